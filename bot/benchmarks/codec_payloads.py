@@ -0,0 +1,138 @@
+"""Cache codec microbenchmark: stdlib json vs cache.codec (orjson).
+
+Payloads:
+- history: messages cache entry with 500 compact messages
+  (history_cache_entries shape)
+- write_batch: 1000 write-behind queue items (MESSAGE writes)
+
+For each payload reports encode and decode time per operation. The json
+baseline decodes the way the cache modules did before the codec:
+json.loads(data.decode("utf-8")).
+
+Usage (from bot/):
+    python -m benchmarks.codec_payloads [--iterations 50]
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Any, Callable
+
+from cache.codec import decode
+from cache.codec import encode
+
+_WORDS = ("the model answered with a detailed explanation of async "
+          "generators, context managers and Привет мир 👋").split()
+
+
+def _text(rng: random.Random, words: int) -> str:
+    """Random text of given word count."""
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+
+def history_payload(messages: int = 500) -> dict[str, Any]:
+    """Messages cache entry as written by cache_messages()."""
+    rng = random.Random(1)
+    entries = []
+    for i in range(messages):
+        role = "user" if i % 2 == 0 else "assistant"
+        entry = {
+            "role": role,
+            "text_content": _text(rng, rng.randint(20, 400)),
+            "message_id": 1000 + i,
+            "chat_id": -1001234567890,
+            "thread_id": 42,
+            "date": 1700000000 + i * 30,
+        }
+        if role == "user":
+            entry["from_user_id"] = 123456789
+            entry["sender_display"] = "@alice"
+        entries.append(entry)
+    return {"thread_id": 42, "messages": entries, "cached_at": time.time()}
+
+
+def write_batch_payload(items: int = 1000) -> list[dict[str, Any]]:
+    """Write-behind queue items as produced by queue_write()."""
+    rng = random.Random(2)
+    return [{
+        "type": "message",
+        "data": {
+            "chat_id": -1001234567890,
+            "message_id": 5000 + i,
+            "thread_id": 42,
+            "from_user_id": 123456789,
+            "date": 1700000000 + i,
+            "role": "assistant",
+            "text_content": _text(rng, 80),
+            "input_tokens": 18234,
+            "output_tokens": 912,
+            "cache_read_tokens": 16000,
+            "cache_write_tokens": 0,
+            "thinking_tokens": 0,
+            "model_id": "claude:sonnet",
+        },
+        "queued_at": time.time(),
+    } for i in range(items)]
+
+
+def _time(fn: Callable[[], Any], iterations: int) -> float:
+    """Mean milliseconds per call."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def _bench_one(value: Any, iterations: int) -> dict[str, float]:
+    """Encode/decode timings for a single value."""
+    legacy = json.dumps(value).encode("utf-8")
+    current = encode(value)
+    return {
+        "json encode": _time(lambda: json.dumps(value).encode("utf-8"),
+                             iterations),
+        "codec encode": _time(lambda: encode(value), iterations),
+        "json decode": _time(lambda: json.loads(legacy.decode("utf-8")),
+                             iterations),
+        "codec decode": _time(lambda: decode(current), iterations),
+        "size KB": len(current) / 1024,
+    }
+
+
+def _bench_batch(items: list, iterations: int) -> dict[str, float]:
+    """Per-item encode/decode timings for a queue batch (ms per batch)."""
+    legacy = [json.dumps(item) for item in items]
+    current = [encode(item) for item in items]
+    return {
+        "json encode": _time(lambda: [json.dumps(i) for i in items],
+                             iterations),
+        "codec encode": _time(lambda: [encode(i) for i in items],
+                              iterations),
+        "json decode": _time(lambda: [json.loads(d) for d in legacy],
+                             iterations),
+        "codec decode": _time(lambda: [decode(d) for d in current],
+                              iterations),
+        "size KB": sum(len(d) for d in current) / 1024,
+    }
+
+
+def main() -> None:
+    """Run benchmarks and print a table (milliseconds per operation)."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    results = {
+        "history (500 msgs)": _bench_one(history_payload(), args.iterations),
+        "write batch (1000)": _bench_batch(write_batch_payload(),
+                                           args.iterations),
+    }
+
+    columns = list(next(iter(results.values())))
+    print(f"{'payload':<22}" + "".join(f"{c:>14}" for c in columns))
+    for name, row in results.items():
+        print(f"{name:<22}" + "".join(f"{row[c]:>14.2f}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Peak memory benchmark for Telegram -> Files API transfers (tracemalloc).
+
+Runs N concurrent transfers of a SIZE_MB file. Telegram and the Files
+API are simulated in-process: the download yields 256 KB chunks, the
+upload thread reads the multipart body in 64 KB reads.
+
+Modes:
+- legacy: download into BytesIO, .read() into bytes, cache the bytes,
+  upload from a new BytesIO (before streaming transfers)
+- current: core.file_transfer.transfer_to_files_api (tee into the blob
+  store and a bounded upload pipe, global in-flight budget)
+
+Usage (from bot/):
+    python -m benchmarks.file_transfer_memory [--transfers 8] [--size-mb 8]
+"""
+
+import argparse
+import asyncio
+from io import BytesIO
+import tempfile
+import time
+import tracemalloc
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from cache.blob_store import BlobStore
+from config import FILE_TRANSFER_CHUNK_SIZE
+from core.file_transfer import transfer_to_files_api
+
+READ_SIZE = 64 * 1024
+
+
+class _FakeFilesClient:
+    """Files API stand-in that drains the multipart body."""
+
+    def __init__(self):
+        self.beta = MagicMock()
+        self.beta.files.upload.side_effect = self._upload
+
+    def with_options(self, **kwargs):
+        """Same client, options ignored."""
+        return self
+
+    @staticmethod
+    def _upload(file):
+        body = file[1]
+        while body.read(READ_SIZE):
+            time.sleep(0.0005)  # Network send
+        return MagicMock(id="file_bench")
+
+
+async def _download(size: int):
+    """Telegram download stand-in (chunks created as they arrive)."""
+    for i, offset in enumerate(range(0, size, FILE_TRANSFER_CHUNK_SIZE)):
+        await asyncio.sleep(0)
+        yield bytes([i % 251]) * min(FILE_TRANSFER_CHUNK_SIZE, size - offset)
+
+
+async def _legacy(size: int, store: BlobStore) -> None:
+    """BytesIO download, bytes copy, cache, BytesIO upload."""
+    file_bytes_io = BytesIO()
+    async for chunk in _download(size):
+        file_bytes_io.write(chunk)
+    file_bytes_io.seek(0)
+    content = file_bytes_io.read()
+    await store.put(content)
+    await asyncio.to_thread(_FakeFilesClient._upload,
+                            ("f", BytesIO(content), "application/pdf"))
+
+
+async def _current(size: int) -> None:
+    """Streaming tee via transfer_to_files_api."""
+    bot = MagicMock()
+    bot.get_file = AsyncMock(
+        return_value=MagicMock(file_path="f", file_size=size))
+    bot.session.api.is_local = False
+    bot.session.stream_content = lambda **kwargs: _download(size)
+    await transfer_to_files_api(bot, "tg", filename="f.pdf")
+
+
+async def _run(transfers: int, size: int, legacy: bool) -> dict[str, float]:
+    """Run concurrent transfers under tracemalloc."""
+    with tempfile.TemporaryDirectory() as root:
+        store = BlobStore(root=root, max_bytes=1 << 40)
+        with patch("core.file_transfer.get_blob_store", return_value=store), \
+                patch("core.file_transfer.cache_file_blob", new=AsyncMock()), \
+                patch("core.claude.files_api.get_anthropic_client",
+                      return_value=_FakeFilesClient()):
+            tracemalloc.start()
+            start = time.perf_counter()
+            if legacy:
+                await asyncio.gather(
+                    *(_legacy(size, store) for _ in range(transfers)))
+            else:
+                await asyncio.gather(*(_current(size) for _ in range(transfers)))
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    return {"ms": elapsed * 1000, "peak MB": peak / (1 << 20)}
+
+
+def main() -> None:
+    """Run both modes and print a comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--transfers", type=int, default=8)
+    parser.add_argument("--size-mb", type=int, default=8)
+    args = parser.parse_args()
+    size = args.size_mb << 20
+
+    results = {
+        "legacy": asyncio.run(_run(args.transfers, size, legacy=True)),
+        "current": asyncio.run(_run(args.transfers, size, legacy=False)),
+    }
+
+    columns = list(next(iter(results.values())))
+    print(f"{'mode':<10}" + "".join(f"{c:>14}" for c in columns))
+    for name, row in results.items():
+        print(f"{name:<10}" + "".join(f"{row[c]:>14.1f}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Stand-ins for external services used by the load-test harness.
+
+- FakeBotAPI: local aiohttp server speaking the Bot API wire format.
+  Records when each chat gets its first draft and its final message.
+- ScriptedProvider: LLMProvider that streams a canned answer at a
+  configurable token rate.
+
+Usage: see benchmarks/load_test.py.
+"""
+
+import asyncio
+from collections import defaultdict
+import itertools
+import time
+from typing import AsyncIterator
+
+from aiohttp import web
+from core.base import LLMProvider
+from core.models import LLMRequest
+from core.models import StreamEvent
+from core.models import TokenUsage
+
+BOT_ID = 900000001
+BOT_USERNAME = "loadtest_bot"
+
+# Methods answered with a Message; everything else returns True
+_MESSAGE_METHODS = frozenset({
+    "sendMessage",
+    "editMessageText",
+    "sendDocument",
+    "sendPhoto",
+})
+
+_ANSWER = ("The quick brown fox jumps over a lazy dog while streaming "
+           "tokens arrive at a steady pace and drafts keep up. ")
+
+
+class FakeBotAPI:
+    """Minimal Bot API server with per-call latency.
+
+    Attributes:
+        calls: Calls per Bot API method.
+        first_draft: Chat ID -> monotonic time of the first draft.
+        final_message: Chat ID -> monotonic times of sendMessage calls.
+    """
+
+    def __init__(self, latency: float = 0.05) -> None:
+        """Initialize server.
+
+        Args:
+            latency: Simulated round-trip time per call (seconds).
+        """
+        self._latency = latency
+        self._message_ids: dict[int, itertools.count] = defaultdict(
+            lambda: itertools.count(1))
+        self._runner: web.AppRunner | None = None
+        self.base_url = ""
+        self.calls: dict[str, int] = defaultdict(int)
+        self.first_draft: dict[int, float] = {}
+        self.final_message: dict[int, list[float]] = defaultdict(list)
+        self._waiters: dict[int, asyncio.Event] = {}
+
+    async def start(self, host: str = "127.0.0.1") -> None:
+        """Start listening on a free port."""
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # pylint: disable=protected-access
+        self.base_url = f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        """Stop the server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def next_message_id(self, chat_id: int) -> int:
+        """Allocate a message ID in chat_id (shared by user and bot)."""
+        return next(self._message_ids[chat_id])
+
+    def expect_reply(self, chat_id: int) -> asyncio.Event:
+        """Event set on the next sendMessage to chat_id."""
+        event = asyncio.Event()
+        self._waiters[chat_id] = event
+        return event
+
+    def reset_draft(self, chat_id: int) -> None:
+        """Forget the first draft of chat_id (before its next request)."""
+        self.first_draft.pop(chat_id, None)
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        """Answer one Bot API call."""
+        method = request.match_info["method"]
+        data = await request.post()
+        self.calls[method] += 1
+        await asyncio.sleep(self._latency)
+
+        chat_id = int(data.get("chat_id", 0) or 0)
+        now = time.monotonic()
+        if method == "sendMessageDraft":
+            self.first_draft.setdefault(chat_id, now)
+        elif method == "sendMessage":
+            self.final_message[chat_id].append(now)
+            waiter = self._waiters.pop(chat_id, None)
+            if waiter is not None:
+                waiter.set()
+
+        if method == "getMe":
+            result = {
+                "id": BOT_ID,
+                "is_bot": True,
+                "first_name": "Load Test",
+                "username": BOT_USERNAME,
+            }
+        elif method in _MESSAGE_METHODS:
+            result = {
+                "message_id": self.next_message_id(chat_id),
+                "date": int(time.time()),
+                "chat": {
+                    "id": chat_id,
+                    "type": "private"
+                },
+                "from": {
+                    "id": BOT_ID,
+                    "is_bot": True,
+                    "first_name": "Load Test"
+                },
+                "text": str(data.get("text", "")),
+            }
+        else:
+            result = True
+        return web.json_response({"ok": True, "result": result})
+
+
+class ScriptedProvider(LLMProvider):
+    """LLM stand-in streaming a fixed-length answer.
+
+    Stateless per request (usage travels in stream_complete), so one
+    instance serves all concurrent users like the real singletons.
+    """
+
+    def __init__(self,
+                 tokens_per_second: float = 80.0,
+                 response_tokens: int = 150,
+                 ttft: float = 0.5,
+                 chars_per_token: int = 4) -> None:
+        """Initialize provider.
+
+        Args:
+            tokens_per_second: Output token rate after the first token.
+            response_tokens: Output tokens per answer.
+            ttft: Delay before the first token (seconds).
+            chars_per_token: Characters per streamed token.
+        """
+        self._interval = 1.0 / tokens_per_second
+        self._response_tokens = response_tokens
+        self._ttft = ttft
+        self._chars_per_token = chars_per_token
+        self._usage = TokenUsage(input_tokens=0, output_tokens=0)
+
+    def _usage_for(self, request: LLMRequest) -> TokenUsage:
+        """Rough usage from request size."""
+        input_chars = sum(len(str(m.content)) for m in request.messages)
+        return TokenUsage(input_tokens=max(input_chars // 4, 1),
+                          output_tokens=self._response_tokens)
+
+    async def stream_message(self, request: LLMRequest) -> AsyncIterator[str]:
+        """Stream plain text chunks."""
+        async for event in self.stream_events(request):
+            if event.type == "text_delta":
+                yield event.content
+
+    async def stream_events(self,
+                            request: LLMRequest) -> AsyncIterator[StreamEvent]:
+        """Stream text deltas at the configured rate."""
+        await asyncio.sleep(self._ttft)
+        size = self._chars_per_token
+        start = time.monotonic()
+        for i in range(self._response_tokens):
+            # Sleep to the schedule, not per token, so slow ticks catch up
+            delay = start + i * self._interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            offset = i * size % len(_ANSWER)
+            yield StreamEvent(type="text_delta",
+                              content=(_ANSWER * 2)[offset:offset + size])
+        yield StreamEvent(type="block_end")
+        yield StreamEvent(type="message_end", stop_reason="end_turn")
+        usage = self._usage_for(request)
+        self._usage = usage
+        yield StreamEvent(type="stream_complete", usage=usage)
+
+    async def get_token_count(self, text: str) -> int:
+        """Approximate token count."""
+        return max(len(text) // 4, 1)
+
+    async def get_usage(self) -> TokenUsage:
+        """Usage of the last completed stream."""
+        return self._usage
+
+    def get_stop_reason(self) -> str | None:
+        """Scripted answers always end the turn."""
+        return "end_turn"
+
+    @property
+    def last_compaction(self) -> None:
+        """Scripted answers never compact."""
+        return None
@@ -0,0 +1,83 @@
+"""Logging throughput benchmark: synchronous stdout vs background writer.
+
+Logs N records shaped like claude.stream_events.complete through
+setup_logging() in both modes, with stdout redirected to /dev/null.
+
+Reports:
+- caller: time spent in logger.info() calls (what the event loop pays)
+- total: caller time plus draining the background writer
+
+Sampling is disabled for the comparison so both modes emit every record.
+
+Usage (from bot/):
+    python -m benchmarks.log_throughput [--records 200000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from unittest.mock import patch
+
+import structlog
+from utils import structured_logging
+from utils.structured_logging import get_logger
+from utils.structured_logging import setup_logging
+from utils.structured_logging import shutdown_logging
+
+
+def _run(records: int, background: bool) -> tuple[float, float, int]:
+    """Log records in one mode.
+
+    Returns:
+        Tuple of (caller seconds, total seconds, dropped records).
+    """
+    structlog.reset_defaults()
+    with patch.object(structured_logging, "LOG_SAMPLE_RATES", {}), \
+            patch.object(structured_logging, "LOG_RATE_LIMITS", {}), \
+            patch.object(structured_logging, "LOG_QUEUE_SIZE", records):
+        setup_logging(level="INFO", background=background)
+    logger = get_logger("benchmark")
+
+    start = time.perf_counter()
+    for i in range(records):
+        logger.info("claude.stream_events.complete",
+                    thread_id=12345,
+                    model="claude-sonnet-4-6",
+                    input_tokens=18234,
+                    output_tokens=912,
+                    cache_read_tokens=16000,
+                    stop_reason="end_turn",
+                    iteration=i)
+    caller = time.perf_counter() - start
+    dropped = structured_logging.get_log_stats()["queue_full"]
+    shutdown_logging()
+    total = time.perf_counter() - start
+    return caller, total, dropped
+
+
+def main() -> None:
+    """Run both modes and print a comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--records", type=int, default=200_000)
+    args = parser.parse_args()
+
+    real_stdout = sys.stdout
+    results = {}
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        sys.stdout = devnull
+        try:
+            for name, background in (("sync", False), ("background", True)):
+                results[name] = _run(args.records, background)
+        finally:
+            sys.stdout = real_stdout
+
+    print(f"{'mode':<12}{'caller s':>10}{'total s':>10}"
+          f"{'rec/s (caller)':>16}{'dropped':>9}")
+    for name, (caller, total, dropped) in results.items():
+        print(f"{name:<12}{caller:>10.3f}{total:>10.3f}"
+              f"{args.records / caller:>16,.0f}{dropped:>9}")
+
+
+if __name__ == "__main__":
+    main()
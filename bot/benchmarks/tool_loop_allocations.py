@@ -0,0 +1,172 @@
+"""Allocation benchmark for tool loop records (tracemalloc).
+
+Simulates a 5-iteration tool loop streaming 10k events in total. Each
+iteration builds the LLMRequest for the whole conversation, receives its
+share of StreamEvents (text deltas), produces DisplayBlocks and one
+ToolCall, and appends a tool_use/tool_result pair to the conversation.
+
+Modes:
+- legacy: unslotted dataclasses, validated LLMRequest/Message rebuilt
+  from the full conversation every iteration (before slotted records)
+- current: the shipped slotted dataclasses, model_construct() and
+  Message reuse as in StreamingOrchestrator
+
+Created objects are kept alive for the run, so "retained KB" is the
+memory the records themselves occupy; "peak KB" includes temporaries.
+
+Usage (from bot/):
+    python -m benchmarks.tool_loop_allocations [--events 10000]
+"""
+
+import argparse
+import dataclasses
+import time
+import tracemalloc
+from typing import Any
+
+from core.models import LLMRequest
+from core.models import Message
+from core.models import StreamEvent
+from telegram.streaming.types import BlockType
+from telegram.streaming.types import DisplayBlock
+from telegram.streaming.types import ToolCall
+
+ITERATIONS = 5
+HISTORY_MESSAGES = 40
+DELTAS_PER_BLOCK = 50
+
+
+def _unslotted(cls: type) -> type:
+    """Plain dataclass with the same fields as a slotted one."""
+    return dataclasses.make_dataclass(f"Legacy{cls.__name__}", [
+        (f.name, f.type,
+         dataclasses.field(default=f.default,
+                           default_factory=f.default_factory))
+        for f in dataclasses.fields(cls)
+    ])
+
+
+def _history() -> list[dict[str, Any]]:
+    """Conversation loaded from the database."""
+    return [{
+        "role": "user" if i % 2 == 0 else "assistant",
+        "content": [{
+            "type": "text",
+            "text": f"message {i} " * 40
+        }],
+    } for i in range(HISTORY_MESSAGES)]
+
+
+def _legacy_request(conversation: list[dict]) -> LLMRequest:
+    """Request built with validation from the full conversation."""
+    return LLMRequest(
+        messages=[
+            Message(role=msg["role"], content=msg["content"])
+            for msg in conversation
+        ],
+        system_prompt="You are a helpful assistant",
+        model="claude:sonnet",
+        max_tokens=16000,
+        temperature=1.0,
+        tools=[],
+        cache_breakpoint_index=HISTORY_MESSAGES - 2,
+    )
+
+
+def _current_request(conversation: list[dict],
+                     llm_messages: list[Message]) -> LLMRequest:
+    """Request built as in StreamingOrchestrator."""
+    llm_messages.extend(
+        Message.model_construct(role=msg["role"], content=msg["content"])
+        for msg in conversation[len(llm_messages):])
+    return LLMRequest.model_construct(
+        messages=list(llm_messages),
+        system_prompt="You are a helpful assistant",
+        model="claude:sonnet",
+        max_tokens=16000,
+        temperature=1.0,
+        tools=[],
+        cache_breakpoint_index=HISTORY_MESSAGES - 2,
+        template_hash=None,
+    )
+
+
+def _run(events: int, legacy: bool) -> dict[str, float]:
+    """Run the simulated tool loop under tracemalloc."""
+    event_cls = _unslotted(StreamEvent) if legacy else StreamEvent
+    block_cls = _unslotted(DisplayBlock) if legacy else DisplayBlock
+    tool_cls = _unslotted(ToolCall) if legacy else ToolCall
+    per_iteration = events // ITERATIONS
+    conversation = _history()
+    deltas = [f"tok{i} " for i in range(DELTAS_PER_BLOCK)]
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    llm_messages: list[Message] = []
+    keep: list[Any] = []
+    for iteration in range(ITERATIONS):
+        if legacy:
+            keep.append(_legacy_request(conversation))
+        else:
+            keep.append(_current_request(conversation, llm_messages))
+
+        for i in range(per_iteration):
+            keep.append(
+                event_cls(type="text_delta",
+                          content=deltas[i % DELTAS_PER_BLOCK]))
+            if i % DELTAS_PER_BLOCK == DELTAS_PER_BLOCK - 1:
+                keep.append(
+                    block_cls(block_type=BlockType.TEXT,
+                              content="".join(deltas)))
+
+        tool = tool_cls(tool_id=f"toolu_{iteration}",
+                        name="web_search",
+                        input={"query": "q"})
+        keep.append(tool)
+        conversation.append({
+            "role": "assistant",
+            "content": [{
+                "type": "tool_use",
+                "id": tool.tool_id,
+                "name": tool.name,
+                "input": tool.input,
+            }],
+        })
+        conversation.append({
+            "role": "user",
+            "content": [{
+                "type": "tool_result",
+                "tool_use_id": tool.tool_id,
+                "content": "result",
+            }],
+        })
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "ms": elapsed * 1000,
+        "retained KB": current / 1024,
+        "peak KB": peak / 1024,
+        "objects": len(keep),
+    }
+
+
+def main() -> None:
+    """Run both modes and print a comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--events", type=int, default=10_000)
+    args = parser.parse_args()
+
+    results = {
+        "legacy": _run(args.events, legacy=True),
+        "current": _run(args.events, legacy=False),
+    }
+
+    columns = list(next(iter(results.values())))
+    print(f"{'mode':<10}" + "".join(f"{c:>14}" for c in columns))
+    for name, row in results.items():
+        print(f"{name:<10}" + "".join(f"{row[c]:>14.1f}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -14,11 +14,12 @@ NO __init__.py - use direct import:
 
 from dataclasses import dataclass
 from decimal import Decimal
-import json
 import time
 from typing import Optional
 
 from cache.client import get_redis
+from cache.codec import decode
+from cache.codec import encode
 from cache.keys import files_key
 from cache.keys import messages_key
 from cache.keys import thread_key
@@ -92,7 +93,7 @@ async def get_user_context_batch(
 
         # User data
         if results[0]:
-            context.user = json.loads(results[0].decode("utf-8"))
+            context.user = decode(results[0])
             context.cache_hits += 1
             record_cache_operation("user", hit=True)
         else:
@@ -101,7 +102,7 @@ async def get_user_context_batch(
 
         # Thread data
         if results[1]:
-            context.thread = json.loads(results[1].decode("utf-8"))
+            context.thread = decode(results[1])
             context.cache_hits += 1
             record_cache_operation("thread", hit=True)
         else:
@@ -110,7 +111,7 @@ async def get_user_context_batch(
 
         # Messages
         if results[2]:
-            data = json.loads(results[2].decode("utf-8"))
+            data = decode(results[2])
             context.messages = data.get("messages", [])
             context.cache_hits += 1
             record_cache_operation("messages", hit=True)
@@ -120,7 +121,7 @@ async def get_user_context_batch(
 
         # Files
         if results[3]:
-            data = json.loads(results[3].decode("utf-8"))
+            data = decode(results[3])
             context.files = data.get("files", [])
             context.cache_hits += 1
             record_cache_operation("files", hit=True)
@@ -191,24 +192,24 @@ async def set_user_context_batch(
         async with redis.pipeline(transaction=False) as pipe:
             if user_data is not None:
                 key = user_key(user_id)
-                pipe.setex(key, user_ttl, json.dumps(user_data))
+                pipe.setex(key, user_ttl, encode(user_data))
                 keys_set += 1
 
             if thread_data is not None:
                 key = thread_key(thread_id)
-                pipe.setex(key, thread_ttl, json.dumps(thread_data))
+                pipe.setex(key, thread_ttl, encode(thread_data))
                 keys_set += 1
 
             if messages is not None:
                 key = messages_key(thread_id)
                 data = {"messages": messages, "cached_at": time.time()}
-                pipe.setex(key, messages_ttl, json.dumps(data))
+                pipe.setex(key, messages_ttl, encode(data))
                 keys_set += 1
 
             if files is not None:
                 key = files_key(thread_id)
                 data = {"files": files, "cached_at": time.time()}
-                pipe.setex(key, files_ttl, json.dumps(data))
+                pipe.setex(key, files_ttl, encode(data))
                 keys_set += 1
 
             if keys_set > 0:
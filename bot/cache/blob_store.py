@@ -0,0 +1,446 @@
+"""Content-addressed local blob store for file bytes.
+
+Redis keeps only small pointers (sha256 hex digest) for cached files; the
+bytes themselves live on local disk under BLOB_STORE_DIR. This keeps
+multi-MB payloads out of Redis memory (where they compete with user,
+thread and message caches under allkeys-lru) and lets large reads be
+memory-mapped instead of copied through the Redis client.
+
+Layout:
+    {root}/{digest[:2]}/{digest}
+
+Properties:
+- Identical content is stored once (same digest)
+- Writes are atomic (temp file + os.replace); open_writer() streams
+  content in chunks without holding it in memory
+- Total size bounded by BLOB_STORE_MAX_BYTES, evicted least recently used
+- Index (digest -> size, LRU order) is kept in memory and rebuilt from
+  the directory on first use (mtime order, touched on every read)
+
+Blobs may be evicted while Redis pointers still reference them; readers
+treat a missing blob as a cache miss. Unlinking a mapped file is safe on
+POSIX, so views handed out by open_view() stay valid after eviction.
+
+NO __init__.py - use direct import:
+    from cache.blob_store import get_blob_store, parse_blob_pointer
+"""
+
+import asyncio
+from collections import OrderedDict
+import hashlib
+import mmap
+import os
+import re
+import threading
+from typing import Optional
+import uuid
+
+from config import BLOB_STORE_DIR
+from config import BLOB_STORE_MAX_BYTES
+from utils.metrics import record_blob_eviction
+from utils.metrics import set_blob_store_bytes
+from utils.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+_DIGEST_RE = re.compile(rb"[0-9a-f]{64}")
+
+
+def parse_blob_pointer(value: bytes) -> Optional[str]:
+    """Get blob digest from a Redis value.
+
+    Args:
+        value: Raw Redis value.
+
+    Returns:
+        Hex digest if value is a blob pointer, None for legacy values
+        that hold the file bytes inline.
+    """
+    if len(value) != 64 or not _DIGEST_RE.fullmatch(value):
+        return None
+    return value.decode("ascii")
+
+
+async def resolve_blob(value: bytes,
+                       as_view: bool = False) -> Optional[bytes | memoryview]:
+    """Resolve a Redis file value to its content.
+
+    Args:
+        value: Raw Redis value (blob pointer or legacy inline bytes).
+        as_view: Return an mmap-backed memoryview instead of bytes.
+
+    Returns:
+        File content, None if the pointed-to blob was evicted.
+    """
+    digest = parse_blob_pointer(value)
+    if digest is None:
+        return value
+    store = get_blob_store()
+    if as_view:
+        return await store.open_view(digest)
+    return await store.get(digest)
+
+
+class BlobStore:
+    """Size-bounded content-addressed file store on local disk.
+
+    Sync methods do file I/O and must run off the event loop; the async
+    wrappers use asyncio.to_thread().
+
+    Usage:
+        store = get_blob_store()
+        digest = await store.put(content)
+        data = await store.get(digest)  # bytes
+        view = await store.open_view(digest)  # mmap-backed memoryview
+
+        writer = store.open_writer()  # streaming, chunk by chunk
+        await writer.write(chunk)
+        digest = await writer.commit()
+    """
+
+    def __init__(self,
+                 root: str = BLOB_STORE_DIR,
+                 max_bytes: int = BLOB_STORE_MAX_BYTES) -> None:
+        """Initialize the store.
+
+        Args:
+            root: Directory for blob files (created on first write).
+            max_bytes: Total size budget for stored blobs.
+        """
+        self._root = root
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: OrderedDict[str, int] = OrderedDict()
+        self._total_bytes = 0
+        self._loaded = False
+
+    @property
+    def total_bytes(self) -> int:
+        """Bytes currently held in the store."""
+        return self._total_bytes
+
+    # === Async API ===
+
+    async def put(self, data: bytes | bytearray | memoryview) -> str:
+        """Store content and return its digest.
+
+        Args:
+            data: File content.
+
+        Returns:
+            sha256 hex digest (the blob pointer).
+
+        Raises:
+            OSError: If the blob can't be written.
+        """
+        return await asyncio.to_thread(self.put_sync, data)
+
+    async def get(self, digest: str) -> Optional[bytes]:
+        """Read blob content.
+
+        Args:
+            digest: Blob digest.
+
+        Returns:
+            Content as bytes, None if blob is missing (evicted).
+        """
+        view = await asyncio.to_thread(self.open_view_sync, digest)
+        return view.tobytes() if view is not None else None
+
+    async def open_view(self, digest: str) -> Optional[memoryview]:
+        """Map blob read-only without copying.
+
+        Args:
+            digest: Blob digest.
+
+        Returns:
+            Read-only memoryview over the mapped file, None if missing.
+        """
+        return await asyncio.to_thread(self.open_view_sync, digest)
+
+    def open_writer(self) -> "BlobWriter":
+        """Start a streaming write.
+
+        Returns:
+            BlobWriter; call commit() when done or abort() on failure.
+        """
+        return BlobWriter(self)
+
+    # === Sync API ===
+
+    def put_sync(self, data: bytes | bytearray | memoryview) -> str:
+        """Store content (blocking). See put()."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+
+        with self._lock:
+            self._ensure_loaded()
+            if digest in self._index and os.path.exists(path):
+                self._touch(digest, path)
+                return digest
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        self._register(digest, len(data))
+        return digest
+
+    def commit_sync(self, tmp_path: str, digest: str, size: int) -> None:
+        """Move a fully written temp file into place (blocking).
+
+        Args:
+            tmp_path: Temp file written by BlobWriter.
+            digest: sha256 hex digest of its content.
+            size: Content size in bytes.
+        """
+        path = self._path(digest)
+
+        with self._lock:
+            self._ensure_loaded()
+            exists = digest in self._index and os.path.exists(path)
+            if exists:
+                self._touch(digest, path)
+
+        if exists:
+            os.unlink(tmp_path)
+            return
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+        self._register(digest, size)
+
+    def tmp_path_sync(self) -> str:
+        """Path for a new streaming temp file (blocking).
+
+        Temp files live in {root}/tmp, which the index rebuild treats as
+        a shard and clears of leftovers.
+        """
+        with self._lock:
+            self._ensure_loaded()
+        tmp_dir = os.path.join(self._root, "tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        return os.path.join(tmp_dir, f"{uuid.uuid4().hex}.tmp")
+
+    def open_view_sync(self, digest: str) -> Optional[memoryview]:
+        """Map blob read-only (blocking). See open_view()."""
+        path = self._path(digest)
+        try:
+            with open(path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size == 0:
+                    view = memoryview(b"")
+                else:
+                    view = memoryview(
+                        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        except FileNotFoundError:
+            with self._lock:
+                self._forget(digest)
+            return None
+
+        with self._lock:
+            self._ensure_loaded()
+            if digest not in self._index:
+                self._index[digest] = size
+                self._total_bytes += size
+            self._touch(digest, path)
+        return view
+
+    def contains(self, digest: str) -> bool:
+        """Check whether blob is present on disk."""
+        return os.path.exists(self._path(digest))
+
+    def _register(self, digest: str, size: int) -> None:
+        """Add a written blob to the index and evict over budget."""
+        with self._lock:
+            old_size = self._index.pop(digest, None)
+            if old_size is not None:
+                self._total_bytes -= old_size
+            self._index[digest] = size
+            self._total_bytes += size
+            self._evict(keep=digest)
+            set_blob_store_bytes(self._total_bytes)
+
+    # === Internals (caller holds self._lock) ===
+
+    def _path(self, digest: str) -> str:
+        """File path for a digest."""
+        return os.path.join(self._root, digest[:2], digest)
+
+    def _ensure_loaded(self) -> None:
+        """Rebuild index from disk once (oldest mtime first)."""
+        if self._loaded:
+            return
+        self._loaded = True
+
+        entries = []
+        try:
+            shards = os.scandir(self._root)
+        except FileNotFoundError:
+            return
+        with shards:
+            for shard in shards:
+                if not shard.is_dir():
+                    continue
+                for entry in os.scandir(shard.path):
+                    if entry.name.endswith(".tmp"):
+                        # Leftover from an interrupted write
+                        try:
+                            os.unlink(entry.path)
+                        except OSError:
+                            pass
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, entry.name, stat.st_size))
+
+        for _, digest, size in sorted(entries):
+            self._index[digest] = size
+            self._total_bytes += size
+
+        logger.info("blob_store.loaded",
+                    root=self._root,
+                    blobs=len(self._index),
+                    total_bytes=self._total_bytes)
+        self._evict()
+        set_blob_store_bytes(self._total_bytes)
+
+    def _touch(self, digest: str, path: str) -> None:
+        """Mark blob as recently used (index order and mtime)."""
+        self._index.move_to_end(digest)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _forget(self, digest: str) -> None:
+        """Drop blob from index (file already gone)."""
+        size = self._index.pop(digest, None)
+        if size is not None:
+            self._total_bytes -= size
+            set_blob_store_bytes(self._total_bytes)
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Remove least recently used blobs until within budget."""
+        evicted = 0
+        while self._total_bytes > self._max_bytes and self._index:
+            digest, size = next(iter(self._index.items()))
+            if digest == keep:
+                break
+            del self._index[digest]
+            self._total_bytes -= size
+            try:
+                os.unlink(self._path(digest))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.info("blob_store.evict_error",
+                            digest=digest[:12],
+                            error=str(e))
+            evicted += 1
+
+        if evicted:
+            record_blob_eviction(evicted)
+            logger.debug("blob_store.evicted",
+                         count=evicted,
+                         total_bytes=self._total_bytes)
+
+
+class BlobWriter:
+    """Streaming write of one blob.
+
+    Content is hashed and written to a temp file chunk by chunk, so only
+    the current chunk is held in memory. The blob becomes visible under
+    its digest on commit().
+    """
+
+    def __init__(self, store: BlobStore) -> None:
+        """Initialize writer.
+
+        Args:
+            store: Store the blob is committed to.
+        """
+        self._store = store
+        self._hash = hashlib.sha256()
+        self._file = None
+        self._tmp_path: Optional[str] = None
+        self.size = 0
+
+    async def write(self, chunk: bytes | memoryview) -> None:
+        """Append a chunk.
+
+        Raises:
+            OSError: If the temp file can't be written.
+        """
+        await asyncio.to_thread(self.write_sync, chunk)
+
+    async def commit(self) -> str:
+        """Finish the write and return the blob digest.
+
+        Raises:
+            OSError: If the blob can't be moved into place.
+        """
+        return await asyncio.to_thread(self.commit_sync)
+
+    async def abort(self) -> None:
+        """Discard the partial write."""
+        await asyncio.to_thread(self.abort_sync)
+
+    def write_sync(self, chunk: bytes | memoryview) -> None:
+        """Append a chunk (blocking). See write()."""
+        if self._file is None:
+            self._tmp_path = self._store.tmp_path_sync()
+            self._file = open(  # pylint: disable=consider-using-with
+                self._tmp_path, "wb")
+        self._file.write(chunk)
+        self._hash.update(chunk)
+        self.size += len(chunk)
+
+    def commit_sync(self) -> str:
+        """Finish the write (blocking). See commit()."""
+        if self._file is None:
+            self.write_sync(b"")
+        self._file.close()
+        digest = self._hash.hexdigest()
+        try:
+            self._store.commit_sync(self._tmp_path, digest, self.size)
+        except OSError:
+            self.abort_sync()
+            raise
+        self._tmp_path = None
+        return digest
+
+    def abort_sync(self) -> None:
+        """Discard the partial write (blocking). See abort()."""
+        if self._file is not None:
+            self._file.close()
+        if self._tmp_path is not None:
+            try:
+                os.unlink(self._tmp_path)
+            except OSError:
+                pass
+            self._tmp_path = None
+
+
+from core.singleton import singleton  # pylint: disable=wrong-import-position
+
+
+@singleton
+def get_blob_store() -> BlobStore:
+    """Get the global blob store instance.
+
+    Returns:
+        BlobStore singleton.
+    """
+    return BlobStore()
@@ -0,0 +1,111 @@
+"""JSON codec for Redis cache and queue payloads.
+
+All cache modules serialize through this module instead of the stdlib
+json module. Encoding uses orjson (several times faster than json.dumps
+and returns bytes directly, so no str -> bytes round trip); decoding
+reads the raw Redis bytes without .decode("utf-8").
+
+Envelope format:
+    b"\\x01" + orjson JSON    version 1 (current)
+    JSON text                 legacy, written by json.dumps before v1
+
+The version byte is a control character, which can never start a JSON
+document, so legacy values stay readable during rollout and until they
+expire. Unknown version bytes raise CodecError; callers treat that as a
+cache miss.
+
+Lua scripts that rewrite cached values (cjson) must strip the envelope
+byte before cjson.decode and put it back on SET; see LUA_UNWRAP.
+
+NO __init__.py - use direct import:
+    from cache.codec import decode, encode
+"""
+
+import json
+from typing import Any
+
+import orjson
+
+CODEC_VERSION = 1
+_V1 = b"\x01"
+
+# orjson refuses non-str dict keys by default; json.dumps coerces them
+_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+# Lua fragment: strips the envelope byte from `data` into `envelope`.
+# Re-encode with: envelope .. cjson.encode(value)
+LUA_UNWRAP = """
+local envelope = ''
+local first = string.byte(data, 1)
+if first ~= nil and first < 32 and first ~= 9 and first ~= 10
+        and first ~= 13 then
+    envelope = string.sub(data, 1, 1)
+    data = string.sub(data, 2)
+end
+"""
+
+
+class CodecError(ValueError):
+    """Payload has an unknown envelope version."""
+
+
+def encode(value: Any) -> bytes:
+    """Serialize a value for storage in Redis.
+
+    Args:
+        value: JSON-compatible value.
+
+    Returns:
+        Versioned envelope bytes.
+
+    Raises:
+        TypeError: If value is not JSON-serializable.
+    """
+    return _V1 + orjson.dumps(value, option=_OPTIONS)
+
+
+def dumps(value: Any) -> bytes:
+    """Serialize a value as plain JSON (no envelope).
+
+    For payloads that are not stored as-is, e.g. Lua script arguments
+    parsed by cjson.
+
+    Args:
+        value: JSON-compatible value.
+
+    Returns:
+        JSON bytes.
+    """
+    return orjson.dumps(value, option=_OPTIONS)
+
+
+def decode(data: bytes | bytearray | memoryview | str) -> Any:
+    """Deserialize a Redis payload (v1 envelope or legacy JSON).
+
+    Args:
+        data: Raw value as returned by Redis.
+
+    Returns:
+        Decoded value.
+
+    Raises:
+        CodecError: If the envelope version is unknown.
+        json.JSONDecodeError: If the payload is not valid JSON.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    view = memoryview(data)
+    if not view:
+        raise json.JSONDecodeError("Empty payload", "", 0)
+
+    first = view[0]
+    if first == _V1[0]:
+        return orjson.loads(view[1:])
+    if first < 0x20 and first not in b"\t\n\r":
+        raise CodecError(f"Unknown codec envelope version: {first}")
+
+    try:
+        return orjson.loads(view)
+    except orjson.JSONDecodeError:
+        # Legacy json.dumps output may contain NaN/Infinity
+        return json.loads(view.tobytes())
@@ -9,24 +9,32 @@ Key features:
 - Up to 100MB per file
 - Stores both file content and metadata
 - Automatic file preview generation
+- File content lives in the local blob store; Redis holds the pointer
 
 NO __init__.py - use direct import:
     from cache.exec_cache import (
-        store_exec_file, get_exec_file, get_exec_meta, delete_exec_file
+        store_exec_file, get_exec_file, get_exec_file_view, get_exec_meta,
+        delete_exec_file
     )
 """
 
-import json
 import time
 from typing import Any, List, Optional
 import uuid
 
+from cache.blob_store import get_blob_store
+from cache.blob_store import resolve_blob
 from cache.client import get_redis
+from cache.codec import decode
+from cache.codec import encode
 from cache.keys import exec_file_key
 from cache.keys import EXEC_FILE_MAX_SIZE
 from cache.keys import EXEC_FILE_TTL
 from cache.keys import exec_meta_key
 from cache.keys import exec_thread_index_key
+from core.image_processor import get_image_processor
+from core.image_processor import ImageInfo
+from core.image_processor import probe_image
 from utils.metrics import record_cache_operation
 from utils.metrics import record_redis_operation_time
 from utils.structured_logging import get_logger
@@ -55,6 +63,7 @@ def _generate_preview(  # pylint: disable=too-many-return-statements
     filename: str,
     content: bytes,
     mime_type: str,
+    image_info: Optional[ImageInfo] = None,
 ) -> str:
     """Generate human-readable preview of file content.
 
@@ -62,6 +71,8 @@ def _generate_preview(  # pylint: disable=too-many-return-statements
         filename: Original filename.
         content: File content as bytes.
         mime_type: MIME type of the file.
+        image_info: Pre-computed image header info from the image
+            processor (probed if not provided).
 
     Returns:
         Preview string describing file content.
@@ -79,16 +90,12 @@ def _generate_preview(  # pylint: disable=too-many-return-statements
 
     # Image files
     if mime_type.startswith("image/"):
-        try:
-            import io  # pylint: disable=import-outside-toplevel
-
-            from PIL import Image  # pylint: disable=import-outside-toplevel
-            img = Image.open(io.BytesIO(content))
-            width, height = img.size
-            mode = img.mode
-            return f"Image {width}x{height} ({mode}), {size_str}"
-        except Exception:  # pylint: disable=broad-exception-caught
+        if image_info is None:
+            image_info = probe_image(content)
+        if image_info is None:
             return f"Image file, {size_str}"
+        return (f"Image {image_info.width}x{image_info.height} "
+                f"({image_info.mode}), {size_str}")
 
     # PDF files
     if mime_type == "application/pdf":
@@ -166,7 +173,7 @@ async def store_exec_file(
     thread_id: Optional[int] = None,
     delivery_hint: Optional[str] = None,
 ) -> Optional[dict]:
-    """Store execution output file in Redis.
+    """Store execution output file (content in blob store, metadata in Redis).
 
     Args:
         filename: Original filename (e.g., "plot.png").
@@ -205,8 +212,11 @@ async def store_exec_file(
         # Generate temp ID
         temp_id = generate_temp_id(filename)
 
-        # Generate preview
-        preview = _generate_preview(filename, content, mime_type)
+        # Generate preview (image header probe via shared image processor)
+        image_info = None
+        if mime_type.startswith("image/"):
+            image_info = await get_image_processor().probe(content)
+        preview = _generate_preview(filename, content, mime_type, image_info)
 
         # Prepare metadata
         metadata = {
@@ -223,10 +233,9 @@ async def store_exec_file(
             "expires_at": time.time() + EXEC_FILE_TTL,
         }
 
-        # Store file content (convert bytearray to bytes for Redis)
+        # Store file content on disk, Redis gets the pointer
         file_key = exec_file_key(temp_id)
-        file_content = bytes(content) if isinstance(content,
-                                                    bytearray) else content
+        digest = await get_blob_store().put(content)
 
         # Store metadata
         meta_key = exec_meta_key(temp_id)
@@ -235,8 +244,8 @@ async def store_exec_file(
         # This avoids exhausting the connection pool when many files are
         # cached concurrently (e.g., 13 files × 4 parallel ops = 52 conns).
         async with redis.pipeline(transaction=False) as pipe:
-            pipe.setex(file_key, EXEC_FILE_TTL, file_content)
-            pipe.setex(meta_key, EXEC_FILE_TTL, json.dumps(metadata))
+            pipe.setex(file_key, EXEC_FILE_TTL, digest)
+            pipe.setex(meta_key, EXEC_FILE_TTL, encode(metadata))
             if thread_id is not None:
                 thread_key = exec_thread_index_key(thread_id)
                 pipe.sadd(thread_key, temp_id)
@@ -270,7 +279,7 @@ async def store_exec_file(
 
 
 async def get_exec_file(temp_id: str) -> Optional[bytes]:
-    """Get execution output file content from Redis.
+    """Get execution output file content.
 
     Args:
         temp_id: Temporary file ID.
@@ -278,6 +287,27 @@ async def get_exec_file(temp_id: str) -> Optional[bytes]:
     Returns:
         File content as bytes if found, None otherwise.
     """
+    return await _get_exec_content(temp_id, as_view=False)
+
+
+async def get_exec_file_view(temp_id: str) -> Optional[bytes | memoryview]:
+    """Get execution output file content without copying it into memory.
+
+    The view is backed by a read-only mmap of the blob file. Not picklable,
+    so don't pass it to the image processor pool.
+
+    Args:
+        temp_id: Temporary file ID.
+
+    Returns:
+        memoryview (or bytes for legacy values) if found, None otherwise.
+    """
+    return await _get_exec_content(temp_id, as_view=True)
+
+
+async def _get_exec_content(temp_id: str,
+                            as_view: bool) -> Optional[bytes | memoryview]:
+    """Get execution output file content, resolving the blob pointer."""
     start_time = time.time()
     redis = await get_redis()
 
@@ -288,8 +318,11 @@ async def get_exec_file(temp_id: str) -> Optional[bytes]:
         key = exec_file_key(temp_id)
         content = await redis.get(key)
 
+        record_redis_operation_time("get", time.time() - start_time)
+
+        if content is not None:
+            content = await resolve_blob(content, as_view=as_view)
         elapsed = time.time() - start_time
-        record_redis_operation_time("get", elapsed)
 
         if content is None:
             record_cache_operation("exec_file", hit=False)
@@ -336,7 +369,7 @@ async def get_exec_meta(temp_id: str) -> Optional[dict]:
         if data is None:
             return None
 
-        return json.loads(data.decode("utf-8"))
+        return decode(data)
 
     except Exception as e:  # pylint: disable=broad-exception-caught
         logger.error(
@@ -370,9 +403,9 @@ async def delete_exec_file(temp_id: str) -> bool:
         thread_id = None
         if meta_data:
             try:
-                metadata = json.loads(meta_data.decode("utf-8"))
+                metadata = decode(meta_data)
                 thread_id = metadata.get("thread_id")
-            except (json.JSONDecodeError, AttributeError):
+            except (ValueError, AttributeError):
                 pass
 
         # Delete file and metadata
@@ -459,7 +492,7 @@ async def get_pending_files_for_thread(thread_id: int) -> List[dict]:
                 continue
 
             try:
-                metadata = json.loads(data.decode("utf-8"))
+                metadata = decode(data)
                 pending_files.append(metadata)
             except Exception as e:  # pylint: disable=broad-exception-caught
                 logger.debug("exec_cache.get_pending_files.parse_error",
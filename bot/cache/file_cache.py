@@ -4,19 +4,26 @@ This module provides caching for file content downloaded from Telegram.
 Files are cached by their telegram_file_id for fast retrieval during
 tool execution (transcribe_audio, execute_python file inputs).
 
+Content lives in the local blob store (cache/blob_store.py); Redis holds
+only the sha256 pointer under file_bytes_key. Values written before the
+blob store (raw bytes) are still returned as-is until they expire.
+
 Constraints:
-- MAX_FILE_SIZE: 20MB (Redis not designed for large blobs)
-- TTL: 3600 seconds (1 hour)
+- MAX_FILE_SIZE: 20MB
+- TTL: 3600 seconds (1 hour, applies to the pointer)
 
 NO __init__.py - use direct import:
     from cache.file_cache import (
-        get_cached_file, cache_file, invalidate_file
+        get_cached_file, get_cached_file_view, cache_file, cache_file_blob,
+        invalidate_file
     )
 """
 
 import time
 from typing import Optional
 
+from cache.blob_store import get_blob_store
+from cache.blob_store import resolve_blob
 from cache.client import get_redis
 from cache.keys import file_bytes_key
 from cache.keys import FILE_BYTES_MAX_SIZE
@@ -37,6 +44,28 @@ async def get_cached_file(telegram_file_id: str) -> Optional[bytes]:
     Returns:
         File content as bytes if cached, None otherwise.
     """
+    return await _get_cached(telegram_file_id, as_view=False)
+
+
+async def get_cached_file_view(
+        telegram_file_id: str) -> Optional[bytes | memoryview]:
+    """Get cached file content without copying it into memory.
+
+    For uploads and other consumers that accept a buffer. The view is
+    backed by a read-only mmap of the blob file.
+
+    Args:
+        telegram_file_id: Telegram file ID.
+
+    Returns:
+        memoryview (or bytes for legacy values) if cached, None otherwise.
+    """
+    return await _get_cached(telegram_file_id, as_view=True)
+
+
+async def _get_cached(telegram_file_id: str,
+                      as_view: bool) -> Optional[bytes | memoryview]:
+    """Get cached file content, resolving the blob pointer."""
     start_time = time.time()
     redis = await get_redis()
 
@@ -47,8 +76,11 @@ async def get_cached_file(telegram_file_id: str) -> Optional[bytes]:
         key = file_bytes_key(telegram_file_id)
         data = await redis.get(key)
 
+        record_redis_operation_time("get", time.time() - start_time)
+
+        if data is not None:
+            data = await resolve_blob(data, as_view=as_view)
         elapsed = time.time() - start_time
-        record_redis_operation_time("get", elapsed)
 
         if data is None:
             record_cache_operation("file", hit=False)
@@ -110,8 +142,9 @@ async def cache_file(
         return False
 
     try:
+        digest = await get_blob_store().put(content)
         key = file_bytes_key(telegram_file_id)
-        await redis.setex(key, FILE_BYTES_TTL, content)
+        await redis.setex(key, FILE_BYTES_TTL, digest)
 
         elapsed = time.time() - start_time
         record_redis_operation_time("set", elapsed)
@@ -137,9 +170,76 @@ async def cache_file(
         return False
 
 
+async def cache_file_blob(
+    telegram_file_id: str,
+    digest: str,
+    size_bytes: int,
+    filename: Optional[str] = None,
+) -> bool:
+    """Point the file cache at a blob that is already in the blob store.
+
+    Used by streaming transfers that write the blob chunk by chunk
+    (BlobStore.open_writer) instead of passing the whole content.
+
+    Args:
+        telegram_file_id: Telegram file ID.
+        digest: Blob digest returned by BlobWriter.commit().
+        size_bytes: Content size (for the size limit and logging).
+        filename: Optional filename for logging.
+
+    Returns:
+        True if cached successfully, False otherwise.
+    """
+    if size_bytes > FILE_BYTES_MAX_SIZE:
+        logger.debug(
+            "file_cache.skip_too_large",
+            file_id=telegram_file_id[:20] + "...",
+            filename=filename,
+            size_bytes=size_bytes,
+            max_size=FILE_BYTES_MAX_SIZE,
+        )
+        return False
+
+    start_time = time.time()
+    redis = await get_redis()
+
+    if redis is None:
+        return False
+
+    try:
+        await redis.setex(file_bytes_key(telegram_file_id), FILE_BYTES_TTL,
+                          digest)
+
+        elapsed = time.time() - start_time
+        record_redis_operation_time("set", elapsed)
+
+        logger.debug(
+            "file_cache.set",
+            file_id=telegram_file_id[:20] + "...",
+            filename=filename,
+            size_bytes=size_bytes,
+            ttl=FILE_BYTES_TTL,
+            elapsed_ms=elapsed * 1000,
+        )
+
+        return True
+
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.info(
+            "file_cache.set_error",
+            file_id=telegram_file_id[:20] + "...",
+            filename=filename,
+            error=str(e),
+        )
+        return False
+
+
 async def invalidate_file(telegram_file_id: str) -> bool:
     """Invalidate cached file.
 
+    Removes the pointer only; the blob is shared by content and is
+    evicted from the blob store by LRU.
+
     Args:
         telegram_file_id: Telegram file ID.
 
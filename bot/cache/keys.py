@@ -6,10 +6,16 @@ and monitoring.
 
 Key schema:
     cache:user:{user_id}           -> User data (balance, model_id)
+    cache:user:{user_id}:reservations -> Reservation ID -> "amount|expires_at"
     cache:thread:{chat_id}:{user_id}:{thread_id} -> Thread
-    cache:messages:{thread_id}     -> Message history
+    cache:messages:{thread_id}     -> Message history (compact entries)
     cache:files:{thread_id}        -> Available files list
     file:bytes:{telegram_file_id}  -> Binary file content
+    broadcast:active               -> IDs of unfinished broadcasts (set)
+    broadcast:{id}:meta            -> Broadcast source, targets, checkpoint
+    broadcast:{id}:delivered       -> Delivered user IDs (set)
+    broadcast:{id}:failed          -> Failed user ID -> reason (hash)
+    image:variant:{hash}:{op}      -> Processed image variant
 
 NO __init__.py - use direct import:
     from cache.keys import user_key, thread_key, messages_key
@@ -30,6 +36,18 @@ def user_key(user_id: int) -> str:
     return f"cache:user:{user_id}"
 
 
+def user_reservations_key(user_id: int) -> str:
+    """Generate key for a user's in-flight balance reservations.
+
+    Args:
+        user_id: Telegram user ID.
+
+    Returns:
+        Redis key string (e.g., "cache:user:123456:reservations").
+    """
+    return f"cache:user:{user_id}:reservations"
+
+
 def thread_key(
     chat_id: int,
     user_id: int,
@@ -88,17 +106,25 @@ def file_bytes_key(telegram_file_id: str) -> str:
 # TTL constants (in seconds)
 # All TTLs set to 1 hour for optimal cache hit rate
 # Cache is properly invalidated/updated on data changes:
-# - User: balance updated via update_cached_balance() after charge
+# - User: balance adjusted via adjust_cached_balance() after charge
 # - Messages: invalidated via invalidate_messages() on new message
 # - Thread: rarely changes, 1 hour is safe
 # - Files: invalidated when new files uploaded
 USER_TTL = 3600  # 1 hour (balance updated, not invalidated)
+# Reservations are settled or released when a generation ends; the TTL only
+# bounds leaks from crashed workers (longer than CONCURRENCY_QUEUE_TIMEOUT
+# plus a long tool loop)
+RESERVATION_TTL = 1800  # 30 minutes
 THREAD_TTL = 3600  # 1 hour (metadata rarely changes)
 MESSAGES_TTL = 3600  # 1 hour (invalidated on new message)
 FILES_TTL = 3600  # 1 hour (invalidated on new file)
 FILE_BYTES_TTL = 3600  # 1 hour (file content immutable)
 FILE_BYTES_MAX_SIZE = 20 * 1024 * 1024  # 20 MB
 
+# Processed image variants (downscaled / converted images)
+IMAGE_VARIANT_TTL = 3600  # 1 hour (derived from immutable content)
+IMAGE_VARIANT_MAX_SIZE = 10 * 1024 * 1024  # 10 MB
+
 # Execution output cache (Phase 3.2+)
 EXEC_FILE_TTL = 3600  # 1 hour (consumed once, then deleted)
 EXEC_FILE_MAX_SIZE = 100 * 1024 * 1024  # 100 MB
@@ -112,6 +138,19 @@ EXEC_FILE_MAX_SIZE = 100 * 1024 * 1024  # 100 MB
 SANDBOX_TTL = 3600  # 1 hour (same as exec files)
 
 
+def image_variant_key(content_hash: str, operation: str) -> str:
+    """Generate key for processed image variant.
+
+    Args:
+        content_hash: Hash of the source image bytes.
+        operation: Operation identifier (e.g., "downscale:2000:85:image/png").
+
+    Returns:
+        Redis key string (e.g., "image:variant:ab12...:jpeg:95").
+    """
+    return f"image:variant:{content_hash}:{operation}"
+
+
 def exec_file_key(temp_id: str) -> str:
     """Generate key for execution output file content.
 
@@ -151,6 +190,48 @@ def exec_thread_index_key(thread_id: int) -> str:
     return f"exec:thread:{thread_id}"
 
 
+# Finished broadcast state is kept for inspection, then expires
+BROADCAST_TTL = 7 * 86400  # 7 days
+
+BROADCAST_ACTIVE_KEY = "broadcast:active"
+
+
+def broadcast_meta_key(broadcast_id: str) -> str:
+    """Generate key for broadcast metadata and checkpoint.
+
+    Args:
+        broadcast_id: Broadcast ID.
+
+    Returns:
+        Redis key string (e.g., "broadcast:1a2b3c:meta").
+    """
+    return f"broadcast:{broadcast_id}:meta"
+
+
+def broadcast_delivered_key(broadcast_id: str) -> str:
+    """Generate key for the set of user IDs a broadcast reached.
+
+    Args:
+        broadcast_id: Broadcast ID.
+
+    Returns:
+        Redis key string (e.g., "broadcast:1a2b3c:delivered").
+    """
+    return f"broadcast:{broadcast_id}:delivered"
+
+
+def broadcast_failed_key(broadcast_id: str) -> str:
+    """Generate key for the hash of failed user IDs and reasons.
+
+    Args:
+        broadcast_id: Broadcast ID.
+
+    Returns:
+        Redis key string (e.g., "broadcast:1a2b3c:failed").
+    """
+    return f"broadcast:{broadcast_id}:failed"
+
+
 def sandbox_key(thread_id: int) -> str:
     """Generate key for E2B sandbox cache.
 
@@ -18,11 +18,12 @@ NO __init__.py - use direct import:
     )
 """
 
-import json
 import time
 from typing import Optional, TypedDict
 
 from cache.client import get_redis
+from cache.codec import decode
+from cache.codec import encode
 from cache.keys import sandbox_key
 from cache.keys import SANDBOX_TTL
 from utils.structured_logging import get_logger
@@ -59,7 +60,7 @@ async def get_cached_sandbox(thread_id: int) -> Optional[str]:
             logger.debug("sandbox_cache.miss", thread_id=thread_id)
             return None
 
-        meta: SandboxMeta = json.loads(data)
+        meta: SandboxMeta = decode(data)
         sandbox_id = meta.get("sandbox_id")
 
         logger.info(
@@ -103,7 +104,7 @@ async def cache_sandbox(thread_id: int, sandbox_id: str) -> bool:
     }
 
     try:
-        await redis.setex(key, SANDBOX_TTL, json.dumps(meta))
+        await redis.setex(key, SANDBOX_TTL, encode(meta))
         logger.info(
             "sandbox_cache.stored",
             thread_id=thread_id,
@@ -144,10 +145,10 @@ async def refresh_sandbox_ttl(thread_id: int) -> bool:
         if not data:
             return False
 
-        meta: SandboxMeta = json.loads(data)
+        meta: SandboxMeta = decode(data)
         meta["last_used"] = time.time()
 
-        await redis.setex(key, SANDBOX_TTL, json.dumps(meta))
+        await redis.setex(key, SANDBOX_TTL, encode(meta))
         logger.debug(
             "sandbox_cache.ttl_refreshed",
             thread_id=thread_id,
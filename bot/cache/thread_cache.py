@@ -3,13 +3,15 @@
 This module provides caching for thread and message data that is frequently
 accessed during Claude requests:
 - Active thread lookup (by chat_id, user_id, thread_id)
-- Message history (for LLM context)
+- Message history (for LLM context, compact entries)
+- Thinking blocks of history messages (separate hash, fetched lazily)
 
 Uses cache-aside pattern with TTL-based expiration.
 
 TTLs (all 1 hour for optimal cache hit rate):
 - Thread: 3600 seconds (rarely changes)
 - Messages: 3600 seconds (appended in-place, invalidated on full rebuild)
+- Thinking: 3600 seconds (keyed by message_id, never stale)
 
 Message updates use atomic Lua script to prevent race conditions
 when multiple processes append messages concurrently.
@@ -18,15 +20,18 @@ NO __init__.py - use direct import:
     from cache.thread_cache import (
         get_cached_thread, cache_thread, invalidate_thread,
         get_cached_messages, cache_messages, invalidate_messages,
-        append_message_atomic
+        append_message_atomic, append_messages_atomic
     )
 """
 
-import json
 import time
 from typing import Any, Optional
 
 from cache.client import get_redis
+from cache.codec import decode
+from cache.codec import dumps
+from cache.codec import encode
+from cache.codec import LUA_UNWRAP
 from cache.keys import files_key
 from cache.keys import FILES_TTL
 from cache.keys import messages_key
@@ -80,7 +85,7 @@ async def get_cached_thread(
             return None
 
         record_cache_operation("thread", hit=True)
-        cached = json.loads(data.decode("utf-8"))
+        cached = decode(data)
 
         logger.debug(
             "thread_cache.hit",
@@ -141,7 +146,7 @@ async def cache_thread(
             "cached_at": time.time(),
         }
 
-        await redis.setex(key, THREAD_TTL, json.dumps(data))
+        await redis.setex(key, THREAD_TTL, encode(data))
 
         elapsed = time.time() - start_time
         record_redis_operation_time("set", elapsed)
@@ -219,7 +224,7 @@ async def invalidate_thread(
 
 # Lua script for atomic message append
 # Prevents race conditions when multiple processes append messages concurrently
-# Uses cjson for JSON parsing (built into Redis)
+# Uses cjson for JSON parsing (built into Redis); keeps the codec envelope
 APPEND_MESSAGE_LUA = """
 local key = KEYS[1]
 local new_message_json = ARGV[1]
@@ -231,6 +236,7 @@ local data = redis.call('GET', key)
 if not data then
     return 0  -- Cache miss, caller should rebuild cache
 end
+""" + LUA_UNWRAP + """
 
 -- Parse existing cache
 local cached = cjson.decode(data)
@@ -245,10 +251,37 @@ cached.messages = messages
 cached.cached_at = tonumber(timestamp)
 
 -- Save with TTL refresh
-redis.call('SETEX', key, ttl, cjson.encode(cached))
+redis.call('SETEX', key, ttl, envelope .. cjson.encode(cached))
 return 1  -- Success
 """
 
+# Lua script: append several messages in one round trip (batch save)
+# ARGV[1] is a JSON array of messages
+APPEND_MESSAGES_LUA = """
+local key = KEYS[1]
+local ttl = tonumber(ARGV[2])
+local timestamp = ARGV[3]
+
+local data = redis.call('GET', key)
+if not data then
+    return 0  -- Cache miss, caller should rebuild cache
+end
+""" + LUA_UNWRAP + """
+
+local cached = cjson.decode(data)
+local messages = cached.messages or {}
+
+for _, new_message in ipairs(cjson.decode(ARGV[1])) do
+    table.insert(messages, new_message)
+end
+
+cached.messages = messages
+cached.cached_at = tonumber(timestamp)
+
+redis.call('SETEX', key, ttl, envelope .. cjson.encode(cached))
+return 1
+"""
+
 
 async def get_cached_messages(internal_thread_id: int) -> Optional[list[dict]]:
     """Get cached message history for a thread.
@@ -281,7 +314,7 @@ async def get_cached_messages(internal_thread_id: int) -> Optional[list[dict]]:
             return None
 
         record_cache_operation("messages", hit=True)
-        cached = json.loads(data.decode("utf-8"))
+        cached = decode(data)
         messages = cached.get("messages", [])
 
         logger.debug(
@@ -328,7 +361,7 @@ async def cache_messages(
             "cached_at": time.time(),
         }
 
-        await redis.setex(key, MESSAGES_TTL, json.dumps(data))
+        await redis.setex(key, MESSAGES_TTL, encode(data))
 
         elapsed = time.time() - start_time
         record_redis_operation_time("set", elapsed)
@@ -423,7 +456,7 @@ async def append_message_atomic(
             APPEND_MESSAGE_LUA,
             1,  # number of keys
             key,  # KEYS[1]
-            json.dumps(new_message),  # ARGV[1] - new message as JSON
+            dumps(new_message),  # ARGV[1] - new message as JSON
             str(MESSAGES_TTL),  # ARGV[2] - TTL
             str(time.time()),  # ARGV[3] - timestamp
         )
@@ -457,6 +490,70 @@ async def append_message_atomic(
         return False
 
 
+async def append_messages_atomic(
+    internal_thread_id: int,
+    new_messages: list[dict[str, Any]],
+) -> bool:
+    """Atomically append several messages to cached history.
+
+    Single EVAL for the whole batch (e.g. a media group album) instead
+    of one append_message_atomic() round trip per message.
+
+    Args:
+        internal_thread_id: Internal thread ID (from database).
+        new_messages: Message dicts to append, in order.
+
+    Returns:
+        True if appended successfully, False if cache miss or error.
+    """
+    if not new_messages:
+        return True
+
+    start_time = time.time()
+    redis = await get_redis()
+
+    if redis is None:
+        return False
+
+    try:
+        result = await redis.eval(
+            APPEND_MESSAGES_LUA,
+            1,
+            messages_key(internal_thread_id),
+            dumps(new_messages),
+            str(MESSAGES_TTL),
+            str(time.time()),
+        )
+
+        elapsed = time.time() - start_time
+        record_redis_operation_time("atomic_append_many", elapsed)
+
+        if result == 0:
+            logger.debug(
+                "messages_cache.atomic_append_miss",
+                thread_id=internal_thread_id,
+                count=len(new_messages),
+            )
+            return False
+
+        logger.debug(
+            "messages_cache.atomic_append_success",
+            thread_id=internal_thread_id,
+            count=len(new_messages),
+            elapsed_ms=round(elapsed * 1000, 2),
+        )
+        return True
+
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.info(
+            "messages_cache.atomic_append_error",
+            thread_id=internal_thread_id,
+            error=str(e),
+            error_type=type(e).__name__,
+        )
+        return False
+
+
 # Backward compatibility alias
 async def update_cached_messages(
     internal_thread_id: int,
@@ -511,7 +608,7 @@ async def get_cached_files(internal_thread_id: int) -> Optional[list[dict]]:
             return None
 
         record_cache_operation("files", hit=True)
-        cached = json.loads(data.decode("utf-8"))
+        cached = decode(data)
         files = cached.get("files", [])
 
         logger.debug(
@@ -558,7 +655,7 @@ async def cache_files(
             "cached_at": time.time(),
         }
 
-        await redis.setex(key, FILES_TTL, json.dumps(data))
+        await redis.setex(key, FILES_TTL, encode(data))
 
         elapsed = time.time() - start_time
         record_redis_operation_time("set", elapsed)
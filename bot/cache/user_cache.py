@@ -3,6 +3,7 @@
 This module provides caching for user data that is frequently accessed:
 - Balance (for balance_middleware checks)
 - Model ID (for model selection)
+- Balance reservations held by in-flight generations
 
 Uses cache-aside pattern:
 1. Check cache first
@@ -11,17 +12,28 @@ Uses cache-aside pattern:
 
 TTL: 3600 seconds (1 hour). Balance updated atomically via Lua script.
 
+While a user is cached, the cached balance is authoritative for charges
+made through reservations: reserve_balance() holds an estimate,
+settle_reservation() deducts the actual cost in Redis and the caller
+queues the Postgres write (write-behind BALANCE_CHARGE). Reloading a
+cached user from Postgres (cache_user) therefore keeps the cached balance.
+
 NO __init__.py - use direct import:
     from cache.user_cache import get_cached_user, cache_user, invalidate_user
 """
 
 from decimal import Decimal
-import json
 import time
 from typing import Optional, TypedDict
 
 from cache.client import get_redis
+from cache.codec import decode
+from cache.codec import dumps
+from cache.codec import encode
+from cache.codec import LUA_UNWRAP
+from cache.keys import RESERVATION_TTL
 from cache.keys import user_key
+from cache.keys import user_reservations_key
 from cache.keys import USER_TTL
 from utils.metrics import record_cache_operation
 from utils.metrics import record_redis_operation_time
@@ -73,7 +85,7 @@ async def get_cached_user(user_id: int) -> Optional[CachedUserData]:
             return None
 
         record_cache_operation("user", hit=True)
-        cached = json.loads(data.decode("utf-8"))
+        cached = decode(data)
 
         logger.debug(
             "user_cache.hit",
@@ -91,6 +103,33 @@ async def get_cached_user(user_id: int) -> Optional[CachedUserData]:
         return None
 
 
+# Lua script for caching user data loaded from Postgres.
+# Writes the entry as-is when the user is not cached. Otherwise refreshes
+# every field but the balance: the cached balance may include charges
+# settled in Redis whose write-behind hasn't reached Postgres yet, and the
+# Postgres balance would undo them.
+# ARGV[1] is the encoded entry, ARGV[3] the same entry as plain JSON.
+# Returns {1, kept_balance} when an entry was refreshed, {0, ''} otherwise.
+_CACHE_USER_LUA = """
+local key = KEYS[1]
+local ttl = tonumber(ARGV[2])
+
+local data = redis.call('GET', key)
+if not data then
+    redis.call('SETEX', key, ttl, ARGV[1])
+    return {0, ''}
+end
+""" + LUA_UNWRAP + """
+
+local cached = cjson.decode(data)
+local fresh = cjson.decode(ARGV[3])
+fresh['balance'] = cached['balance']
+
+redis.call('SETEX', key, ttl, envelope .. cjson.encode(fresh))
+return {1, cached['balance']}
+"""
+
+
 async def cache_user(
     user_id: int,
     balance: Decimal,
@@ -102,6 +141,10 @@ async def cache_user(
 ) -> bool:
     """Cache user data.
 
+    If the user is already cached, the cached balance is kept and only the
+    other fields are refreshed: balance changes reach the cache as deltas
+    (adjust_cached_balance, settle_reservation), never as a Postgres value.
+
     Args:
         user_id: Telegram user ID.
         balance: User balance in USD.
@@ -133,7 +176,14 @@ async def cache_user(
             "cached_at": time.time(),
         }
 
-        await redis.setex(key, USER_TTL, json.dumps(data))
+        result = await redis.eval(
+            _CACHE_USER_LUA,
+            1,  # number of keys
+            key,  # KEYS[1]
+            encode(data),  # ARGV[1]
+            str(USER_TTL),  # ARGV[2]
+            dumps(data),  # ARGV[3]
+        )
 
         elapsed = time.time() - start_time
         record_redis_operation_time("set", elapsed)
@@ -141,7 +191,8 @@ async def cache_user(
         logger.debug(
             "user_cache.set",
             user_id=user_id,
-            balance=str(balance),
+            balance=(_lua_str(result[1]) if int(result[0]) else str(balance)),
+            balance_kept=bool(int(result[0])),
             model_id=model_id,
             ttl=USER_TTL,
             elapsed_ms=elapsed * 1000,
@@ -209,47 +260,54 @@ def get_balance_from_cached(cached: CachedUserData) -> Decimal:
     return Decimal(cached["balance"])
 
 
-# Lua script for atomic balance update.
-# Prevents race conditions when concurrent charges update balance simultaneously.
-# Uses cjson for JSON parsing (built into Redis).
-_UPDATE_BALANCE_LUA = """
+def _lua_str(value) -> str:
+    """Decode a Lua string reply (bytes with decode_responses=False)."""
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+
+# Lua script for atomic balance adjustment.
+# Applies a relative change (GET + modify + SETEX in one step), so charges
+# settled in Redis whose write-behind hasn't reached Postgres yet are kept:
+# writing the Postgres balance back would undo them.
+# Uses cjson for JSON parsing (built into Redis); keeps the codec envelope.
+# Returns {1, old_balance, new_balance}, or {0, '', ''} if not cached.
+_ADJUST_BALANCE_LUA = """
 local key = KEYS[1]
-local new_balance = ARGV[1]
+local delta = tonumber(ARGV[1])
 local ttl = tonumber(ARGV[2])
 local timestamp = ARGV[3]
 
 local data = redis.call('GET', key)
 if not data then
-    return {0, ''}
+    return {0, '', ''}
 end
+""" + LUA_UNWRAP + """
 
 local cached = cjson.decode(data)
-local old_balance = cached['balance'] or ''
+local old_balance = cached['balance']
+local new_balance = string.format('%.4f', tonumber(old_balance) + delta)
 cached['balance'] = new_balance
 cached['cached_at'] = tonumber(timestamp)
 
-redis.call('SETEX', key, ttl, cjson.encode(cached))
-return {1, old_balance}
+redis.call('SETEX', key, ttl, envelope .. cjson.encode(cached))
+return {1, old_balance, new_balance}
 """
 
 
-async def update_cached_balance(user_id: int, new_balance: Decimal) -> bool:
-    """Atomically update only the balance in cached user data.
+async def adjust_cached_balance(user_id: int, delta: Decimal) -> bool:
+    """Atomically add delta to the balance in cached user data.
 
-    Uses a Lua script to perform GET + modify + SET in a single atomic
-    Redis operation, preventing race conditions when concurrent charges
-    update the same user's balance simultaneously.
+    Use after a balance change committed to Postgres (charge, top-up,
+    payment, refund) instead of invalidate_user(): keeps the cache warm
+    and preserves other cached fields.
 
-    This is more efficient than invalidate + re-cache because:
-    1. Single atomic Redis operation (no race window)
-    2. Preserves other cached data (model_id, etc.)
-    3. Avoids cache miss on next request
-
-    Use this after charge_user() instead of invalidate_user().
+    The change is applied relative to the cached balance, never as the
+    Postgres value: while reservations are settled in Redis, the cached
+    balance may include charges not yet written to Postgres.
 
     Args:
         user_id: Telegram user ID.
-        new_balance: New balance value.
+        delta: Balance change (negative for charges).
 
     Returns:
         True if updated successfully, False if not cached or error.
@@ -262,26 +320,19 @@ async def update_cached_balance(user_id: int, new_balance: Decimal) -> bool:
         return False
 
     try:
-        key = user_key(user_id)
-
-        # Execute Lua script atomically
         result = await redis.eval(
-            _UPDATE_BALANCE_LUA,
+            _ADJUST_BALANCE_LUA,
             1,  # number of keys
-            key,  # KEYS[1]
-            str(new_balance),  # ARGV[1]
+            user_key(user_id),  # KEYS[1]
+            str(delta),  # ARGV[1]
             str(USER_TTL),  # ARGV[2]
             str(time.time()),  # ARGV[3]
         )
 
-        success = int(result[0])
-        old_balance = result[1].decode("utf-8") if isinstance(
-            result[1], bytes) else str(result[1])
-
         elapsed = time.time() - start_time
         record_redis_operation_time("update", elapsed)
 
-        if not success:
+        if not int(result[0]):
             logger.debug("user_cache.update_skipped_not_cached",
                          user_id=user_id)
             return False
@@ -289,8 +340,9 @@ async def update_cached_balance(user_id: int, new_balance: Decimal) -> bool:
         logger.debug(
             "user_cache.balance_updated",
             user_id=user_id,
-            old_balance=old_balance,
-            new_balance=str(new_balance),
+            delta=str(delta),
+            old_balance=_lua_str(result[1]),
+            new_balance=_lua_str(result[2]),
             elapsed_ms=elapsed * 1000,
         )
 
@@ -303,3 +355,242 @@ async def update_cached_balance(user_id: int, new_balance: Decimal) -> bool:
             error=str(e),
         )
         return False
+
+
+# Lua script for atomic balance reservation.
+# Sums the user's unexpired reservations (dropping expired ones) and holds
+# `amount` only if the balance minus everything already reserved is still
+# above the minimum - the soft check applied across concurrent generations.
+# Returns {1, available_after} when held, {0, available} when refused,
+# {-1, ''} when the user is not cached.
+_RESERVE_BALANCE_LUA = """
+local key = KEYS[1]
+local reservations_key = KEYS[2]
+local reservation_id = ARGV[1]
+local amount = tonumber(ARGV[2])
+local min_balance = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+local ttl = tonumber(ARGV[5])
+
+local data = redis.call('GET', key)
+if not data then
+    return {-1, ''}
+end
+""" + LUA_UNWRAP + """
+
+local cached = cjson.decode(data)
+local reserved = 0
+local entries = redis.call('HGETALL', reservations_key)
+for i = 1, #entries, 2 do
+    local value = entries[i + 1]
+    local sep = string.find(value, '|', 1, true)
+    local expires_at = tonumber(string.sub(value, sep + 1))
+    if expires_at <= now then
+        redis.call('HDEL', reservations_key, entries[i])
+    elseif entries[i] ~= reservation_id then
+        reserved = reserved + tonumber(string.sub(value, 1, sep - 1))
+    end
+end
+
+local available = tonumber(cached['balance']) - reserved
+if available <= min_balance then
+    return {0, string.format('%.4f', available)}
+end
+
+redis.call('HSET', reservations_key, reservation_id,
+           ARGV[2] .. '|' .. string.format('%.3f', now + ttl))
+redis.call('EXPIRE', reservations_key, ttl)
+return {1, string.format('%.4f', available - amount)}
+"""
+
+# Lua script for settling a reservation with the actual cost.
+# Drops the reservation and deducts `amount` from the cached balance in one
+# step (same GET + modify + SETEX as _ADJUST_BALANCE_LUA).
+# Returns {1, old_balance, new_balance}, or {0, '', ''} if not cached.
+_SETTLE_BALANCE_LUA = """
+local key = KEYS[1]
+local reservations_key = KEYS[2]
+local amount = tonumber(ARGV[2])
+local ttl = tonumber(ARGV[3])
+local timestamp = ARGV[4]
+
+redis.call('HDEL', reservations_key, ARGV[1])
+
+local data = redis.call('GET', key)
+if not data then
+    return {0, '', ''}
+end
+""" + LUA_UNWRAP + """
+
+local cached = cjson.decode(data)
+local old_balance = cached['balance']
+local new_balance = string.format('%.4f', tonumber(old_balance) - amount)
+cached['balance'] = new_balance
+cached['cached_at'] = tonumber(timestamp)
+
+redis.call('SETEX', key, ttl, envelope .. cjson.encode(cached))
+return {1, old_balance, new_balance}
+"""
+
+
+async def reserve_balance(
+    user_id: int,
+    reservation_id: str,
+    amount: Decimal,
+    min_balance: Decimal,
+) -> Optional[tuple[bool, Decimal]]:
+    """Atomically reserve part of the cached balance for a generation.
+
+    Args:
+        user_id: Telegram user ID.
+        reservation_id: Unique ID of this reservation.
+        amount: Estimated cost to hold.
+        min_balance: Reservation is refused unless balance minus other
+            reservations is above this.
+
+    Returns:
+        Tuple of (reserved, available balance after reservation), or None
+        if the user is not cached or Redis is unavailable.
+    """
+    start_time = time.time()
+    redis = await get_redis()
+
+    if redis is None:
+        logger.debug("user_cache.redis_unavailable", user_id=user_id)
+        return None
+
+    try:
+        result = await redis.eval(
+            _RESERVE_BALANCE_LUA,
+            2,  # number of keys
+            user_key(user_id),  # KEYS[1]
+            user_reservations_key(user_id),  # KEYS[2]
+            reservation_id,  # ARGV[1]
+            str(amount),  # ARGV[2]
+            str(min_balance),  # ARGV[3]
+            str(time.time()),  # ARGV[4]
+            str(RESERVATION_TTL),  # ARGV[5]
+        )
+
+        status = int(result[0])
+        elapsed = time.time() - start_time
+        record_redis_operation_time("reserve", elapsed)
+
+        if status < 0:
+            logger.debug("user_cache.reserve_skipped_not_cached",
+                         user_id=user_id)
+            return None
+
+        available = Decimal(_lua_str(result[1]))
+        logger.debug(
+            "user_cache.balance_reserved"
+            if status else "user_cache.reservation_refused",
+            user_id=user_id,
+            reservation_id=reservation_id,
+            amount=str(amount),
+            available=str(available),
+            elapsed_ms=elapsed * 1000,
+        )
+        return bool(status), available
+
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.warning(
+            "user_cache.reserve_error",
+            user_id=user_id,
+            error=str(e),
+        )
+        return None
+
+
+async def settle_reservation(
+    user_id: int,
+    reservation_id: str,
+    amount: Decimal,
+) -> Optional[tuple[Decimal, Decimal]]:
+    """Atomically drop a reservation and deduct the actual cost.
+
+    Args:
+        user_id: Telegram user ID.
+        reservation_id: Reservation to settle.
+        amount: Actual cost to deduct from the cached balance.
+
+    Returns:
+        Tuple of (balance before, balance after), or None if the user is
+        not cached or Redis is unavailable (caller charges the DB directly).
+    """
+    start_time = time.time()
+    redis = await get_redis()
+
+    if redis is None:
+        logger.debug("user_cache.redis_unavailable", user_id=user_id)
+        return None
+
+    try:
+        result = await redis.eval(
+            _SETTLE_BALANCE_LUA,
+            2,  # number of keys
+            user_key(user_id),  # KEYS[1]
+            user_reservations_key(user_id),  # KEYS[2]
+            reservation_id,  # ARGV[1]
+            str(amount),  # ARGV[2]
+            str(USER_TTL),  # ARGV[3]
+            str(time.time()),  # ARGV[4]
+        )
+
+        elapsed = time.time() - start_time
+        record_redis_operation_time("settle", elapsed)
+
+        if not int(result[0]):
+            logger.debug("user_cache.settle_skipped_not_cached",
+                         user_id=user_id)
+            return None
+
+        balance_before = Decimal(_lua_str(result[1]))
+        balance_after = Decimal(_lua_str(result[2]))
+        logger.debug(
+            "user_cache.reservation_settled",
+            user_id=user_id,
+            reservation_id=reservation_id,
+            amount=str(amount),
+            balance_before=str(balance_before),
+            balance_after=str(balance_after),
+            elapsed_ms=elapsed * 1000,
+        )
+        return balance_before, balance_after
+
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.warning(
+            "user_cache.settle_error",
+            user_id=user_id,
+            error=str(e),
+        )
+        return None
+
+
+async def release_reservation(user_id: int, reservation_id: str) -> bool:
+    """Drop a reservation without charging (cancelled or failed request).
+
+    Args:
+        user_id: Telegram user ID.
+        reservation_id: Reservation to release.
+
+    Returns:
+        True if a reservation was removed, False otherwise.
+    """
+    redis = await get_redis()
+
+    if redis is None:
+        return False
+
+    try:
+        removed = await redis.hdel(user_reservations_key(user_id),
+                                   reservation_id)
+        logger.debug("user_cache.reservation_released",
+                     user_id=user_id,
+                     reservation_id=reservation_id,
+                     removed=removed)
+        return removed > 0
+
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.info("user_cache.release_error", user_id=user_id, error=str(e))
+        return False
@@ -9,6 +9,8 @@ Write Types:
 - MESSAGE: User and assistant messages
 - USER_STATS: Token counts, message counts
 - BALANCE_OP: Balance operations (use carefully!)
+- BALANCE_CHARGE: Charges already settled in Redis (reservations); the
+  flush deducts users.balance and records the USAGE operation
 
 NO __init__.py - use direct import:
     from cache.write_behind import queue_write, WriteType
@@ -16,11 +18,12 @@ NO __init__.py - use direct import:
 
 import asyncio
 from enum import Enum
-import json
 import time
 from typing import Any, Dict, List, Optional
 
 from cache.client import get_redis, record_redis_failure
+from cache.codec import decode
+from cache.codec import encode
 from utils.metrics import record_redis_operation_time
 from utils.metrics import record_write_flush
 from utils.metrics import set_write_queue_depth
@@ -62,6 +65,7 @@ class WriteType(str, Enum):
     MESSAGE = "message"
     USER_STATS = "user_stats"
     BALANCE_OP = "balance_op"
+    BALANCE_CHARGE = "balance_charge"
     FILE = "file"
     TOOL_CALL = "tool_call"
 
@@ -94,7 +98,7 @@ async def queue_write(write_type: WriteType, data: Dict[str, Any]) -> bool:
         return False
 
     try:
-        payload = json.dumps({
+        payload = encode({
             "type": write_type.value,
             "data": data,
             "queued_at": time.time(),
@@ -173,7 +177,7 @@ async def move_to_dlq(item: Dict[str, Any]) -> bool:
         return False
 
     try:
-        await redis.rpush(WRITE_DLQ_KEY, json.dumps(item))
+        await redis.rpush(WRITE_DLQ_KEY, encode(item))
         logger.info(
             "write_behind.item_moved_to_dlq",
             write_type=item.get("type"),
@@ -243,7 +247,7 @@ async def requeue_failed_items(failed_items: List[Dict[str, Any]]) -> int:
 
         try:
             # Push to end of queue (will be processed after current items)
-            await redis.rpush(WRITE_QUEUE_KEY, json.dumps(item))
+            await redis.rpush(WRITE_QUEUE_KEY, encode(item))
             requeued += 1
 
             # Normal retry mechanism - item will be processed later
@@ -292,7 +296,7 @@ async def flush_writes_batch() -> tuple[List[Dict[str, Any]], int]:
             data = await redis.lpop(WRITE_QUEUE_KEY)
             if data is None:
                 break
-            writes.append(json.loads(data))
+            writes.append(decode(data))
 
         return writes, batch_size
 
@@ -382,6 +386,8 @@ async def _batch_insert_messages(
                     thinking_tokens,
                 "thinking_blocks":
                     data.get("thinking_blocks"),
+                "compaction_summary":
+                    data.get("compaction_summary"),
                 "cache_write_subsidized":
                     data.get("cache_write_subsidized", False),
                 "cache_write_cost_usd":
@@ -455,8 +461,11 @@ async def _batch_update_stats(
     """
     from db.repositories.user_repository import \
         UserRepository  # pylint: disable=import-outside-toplevel
+    from services.metrics_collector import \
+        get_aggregate_tracker  # pylint: disable=import-outside-toplevel
 
     user_repo = UserRepository(session)
+    tracker = get_aggregate_tracker()
     count = 0
     failed = []
 
@@ -481,9 +490,13 @@ async def _batch_update_stats(
     # Update each user
     for user_id, totals in by_user.items():
         try:
-            await user_repo.increment_stats(user_id,
-                                            messages=totals["messages"],
-                                            tokens=totals["tokens"])
+            user = await user_repo.increment_stats(user_id,
+                                                   messages=totals["messages"],
+                                                   tokens=totals["tokens"])
+            if user is not None:
+                # Absolute totals, so re-applying after a retry is harmless
+                tracker.user_stats(user_id, user.username, user.message_count,
+                                   user.total_tokens_used)
             count += 1
         except Exception as e:  # pylint: disable=broad-exception-caught
             logger.error(
@@ -497,6 +510,27 @@ async def _batch_update_stats(
     return count, failed
 
 
+def _observe_user_activity(messages: List[Dict]) -> None:
+    """Feed flushed user messages to the active users tracker.
+
+    Args:
+        messages: Message dicts from queue (committed).
+    """
+    from services.metrics_collector import \
+        get_aggregate_tracker  # pylint: disable=import-outside-toplevel
+
+    tracker = get_aggregate_tracker()
+    for msg_data in messages:
+        data = msg_data.get("data", {})
+        user_id = data.get("from_user_id")
+        if data.get("role") != "user" or user_id is None:
+            continue
+        date_value = data.get("date")
+        tracker.user_active(
+            user_id,
+            float(date_value) if isinstance(date_value, (int, float)) else None)
+
+
 async def _batch_insert_balance_ops(
     session,
     balance_ops: List[Dict],
@@ -546,6 +580,66 @@ async def _batch_insert_balance_ops(
     return count, failed
 
 
+async def _batch_apply_balance_charges(
+    session,
+    charges: List[Dict],
+) -> tuple[int, List[Dict]]:
+    """Apply charges settled in Redis to users.balance.
+
+    Each charge is a relative UPDATE (balance - amount), so the order of
+    flushes doesn't matter and concurrent direct charges (row lock in
+    BalanceService.charge_user) stay correct. The audit row uses the
+    balance returned by the UPDATE.
+
+    Args:
+        session: Database session.
+        charges: List of balance charge dicts from queue.
+
+    Returns:
+        Tuple of (success_count, failed_items).
+    """
+    from decimal import Decimal  # pylint: disable=import-outside-toplevel
+
+    from db.models.balance_operation import \
+        BalanceOperation  # pylint: disable=import-outside-toplevel
+    from db.models.balance_operation import \
+        OperationType  # pylint: disable=import-outside-toplevel
+    from db.models.user import User  # pylint: disable=import-outside-toplevel
+    from sqlalchemy import update  # pylint: disable=import-outside-toplevel
+
+    count = 0
+    failed = []
+
+    for charge_data in charges:
+        data = charge_data.get("data", {})
+        try:
+            amount = Decimal(str(data["amount"]))
+            result = await session.execute(
+                update(User).where(User.id == data["user_id"]).values(
+                    balance=User.balance - amount).returning(User.balance))
+            balance_after = result.scalar_one()
+            session.add(
+                BalanceOperation(
+                    user_id=data["user_id"],
+                    operation_type=OperationType.USAGE,
+                    amount=-amount,
+                    balance_before=balance_after + amount,
+                    balance_after=balance_after,
+                    related_message_id=data.get("related_message_id"),
+                    description=data.get("description"),
+                ))
+            count += 1
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error(
+                "write_behind.balance_charge_error",
+                user_id=data.get("user_id"),
+                error=str(e),
+            )
+            failed.append(charge_data)
+
+    return count, failed
+
+
 async def _batch_insert_tool_calls(
     session,
     tool_calls: List[Dict],
@@ -654,11 +748,16 @@ async def flush_writes(session) -> int:
     tool_calls = [
         w for w in ready_writes if w.get("type") == WriteType.TOOL_CALL.value
     ]
+    balance_charges = [
+        w for w in ready_writes
+        if w.get("type") == WriteType.BALANCE_CHARGE.value
+    ]
 
     # Process each type, collecting failed items
     msg_count = 0
     stats_count = 0
     balance_count = 0
+    charge_count = 0
     tool_count = 0
     all_failed: List[Dict] = []
 
@@ -680,9 +779,16 @@ async def flush_writes(session) -> int:
             session, tool_calls)
         all_failed.extend(tool_failed)
 
+    if balance_charges:
+        charge_count, charge_failed = await _batch_apply_balance_charges(
+            session, balance_charges)
+        all_failed.extend(charge_failed)
+
     # Try to commit
     try:
         await session.commit()
+        if msg_count:
+            _observe_user_activity(messages)
     except Exception as e:  # pylint: disable=broad-exception-caught
         logger.error(
             "write_behind.commit_failed",
@@ -714,12 +820,15 @@ async def flush_writes(session) -> int:
         record_write_flush(flush_duration, "balance_op", balance_count)
     if tool_count > 0:
         record_write_flush(flush_duration, "tool_call", tool_count)
+    if charge_count > 0:
+        record_write_flush(flush_duration, "balance_charge", charge_count)
 
     # Update queue depth after flush
     queue_depth = await get_queue_depth()
     set_write_queue_depth(queue_depth)
 
-    total = msg_count + stats_count + balance_count + tool_count
+    total = (msg_count + stats_count + balance_count + tool_count +
+             charge_count)
 
     logger.info(
         "write_behind.flushed",
@@ -728,6 +837,7 @@ async def flush_writes(session) -> int:
         stats=stats_count,
         balance_ops=balance_count,
         tool_calls=tool_count,
+        balance_charges=charge_count,
         queue_items=len(ready_writes),
         batch_size=batch_size,
         failed_items=len(all_failed),
@@ -762,7 +872,7 @@ async def _auto_replay_dlq(log) -> None:
             if raw is None:
                 break
 
-            item = json.loads(raw)
+            item = decode(raw)
             queued_at = item.get("queued_at", now)
             age = now - queued_at
 
@@ -778,7 +888,7 @@ async def _auto_replay_dlq(log) -> None:
             # Reset retry count and re-queue
             item.pop("retry_count", None)
             item.pop("retry_after", None)
-            await redis.rpush(WRITE_QUEUE_KEY, json.dumps(item))
+            await redis.rpush(WRITE_QUEUE_KEY, encode(item))
             replayed += 1
 
         if replayed or discarded:
@@ -52,13 +52,51 @@ MAX_QUERY_LIMIT = 1000  # Hard cap for get_all() queries to prevent memory issue
 # Streaming settings
 # With sendMessageDraft (Bot API 9.3), no flood control - update immediately
 DRAFT_KEEPALIVE_INTERVAL = 5.0  # Keep draft visible during long operations (seconds)
+
+# Adaptive draft cadence (telegram/streaming/cadence.py)
+# Update interval slides from MIN (slow streams: show each chunk promptly)
+# to FAST (streams at DRAFT_FAST_CHARS_PER_SECOND or more: Telegram animates
+# each draft change, so fewer, larger updates look just as smooth)
+DRAFT_MIN_UPDATE_INTERVAL = 0.5  # Floor for the update interval (seconds)
+DRAFT_FAST_UPDATE_INTERVAL = 2.0  # Interval for fast streams (seconds)
+DRAFT_MAX_UPDATE_INTERVAL = 4.0  # Ceiling, incl. flood/budget back-off (seconds)
+DRAFT_FAST_CHARS_PER_SECOND = 300.0  # Token arrival rate considered fast
+DRAFT_LATENCY_FACTOR = 2.0  # Interval >= factor x sendMessageDraft latency
+DRAFT_GLOBAL_UPDATES_PER_SECOND = 20.0  # Draft budget shared by all chats
 TOOL_LOOP_MAX_ITERATIONS = 100  # Max tool calls per request
 TOOL_COST_PRECHECK_ENABLED = True  # Pre-check balance before paid tools
+# Start tool work as soon as a tool's input has streamed: prepare hooks
+# (file prefetch, sandbox lease) and read-only tools run while the model
+# finishes its turn (telegram/streaming/tool_executor.py)
+TOOL_SPECULATION_ENABLED = True
 
 # Concurrency limits (per user)
 MAX_CONCURRENT_GENERATIONS_PER_USER = 5  # Max parallel Claude API calls per user
 CONCURRENCY_QUEUE_TIMEOUT = 300.0  # Max seconds to wait in queue (5 minutes)
 
+# Tool bulkheads (core/tools/bulkhead.py)
+# Per-tool limits live on ToolConfig (max_concurrent, max_concurrent_per_user,
+# max_queue); a tool call waiting longer than this fails with a tool error
+TOOL_QUEUE_TIMEOUT = 60.0
+
+# Balance reservations (services/balance_policy.py)
+# Each generation holds its estimated cost (context tokens at input price +
+# this many output tokens) until it is charged or released
+BALANCE_RESERVATION_OUTPUT_TOKENS = 4096
+
+# /announce broadcasts (services/broadcast.py)
+ANNOUNCE_MESSAGES_PER_SECOND = 25.0  # Below Telegram's ~30 msg/s bot limit
+ANNOUNCE_MIN_MESSAGES_PER_SECOND = 1.0  # Floor after flood-control back-off
+ANNOUNCE_MAX_CONCURRENCY = 10  # Sends in flight at once (all broadcasts)
+ANNOUNCE_PAGE_SIZE = 200  # Targets per page; checkpoint advances per page
+ANNOUNCE_PROGRESS_INTERVAL = 3.0  # Seconds between progress message edits
+ANNOUNCE_MAX_RETRIES = 3  # Attempts per target on TelegramRetryAfter
+
+# Speculative pipeline start (handler)
+# Routing starts alongside normalization when text is known upfront;
+# user and likely-thread caches are warmed while routing decides
+SPECULATIVE_PREFETCH_ENABLED = True
+
 # Topic naming settings (Bot API 9.3: topics in private chats)
 # Automatically generates topic names using LLM after first bot response
 TOPIC_NAMING_ENABLED = True
@@ -75,6 +113,115 @@ TOPIC_ROUTING_MODEL = TOPIC_NAMING_MODEL  # Haiku
 TOPIC_ROUTING_MAX_TOKENS = 60  # JSON response with optional title
 TOPIC_TEMP_NAME_MAX_LENGTH = 30  # Max chars for temp name from General
 
+# Topic routing local pre-filter (TF-IDF over char trigrams, skips Haiku)
+TOPIC_PREFILTER_ENABLED = True
+TOPIC_PREFILTER_STAY_MIN_SCORE = 0.35  # Min similarity to current topic
+TOPIC_PREFILTER_RESUME_MIN_SCORE = 0.45  # Min similarity to other topic
+TOPIC_PREFILTER_MIN_MARGIN = 0.25  # Min lead over runner-up topic
+TOPIC_PREFILTER_MIN_MESSAGE_CHARS = 15  # Shorter messages go to LLM
+TOPIC_PREFILTER_VERIFY_SAMPLE_RATE = 0.05  # Local decisions checked by LLM
+TOPIC_DECISION_CACHE_TTL = 300  # Seconds to reuse a routing decision
+TOPIC_DECISION_CACHE_SIZE = 1024  # Max cached decisions
+
+# Conversation compaction (models without server-side compaction)
+# A cheap model summarizes older history into messages.compaction_summary
+COMPACTION_ENABLED = True
+COMPACTION_TRIGGER_TOKENS = int(os.getenv("COMPACTION_TRIGGER_TOKENS",
+                                          "60000"))  # Context size to compact
+COMPACTION_KEEP_RECENT_TOKENS = 15000  # Recent history kept verbatim
+COMPACTION_MIN_MESSAGES = 6  # Min older messages worth summarizing
+COMPACTION_MODEL_CLAUDE = "claude:haiku"  # Summarizer for Claude users
+COMPACTION_MODEL_GOOGLE = "google:flash-lite"  # Summarizer for Google users
+COMPACTION_MAX_TOKENS = 2048  # Summary length limit
+COMPACTION_MSG_TRUNCATE = 6000  # Max chars per message in transcript
+COMPACTION_MAX_INPUT_CHARS = 400_000  # Transcript cap (~100K tokens)
+
+# Image processing (Pillow decode/resize/encode runs in a process pool)
+IMAGE_PROCESS_WORKERS = int(os.getenv("IMAGE_PROCESS_WORKERS", "2"))
+IMAGE_VARIANT_CACHE_MAX_BYTES = 64 * 1024 * 1024  # In-process LRU budget
+
+# Local blob store for file bytes (Redis keeps only sha256 pointers)
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR", "/var/cache/bot/blobs")
+BLOB_STORE_MAX_BYTES = int(os.getenv("BLOB_STORE_MAX_BYTES",
+                                     str(2 * 1024 * 1024 * 1024)))  # LRU cap
+
+# Streaming Telegram download -> Files API upload (core/file_transfer.py)
+FILE_TRANSFER_CHUNK_SIZE = 256 * 1024  # Telegram download chunk
+FILE_TRANSFER_BUFFER_BYTES = 1024 * 1024  # Upload buffer per transfer
+FILE_TRANSFER_TIMEOUT = 120  # Seconds; download is paced by the upload
+FILE_TRANSFER_UPLOAD_THREADS = 8  # Dedicated pool for streaming uploads
+FILE_TRANSFER_MAX_INFLIGHT_BYTES = int(
+    os.getenv("FILE_TRANSFER_MAX_INFLIGHT_BYTES",
+              str(32 * 1024 * 1024)))  # Budget across all transfers
+
+# Operational metrics collector (services/metrics_collector.py)
+METRICS_COLLECT_INTERVAL = 10  # Seconds: pool, queue, Redis, aggregates
+METRICS_DISK_INTERVAL = 60  # Seconds: disk usage walk (worker thread)
+METRICS_DISK_FULL_RESCAN = 900  # Re-stat files in unchanged directories
+METRICS_RESEED_INTERVAL = 3600  # Full DB aggregate queries (drift repair)
+METRICS_TOP_USERS_TRACKED = 50  # Candidates kept for top-10 user gauges
+METRICS_DISK_VOLUMES = {
+    'postgres': '/mnt/volumes/postgres',
+    'loki': '/mnt/volumes/loki',
+    'prometheus': '/mnt/volumes/prometheus',
+    'grafana': '/mnt/volumes/grafana',
+}
+
+# On-demand profiling (utils/profiling.py, /profile admin command)
+# /debug/* endpoints on the metrics server need
+# "Authorization: Bearer <DEBUG_ENDPOINTS_TOKEN>"; empty disables them.
+DEBUG_ENDPOINTS_TOKEN = os.getenv("DEBUG_ENDPOINTS_TOKEN", "")
+PROFILER_SAMPLE_INTERVAL = 0.005  # Seconds between stack samples
+PROFILER_MAX_DURATION = 300  # Sampling stops by itself after this
+TRACEMALLOC_FRAMES = 10  # Stack depth stored per traced allocation
+
+# Event loop health (utils/loop_monitor.py)
+EVENT_LOOP_LAG_INTERVAL = 0.5  # Seconds between lag samples
+EVENT_LOOP_LAG_WARN_THRESHOLD = 0.1  # Log lag above this (seconds)
+SLOW_CALLBACK_DETECTOR = os.getenv("SLOW_CALLBACK_DETECTOR",
+                                   "true").lower() == "true"
+SLOW_CALLBACK_THRESHOLD = 0.1  # Log callbacks blocking longer (seconds)
+
+# Structured logging pipeline (utils/log_pipeline.py)
+# Background writer: records are rendered with orjson on the calling thread
+# and written to stdout by a writer thread through a bounded queue. When the
+# queue is full, records are dropped and counted instead of blocking.
+LOG_BACKGROUND_WRITER = os.getenv("LOG_BACKGROUND_WRITER",
+                                  "true").lower() == "true"
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_WRITE_BATCH = 256  # Max records per stdout write
+# Per-event sampling applies only under load (writer queue fill >= threshold).
+# Warnings and errors are never sampled or rate limited.
+LOG_SAMPLING_LOAD_THRESHOLD = 0.25
+LOG_SAMPLE_RATES: dict[str, float] = {
+    'claude.stream_events.start': 0.01,
+    'gemini.stream_events.start': 0.01,
+    'context_manager.build_context.start': 0.01,
+    'tools.execute_tool.called': 0.1,
+}
+# Per-event rate limits (records per second), applied regardless of load
+LOG_RATE_LIMITS: dict[str, float] = {
+    'write_behind.item_requeued': 10.0,
+}
+
+# Prompt cache manager (core/claude/prompt_cache.py)
+# The shared prefix (tools + global system prompt block) uses the default
+# 5-minute ephemeral TTL. While a prefix has seen real traffic recently it
+# is refreshed shortly before expiry with a 1-token request (cache read,
+# 0.1x input price) so the next user doesn't pay a full rewrite (1.25x).
+PROMPT_CACHE_REFRESH_ENABLED = os.getenv("PROMPT_CACHE_REFRESH_ENABLED",
+                                         "true").lower() == "true"
+PROMPT_CACHE_TTL = 300  # Seconds, matches ephemeral cache_control
+PROMPT_CACHE_REFRESH_MARGIN = 30  # Refresh when this close to expiry
+PROMPT_CACHE_KEEPALIVE_WINDOW = 1800  # Stop refreshing after idle this long
+PROMPT_CACHE_CHECK_INTERVAL = 10  # Seconds between refresh checks
+# Rolling message breakpoint: candidate offsets from the end of the clean
+# history (first = default), scored by net cache savings on the next turn
+PROMPT_CACHE_BREAKPOINT_OFFSETS = (2, 1)
+PROMPT_CACHE_EXPLORE_RATE = 0.05  # Turns that try a random candidate
+PROMPT_CACHE_MIN_SAMPLES = 20  # Samples per candidate before switching
+PROMPT_CACHE_MAX_THREADS = 10000  # Threads tracked for breakpoint credit
+
 # Vision model IDs for tool API calls (analyze_image, analyze_pdf, preview_file)
 VISION_MODEL_ID = "claude-opus-4-6"  # Full analysis (image, PDF)
 VISION_MODEL_ID_LITE = "claude-sonnet-4-6"  # Lighter preview analysis
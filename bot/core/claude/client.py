@@ -10,7 +10,7 @@ NO __init__.py - use direct import: from core.claude.client import ClaudeProvide
 import asyncio
 import json
 import time
-from typing import AsyncIterator, Optional
+from typing import Any, AsyncIterator, Optional, TYPE_CHECKING
 
 import anthropic
 from config import get_model
@@ -25,6 +25,9 @@ from core.models import StreamEvent
 from core.models import TokenUsage
 from utils.structured_logging import get_logger
 
+if TYPE_CHECKING:
+    from core.request_templates import RequestTemplate
+
 logger = get_logger(__name__)
 
 
@@ -55,11 +58,13 @@ def _is_retriable_server_error(e: anthropic.APIStatusError) -> bool:
     return error_type in ('overloaded_error', 'api_error')
 
 
-def _downscale_base64_image(block: dict, max_dim: int = 2000) -> dict:
+async def _downscale_base64_image(block: dict, max_dim: int = 2000) -> dict:
     """Downscale a base64 image block if it exceeds max_dim pixels.
 
     Claude API rejects images > 2000px in any dimension for multi-image
-    requests. This function resizes such images while preserving aspect ratio.
+    requests. Resizing runs in the shared image processor pool and is
+    cached by content hash, so the same history image is only processed
+    once across tool loop iterations.
 
     Args:
         block: Image content block with source.type == "base64".
@@ -74,54 +79,36 @@ def _downscale_base64_image(block: dict, max_dim: int = 2000) -> dict:
 
     try:
         import base64 as b64
-        from io import BytesIO
 
-        from PIL import Image  # pylint: disable=import-outside-toplevel
+        from core.image_processor import \
+            get_image_processor  # pylint: disable=import-outside-toplevel
 
         raw = b64.b64decode(source["data"])
-        img = Image.open(BytesIO(raw))
-        w, h = img.size
-
-        if w <= max_dim and h <= max_dim:
-            return block
-
-        # Calculate new dimensions preserving aspect ratio
-        scale = max_dim / max(w, h)
-        new_w = int(w * scale)
-        new_h = int(h * scale)
-
-        img = img.resize((new_w, new_h), Image.LANCZOS)
-
-        # Re-encode to original format
         media_type = source.get("media_type", "image/png")
-        fmt = "PNG" if "png" in media_type else "JPEG"
-        buf = BytesIO()
-        if fmt == "JPEG" and img.mode in ("RGBA", "P"):
-            img = img.convert("RGB")
-        img.save(buf, format=fmt, quality=85)
+        resized, _ = await get_image_processor().downscale(raw,
+                                                           media_type,
+                                                           max_dim=max_dim)
+        if resized is raw:
+            return block
 
         new_block = block.copy()
         new_source = source.copy()
-        new_source["data"] = b64.b64encode(buf.getvalue()).decode("utf-8")
+        new_source["data"] = b64.b64encode(resized).decode("utf-8")
         new_block["source"] = new_source
-
-        logger.debug("claude.image_downscaled",
-                     original=f"{w}x{h}",
-                     resized=f"{new_w}x{new_h}")
         return new_block
 
     except Exception:  # pylint: disable=broad-exception-caught
         return block
 
 
-def _downscale_images_in_block(block: dict) -> dict:
+async def _downscale_images_in_block(block: dict) -> dict:
     """Downscale base64 images in a content block (top-level or nested).
 
     Handles both direct image blocks and images nested inside
     tool_result content lists.
     """
     if block.get("type") == "image":
-        return _downscale_base64_image(block)
+        return await _downscale_base64_image(block)
 
     # tool_result blocks may contain nested image blocks
     if (block.get("type") == "tool_result"
@@ -130,7 +117,7 @@ def _downscale_images_in_block(block: dict) -> dict:
         changed = False
         for item in block["content"]:
             if isinstance(item, dict) and item.get("type") == "image":
-                resized = _downscale_base64_image(item)
+                resized = await _downscale_base64_image(item)
                 new_content.append(resized)
                 if resized is not item:
                     changed = True
@@ -142,6 +129,30 @@ def _downscale_images_in_block(block: dict) -> dict:
     return block
 
 
+async def _downscale_images(api_messages: list) -> list:
+    """Downscale oversized base64 images in all messages (API limit:
+    2000px per dimension for multi-image requests).
+
+    MUST be called after _filter_empty_messages() so that content blocks
+    are already serialized dicts.
+
+    Args:
+        api_messages: List of message dicts from _filter_empty_messages.
+
+    Returns:
+        The same list with oversized images replaced.
+    """
+    for msg in api_messages:
+        content = msg["content"]
+        if not isinstance(content, list):
+            continue
+        for i, block in enumerate(content):
+            if isinstance(block, dict) and block.get("type") in ("image",
+                                                                 "tool_result"):
+                content[i] = await _downscale_images_in_block(block)
+    return api_messages
+
+
 def _filter_empty_messages(messages: list) -> list:
     """Filter out messages with empty content and sanitize blocks.
 
@@ -152,8 +163,7 @@ def _filter_empty_messages(messages: list) -> list:
     output-only fields (text, citations, parsed_output) from server
     tool result blocks that the API returns but rejects on input.
 
-    Downscales base64 images exceeding 2000px to avoid API rejection
-    on multi-image requests.
+    Oversized base64 images are handled separately by _downscale_images().
 
     Args:
         messages: List of Message objects.
@@ -187,10 +197,6 @@ def _filter_empty_messages(messages: list) -> list:
                             and serialized.get("type") in ("image", "document")
                             and "source" not in serialized):
                         continue
-                    # Downscale oversized base64 images (API limit: 2000px
-                    # per dimension for multi-image requests)
-                    if isinstance(serialized, dict):
-                        serialized = _downscale_images_in_block(serialized)
                     sanitized.append(serialized)
                 else:
                     sanitized.append(block)
@@ -283,11 +289,16 @@ class ClaudeProvider(LLMProvider):
         last_usage: Token usage from last API call.
     """
 
-    def __init__(self, api_key: str):
+    def __init__(self,
+                 api_key: str = "",
+                 client: Optional[anthropic.AsyncAnthropic] = None):
         """Initialize Claude provider.
 
         Args:
             api_key: Anthropic API key.
+            client: Existing client to share (subagents reuse the main
+                provider's connection pool but keep their own
+                per-request state).
         """
         # Beta headers for advanced features
         # - interleaved-thinking: Extended Thinking (deprecated for Opus 4.6,
@@ -296,7 +307,7 @@ class ClaudeProvider(LLMProvider):
         # - compact: Server-side compaction (Opus 4.6)
         # - files-api: Files API for multimodal content
         # Note: effort, web-search, extended-cache-ttl, web tools are now GA
-        self.client = anthropic.AsyncAnthropic(
+        self.client = client or anthropic.AsyncAnthropic(
             api_key=api_key,
             default_headers={
                 "anthropic-beta": ("interleaved-thinking-2025-05-14,"
@@ -378,6 +389,7 @@ class ClaudeProvider(LLMProvider):
 
         # Convert messages to Anthropic format, filtering empty messages
         api_messages = _filter_empty_messages(request.messages)
+        await _downscale_images(api_messages)
         _normalize_str_to_blocks(api_messages)
         _apply_message_caching(api_messages, request.cache_breakpoint_index)
 
@@ -420,8 +432,9 @@ class ClaudeProvider(LLMProvider):
 
         # Effort parameter (GA via output_config)
         if model_config.has_capability("effort"):
-            api_params["output_config"] = {"effort": "high"}
-            logger.debug("claude.effort.enabled", effort="high")
+            effort = request.effort or "high"
+            api_params["output_config"] = {"effort": effort}
+            logger.debug("claude.effort.enabled", effort=effort)
 
         # Adaptive thinking (Opus 4.6) or manual extended thinking
         if model_config.has_capability("adaptive_thinking"):
@@ -591,6 +604,7 @@ class ClaudeProvider(LLMProvider):
 
         # Convert messages to Anthropic format, filtering empty messages
         api_messages = _filter_empty_messages(request.messages)
+        await _downscale_images(api_messages)
         _normalize_str_to_blocks(api_messages)
         _apply_message_caching(api_messages, request.cache_breakpoint_index)
 
@@ -665,8 +679,9 @@ class ClaudeProvider(LLMProvider):
 
         # Effort parameter (GA via output_config)
         if model_config.has_capability("effort"):
-            api_params["output_config"] = {"effort": "high"}
-            logger.debug("claude.effort.enabled", effort="high")
+            effort = request.effort or "high"
+            api_params["output_config"] = {"effort": effort}
+            logger.debug("claude.effort.enabled", effort=effort)
 
         # Server-side compaction (Opus 4.6, beta)
         self._apply_compaction_config(api_params, model_config)
@@ -912,6 +927,36 @@ class ClaudeProvider(LLMProvider):
 
         return estimated_tokens
 
+    async def warm_prompt_cache(self, template: "RequestTemplate") -> Any:
+        """Refresh the cached shared prefix of a request template.
+
+        Sends tools and the global system block (the breakpoint shared
+        by all users) with a 1-token completion. A cache hit extends the
+        prefix TTL at cache read price. Does not touch last_* state, so
+        it is safe to call while user requests are streaming.
+
+        Args:
+            template: Claude RequestTemplate (block system prompt).
+
+        Returns:
+            Anthropic usage of the refresh request.
+        """
+        model_config = get_model(template.model_id)
+        api_params = {
+            "model": model_config.model_id,
+            "max_tokens": 1,
+            "system": [template.system_prompt[0]],
+            "messages": [{
+                "role": "user",
+                "content": "."
+            }],
+        }
+        if template.tools:
+            api_params["tools"] = template.tools_list()
+
+        response = await self.client.messages.create(**api_params)
+        return response.usage
+
     async def get_usage(self) -> TokenUsage:
         """Get token usage for last API call.
 
@@ -1129,6 +1174,7 @@ class ClaudeProvider(LLMProvider):
 
         # Convert messages to Anthropic format, filtering empty messages
         api_messages = _filter_empty_messages(request.messages)
+        await _downscale_images(api_messages)
         _normalize_str_to_blocks(api_messages)
         _apply_message_caching(api_messages, request.cache_breakpoint_index)
 
@@ -1169,8 +1215,9 @@ class ClaudeProvider(LLMProvider):
 
         # Effort parameter (GA via output_config)
         if model_config.has_capability("effort"):
-            api_params["output_config"] = {"effort": "high"}
-            logger.debug("claude.effort.enabled", effort="high")
+            effort = request.effort or "high"
+            api_params["output_config"] = {"effort": effort}
+            logger.debug("claude.effort.enabled", effort=effort)
 
         # Adaptive thinking (Opus 4.6) or manual extended thinking
         if model_config.has_capability("adaptive_thinking"):
@@ -2,6 +2,7 @@
 
 This module provides functions to interact with Claude Files API:
 - Upload files (images, PDFs, documents)
+- Upload while the file is still being downloaded (streaming)
 - Delete files
 - Cleanup expired files (cron job)
 
@@ -17,9 +18,13 @@ NO __init__.py - use direct import:
 """
 
 import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import io
 from io import BytesIO
 import random
-from typing import Optional
+import threading
+from typing import AsyncIterator, Awaitable, Callable, Optional
 
 import anthropic
 
@@ -27,6 +32,7 @@ import anthropic
 MAX_RETRIES = 3
 BASE_DELAY_SECONDS = 1.0
 MAX_DELAY_SECONDS = 10.0
+from config import FILE_TRANSFER_UPLOAD_THREADS
 from core.clients import get_anthropic_client
 from core.mime_types import detect_mime_type
 from core.mime_types import is_audio_mime
@@ -39,6 +45,208 @@ from utils.structured_logging import get_logger
 
 logger = get_logger(__name__)
 
+# Streaming uploads hold a thread for the whole transfer. They get their
+# own pool: in the default executor they could occupy every worker while
+# waiting for chunks whose blob writes (asyncio.to_thread) can't run.
+_stream_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _get_stream_pool() -> ThreadPoolExecutor:
+    """Get the thread pool for streaming uploads (created lazily)."""
+    global _stream_pool  # pylint: disable=global-statement
+    if _stream_pool is None:
+        _stream_pool = ThreadPoolExecutor(
+            max_workers=FILE_TRANSFER_UPLOAD_THREADS,
+            thread_name_prefix="files-api-upload")
+    return _stream_pool
+
+
+class _BufferReader(io.RawIOBase):
+    """Read-only file object over a buffer, without copying it.
+
+    BytesIO(memoryview) copies the whole buffer; this reader lets the
+    multipart encoder stream an mmap-backed blob in chunks instead.
+    """
+
+    def __init__(self, buffer: memoryview) -> None:
+        """Initialize reader.
+
+        Args:
+            buffer: Content to read (memoryview or any buffer).
+        """
+        super().__init__()
+        self._view = memoryview(buffer).cast("B")
+        self._pos = 0
+
+    def readable(self) -> bool:
+        """Reader is readable."""
+        return True
+
+    def seekable(self) -> bool:
+        """Reader supports seek (used for length detection and retries)."""
+        return True
+
+    def readinto(self, b) -> int:
+        """Copy next chunk into b, return number of bytes copied."""
+        end = min(self._pos + len(b), len(self._view))
+        count = end - self._pos
+        b[:count] = self._view[self._pos:end]
+        self._pos = end
+        return count
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """Move read position, return new position."""
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = len(self._view) + offset
+        else:
+            raise ValueError(f"invalid whence: {whence}")
+        self._pos = max(0, self._pos)
+        return self._pos
+
+    def tell(self) -> int:
+        """Current read position."""
+        return self._pos
+
+
+class _PipeReader(io.RawIOBase):
+    """File object fed with chunks from the event loop, read by a thread.
+
+    The multipart encoder reads it in the upload thread while the event
+    loop is still receiving the file. At most max_buffered unread bytes
+    are held (plus one chunk); feed() waits for the reader to catch up.
+
+    Reports its declared size via seek(0, SEEK_END) so the request has a
+    Content-Length; without a size the body is sent chunked.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_buffered: int,
+                 size: Optional[int]) -> None:
+        """Initialize pipe.
+
+        Args:
+            loop: Event loop that calls feed().
+            max_buffered: Unread bytes after which feed() waits.
+            size: Declared total size, None if unknown.
+        """
+        super().__init__()
+        self._loop = loop
+        self._max_buffered = max_buffered
+        self._size = size
+        self._chunks: deque[memoryview] = deque()
+        self._offset = 0
+        self._buffered = 0
+        self._read = 0
+        self._pos = 0
+        self._eof = False
+        self._detached = False
+        self._error: Optional[BaseException] = None
+        self._cond = threading.Condition()
+        self._space = asyncio.Event()
+        self._space.set()
+
+    # === Event loop side ===
+
+    async def feed(self, chunk: bytes | memoryview) -> None:
+        """Queue a chunk, waiting while the buffer is full.
+
+        Returns immediately once the reader is gone (detach()).
+        """
+        while True:
+            with self._cond:
+                if self._detached:
+                    return
+                if self._buffered < self._max_buffered:
+                    self._chunks.append(memoryview(chunk).cast("B"))
+                    self._buffered += len(chunk)
+                    self._cond.notify()
+                    return
+                self._space.clear()
+            await self._space.wait()
+
+    def finish(self) -> None:
+        """Mark end of stream."""
+        with self._cond:
+            self._eof = True
+            self._cond.notify()
+
+    def fail(self, error: BaseException) -> None:
+        """Abort the reader with an error."""
+        with self._cond:
+            self._error = error
+            self._cond.notify()
+
+    def detach(self) -> None:
+        """Reader is gone (upload finished): drop buffered chunks."""
+        with self._cond:
+            self._detached = True
+            self._chunks.clear()
+            self._buffered = 0
+        self._space.set()
+
+    # === Upload thread side ===
+
+    def readable(self) -> bool:
+        """Pipe is readable."""
+        return True
+
+    def seekable(self) -> bool:
+        """Seek only reports the size; reading can't be rewound."""
+        return self._size is not None
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """Move the logical position (for length detection)."""
+        if self._size is None:
+            raise io.UnsupportedOperation("size unknown")
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = self._size + offset
+        else:
+            raise ValueError(f"invalid whence: {whence}")
+        return self._pos
+
+    def tell(self) -> int:
+        """Current logical position."""
+        return self._pos
+
+    def readinto(self, b) -> int:
+        """Copy next buffered bytes into b, blocking until available."""
+        with self._cond:
+            if self._pos != self._read:
+                raise io.UnsupportedOperation("pipe can't be rewound")
+            while (not self._chunks and not self._eof
+                   and self._error is None):
+                self._cond.wait()
+            if self._error is not None:
+                raise OSError("stream aborted") from self._error
+            if not self._chunks:
+                if self._size is not None and self._read != self._size:
+                    raise OSError(f"stream ended after {self._read} of "
+                                  f"{self._size} bytes")
+                return 0
+
+            head = self._chunks[0]
+            count = min(len(b), len(head) - self._offset)
+            b[:count] = head[self._offset:self._offset + count]
+            self._offset += count
+            if self._offset == len(head):
+                self._chunks.popleft()
+                self._offset = 0
+            self._buffered -= count
+            self._read += count
+            self._pos = self._read
+            if self._size is not None and self._read > self._size:
+                raise OSError(f"stream exceeds declared {self._size} bytes")
+
+        self._loop.call_soon_threadsafe(self._space.set)
+        return count
+
 
 def _is_retryable_error(error: Exception) -> bool:
     """Check if error is retryable (transient API error).
@@ -102,14 +310,15 @@ def _get_file_type_from_mime(mime_type: str) -> str:
 
 
 async def upload_to_files_api(
-    file_bytes: bytes,
+    file_bytes: bytes | memoryview,
     filename: str,
     mime_type: Optional[str] = None,
 ) -> str:
     """Upload file to Claude Files API with retry on transient errors.
 
     Args:
-        file_bytes: File content as bytes.
+        file_bytes: File content as bytes, or a memoryview (e.g. from
+            get_exec_file_view) which is streamed without copying.
         filename: Original filename (used for extension-based MIME detection).
         mime_type: Optional declared MIME type (will be auto-detected if None).
 
@@ -142,8 +351,11 @@ async def upload_to_files_api(
             # FileTypes accepts tuple: (filename, file_content, mime_type)
             # Run in thread pool to avoid blocking event loop
             def _sync_upload():
-                return client.beta.files.upload(file=(filename,
-                                                      BytesIO(file_bytes),
+                if isinstance(file_bytes, memoryview):
+                    body = _BufferReader(file_bytes)
+                else:
+                    body = BytesIO(file_bytes)
+                return client.beta.files.upload(file=(filename, body,
                                                       detected_mime))
 
             file_response = await asyncio.to_thread(_sync_upload)
@@ -190,6 +402,114 @@ async def upload_to_files_api(
     raise last_error  # type: ignore
 
 
+async def upload_stream_to_files_api(
+    chunks: AsyncIterator[bytes],
+    filename: str,
+    mime_type: Optional[str] = None,
+    size_bytes: Optional[int] = None,
+    max_buffered: int = 1024 * 1024,
+    replay: Optional[Callable[[], Awaitable[Optional[bytes | memoryview]]]]
+    = None,
+) -> str:
+    """Upload file to Files API while its chunks are still arriving.
+
+    The request body is read from a bounded pipe in the upload thread,
+    so memory per transfer is max_buffered, not the file size. The
+    source is always consumed to the end, even if the upload fails
+    early, so a tee on it (e.g. a blob writer) sees the whole file.
+
+    A stream can't be re-read, so the streaming attempt is made once.
+    On a transient error the upload is retried with the content from
+    replay() (called after the stream ends) via upload_to_files_api().
+
+    Args:
+        chunks: File content chunks, in order.
+        filename: Original filename (used for extension-based MIME detection).
+        mime_type: Optional declared MIME type (will be auto-detected if None).
+        size_bytes: Declared total size, None if unknown.
+        max_buffered: Unread bytes buffered before the source is paused.
+        replay: Returns the full content for retries, None if unavailable.
+
+    Returns:
+        Claude file ID string.
+
+    Raises:
+        anthropic.APIError: If upload fails and can't be retried.
+        Exception: Any error raised by the chunk source.
+    """
+    first = await anext(chunks, b"")
+    # Magic bytes are at the start of the file
+    detected_mime = detect_mime_type(
+        filename=filename,
+        file_bytes=bytes(first),
+        declared_mime=mime_type,
+    )
+
+    logger.info("files_api.upload_stream_start",
+                filename=filename,
+                declared_mime=mime_type,
+                detected_mime=detected_mime,
+                size_bytes=size_bytes)
+
+    # Single attempt: the SDK can't retry a consumed stream
+    client = get_anthropic_client(use_files_api=True).with_options(
+        max_retries=0)
+    loop = asyncio.get_running_loop()
+    pipe = _PipeReader(loop, max_buffered, size_bytes)
+
+    def _sync_upload():
+        return client.beta.files.upload(file=(filename, pipe, detected_mime))
+
+    upload = loop.run_in_executor(_get_stream_pool(), _sync_upload)
+    upload.add_done_callback(lambda _: pipe.detach())
+
+    received = len(first)
+    try:
+        if first:
+            await pipe.feed(first)
+        async for chunk in chunks:
+            received += len(chunk)
+            await pipe.feed(chunk)
+        pipe.finish()
+    except BaseException as e:
+        pipe.fail(e)
+        await asyncio.wait([upload])
+        if not upload.cancelled():
+            upload.exception()  # Retrieved: the source error wins
+        raise
+
+    try:
+        file_response = await upload
+    except anthropic.APIError as e:
+        content = None
+        if replay is not None and _is_retryable_error(e):
+            content = await replay()
+        logger.info("files_api.upload_stream_failed",
+                    filename=filename,
+                    error=str(e),
+                    status_code=getattr(e, 'status_code', None),
+                    size_bytes=received,
+                    retry=content is not None)
+        if content is None:
+            raise
+        return await upload_to_files_api(
+            file_bytes=content,
+            filename=filename,
+            mime_type=mime_type,
+        )
+
+    logger.info("files_api.upload_success",
+                filename=filename,
+                claude_file_id=file_response.id,
+                mime_type=detected_mime,
+                size_bytes=received,
+                streamed=True)
+
+    record_file_upload(file_type=_get_file_type_from_mime(detected_mime))
+
+    return file_response.id
+
+
 async def download_from_files_api(claude_file_id: str) -> bytes:
     """Download file from Claude Files API with retry on transient errors.
 
@@ -0,0 +1,371 @@
+"""Prompt cache manager for Claude requests.
+
+Tracks Anthropic prompt cache usage (cache_read_input_tokens,
+cache_creation_input_tokens) per shared prefix - tools plus the global
+system prompt block, identified by RequestTemplate.prefix_hash - and:
+
+- Keeps shared prefixes warm. Every real request extends the prefix TTL,
+  so busy prefixes never need help. When traffic is sparse, a prefix that
+  was used within PROMPT_CACHE_KEEPALIVE_WINDOW is refreshed with a
+  1-token request shortly before it expires.
+- Picks the rolling message breakpoint. The breakpoint chosen on turn N
+  pays its cache write on turn N and is read by turn N+1 of the same
+  thread, so each thread's previous choice is credited with the next
+  turn's reads minus its own write premium. The candidate offset with the
+  best average net savings is used once every candidate has enough
+  samples; a small share of turns explores the others.
+
+Results are exported through the PROMPT_CACHE_* metrics.
+
+NO __init__.py - use direct import:
+    from core.claude.prompt_cache import get_prompt_cache_manager
+"""
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from dataclasses import field
+import random
+import time
+from typing import Any, Callable, Optional
+
+from config import PROMPT_CACHE_BREAKPOINT_OFFSETS
+from config import PROMPT_CACHE_CHECK_INTERVAL
+from config import PROMPT_CACHE_EXPLORE_RATE
+from config import PROMPT_CACHE_KEEPALIVE_WINDOW
+from config import PROMPT_CACHE_MAX_THREADS
+from config import PROMPT_CACHE_MIN_SAMPLES
+from config import PROMPT_CACHE_REFRESH_MARGIN
+from config import PROMPT_CACHE_TTL
+from core.request_templates import get_template_by_hash
+from core.request_templates import RequestTemplate
+from core.singleton import singleton
+from utils.metrics import record_prompt_cache_breakpoint
+from utils.metrics import record_prompt_cache_refresh
+from utils.metrics import set_prompt_cache_read_ratio
+from utils.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Savings relative to base input price: cache reads cost 0.1x, 5-minute
+# cache writes cost 1.25x
+CACHE_READ_SAVING = 0.9
+CACHE_WRITE_PREMIUM = 0.25
+
+# Weight of new samples once a candidate has 1 / SCORE_EWMA_ALPHA samples
+SCORE_EWMA_ALPHA = 0.05
+
+
+def usage_tokens(usage: Any, name: str) -> int:
+    """Read a token counter from an Anthropic usage object."""
+    value = getattr(usage, name, 0)
+    return value if isinstance(value, int) else 0
+
+
+@dataclass(slots=True)
+class OffsetStats:
+    """Net savings observed for one breakpoint offset."""
+
+    samples: int = 0
+    score: float = 0.0
+
+    def add(self, value: float) -> None:
+        """Add a sample (running mean, then EWMA)."""
+        self.samples += 1
+        weight = max(1 / self.samples, SCORE_EWMA_ALPHA)
+        self.score += weight * (value - self.score)
+
+
+@dataclass(slots=True)
+class PrefixStats:  # pylint: disable=too-many-instance-attributes
+    """Cache usage of one shared prefix.
+
+    Attributes:
+        model_id: Full model ID (metric label).
+        template_hash: Latest template seen with this prefix (refresh
+            payload source).
+        requests: Requests recorded.
+        read_tokens: Sum of cache_read_input_tokens.
+        creation_tokens: Sum of cache_creation_input_tokens.
+        uncached_tokens: Sum of uncached input_tokens.
+        last_request: Monotonic time of the last real request.
+        warm_until: Monotonic time the cached prefix expires.
+        refreshes: Keep-alive requests sent.
+        offsets: Breakpoint candidate stats by offset.
+    """
+
+    model_id: str
+    template_hash: str
+    requests: int = 0
+    read_tokens: int = 0
+    creation_tokens: int = 0
+    uncached_tokens: int = 0
+    last_request: float = 0.0
+    warm_until: float = 0.0
+    refreshes: int = 0
+    offsets: dict[int, OffsetStats] = field(default_factory=dict)
+
+    @property
+    def read_ratio(self) -> float:
+        """Share of input tokens served from cache."""
+        total = self.read_tokens + self.creation_tokens + self.uncached_tokens
+        return self.read_tokens / total if total else 0.0
+
+
+@dataclass(slots=True)
+class _Turn:
+    """Breakpoint choice of a thread's latest turn, awaiting credit."""
+
+    prefix_hash: str
+    offset: int
+    creation_tokens: int = 0
+    at: float = 0.0
+
+
+class PromptCacheManager:
+    """Per-prefix prompt cache tracking, keep-alive and breakpoint choice.
+
+    Not thread-safe; used from the event loop only.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        ttl: float = PROMPT_CACHE_TTL,
+        refresh_margin: float = PROMPT_CACHE_REFRESH_MARGIN,
+        keepalive_window: float = PROMPT_CACHE_KEEPALIVE_WINDOW,
+        offsets: tuple[int, ...] = PROMPT_CACHE_BREAKPOINT_OFFSETS,
+        explore_rate: float = PROMPT_CACHE_EXPLORE_RATE,
+        min_samples: int = PROMPT_CACHE_MIN_SAMPLES,
+        max_threads: int = PROMPT_CACHE_MAX_THREADS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize manager.
+
+        Args:
+            ttl: Cache TTL of the shared prefix in seconds.
+            refresh_margin: Refresh when the prefix expires within this.
+            keepalive_window: Stop refreshing after this long without
+                real requests.
+            offsets: Breakpoint candidates (offset from the end of the
+                clean history); the first one is the default.
+            explore_rate: Share of turns that try a random candidate.
+            min_samples: Samples every candidate needs before the best
+                one replaces the default.
+            max_threads: Threads tracked for breakpoint credit.
+            clock: Monotonic time source.
+        """
+        self._ttl = ttl
+        self._refresh_margin = refresh_margin
+        self._keepalive_window = keepalive_window
+        self._offsets = offsets
+        self._explore_rate = explore_rate
+        self._min_samples = min_samples
+        self._max_threads = max_threads
+        self._clock = clock
+        self._prefixes: dict[str, PrefixStats] = {}
+        # thread_id -> offset chosen for the turn being streamed
+        self._choices: OrderedDict[int, tuple[str, int]] = OrderedDict()
+        # thread_id -> last completed choice, credited by the next turn
+        self._turns: OrderedDict[int, _Turn] = OrderedDict()
+
+    def _prefix(self, template: RequestTemplate) -> PrefixStats:
+        """Get or create stats for a template's shared prefix."""
+        stats = self._prefixes.get(template.prefix_hash)
+        if stats is None:
+            stats = PrefixStats(model_id=template.model_id,
+                                template_hash=template.content_hash)
+            self._prefixes[template.prefix_hash] = stats
+        return stats
+
+    def get_prefix_stats(self, prefix_hash: str) -> Optional[PrefixStats]:
+        """Stats for a shared prefix (None if never seen)."""
+        return self._prefixes.get(prefix_hash)
+
+    def choose_breakpoint(self, template_hash: Optional[str], thread_id: int,
+                          message_count: int) -> int:
+        """Pick the rolling breakpoint index for a new turn.
+
+        Args:
+            template_hash: LLMRequest.template_hash.
+            thread_id: Internal thread ID (credit attribution).
+            message_count: Messages in the clean history.
+
+        Returns:
+            Index of the message to place the breakpoint on.
+        """
+        offset = self._offsets[0]
+        template = get_template_by_hash(template_hash)
+        if template is not None and template.prefix_hash is not None:
+            offset, reason = self._pick_offset(self._prefix(template))
+            record_prompt_cache_breakpoint(offset, reason)
+            self._choices[thread_id] = (template.prefix_hash, offset)
+            self._choices.move_to_end(thread_id)
+            while len(self._choices) > self._max_threads:
+                self._choices.popitem(last=False)
+        return max(message_count - offset, 0)
+
+    def _pick_offset(self, stats: PrefixStats) -> tuple[int, str]:
+        """Choose a candidate offset and the reason for the choice."""
+        if len(self._offsets) > 1 and random.random() < self._explore_rate:
+            return random.choice(self._offsets), "explore"
+        candidates = [stats.offsets.get(o) for o in self._offsets]
+        if any(c is None or c.samples < self._min_samples for c in candidates):
+            return self._offsets[0], "default"
+        best = max(range(len(candidates)), key=lambda i: candidates[i].score)
+        return self._offsets[best], "best"
+
+    def record_usage(self,
+                     template_hash: Optional[str],
+                     usage: Any,
+                     thread_id: Optional[int] = None,
+                     first_call: bool = False) -> None:
+        """Record cache usage of one API call.
+
+        Args:
+            template_hash: LLMRequest.template_hash.
+            usage: Anthropic usage object of the call.
+            thread_id: Internal thread ID (breakpoint credit).
+            first_call: True for the first call of a turn (the only call
+                whose reads come from the previous turn's breakpoint).
+        """
+        template = get_template_by_hash(template_hash)
+        if template is None or template.prefix_hash is None or usage is None:
+            return
+
+        read = usage_tokens(usage, "cache_read_input_tokens")
+        creation = usage_tokens(usage, "cache_creation_input_tokens")
+        now = self._clock()
+
+        stats = self._prefix(template)
+        stats.template_hash = template.content_hash
+        stats.requests += 1
+        stats.read_tokens += read
+        stats.creation_tokens += creation
+        stats.uncached_tokens += usage_tokens(usage, "input_tokens")
+        stats.last_request = now
+        if read or creation:
+            stats.warm_until = now + self._ttl
+        set_prompt_cache_read_ratio(stats.model_id, stats.read_ratio)
+
+        if thread_id is None or not first_call:
+            return
+        self._credit_previous_turn(thread_id, template.prefix_hash, read, now)
+
+        choice = self._choices.pop(thread_id, None)
+        if choice is not None:
+            self._turns[thread_id] = _Turn(prefix_hash=choice[0],
+                                           offset=choice[1],
+                                           creation_tokens=creation,
+                                           at=now)
+            self._turns.move_to_end(thread_id)
+            while len(self._turns) > self._max_threads:
+                self._turns.popitem(last=False)
+
+    def _credit_previous_turn(self, thread_id: int, prefix_hash: str, read: int,
+                              now: float) -> None:
+        """Score the previous turn's breakpoint with this turn's reads.
+
+        Turns that come back after the TTL say nothing about the
+        breakpoint (the cache expired either way) and are skipped.
+        """
+        previous = self._turns.pop(thread_id, None)
+        if (previous is None or previous.prefix_hash != prefix_hash or
+                now - previous.at > self._ttl):
+            return
+        stats = self._prefixes.get(prefix_hash)
+        if stats is None:
+            return
+        savings = (CACHE_READ_SAVING * read -
+                   CACHE_WRITE_PREMIUM * previous.creation_tokens)
+        stats.offsets.setdefault(previous.offset, OffsetStats()).add(savings)
+
+    def due_for_refresh(self) -> list[PrefixStats]:
+        """Prefixes about to expire that still see occasional traffic.
+
+        Expired prefixes are skipped: refreshing them would cost the same
+        write the next real request pays anyway.
+        """
+        now = self._clock()
+        return [
+            stats for stats in self._prefixes.values()
+            if now < stats.warm_until <= now + self._refresh_margin and now -
+            stats.last_request <= self._keepalive_window
+        ]
+
+    async def refresh(self, stats: PrefixStats) -> bool:
+        """Send a keep-alive request for a shared prefix.
+
+        Args:
+            stats: Prefix to refresh.
+
+        Returns:
+            True if the prefix is warm afterwards.
+        """
+        template = get_template_by_hash(stats.template_hash)
+        if template is None:
+            # Template evicted or invalidated; real traffic re-registers
+            stats.warm_until = 0.0
+            return False
+
+        # pylint: disable=import-outside-toplevel
+        from core.provider_factory import get_provider
+
+        try:
+            usage = await get_provider(template.model_id
+                                      ).warm_prompt_cache(template)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            record_prompt_cache_refresh("error")
+            logger.warning("prompt_cache.refresh_failed",
+                           model_id=stats.model_id,
+                           error=str(e))
+            return False
+
+        read = usage_tokens(usage, "cache_read_input_tokens")
+        creation = usage_tokens(usage, "cache_creation_input_tokens")
+        stats.refreshes += 1
+        if read or creation:
+            stats.warm_until = self._clock() + self._ttl
+        record_prompt_cache_refresh("hit" if read else "write")
+        logger.info("prompt_cache.refreshed",
+                    model_id=stats.model_id,
+                    cache_read=read,
+                    cache_creation=creation,
+                    refreshes=stats.refreshes)
+        return bool(read or creation)
+
+    async def refresh_due(self) -> int:
+        """Refresh all prefixes due for keep-alive.
+
+        Returns:
+            Number of prefixes refreshed successfully.
+        """
+        refreshed = 0
+        for stats in self.due_for_refresh():
+            if await self.refresh(stats):
+                refreshed += 1
+        return refreshed
+
+
+@singleton
+def get_prompt_cache_manager() -> PromptCacheManager:
+    """Get the process-wide prompt cache manager."""
+    return PromptCacheManager()
+
+
+async def prompt_cache_task(log) -> None:
+    """Background task refreshing shared prompt prefixes.
+
+    Args:
+        log: Logger instance.
+    """
+    manager = get_prompt_cache_manager()
+    log.debug("prompt_cache.task_started", interval=PROMPT_CACHE_CHECK_INTERVAL)
+    while True:
+        try:
+            await asyncio.sleep(PROMPT_CACHE_CHECK_INTERVAL)
+            await manager.refresh_due()
+        except asyncio.CancelledError:
+            log.debug("prompt_cache.task_cancelled")
+            break
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            log.error("prompt_cache.task_error", error=str(e), exc_info=True)
@@ -1,7 +1,7 @@
 """Cost tracking for subagent and tool executions.
 
 This module provides a reusable CostTracker class that:
-- Tracks API token usage (input, output, thinking)
+- Tracks API token usage (input, output, thinking, prompt cache)
 - Tracks tool execution costs
 - Calculates total cost
 - Charges users via BalanceService
@@ -63,6 +63,8 @@ class CostTracker:  # pylint: disable=too-many-instance-attributes
         self.total_input_tokens = 0
         self.total_output_tokens = 0
         self.total_thinking_tokens = 0
+        self.total_cache_read_tokens = 0
+        self.total_cache_creation_tokens = 0
         self.tool_costs: list[tuple[str, Decimal]] = []
 
         # Optional callbacks for metrics
@@ -73,17 +75,24 @@ class CostTracker:  # pylint: disable=too-many-instance-attributes
     def add_api_usage(self,
                       input_tokens: int,
                       output_tokens: int,
-                      thinking_tokens: int = 0) -> None:
+                      thinking_tokens: int = 0,
+                      cache_read_tokens: int = 0,
+                      cache_creation_tokens: int = 0) -> None:
         """Track API token usage.
 
         Args:
             input_tokens: Number of input tokens.
             output_tokens: Number of output tokens.
             thinking_tokens: Number of thinking tokens (extended thinking).
+            cache_read_tokens: Input tokens read from prompt cache.
+            cache_creation_tokens: Input tokens written to prompt cache
+                (5-minute TTL).
         """
         self.total_input_tokens += input_tokens
         self.total_output_tokens += output_tokens
         self.total_thinking_tokens += thinking_tokens
+        self.total_cache_read_tokens += cache_read_tokens
+        self.total_cache_creation_tokens += cache_creation_tokens
 
         # Call metrics callback if provided
         if self._on_api_usage:
@@ -127,6 +136,9 @@ class CostTracker:  # pylint: disable=too-many-instance-attributes
                 input_tokens=self.total_input_tokens,
                 output_tokens=self.total_output_tokens,
                 thinking_tokens=self.total_thinking_tokens,
+                cache_read_tokens=self.total_cache_read_tokens,
+                cache_creation_tokens=self.total_cache_creation_tokens,
+                cache_creation_5m_tokens=self.total_cache_creation_tokens,
             )
             token_cost = calculate_provider_cost(model_full_id, usage)
         else:
@@ -136,6 +148,8 @@ class CostTracker:  # pylint: disable=too-many-instance-attributes
                 input_tokens=self.total_input_tokens,
                 output_tokens=self.total_output_tokens,
                 thinking_tokens=self.total_thinking_tokens,
+                cache_read_tokens=self.total_cache_read_tokens,
+                cache_creation_5m_tokens=self.total_cache_creation_tokens,
             )
 
         tool_cost = sum(cost for _, cost in self.tool_costs)
@@ -14,8 +14,8 @@ NO __init__.py - use direct import:
 import asyncio
 from typing import Any, Optional, TYPE_CHECKING
 
-from cache.file_cache import cache_file
 from cache.file_cache import get_cached_file
+from core.file_transfer import download_to_cache
 from utils.structured_logging import get_logger
 
 if TYPE_CHECKING:
@@ -87,10 +87,11 @@ class FileManager:
                 telegram_file_id=telegram_file_id,
             )
 
-            # Download from Telegram
-            file_info = await self.bot.get_file(telegram_file_id)
-            file_bytes_io = await self.bot.download_file(file_info.file_path)
-            content = file_bytes_io.read()
+            # Stream from Telegram through the blob store (one copy in
+            # memory); caches the file unless use_cache is off
+            content = await download_to_cache(self.bot,
+                                              telegram_file_id,
+                                              cache=use_cache)
 
             logger.info(
                 "file_manager.download_success",
@@ -98,10 +99,6 @@ class FileManager:
                 size_bytes=len(content),
             )
 
-            # Cache for future use
-            if use_cache:
-                await cache_file(telegram_file_id, content)
-
             return content
 
         except TelegramAPIError as e:
@@ -0,0 +1,338 @@
+"""Streaming file transfers from Telegram.
+
+Telegram downloads are consumed chunk by chunk and teed into the local
+blob store (for the file cache) and, optionally, into a Files API upload
+that runs while the download is still in progress. No step holds the
+whole file in memory:
+
+    Telegram chunks ─┬─> BlobWriter (temp file + sha256) ─> file cache
+                     └─> _PipeReader (bounded) ─> Files API multipart
+
+Each transfer reserves its upload buffer from a global in-flight budget
+(FILE_TRANSFER_MAX_INFLIGHT_BYTES), so peak memory stays bounded no
+matter how many files arrive at once; extra transfers wait their turn.
+
+The blob also serves as the retry source: a failed streaming upload is
+retried from the mmap-backed blob instead of downloading again.
+
+NO __init__.py - use direct import:
+    from core.file_transfer import transfer_to_files_api, download_to_cache
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional, TYPE_CHECKING
+
+from cache.blob_store import BlobWriter
+from cache.blob_store import get_blob_store
+from cache.file_cache import cache_file_blob
+from config import FILE_TRANSFER_BUFFER_BYTES
+from config import FILE_TRANSFER_CHUNK_SIZE
+from config import FILE_TRANSFER_MAX_INFLIGHT_BYTES
+from config import FILE_TRANSFER_TIMEOUT
+from core.claude.files_api import upload_stream_to_files_api
+from utils.metrics import record_file_transfer
+from utils.metrics import set_file_transfer_inflight_bytes
+from utils.structured_logging import get_logger
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class TransferResult:
+    """Outcome of a Telegram -> cache (-> Files API) transfer.
+
+    Attributes:
+        size_bytes: Bytes received from Telegram.
+        digest: Blob store digest, None if the blob couldn't be written.
+        claude_file_id: Files API ID, None if not uploaded or failed.
+    """
+
+    size_bytes: int
+    digest: Optional[str]
+    claude_file_id: Optional[str]
+
+
+class TransferBudget:
+    """Global budget for bytes buffered by concurrent transfers.
+
+    Reservations larger than the whole budget are clamped to it, so a
+    single transfer can always proceed once the others finish.
+    """
+
+    def __init__(self, max_bytes: int = FILE_TRANSFER_MAX_INFLIGHT_BYTES):
+        """Initialize budget.
+
+        Args:
+            max_bytes: Total bytes all transfers may reserve at once.
+        """
+        self._max_bytes = max_bytes
+        self._in_flight = 0
+        self._cond = asyncio.Condition()
+
+    @property
+    def in_flight(self) -> int:
+        """Bytes currently reserved."""
+        return self._in_flight
+
+    @asynccontextmanager
+    async def reserve(self, nbytes: int) -> AsyncIterator[None]:
+        """Hold nbytes of the budget for the duration of the block.
+
+        Args:
+            nbytes: Bytes the transfer may buffer.
+        """
+        nbytes = min(nbytes, self._max_bytes)
+        async with self._cond:
+            await self._cond.wait_for(
+                lambda: self._in_flight + nbytes <= self._max_bytes)
+            self._in_flight += nbytes
+            set_file_transfer_inflight_bytes(self._in_flight)
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self._in_flight -= nbytes
+                set_file_transfer_inflight_bytes(self._in_flight)
+                self._cond.notify_all()
+
+
+async def iter_telegram_file(
+    bot: 'Bot',
+    file_path: str,
+    chunk_size: int = FILE_TRANSFER_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """Yield a Telegram file in chunks as they are received.
+
+    Args:
+        bot: Telegram Bot instance.
+        file_path: File path from bot.get_file().
+        chunk_size: Chunk size in bytes.
+
+    Yields:
+        Content chunks, in order.
+
+    Raises:
+        ValueError: If a local Bot API server returns no content.
+        aiohttp.ClientError: If the download fails.
+    """
+    if bot.session.api.is_local:
+        # Local Bot API server: the file is already on disk
+        file_bytes_io = await bot.download_file(file_path)
+        if not file_bytes_io:
+            raise ValueError(f"Failed to download file: {file_path}")
+        while chunk := file_bytes_io.read(chunk_size):
+            yield chunk
+        return
+
+    url = bot.session.api.file_url(bot.token, file_path)
+    async for chunk in bot.session.stream_content(
+            url=url,
+            timeout=FILE_TRANSFER_TIMEOUT,
+            chunk_size=chunk_size,
+            raise_for_status=True):
+        yield chunk
+
+
+class _Tee:
+    """Chunk source that also writes every chunk to a blob.
+
+    Blob writes are best-effort: on a disk error the blob is dropped
+    and the chunks keep flowing to the consumer.
+    """
+
+    def __init__(self, source: AsyncIterator[bytes]) -> None:
+        """Initialize tee.
+
+        Args:
+            source: Chunks to pass through.
+        """
+        self._source = source
+        self._writer: Optional[BlobWriter] = get_blob_store().open_writer()
+        self.size_bytes = 0
+        self.digest: Optional[str] = None
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        """Pass chunks through, committing the blob at the end."""
+        try:
+            async for chunk in self._source:
+                self.size_bytes += len(chunk)
+                if self._writer is not None:
+                    try:
+                        await self._writer.write(chunk)
+                    except OSError as e:
+                        self._drop_writer(e)
+                yield chunk
+        except BaseException:
+            await self.abort()
+            raise
+
+        if self._writer is not None:
+            try:
+                self.digest = await self._writer.commit()
+            except OSError as e:
+                self._drop_writer(e)
+
+    async def abort(self) -> None:
+        """Discard the partial blob."""
+        if self._writer is not None:
+            await self._writer.abort()
+            self._writer = None
+
+    def _drop_writer(self, error: OSError) -> None:
+        """Stop writing the blob after a disk error."""
+        logger.info("file_transfer.blob_write_failed", error=str(error))
+        self._writer.abort_sync()
+        self._writer = None
+
+
+async def transfer_to_files_api(
+    bot: 'Bot',
+    telegram_file_id: str,
+    filename: str,
+    mime_type: Optional[str] = None,
+) -> TransferResult:
+    """Stream a Telegram file into the file cache and the Files API.
+
+    The Files API upload is non-fatal: on failure claude_file_id is None
+    and the file is still usable from the cache (Google providers).
+
+    Args:
+        bot: Telegram Bot instance.
+        telegram_file_id: Telegram file ID.
+        filename: Filename for cache and upload.
+        mime_type: Declared MIME type for the upload.
+
+    Returns:
+        TransferResult.
+
+    Raises:
+        ValueError: If the file can't be downloaded.
+        aiohttp.ClientError: If the download fails midway.
+    """
+    file_info = await bot.get_file(telegram_file_id)
+    if not file_info or not file_info.file_path:
+        raise ValueError(f"Failed to download file: {telegram_file_id}")
+
+    tee = _Tee(iter_telegram_file(bot, file_info.file_path))
+    download_error: Optional[BaseException] = None
+    replayed = False
+
+    async def _source() -> AsyncIterator[bytes]:
+        nonlocal download_error
+        try:
+            async for chunk in tee.chunks():
+                yield chunk
+        except Exception as e:
+            download_error = e
+            raise
+
+    async def _replay() -> Optional[memoryview]:
+        nonlocal replayed
+        if tee.digest is None:
+            return None
+        replayed = True
+        return await get_blob_store().open_view(tee.digest)
+
+    claude_file_id = None
+    async with get_transfer_budget().reserve(FILE_TRANSFER_BUFFER_BYTES +
+                                             FILE_TRANSFER_CHUNK_SIZE):
+        try:
+            claude_file_id = await upload_stream_to_files_api(
+                _source(),
+                filename=filename,
+                mime_type=mime_type,
+                size_bytes=file_info.file_size,
+                max_buffered=FILE_TRANSFER_BUFFER_BYTES,
+                replay=_replay,
+            )
+            record_file_transfer("replayed" if replayed else "streamed")
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            if download_error is not None:
+                raise
+            record_file_transfer("upload_failed")
+            logger.warning(
+                "file_transfer.upload_skipped",
+                filename=filename,
+                file_id=telegram_file_id,
+                error=str(e),
+                error_type=type(e).__name__,
+            )
+
+    if tee.digest is not None:
+        await cache_file_blob(telegram_file_id,
+                              tee.digest,
+                              tee.size_bytes,
+                              filename=filename)
+
+    return TransferResult(size_bytes=tee.size_bytes,
+                          digest=tee.digest,
+                          claude_file_id=claude_file_id)
+
+
+async def download_to_cache(
+    bot: 'Bot',
+    telegram_file_id: str,
+    filename: Optional[str] = None,
+    cache: bool = True,
+) -> bytes:
+    """Download a Telegram file through the blob store.
+
+    The download is streamed to disk, then read back once, so the file
+    is in memory a single time (instead of a BytesIO plus its copy).
+
+    Args:
+        bot: Telegram Bot instance.
+        telegram_file_id: Telegram file ID.
+        filename: Optional filename for cache logging.
+        cache: Point the file cache at the blob.
+
+    Returns:
+        File content as bytes.
+
+    Raises:
+        ValueError: If the file can't be downloaded.
+        aiohttp.ClientError: If the download fails midway.
+    """
+    file_info = await bot.get_file(telegram_file_id)
+    if not file_info or not file_info.file_path:
+        raise ValueError(f"Failed to download file: {telegram_file_id}")
+
+    tee = _Tee(iter_telegram_file(bot, file_info.file_path))
+    async for _ in tee.chunks():
+        pass
+
+    if tee.digest is not None:
+        content = await get_blob_store().get(tee.digest)
+        if content is not None:
+            if cache:
+                await cache_file_blob(telegram_file_id,
+                                      tee.digest,
+                                      tee.size_bytes,
+                                      filename=filename)
+            return content
+
+    # Blob store unavailable (disk error): download into memory instead
+    logger.info("file_transfer.blob_unavailable",
+                file_id=telegram_file_id,
+                size_bytes=tee.size_bytes)
+    file_bytes_io = await bot.download_file(file_info.file_path)
+    if not file_bytes_io:
+        raise ValueError(f"Failed to download file: {telegram_file_id}")
+    return file_bytes_io.read()
+
+from core.singleton import singleton  # pylint: disable=wrong-import-position
+
+
+@singleton
+def get_transfer_budget() -> TransferBudget:
+    """Get the global transfer budget.
+
+    Returns:
+        TransferBudget singleton.
+    """
+    return TransferBudget()
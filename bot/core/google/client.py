@@ -32,6 +32,7 @@ from core.exceptions import RateLimitError
 from core.models import LLMRequest
 from core.models import StreamEvent
 from core.models import TokenUsage
+from core.request_templates import get_template_by_hash
 from utils.structured_logging import get_logger
 
 logger = get_logger(__name__)
@@ -273,6 +274,8 @@ class GeminiProvider(LLMProvider):
         self._cache_creation_failures: dict[str, float] = {}
         # Cache creation tokens from last _get_or_create_cache() call
         self._last_cache_creation_tokens: int = 0
+        # tools_hash -> converted genai Tool list (from RequestTemplate)
+        self._template_tools: dict[str, list] = {}
         logger.info("gemini_provider.initialized")
 
     async def _get_or_create_cache(
@@ -281,6 +284,7 @@ class GeminiProvider(LLMProvider):
         system_instruction: Optional[str],
         google_tools: list,
         google_contents: Optional[list[dict]] = None,
+        tools_hash: Optional[str] = None,
     ) -> tuple[Optional[str], Optional[list[dict]]]:
         """Get or create explicit cache for system + tools + conversation.
 
@@ -293,6 +297,8 @@ class GeminiProvider(LLMProvider):
             system_instruction: System prompt string.
             google_tools: List of genai_types.Tool objects.
             google_contents: Converted conversation messages.
+            tools_hash: Stable hash of the tool set (from RequestTemplate).
+                Avoids hashing repr(google_tools) on every request.
 
         Returns:
             Tuple of (cache_name or None, remaining_contents or None).
@@ -315,7 +321,9 @@ class GeminiProvider(LLMProvider):
         hash_parts = [model_id]
         if system_instruction:
             hash_parts.append(system_instruction)
-        if google_tools:
+        if tools_hash:
+            hash_parts.append(tools_hash)
+        elif google_tools:
             hash_parts.append(repr(google_tools))
         if cache_contents:
             hash_parts.append(repr(cache_contents))
@@ -538,9 +546,24 @@ class GeminiProvider(LLMProvider):
         conversation = await self._resolve_file_bytes(conversation)
         google_contents = _convert_messages_for_google(conversation)
 
-        # Convert tool definitions
+        # Convert tool definitions (precomputed when request has a template)
         google_tools = []
-        if request.tools:
+        tools_hash = None
+        template = get_template_by_hash(request.template_hash)
+        if request.tools and template and template.google_declarations:
+            tools_hash = template.tools_hash
+            google_tools = self._template_tools.get(tools_hash)
+            if google_tools is None:
+                google_tools = [
+                    genai_types.Tool(function_declarations=[
+                        genai_types.FunctionDeclaration(**d)
+                        for d in template.google_declarations
+                    ])
+                ]
+                self._template_tools[tools_hash] = google_tools
+            # Shared list — copy before any per-request mutation
+            google_tools = list(google_tools)
+        elif request.tools:
             declarations = _convert_tools_for_google(request.tools)
             if declarations:
                 google_tools.append(
@@ -582,6 +605,7 @@ class GeminiProvider(LLMProvider):
                 system_instruction=system_instruction,
                 google_tools=google_tools,
                 google_contents=google_contents,
+                tools_hash=tools_hash,
             )
             if cache_name and cached_remaining is not None:
                 google_contents = cached_remaining
@@ -0,0 +1,412 @@
+"""Shared image processing service.
+
+Pillow decode/resize/encode is CPU-bound and holds the GIL for most of its
+work. Running it inline on the event loop stalls every other coroutine for
+hundreds of milliseconds on large HEIC or PNG uploads. This module moves that
+work into a process pool and caches the processed variants so repeated
+requests (e.g. every tool loop iteration re-sending the same base64 image)
+never decode the same image twice.
+
+Cache layers (keyed by content hash + operation):
+- In-process LRU bounded by total bytes (IMAGE_VARIANT_CACHE_MAX_BYTES)
+- Redis (shared across restarts, IMAGE_VARIANT_TTL)
+
+Decoding uses Image.draft() where the codec supports it (JPEG), so a
+4000px photo downscaled to 2000px is decoded at reduced resolution.
+
+NO __init__.py - use direct import:
+    from core.image_processor import get_image_processor
+"""
+
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+import hashlib
+from io import BytesIO
+import multiprocessing
+import time
+from typing import Any, Callable, Optional
+
+from cache.client import get_redis
+from cache.keys import IMAGE_VARIANT_MAX_SIZE
+from cache.keys import IMAGE_VARIANT_TTL
+from cache.keys import image_variant_key
+from config import IMAGE_PROCESS_WORKERS
+from config import IMAGE_VARIANT_CACHE_MAX_BYTES
+from utils.metrics import record_cache_operation
+from utils.metrics import record_image_processing
+from utils.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Register HEIC/HEIF opener for Pillow (must run before any Image.open).
+# Runs in the main process and in every spawned worker on import.
+try:
+    import pillow_heif  # pylint: disable=import-outside-toplevel
+    pillow_heif.register_heif_opener()
+except ImportError:
+    logger.info("image_processor.pillow_heif_not_available")
+
+# Hashing multi-MB payloads is offloaded to a thread (hashlib releases GIL)
+_HASH_OFFLOAD_THRESHOLD = 1024 * 1024  # 1 MB
+
+# Marker stored in cache when an operation leaves the image unchanged
+# (e.g. downscale of an image already within limits)
+_UNCHANGED = b""
+
+
+@dataclass(frozen=True)
+class ImageInfo:
+    """Header-level image information (no pixel decode).
+
+    Attributes:
+        width: Image width in pixels.
+        height: Image height in pixels.
+        mode: Pillow mode string (e.g. "RGB", "RGBA").
+        format: Pillow format name (e.g. "PNG", "JPEG") or None.
+    """
+
+    width: int
+    height: int
+    mode: str
+    format: Optional[str]
+
+
+# === Worker functions (module-level so they pickle into the pool) ===
+
+
+def _downscale_worker(data: bytes, mime_type: str, max_dim: int,
+                      quality: int) -> bytes:
+    """Downscale image so that no dimension exceeds max_dim.
+
+    Args:
+        data: Encoded image bytes.
+        mime_type: MIME type of the image (selects output format).
+        max_dim: Maximum allowed dimension in pixels.
+        quality: JPEG quality for re-encoding.
+
+    Returns:
+        Re-encoded bytes, or _UNCHANGED if already within limits.
+    """
+    from PIL import Image  # pylint: disable=import-outside-toplevel
+
+    img = Image.open(BytesIO(data))
+    w, h = img.size
+
+    if w <= max_dim and h <= max_dim:
+        return _UNCHANGED
+
+    scale = max_dim / max(w, h)
+    new_w = int(w * scale)
+    new_h = int(h * scale)
+
+    # Reduced decoding: JPEG decoder can scale by 1/2, 1/4, 1/8 while
+    # decoding, always keeping the result >= requested size
+    if img.format == "JPEG":
+        img.draft(img.mode, (new_w, new_h))
+
+    img = img.resize((new_w, new_h), Image.LANCZOS)
+
+    fmt = "PNG" if "png" in mime_type else "JPEG"
+    if fmt == "JPEG" and img.mode in ("RGBA", "P", "LA"):
+        img = img.convert("RGB")
+    buf = BytesIO()
+    img.save(buf, format=fmt, quality=quality)
+    return buf.getvalue()
+
+
+def _to_jpeg_worker(data: bytes, quality: int) -> bytes:
+    """Convert any Pillow-readable image (HEIC, BMP, TIFF...) to JPEG.
+
+    Args:
+        data: Encoded image bytes.
+        quality: JPEG quality.
+
+    Returns:
+        JPEG bytes.
+    """
+    from PIL import Image  # pylint: disable=import-outside-toplevel
+
+    img = Image.open(BytesIO(data))
+
+    # Convert to RGB for JPEG (handles RGBA, LA, P, etc.)
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+
+    buf = BytesIO()
+    img.save(buf, format="JPEG", quality=quality)
+    return buf.getvalue()
+
+
+def probe_image(data: bytes) -> Optional[ImageInfo]:
+    """Read image dimensions and mode from the header only.
+
+    Image.open() is lazy: it parses the header without decoding pixels,
+    so this is cheap enough to run inline.
+
+    Args:
+        data: Encoded image bytes.
+
+    Returns:
+        ImageInfo, or None if the bytes are not a readable image.
+    """
+    try:
+        from PIL import Image  # pylint: disable=import-outside-toplevel
+
+        with Image.open(BytesIO(data)) as img:
+            w, h = img.size
+            return ImageInfo(width=w,
+                             height=h,
+                             mode=img.mode,
+                             format=img.format)
+    except Exception:  # pylint: disable=broad-exception-caught
+        return None
+
+
+def _content_hash(data: bytes) -> str:
+    """Compute content hash used in variant cache keys."""
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+class ImageProcessor:
+    """Process-pool backed image processing with a variant cache.
+
+    All public operations are async and never run Pillow decode/encode
+    on the event loop. Results are cached by (content hash, operation).
+
+    Usage:
+        processor = get_image_processor()
+        data, mime = await processor.downscale(raw, "image/png")
+        jpeg = await processor.to_jpeg(heic_bytes)
+    """
+
+    def __init__(self,
+                 max_workers: int = IMAGE_PROCESS_WORKERS,
+                 cache_max_bytes: int = IMAGE_VARIANT_CACHE_MAX_BYTES) -> None:
+        """Initialize the processor.
+
+        Args:
+            max_workers: Process pool size. 0 runs work in a thread instead
+                (still off the event loop, but GIL-bound).
+            cache_max_bytes: Byte budget for the in-process variant LRU.
+        """
+        self._max_workers = max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._cache: OrderedDict[str, bytes] = OrderedDict()
+        self._cache_bytes = 0
+        self._cache_max_bytes = cache_max_bytes
+
+        logger.debug("image_processor.initialized",
+                     max_workers=max_workers,
+                     cache_max_bytes=cache_max_bytes)
+
+    # === Public API ===
+
+    async def downscale(
+        self,
+        data: bytes,
+        mime_type: str,
+        max_dim: int = 2000,
+        quality: int = 85,
+    ) -> tuple[bytes, str]:
+        """Downscale image if any dimension exceeds max_dim.
+
+        Args:
+            data: Encoded image bytes.
+            mime_type: MIME type of the image.
+            max_dim: Maximum allowed dimension in pixels.
+            quality: JPEG quality for re-encoding.
+
+        Returns:
+            Tuple of (possibly resized bytes, mime_type). Original bytes
+            are returned unchanged if within limits or on failure.
+        """
+        # Header check is cheap; skip the pool entirely for small images
+        info = probe_image(data)
+        if info is None or (info.width <= max_dim and info.height <= max_dim):
+            return data, mime_type
+
+        operation = f"downscale:{max_dim}:{quality}:{mime_type}"
+        try:
+            result = await self._run(operation, data, _downscale_worker, data,
+                                     mime_type, max_dim, quality)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.info("image_processor.downscale_failed",
+                        error=str(e),
+                        error_type=type(e).__name__)
+            return data, mime_type
+
+        if result == _UNCHANGED:
+            return data, mime_type
+
+        logger.debug("image_processor.downscaled",
+                     original=f"{info.width}x{info.height}",
+                     max_dim=max_dim,
+                     original_size=len(data),
+                     resized_size=len(result))
+        return result, mime_type
+
+    async def to_jpeg(self, data: bytes, quality: int = 95) -> bytes:
+        """Convert image to JPEG (for formats Claude API doesn't accept).
+
+        Args:
+            data: Encoded image bytes (HEIC, HEIF, BMP, TIFF, ...).
+            quality: JPEG quality.
+
+        Returns:
+            JPEG bytes.
+
+        Raises:
+            Exception: If the image cannot be opened or converted.
+        """
+        return await self._run(f"jpeg:{quality}", data, _to_jpeg_worker, data,
+                               quality)
+
+    async def probe(self, data: bytes) -> Optional[ImageInfo]:
+        """Read image dimensions and mode without decoding pixels.
+
+        Args:
+            data: Encoded image bytes.
+
+        Returns:
+            ImageInfo, or None if not a readable image.
+        """
+        return probe_image(data)
+
+    def shutdown(self) -> None:
+        """Shut down the process pool (call on application exit)."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            logger.debug("image_processor.shutdown")
+
+    # === Internals ===
+
+    async def _run(self, operation: str, data: bytes,
+                   func: Callable[..., bytes], *args: Any) -> bytes:
+        """Run a worker function with variant caching.
+
+        Args:
+            operation: Operation identifier (part of cache key).
+            data: Source bytes (hashed for the cache key).
+            func: Module-level worker function.
+            *args: Arguments for func.
+
+        Returns:
+            Worker result bytes.
+        """
+        if len(data) >= _HASH_OFFLOAD_THRESHOLD:
+            content_hash = await asyncio.to_thread(_content_hash, data)
+        else:
+            content_hash = _content_hash(data)
+        key = image_variant_key(content_hash, operation)
+
+        cached = self._cache_get(key)
+        if cached is None:
+            cached = await self._redis_get(key)
+            if cached is not None:
+                self._cache_put(key, cached)
+        if cached is not None:
+            record_cache_operation("image_variant", hit=True)
+            return cached
+        record_cache_operation("image_variant", hit=False)
+
+        op_name = operation.split(":", 1)[0]
+        start = time.perf_counter()
+        result = await self._submit(func, *args)
+        record_image_processing(op_name, time.perf_counter() - start)
+
+        self._cache_put(key, result)
+        await self._redis_put(key, result)
+        return result
+
+    async def _submit(self, func: Callable[..., bytes], *args: Any) -> bytes:
+        """Execute worker function off the event loop.
+
+        Uses the process pool when configured; falls back to a thread if
+        the pool is disabled or has broken (worker crashed).
+        """
+        if self._max_workers <= 0:
+            return await asyncio.to_thread(func, *args)
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_pool(), func, *args)
+        except BrokenProcessPool:
+            logger.warning("image_processor.pool_broken",
+                           msg="Recreating pool, running in thread")
+            self._pool = None
+            return await asyncio.to_thread(func, *args)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Lazily create the process pool.
+
+        Uses the "spawn" start method: forking a process that already runs
+        an event loop and SDK client threads is unsafe.
+        """
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    def _cache_get(self, key: str) -> Optional[bytes]:
+        """Get variant from in-process LRU."""
+        value = self._cache.get(key)
+        if value is not None:
+            self._cache.move_to_end(key)
+        return value
+
+    def _cache_put(self, key: str, value: bytes) -> None:
+        """Store variant in in-process LRU, evicting oldest over budget."""
+        if len(value) > self._cache_max_bytes:
+            return
+        old = self._cache.pop(key, None)
+        if old is not None:
+            self._cache_bytes -= len(old)
+        self._cache[key] = value
+        self._cache_bytes += len(value)
+        while self._cache_bytes > self._cache_max_bytes and self._cache:
+            _, evicted = self._cache.popitem(last=False)
+            self._cache_bytes -= len(evicted)
+
+    @staticmethod
+    async def _redis_get(key: str) -> Optional[bytes]:
+        """Get variant from Redis (None on miss or Redis unavailable)."""
+        redis = await get_redis()
+        if redis is None:
+            return None
+        try:
+            return await redis.get(key)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.info("image_processor.redis_get_error", error=str(e))
+            return None
+
+    @staticmethod
+    async def _redis_put(key: str, value: bytes) -> None:
+        """Store variant in Redis (best effort)."""
+        if len(value) > IMAGE_VARIANT_MAX_SIZE:
+            return
+        redis = await get_redis()
+        if redis is None:
+            return
+        try:
+            await redis.setex(key, IMAGE_VARIANT_TTL, value)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.info("image_processor.redis_set_error", error=str(e))
+
+
+from core.singleton import singleton  # pylint: disable=wrong-import-position
+
+
+@singleton
+def get_image_processor() -> ImageProcessor:
+    """Get the global image processor instance.
+
+    Returns:
+        ImageProcessor singleton.
+    """
+    return ImageProcessor()
@@ -19,6 +19,9 @@ from utils.structured_logging import get_logger
 
 logger = get_logger(__name__)
 
+# libmagic only inspects the head of a buffer (its default bytes_max is 1 MB)
+MAGIC_SCAN_BYTES = 1024 * 1024
+
 # MIME type normalization map (non-standard -> standard)
 MIME_NORMALIZATION = {
     # JFIF variants -> JPEG
@@ -176,7 +179,10 @@ def detect_mime_from_magic(
     # libmagic ctypes bindings only accept bytes, not bytearray/memoryview
     # Convert any buffer-like object to bytes
     # See: https://github.com/ahupp/python-magic (uses ctypes)
-    if isinstance(file_bytes, (bytearray, memoryview)):
+    if isinstance(file_bytes, memoryview):
+        # Views are usually mmap-backed blobs - copy only what libmagic reads
+        file_bytes = bytes(file_bytes[:MAGIC_SCAN_BYTES])
+    elif isinstance(file_bytes, bytearray):
         file_bytes = bytes(file_bytes)
     elif not isinstance(file_bytes, bytes):
         logger.error("mime.magic_expected_bytes",
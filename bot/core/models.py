@@ -1,7 +1,8 @@
 """Pydantic models for LLM requests and responses.
 
 This module defines data models used for communication with LLM providers.
-All models use Pydantic v2 for validation and serialization.
+All models use Pydantic v2 for validation and serialization. Hot paths
+(tool loop iterations) build already-validated data with model_construct().
 
 NO __init__.py - use direct import: from core.models import LLMRequest
 """
@@ -14,12 +15,13 @@ from pydantic import BaseModel
 from pydantic import Field
 
 
-@dataclass
+@dataclass(slots=True)
 class StreamEvent:  # pylint: disable=too-many-instance-attributes
     """Streaming event from LLM provider.
 
     Represents a single event during streaming response. Used for unified
-    streaming of thinking, text, and tool use.
+    streaming of thinking, text, and tool use. Slotted: one instance is
+    created per token delta.
 
     Attributes:
         type: Event type indicating what happened.
@@ -90,6 +92,11 @@ class LLMRequest(BaseModel):
         max_tokens: Maximum tokens to generate in response.
         temperature: Sampling temperature (0.0-2.0, higher = more random).
         tools: Optional list of tool definitions (Phase 1.5).
+        template_hash: Content hash of the RequestTemplate the tools and
+            system prompt came from (lets providers reuse precomputed
+            provider-specific payloads).
+        effort: Effort level for models with the effort capability
+            ("low", "medium", "high"). None = "high".
     """
 
     messages: List[Message] = Field(
@@ -119,6 +126,12 @@ class LLMRequest(BaseModel):
         "Index of the message to place the rolling cache breakpoint on. "
         "When set, anchors the cache to this message instead of messages[-2]. "
         "Used to keep cache stable across tool loop iterations.")
+    template_hash: Optional[str] = Field(
+        default=None,
+        description="RequestTemplate content hash (precomputed tools/prompt)")
+    effort: Optional[str] = Field(
+        default=None,
+        description="Effort level for effort-capable models. None = high.")
 
 
 class TokenUsage(BaseModel):
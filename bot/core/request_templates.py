@@ -0,0 +1,263 @@
+"""Precompiled request templates (tools + system prompt) per model.
+
+Tool definitions and system prompt blocks are static for a given
+(model, provider, tool set, prompt version, custom prompt). Rebuilding them
+on every request and every tool loop iteration wastes CPU, and hashing
+them with repr() for provider-side caches is both slow and unstable.
+
+This module builds each combination once and keeps an immutable
+RequestTemplate with:
+- Ready-to-send tool definitions (Anthropic format)
+- System prompt (Claude multi-block with cache_control, or plain string)
+- Pre-converted Google function declarations (Gemini providers)
+- Stable content hashes for cache keys
+
+Templates are invalidated when prompt-affecting configuration changes
+(admin commands call invalidate_request_templates()).
+
+NO __init__.py - use direct import:
+    from core.request_templates import get_request_template
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import timezone
+import hashlib
+import json
+from typing import Any, Optional
+
+from config import get_model
+from config import get_system_prompt
+from utils.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Max templates kept (one per model x custom prompt in active use)
+MAX_TEMPLATES = 1024
+
+# Bumped by invalidate_request_templates(); part of every template key
+_prompt_version = 0
+
+_templates: OrderedDict[tuple, "RequestTemplate"] = OrderedDict()
+_templates_by_hash: dict[str, "RequestTemplate"] = {}
+
+
+@dataclass(frozen=True)
+class RequestTemplate:  # pylint: disable=too-many-instance-attributes
+    """Immutable precompiled request payload parts.
+
+    Callers must treat tools/system_prompt as read-only (they are shared
+    across requests). LLMRequest validation makes its own copies.
+
+    Attributes:
+        model_id: Full model ID (e.g., "claude:sonnet").
+        provider: Provider name ("claude", "google").
+        tools: Tool definitions in Anthropic format.
+        system_prompt: Claude blocks with cache_control, or plain string.
+        system_prompt_length: Total characters in system prompt.
+        tools_hash: Stable hash of tool definitions.
+        system_hash: Stable hash of system prompt.
+        content_hash: Combined hash (model + tools + system).
+        prefix_hash: Hash of the prefix shared across users (model + tools
+            + global system block), None for non-block system prompts.
+        google_declarations: Function declarations for Gemini (or None).
+        prompt_version: Prompt version at build time.
+    """
+
+    model_id: str
+    provider: str
+    tools: tuple[dict[str, Any], ...]
+    system_prompt: str | tuple[dict[str, Any], ...]
+    system_prompt_length: int
+    tools_hash: str
+    system_hash: str
+    content_hash: str
+    prefix_hash: Optional[str]
+    google_declarations: Optional[tuple[dict[str, Any], ...]]
+    prompt_version: int
+
+    def tools_list(self) -> list[dict[str, Any]]:
+        """Tool definitions as list (LLMRequest field type)."""
+        return list(self.tools)
+
+    def system_prompt_value(self) -> str | list[dict[str, Any]]:
+        """System prompt in LLMRequest format (str or list of blocks)."""
+        if isinstance(self.system_prompt, tuple):
+            return list(self.system_prompt)
+        return self.system_prompt
+
+
+def stable_hash(value: Any) -> str:
+    """Compute a stable short hash of a JSON-serializable value.
+
+    Unlike hash(repr(...)), the result does not depend on dict insertion
+    order or object identity, so it can be used in external cache keys.
+
+    Args:
+        value: JSON-serializable value.
+
+    Returns:
+        16-char hex digest.
+    """
+    payload = json.dumps(value,
+                         sort_keys=True,
+                         separators=(",", ":"),
+                         ensure_ascii=False,
+                         default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _excluded_tools(model_config) -> frozenset[str]:
+    """Tools excluded for a model.
+
+    Opus/Sonnet 4.6 have native adaptive thinking — skip the
+    extended_thinking tool to avoid redundant API calls.
+    """
+    exclude = set()
+    if model_config.has_capability("adaptive_thinking"):
+        exclude.add("extended_thinking")
+    return frozenset(exclude)
+
+
+def _build_template(model_id: str, custom_prompt: Optional[str],
+                    exclude: frozenset[str]) -> RequestTemplate:
+    """Build a template from scratch (registry + prompt composition)."""
+    # pylint: disable=import-outside-toplevel
+    from core.google.client import _convert_tools_for_google
+    from core.tools.registry import get_tool_definitions
+    from telegram.handlers.claude_helpers import \
+        compose_system_prompt_for_provider
+
+    model_config = get_model(model_id)
+    provider = model_config.provider
+
+    tools = get_tool_definitions(exclude=set(exclude), provider=provider)
+    system_prompt = compose_system_prompt_for_provider(
+        provider=provider,
+        global_prompt=get_system_prompt(provider),
+        custom_prompt=custom_prompt)
+
+    if isinstance(system_prompt, list):
+        system_length = sum(len(b.get("text", "")) for b in system_prompt)
+        frozen_system: str | tuple = tuple(system_prompt)
+    else:
+        system_length = len(system_prompt)
+        frozen_system = system_prompt
+
+    google_declarations = None
+    if provider == "google":
+        google_declarations = tuple(_convert_tools_for_google(tools))
+
+    tools_hash = stable_hash(tools)
+    system_hash = stable_hash(system_prompt)
+    content_hash = stable_hash([model_config.model_id, tools_hash, system_hash])
+    # Custom prompts come after the global block, so its cache breakpoint
+    # covers a prefix that is identical for all users of the model
+    prefix_hash = None
+    if isinstance(system_prompt, list) and system_prompt:
+        prefix_hash = stable_hash(
+            [model_config.model_id, tools_hash, system_prompt[0]])
+
+    return RequestTemplate(
+        model_id=model_id,
+        provider=provider,
+        tools=tuple(tools),
+        system_prompt=frozen_system,
+        system_prompt_length=system_length,
+        tools_hash=tools_hash,
+        system_hash=system_hash,
+        content_hash=content_hash,
+        prefix_hash=prefix_hash,
+        google_declarations=google_declarations,
+        prompt_version=_prompt_version,
+    )
+
+
+def get_request_template(model_id: str,
+                         custom_prompt: Optional[str] = None) -> RequestTemplate:
+    """Get precompiled template for model and user custom prompt.
+
+    Args:
+        model_id: Full model ID (e.g., "claude:sonnet").
+        custom_prompt: User's custom system prompt (or None).
+
+    Returns:
+        Cached or newly built RequestTemplate.
+
+    Raises:
+        KeyError: If model_id is not in the registry.
+    """
+    model_config = get_model(model_id)
+    exclude = _excluded_tools(model_config)
+    custom_hash = (hashlib.sha256(custom_prompt.encode("utf-8")).hexdigest()
+                   if custom_prompt else None)
+    # Non-Claude prompts embed the current date
+    date_part = (None if model_config.provider == "claude" else
+                 datetime.now(timezone.utc).strftime("%Y-%m-%d"))
+
+    key = (model_id, model_config.provider, exclude, _prompt_version,
+           custom_hash, date_part)
+
+    template = _templates.get(key)
+    if template is not None:
+        _templates.move_to_end(key)
+        return template
+
+    template = _build_template(model_id, custom_prompt, exclude)
+    _templates[key] = template
+    _templates_by_hash[template.content_hash] = template
+
+    while len(_templates) > MAX_TEMPLATES:
+        _, evicted = _templates.popitem(last=False)
+        _templates_by_hash.pop(evicted.content_hash, None)
+
+    logger.debug("request_templates.built",
+                 model_id=model_id,
+                 provider=template.provider,
+                 tool_count=len(template.tools),
+                 system_length=template.system_prompt_length,
+                 content_hash=template.content_hash)
+    return template
+
+
+def get_template_by_hash(
+        content_hash: Optional[str]) -> Optional[RequestTemplate]:
+    """Look up a live template by its content hash.
+
+    Providers use this to fetch precomputed provider-specific payloads
+    for a request built from a template.
+
+    Args:
+        content_hash: RequestTemplate.content_hash (or None).
+
+    Returns:
+        Template or None if unknown/evicted.
+    """
+    if not content_hash:
+        return None
+    return _templates_by_hash.get(content_hash)
+
+
+def invalidate_request_templates(reason: str) -> None:
+    """Drop all templates and bump the prompt version.
+
+    Called when admin commands change prompt-affecting configuration.
+
+    Args:
+        reason: Short reason for logging (e.g., "set_margin").
+    """
+    global _prompt_version  # pylint: disable=global-statement
+    _prompt_version += 1
+    dropped = len(_templates)
+    _templates.clear()
+    _templates_by_hash.clear()
+    logger.info("request_templates.invalidated",
+                reason=reason,
+                dropped=dropped,
+                prompt_version=_prompt_version)
+
+
+def get_prompt_version() -> int:
+    """Current prompt version (bumped on each invalidation)."""
+    return _prompt_version
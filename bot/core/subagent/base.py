@@ -1,7 +1,7 @@
 """Base class for LLM subagents with tool loop.
 
 This module provides a reusable foundation for creating subagents that:
-- Run Claude API with extended thinking
+- Run Claude API with extended thinking (streamed, prompt-cached)
 - Execute tools in parallel
 - Track costs and charge users
 - Handle iteration limits and cost caps
@@ -19,9 +19,12 @@ from decimal import Decimal
 import json
 from typing import Any, Awaitable, Callable, Optional, TYPE_CHECKING
 
+from core.claude.client import ClaudeProvider
 from core.cost_tracker import CostTracker
-from core.pricing import calculate_claude_cost
 from core.pricing import calculate_e2b_cost
+from core.subagent.request import build_subagent_request
+from core.subagent.request import stream_subagent_response
+from core.subagent.request import track_subagent_usage
 from utils.serialization import serialize_content_block
 from utils.structured_logging import get_logger
 
@@ -55,7 +58,11 @@ class SubagentResult:
 
 @dataclass
 class SubagentConfig:  # pylint: disable=too-many-instance-attributes
-    """Configuration for a subagent."""
+    """Configuration for a subagent.
+
+    effort overrides the effort level on effort-capable models (None keeps
+    the provider default, "high").
+    """
 
     model_id: str
     system_prompt: str
@@ -65,13 +72,14 @@ class SubagentConfig:  # pylint: disable=too-many-instance-attributes
     max_tokens: int = 16000
     cost_cap_usd: Decimal = Decimal("0.50")
     min_balance_usd: Decimal = Decimal("0.50")
+    effort: Optional[str] = None
 
 
 class BaseSubagent(ABC):  # pylint: disable=too-many-instance-attributes
     """Base class for LLM subagents with tool loop.
 
     Provides reusable infrastructure for:
-    - Running Claude API with extended thinking
+    - Running Claude API with extended thinking (streamed, prompt-cached)
     - Executing tools in parallel
     - Tracking costs and charging users
     - Handling iteration limits and cost caps
@@ -107,6 +115,7 @@ class BaseSubagent(ABC):  # pylint: disable=too-many-instance-attributes
         session: 'AsyncSession',
         user_id: int,
         on_tool_start: Optional[Callable[[str], Awaitable[None]]] = None,
+        on_thinking_chunk: Optional[Callable[[str], Awaitable[None]]] = None,
     ):
         """Initialize subagent.
 
@@ -117,6 +126,7 @@ class BaseSubagent(ABC):  # pylint: disable=too-many-instance-attributes
             session: Database session.
             user_id: User ID for billing and logging.
             on_tool_start: Optional callback when a tool starts executing.
+            on_thinking_chunk: Optional callback for streamed thinking.
         """
         self.config = config
         self.client = client
@@ -124,6 +134,9 @@ class BaseSubagent(ABC):  # pylint: disable=too-many-instance-attributes
         self.session = session
         self.user_id = user_id
         self.on_tool_start = on_tool_start
+        self.on_thinking_chunk = on_thinking_chunk
+        # Own provider state, shared HTTP client
+        self._provider = ClaudeProvider(client=client)
 
         self.cost_tracker = CostTracker(
             model_id=config.model_id,
@@ -224,72 +237,28 @@ class BaseSubagent(ABC):  # pylint: disable=too-many-instance-attributes
         return None
 
     async def _call_api(self, messages: list[dict[str, Any]]) -> Any:
-        """Call Claude API with extended thinking."""
-        from config import \
-            get_model_by_provider_id  # pylint: disable=import-outside-toplevel
+        """Stream one Claude API call with extended thinking.
 
-        try:
-            model_config = get_model_by_provider_id("claude",
-                                                    self.config.model_id)
-        except ValueError:
-            model_config = None
-
-        # Adaptive thinking (Opus 4.6) or manual budget
-        thinking_param: dict[str, Any]
-        if model_config and model_config.has_capability("adaptive_thinking"):
-            thinking_param = {"type": "adaptive"}
-            logger.debug("subagent.thinking.adaptive",
-                         model_id=self.config.model_id)
-        else:
-            thinking_param = {
-                "type": "enabled",
-                "budget_tokens": self.config.thinking_budget_tokens
-            }
-
-        api_params: dict[str, Any] = {
-            "model": self.config.model_id,
-            "max_tokens": self.config.max_tokens,
-            "thinking": thinking_param,
-            "system": self.config.system_prompt,
-            "tools": self.config.tools,
-            "messages": messages,
-        }
+        Returns:
+            Final Anthropic message of the iteration.
 
-        # Effort parameter (GA via output_config)
-        if model_config and model_config.has_capability("effort"):
-            api_params["output_config"] = {"effort": "high"}
-            logger.debug("subagent.effort.enabled",
-                         model_id=self.config.model_id,
-                         effort="high")
+        Raises:
+            ValueError: Model is not in the registry.
+        """
+        from config import \
+            get_model_by_provider_id  # pylint: disable=import-outside-toplevel
 
-        return await self.client.messages.create(**api_params)
+        model_config = get_model_by_provider_id("claude", self.config.model_id)
+        request = build_subagent_request(self.config, model_config, messages)
+        return await stream_subagent_response(
+            self._provider,
+            request,
+            source=self._source_name,
+            on_thinking_chunk=self.on_thinking_chunk)
 
     def _track_api_usage(self, response: Any) -> None:
-        """Track API token usage from response."""
-        thinking_tokens = 0
-        if hasattr(response.usage, 'thinking_tokens'):
-            thinking_tokens = response.usage.thinking_tokens or 0
-
-        self.cost_tracker.add_api_usage(
-            input_tokens=response.usage.input_tokens,
-            output_tokens=response.usage.output_tokens,
-            thinking_tokens=thinking_tokens,
-        )
-
-        # Log for monitoring
-        api_cost = calculate_claude_cost(
-            model_id=self.config.model_id,
-            input_tokens=response.usage.input_tokens,
-            output_tokens=response.usage.output_tokens,
-            thinking_tokens=thinking_tokens,
-        )
-        logger.info("claude_handler.user_charged",
-                    model_id=self.config.model_id,
-                    cost_usd=float(api_cost),
-                    input_tokens=response.usage.input_tokens,
-                    output_tokens=response.usage.output_tokens,
-                    thinking_tokens=thinking_tokens,
-                    source=self._source_name)
+        """Track API token usage and prompt cache hits from response."""
+        track_subagent_usage(response, self.cost_tracker, self._source_name)
 
     def _track_web_search_costs(self, response: Any) -> None:
         """Track web_search costs from response."""
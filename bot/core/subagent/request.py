@@ -0,0 +1,160 @@
+"""Request building and streaming for subagent API calls.
+
+Subagents resend the same system prompt and tools on every tool loop
+iteration, followed by a message list that only grows. Requests are built
+with the same cache breakpoints as the main ClaudeProvider path:
+- System prompt block: tools + system prompt form a prefix shared by
+  every run of the subagent, across users
+- Rolling breakpoint on the newest message: the next iteration reads the
+  whole previous iteration from cache and only pays for its own tail
+
+Requests are streamed through ClaudeProvider.stream_events, so thinking
+reaches the UI while an iteration is still running. track_subagent_usage()
+bills each iteration's tokens, including cache reads and writes.
+
+NO __init__.py - use direct import:
+    from core.subagent.request import build_subagent_request
+"""
+
+from typing import Any, Awaitable, Callable, Optional, TYPE_CHECKING
+
+from core.claude.client import ClaudeProvider
+from core.claude.prompt_cache import usage_tokens
+from core.models import LLMRequest
+from core.models import Message
+from core.pricing import calculate_claude_cost
+from utils.metrics import record_subagent_cache_usage
+from utils.structured_logging import get_logger
+
+if TYPE_CHECKING:
+    from config import ModelConfig
+    from core.cost_tracker import CostTracker
+    from core.subagent.base import SubagentConfig
+
+logger = get_logger(__name__)
+
+
+def build_subagent_request(config: 'SubagentConfig',
+                           model_config: 'ModelConfig',
+                           messages: list[dict[str, Any]]) -> LLMRequest:
+    """Build a cache-friendly request for one subagent iteration.
+
+    Thinking mode (adaptive or manual budget) and effort are applied by
+    ClaudeProvider from the model's capabilities; config.effort overrides
+    the default effort level.
+
+    Args:
+        config: Subagent configuration (prompt, tools, limits).
+        model_config: Registry entry of config.model_id.
+        messages: Conversation so far (initial message, then assistant
+            tool calls and user tool results).
+
+    Returns:
+        LLMRequest for ClaudeProvider.stream_events.
+    """
+    system_prompt = [{
+        "type": "text",
+        "text": config.system_prompt,
+        "cache_control": {
+            "type": "ephemeral"
+        }
+    }]
+    return LLMRequest(
+        messages=[
+            Message(role=msg["role"], content=msg["content"])
+            for msg in messages
+        ],
+        system_prompt=system_prompt,
+        model=model_config.get_full_id(),
+        max_tokens=config.max_tokens,
+        tools=config.tools or None,
+        thinking_budget=config.thinking_budget_tokens,
+        cache_breakpoint_index=len(messages) - 1,
+        effort=config.effort,
+    )
+
+
+async def stream_subagent_response(
+    provider: ClaudeProvider,
+    request: LLMRequest,
+    source: str,
+    on_thinking_chunk: Optional[Callable[[str], Awaitable[None]]] = None,
+) -> Any:
+    """Stream one subagent iteration and return the final message.
+
+    Args:
+        provider: Provider owned by the subagent (per-request state such
+            as last_usage must not be shared with the main tool loop).
+        request: Request from build_subagent_request().
+        source: Subagent name (logging).
+        on_thinking_chunk: Optional callback for thinking deltas.
+
+    Returns:
+        Complete Anthropic message (content, stop_reason, usage).
+
+    Raises:
+        RuntimeError: Stream ended without a final message.
+    """
+    final_message = None
+    async for event in provider.stream_events(request):
+        if event.type == "thinking_delta" and on_thinking_chunk:
+            try:
+                await on_thinking_chunk(event.content)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.warning(f"{source}.on_thinking_chunk_failed",
+                               error=str(e))
+        elif event.type == "stream_complete":
+            final_message = event.final_message
+
+    if final_message is None:
+        raise RuntimeError("Stream ended without a final message")
+    return final_message
+
+
+def track_subagent_usage(response: Any,
+                         cost_tracker: 'CostTracker',
+                         source: str,
+                         model_label: Optional[str] = None) -> None:
+    """Track token usage and prompt cache hits of one subagent iteration.
+
+    Args:
+        response: Final message from stream_subagent_response().
+        cost_tracker: Tracker billed for the tokens (its model_id sets
+            the pricing).
+        source: Subagent name (metrics and logging).
+        model_label: Model name in the user_charged log (Grafana);
+            defaults to the tracker's model_id.
+    """
+    usage = response.usage
+    thinking_tokens = usage_tokens(usage, "thinking_tokens")
+    cache_read = usage_tokens(usage, "cache_read_input_tokens")
+    cache_creation = usage_tokens(usage, "cache_creation_input_tokens")
+
+    cost_tracker.add_api_usage(
+        input_tokens=usage.input_tokens,
+        output_tokens=usage.output_tokens,
+        thinking_tokens=thinking_tokens,
+        cache_read_tokens=cache_read,
+        cache_creation_tokens=cache_creation,
+    )
+    record_subagent_cache_usage(source, cache_read, cache_creation,
+                                usage.input_tokens)
+
+    # Log for monitoring
+    api_cost = calculate_claude_cost(
+        model_id=cost_tracker.model_id,
+        input_tokens=usage.input_tokens,
+        output_tokens=usage.output_tokens,
+        thinking_tokens=thinking_tokens,
+        cache_read_tokens=cache_read,
+        cache_creation_5m_tokens=cache_creation,
+    )
+    logger.info("claude_handler.user_charged",
+                model_id=model_label or cost_tracker.model_id,
+                cost_usd=float(api_cost),
+                input_tokens=usage.input_tokens,
+                output_tokens=usage.output_tokens,
+                thinking_tokens=thinking_tokens,
+                cache_read=cache_read,
+                cache_creation=cache_creation,
+                source=source)
@@ -49,6 +49,8 @@ class ToolConfig:  # pylint: disable=too-many-instance-attributes
     - Runtime requirements (needs_bot_session)
     - Result formatting
     - File type validation
+    - Speculative execution (prepare hook, read_only)
+    - Bulkhead limits (max_concurrent, max_concurrent_per_user, max_queue)
 
     When adding a new tool, create a ToolConfig instance in the tool module
     and import it into the registry. This eliminates the need to update
@@ -64,6 +66,18 @@ class ToolConfig:  # pylint: disable=too-many-instance-attributes
         is_server_side: Whether this is a server-side tool (managed by Anthropic).
         file_id_param: Parameter name containing claude_file_id (for validation).
         allowed_mime_prefixes: List of allowed MIME type prefixes (e.g., ["image/"]).
+        prepare: Optional async warm-up run while the model is still
+            streaming: prepare(tool_input, bot=, session=, thread_id=).
+            Must be idempotent and safe to cancel (file prefetch, sandbox
+            lease); its result is discarded.
+        read_only: Executor has no side effects and no cost, so it may run
+            in full before the model finishes its turn.
+        max_concurrent: Calls running at once across all users (sandboxes,
+            subprocesses, external quotas). None = unlimited.
+        max_concurrent_per_user: Calls running at once for one user.
+            None = unlimited.
+        max_queue: Calls allowed to wait for a slot; further calls fail
+            immediately with a tool error. None = unbounded.
 
     Examples:
         >>> config = ToolConfig(
@@ -93,6 +107,11 @@ class ToolConfig:  # pylint: disable=too-many-instance-attributes
     file_id_param: Optional[str] = None  # Parameter with claude_file_id
     allowed_mime_prefixes: list[str] = field(default_factory=list)
     providers: set[str] = field(default_factory=lambda: {"claude", "google"})
+    prepare: Optional[Callable] = None
+    read_only: bool = False
+    max_concurrent: Optional[int] = None
+    max_concurrent_per_user: Optional[int] = None
+    max_queue: Optional[int] = None
 
     def __post_init__(self) -> None:
         """Validate configuration after initialization."""
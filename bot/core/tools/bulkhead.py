@@ -0,0 +1,262 @@
+"""Per-tool bulkheads: concurrency limits and load shedding for tools.
+
+ToolExecutor runs every tool of a batch at once. Without limits one heavy
+user can hold every E2B sandbox, pdflatex thread or image quota slot the
+bot has. Each tool gets its own bulkhead configured on its ToolConfig:
+- max_concurrent: slots shared by all users
+- max_concurrent_per_user: slots one user may hold; the per-user slot is
+  taken first, so a user's surplus calls queue behind each other instead
+  of filling the shared queue. This wait is never shed: the user's own
+  calls may legitimately run for a long time
+- max_queue: calls allowed to wait for a shared slot; beyond that calls
+  are shed immediately
+- TOOL_QUEUE_TIMEOUT: calls waiting longer for a shared slot are shed
+
+Shed calls raise ToolOverloaded; ToolExecutor turns it into a tool error
+so the model can tell the user or continue without the tool. Tools
+without limits pass through untouched.
+
+NO __init__.py - use direct import:
+    from core.tools.bulkhead import get_tool_bulkhead, ToolOverloaded
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+import time
+from typing import AsyncIterator, Optional, TYPE_CHECKING
+
+from config import TOOL_QUEUE_TIMEOUT
+from utils.metrics import record_tool_queue_wait
+from utils.metrics import record_tool_shed
+from utils.metrics import set_tool_active
+from utils.structured_logging import get_logger
+
+if TYPE_CHECKING:
+    from core.tools.base import ToolConfig
+
+logger = get_logger(__name__)
+
+
+class ToolOverloaded(Exception):
+    """Raised when a tool call is shed by its bulkhead.
+
+    Attributes:
+        tool_name: Tool whose bulkhead rejected the call.
+        reason: "queue_full" (shared queue full) or "timeout" (waited too
+            long for a shared slot).
+        wait_time: Seconds waited before the call was shed.
+    """
+
+    def __init__(self, tool_name: str, reason: str, wait_time: float) -> None:
+        """Initialize exception.
+
+        Args:
+            tool_name: Tool name.
+            reason: queue_full or timeout.
+            wait_time: Seconds waited.
+        """
+        self.tool_name = tool_name
+        self.reason = reason
+        self.wait_time = wait_time
+        super().__init__(f"Tool {tool_name} is overloaded ({reason}, "
+                         f"waited {wait_time:.1f}s)")
+
+
+@dataclass
+class _Lane:
+    """Slots of one bulkhead (a tool, or a tool for one user).
+
+    Attributes:
+        semaphore: Limits calls running at once.
+        active: Calls holding a slot.
+        waiting: Calls waiting for a slot.
+    """
+
+    semaphore: asyncio.Semaphore
+    active: int = 0
+    waiting: int = 0
+
+
+class ToolBulkhead:
+    """Per-tool global and per-user concurrency limits.
+
+    Example:
+        async with get_tool_bulkhead().acquire(config, user_id) as waited:
+            result = await execute_tool(...)
+
+    All state changes happen between awaits on the event loop thread, so no
+    lock is needed.
+    """
+
+    def __init__(self, queue_timeout: float = TOOL_QUEUE_TIMEOUT) -> None:
+        """Initialize bulkhead.
+
+        Args:
+            queue_timeout: Maximum seconds a call waits for a shared slot.
+        """
+        self._queue_timeout = queue_timeout
+        self._tools: dict[str, _Lane] = {}
+        self._users: dict[tuple[str, int], _Lane] = {}
+
+    def _lanes(self, config: "ToolConfig",
+               user_id: int) -> list[tuple[Optional[tuple[str, int]], _Lane]]:
+        """Lanes a call must pass, per-user lane first."""
+        lanes: list[tuple[Optional[tuple[str, int]], _Lane]] = []
+        if config.max_concurrent_per_user is not None:
+            key = (config.name, user_id)
+            if key not in self._users:
+                self._users[key] = _Lane(
+                    semaphore=asyncio.Semaphore(config.max_concurrent_per_user))
+            lanes.append((key, self._users[key]))
+        if config.max_concurrent is not None:
+            if config.name not in self._tools:
+                self._tools[config.name] = _Lane(
+                    semaphore=asyncio.Semaphore(config.max_concurrent))
+            lanes.append((None, self._tools[config.name]))
+        return lanes
+
+    def _forget_idle(self, key: Optional[tuple[str, int]], lane: _Lane) -> None:
+        """Drop per-user lanes nobody uses (one per user would pile up)."""
+        if key is not None and lane.active == 0 and lane.waiting == 0:
+            self._users.pop(key, None)
+
+    def _shed(self, config: "ToolConfig", user_id: int, reason: str,
+              wait_time: float) -> ToolOverloaded:
+        """Record a shed call and build its exception."""
+        record_tool_shed(config.name, reason)
+        logger.warning(
+            "tool_bulkhead.shed",
+            tool_name=config.name,
+            user_id=user_id,
+            reason=reason,
+            wait_time_ms=round(wait_time * 1000),
+        )
+        return ToolOverloaded(config.name, reason, wait_time)
+
+    @asynccontextmanager
+    async def acquire(self, config: "ToolConfig",
+                      user_id: int) -> AsyncIterator[float]:
+        """Hold the tool's slots for the duration of the block.
+
+        Args:
+            config: Tool configuration with bulkhead limits.
+            user_id: Telegram user ID.
+
+        Yields:
+            Seconds waited for the slots.
+
+        Raises:
+            ToolOverloaded: Shared queue full, or no shared slot within the
+                queue timeout.
+        """
+        lanes = self._lanes(config, user_id)
+        if not lanes:
+            yield 0.0
+            return
+
+        wait_start = time.monotonic()
+        acquired: list[tuple[Optional[tuple[str, int]], _Lane]] = []
+        try:
+            for key, lane in lanes:
+                if key is not None:
+                    # Per-user lane: waits behind the user's own calls only
+                    await self._take(lane, timeout=None)
+                else:
+                    if (config.max_queue is not None and
+                            lane.semaphore.locked() and
+                            lane.waiting >= config.max_queue):
+                        raise self._shed(config, user_id, "queue_full",
+                                         time.monotonic() - wait_start)
+                    await self._take(lane, timeout=self._queue_timeout)
+                lane.active += 1
+                acquired.append((key, lane))
+        except BaseException as exc:
+            # Shed, timeout or cancellation: give back what was already taken
+            self._release(config.name, acquired)
+            for key, lane in lanes:
+                self._forget_idle(key, lane)
+            if isinstance(exc, asyncio.TimeoutError):
+                raise self._shed(config, user_id, "timeout",
+                                 time.monotonic() - wait_start) from exc
+            raise
+
+        wait_time = time.monotonic() - wait_start
+        record_tool_queue_wait(config.name, wait_time)
+        if tool_lane := self._tools.get(config.name):
+            set_tool_active(config.name, tool_lane.active)
+        if wait_time >= 1.0:
+            logger.info(
+                "tool_bulkhead.queued",
+                tool_name=config.name,
+                user_id=user_id,
+                wait_time_ms=round(wait_time * 1000),
+            )
+
+        try:
+            yield wait_time
+        finally:
+            self._release(config.name, acquired)
+
+    @staticmethod
+    async def _take(lane: _Lane, timeout: Optional[float]) -> None:
+        """Take a slot of the lane, waiting up to timeout (None: no limit).
+
+        Raises:
+            asyncio.TimeoutError: No slot within timeout.
+        """
+        if not lane.semaphore.locked():
+            # Free slot: take it without yielding, so calls arriving
+            # together see each other in the queue_full check
+            await lane.semaphore.acquire()
+            return
+        lane.waiting += 1
+        try:
+            if timeout is None:
+                await lane.semaphore.acquire()
+            else:
+                await asyncio.wait_for(lane.semaphore.acquire(),
+                                       timeout=timeout)
+        finally:
+            lane.waiting -= 1
+
+    def _release(
+            self, tool_name: str,
+            acquired: list[tuple[Optional[tuple[str, int]], _Lane]]) -> None:
+        """Release held slots (reverse order of acquisition)."""
+        for key, lane in reversed(acquired):
+            lane.semaphore.release()
+            lane.active -= 1
+            self._forget_idle(key, lane)
+        if acquired and (tool_lane := self._tools.get(tool_name)):
+            set_tool_active(tool_name, tool_lane.active)
+        acquired.clear()
+
+    def get_stats(self) -> dict:
+        """Get bulkhead statistics.
+
+        Returns:
+            Dict of tool name -> active/waiting counts.
+        """
+        return {
+            name: {
+                "active": lane.active,
+                "waiting": lane.waiting
+            } for name, lane in self._tools.items()
+        }
+
+
+# Global singleton instance
+_bulkhead: ToolBulkhead | None = None
+
+
+def get_tool_bulkhead() -> ToolBulkhead:
+    """Get or create the global bulkhead instance.
+
+    Returns:
+        ToolBulkhead singleton.
+    """
+    global _bulkhead  # pylint: disable=global-statement
+    if _bulkhead is None:
+        _bulkhead = ToolBulkhead()
+    return _bulkhead
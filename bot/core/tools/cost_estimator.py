@@ -8,13 +8,20 @@ expensive tool calls, preventing users from going into large negative
 balance.
 
 Simple rule: If balance < 0, reject all paid tool calls.
+
+estimate_generation_cost() sizes the balance reservation held while an
+LLM generation runs (services/balance_policy.py).
 """
 
 from decimal import Decimal
-from typing import Any, Optional
+from typing import Any, Optional, TYPE_CHECKING
 
+from config import BALANCE_RESERVATION_OUTPUT_TOKENS
 from core.pricing import E2B_COST_PER_SECOND
 
+if TYPE_CHECKING:
+    from config import ModelConfig
+
 # Tools that have API costs (external or Claude)
 # If user balance < 0, these tools are blocked
 PAID_TOOLS: set[str] = {
@@ -95,3 +102,26 @@ def estimate_tool_cost(
     # Claude API cost depends on response tokens
     # Can't estimate upfront, actual cost calculated after call
     return None
+
+
+def estimate_generation_cost(
+    model_config: "ModelConfig",
+    input_tokens: int,
+    output_tokens: int = BALANCE_RESERVATION_OUTPUT_TOKENS,
+) -> Decimal:
+    """Estimate the cost of one LLM generation for a balance reservation.
+
+    Uncached input price (upper bound for the prompt) plus a typical
+    output length; tool calls are charged separately.
+
+    Args:
+        model_config: Model being called.
+        input_tokens: Estimated context tokens.
+        output_tokens: Output tokens to budget for.
+
+    Returns:
+        Estimated cost in USD.
+    """
+    cost = (Decimal(input_tokens) * Decimal(str(model_config.pricing_input)) +
+            Decimal(output_tokens) * Decimal(str(model_config.pricing_output)))
+    return cost / 1_000_000
@@ -17,6 +17,7 @@ from typing import Any, Dict, TYPE_CHECKING
 
 from cache.exec_cache import delete_exec_file
 from cache.exec_cache import get_exec_file
+from cache.exec_cache import get_exec_file_view
 from cache.exec_cache import get_exec_meta
 from utils.structured_logging import get_logger
 
@@ -139,8 +140,13 @@ async def deliver_file(
                           "Use execute_python/render_latex to regenerate."),
             }
 
-        # Step 2: Get file content from cache
-        content = await get_exec_file(temp_id)
+        # Step 2: Get file content from cache. Non-images are passed to
+        # the handler as an mmap view (streamed to Files API without a
+        # copy); images need bytes for the downscale process pool.
+        if metadata["mime_type"].startswith("image/"):
+            content = await get_exec_file(temp_id)
+        else:
+            content = await get_exec_file_view(temp_id)
         if content is None:
             logger.info("tools.deliver_file.content_not_found", temp_id=temp_id)
             return {
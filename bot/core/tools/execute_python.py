@@ -706,6 +706,35 @@ def format_execute_python_result(
         return f"[❌ Ошибка выполнения: {preview}]"
 
 
+async def prepare_execute_python(tool_input: Dict[str, Any],
+                                 bot: 'Bot',
+                                 session: 'AsyncSession',
+                                 thread_id: Optional[int] = None) -> None:
+    """Warm up an execute_python call while the model is still streaming.
+
+    Downloads file_inputs into the file cache and extends the thread's
+    sandbox lease, so execution finds both ready. Creates nothing that
+    costs money; safe to repeat or abandon.
+
+    Args:
+        tool_input: Complete tool input from the model.
+        bot: Telegram Bot instance for downloading user files.
+        session: Database session for querying file metadata.
+        thread_id: Thread ID (sandbox cache key).
+    """
+    # pylint: disable=import-outside-toplevel
+    from cache.sandbox_cache import refresh_sandbox_ttl
+    from core.file_manager import FileManager
+
+    if thread_id:
+        await refresh_sandbox_ttl(thread_id)
+
+    file_inputs = tool_input.get("file_inputs")
+    if file_inputs:
+        await FileManager(bot, session).download_many_by_claude_id(
+            file_inputs, use_cache=True)
+
+
 # Unified tool configuration
 # Import here to avoid circular dependencies at module level
 from core.tools.base import ToolConfig  # pylint: disable=wrong-import-position
@@ -717,4 +746,9 @@ TOOL_CONFIG = ToolConfig(
     emoji="🐍",
     needs_bot_session=True,
     format_result=format_execute_python_result,
+    prepare=prepare_execute_python,
+    # E2B plan caps concurrent sandboxes
+    max_concurrent=20,
+    max_concurrent_per_user=3,
+    max_queue=40,
 )
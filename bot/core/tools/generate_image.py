@@ -485,4 +485,8 @@ TOOL_CONFIG = ToolConfig(
     emoji="🎨",
     needs_bot_session=True,
     format_result=format_generate_image_result,
+    # Gemini image quota is shared by all users
+    max_concurrent=10,
+    max_concurrent_per_user=2,
+    max_queue=30,
 )
@@ -128,4 +128,5 @@ TOOL_CONFIG = ToolConfig(
     executor=list_files,
     emoji="\U0001f4cb",  # clipboard
     needs_bot_session=True,
+    read_only=True,
 )
@@ -777,6 +777,28 @@ def format_preview_file_result(
     return f"[❌ Preview failed: {error}]"
 
 
+async def prepare_preview_file(
+        tool_input: Dict[str, Any],
+        bot: 'Bot',
+        session: 'AsyncSession',
+        thread_id: int | None = None,  # pylint: disable=unused-argument
+) -> None:
+    """Fetch the previewed file into the cache while the model streams.
+
+    Args:
+        tool_input: Complete tool input from the model.
+        bot: Telegram bot instance.
+        session: Database session.
+        thread_id: Thread ID (unused, for interface consistency).
+    """
+    from core.file_manager import \
+        FileManager  # pylint: disable=import-outside-toplevel
+
+    file_id = tool_input.get("file_id")
+    if file_id:
+        await FileManager(bot, session).get_file_content(file_id)
+
+
 # Unified tool configuration
 from core.tools.base import ToolConfig
 
@@ -787,4 +809,5 @@ TOOL_CONFIG = ToolConfig(
     emoji="👁️",
     needs_bot_session=True,
     format_result=format_preview_file_result,
+    prepare=prepare_preview_file,
 )
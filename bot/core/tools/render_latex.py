@@ -547,4 +547,8 @@ TOOL_CONFIG = ToolConfig(
     emoji="📐",
     needs_bot_session=True,
     format_result=format_render_latex_result,
+    # pdflatex runs in the default thread pool shared by the whole bot
+    max_concurrent=4,
+    max_concurrent_per_user=2,
+    max_queue=20,
 )
@@ -25,15 +25,20 @@ NO __init__.py - use direct import:
 """
 
 import asyncio
+from dataclasses import replace
 from decimal import Decimal
 import json
 from typing import Any, Awaitable, Callable, Optional, TYPE_CHECKING
 
 # AsyncAnthropic client obtained from provider factory
 from config import get_model
+from core.claude.client import ClaudeProvider
 from core.cost_tracker import CostTracker as BaseCostTracker
-from core.pricing import calculate_claude_cost
 from core.pricing import calculate_e2b_cost
+from core.subagent.base import SubagentConfig
+from core.subagent.request import build_subagent_request
+from core.subagent.request import stream_subagent_response
+from core.subagent.request import track_subagent_usage
 # Import tool definitions from existing modules (DRY - don't duplicate)
 from core.tools.analyze_image import ANALYZE_IMAGE_TOOL
 from core.tools.analyze_pdf import ANALYZE_PDF_TOOL
@@ -517,6 +522,7 @@ async def execute_self_critique(  # pylint: disable=too-many-return-statements
     on_subagent_tool: Optional[Callable[[str], Awaitable[None]]] = None,
     anthropic_client: Optional[Any] = None,
     cancel_event: Optional[asyncio.Event] = None,
+    on_thinking_chunk: Optional[Callable[[str], Awaitable[None]]] = None,
 ) -> dict[str, Any]:
     """Execute critical self-verification subagent.
 
@@ -544,6 +550,8 @@ async def execute_self_critique(  # pylint: disable=too-many-return-statements
             Useful for testing and custom client configurations.
         cancel_event: Optional asyncio.Event for cancellation.
             If set, subagent will stop and return partial results.
+        on_thinking_chunk: Optional callback for the subagent's thinking
+            deltas, streamed while an iteration is still running.
 
     Returns:
         Structured verification result with verdict, issues, recommendations.
@@ -604,7 +612,18 @@ async def execute_self_critique(  # pylint: disable=too-many-return-statements
     else:
         logger.debug("self_critique.client_injected", user_id=user_id)
 
-    # 5. Run subagent tool loop
+    # 5. Run subagent tool loop (streamed, with prompt cache breakpoints)
+    provider = ClaudeProvider(client=client)
+    config = SubagentConfig(
+        model_id=model_config.model_id,
+        system_prompt=CRITICAL_REVIEWER_SYSTEM_PROMPT,
+        tools=SUBAGENT_TOOLS + [WEB_SEARCH_TOOL, WEB_FETCH_TOOL],
+        max_iterations=MAX_SUBAGENT_ITERATIONS,
+        thinking_budget_tokens=THINKING_BUDGET_TOKENS,
+        max_tokens=16000,
+        cost_cap_usd=MAX_COST_USD,
+        min_balance_usd=MIN_BALANCE_FOR_CRITIQUE,
+    )
     messages: list[dict[str, Any]] = [{
         "role": "user",
         "content": verification_context
@@ -636,22 +655,13 @@ async def execute_self_critique(  # pylint: disable=too-many-return-statements
                      message_count=len(messages))
 
         # Call Claude API with extended thinking
-        # Opus 4.6: adaptive thinking + effort; others: manual budget
-        thinking_params: dict = {"type": "adaptive"} \
-            if model_config.has_capability("adaptive_thinking") \
-            else {"type": "enabled", "budget_tokens": THINKING_BUDGET_TOKENS}
-        extra_params: dict = {}
-        if model_config.has_capability("adaptive_thinking"):
-            extra_params["output_config"] = {"effort": "high"}
+        # (thinking mode and effort come from the model's capabilities)
         try:
-            response = await client.messages.create(
-                model=model_config.model_id,
-                max_tokens=16000,
-                thinking=thinking_params,
-                system=CRITICAL_REVIEWER_SYSTEM_PROMPT,
-                tools=SUBAGENT_TOOLS + [WEB_SEARCH_TOOL, WEB_FETCH_TOOL],
-                messages=messages,
-                **extra_params)
+            response = await stream_subagent_response(
+                provider,
+                build_subagent_request(config, model_config, messages),
+                source="self_critique",
+                on_thinking_chunk=on_thinking_chunk)
         except Exception as api_error:
             logger.error("self_critique.api_error",
                          user_id=user_id,
@@ -667,29 +677,10 @@ async def execute_self_critique(  # pylint: disable=too-many-return-statements
             }
 
         # Track token costs
-        thinking_tokens = 0
-        if hasattr(response.usage, 'thinking_tokens'):
-            thinking_tokens = response.usage.thinking_tokens or 0
-
-        cost_tracker.add_api_usage(input_tokens=response.usage.input_tokens,
-                                   output_tokens=response.usage.output_tokens,
-                                   thinking_tokens=thinking_tokens)
-
-        # Log for Grafana (appears in Anthropic panel)
-        # Calculate cost for this API call
-        api_cost = calculate_claude_cost(
-            model_id=model_config.model_id,
-            input_tokens=response.usage.input_tokens,
-            output_tokens=response.usage.output_tokens,
-            thinking_tokens=thinking_tokens,
-        )
-        logger.info("claude_handler.user_charged",
-                    model_id="claude:opus",
-                    cost_usd=float(api_cost),
-                    input_tokens=response.usage.input_tokens,
-                    output_tokens=response.usage.output_tokens,
-                    thinking_tokens=thinking_tokens,
-                    source="self_critique")
+        track_subagent_usage(response,
+                             cost_tracker,
+                             "self_critique",
+                             model_label=VERIFICATION_MODEL_ID)
 
         # Check cost cap - stop if we're getting too expensive
         current_cost = cost_tracker.calculate_total_cost()
@@ -880,31 +871,23 @@ async def execute_self_critique(  # pylint: disable=too-many-return-statements
 
     try:
         # Final API call without tools - forces model to return verdict
-        # Opus 4.6: adaptive thinking; others: minimal manual budget
-        final_thinking: dict = {"type": "adaptive"} \
-            if model_config.has_capability("adaptive_thinking") \
-            else {"type": "enabled", "budget_tokens": 2000}
-        final_extra: dict = {}
-        if model_config.has_capability("adaptive_thinking"):
-            final_extra["output_config"] = {"effort": "low"}
-        final_response = await client.messages.create(
-            model=model_config.model_id,
-            max_tokens=4000,  # Smaller - just need JSON verdict
-            thinking=final_thinking,
-            system=CRITICAL_REVIEWER_SYSTEM_PROMPT,
-            tools=[],  # No tools - must return text
-            messages=messages,
-            **final_extra)
+        # Smaller output, low effort / minimal budget - just need JSON verdict
+        final_config = replace(config,
+                               tools=[],
+                               max_tokens=4000,
+                               thinking_budget_tokens=2000,
+                               effort="low")
+        final_response = await stream_subagent_response(
+            provider,
+            build_subagent_request(final_config, model_config, messages),
+            source="self_critique",
+            on_thinking_chunk=on_thinking_chunk)
 
         # Track final API usage
-        thinking_tokens = 0
-        if hasattr(final_response.usage, 'thinking_tokens'):
-            thinking_tokens = final_response.usage.thinking_tokens or 0
-
-        cost_tracker.add_api_usage(
-            input_tokens=final_response.usage.input_tokens,
-            output_tokens=final_response.usage.output_tokens,
-            thinking_tokens=thinking_tokens)
+        track_subagent_usage(final_response,
+                             cost_tracker,
+                             "self_critique",
+                             model_label=VERIFICATION_MODEL_ID)
 
         # Extract result text
         result_text = ""
@@ -237,4 +237,8 @@ TOOL_CONFIG = ToolConfig(
     emoji="🎤",
     needs_bot_session=True,
     format_result=format_transcribe_audio_result,
+    # Whisper uploads hold the whole file in memory
+    max_concurrent=8,
+    max_concurrent_per_user=2,
+    max_queue=20,
 )
@@ -5,12 +5,14 @@ management utilities for use throughout the bot application.
 """
 
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator, Optional
+from typing import AsyncGenerator, Callable, Optional
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
 from utils.structured_logging import get_logger
 
 logger = get_logger(__name__)
@@ -19,6 +21,9 @@ logger = get_logger(__name__)
 _engine: Optional[AsyncEngine] = None
 _session_factory: Optional[async_sessionmaker[AsyncSession]] = None
 
+# Session.info key for callbacks waiting on the current transaction
+_AFTER_COMMIT_KEY = "after_commit_callbacks"
+
 
 def init_db(database_url: str, echo: bool = False) -> None:
     """Initialize database engine and session factory.
@@ -166,3 +171,33 @@ def get_pool_stats() -> dict:
         "pool_size": pool.size(),
         "max_overflow": pool._max_overflow,
     }
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """Run callback once the session's current transaction commits.
+
+    Used for side effects that must not happen for rolled-back work
+    (e.g. Prometheus counters of created rows). Callbacks are dropped if
+    the transaction rolls back.
+
+    Args:
+        session: Session whose transaction the callback waits for.
+        callback: Synchronous callable, run after COMMIT.
+    """
+    session.sync_session.info.setdefault(_AFTER_COMMIT_KEY, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session) -> None:
+    """Run callbacks registered by after_commit()."""
+    for callback in session.info.pop(_AFTER_COMMIT_KEY, []):
+        try:
+            callback()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.warning("after_commit_callback_failed", error=str(e))
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_after_commit(session: Session) -> None:
+    """Forget callbacks of a rolled-back transaction."""
+    session.info.pop(_AFTER_COMMIT_KEY, None)
@@ -18,12 +18,159 @@ from db.models.message import Message
 from db.models.message import MessageRole
 from db.repositories.base import BaseRepository
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from utils.structured_logging import get_logger
 
 logger = get_logger(__name__)
 
 
+def _attachment_flags(attachments: list[dict]) -> dict:
+    """Denormalized attachment flags (has_photos, attachment_count, ...)."""
+    types_ = {att.get("type") for att in attachments}
+    return {
+        "has_photos": "photo" in types_,
+        "has_documents": "document" in types_,
+        "has_voice": "voice" in types_,
+        "has_video": "video" in types_,
+        "attachment_count": len(attachments),
+    }
+
+
+def _dialect_insert(session: AsyncSession):
+    """INSERT construct with ON CONFLICT support for the session's database.
+
+    PostgreSQL in production; SQLite in tests.
+    """
+    if session.get_bind().dialect.name == "sqlite":
+        return sqlite_insert
+    return pg_insert
+
+
+def trim_to_latest_compaction(messages: Sequence[Message]) -> list[Message]:
+    """Drop history older than the latest compaction boundary.
+
+    A compaction_summary on an assistant message covers everything before
+    the user message it answered. That user message is kept so history
+    still starts with a user turn.
+
+    Args:
+        messages: Messages ordered by date ASC.
+
+    Returns:
+        Messages starting from the latest compaction boundary (or all
+        messages if none were compacted).
+    """
+    for idx in range(len(messages) - 1, -1, -1):
+        msg = messages[idx]
+        if msg.compaction_summary and msg.role == MessageRole.ASSISTANT:
+            return list(messages[max(idx - 1, 0):])
+    return list(messages)
+
+
+# Optional formatter inputs stored in compact history entries when set.
+# Thinking blocks and attachment metadata are left out: the formatter
+# never sends them back to the model.
+_HISTORY_CONTEXT_FIELDS = (
+    "caption",
+    "compaction_summary",
+    "sender_display",
+    "forward_origin",
+    "reply_snippet",
+    "reply_sender_display",
+    "quote_data",
+    "edit_count",
+)
+
+
+class CachedMessage:
+    """Read-only history record rebuilt from the messages cache.
+
+    Lightweight stand-in for Message in LLM context building: exposes the
+    attributes ContextFormatter and compaction read, without SQLAlchemy
+    instrumentation. Thinking blocks are not loaded.
+    """
+
+    __slots__ = (
+        "chat_id",
+        "message_id",
+        "thread_id",
+        "from_user_id",
+        "date",
+        "role",
+        "text_content",
+    ) + _HISTORY_CONTEXT_FIELDS
+
+    def __init__(self, data: dict) -> None:
+        """Initialize from a cached history entry.
+
+        Args:
+            data: Entry from history_cache_entries() or an appended
+                message dict. Unknown keys (e.g. thinking_blocks in
+                entries cached by older versions) are ignored.
+        """
+        self.chat_id = data.get("chat_id", 0)
+        self.message_id = data.get("message_id", 0)
+        self.thread_id = data.get("thread_id")
+        self.from_user_id = data.get("from_user_id")
+        self.date = data["date"]
+        self.role = MessageRole(data["role"])
+        self.text_content = data.get("text_content")
+        self.caption = data.get("caption")
+        self.compaction_summary = data.get("compaction_summary")
+        self.sender_display = data.get("sender_display")
+        self.forward_origin = data.get("forward_origin")
+        self.reply_snippet = data.get("reply_snippet")
+        self.reply_sender_display = data.get("reply_sender_display")
+        self.quote_data = data.get("quote_data")
+        self.edit_count = data.get("edit_count") or 0
+
+
+def history_cache_entries(messages: Sequence[Message]) -> list[dict]:
+    """Serialize LLM context history for the thread messages cache.
+
+    Entries are compact: role, text, ids and date, plus formatter context
+    fields only when set.
+
+    Args:
+        messages: Messages ordered by date ASC.
+
+    Returns:
+        List of dicts in the format read by CachedMessage.
+    """
+    entries = []
+    for msg in messages:
+        entry = {
+            "role": msg.role.value,
+            "text_content": msg.text_content,
+            "message_id": msg.message_id,
+            "chat_id": msg.chat_id,
+            "thread_id": msg.thread_id,
+            "date": msg.date,
+        }
+        if msg.from_user_id is not None:
+            entry["from_user_id"] = msg.from_user_id
+        for field in _HISTORY_CONTEXT_FIELDS:
+            value = getattr(msg, field, None)
+            if value:
+                entry[field] = value
+        entries.append(entry)
+    return entries
+
+
+def history_from_cache(entries: list[dict]) -> list[CachedMessage]:
+    """Rebuild history records from cached entries.
+
+    Args:
+        entries: Cached history entries ordered by date ASC.
+
+    Returns:
+        CachedMessage records.
+    """
+    return [CachedMessage(data) for data in entries]
+
+
 class MessageRepository(BaseRepository[Message]):
     """Repository for Message model operations.
 
@@ -129,14 +276,6 @@ class MessageRepository(BaseRepository[Message]):
         """
         attachments = attachments or []
 
-        # Calculate denormalized flags
-        has_photos = any(att.get("type") == "photo" for att in attachments)
-        has_documents = any(
-            att.get("type") == "document" for att in attachments)
-        has_voice = any(att.get("type") == "voice" for att in attachments)
-        has_video = any(att.get("type") == "video" for att in attachments)
-        attachment_count = len(attachments)
-
         message = Message(
             chat_id=chat_id,
             message_id=message_id,
@@ -157,11 +296,7 @@ class MessageRepository(BaseRepository[Message]):
             edit_count=0,  # New messages have no edits
             original_content=None,  # Set on first edit
             media_group_id=media_group_id,
-            has_photos=has_photos,
-            has_documents=has_documents,
-            has_voice=has_voice,
-            has_video=has_video,
-            attachment_count=attachment_count,
+            **_attachment_flags(attachments),
             attachments=attachments,
             thinking_blocks=thinking_blocks,  # Phase 1.4.3: Extended Thinking
             model_id=model_id,  # LLM model for assistant messages
@@ -269,6 +404,7 @@ class MessageRepository(BaseRepository[Message]):
         thread_id: int,
         limit: Optional[int] = None,
         offset: int = 0,
+        since_compaction: bool = False,
     ) -> list[Message]:
         """Get conversation history for LLM context.
 
@@ -285,57 +421,33 @@ class MessageRepository(BaseRepository[Message]):
             thread_id: Internal thread ID.
             limit: Max number of RECENT messages. None = all. Defaults to None.
             offset: Number of messages to skip from the end. Defaults to 0.
+            since_compaction: Start from the latest compaction boundary
+                (see trim_to_latest_compaction). Defaults to False.
 
         Returns:
-            List of Message instances ordered by date ASC.
+            List of Message instances ordered by date ASC (CachedMessage
+            records when served from cache).
         """
         # Phase 3.2: Check cache for full message history (no limit/offset)
         # Only cache full history to avoid complexity
-        if limit is None and offset == 0:
+        if limit is None and offset == 0 and not since_compaction:
             cached = await get_cached_messages(thread_id)
             if cached:
-                # Reconstruct Message objects from cached data
-                # Note: These are not attached to session, read-only
-                messages = []
-                for msg_data in cached:
-                    # Create detached Message objects for LLM context
-                    # Only essential fields needed for context
-                    msg = Message(
-                        chat_id=msg_data["chat_id"],
-                        message_id=msg_data["message_id"],
-                        thread_id=msg_data.get("thread_id"),
-                        from_user_id=msg_data.get("from_user_id"),
-                        date=msg_data["date"],
-                        role=MessageRole(msg_data["role"]),
-                        text_content=msg_data.get("text_content"),
-                        caption=msg_data.get("caption"),
-                        thinking_blocks=msg_data.get("thinking_blocks"),
-                        attachments=msg_data.get("attachments", []),
-                        has_photos=msg_data.get("has_photos", False),
-                        has_documents=msg_data.get("has_documents", False),
-                        has_voice=msg_data.get("has_voice", False),
-                        has_video=msg_data.get("has_video", False),
-                        attachment_count=msg_data.get("attachment_count", 0),
-                        reply_to_message_id=msg_data.get("reply_to_message_id"),
-                        reply_snippet=msg_data.get("reply_snippet"),
-                        reply_sender_display=msg_data.get(
-                            "reply_sender_display"),
-                        sender_display=msg_data.get("sender_display"),
-                        forward_origin=msg_data.get("forward_origin"),
-                        quote_data=msg_data.get("quote_data"),
-                        edit_count=msg_data.get("edit_count", 0),
-                        created_at=msg_data["date"],
-                    )
-                    messages.append(msg)
-                return messages
+                # Detached read-only records (not attached to session)
+                return history_from_cache(cached)
 
         # Cache miss or paginated query - query database
+        thread_filter = Message.thread_id == thread_id
+        if since_compaction:
+            start_date = await self._get_compaction_start_date(thread_id)
+            if start_date is not None:
+                thread_filter = thread_filter & (Message.date >= start_date)
+
         if limit is not None:
             # Get most recent N messages, but return in chronological order
             # Subquery: get IDs of most recent messages
             subq = (select(Message.chat_id, Message.message_id).where(
-                Message.thread_id == thread_id).order_by(
-                    Message.date.desc()).limit(limit))
+                thread_filter).order_by(Message.date.desc()).limit(limit))
             if offset > 0:
                 subq = subq.offset(offset)
             subq = subq.subquery()
@@ -347,45 +459,20 @@ class MessageRepository(BaseRepository[Message]):
             ).order_by(Message.date.asc()))
         else:
             # No limit - get all messages in chronological order
-            stmt = (select(Message).where(
-                Message.thread_id == thread_id).order_by(Message.date.asc()))
+            stmt = (select(Message).where(thread_filter).order_by(
+                Message.date.asc()))
             if offset > 0:
                 stmt = stmt.offset(offset)
 
         result = await self.session.execute(stmt)
         messages = list(result.scalars().all())
+        if since_compaction:
+            messages = trim_to_latest_compaction(messages)
 
         # Cache full history for future requests
-        if limit is None and offset == 0 and messages:
-            # Serialize messages for cache
-            messages_data = []
-            for msg in messages:
-                msg_dict = {
-                    "chat_id": msg.chat_id,
-                    "message_id": msg.message_id,
-                    "thread_id": msg.thread_id,
-                    "from_user_id": msg.from_user_id,
-                    "date": msg.date,
-                    "role": msg.role.value,
-                    "text_content": msg.text_content,
-                    "caption": msg.caption,
-                    "thinking_blocks": msg.thinking_blocks,
-                    "attachments": msg.attachments,
-                    "has_photos": msg.has_photos,
-                    "has_documents": msg.has_documents,
-                    "has_voice": msg.has_voice,
-                    "has_video": msg.has_video,
-                    "attachment_count": msg.attachment_count,
-                    "reply_to_message_id": msg.reply_to_message_id,
-                    "reply_snippet": msg.reply_snippet,
-                    "reply_sender_display": msg.reply_sender_display,
-                    "sender_display": msg.sender_display,
-                    "forward_origin": msg.forward_origin,
-                    "quote_data": msg.quote_data,
-                    "edit_count": msg.edit_count,
-                }
-                messages_data.append(msg_dict)
-            await cache_messages(thread_id, messages_data)
+        if (limit is None and offset == 0 and messages and
+                not since_compaction):
+            await cache_messages(thread_id, history_cache_entries(messages))
 
         return messages
 
@@ -496,11 +583,13 @@ class MessageRepository(BaseRepository[Message]):
     async def create_messages_batch(
         self,
         messages_data: Sequence[dict],
+        invalidate_cache: bool = True,
     ) -> list[Message]:
-        """Create multiple messages in a single batch operation.
+        """Create multiple messages with a single INSERT statement.
 
-        Optimized for bulk inserts - uses single flush instead of per-message flush.
-        Ideal for importing conversation history or bulk operations.
+        Uses INSERT ... ON CONFLICT (chat_id, message_id) DO NOTHING
+        RETURNING, so messages that already exist (retries) are skipped
+        without a per-message existence check.
 
         Args:
             messages_data: List of dicts with message parameters.
@@ -508,82 +597,129 @@ class MessageRepository(BaseRepository[Message]):
                 Optional keys: thread_id, from_user_id, text_content, caption,
                     reply_to_message_id, media_group_id, attachments, edit_date,
                     thinking_blocks, sender_display, forward_origin, reply_snippet,
-                    reply_sender_display, quote_data.
+                    reply_sender_display, quote_data, model_id.
+            invalidate_cache: Invalidate messages cache of affected threads.
+                Pass False when the caller appends to the cache itself.
 
         Returns:
-            List of created Message instances.
-
-        Note:
-            Does NOT invalidate cache per-message for performance.
-            Caller should invalidate relevant thread caches after batch insert.
+            Newly inserted Message instances (existing ones are omitted).
         """
         if not messages_data:
             return []
 
-        messages = []
+        values = []
         thread_ids_to_invalidate: set[int] = set()
 
         for msg_data in messages_data:
-            attachments = msg_data.get("attachments", [])
-
-            # Calculate denormalized flags
-            has_photos = any(att.get("type") == "photo" for att in attachments)
-            has_documents = any(
-                att.get("type") == "document" for att in attachments)
-            has_voice = any(att.get("type") == "voice" for att in attachments)
-            has_video = any(att.get("type") == "video" for att in attachments)
-            attachment_count = len(attachments)
-
-            message = Message(
-                chat_id=msg_data["chat_id"],
-                message_id=msg_data["message_id"],
-                thread_id=msg_data.get("thread_id"),
-                from_user_id=msg_data.get("from_user_id"),
-                date=msg_data["date"],
-                edit_date=msg_data.get("edit_date"),
-                role=msg_data["role"],
-                text_content=msg_data.get("text_content"),
-                caption=msg_data.get("caption"),
-                reply_to_message_id=msg_data.get("reply_to_message_id"),
-                reply_snippet=msg_data.get("reply_snippet"),
-                reply_sender_display=msg_data.get("reply_sender_display"),
-                quote_data=msg_data.get("quote_data"),
-                forward_origin=msg_data.get("forward_origin"),
-                sender_display=msg_data.get("sender_display"),
-                edit_count=0,
-                original_content=None,
-                media_group_id=msg_data.get("media_group_id"),
-                has_photos=has_photos,
-                has_documents=has_documents,
-                has_voice=has_voice,
-                has_video=has_video,
-                attachment_count=attachment_count,
-                attachments=attachments,
-                thinking_blocks=msg_data.get("thinking_blocks"),
-                created_at=msg_data["date"],
-            )
-            self.session.add(message)
-            messages.append(message)
+            attachments = msg_data.get("attachments") or []
+            values.append({
+                "chat_id": msg_data["chat_id"],
+                "message_id": msg_data["message_id"],
+                "thread_id": msg_data.get("thread_id"),
+                "from_user_id": msg_data.get("from_user_id"),
+                "date": msg_data["date"],
+                "edit_date": msg_data.get("edit_date"),
+                "role": msg_data["role"],
+                "text_content": msg_data.get("text_content"),
+                "caption": msg_data.get("caption"),
+                "reply_to_message_id": msg_data.get("reply_to_message_id"),
+                "reply_snippet": msg_data.get("reply_snippet"),
+                "reply_sender_display": msg_data.get("reply_sender_display"),
+                "quote_data": msg_data.get("quote_data"),
+                "forward_origin": msg_data.get("forward_origin"),
+                "sender_display": msg_data.get("sender_display"),
+                "edit_count": 0,
+                "original_content": None,
+                "media_group_id": msg_data.get("media_group_id"),
+                **_attachment_flags(attachments),
+                "attachments": attachments,
+                "thinking_blocks": msg_data.get("thinking_blocks"),
+                "model_id": msg_data.get("model_id"),
+                "created_at": msg_data["date"],
+            })
 
             # Track thread IDs for cache invalidation
             if msg_data.get("thread_id"):
                 thread_ids_to_invalidate.add(msg_data["thread_id"])
 
-        # Single flush for all messages
-        await self.session.flush()
+        insert = _dialect_insert(self.session)
+        stmt = (insert(Message).values(values).on_conflict_do_nothing(
+            index_elements=["chat_id", "message_id"]).returning(Message))
+        messages = list((await self.session.scalars(stmt)).all())
 
-        # Invalidate caches for all affected threads
-        for thread_id in thread_ids_to_invalidate:
-            await invalidate_messages(thread_id)
+        if invalidate_cache:
+            for thread_id in thread_ids_to_invalidate:
+                await invalidate_messages(thread_id)
 
         logger.info(
             "messages.batch_created",
             count=len(messages),
-            threads_invalidated=len(thread_ids_to_invalidate),
+            skipped=len(values) - len(messages),
+            threads_invalidated=(len(thread_ids_to_invalidate)
+                                 if invalidate_cache else 0),
         )
 
         return messages
 
+    async def _get_compaction_start_date(self,
+                                         thread_id: int) -> Optional[int]:
+        """Get date of the first message to load after latest compaction.
+
+        Returns the date of the message preceding the latest assistant
+        message with a compaction_summary (the user turn it answered).
+
+        Args:
+            thread_id: Internal thread ID.
+
+        Returns:
+            Unix timestamp, or None if the thread was never compacted.
+        """
+        from sqlalchemy import func
+
+        boundary_stmt = select(func.max(Message.date)).where(
+            Message.thread_id == thread_id,
+            Message.compaction_summary.is_not(None))
+        boundary_date = (await self.session.execute(boundary_stmt)).scalar()
+        if boundary_date is None:
+            return None
+
+        prev_stmt = select(func.max(Message.date)).where(
+            Message.thread_id == thread_id, Message.date < boundary_date)
+        prev_date = (await self.session.execute(prev_stmt)).scalar()
+        return prev_date if prev_date is not None else boundary_date
+
+    async def set_compaction_summary(
+        self,
+        chat_id: int,
+        message_id: int,
+        summary: str,
+    ) -> None:
+        """Store compaction summary on an assistant message.
+
+        History before this message is then replaced by the summary
+        (see trim_to_latest_compaction).
+
+        Args:
+            chat_id: Telegram chat ID.
+            message_id: Telegram message ID.
+            summary: Summary of conversation before this message.
+
+        Raises:
+            ValueError: If message not found.
+        """
+        message = await self.get_message(chat_id, message_id)
+        if not message:
+            raise ValueError(f"Message ({chat_id}, {message_id}) not found")
+
+        message.compaction_summary = summary
+        await self.session.flush()
+
+        logger.info("message_repository.compaction_summary_set",
+                    chat_id=chat_id,
+                    message_id=message_id,
+                    thread_id=message.thread_id,
+                    summary_length=len(summary))
+
     async def count_messages_in_thread(self, thread_id: int) -> int:
         """Count messages in a thread by internal thread ID.
 
@@ -13,12 +13,15 @@ from typing import Optional
 
 from cache.thread_cache import cache_thread
 from cache.thread_cache import get_cached_thread
+from db.engine import after_commit
 from db.models.thread import Thread
 from db.repositories.base import BaseRepository
 from sqlalchemy import func
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from utils.metrics import record_thread_created
+from utils.metrics import record_thread_deleted
 
 
 class ThreadRepository(BaseRepository[Thread]):
@@ -94,6 +97,7 @@ class ThreadRepository(BaseRepository[Thread]):
             async with self.session.begin_nested():
                 self.session.add(thread)
                 await self.session.flush()
+            after_commit(self.session, record_thread_created)
             return thread, True
         except IntegrityError:
             # Race condition: another request created the thread
@@ -217,6 +221,7 @@ class ThreadRepository(BaseRepository[Thread]):
 
         await self.session.delete(thread)
         await self.session.flush()
+        after_commit(self.session, record_thread_deleted)
 
     async def get_threads_count(self) -> int:
         """Get total number of threads.
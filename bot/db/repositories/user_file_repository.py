@@ -326,6 +326,21 @@ class UserFileRepository(BaseRepository[UserFile]):
 
         return result.scalar_one() or 0
 
+    async def get_active_file_expiries(self) -> list[datetime]:
+        """Get expiry times of files that haven't expired yet.
+
+        Seeds the in-memory active files tracker (metrics collector),
+        which then counts down expiries without querying.
+
+        Returns:
+            List of expires_at values (expires_at > now).
+        """
+        stmt = select(UserFile.expires_at).where(
+            UserFile.expires_at > datetime.now(timezone.utc))
+        result = await self.session.execute(stmt)
+
+        return list(result.scalars().all())
+
     async def get_total_size(self) -> int:
         """Calculate total size of all files in bytes.
 
@@ -13,12 +13,14 @@ from datetime import timezone
 from decimal import Decimal
 from typing import Optional
 
+from db.engine import after_commit
 from db.models.user import User
 from db.repositories.base import BaseRepository
 from sqlalchemy import desc
 from sqlalchemy import func
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from utils.metrics import record_user_created
 from utils.structured_logging import get_logger
 
 logger = get_logger(__name__)
@@ -185,6 +187,7 @@ class UserRepository(BaseRepository[User]):
         )
         self.session.add(user)
         await self.session.flush()
+        after_commit(self.session, record_user_created)
 
         logger.info("user_repository.get_or_create.complete",
                     telegram_id=telegram_id,
@@ -246,19 +249,22 @@ class UserRepository(BaseRepository[User]):
         telegram_id: int,
         messages: int = 0,
         tokens: int = 0,
-    ) -> None:
+    ) -> Optional[User]:
         """Increment user statistics counters.
 
         Args:
             telegram_id: Telegram user ID.
             messages: Number of messages to add.
             tokens: Number of tokens to add.
+
+        Returns:
+            Updated user (new totals), None if user not found.
         """
         user = await self.get_by_telegram_id(telegram_id)
         if not user:
             logger.error("user_repository.increment_stats.user_not_found",
                          telegram_id=telegram_id)
-            return
+            return None
 
         if messages:
             user.message_count += messages
@@ -270,26 +276,7 @@ class UserRepository(BaseRepository[User]):
                      telegram_id=telegram_id,
                      messages_added=messages,
                      tokens_added=tokens)
-
-    async def get_active_users_count(self, hours: int = 1) -> int:
-        """Get count of users active in the last N hours.
-
-        Args:
-            hours: Number of hours to look back. Defaults to 1.
-
-        Returns:
-            Number of active users.
-        """
-        cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
-        stmt = select(
-            func.count()).select_from(User).where(User.last_seen_at >= cutoff)
-        result = await self.session.execute(stmt)
-        count = result.scalar_one()
-
-        logger.debug("user_repository.get_active_users_count",
-                     hours=hours,
-                     count=count)
-        return count
+        return user
 
     async def get_active_users(self, hours: int = 24) -> list[User]:
         """Get users active in the last N hours.
@@ -326,21 +313,43 @@ class UserRepository(BaseRepository[User]):
         logger.debug("user_repository.get_total_balance", total=float(total))
         return total
 
-    async def get_all_users(self) -> list[User]:
-        """Get all users without limit cap.
+    async def get_user_ids_after(self, after_id: int,
+                                 limit: int) -> list[int]:
+        """Get a page of user IDs in ID order (keyset pagination).
 
-        Unlike get_all() which is capped at MAX_QUERY_LIMIT=1000,
-        this method returns all users. Used for broadcast functionality.
+        Used by the broadcast engine to walk all users without loading
+        them at once; the last ID of a page is the next page's after_id.
+
+        Args:
+            after_id: Return IDs greater than this (0 for the first page).
+            limit: Max IDs to return.
 
         Returns:
-            List of all User objects.
+            Ascending list of user IDs.
         """
-        stmt = select(User).order_by(User.id)
+        stmt = (select(User.id).where(User.id > after_id).order_by(
+            User.id).limit(limit))
         result = await self.session.execute(stmt)
-        users = list(result.scalars().all())
+        return list(result.scalars().all())
 
-        logger.debug("user_repository.get_all_users", count=len(users))
-        return users
+    async def get_usernames(self, user_ids: list[int]) -> dict[int, str]:
+        """Get usernames for the given user IDs.
+
+        Args:
+            user_ids: Telegram user IDs (queried in chunks).
+
+        Returns:
+            Mapping of user ID to username (users without one omitted).
+        """
+        usernames: dict[int, str] = {}
+        chunk = 1000
+        for start in range(0, len(user_ids), chunk):
+            stmt = select(User.id, User.username).where(
+                User.id.in_(user_ids[start:start + chunk]),
+                User.username.isnot(None))
+            result = await self.session.execute(stmt)
+            usernames.update({row.id: row.username for row in result})
+        return usernames
 
     async def get_top_users(
         self,
@@ -611,6 +611,59 @@ MESSAGES: MessageDict = {
                "<b>Стало:</b> {new}"),
     },
 
+    # =========================================================================
+    # Admin - /profile command
+    # =========================================================================
+    "admin.profile_usage": {
+        "en": ("🔬 <b>Live Profiling</b>\n\n"
+               "<b>Profiler:</b> {profiler}\n"
+               "<b>tracemalloc:</b> {memory}\n\n"
+               "Usage:\n"
+               "<code>/profile start [interval_ms]</code> — start sampling\n"
+               "<code>/profile stop</code> — stop, send speedscope file\n"
+               "<code>/profile tasks</code> — dump asyncio tasks\n"
+               "<code>/profile memory</code> — start tracemalloc / "
+               "send diff since last call\n"
+               "<code>/profile memory stop</code> — stop tracemalloc"),
+        "ru": ("🔬 <b>Профилирование</b>\n\n"
+               "<b>Профайлер:</b> {profiler}\n"
+               "<b>tracemalloc:</b> {memory}\n\n"
+               "Использование:\n"
+               "<code>/profile start [interval_ms]</code> — начать сбор\n"
+               "<code>/profile stop</code> — остановить, прислать "
+               "файл speedscope\n"
+               "<code>/profile tasks</code> — список задач asyncio\n"
+               "<code>/profile memory</code> — запустить tracemalloc / "
+               "прислать разницу с прошлым вызовом\n"
+               "<code>/profile memory stop</code> — остановить tracemalloc"),
+    },
+    "admin.profile_started": {
+        "en": ("🔬 Profiler started ({interval_ms:.1f} ms interval).\n"
+               "Send <code>/profile stop</code> to get the result."),
+        "ru": ("🔬 Профайлер запущен (интервал {interval_ms:.1f} мс).\n"
+               "Отправьте <code>/profile stop</code> для результата."),
+    },
+    "admin.profile_caption": {
+        "en": ("🔬 {samples} samples over {duration:.1f}s. "
+               "Open in https://www.speedscope.app"),
+        "ru": ("🔬 {samples} сэмплов за {duration:.1f} с. "
+               "Откройте в https://www.speedscope.app"),
+    },
+    "admin.profile_memory_started": {
+        "en": ("🧠 tracemalloc started. Send <code>/profile memory</code> "
+               "again to see what grew."),
+        "ru": ("🧠 tracemalloc запущен. Отправьте <code>/profile memory</code> "
+               "ещё раз, чтобы увидеть рост."),
+    },
+    "admin.profile_memory_stopped": {
+        "en": "🧠 tracemalloc stopped.",
+        "ru": "🧠 tracemalloc остановлен.",
+    },
+    "admin.profile_error": {
+        "en": "❌ {error}",
+        "ru": "❌ {error}",
+    },
+
     # =========================================================================
     # Admin - /clear command
     # =========================================================================
@@ -11,28 +11,38 @@ from pathlib import Path
 from cache.client import close_redis
 from cache.client import init_redis
 from config import get_database_url
+from config import LOG_BACKGROUND_WRITER
+from config import METRICS_COLLECT_INTERVAL
+from config import METRICS_DISK_INTERVAL
+from config import METRICS_DISK_VOLUMES
+from config import METRICS_RESEED_INTERVAL
+from config import PROMPT_CACHE_REFRESH_ENABLED
+from config import SLOW_CALLBACK_DETECTOR
+from core.image_processor import get_image_processor
 from db.engine import dispose_db
 from db.engine import get_pool_stats
-from db.engine import get_session
 from db.engine import init_db
+from services.broadcast import get_broadcast_engine
+from services.metrics_collector import DiskUsageCollector
+from services.metrics_collector import MetricsCollector
+from services.metrics_collector import publish_aggregates
+from services.metrics_collector import reseed_aggregates
 from telegram.commands import setup_bot_commands
 from telegram.handlers.claude import init_claude_provider
 from telegram.loader import create_bot
 from telegram.loader import create_dispatcher
 from telegram.pipeline.handler import get_queue
-from utils.metrics import set_active_files
-from utils.metrics import set_active_users
+from utils.loop_monitor import install_slow_callback_detector
+from utils.loop_monitor import loop_lag_monitor_task
 from utils.metrics import set_db_pool_stats
-from utils.metrics import set_disk_usage
+from utils.metrics import set_log_pipeline_stats
 from utils.metrics import set_queue_stats
 from utils.metrics import set_redis_stats
-from utils.metrics import set_top_users
-from utils.metrics import set_total_balance
-from utils.metrics import set_total_threads
-from utils.metrics import set_total_users
 from utils.metrics import start_metrics_server
+from utils.structured_logging import get_log_stats
 from utils.structured_logging import get_logger
 from utils.structured_logging import setup_logging
+from utils.structured_logging import shutdown_logging
 
 
 def read_secret(secret_name: str) -> str:
@@ -112,30 +122,6 @@ def load_privileged_users() -> set[int]:
         return set()
 
 
-def get_directory_size(path: str) -> int:
-    """Get total size of directory in bytes.
-
-    Args:
-        path: Directory path to measure.
-
-    Returns:
-        Total size in bytes, or 0 if path doesn't exist.
-    """
-    import os
-    total = 0
-    try:
-        for dirpath, _, filenames in os.walk(path):
-            for filename in filenames:
-                filepath = os.path.join(dirpath, filename)
-                try:
-                    total += os.path.getsize(filepath)
-                except (OSError, IOError):
-                    pass
-    except (OSError, IOError):
-        pass
-    return total
-
-
 def _parse_memory(memory_str: str) -> int:
     """Parse Redis memory string to bytes.
 
@@ -210,150 +196,79 @@ async def warm_user_cache(logger) -> int:
         return 0
 
 
+async def _collect_pool_stats() -> None:
+    """Set database connection pool gauges."""
+    pool_stats = get_pool_stats()
+    if pool_stats:
+        set_db_pool_stats(
+            active=pool_stats.get("active", 0),
+            idle=pool_stats.get("idle", 0),
+            overflow=pool_stats.get("overflow", 0),
+        )
+
+
+async def _collect_queue_stats() -> None:
+    """Set message queue gauges."""
+    pipeline_queue = get_queue()
+    if pipeline_queue:
+        queue_stats = pipeline_queue.get_stats()
+        set_queue_stats(
+            total=queue_stats.get("total_threads", 0),
+            processing=queue_stats.get("processing_threads", 0),
+            waiting=queue_stats.get("waiting_threads", 0),
+        )
+
+
+async def _collect_redis_stats() -> None:
+    """Set Redis server gauges."""
+    from cache.client import \
+        redis_health_check  # pylint: disable=import-outside-toplevel
+    redis_health = await redis_health_check()
+    if redis_health.get("status") == "ok":
+        info = redis_health.get("info", {})
+        set_redis_stats(
+            connected_clients=info.get("connected_clients", 0),
+            used_memory=_parse_memory(info.get("used_memory_human", "0B")),
+            uptime=info.get("uptime_seconds", 0),
+        )
+
+
+async def _collect_log_stats() -> None:
+    """Set log pipeline gauges and drop counters."""
+    set_log_pipeline_stats(get_log_stats())
+
+
 async def collect_metrics_task(logger) -> None:
     """Background task to collect metrics periodically.
 
-    Collects every 10 seconds:
+    Collects every METRICS_COLLECT_INTERVAL (10s):
         - Database connection pool statistics
         - Message queue statistics
         - Redis cache statistics
+        - Log pipeline backlog and drops
+        - Active users, active files, top users (in-memory tracker)
 
-    Collects every 60 seconds:
-        - Active users count
-        - Total balance
-        - Total users
-        - Top users by messages/tokens
-    """
-    iteration = 0
+    Collects every METRICS_DISK_INTERVAL (60s), in a worker thread:
+        - Disk usage by volume
 
-    while True:
-        try:
-            await asyncio.sleep(10)
-            iteration += 1
-
-            # Collect database pool stats (every 10s)
-            pool_stats = get_pool_stats()
-            if pool_stats:
-                set_db_pool_stats(
-                    active=pool_stats.get("active", 0),
-                    idle=pool_stats.get("idle", 0),
-                    overflow=pool_stats.get("overflow", 0),
-                )
-
-            # Collect queue stats (every 10s)
-            pipeline_queue = get_queue()
-            if pipeline_queue:
-                queue_stats = pipeline_queue.get_stats()
-                set_queue_stats(
-                    total=queue_stats.get("total_threads", 0),
-                    processing=queue_stats.get("processing_threads", 0),
-                    waiting=queue_stats.get("waiting_threads", 0),
-                )
+    Reloads DB aggregates at startup and every METRICS_RESEED_INTERVAL;
+    in between they are maintained incrementally at the write sites.
+    See services/metrics_collector.py.
+    """
+    collector = MetricsCollector(tick=METRICS_COLLECT_INTERVAL)
+    collector.add("reseed", METRICS_RESEED_INTERVAL, reseed_aggregates)
+    collector.add("pool", METRICS_COLLECT_INTERVAL, _collect_pool_stats)
+    collector.add("queue", METRICS_COLLECT_INTERVAL, _collect_queue_stats)
+    collector.add("redis", METRICS_COLLECT_INTERVAL, _collect_redis_stats)
+    collector.add("logging", METRICS_COLLECT_INTERVAL, _collect_log_stats)
+    collector.add("aggregates", METRICS_COLLECT_INTERVAL, publish_aggregates)
+    collector.add("disk", METRICS_DISK_INTERVAL,
+                  DiskUsageCollector(METRICS_DISK_VOLUMES))
 
-            # Collect Redis stats (every 10s)
-            try:
-                from cache.client import \
-                    redis_health_check  # pylint: disable=import-outside-toplevel
-                redis_health = await redis_health_check()
-                if redis_health.get("status") == "ok":
-                    info = redis_health.get("info", {})
-                    set_redis_stats(
-                        connected_clients=info.get("connected_clients", 0),
-                        used_memory=_parse_memory(
-                            info.get("used_memory_human", "0B")),
-                        uptime=info.get("uptime_seconds", 0),
-                    )
-            except Exception as redis_err:  # pylint: disable=broad-exception-caught
-                logger.debug("metrics.redis_stats_error", error=str(redis_err))
-
-            # Collect user metrics (every 60s = 6 iterations)
-            if iteration % 6 == 0:
-                try:
-                    # Import here to avoid circular imports
-                    from db.repositories.user_repository import \
-                        UserRepository  # pylint: disable=import-outside-toplevel
-
-                    async with get_session() as session:
-                        user_repo = UserRepository(session)
-
-                        # Active users (last hour)
-                        active_count = await user_repo.get_active_users_count(
-                            hours=1)
-                        set_active_users(active_count)
-
-                        # Total balance
-                        total_balance = await user_repo.get_total_balance()
-                        set_total_balance(float(total_balance))
-
-                        # Total users
-                        total_users = await user_repo.get_users_count()
-                        set_total_users(total_users)
-
-                        # Top users by messages
-                        top_by_messages = await user_repo.get_top_users(
-                            limit=10, by="messages")
-                        users_data = [(str(u.id), u.username, u.message_count,
-                                       u.total_tokens_used)
-                                      for u in top_by_messages]
-                        set_top_users(users_data, metric_type="messages")
-
-                        # Top users by tokens
-                        top_by_tokens = await user_repo.get_top_users(
-                            limit=10, by="tokens")
-                        users_data = [(str(u.id), u.username, u.message_count,
-                                       u.total_tokens_used)
-                                      for u in top_by_tokens]
-                        set_top_users(users_data, metric_type="tokens")
-
-                        # Active files in Files API
-                        from db.repositories.user_file_repository import \
-                            UserFileRepository  # pylint: disable=import-outside-toplevel
-                        user_file_repo = UserFileRepository(session)
-                        active_files = await user_file_repo.get_active_files_count(
-                        )
-                        set_active_files(active_files)
-
-                        # Total threads
-                        from db.repositories.thread_repository import \
-                            ThreadRepository  # pylint: disable=import-outside-toplevel
-                        thread_repo = ThreadRepository(session)
-                        total_threads = await thread_repo.get_threads_count()
-                        set_total_threads(total_threads)
-
-                        # Disk usage by volume
-                        volumes = {
-                            'postgres': '/mnt/volumes/postgres',
-                            'loki': '/mnt/volumes/loki',
-                            'prometheus': '/mnt/volumes/prometheus',
-                            'grafana': '/mnt/volumes/grafana',
-                        }
-                        total_disk = 0
-                        for vol_name, vol_path in volumes.items():
-                            vol_size = get_directory_size(vol_path)
-                            set_disk_usage(vol_name, vol_size)
-                            total_disk += vol_size
-                        set_disk_usage('total', total_disk)
-
-                        logger.debug("metrics.user_stats_collected",
-                                     active_users=active_count,
-                                     total_users=total_users,
-                                     total_balance=float(total_balance),
-                                     active_files=active_files,
-                                     total_threads=total_threads,
-                                     total_disk_bytes=total_disk)
-
-                except Exception as user_err:  # pylint: disable=broad-exception-caught
-                    logger.error("metrics.user_stats_error",
-                                 error=str(user_err),
-                                 exc_info=True)
-
-        except asyncio.CancelledError:
-            logger.debug("metrics_collection_task_cancelled")
-            break
-        except Exception as e:
-            logger.error("metrics_collection_error",
-                         error=str(e),
-                         exc_info=True)
+    try:
+        await collector.run()
+    except asyncio.CancelledError:
+        logger.debug("metrics_collection_task_cancelled")
 
 
 async def main() -> None:
@@ -366,8 +281,8 @@ async def main() -> None:
         FileNotFoundError: If required secret file is missing.
         Exception: Any other startup errors.
     """
-    # Setup logging
-    setup_logging(level="DEBUG")
+    # Setup logging (stdout writes happen in a background thread)
+    setup_logging(level="DEBUG", background=LOG_BACKGROUND_WRITER)
     logger = get_logger(__name__)
 
     logger.debug("bot_starting")
@@ -432,6 +347,11 @@ async def main() -> None:
         metrics_task = asyncio.create_task(collect_metrics_task(logger))
         logger.debug("metrics_collection_task_started")
 
+        # Event loop health: lag histogram and slow callback warnings
+        loop_monitor_handle = asyncio.create_task(loop_lag_monitor_task(logger))
+        if SLOW_CALLBACK_DETECTOR:
+            install_slow_callback_detector()
+
         # Start write-behind background task (Phase 3.3: Cache-first)
         from cache.write_behind import \
             write_behind_task  # pylint: disable=import-outside-toplevel
@@ -444,6 +364,20 @@ async def main() -> None:
         cleanup_handle = asyncio.create_task(cleanup_task(logger))
         logger.debug("cleanup_task_started")
 
+        # Continue /announce broadcasts interrupted by the last shutdown
+        resumed = await get_broadcast_engine().resume(bot)
+        if resumed:
+            logger.info("broadcasts_resumed", count=resumed)
+
+        # Keep shared prompt prefixes warm between sparse requests
+        prompt_cache_handle = None
+        if PROMPT_CACHE_REFRESH_ENABLED:
+            from core.claude.prompt_cache import \
+                prompt_cache_task  # pylint: disable=import-outside-toplevel
+            prompt_cache_handle = asyncio.create_task(
+                prompt_cache_task(logger))
+            logger.debug("prompt_cache_task_started")
+
         # Start polling
         logger.debug("starting_polling")
         try:
@@ -452,8 +386,14 @@ async def main() -> None:
         finally:
             # Cancel background tasks on shutdown
             metrics_task.cancel()
+            loop_monitor_handle.cancel()
             write_behind_handle.cancel()
             cleanup_handle.cancel()
+            if prompt_cache_handle is not None:
+                prompt_cache_handle.cancel()
+
+            # Broadcasts persist their checkpoint and resume on next start
+            await get_broadcast_engine().shutdown()
 
             # Wait for graceful shutdown (write-behind flushes pending writes)
             try:
@@ -461,6 +401,11 @@ async def main() -> None:
             except asyncio.CancelledError:
                 pass
 
+            try:
+                await loop_monitor_handle
+            except asyncio.CancelledError:
+                pass
+
             try:
                 await write_behind_handle
             except asyncio.CancelledError:
@@ -471,6 +416,12 @@ async def main() -> None:
             except asyncio.CancelledError:
                 pass
 
+            if prompt_cache_handle is not None:
+                try:
+                    await prompt_cache_handle
+                except asyncio.CancelledError:
+                    pass
+
     except FileNotFoundError as error:
         logger.error("secret_not_found", error=str(error))
         raise
@@ -482,10 +433,16 @@ async def main() -> None:
         await close_redis()
         logger.debug("redis_closed")
 
+        # Stop image processing worker pool
+        get_image_processor().shutdown()
+
         # Cleanup database connections
         await dispose_db()
         logger.debug("bot_stopped")
 
+        # Flush queued log records
+        shutdown_logging()
+
 
 if __name__ == "__main__":
     asyncio.run(main())
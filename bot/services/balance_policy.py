@@ -9,19 +9,31 @@ Uses cache-first approach for fast checks with database fallback.
 Implements soft-check: user can go negative ONCE, then blocked.
 This allows completing started requests without abrupt cutoff.
 
+Concurrent generations: each one reserves its estimated cost in Redis
+(reserve / reservation_scope). The soft check then applies to the balance
+minus what other in-flight generations hold, so parallel requests can't
+all start on a balance that covers one. The reservation is settled with
+the actual cost by BalanceService.charge_user(reservation=...) and
+released when the generation ends without a charge.
+
 NO __init__.py - use direct import:
     from services.balance_policy import BalancePolicy, BalanceCheckResult
 """
 
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
+from dataclasses import field
 from decimal import Decimal
-from typing import Optional, TYPE_CHECKING
+from typing import AsyncIterator, Optional, TYPE_CHECKING
+import uuid
 
 if TYPE_CHECKING:
     from sqlalchemy.ext.asyncio import AsyncSession
 
 from cache.user_cache import get_balance_from_cached
 from cache.user_cache import get_cached_user
+from cache.user_cache import release_reservation
+from cache.user_cache import reserve_balance
 import config
 from utils.structured_logging import get_logger
 
@@ -38,6 +50,21 @@ class BalanceCheckResult:
     reason: Optional[str] = None
 
 
+@dataclass
+class BalanceReservation:
+    """Estimated cost held in Redis for one generation.
+
+    held is True while Redis holds the amount; settling or releasing
+    clears it. A reservation that couldn't be placed (user not cached,
+    Redis down) stays unheld and charges go straight to the database.
+    """
+
+    user_id: int
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    amount: Decimal = Decimal("0")
+    held: bool = False
+
+
 class BalancePolicy:
     """Unified balance checking policy.
 
@@ -144,6 +171,79 @@ class BalancePolicy:
             reason=None if allowed else "Insufficient balance",
         )
 
+    async def reserve(
+        self,
+        reservation: BalanceReservation,
+        amount: Decimal,
+    ) -> BalanceCheckResult:
+        """Hold an estimated cost against the cached balance.
+
+        Atomic in Redis: allowed only if balance minus other reservations
+        is above min_balance_for_request. Fails open (like
+        can_make_request) when the user isn't cached or Redis is down.
+
+        Args:
+            reservation: Reservation to place (from reservation_scope).
+            amount: Estimated cost of the generation.
+
+        Returns:
+            BalanceCheckResult with the balance left after reservations.
+        """
+        result = await reserve_balance(reservation.user_id, reservation.id,
+                                       amount, self.min_balance_for_request)
+
+        if result is None:
+            logger.debug(
+                "balance_policy.reservation_unavailable",
+                user_id=reservation.user_id,
+            )
+            return BalanceCheckResult(
+                allowed=True,
+                balance=Decimal("0"),
+                source="unknown",
+                reason="Reservation unavailable - fail open",
+            )
+
+        held, available = result
+        reservation.amount = amount
+        reservation.held = held
+        return BalanceCheckResult(
+            allowed=held,
+            balance=available,
+            source="reservation",
+            reason=None if held else
+            "Insufficient balance (reserved by concurrent requests)",
+        )
+
+    async def release(self, reservation: BalanceReservation) -> None:
+        """Release a reservation that was not settled.
+
+        Args:
+            reservation: Reservation to release (no-op if not held).
+        """
+        if not reservation.held:
+            return
+        reservation.held = False
+        await release_reservation(reservation.user_id, reservation.id)
+
+    @asynccontextmanager
+    async def reservation_scope(
+            self, user_id: int) -> AsyncIterator[BalanceReservation]:
+        """Reservation for one generation, released on exit if unsettled.
+
+        Args:
+            user_id: Telegram user ID.
+
+        Yields:
+            Unheld BalanceReservation; call reserve() once the cost can
+            be estimated.
+        """
+        reservation = BalanceReservation(user_id=user_id)
+        try:
+            yield reservation
+        finally:
+            await self.release(reservation)
+
     async def can_use_paid_tool(
         self,
         user_id: int,
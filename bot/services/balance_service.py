@@ -7,13 +7,20 @@ This module handles all balance-related operations:
 - Balance history retrieval
 
 Phase 3.2: Invalidates Redis cache on balance changes.
+
+Charges with a held reservation (services/balance_policy.py) are settled
+in Redis and written to Postgres by the write-behind queue.
 """
 
 from decimal import Decimal
 from decimal import ROUND_HALF_UP
+from typing import Optional, TYPE_CHECKING
 
+from cache.user_cache import adjust_cached_balance
 from cache.user_cache import invalidate_user
-from cache.user_cache import update_cached_balance
+from cache.user_cache import settle_reservation
+from cache.write_behind import queue_write
+from cache.write_behind import WriteType
 from config import MINIMUM_BALANCE_FOR_REQUEST
 from db.models.balance_operation import BalanceOperation
 from db.models.balance_operation import OperationType
@@ -22,8 +29,12 @@ from db.repositories.balance_operation_repository import \
 from db.repositories.user_repository import UserRepository
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from utils.metrics import record_balance_change
 from utils.structured_logging import get_logger
 
+if TYPE_CHECKING:
+    from services.balance_policy import BalanceReservation
+
 logger = get_logger(__name__)
 
 
@@ -133,16 +144,23 @@ class BalanceService:
         amount: Decimal | float,
         description: str,
         related_message_id: int | None = None,
+        reservation: Optional["BalanceReservation"] = None,
     ) -> Decimal:
         """Charge user for API usage.
 
         CRITICAL: This is where money is spent! Always log thoroughly.
 
+        With a held reservation, the charge settles it in Redis (cached
+        balance is deducted atomically) and the Postgres update is queued
+        (write-behind BALANCE_CHARGE). Otherwise, or if the user is no
+        longer cached, the user row is locked and charged directly.
+
         Args:
             user_id: Telegram user ID.
             amount: Amount to charge (positive value).
             description: Human-readable description of what was charged.
             related_message_id: Optional message ID that caused the charge.
+            reservation: Optional reservation placed for this request.
 
         Returns:
             User's balance after charge.
@@ -170,6 +188,20 @@ class BalanceService:
             related_message_id=related_message_id,
         )
 
+        settled = None
+        if reservation is not None and reservation.held:
+            reservation.held = False
+            settled = await settle_reservation(user_id, reservation.id, amount)
+            if settled is not None and await queue_write(
+                    WriteType.BALANCE_CHARGE, {
+                        "user_id": user_id,
+                        "amount": str(amount),
+                        "related_message_id": related_message_id,
+                        "description": description,
+                    }):
+                return self._log_settled_charge(user_id, amount, description,
+                                                related_message_id, *settled)
+
         # Get user with row-level lock (SELECT FOR UPDATE)
         # Prevents race conditions in concurrent charge operations
         user = await self.user_repo.get_by_id_for_update(user_id)
@@ -234,9 +266,16 @@ class BalanceService:
             msg="User charged for API usage",
         )
 
+        record_balance_change(float(balance_after - balance_before))
+
         # Phase 3.2: Update cache with new balance (don't invalidate!)
-        # This keeps the cache warm for subsequent requests
-        await update_cached_balance(user_id, balance_after)
+        # This keeps the cache warm for subsequent requests. Applied as a
+        # delta: the cached balance may hold Redis-settled charges that
+        # Postgres doesn't have yet.
+        # Skipped when the reservation was settled in Redis but the queue
+        # write failed: the cached balance already has this charge.
+        if settled is None:
+            await adjust_cached_balance(user_id, -amount)
 
         # Alert if balance went negative
         if balance_after < 0:
@@ -251,6 +290,46 @@ class BalanceService:
 
         return balance_after
 
+    def _log_settled_charge(
+        self,
+        user_id: int,
+        amount: Decimal,
+        description: str,
+        related_message_id: int | None,
+        balance_before: Decimal,
+        balance_after: Decimal,
+    ) -> Decimal:
+        """Log and record a charge settled in Redis.
+
+        Returns:
+            Balance after charge (from Redis).
+        """
+        logger.info(
+            "balance.user_charged",
+            user_id=user_id,
+            amount=float(amount),
+            balance_before=float(balance_before),
+            balance_after=float(balance_after),
+            description=description,
+            related_message_id=related_message_id,
+            source="reservation",
+            msg="User charged for API usage (DB write queued)",
+        )
+
+        record_balance_change(float(balance_after - balance_before))
+
+        if balance_after < 0:
+            logger.info(
+                "balance.negative_after_charge",
+                user_id=user_id,
+                balance_after=float(balance_after),
+                amount=float(amount),
+                msg=
+                "User balance went negative after charge (expected behavior)",
+            )
+
+        return balance_after
+
     async def admin_topup(
         self,
         admin_user_id: int,
@@ -376,8 +455,11 @@ class BalanceService:
             msg="Admin adjusted user balance",
         )
 
-        # Phase 3.2: Update cache with new balance
-        await update_cached_balance(user.id, balance_after)
+        record_balance_change(float(balance_after - balance_before))
+
+        # Phase 3.2: Update cache with new balance (as a delta, see
+        # charge_user)
+        await adjust_cached_balance(user.id, balance_after - balance_before)
 
         return balance_before, balance_after
 
@@ -0,0 +1,716 @@
+"""Resumable broadcast engine for /announce.
+
+A broadcast runs as a background task, not inside the handler:
+
+- Targets are read in pages of ANNOUNCE_PAGE_SIZE user IDs (keyset
+  pagination: id > checkpoint, ordered), so the user table is never
+  materialized and no DB connection is held between pages.
+- Delivery state lives in Redis (see cache/keys.py): metadata with the
+  checkpoint, a delivered set and a failed hash. Each outcome is written
+  as it happens; the checkpoint advances after each page. After a
+  restart, resume() continues every unfinished broadcast from its
+  checkpoint and skips targets already done, so only sends in flight at
+  the moment of the crash can repeat.
+- Sends run concurrently (ANNOUNCE_MAX_CONCURRENCY) under one token
+  bucket shared by all broadcasts (ANNOUNCE_MESSAGES_PER_SECOND).
+  TelegramRetryAfter pauses every send for retry_after and halves the
+  rate; successes restore it step by step.
+- The admin's progress message is edited every
+  ANNOUNCE_PROGRESS_INTERVAL seconds; the delivery report is sent as a
+  document when the broadcast finishes.
+
+Without Redis a broadcast still runs, but can't resume after restart.
+
+NO __init__.py - use direct import:
+    from services.broadcast import get_broadcast_engine
+"""
+
+import asyncio
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import datetime
+from datetime import timezone
+import time
+from typing import Callable, Optional
+import uuid
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.exceptions import TelegramForbiddenError
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.types import BufferedInputFile
+from cache.client import get_redis
+from cache.client import record_redis_failure
+from cache.codec import decode
+from cache.codec import encode
+from cache.keys import BROADCAST_ACTIVE_KEY
+from cache.keys import BROADCAST_TTL
+from cache.keys import broadcast_delivered_key
+from cache.keys import broadcast_failed_key
+from cache.keys import broadcast_meta_key
+from config import ANNOUNCE_MAX_CONCURRENCY
+from config import ANNOUNCE_MAX_RETRIES
+from config import ANNOUNCE_MESSAGES_PER_SECOND
+from config import ANNOUNCE_MIN_MESSAGES_PER_SECOND
+from config import ANNOUNCE_PAGE_SIZE
+from config import ANNOUNCE_PROGRESS_INTERVAL
+from db.engine import get_session
+from db.models.chat import Chat
+from db.repositories.thread_repository import ThreadRepository
+from db.repositories.user_repository import UserRepository
+from i18n import get_text
+from sqlalchemy import select
+from utils.metrics import record_broadcast_message
+from utils.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Rate regained per successful send, as a fraction of the configured rate
+_RATE_RECOVERY_STEP = 0.02
+
+
+class BroadcastRateLimiter:
+    """Token bucket with flood-control back-off (AIMD).
+
+    acquire() hands out send slots 1/rate apart. on_flood() pauses all
+    callers until retry_after has passed and halves the rate;
+    on_success() adds back a small step up to the configured rate.
+    """
+
+    def __init__(self,
+                 rate: float = ANNOUNCE_MESSAGES_PER_SECOND,
+                 min_rate: float = ANNOUNCE_MIN_MESSAGES_PER_SECOND,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """Initialize limiter.
+
+        Args:
+            rate: Sends per second when there is no flood control.
+            min_rate: Floor for the rate after back-off.
+            clock: Monotonic time source.
+        """
+        self._max_rate = rate
+        self._min_rate = min_rate
+        self._rate = rate
+        self._clock = clock
+        self._next_slot = 0.0
+        self._paused_until = 0.0
+
+    @property
+    def rate(self) -> float:
+        """Current sends per second."""
+        return self._rate
+
+    async def acquire(self) -> None:
+        """Wait for the next send slot."""
+        while True:
+            now = self._clock()
+            wait = max(self._paused_until, self._next_slot) - now
+            if wait <= 0:
+                self._next_slot = max(self._next_slot, now) + 1 / self._rate
+                return
+            await asyncio.sleep(wait)
+
+    def on_success(self) -> None:
+        """Recover rate after a successful send."""
+        self._rate = min(self._rate + self._max_rate * _RATE_RECOVERY_STEP,
+                         self._max_rate)
+
+    def on_flood(self, retry_after: float) -> None:
+        """Back off after TelegramRetryAfter.
+
+        Args:
+            retry_after: Seconds Telegram asked to wait.
+        """
+        self._paused_until = max(self._paused_until,
+                                 self._clock() + retry_after)
+        self._rate = max(self._rate / 2, self._min_rate)
+
+
+@dataclass
+class Broadcast:  # pylint: disable=too-many-instance-attributes
+    """State of one broadcast.
+
+    Attributes:
+        id: Broadcast ID (Redis key component).
+        admin_user_id: Admin who started it.
+        lang: Admin's language for progress and report.
+        source_chat_id: Chat of the message being broadcast.
+        source_message_id: Message being broadcast.
+        progress_chat_id: Chat of the progress message.
+        progress_message_id: Progress message edited while sending.
+        total: Number of targets when the broadcast started.
+        target_ids: Explicit targets, None for all users.
+        usernames: Known usernames of targets (for the report).
+        checkpoint: Highest user ID whose page is complete.
+        delivered: User IDs reached.
+        failed: User ID -> failure reason.
+    """
+
+    id: str
+    admin_user_id: int
+    lang: str
+    source_chat_id: int
+    source_message_id: int
+    progress_chat_id: int
+    progress_message_id: int
+    total: int
+    target_ids: Optional[list[int]] = None
+    usernames: dict[int, str] = field(default_factory=dict)
+    checkpoint: int = 0
+    delivered: set[int] = field(default_factory=set)
+    failed: dict[int, str] = field(default_factory=dict)
+
+    @property
+    def processed(self) -> int:
+        """Targets with a final outcome."""
+        return len(self.delivered) + len(self.failed)
+
+    def meta(self) -> dict:
+        """Metadata persisted in Redis (outcomes are stored separately)."""
+        data = asdict(self)
+        del data["delivered"]
+        del data["failed"]
+        return data
+
+
+class BroadcastEngine:
+    """Runs broadcasts as background tasks with persisted progress."""
+
+    def __init__(self,
+                 limiter: Optional[BroadcastRateLimiter] = None,
+                 concurrency: int = ANNOUNCE_MAX_CONCURRENCY,
+                 page_size: int = ANNOUNCE_PAGE_SIZE,
+                 progress_interval: float = ANNOUNCE_PROGRESS_INTERVAL,
+                 max_retries: int = ANNOUNCE_MAX_RETRIES) -> None:
+        """Initialize engine.
+
+        Args:
+            limiter: Send rate limiter shared by all broadcasts.
+            concurrency: Max sends in flight.
+            page_size: Targets per page (checkpoint granularity).
+            progress_interval: Seconds between progress edits.
+            max_retries: Attempts per target on TelegramRetryAfter.
+        """
+        self._limiter = limiter or BroadcastRateLimiter()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._page_size = page_size
+        self._progress_interval = progress_interval
+        self._max_retries = max_retries
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    @property
+    def active(self) -> list[str]:
+        """IDs of broadcasts running in this process."""
+        return list(self._tasks)
+
+    async def start(  # pylint: disable=too-many-arguments
+            self, bot, *, admin_user_id: int, lang: str, source_chat_id: int,
+            source_message_id: int, progress_message, total: int,
+            target_ids: Optional[list[int]],
+            usernames: Optional[dict[int, str]]) -> Broadcast:
+        """Persist a new broadcast and start sending in the background.
+
+        Args:
+            bot: Bot instance.
+            admin_user_id: Admin who confirmed the broadcast.
+            lang: Admin's language.
+            source_chat_id: Chat of the message to broadcast.
+            source_message_id: Message to broadcast.
+            progress_message: Message edited with progress.
+            total: Number of targets.
+            target_ids: Explicit targets, None for all users.
+            usernames: Known usernames of targets.
+
+        Returns:
+            The started broadcast.
+        """
+        broadcast = Broadcast(
+            id=uuid.uuid4().hex[:12],
+            admin_user_id=admin_user_id,
+            lang=lang,
+            source_chat_id=source_chat_id,
+            source_message_id=source_message_id,
+            progress_chat_id=progress_message.chat.id,
+            progress_message_id=progress_message.message_id,
+            total=total,
+            target_ids=sorted(target_ids) if target_ids is not None else None,
+            usernames=usernames or {},
+        )
+        await _save_meta(broadcast, new=True)
+        self._spawn(bot, broadcast)
+        logger.info("broadcast.started",
+                    broadcast_id=broadcast.id,
+                    admin_user_id=admin_user_id,
+                    total=total,
+                    all_users=target_ids is None)
+        return broadcast
+
+    async def resume(self, bot) -> int:
+        """Continue unfinished broadcasts after a restart.
+
+        Args:
+            bot: Bot instance.
+
+        Returns:
+            Number of broadcasts resumed.
+        """
+        resumed = 0
+        for broadcast in await _load_active():
+            if broadcast.id in self._tasks:
+                continue
+            self._spawn(bot, broadcast)
+            resumed += 1
+            logger.info("broadcast.resumed",
+                        broadcast_id=broadcast.id,
+                        checkpoint=broadcast.checkpoint,
+                        processed=broadcast.processed,
+                        total=broadcast.total)
+        return resumed
+
+    async def join(self) -> None:
+        """Wait until running broadcasts finish."""
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    async def shutdown(self) -> None:
+        """Stop running broadcasts; they resume from their checkpoints."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _spawn(self, bot, broadcast: Broadcast) -> None:
+        """Start the broadcast task."""
+        task = asyncio.create_task(self._run(bot, broadcast),
+                                   name=f"broadcast:{broadcast.id}")
+        self._tasks[broadcast.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(broadcast.id, None))
+
+    async def _run(self, bot, broadcast: Broadcast) -> None:
+        """Send to all remaining targets page by page, then report."""
+        progress_task = asyncio.create_task(self._progress_loop(bot, broadcast))
+        suspended = False
+        try:
+            while True:
+                page = await self._next_page(broadcast)
+                if not page:
+                    break
+                sent_message_ids: dict[int, int] = {}
+                await asyncio.gather(
+                    *(self._deliver(bot, broadcast, target_id, sent_message_ids)
+                      for target_id in page
+                      if target_id not in broadcast.delivered and
+                      target_id not in broadcast.failed))
+                broadcast.checkpoint = page[-1]
+                await _save_meta(broadcast)
+                if sent_message_ids:
+                    await register_announce_topics(sent_message_ids)
+        except asyncio.CancelledError:
+            suspended = True
+            logger.info("broadcast.suspended",
+                        broadcast_id=broadcast.id,
+                        checkpoint=broadcast.checkpoint,
+                        processed=broadcast.processed)
+            raise
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("broadcast.failed",
+                         broadcast_id=broadcast.id,
+                         checkpoint=broadcast.checkpoint,
+                         error=str(e),
+                         exc_info=True)
+            return
+        finally:
+            progress_task.cancel()
+            # Only suspended broadcasts stay active for resume(); a failed
+            # one would most likely fail the same way again
+            if not suspended:
+                await _retire(broadcast)
+
+        await self._finish(bot, broadcast)
+
+    async def _next_page(self, broadcast: Broadcast) -> list[int]:
+        """Next page of target IDs after the checkpoint."""
+        if broadcast.target_ids is not None:
+            return [
+                target_id for target_id in broadcast.target_ids
+                if target_id > broadcast.checkpoint
+            ][:self._page_size]
+        async with get_session() as session:
+            return await UserRepository(session).get_user_ids_after(
+                broadcast.checkpoint, self._page_size)
+
+    async def _deliver(self, bot, broadcast: Broadcast, target_id: int,
+                       sent_message_ids: dict[int, int]) -> None:
+        """Send to one target and record the outcome."""
+        async with self._semaphore:
+            sent_message_id, error = await self._send(bot, broadcast, target_id)
+        if error is None:
+            broadcast.delivered.add(target_id)
+            if sent_message_id is not None:
+                sent_message_ids[target_id] = sent_message_id
+            record_broadcast_message("delivered")
+        else:
+            broadcast.failed[target_id] = error
+            record_broadcast_message("failed")
+        await _save_outcome(broadcast, target_id, error)
+
+    async def _send(self, bot, broadcast: Broadcast,
+                    target_id: int) -> tuple[Optional[int], Optional[str]]:
+        """Copy the message to a target (forward as fallback).
+
+        Returns:
+            Tuple of (sent message ID or None, error or None on success).
+        """
+        username = broadcast.usernames.get(target_id)
+        last_error = ""
+        for attempt in range(self._max_retries):
+            await self._limiter.acquire()
+            try:
+                result = await bot.copy_message(
+                    chat_id=target_id,
+                    from_chat_id=broadcast.source_chat_id,
+                    message_id=broadcast.source_message_id,
+                )
+                self._limiter.on_success()
+                logger.debug("announce.copy_ok",
+                             target_id=target_id,
+                             target_username=username)
+                return getattr(result, 'message_id', None), None
+            except TelegramRetryAfter as e:
+                self._limiter.on_flood(e.retry_after)
+                record_broadcast_message("flood")
+                logger.warning("announce.flood_control",
+                               target_id=target_id,
+                               retry_after=e.retry_after,
+                               attempt=attempt + 1,
+                               rate=round(self._limiter.rate, 2))
+                last_error = f"Flood control: retry_after={e.retry_after}"
+            except TelegramForbiddenError as e:
+                logger.warning("announce.copy_failed",
+                               target_id=target_id,
+                               target_username=username,
+                               error="Bot blocked by user",
+                               error_detail=str(e))
+                return None, "Bot blocked by user"
+            except TelegramBadRequest as e:
+                return await self._forward_fallback(bot, broadcast, target_id,
+                                                    str(e))
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.warning("announce.copy_failed",
+                               target_id=target_id,
+                               target_username=username,
+                               error=str(e))
+                return None, str(e)
+        return None, last_error
+
+    async def _forward_fallback(
+            self, bot, broadcast: Broadcast, target_id: int,
+            copy_error: str) -> tuple[Optional[int], Optional[str]]:
+        """Forward the message when copy_message is rejected."""
+        username = broadcast.usernames.get(target_id)
+        await self._limiter.acquire()
+        try:
+            result = await bot.forward_message(
+                chat_id=target_id,
+                from_chat_id=broadcast.source_chat_id,
+                message_id=broadcast.source_message_id,
+            )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.warning("announce.copy_and_forward_failed",
+                           target_id=target_id,
+                           target_username=username,
+                           copy_error=copy_error,
+                           forward_error=str(e))
+            return None, copy_error
+        self._limiter.on_success()
+        logger.info("announce.forward_fallback_ok",
+                    target_id=target_id,
+                    target_username=username,
+                    copy_error=copy_error)
+        return (getattr(result, 'message_thread_id', None) or
+                getattr(result, 'message_id', None)), None
+
+    async def _progress_loop(self, bot, broadcast: Broadcast) -> None:
+        """Edit the progress message periodically."""
+        last_processed = -1
+        while True:
+            await asyncio.sleep(self._progress_interval)
+            if broadcast.processed == last_processed:
+                continue
+            last_processed = broadcast.processed
+            total = max(broadcast.total, broadcast.processed, 1)
+            try:
+                await bot.edit_message_text(
+                    get_text("announce.sending_progress",
+                             broadcast.lang,
+                             sent=broadcast.processed,
+                             total=total,
+                             pct=round(broadcast.processed * 100 / total),
+                             delivered=len(broadcast.delivered),
+                             failed=len(broadcast.failed)),
+                    chat_id=broadcast.progress_chat_id,
+                    message_id=broadcast.progress_message_id,
+                )
+            except Exception:  # pylint: disable=broad-exception-caught
+                pass  # Progress is cosmetic (e.g. "message is not modified")
+
+    async def _finish(self, bot, broadcast: Broadcast) -> None:
+        """Post summary and report."""
+        logger.info("announce.broadcast_complete",
+                    broadcast_id=broadcast.id,
+                    admin_user_id=broadcast.admin_user_id,
+                    delivered=len(broadcast.delivered),
+                    failed=len(broadcast.failed),
+                    total=broadcast.total)
+
+        try:
+            await bot.edit_message_text(
+                get_text("announce.complete",
+                         broadcast.lang,
+                         delivered=len(broadcast.delivered),
+                         failed=len(broadcast.failed)),
+                chat_id=broadcast.progress_chat_id,
+                message_id=broadcast.progress_message_id,
+            )
+        except Exception:  # pylint: disable=broad-exception-caught
+            pass
+
+        if not broadcast.processed:
+            return
+        usernames = broadcast.usernames
+        if broadcast.target_ids is None:
+            try:
+                async with get_session() as session:
+                    usernames = await UserRepository(session).get_usernames(
+                        sorted(broadcast.delivered | set(broadcast.failed)))
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.warning("broadcast.usernames_failed", error=str(e))
+        report = generate_report(sorted(broadcast.delivered),
+                                 sorted(broadcast.failed.items()), usernames)
+        try:
+            await bot.send_document(
+                broadcast.progress_chat_id,
+                BufferedInputFile(
+                    report.encode("utf-8"),
+                    filename=(
+                        "broadcast_report_"
+                        f"{datetime.now(timezone.utc):%Y%m%d_%H%M%S}.txt"),
+                ),
+                caption=get_text("announce.report_caption", broadcast.lang),
+            )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.warning("broadcast.report_failed",
+                           broadcast_id=broadcast.id,
+                           error=str(e))
+
+
+# === Redis persistence (best-effort: broadcasts run without Redis) ===
+
+
+async def _save_meta(broadcast: Broadcast, new: bool = False) -> None:
+    """Persist metadata and checkpoint; register new broadcasts as active."""
+    redis = await get_redis()
+    if redis is None:
+        return
+    try:
+        pipe = redis.pipeline(transaction=False)
+        pipe.set(broadcast_meta_key(broadcast.id), encode(broadcast.meta()))
+        if new:
+            pipe.sadd(BROADCAST_ACTIVE_KEY, broadcast.id)
+        await pipe.execute()
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.warning("broadcast.save_failed",
+                       broadcast_id=broadcast.id,
+                       error=str(e))
+        await record_redis_failure()
+
+
+async def _save_outcome(broadcast: Broadcast, target_id: int,
+                        error: Optional[str]) -> None:
+    """Record one delivery outcome."""
+    redis = await get_redis()
+    if redis is None:
+        return
+    try:
+        if error is None:
+            await redis.sadd(broadcast_delivered_key(broadcast.id), target_id)
+        else:
+            await redis.hset(broadcast_failed_key(broadcast.id), target_id,
+                             error)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.warning("broadcast.save_failed",
+                       broadcast_id=broadcast.id,
+                       error=str(e))
+        await record_redis_failure()
+
+
+async def _load_active() -> list[Broadcast]:
+    """Load unfinished broadcasts with their outcomes."""
+    redis = await get_redis()
+    if redis is None:
+        return []
+    broadcasts = []
+    try:
+        for raw_id in await redis.smembers(BROADCAST_ACTIVE_KEY):
+            broadcast_id = raw_id.decode() if isinstance(raw_id,
+                                                         bytes) else raw_id
+            raw_meta = await redis.get(broadcast_meta_key(broadcast_id))
+            if raw_meta is None:
+                await redis.srem(BROADCAST_ACTIVE_KEY, broadcast_id)
+                continue
+            meta = decode(raw_meta)
+            meta["usernames"] = {
+                int(k): v for k, v in meta.get("usernames", {}).items()
+            }
+            broadcast = Broadcast(**meta)
+            broadcast.delivered = {
+                int(target_id) for target_id in await redis.smembers(
+                    broadcast_delivered_key(broadcast_id))
+            }
+            broadcast.failed = {
+                int(target_id): reason.decode()
+                for target_id, reason in (await redis.hgetall(
+                    broadcast_failed_key(broadcast_id))).items()
+            }
+            broadcasts.append(broadcast)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.error("broadcast.load_failed", error=str(e), exc_info=True)
+        await record_redis_failure()
+    return broadcasts
+
+
+async def _retire(broadcast: Broadcast) -> None:
+    """Mark finished: drop from the active set, let the state expire."""
+    redis = await get_redis()
+    if redis is None:
+        return
+    try:
+        pipe = redis.pipeline(transaction=False)
+        pipe.srem(BROADCAST_ACTIVE_KEY, broadcast.id)
+        for key in (broadcast_meta_key(broadcast.id),
+                    broadcast_delivered_key(broadcast.id),
+                    broadcast_failed_key(broadcast.id)):
+            pipe.expire(key, BROADCAST_TTL)
+        await pipe.execute()
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.warning("broadcast.retire_failed",
+                       broadcast_id=broadcast.id,
+                       error=str(e))
+        await record_redis_failure()
+
+
+async def register_announce_topics(sent_message_ids: dict[int, int]) -> None:
+    """Register announce-created topics in DB for forum chats.
+
+    When copy_message/forward_message creates a new topic in a forum chat,
+    the Thread table has no record of it. This causes /clear to miss these
+    topics. We register them here so /clear can find and delete them.
+
+    Best-effort: all errors are caught and logged, never breaks broadcast.
+
+    Args:
+        sent_message_ids: Mapping of target_id → sent message_id.
+    """
+    try:
+        async with get_session() as session:
+            # Find which targets are forum chats
+            result = await session.execute(
+                select(Chat.id).where(
+                    Chat.id.in_(list(sent_message_ids.keys())),
+                    Chat.is_forum.is_(True),
+                ))
+            forum_chat_ids = {row[0] for row in result.all()}
+
+            if not forum_chat_ids:
+                return
+
+            thread_repo = ThreadRepository(session)
+            registered = 0
+            for chat_id in forum_chat_ids:
+                message_id = sent_message_ids[chat_id]
+                try:
+                    await thread_repo.get_or_create_thread(
+                        chat_id=chat_id,
+                        user_id=chat_id,
+                        thread_id=message_id,
+                    )
+                    registered += 1
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    logger.warning(
+                        "announce.topic_register_failed",
+                        chat_id=chat_id,
+                        thread_id=message_id,
+                        error=str(e),
+                    )
+
+            if registered:
+                logger.info(
+                    "announce.topics_registered",
+                    registered=registered,
+                    forum_chats=len(forum_chat_ids),
+                )
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.warning(
+            "announce.topic_registration_error",
+            error=str(e),
+        )
+
+
+def generate_report(
+    delivered: list[int],
+    failed: list[tuple[int, str]],
+    usernames: dict[int, str] | None = None,
+) -> str:
+    """Generate a text delivery report.
+
+    Args:
+        delivered: List of user IDs that received the message.
+        failed: List of (user_id, error_reason) tuples.
+        usernames: Optional mapping of user_id → username.
+
+    Returns:
+        Report text as string.
+    """
+    usernames = usernames or {}
+    now = datetime.now(timezone.utc)
+    lines = [
+        f"Broadcast Report — {now:%Y-%m-%d %H:%M:%S} UTC",
+        f"Total: {len(delivered) + len(failed)}",
+        f"Delivered: {len(delivered)}",
+        f"Failed: {len(failed)}",
+        "",
+    ]
+
+    if delivered:
+        lines.append("=== Delivered ===")
+        for uid in delivered:
+            uname = usernames.get(uid)
+            if uname:
+                lines.append(f'{uid} "@{uname}"')
+            else:
+                lines.append(str(uid))
+        lines.append("")
+
+    if failed:
+        lines.append("=== Failed ===")
+        for uid, reason in failed:
+            uname = usernames.get(uid)
+            if uname:
+                lines.append(f'{uid} "@{uname}": {reason}')
+            else:
+                lines.append(f"{uid}: {reason}")
+        lines.append("")
+
+    return "\n".join(lines)
+
+
+from core.singleton import singleton  # pylint: disable=wrong-import-position
+
+
+@singleton
+def get_broadcast_engine() -> BroadcastEngine:
+    """Get the process-wide broadcast engine.
+
+    Returns:
+        BroadcastEngine singleton.
+    """
+    return BroadcastEngine()
@@ -19,6 +19,7 @@ from sqlalchemy import delete
 from sqlalchemy import func
 from sqlalchemy import select
 from sqlalchemy import text
+from utils.metrics import record_thread_deleted
 from utils.structured_logging import get_logger
 
 # Retention periods in days
@@ -206,6 +207,7 @@ async def cleanup_empty_threads(session, cutoff_date: datetime, logger) -> int:
     deleted = result.rowcount
 
     if deleted > 0:
+        record_thread_deleted(deleted)
         logger.info(
             "cleanup.empty_threads",
             deleted=deleted,
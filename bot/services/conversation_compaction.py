@@ -0,0 +1,454 @@
+"""Conversation compaction for models without server-side compaction.
+
+Opus 4.6 compacts long conversations on the API side and returns a
+summary that we store in messages.compaction_summary. Other models
+(Gemini, older Claude) resend the whole history on every turn, so input
+cost grows linearly with thread length.
+
+This service does the same thing client-side:
+1. After a response, the handler reports the context size
+2. Above COMPACTION_TRIGGER_TOKENS, a background task is scheduled
+3. A cheap model (Haiku / Flash-Lite) summarizes older history
+4. Summary is stored on the boundary assistant message
+5. History loaders and ContextFormatter start from the latest summary
+
+Only recent history (COMPACTION_KEEP_RECENT_TOKENS) stays verbatim.
+The user is charged for the summarization call (same as topic naming).
+
+NO __init__.py - use direct import:
+    from services.conversation_compaction import get_compaction_service
+"""
+
+import asyncio
+from typing import Any, Optional, Sequence
+
+from cache.thread_cache import invalidate_messages
+import config
+from config import get_model
+from core.clients import get_anthropic_async_client
+from core.models import TokenUsage
+from core.pricing import calculate_provider_cost
+from core.singleton import singleton
+from db.engine import get_session
+from db.models.message import Message
+from db.models.message import MessageRole
+from db.repositories.message_repository import MessageRepository
+from services.factory import ServiceFactory
+from sqlalchemy.ext.asyncio import AsyncSession
+from utils.metrics import record_cost
+from utils.metrics import record_llm_request
+from utils.metrics import record_llm_tokens
+from utils.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+COMPACTION_SYSTEM_PROMPT = """You compress chat history into a summary.
+
+<context>
+The summary replaces the earlier part of a conversation between a user and
+an AI assistant. The assistant will continue the conversation seeing only
+your summary plus the most recent messages.
+</context>
+
+<requirements>
+- Preserve facts, decisions, user preferences, names, numbers, code and
+  file names that later messages may rely on
+- Preserve open questions and tasks still in progress
+- If a previous summary is given, merge it — do not drop its content
+- Write in the language of the conversation
+- Be dense: bullet points, no greetings or filler
+</requirements>
+
+Output ONLY the summary, nothing else."""
+
+
+def estimate_tokens(content: Any) -> int:
+    """Estimate token count of message content (chars / 4).
+
+    Args:
+        content: String or list of content blocks.
+
+    Returns:
+        Estimated token count.
+    """
+    if isinstance(content, str):
+        return len(content) // 4
+    if isinstance(content, list):
+        total = 0
+        for block in content:
+            if isinstance(block, dict):
+                total += len(block.get("text") or block.get("content") or
+                             "") // 4
+            else:
+                total += len(str(block)) // 4
+        return total
+    return 0
+
+
+def _message_text(msg: Message) -> str:
+    """Plain text of a DB message for transcripts."""
+    return msg.text_content or msg.caption or ""
+
+
+def select_compaction_boundary(messages: Sequence[Message]) -> Optional[int]:
+    """Choose the assistant message to attach the summary to.
+
+    Boundary b is an assistant message answering the user message b-1.
+    Messages before b-1 are summarized; b-1 onwards stay verbatim.
+    Prefers the earliest boundary whose verbatim tail fits
+    COMPACTION_KEEP_RECENT_TOKENS.
+
+    Args:
+        messages: History ordered by date ASC, starting at the latest
+            compaction boundary (see trim_to_latest_compaction).
+
+    Returns:
+        Index of boundary message, or None if nothing worth compacting.
+    """
+    # Suffix token sums: tail_tokens[i] = tokens of messages[i:]
+    tail_tokens = [0] * (len(messages) + 1)
+    for idx in range(len(messages) - 1, -1, -1):
+        tail_tokens[idx] = (tail_tokens[idx + 1] +
+                            estimate_tokens(_message_text(messages[idx])))
+
+    candidates = [
+        idx for idx in range(config.COMPACTION_MIN_MESSAGES + 1, len(messages))
+        if messages[idx].role == MessageRole.ASSISTANT and
+        messages[idx - 1].role == MessageRole.USER and
+        not messages[idx].compaction_summary
+    ]
+    if not candidates:
+        return None
+
+    for idx in candidates:
+        if tail_tokens[idx - 1] <= config.COMPACTION_KEEP_RECENT_TOKENS:
+            return idx
+    # Tail too large even at the latest candidate - compact as much as possible
+    return candidates[-1]
+
+
+def build_transcript(messages: Sequence[Message],
+                     previous_summary: Optional[str] = None) -> str:
+    """Build summarization transcript.
+
+    Args:
+        messages: Messages to summarize (oldest first).
+        previous_summary: Summary of history before these messages.
+
+    Returns:
+        Transcript text (capped at COMPACTION_MAX_INPUT_CHARS).
+    """
+    parts = []
+    if previous_summary:
+        parts.append(f"<previous_summary>\n{previous_summary}\n"
+                     "</previous_summary>")
+
+    lines = []
+    for msg in messages:
+        text = _message_text(msg)
+        if not text:
+            continue
+        role = "User" if msg.role == MessageRole.USER else "Assistant"
+        if len(text) > config.COMPACTION_MSG_TRUNCATE:
+            text = text[:config.COMPACTION_MSG_TRUNCATE] + " [...]"
+        lines.append(f"{role}: {text}")
+    transcript = "\n\n".join(lines)
+
+    budget = config.COMPACTION_MAX_INPUT_CHARS - sum(len(p) for p in parts)
+    if len(transcript) > budget:
+        # Keep the most recent part - older content is in previous summary
+        transcript = "[...]\n" + transcript[-max(budget, 0):]
+
+    parts.append(f"<conversation>\n{transcript}\n</conversation>")
+    return "\n\n".join(parts)
+
+
+class ConversationCompactionService:
+    """Background summarizer of long conversation history."""
+
+    def __init__(self):
+        """Initialize ConversationCompactionService."""
+        self._in_progress: set[int] = set()
+        # Strong refs so background tasks aren't garbage collected
+        self._tasks: set[asyncio.Task] = set()
+
+    @staticmethod
+    def _get_summarizer_model(user_model_id: str) -> str:
+        """Get cheapest summarizer model matching user's provider.
+
+        Args:
+            user_model_id: User's current model (e.g. "google:pro").
+
+        Returns:
+            Full model ID of summarizer.
+        """
+        try:
+            if get_model(user_model_id).provider == "google":
+                return config.COMPACTION_MODEL_GOOGLE
+        except KeyError:
+            pass
+        return config.COMPACTION_MODEL_CLAUDE
+
+    def needs_compaction(self, user_model_id: str, context_tokens: int) -> bool:
+        """Check whether thread context is large enough to compact.
+
+        Args:
+            user_model_id: User's current model.
+            context_tokens: Estimated tokens of the context just sent.
+
+        Returns:
+            True if client-side compaction should run.
+        """
+        if not config.COMPACTION_ENABLED:
+            return False
+        if context_tokens < config.COMPACTION_TRIGGER_TOKENS:
+            return False
+        try:
+            # Server-side compaction handles these models
+            return not get_model(user_model_id).has_capability("compaction")
+        except KeyError:
+            return False
+
+    def schedule(
+        self,
+        thread_id: int,
+        user_id: int,
+        user_model_id: str,
+        context_tokens: int,
+    ) -> bool:
+        """Schedule background compaction if needed.
+
+        At most one compaction runs per thread at a time.
+
+        Args:
+            thread_id: Internal thread ID.
+            user_id: Telegram user ID (charged for summarization).
+            user_model_id: User's current model.
+            context_tokens: Estimated tokens of the context just sent.
+
+        Returns:
+            True if a compaction task was scheduled.
+        """
+        if not self.needs_compaction(user_model_id, context_tokens):
+            return False
+        if thread_id in self._in_progress:
+            logger.debug("compaction.already_running", thread_id=thread_id)
+            return False
+
+        self._in_progress.add(thread_id)
+        task = asyncio.create_task(
+            self._run(thread_id, user_id, user_model_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+        logger.info("compaction.scheduled",
+                    thread_id=thread_id,
+                    user_id=user_id,
+                    model_id=user_model_id,
+                    context_tokens=context_tokens)
+        return True
+
+    async def _run(self, thread_id: int, user_id: int,
+                   user_model_id: str) -> None:
+        """Background task body with own DB session."""
+        try:
+            async with get_session() as session:
+                await self.compact_thread(session, thread_id, user_id,
+                                          user_model_id)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.info("compaction.failed",
+                        thread_id=thread_id,
+                        error=str(e),
+                        error_type=type(e).__name__)
+        finally:
+            self._in_progress.discard(thread_id)
+
+    async def compact_thread(
+        self,
+        session: AsyncSession,
+        thread_id: int,
+        user_id: int,
+        user_model_id: str,
+    ) -> Optional[str]:
+        """Summarize older history of a thread and store the summary.
+
+        Args:
+            session: Database session.
+            thread_id: Internal thread ID.
+            user_id: Telegram user ID (charged for summarization).
+            user_model_id: User's current model (selects summarizer).
+
+        Returns:
+            Summary text, or None if nothing was compacted.
+        """
+        msg_repo = MessageRepository(session)
+        history = await msg_repo.get_thread_messages(thread_id,
+                                                     since_compaction=True)
+
+        boundary = select_compaction_boundary(history)
+        if boundary is None:
+            logger.debug("compaction.nothing_to_compact",
+                         thread_id=thread_id,
+                         message_count=len(history))
+            return None
+
+        previous_summary = None
+        for msg in history[:boundary]:
+            if msg.compaction_summary:
+                previous_summary = msg.compaction_summary
+
+        transcript = build_transcript(history[:boundary - 1], previous_summary)
+        summarizer = self._get_summarizer_model(user_model_id)
+        summary, usage = await self.summarize(summarizer, transcript)
+        if not summary:
+            logger.info("compaction.empty_summary", thread_id=thread_id)
+            return None
+
+        boundary_msg = history[boundary]
+        await msg_repo.set_compaction_summary(boundary_msg.chat_id,
+                                              boundary_msg.message_id, summary)
+        await session.commit()
+        # Cached history lacks the summary - reload on next request
+        await invalidate_messages(thread_id)
+
+        cost_usd = calculate_provider_cost(summarizer, usage)
+        logger.info("compaction.completed",
+                    thread_id=thread_id,
+                    user_id=user_id,
+                    model=summarizer,
+                    summarized_messages=boundary - 1,
+                    kept_messages=len(history) - boundary + 1,
+                    transcript_chars=len(transcript),
+                    summary_chars=len(summary),
+                    input_tokens=usage.input_tokens,
+                    output_tokens=usage.output_tokens,
+                    cost_usd=float(cost_usd))
+
+        await self._charge(session, user_id, summarizer, usage, cost_usd)
+        return summary
+
+    async def _charge(self, session: AsyncSession, user_id: int,
+                      summarizer: str, usage: TokenUsage, cost_usd) -> None:
+        """Record metrics and charge user for the summarization call."""
+        api_model = get_model(summarizer).model_id
+        record_llm_request(model=api_model, success=True)
+        record_llm_tokens(model=api_model,
+                          input_tokens=usage.input_tokens,
+                          output_tokens=usage.output_tokens,
+                          cache_read_tokens=0,
+                          cache_write_tokens=0)
+        record_cost(service="compaction", amount_usd=float(cost_usd))
+
+        if cost_usd <= 0:
+            # No usage reported (e.g. Gemini without usage_metadata)
+            return
+
+        try:
+            services = ServiceFactory(session)
+            await services.balance.charge_user(
+                user_id=user_id,
+                amount=cost_usd,
+                description=(f"Conversation compaction: "
+                             f"{usage.input_tokens} input + "
+                             f"{usage.output_tokens} output tokens"),
+                related_message_id=None,
+            )
+            await session.commit()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            # Summary already stored - log for manual reconciliation
+            logger.error("compaction.charge_failed",
+                         user_id=user_id,
+                         cost_usd=float(cost_usd),
+                         error=str(e),
+                         exc_info=True)
+
+    async def summarize(self, summarizer: str,
+                        transcript: str) -> tuple[str, TokenUsage]:
+        """Run summarization on the cheap model.
+
+        Args:
+            summarizer: Full model ID of summarizer.
+            transcript: Conversation transcript.
+
+        Returns:
+            Tuple of (summary, token usage).
+        """
+        model_config = get_model(summarizer)
+        if model_config.provider == "google":
+            return await self._summarize_google(model_config.model_id,
+                                                transcript)
+        return await self._summarize_claude(model_config.model_id, transcript)
+
+    @staticmethod
+    async def _summarize_claude(model_id: str,
+                                transcript: str) -> tuple[str, TokenUsage]:
+        """Summarize via Claude API."""
+        client = get_anthropic_async_client()
+        response = await client.messages.create(
+            model=model_id,
+            max_tokens=config.COMPACTION_MAX_TOKENS,
+            system=COMPACTION_SYSTEM_PROMPT,
+            messages=[{
+                "role": "user",
+                "content": transcript,
+            }],
+        )
+        summary = "".join(
+            getattr(block, "text", "") for block in response.content).strip()
+        usage = TokenUsage(input_tokens=response.usage.input_tokens,
+                           output_tokens=response.usage.output_tokens)
+        return summary, usage
+
+    @staticmethod
+    async def _summarize_google(model_id: str,
+                                transcript: str) -> tuple[str, TokenUsage]:
+        """Summarize via Google Gemini API."""
+        from core.clients import get_google_client  # pylint: disable=import-outside-toplevel
+        from google.genai import types as genai_types  # pylint: disable=import-outside-toplevel
+
+        client = get_google_client()
+        gen_config = genai_types.GenerateContentConfig(
+            system_instruction=COMPACTION_SYSTEM_PROMPT,
+            max_output_tokens=config.COMPACTION_MAX_TOKENS,
+            temperature=0.3,
+        )
+
+        def _sync_generate():
+            return client.models.generate_content(
+                model=model_id,
+                contents=[{
+                    "role": "user",
+                    "parts": [{
+                        "text": transcript
+                    }],
+                }],
+                config=gen_config,
+            )
+
+        response = await asyncio.to_thread(_sync_generate)
+
+        summary = ""
+        if response.candidates and response.candidates[0].content:
+            for part in response.candidates[0].content.parts:
+                if part.text:
+                    summary += part.text
+
+        input_tokens = 0
+        output_tokens = 0
+        if getattr(response, 'usage_metadata', None):
+            meta = response.usage_metadata
+            input_tokens = getattr(meta, 'prompt_token_count', 0) or 0
+            output_tokens = getattr(meta, 'candidates_token_count', 0) or 0
+
+        return summary.strip(), TokenUsage(input_tokens=input_tokens,
+                                           output_tokens=output_tokens)
+
+
+@singleton
+def get_compaction_service() -> ConversationCompactionService:
+    """Get or create ConversationCompactionService instance.
+
+    Returns:
+        ConversationCompactionService singleton.
+    """
+    return ConversationCompactionService()
@@ -0,0 +1,452 @@
+"""Operational metrics collector.
+
+Collects the gauges exported on /metrics without stalling the event loop:
+
+- Disk usage: directory walks run in a worker thread. Per-directory file
+  totals are cached and reused while the directory mtime is unchanged
+  (files added/removed/renamed bump it); files growing in place inside
+  unchanged directories are picked up by a periodic full re-stat
+  (METRICS_DISK_FULL_RESCAN).
+- Aggregates: user/thread/balance totals are adjusted incrementally at the
+  write sites (record_user_created, record_balance_change, ...). Active
+  users, active Files API files and top users are kept in memory by
+  AggregateTracker, fed from write-behind flushes and file uploads.
+  Full DB aggregate queries only run at startup and every
+  METRICS_RESEED_INTERVAL to repair drift.
+- Each collector run is timed (bot_metrics_collector_seconds).
+
+NO __init__.py - use direct import:
+    from services.metrics_collector import get_aggregate_tracker
+"""
+
+import asyncio
+from dataclasses import dataclass
+from dataclasses import field
+import heapq
+import os
+import time
+from typing import Awaitable, Callable, Optional
+
+from config import METRICS_COLLECT_INTERVAL
+from config import METRICS_DISK_FULL_RESCAN
+from config import METRICS_TOP_USERS_TRACKED
+from core.singleton import singleton
+from utils.metrics import record_metrics_collection
+from utils.metrics import set_active_files
+from utils.metrics import set_active_users
+from utils.metrics import set_disk_usage
+from utils.metrics import set_top_users
+from utils.metrics import set_total_balance
+from utils.metrics import set_total_threads
+from utils.metrics import set_total_users
+from utils.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Sliding window for bot_active_users (matches get_active_users(hours=1))
+ACTIVE_USERS_WINDOW = 3600
+
+# Number of ranks exported per top-users gauge
+TOP_USERS_EXPORTED = 10
+
+# === Disk usage ===
+
+
+@dataclass
+class _DirEntry:
+    """Cached scan result for one directory (direct children only)."""
+
+    mtime_ns: int
+    files_bytes: int
+    subdirs: tuple[str, ...]
+    scanned_at: float
+
+
+class DirectorySizeCache:
+    """Incremental recursive directory size measurement.
+
+    Not thread-safe; use from one worker thread at a time.
+    """
+
+    def __init__(self, full_rescan_interval: float = METRICS_DISK_FULL_RESCAN):
+        """Initialize cache.
+
+        Args:
+            full_rescan_interval: Seconds after which files in an unchanged
+                directory are re-stat'ed anyway (in-place growth).
+        """
+        self._full_rescan_interval = full_rescan_interval
+        self._dirs: dict[str, _DirEntry] = {}
+        self.last_scanned = 0
+        self.last_reused = 0
+
+    def size(self, root: str) -> int:
+        """Get total size of files under root (blocking).
+
+        Args:
+            root: Directory path.
+
+        Returns:
+            Total size in bytes, 0 if root doesn't exist.
+        """
+        now = time.monotonic()
+        total = 0
+        seen: set[str] = set()
+        self.last_scanned = 0
+        self.last_reused = 0
+        stack = [root]
+
+        while stack:
+            path = stack.pop()
+            entry = self._scan(path, now)
+            if entry is None:
+                continue
+            seen.add(path)
+            total += entry.files_bytes
+            stack.extend(entry.subdirs)
+
+        # Forget directories that disappeared under this root
+        prefix = root.rstrip(os.sep) + os.sep
+        for path in [
+                p for p in self._dirs
+                if (p == root or p.startswith(prefix)) and p not in seen
+        ]:
+            del self._dirs[path]
+
+        return total
+
+    def _scan(self, path: str, now: float) -> Optional[_DirEntry]:
+        """Scan one directory, reusing cached totals when unchanged."""
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+        cached = self._dirs.get(path)
+        if (cached is not None and cached.mtime_ns == mtime_ns and
+                now - cached.scanned_at < self._full_rescan_interval):
+            self.last_reused += 1
+            return cached
+
+        files_bytes = 0
+        subdirs = []
+        try:
+            with os.scandir(path) as it:
+                for child in it:
+                    try:
+                        if child.is_dir(follow_symlinks=False):
+                            subdirs.append(child.path)
+                        elif child.is_file(follow_symlinks=False):
+                            files_bytes += child.stat(
+                                follow_symlinks=False).st_size
+                    except OSError:
+                        pass
+        except OSError:
+            return None
+
+        entry = _DirEntry(mtime_ns=mtime_ns,
+                          files_bytes=files_bytes,
+                          subdirs=tuple(subdirs),
+                          scanned_at=now)
+        self._dirs[path] = entry
+        self.last_scanned += 1
+        return entry
+
+
+class DiskUsageCollector:
+    """Disk usage gauges, measured in a worker thread."""
+
+    def __init__(self, volumes: dict[str, str],
+                 cache: Optional[DirectorySizeCache] = None):
+        """Initialize collector.
+
+        Args:
+            volumes: Volume name -> mount path.
+            cache: Directory size cache (new one if not provided).
+        """
+        self._volumes = volumes
+        self._cache = cache or DirectorySizeCache()
+
+    def measure(self) -> dict[str, int]:
+        """Measure all volumes (blocking).
+
+        Returns:
+            Volume name -> size in bytes.
+        """
+        scanned = reused = 0
+        sizes = {}
+        for name, path in self._volumes.items():
+            sizes[name] = self._cache.size(path)
+            scanned += self._cache.last_scanned
+            reused += self._cache.last_reused
+
+        logger.debug("metrics.disk_measured",
+                     dirs_scanned=scanned,
+                     dirs_reused=reused,
+                     total_bytes=sum(sizes.values()))
+        return sizes
+
+    async def __call__(self) -> None:
+        """Measure off the event loop and publish gauges."""
+        sizes = await asyncio.to_thread(self.measure)
+        for name, size in sizes.items():
+            set_disk_usage(name, size)
+        set_disk_usage('total', sum(sizes.values()))
+
+
+# === Aggregates ===
+
+
+class AggregateTracker:
+    """In-memory state behind sliding-window and top-N gauges.
+
+    Fed by write paths (write-behind flush, file uploads) and published
+    every collector tick without touching the database. seed() replaces
+    the state with a fresh DB snapshot.
+    """
+
+    def __init__(self, tracked_users: int = METRICS_TOP_USERS_TRACKED):
+        """Initialize tracker.
+
+        Args:
+            tracked_users: Top-user candidates kept per metric.
+        """
+        self._tracked_users = tracked_users
+        # user_id -> last activity (unix time)
+        self._last_seen: dict[int, float] = {}
+        # Min-heap of Files API expiry times (unix time)
+        self._file_expiries: list[float] = []
+        # user_id -> (username, message_count, total_tokens_used)
+        self._user_stats: dict[int, tuple[Optional[str], int, int]] = {}
+
+    def seed(self, last_seen: dict[int, float], file_expiries: list[float],
+             user_stats: dict[int, tuple[Optional[str], int, int]]) -> None:
+        """Replace state with a DB snapshot.
+
+        Args:
+            last_seen: user_id -> last activity for recently active users.
+            file_expiries: Expiry times of non-expired Files API files.
+            user_stats: user_id -> (username, messages, tokens) for the
+                current top users.
+        """
+        self._last_seen = dict(last_seen)
+        self._file_expiries = list(file_expiries)
+        heapq.heapify(self._file_expiries)
+        self._user_stats = dict(user_stats)
+
+    def user_active(self, user_id: int, at: Optional[float] = None) -> None:
+        """Mark user as active.
+
+        Args:
+            user_id: Telegram user ID.
+            at: Activity time (unix, default now).
+        """
+        at = at if at is not None else time.time()
+        if at > self._last_seen.get(user_id, 0):
+            self._last_seen[user_id] = at
+
+    def file_created(self, expires_at: float) -> None:
+        """Count a new Files API file until it expires.
+
+        Args:
+            expires_at: Expiry time (unix).
+        """
+        heapq.heappush(self._file_expiries, expires_at)
+
+    def user_stats(self, user_id: int, username: Optional[str], messages: int,
+                   tokens: int) -> None:
+        """Record a user's current (absolute) totals.
+
+        Args:
+            user_id: Telegram user ID.
+            username: Telegram username.
+            messages: Total message count.
+            tokens: Total tokens used.
+        """
+        self._user_stats[user_id] = (username, messages, tokens)
+
+    def active_users(self, now: Optional[float] = None) -> int:
+        """Users active within the window (prunes older entries)."""
+        cutoff = (now if now is not None else time.time()) - ACTIVE_USERS_WINDOW
+        stale = [u for u, ts in self._last_seen.items() if ts < cutoff]
+        for user_id in stale:
+            del self._last_seen[user_id]
+        return len(self._last_seen)
+
+    def active_files(self, now: Optional[float] = None) -> int:
+        """Files not yet expired (pops expired entries)."""
+        now = now if now is not None else time.time()
+        while self._file_expiries and self._file_expiries[0] <= now:
+            heapq.heappop(self._file_expiries)
+        return len(self._file_expiries)
+
+    def top_users(self,
+                  by: str,
+                  limit: int = TOP_USERS_EXPORTED
+                 ) -> list[tuple[str, Optional[str], int, int]]:
+        """Top users by "messages" or "tokens".
+
+        Returns:
+            List of (user_id, username, messages, tokens) tuples.
+        """
+        idx = 1 if by == "messages" else 2
+        ranked = sorted(self._user_stats.items(),
+                        key=lambda item: item[1][idx],
+                        reverse=True)[:limit]
+        return [(str(user_id), stats[0], stats[1], stats[2])
+                for user_id, stats in ranked]
+
+    def publish(self, now: Optional[float] = None) -> None:
+        """Set gauges from in-memory state."""
+        set_active_users(self.active_users(now))
+        set_active_files(self.active_files(now))
+        set_top_users(self.top_users("messages"), metric_type="messages")
+        set_top_users(self.top_users("tokens"), metric_type="tokens")
+        self._prune_user_stats()
+
+    def _prune_user_stats(self) -> None:
+        """Keep only top candidates (dropped users re-enter on next flush)."""
+        if len(self._user_stats) <= 2 * self._tracked_users:
+            return
+        keep = {
+            int(u[0]) for u in self.top_users("messages", self._tracked_users)
+        }
+        keep.update(
+            int(u[0]) for u in self.top_users("tokens", self._tracked_users))
+        self._user_stats = {
+            u: s for u, s in self._user_stats.items() if u in keep
+        }
+
+
+@singleton
+def get_aggregate_tracker() -> AggregateTracker:
+    """Get the global aggregate tracker.
+
+    Returns:
+        AggregateTracker singleton.
+    """
+    return AggregateTracker()
+
+
+async def reseed_aggregates() -> None:
+    """Load aggregate gauges and tracker state from the database.
+
+    Runs at startup and every METRICS_RESEED_INTERVAL; in between the
+    gauges are maintained incrementally.
+    """
+    # pylint: disable=import-outside-toplevel
+    from db.engine import get_session
+    from db.repositories.thread_repository import ThreadRepository
+    from db.repositories.user_file_repository import UserFileRepository
+    from db.repositories.user_repository import UserRepository
+
+    tracked = METRICS_TOP_USERS_TRACKED
+    async with get_session() as session:
+        user_repo = UserRepository(session)
+        active = await user_repo.get_active_users(hours=1)
+        total_balance = await user_repo.get_total_balance()
+        total_users = await user_repo.get_users_count()
+        top_users = await user_repo.get_top_users(limit=tracked, by="messages")
+        top_users += await user_repo.get_top_users(limit=tracked, by="tokens")
+        expiries = await UserFileRepository(
+            session).get_active_file_expiries()
+        total_threads = await ThreadRepository(session).get_threads_count()
+
+    set_total_balance(float(total_balance))
+    set_total_users(total_users)
+    set_total_threads(total_threads)
+    get_aggregate_tracker().seed(
+        last_seen={
+            u.id: u.last_seen_at.timestamp() for u in active if u.last_seen_at
+        },
+        file_expiries=[e.timestamp() for e in expiries],
+        user_stats={
+            u.id: (u.username, u.message_count, u.total_tokens_used)
+            for u in top_users
+        },
+    )
+
+    logger.debug("metrics.aggregates_reseeded",
+                 active_users=len(active),
+                 active_files=len(expiries),
+                 total_users=total_users,
+                 total_threads=total_threads,
+                 total_balance=float(total_balance))
+
+
+async def publish_aggregates() -> None:
+    """Publish tracker state to gauges (no DB access)."""
+    get_aggregate_tracker().publish()
+
+
+# === Scheduler ===
+
+
+@dataclass
+class _Collector:
+    """Registered collector with its schedule."""
+
+    name: str
+    interval: float
+    collect: Callable[[], Awaitable[None]]
+    next_run: float = field(default=0.0)
+
+
+class MetricsCollector:
+    """Runs registered collectors on their intervals, timing each run.
+
+    Usage:
+        collector = MetricsCollector()
+        collector.add("disk", 60, DiskUsageCollector(volumes))
+        await collector.run()  # until cancelled
+    """
+
+    def __init__(self, tick: float = METRICS_COLLECT_INTERVAL):
+        """Initialize collector.
+
+        Args:
+            tick: Seconds between schedule checks.
+        """
+        self._tick = tick
+        self._collectors: list[_Collector] = []
+
+    def add(self, name: str, interval: float,
+            collect: Callable[[], Awaitable[None]]) -> None:
+        """Register a collector (first run on the next tick).
+
+        Args:
+            name: Collector name (metric label).
+            interval: Seconds between runs.
+            collect: Async callable that updates gauges.
+        """
+        self._collectors.append(_Collector(name, interval, collect))
+
+    async def collect_due(self, now: Optional[float] = None) -> None:
+        """Run collectors whose interval has elapsed.
+
+        A failing collector is logged and doesn't affect the others.
+        """
+        now = now if now is not None else time.monotonic()
+        for collector in self._collectors:
+            if now < collector.next_run:
+                continue
+            collector.next_run = now + collector.interval
+            start = time.perf_counter()
+            try:
+                await collector.collect()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.error("metrics.collector_error",
+                             collector=collector.name,
+                             error=str(e),
+                             exc_info=True)
+            finally:
+                record_metrics_collection(collector.name,
+                                          time.perf_counter() - start)
+
+    async def run(self) -> None:
+        """Collect forever (cancel to stop)."""
+        while True:
+            await self.collect_due()
+            await asyncio.sleep(self._tick)
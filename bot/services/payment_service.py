@@ -17,8 +17,8 @@ from decimal import ROUND_HALF_UP
 
 from aiogram import Bot
 from aiogram.types import LabeledPrice
+from cache.user_cache import adjust_cached_balance
 from cache.user_cache import invalidate_user
-from cache.user_cache import update_cached_balance
 from config import DEFAULT_OWNER_MARGIN
 from config import PAYMENT_INVOICE_DESCRIPTION_TEMPLATE
 from config import PAYMENT_INVOICE_TITLE
@@ -35,6 +35,7 @@ from db.repositories.balance_operation_repository import \
 from db.repositories.payment_repository import PaymentRepository
 from db.repositories.user_repository import UserRepository
 from sqlalchemy.ext.asyncio import AsyncSession
+from utils.metrics import record_balance_change
 from utils.structured_logging import get_logger
 
 logger = get_logger(__name__)
@@ -348,9 +349,11 @@ class PaymentService:
             charge_id=telegram_payment_charge_id,
             msg="Payment processed and balance credited",
         )
+        record_balance_change(float(balance_after - balance_before))
 
-        # Phase 3.2: Update cache with new balance
-        await update_cached_balance(user_id, balance_after)
+        # Phase 3.2: Update cache with new balance (as a delta: the cached
+        # balance may hold charges not yet written to Postgres)
+        await adjust_cached_balance(user_id, balance_after - balance_before)
 
         return payment
 
@@ -489,8 +492,9 @@ class PaymentService:
             charge_id=telegram_payment_charge_id,
             msg="Refund processed and balance deducted",
         )
+        record_balance_change(float(balance_after - balance_before))
 
-        # Phase 3.2: Update cache with new balance
-        await update_cached_balance(user_id, balance_after)
+        # Phase 3.2: Update cache with new balance (as a delta)
+        await adjust_cached_balance(user_id, balance_after - balance_before)
 
         return payment
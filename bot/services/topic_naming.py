@@ -21,7 +21,6 @@ from decimal import Decimal
 from typing import Optional
 
 from aiogram import Bot
-from cache.user_cache import update_cached_balance
 import config
 from core.clients import get_anthropic_async_client
 from core.pricing import calculate_claude_cost
@@ -342,9 +341,7 @@ class TopicNamingService:
                     related_message_id=None,
                 )
 
-                # Update cached balance
-                await update_cached_balance(user_id, balance_after)
-
+                # charge_user keeps the cached balance in sync
                 logger.info(
                     "topic_naming.charge_success",
                     user_id=user_id,
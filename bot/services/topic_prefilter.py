@@ -0,0 +1,305 @@
+"""Local topic relevance pre-filter (before the Haiku call).
+
+Scores the incoming message against recent topic contexts (title +
+recent user messages from load_recent_topic_contexts) with TF-IDF over
+character trigrams. Character trigrams tolerate word inflection (Russian)
+and typos without any model or external dependency.
+
+Only high-confidence "stay" and "resume" decisions are made locally;
+everything else (including "new", which needs a title) goes to the LLM.
+
+NO __init__.py - use direct import:
+    from services.topic_prefilter import TopicPrefilter
+"""
+
+from collections import Counter
+from dataclasses import dataclass
+import math
+import re
+from typing import TYPE_CHECKING
+
+import config
+
+if TYPE_CHECKING:
+    from services.topic_relevance import TopicContext
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Function words carry no topic signal
+_STOPWORDS = frozenset({
+    # English
+    "the",
+    "and",
+    "for",
+    "are",
+    "was",
+    "what",
+    "how",
+    "why",
+    "who",
+    "about",
+    "this",
+    "that",
+    "with",
+    "you",
+    "your",
+    "can",
+    "could",
+    "would",
+    "should",
+    "does",
+    "did",
+    "have",
+    "has",
+    "not",
+    "but",
+    "all",
+    "any",
+    "some",
+    "more",
+    "please",
+    "thanks",
+    "thank",
+    "show",
+    "tell",
+    "give",
+    "make",
+    "get",
+    "still",
+    "also",
+    "just",
+    "now",
+    "then",
+    "there",
+    "here",
+    "one",
+    "it",
+    "is",
+    "to",
+    "of",
+    "in",
+    "on",
+    "do",
+    "me",
+    "my",
+    "an",
+    "or",
+    "if",
+    "so",
+    # Russian
+    "как",
+    "что",
+    "это",
+    "для",
+    "про",
+    "или",
+    "так",
+    "все",
+    "ещё",
+    "еще",
+    "уже",
+    "где",
+    "когда",
+    "почему",
+    "зачем",
+    "мне",
+    "меня",
+    "мой",
+    "моя",
+    "тебя",
+    "тебе",
+    "вот",
+    "был",
+    "была",
+    "было",
+    "есть",
+    "нет",
+    "да",
+    "можно",
+    "нужно",
+    "надо",
+    "пожалуйста",
+    "спасибо",
+    "покажи",
+    "скажи",
+    "сделай",
+    "дай",
+    "его",
+    "она",
+    "они",
+    "оно",
+    "там",
+    "тут",
+    "ли",
+    "не",
+    "на",
+    "по",
+    "из",
+    "за",
+    "от",
+    "до",
+    "и",
+    "в",
+    "с",
+    "к",
+    "у",
+    "о",
+    "а",
+})
+
+
+@dataclass(frozen=True)
+class PrefilterScore:
+    """Similarity of the message to each topic."""
+
+    current: float  # 0.0 when from General
+    others: tuple[float, ...]  # Same order as other_topics
+
+
+@dataclass(frozen=True)
+class PrefilterDecision:
+    """Local routing decision."""
+
+    action: str  # "stay" | "resume"
+    target: "TopicContext | None" = None  # For "resume"
+
+
+def _features(text: str) -> Counter:
+    """Character trigram counts of content words."""
+    grams: Counter = Counter()
+    for word in _WORD_RE.findall(text.lower()):
+        if len(word) < 3 or word in _STOPWORDS or word.isdigit():
+            continue
+        padded = f" {word} "
+        for idx in range(len(padded) - 2):
+            grams[padded[idx:idx + 3]] += 1
+    return grams
+
+
+def _topic_text(topic: "TopicContext") -> str:
+    """Text representing a topic (title weighted twice)."""
+    return " ".join([topic.title, topic.title, *topic.recent_user_messages])
+
+
+def _tfidf(grams: Counter, idf: dict[str, float]) -> dict[str, float]:
+    """Sublinear TF-IDF vector, L2-normalized."""
+    vec = {g: (1.0 + math.log(tf)) * idf[g] for g, tf in grams.items()}
+    norm = math.sqrt(sum(v * v for v in vec.values()))
+    if norm == 0:
+        return {}
+    return {g: v / norm for g, v in vec.items()}
+
+
+def _cosine(a: dict[str, float], b: dict[str, float]) -> float:
+    """Cosine similarity of normalized sparse vectors."""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(g, 0.0) for g, v in a.items())
+
+
+def score_topics(
+    new_message: str,
+    current_topic: "TopicContext | None",
+    other_topics: "list[TopicContext]",
+) -> PrefilterScore | None:
+    """Score message similarity to current and other topics.
+
+    IDF is computed over the candidate topic documents, so trigrams shared
+    by all topics (common vocabulary) get low weight.
+
+    Args:
+        new_message: Incoming message text.
+        current_topic: Current topic (None from General).
+        other_topics: Other recent topics.
+
+    Returns:
+        PrefilterScore, or None if message has no content words.
+    """
+    query = _features(new_message)
+    if not query:
+        return None
+
+    topics = ([current_topic] if current_topic else []) + list(other_topics)
+    docs = [_features(_topic_text(t)) for t in topics]
+
+    n_docs = len(docs) + 1
+    doc_freq: Counter = Counter()
+    for grams in [query, *docs]:
+        doc_freq.update(grams.keys())
+    idf = {
+        g: math.log((n_docs + 1) / (df + 1)) + 1.0
+        for g, df in doc_freq.items()
+    }
+
+    query_vec = _tfidf(query, idf)
+    scores = [_cosine(query_vec, _tfidf(doc, idf)) for doc in docs]
+
+    if current_topic:
+        return PrefilterScore(current=scores[0], others=tuple(scores[1:]))
+    return PrefilterScore(current=0.0, others=tuple(scores))
+
+
+class TopicPrefilter:
+    """High-confidence local routing decisions."""
+
+    def __init__(
+        self,
+        stay_min_score: float | None = None,
+        resume_min_score: float | None = None,
+        min_margin: float | None = None,
+    ):
+        """Initialize TopicPrefilter.
+
+        Args:
+            stay_min_score: Min similarity to current topic for "stay".
+                Default: config.TOPIC_PREFILTER_STAY_MIN_SCORE
+            resume_min_score: Min similarity to other topic for "resume".
+                Default: config.TOPIC_PREFILTER_RESUME_MIN_SCORE
+            min_margin: Min lead over the runner-up topic.
+                Default: config.TOPIC_PREFILTER_MIN_MARGIN
+        """
+        self.stay_min_score = (stay_min_score if stay_min_score is not None else
+                               config.TOPIC_PREFILTER_STAY_MIN_SCORE)
+        self.resume_min_score = (resume_min_score
+                                 if resume_min_score is not None else
+                                 config.TOPIC_PREFILTER_RESUME_MIN_SCORE)
+        self.min_margin = (min_margin if min_margin is not None else
+                           config.TOPIC_PREFILTER_MIN_MARGIN)
+
+    def decide(
+        self,
+        new_message: str,
+        current_topic: "TopicContext | None",
+        other_topics: "list[TopicContext]",
+    ) -> tuple[PrefilterDecision | None, PrefilterScore | None]:
+        """Decide locally if confident enough.
+
+        Args:
+            new_message: Incoming message text.
+            current_topic: Current topic (None from General).
+            other_topics: Other recent topics.
+
+        Returns:
+            Tuple of (decision or None to ask the LLM, scores).
+        """
+        if len(new_message.strip()) < config.TOPIC_PREFILTER_MIN_MESSAGE_CHARS:
+            return None, None
+
+        score = score_topics(new_message, current_topic, other_topics)
+        if score is None:
+            return None, None
+
+        best_other = max(score.others, default=0.0)
+
+        if (current_topic and score.current >= self.stay_min_score and
+                score.current - best_other >= self.min_margin):
+            return PrefilterDecision(action="stay"), score
+
+        if score.others and best_other >= self.resume_min_score:
+            ranked = sorted(score.others, reverse=True)
+            runner_up = max(score.current, ranked[1] if len(ranked) > 1 else 0)
+            if best_other - runner_up >= self.min_margin:
+                target = other_topics[score.others.index(best_other)]
+                return PrefilterDecision(action="resume", target=target), score
+
+        return None, score
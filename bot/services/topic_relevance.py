@@ -12,21 +12,30 @@ NO __init__.py - use direct import:
 """
 
 import asyncio
+from collections import OrderedDict
 from dataclasses import dataclass
 from dataclasses import field
+import hashlib
 import json
+import random
 import string
 import time
 
 from cache.client import get_redis
+from cache.codec import decode
+from cache.codec import encode
 from cache.thread_cache import get_cached_messages
 import config
 from core.clients import get_anthropic_async_client
 from core.pricing import calculate_claude_cost
 from db.models.thread import Thread
 from db.repositories.thread_repository import ThreadRepository
+from services.topic_prefilter import PrefilterDecision
+from services.topic_prefilter import TopicPrefilter
 from sqlalchemy.ext.asyncio import AsyncSession
 from utils.metrics import record_cost
+from utils.metrics import record_topic_decision
+from utils.metrics import record_topic_prefilter_agreement
 from utils.structured_logging import get_logger
 
 # Cache TTL for recent topics list (short — topics change often)
@@ -72,21 +81,34 @@ TOPIC_LABELS = list(string.ascii_uppercase)
 
 
 class TopicRelevanceService:
-    """Haiku-based topic relevance checker."""
+    """Topic relevance checker.
+
+    Decision order: recent decision cache → local pre-filter (high
+    confidence "stay"/"resume") → Haiku. A sample of local decisions is
+    verified by Haiku in the background to track agreement.
+    """
 
     def __init__(
         self,
         model: str | None = None,
         max_tokens: int | None = None,
+        prefilter: TopicPrefilter | None = None,
     ):
         """Initialize TopicRelevanceService.
 
         Args:
             model: Model to use. Default: config.TOPIC_ROUTING_MODEL
             max_tokens: Max tokens. Default: config.TOPIC_ROUTING_MAX_TOKENS
+            prefilter: Local pre-filter. Creates default if None.
         """
         self.model = model or config.TOPIC_ROUTING_MODEL
         self.max_tokens = max_tokens or config.TOPIC_ROUTING_MAX_TOKENS
+        self.prefilter = prefilter or TopicPrefilter()
+        # decision key -> (result, expires_at)
+        self._decisions: OrderedDict[str, tuple[RelevanceResult,
+                                                float]] = OrderedDict()
+        # Strong refs so verification tasks aren't garbage collected
+        self._verify_tasks: set[asyncio.Task] = set()
 
     async def check_relevance(
         self,
@@ -112,6 +134,156 @@ class TopicRelevanceService:
             logger.debug("topic_relevance.empty_message_new")
             return RelevanceResult(action="new", title="New chat")
 
+        key = self._decision_key(new_message, current_topic, other_topics)
+        cached = self._get_cached_decision(key)
+        if cached is not None:
+            record_topic_decision(source="cache", action=cached.action)
+            logger.info("topic_relevance.decision_cache_hit",
+                        action=cached.action,
+                        target_thread_id=cached.target_thread_id)
+            return cached
+
+        if config.TOPIC_PREFILTER_ENABLED:
+            prefilter_start = time.perf_counter()
+            local, score = self.prefilter.decide(new_message, current_topic,
+                                                 other_topics)
+            prefilter_ms = (time.perf_counter() - prefilter_start) * 1000
+            if local is not None:
+                result = self._from_local(local)
+                record_topic_decision(source="local", action=result.action)
+                logger.info(
+                    "topic_relevance.local_decision",
+                    action=result.action,
+                    target_thread_id=result.target_thread_id,
+                    score_current=round(score.current, 3),
+                    score_others=[round(x, 3) for x in score.others],
+                    prefilter_ms=round(prefilter_ms, 2),
+                )
+                self._cache_decision(key, result)
+                if random.random() < config.TOPIC_PREFILTER_VERIFY_SAMPLE_RATE:
+                    self._schedule_verification(result, new_message,
+                                                current_topic, other_topics)
+                return result
+
+        result = await self._check_with_llm(new_message, current_topic,
+                                            other_topics)
+        if result is None:
+            # Safe fallback (not cached - retry LLM next time)
+            record_topic_decision(source="fallback",
+                                  action="stay" if current_topic else "new")
+            if current_topic:
+                return RelevanceResult(action="stay")
+            return RelevanceResult(action="new", title="New chat")
+
+        record_topic_decision(source="llm", action=result.action)
+        self._cache_decision(key, result)
+        return result
+
+    @staticmethod
+    def _from_local(local: PrefilterDecision) -> RelevanceResult:
+        """Convert pre-filter decision to RelevanceResult."""
+        if local.action == "resume" and local.target is not None:
+            return RelevanceResult(
+                action="resume",
+                target_thread_id=local.target.thread_id,
+                target_internal_id=local.target.internal_id,
+            )
+        return RelevanceResult(action="stay")
+
+    @staticmethod
+    def _decision_key(
+        new_message: str,
+        current_topic: TopicContext | None,
+        other_topics: list[TopicContext],
+    ) -> str:
+        """Cache key: normalized message + current/other topic IDs."""
+        normalized = " ".join(new_message.lower().split())
+        current_id = current_topic.internal_id if current_topic else 0
+        other_ids = ",".join(str(t.internal_id) for t in other_topics)
+        raw = f"{current_id}|{other_ids}|{normalized}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _get_cached_decision(self, key: str) -> RelevanceResult | None:
+        """Get unexpired cached decision."""
+        entry = self._decisions.get(key)
+        if entry is None:
+            return None
+        result, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._decisions[key]
+            return None
+        self._decisions.move_to_end(key)
+        return result
+
+    def _cache_decision(self, key: str, result: RelevanceResult) -> None:
+        """Store decision (LRU bounded, TTL expiry)."""
+        self._decisions[key] = (result,
+                                time.monotonic() +
+                                config.TOPIC_DECISION_CACHE_TTL)
+        self._decisions.move_to_end(key)
+        while len(self._decisions) > config.TOPIC_DECISION_CACHE_SIZE:
+            self._decisions.popitem(last=False)
+
+    def _schedule_verification(
+        self,
+        local_result: RelevanceResult,
+        new_message: str,
+        current_topic: TopicContext | None,
+        other_topics: list[TopicContext],
+    ) -> None:
+        """Verify a local decision with the LLM in the background."""
+        task = asyncio.create_task(
+            self._verify_local_decision(local_result, new_message,
+                                        current_topic, other_topics))
+        self._verify_tasks.add(task)
+        task.add_done_callback(self._verify_tasks.discard)
+
+    async def _verify_local_decision(
+        self,
+        local_result: RelevanceResult,
+        new_message: str,
+        current_topic: TopicContext | None,
+        other_topics: list[TopicContext],
+    ) -> bool | None:
+        """Compare local decision with the LLM decision.
+
+        Returns:
+            True if LLM agreed, None if LLM call failed.
+        """
+        llm_result = await self._check_with_llm(new_message, current_topic,
+                                                other_topics)
+        if llm_result is None:
+            return None
+        agreed = (llm_result.action == local_result.action and
+                  llm_result.target_thread_id
+                  == local_result.target_thread_id)
+        record_topic_prefilter_agreement(agreed)
+        logger.info(
+            "topic_relevance.prefilter_verified",
+            agreed=agreed,
+            local_action=local_result.action,
+            local_target=local_result.target_thread_id,
+            llm_action=llm_result.action,
+            llm_target=llm_result.target_thread_id,
+        )
+        return agreed
+
+    async def _check_with_llm(
+        self,
+        new_message: str,
+        current_topic: TopicContext | None,
+        other_topics: list[TopicContext],
+    ) -> RelevanceResult | None:
+        """Ask Haiku for the routing decision.
+
+        Args:
+            new_message: The new user message text.
+            current_topic: Current topic context (None when from General).
+            other_topics: Other recent topics to check against.
+
+        Returns:
+            RelevanceResult with routing decision, or None on API error.
+        """
         prompt = self._build_prompt(new_message, current_topic, other_topics)
 
         try:
@@ -178,10 +350,7 @@ class TopicRelevanceService:
                 from_general=current_topic is None,
                 topics_checked=len(other_topics),
             )
-            # Safe fallback
-            if current_topic:
-                return RelevanceResult(action="stay")
-            return RelevanceResult(action="new", title="New chat")
+            return None
 
     def _build_prompt(
         self,
@@ -427,7 +596,7 @@ async def _get_recent_topics_cached(
                 logger.debug("topic_relevance.recent_topics_cache_hit",
                              chat_id=chat_id,
                              user_id=user_id)
-                return json.loads(data.decode("utf-8"))
+                return decode(data)
         except Exception:
             pass
 
@@ -450,7 +619,7 @@ async def _get_recent_topics_cached(
     if redis:
         try:
             await redis.set(cache_key,
-                            json.dumps(result),
+                            encode(result),
                             ex=_RECENT_TOPICS_TTL)
             logger.debug("topic_relevance.recent_topics_cached",
                          chat_id=chat_id,
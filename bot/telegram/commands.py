@@ -106,6 +106,9 @@ COMMANDS: tuple[BotCmd, ...] = (
     BotCmd("announce", "Broadcast messages to users",
            "Рассылка сообщений пользователям",
            Section.ADMIN, admin=True),
+    BotCmd("profile", "Profile the running bot",
+           "Профилирование работающего бота",
+           Section.ADMIN, admin=True),
 )
 
 
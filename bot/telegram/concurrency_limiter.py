@@ -24,6 +24,7 @@ from typing import AsyncIterator
 from config import CONCURRENCY_QUEUE_TIMEOUT
 from config import MAX_CONCURRENT_GENERATIONS_PER_USER
 from utils.structured_logging import get_logger
+from utils.tracing import start_span
 
 logger = get_logger(__name__)
 
@@ -202,6 +203,7 @@ class UserConcurrencyLimiter:
         """
         queue_position = 0
         wait_start = asyncio.get_event_loop().time()
+        wait_span = start_span("concurrency.wait")
 
         async with self._lock:
             state = self._get_or_create_user_state(user_id)
@@ -236,6 +238,7 @@ class UserConcurrencyLimiter:
                 )
 
         except asyncio.TimeoutError as exc:
+            wait_span.end(error=exc)
             # Queue timeout - decrement queue count and raise
             async with self._lock:
                 state = self._users.get(user_id)
@@ -260,6 +263,8 @@ class UserConcurrencyLimiter:
             ) from exc
 
         # Acquired - update state
+        wait_span.set_attribute("queue_position", queue_position)
+        wait_span.end()
         wait_time = asyncio.get_event_loop().time() - wait_start
 
         async with self._lock:
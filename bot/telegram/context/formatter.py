@@ -22,6 +22,18 @@ if TYPE_CHECKING:
     from db.repositories.user_file_repository import UserFileRepository
     from sqlalchemy.ext.asyncio import AsyncSession
 
+# Wraps compaction summary for models without native compaction blocks
+COMPACTION_SUMMARY_HEADER = "[Summary of earlier conversation]"
+COMPACTION_SUMMARY_FOOTER = "[End of summary]"
+
+
+def _get_compaction_summary(msg: DBMessage) -> str | None:
+    """Get non-empty compaction summary of a message (or None)."""
+    summary = getattr(msg, 'compaction_summary', None)
+    if isinstance(summary, str) and summary:
+        return summary
+    return None
+
 
 class ContextFormatter:
     """Formats conversation history for Claude with Telegram context.
@@ -36,15 +48,21 @@ class ContextFormatter:
         is_group: Whether the chat is a group/supergroup.
     """
 
-    def __init__(self, chat_type: str = "private"):
+    def __init__(self,
+                 chat_type: str = "private",
+                 native_compaction: bool = True):
         """Initialize formatter with chat type.
 
         Args:
             chat_type: Type of chat from Telegram (private, group,
                 supergroup, channel). Defaults to "private".
+            native_compaction: Model accepts compaction blocks (Opus 4.6).
+                When False, compaction summaries are sent as plain text
+                at the start of the conversation. Defaults to True.
         """
         self.chat_type = chat_type
         self.is_group = chat_type in ("group", "supergroup")
+        self.native_compaction = native_compaction
 
     def format_message(self, msg: DBMessage) -> LLMMessage:
         """Format a single database message for LLM.
@@ -71,8 +89,8 @@ class ContextFormatter:
 
         return LLMMessage(role=role, content=text_content)
 
-    @staticmethod
     def _maybe_compaction_message(
+        self,
         msg: DBMessage,
         role: str,
         text_content: str,
@@ -83,12 +101,16 @@ class ContextFormatter:
         a compaction block before the text. All messages prior to the
         compaction block are ignored by the API.
 
+        Models without native compaction get the summary as text via
+        _apply_text_compaction() instead.
+
         Returns:
             LLMMessage with compaction blocks, or None if not applicable.
         """
-        compaction = getattr(msg, 'compaction_summary', None)
-        if role != "assistant" or not isinstance(compaction,
-                                                 str) or not compaction:
+        if not self.native_compaction:
+            return None
+        compaction = _get_compaction_summary(msg)
+        if role != "assistant" or not compaction:
             return None
 
         text = text_content or "[empty message]"
@@ -183,7 +205,52 @@ class ContextFormatter:
         Returns:
             List of LLM Message objects with formatted content.
         """
-        return [self.format_message(msg) for msg in messages]
+        result = [self.format_message(msg) for msg in messages]
+        return self._apply_text_compaction(messages, result)
+
+    def _apply_text_compaction(
+        self,
+        messages: list[DBMessage],
+        formatted: list[LLMMessage],
+    ) -> list[LLMMessage]:
+        """Start conversation from the latest compaction summary (text form).
+
+        For models without native compaction: drops messages before the
+        user turn preceding the latest compacted assistant message and
+        prepends the summary to that user turn.
+
+        Args:
+            messages: Database messages (same order as formatted).
+            formatted: Formatted LLM messages.
+
+        Returns:
+            Formatted messages starting from the summary.
+        """
+        if self.native_compaction:
+            return formatted
+
+        for idx in range(len(messages) - 1, -1, -1):
+            summary = _get_compaction_summary(messages[idx])
+            if summary and not messages[idx].from_user_id:
+                break
+        else:
+            return formatted
+
+        summary_text = (f"{COMPACTION_SUMMARY_HEADER}\n{summary}\n"
+                        f"{COMPACTION_SUMMARY_FOOTER}")
+        if idx == 0 or formatted[idx - 1].role != "user":
+            # No preceding user turn loaded - add one for the summary
+            return [LLMMessage(role="user", content=summary_text)
+                   ] + formatted[idx:]
+
+        start = idx - 1
+        first = formatted[start]
+        if isinstance(first.content, list):
+            content = [{"type": "text", "text": summary_text}] + first.content
+        else:
+            content = f"{summary_text}\n\n{first.content}"
+        return [LLMMessage(role="user", content=content)
+               ] + formatted[start + 1:]
 
     async def format_conversation_with_files(
         self,
@@ -220,7 +287,7 @@ class ContextFormatter:
             formatted = await self._format_message_with_files(msg, file_repo)
             result.append(formatted)
 
-        return result
+        return self._apply_text_compaction(messages, result)
 
     async def _format_message_with_files(
         self,
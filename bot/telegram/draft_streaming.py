@@ -1,7 +1,8 @@
 """Draft-based streaming for Telegram Bot API 9.3.
 
 This module provides DraftStreamer class for streaming responses using
-sendMessageDraft method with proper rate limiting.
+sendMessageDraft method with adaptive rate limiting (see
+telegram/streaming/cadence.py).
 
 Supports both MarkdownV2 (default) and HTML parse modes.
 
@@ -19,6 +20,7 @@ from aiogram import types
 from aiogram.exceptions import TelegramBadRequest
 from aiogram.exceptions import TelegramRetryAfter
 from aiogram.methods import SendMessageDraft
+from telegram.streaming.cadence import DraftCadence
 from telegram.streaming.constants import DEFAULT_PARSE_MODE
 from telegram.streaming.constants import ParseMode
 from telegram.streaming.constants import TELEGRAM_LIMIT
@@ -28,23 +30,10 @@ from utils.structured_logging import get_logger
 
 logger = get_logger(__name__)
 
-# Minimum interval between draft updates (seconds)
-# sendMessageDraft still has rate limits, just more relaxed than edit_message
-MIN_UPDATE_INTERVAL = 1.0
-
-# After flood control, temporarily increase update interval (seconds)
-FLOOD_BACKOFF_INTERVAL = 2.0
-
-# How many updates after flood before resetting to normal interval
-FLOOD_BACKOFF_UPDATES = 10
-
 # Default keepalive interval (seconds)
+# Stretched by DraftCadence when updates are throttled harder
 DEFAULT_KEEPALIVE_INTERVAL = 6.0
 
-# Minimum time since last update before sending keepalive (seconds)
-# If we recently sent an update, skip keepalive to avoid flood control
-MIN_TIME_BEFORE_KEEPALIVE = 4.0
-
 
 class DraftManager:
     """Manages multiple DraftStreamers with automatic cleanup.
@@ -54,6 +43,10 @@ class DraftManager:
 
     Implements async context manager for automatic resource cleanup.
 
+    All drafts of a manager share one DraftCadence, so the update interval
+    learned for a response survives splits, and telemetry covers the
+    whole response.
+
     Example:
         async with DraftManager(bot, chat_id, topic_id) as dm:
             await dm.current.update("Processing...")
@@ -81,6 +74,7 @@ class DraftManager:
         self.chat_id = chat_id
         self.topic_id = topic_id
         self.keepalive_interval = keepalive_interval
+        self.cadence = DraftCadence()
         self._current: Optional["DraftStreamer"] = None
 
     @property
@@ -91,6 +85,7 @@ class DraftManager:
                 bot=self.bot,
                 chat_id=self.chat_id,
                 topic_id=self.topic_id,
+                cadence=self.cadence,
             )
             self._current.start_keepalive(self.keepalive_interval)
         return self._current
@@ -136,6 +131,7 @@ class DraftManager:
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> bool:
         """Exit async context manager - ensure cleanup."""
         await self.cleanup()
+        self.cadence.close(chat_id=self.chat_id)
         logger.debug("draft_manager.context_exit",
                      chat_id=self.chat_id,
                      had_exception=exc_type is not None)
@@ -148,7 +144,9 @@ class DraftStreamer:  # pylint: disable=too-many-instance-attributes
     Uses sendMessageDraft for smooth animated updates.
     Bot API 9.3 feature - requires forum topic mode enabled.
 
-    Includes built-in throttling to avoid flood control.
+    Includes built-in adaptive throttling (DraftCadence) to avoid flood
+    control. Throttled text is sent by a deferred flush once the interval
+    has passed, so it never waits for the next delta.
     Implements async context manager for automatic resource cleanup.
 
     Attributes:
@@ -179,13 +177,16 @@ class DraftStreamer:  # pylint: disable=too-many-instance-attributes
     def __init__(self,
                  bot: Bot,
                  chat_id: int,
-                 topic_id: Optional[int] = None) -> None:
+                 topic_id: Optional[int] = None,
+                 cadence: Optional[DraftCadence] = None) -> None:
         """Initialize draft streamer.
 
         Args:
             bot: Telegram Bot instance.
             chat_id: Target chat ID.
             topic_id: Telegram forum topic ID (None for main chat).
+            cadence: Shared cadence of the response (DraftManager).
+                A private one is created (and closed) if not given.
         """
         self.bot = bot
         self.chat_id = chat_id
@@ -196,12 +197,15 @@ class DraftStreamer:  # pylint: disable=too-many-instance-attributes
         self._update_count = 0
         self._last_update_time = 0.0
         self._pending_text: Optional[str] = None  # Text waiting to be sent
+        self._pending_parse_mode: Optional[str] = DEFAULT_PARSE_MODE
+        self._flush_task: Optional[Task[None]] = None  # Deferred pending send
         self._finalized = False  # Prevents keepalive on finalized drafts
         self._keepalive_task: Optional[Task[None]] = None  # Managed keepalive
         self._keepalive_interval: float = 6.0  # Default keepalive interval
         self._last_parse_mode: Optional[str] = DEFAULT_PARSE_MODE  # Track mode
         self._keepalive_failure_logged = False  # Prevent repeated warnings
-        self._flood_backoff_remaining = 0  # Updates left with increased interval
+        self._owns_cadence = cadence is None
+        self.cadence = cadence or DraftCadence()
 
         logger.debug("draft_streamer.initialized",
                      chat_id=chat_id,
@@ -254,8 +258,10 @@ class DraftStreamer:  # pylint: disable=too-many-instance-attributes
     def start_keepalive(self, interval: float = 6.0) -> None:
         """Start automatic keepalive task.
 
-        Creates a background task that periodically sends keepalive updates
-        to prevent the draft from disappearing during long operations.
+        Creates a background task that sends a keepalive update once the
+        draft has been idle for the keepalive interval, to prevent it from
+        disappearing during long operations. The interval is stretched by
+        the cadence under flood or budget pressure.
 
         The task is automatically cancelled when finalize() or clear() is called.
 
@@ -266,10 +272,16 @@ class DraftStreamer:  # pylint: disable=too-many-instance-attributes
             return  # Already running
 
         async def keepalive_loop() -> None:
-            """Send periodic keepalive updates."""
+            """Send keepalive updates when the draft goes idle."""
             while True:
-                await asyncio.sleep(interval)
+                idle_for = self.cadence.keepalive_interval(interval)
+                idle = time.monotonic() - self._last_update_time
+                if idle < idle_for:
+                    await asyncio.sleep(idle_for - idle)
+                    continue
                 await self.keepalive()
+                # No-op keepalives (nothing sent yet) don't touch the clock
+                await asyncio.sleep(idle_for)
 
         self._keepalive_task = asyncio.create_task(keepalive_loop())
         logger.debug("draft_streamer.keepalive_started",
@@ -303,8 +315,9 @@ class DraftStreamer:  # pylint: disable=too-many-instance-attributes
             force: bool = False) -> bool:
         """Update draft with new text (with throttling).
 
-        Skips update if text hasn't changed or if called too frequently.
-        Handles TelegramRetryAfter by waiting and retrying.
+        Skips update if text hasn't changed. If called sooner than the
+        cadence interval, the text is kept as pending and sent by a
+        deferred flush. Handles TelegramRetryAfter by waiting and retrying.
         Falls back to plain text if MarkdownV2 parsing fails.
 
         Args:
@@ -327,16 +340,15 @@ class DraftStreamer:  # pylint: disable=too-many-instance-attributes
             return True
 
         # Throttle updates (unless forced)
-        # Use increased interval after flood control hit
-        current_time = time.time()
-        time_since_last = current_time - self._last_update_time
-        effective_interval = (FLOOD_BACKOFF_INTERVAL
-                              if self._flood_backoff_remaining > 0
-                              else MIN_UPDATE_INTERVAL)
-
-        if not force and time_since_last < effective_interval:
-            # Store pending text, will be sent on next allowed update
+        time_since_last = time.monotonic() - self._last_update_time
+        interval = self.cadence.interval()
+
+        if not force and time_since_last < interval:
+            # Store pending text, sent by the deferred flush
             self._pending_text = text
+            self._pending_parse_mode = parse_mode
+            self.cadence.record_skipped()
+            self._schedule_flush(interval - time_since_last)
             return True
 
         # When forced, always use the passed text (e.g., final stripped message)
@@ -354,6 +366,10 @@ class DraftStreamer:  # pylint: disable=too-many-instance-attributes
         if len(text_to_send) > TELEGRAM_LIMIT:
             text_to_send = TruncationManager.truncate_for_telegram(text_to_send, parse_mode)
 
+        # Claim the slot before awaiting, so a concurrent deferred flush
+        # doesn't send in parallel
+        started = time.monotonic()
+        self._last_update_time = started
         try:
             await self.bot(
                 SendMessageDraft(
@@ -364,12 +380,11 @@ class DraftStreamer:  # pylint: disable=too-many-instance-attributes
                     parse_mode=parse_mode,
                 ))
 
+            self.cadence.observe_latency(time.monotonic() - started)
             self.last_text = text_to_send
             self._last_parse_mode = parse_mode  # Track successful parse_mode
             self._update_count += 1
-            self._last_update_time = time.time()
-            if self._flood_backoff_remaining > 0:
-                self._flood_backoff_remaining -= 1
+            self.cadence.record_sent()
 
             if self._update_count % 50 == 0:  # Log every 50 updates
                 logger.debug("draft_streamer.update_milestone",
@@ -384,8 +399,9 @@ class DraftStreamer:  # pylint: disable=too-many-instance-attributes
             logger.warning("draft_streamer.flood_control",
                            chat_id=self.chat_id,
                            retry_after=e.retry_after)
-            # Activate adaptive back-off to prevent repeated flood control
-            self._flood_backoff_remaining = FLOOD_BACKOFF_UPDATES
+            # Widen the cadence to prevent repeated flood control
+            self.cadence.observe_flood()
+            self._last_update_time = time.monotonic() + e.retry_after
             await asyncio.sleep(e.retry_after)
             try:
                 await self.bot(
@@ -399,7 +415,8 @@ class DraftStreamer:  # pylint: disable=too-many-instance-attributes
                 self.last_text = text_to_send
                 self._last_parse_mode = parse_mode  # Track successful parse_mode
                 self._update_count += 1
-                self._last_update_time = time.time()
+                self._last_update_time = time.monotonic()
+                self.cadence.record_sent()
                 return True
             except Exception:  # pylint: disable=broad-exception-caught
                 return False
@@ -443,6 +460,44 @@ class DraftStreamer:  # pylint: disable=too-many-instance-attributes
                         error=str(e))
             return False
 
+    def _schedule_flush(self, delay: float) -> None:
+        """Send pending text after delay, unless a newer update does first.
+
+        Args:
+            delay: Seconds until the cadence allows the next update.
+        """
+        current = self._flush_task
+        if (current is not None and not current.done()
+                and current is not asyncio.current_task()):
+            return
+
+        async def flush_later() -> None:
+            try:
+                await asyncio.sleep(delay)
+                if self._pending_text and not self._finalized:
+                    # Not forced: re-checks the (possibly widened) interval
+                    # and may schedule the next flush from inside this one
+                    await self.update(self._pending_text,
+                                      self._pending_parse_mode)
+            finally:
+                # Dropped only once the send is done: finalize() and clear()
+                # must be able to cancel a send still in flight
+                if self._flush_task is asyncio.current_task():
+                    self._flush_task = None
+
+        self._flush_task = asyncio.create_task(flush_later())
+
+    async def _cancel_flush(self) -> None:
+        """Cancel the deferred flush task, if any."""
+        if self._flush_task is None:
+            return
+        self._flush_task.cancel()
+        try:
+            await self._flush_task
+        except asyncio.CancelledError:
+            pass
+        self._flush_task = None
+
     async def flush_pending(self,
                             parse_mode: Optional[str] = DEFAULT_PARSE_MODE
                            ) -> bool:
@@ -468,7 +523,7 @@ class DraftStreamer:  # pylint: disable=too-many-instance-attributes
         Unlike update(), this always sends even if text unchanged.
         Use during long operations like image generation.
 
-        Skips if we recently sent an update (within MIN_TIME_BEFORE_KEEPALIVE)
+        Skips if we sent an update within the current cadence interval,
         to avoid flood control.
 
         Uses the last successful parse_mode to avoid parse errors when
@@ -497,8 +552,8 @@ class DraftStreamer:  # pylint: disable=too-many-instance-attributes
             return True
 
         # Skip if we recently sent an update (avoids redundant keepalive)
-        time_since_update = time.time() - self._last_update_time
-        if time_since_update < MIN_TIME_BEFORE_KEEPALIVE:
+        time_since_update = time.monotonic() - self._last_update_time
+        if time_since_update < self.cadence.interval():
             logger.debug("draft_streamer.keepalive_skipped",
                          chat_id=self.chat_id,
                          draft_id=self.draft_id,
@@ -518,6 +573,7 @@ class DraftStreamer:  # pylint: disable=too-many-instance-attributes
         Returns:
             True on success, False on failure.
         """
+        started = time.monotonic()
         try:
             await self.bot(
                 SendMessageDraft(
@@ -527,7 +583,9 @@ class DraftStreamer:  # pylint: disable=too-many-instance-attributes
                     message_thread_id=self.topic_id,
                     parse_mode=effective_parse_mode,
                 ))
-            self._last_update_time = time.time()
+            self._last_update_time = time.monotonic()
+            self.cadence.observe_latency(self._last_update_time - started)
+            self.cadence.record_keepalive()
             logger.debug("draft_streamer.keepalive",
                          chat_id=self.chat_id,
                          draft_id=self.draft_id)
@@ -537,6 +595,7 @@ class DraftStreamer:  # pylint: disable=too-many-instance-attributes
             logger.warning("draft_streamer.keepalive_flood",
                            chat_id=self.chat_id,
                            retry_after=e.retry_after)
+            self.cadence.observe_flood()
             await asyncio.sleep(e.retry_after)
             return True
         except TelegramBadRequest as e:
@@ -609,8 +668,11 @@ class DraftStreamer:  # pylint: disable=too-many-instance-attributes
         # commit_draft_before_file creates new DraftStreamer)
         self._finalized = True
 
-        # Stop keepalive task if running (prevents resource leak)
+        # Stop keepalive and flush tasks if running (prevents resource leak)
         await self.stop_keepalive()
+        await self._cancel_flush()
+        if self._owns_cadence:
+            self.cadence.close(chat_id=self.chat_id)
 
         # Determine what text to send (after any updates)
         text_to_send = final_text if final_text else self.last_text
@@ -623,6 +685,7 @@ class DraftStreamer:  # pylint: disable=too-many-instance-attributes
                     chat_id=self.chat_id,
                     topic_id=self.topic_id,
                     total_updates=self._update_count,
+                    update_interval=round(self.cadence.interval(), 2),
                     final_length=len(text_to_send))
 
         # Send final message directly with correct text (no edit needed)
@@ -679,11 +742,15 @@ class DraftStreamer:  # pylint: disable=too-many-instance-attributes
         # Skip if already finalized (idempotent - safe to call after finalize)
         if self._finalized:
             await self.stop_keepalive()  # Ensure keepalive is stopped
+            await self._cancel_flush()
             return True
 
         # Mark as finalized to prevent further updates
         self._finalized = True
         await self.stop_keepalive()  # Stop keepalive task if running
+        await self._cancel_flush()
+        if self._owns_cadence:
+            self.cadence.close(chat_id=self.chat_id)
 
         logger.debug("draft_streamer.cleared",
                      chat_id=self.chat_id,
@@ -3,6 +3,7 @@
 This module handles admin-only commands:
 - /topup - Adjust any user's balance (add or subtract)
 - /set_margin - Configure owner margin (k3) for payment commissions
+- /profile - Sample CPU, dump asyncio tasks, diff tracemalloc snapshots
 
 And user commands with admin escalation:
 - /clear - Delete forum topics (current topic for all, all topics for admins)
@@ -11,22 +12,31 @@ Only users in PRIVILEGED_USERS (from secrets/privileged_users.txt) can use
 privileged commands like /topup and /set_margin.
 """
 
+from datetime import datetime
+from datetime import timezone
 from decimal import Decimal
+import json
 
 from aiogram import F
 from aiogram import Router
 from aiogram.enums import ButtonStyle
 from aiogram.filters import Command
+from aiogram.types import BufferedInputFile
 from aiogram.types import CallbackQuery
 from aiogram.types import InlineKeyboardButton
 from aiogram.types import InlineKeyboardMarkup
 from aiogram.types import Message
 import config
+from core.request_templates import invalidate_request_templates
 from db.repositories.thread_repository import ThreadRepository
 from i18n import get_lang
 from i18n import get_text
 from services.factory import ServiceFactory
 from sqlalchemy.ext.asyncio import AsyncSession
+from utils.profiling import dump_tasks
+from utils.profiling import get_memory_tracker
+from utils.profiling import get_profiler
+from utils.profiling import ProfilerError
 from utils.structured_logging import get_logger
 
 logger = get_logger(__name__)
@@ -256,6 +266,7 @@ async def cmd_set_margin(message: Message):
     # Update global config
     old_margin = config.DEFAULT_OWNER_MARGIN
     config.DEFAULT_OWNER_MARGIN = k3
+    invalidate_request_templates("set_margin")
 
     await message.answer(
         get_text("admin.margin_updated",
@@ -330,6 +341,7 @@ async def cmd_set_cache_subsidy(message: Message):
 
     old_value = config.CHARGE_USERS_FOR_CACHE_WRITE
     config.CHARGE_USERS_FOR_CACHE_WRITE = new_value
+    invalidate_request_templates("set_cache_subsidy")
 
     old_status = "OFF" if old_value else "ON"
     new_status = "ON" if not new_value else "OFF"
@@ -351,6 +363,108 @@ async def cmd_set_cache_subsidy(message: Message):
                  new=new_status))
 
 
+@router.message(Command("profile"))
+async def cmd_profile(message: Message):
+    """Handler for /profile command - live profiling artifacts.
+
+    Privileged users only.
+    Usage: /profile [start [interval_ms] | stop | tasks | memory [stop]]
+
+    Examples:
+        /profile start        (sample the event loop thread)
+        /profile start 1      (1 ms sampling interval)
+        /profile stop         (speedscope profile as a document)
+        /profile tasks        (all asyncio tasks with ages and stacks)
+        /profile memory       (start tracemalloc, then diff per call)
+        /profile memory stop  (stop tracemalloc)
+    """
+    user_id = message.from_user.id
+    lang = get_lang(message.from_user.language_code)
+
+    # Check privileges
+    if not is_privileged(user_id):
+        logger.warning(
+            "admin.profile_unauthorized",
+            user_id=user_id,
+            username=message.from_user.username,
+            msg="Unauthorized profile attempt",
+        )
+        await message.answer(get_text("admin.unauthorized", lang))
+        return
+
+    args = message.text.split()
+    action = args[1].lower() if len(args) > 1 else None
+    profiler = get_profiler()
+    memory = get_memory_tracker()
+    stamp = f"{datetime.now(timezone.utc):%Y%m%d_%H%M%S}"
+
+    try:
+        if action == "start":
+            try:
+                interval = float(args[2]) / 1000 if len(args) > 2 else None
+            except ValueError:
+                await message.answer(
+                    get_text("admin.profile_usage",
+                             lang,
+                             profiler="ON" if profiler.running else "OFF",
+                             memory="ON" if memory.running else "OFF"))
+                return
+            profiler.start(interval)
+            await message.answer(
+                get_text("admin.profile_started",
+                         lang,
+                         interval_ms=profiler.interval * 1000))
+
+        elif action == "stop":
+            profile = profiler.stop()
+            await message.answer_document(
+                BufferedInputFile(
+                    json.dumps(profile.to_speedscope()).encode("utf-8"),
+                    filename=f"profile_{stamp}.speedscope.json",
+                ),
+                caption=get_text("admin.profile_caption",
+                                 lang,
+                                 samples=profile.sample_count,
+                                 duration=profile.duration),
+            )
+
+        elif action == "tasks":
+            await message.answer_document(
+                BufferedInputFile(dump_tasks().encode("utf-8"),
+                                  filename=f"tasks_{stamp}.txt"))
+
+        elif action == "memory":
+            if len(args) > 2 and args[2].lower() == "stop":
+                memory.stop()
+                await message.answer(
+                    get_text("admin.profile_memory_stopped", lang))
+            elif not memory.running:
+                memory.start()
+                await message.answer(
+                    get_text("admin.profile_memory_started", lang))
+            else:
+                await message.answer_document(
+                    BufferedInputFile(memory.diff().encode("utf-8"),
+                                      filename=f"memory_{stamp}.txt"))
+
+        else:
+            await message.answer(
+                get_text("admin.profile_usage",
+                         lang,
+                         profiler="ON" if profiler.running else "OFF",
+                         memory="ON" if memory.running else "OFF"))
+            return
+
+    except (ProfilerError, ValueError) as e:
+        await message.answer(get_text("admin.profile_error", lang,
+                                      error=str(e)))
+        return
+
+    logger.info("admin.profile_success",
+                admin_user_id=user_id,
+                action=action)
+
+
 @router.message(Command("clear"))
 async def cmd_clear(
     message: Message,
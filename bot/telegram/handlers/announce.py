@@ -8,34 +8,27 @@ Flow:
 2. Bot enters FSM state waiting_for_message
 3. Admin sends any message to broadcast
 4. Bot shows preview via copy_message + confirmation buttons
-5. Admin confirms → rate-limited broadcast with flood control + delivery report
+5. Admin confirms → broadcast runs in the background engine
+   (services/broadcast.py): concurrent, rate-limited, resumable after
+   restart, with progress updates and a delivery report
 """
 
-import asyncio
-from datetime import datetime
-from datetime import timezone
-
 from aiogram import F
 from aiogram import Router
 from aiogram.enums import ButtonStyle
-from aiogram.exceptions import TelegramBadRequest
-from aiogram.exceptions import TelegramForbiddenError
-from aiogram.exceptions import TelegramRetryAfter
 from aiogram.filters import Command
 from aiogram.filters import StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State
 from aiogram.fsm.state import StatesGroup
-from aiogram.types import BufferedInputFile
 from aiogram.types import CallbackQuery
 from aiogram.types import InlineKeyboardButton
 from aiogram.types import InlineKeyboardMarkup
 from aiogram.types import Message
-from db.models.chat import Chat
-from db.repositories.thread_repository import ThreadRepository
 from db.repositories.user_repository import UserRepository
 from i18n import get_lang
 from i18n import get_text
+from services.broadcast import get_broadcast_engine
 from sqlalchemy.ext.asyncio import AsyncSession
 from telegram.handlers.admin import is_privileged
 from utils.structured_logging import get_logger
@@ -132,32 +125,28 @@ async def cmd_announce(
             not_found=not_found,
         )
     else:
-        # All users mode
-        all_users = await user_repo.get_all_users()
-        all_ids = [u.id for u in all_users]
-        usernames = {u.id: u.username for u in all_users if u.username}
+        # All users mode: only the count here, the broadcast engine
+        # pages through user IDs itself
+        total = await user_repo.get_users_count()
 
-        if not all_ids:
+        if not total:
             await message.answer(get_text("announce.no_valid_targets", lang))
             return
 
         await state.set_state(AnnounceStates.waiting_for_message)
         await state.update_data(
-            target_ids=all_ids,
-            usernames=usernames,
+            total=total,
             is_all=True,
             admin_user_id=user_id,
         )
 
         await message.answer(
-            get_text("announce.waiting_for_message_all",
-                     lang,
-                     count=len(all_ids)))
+            get_text("announce.waiting_for_message_all", lang, count=total))
 
         logger.info(
             "announce.all_users_mode",
             admin_user_id=user_id,
-            total_users=len(all_ids),
+            total_users=total,
         )
 
 
@@ -190,7 +179,7 @@ async def announce_message_received(
         return
 
     lang = get_lang(message.from_user.language_code)
-    target_ids = data.get("target_ids", [])
+    total = data.get("total") or len(data.get("target_ids", []))
 
     # Store the message reference for broadcasting
     await state.update_data(
@@ -213,7 +202,7 @@ async def announce_message_received(
     ]])
 
     await message.reply(
-        get_text("announce.confirm", lang, count=len(target_ids)),
+        get_text("announce.confirm", lang, count=total),
         reply_markup=keyboard,
     )
 
@@ -226,7 +215,7 @@ async def announce_message_received(
         admin_user_id=admin_user_id,
         broadcast_chat_id=message.chat.id,
         broadcast_message_id=message.message_id,
-        target_count=len(target_ids),
+        target_count=total,
     )
 
 
@@ -240,7 +229,8 @@ async def announce_confirm_callback(
 ) -> None:
     """Handle broadcast confirmation.
 
-    Broadcasts via copy_message with rate limiting and sends delivery report.
+    Hands the broadcast to the background engine (services/broadcast.py),
+    which reports progress in a message and sends the delivery report.
 
     Args:
         callback: Callback query from confirm button.
@@ -258,18 +248,8 @@ async def announce_confirm_callback(
         return
 
     lang = get_lang(callback.from_user.language_code)
-    target_ids = data.get("target_ids", [])
-    usernames = data.get("usernames", {})
-    broadcast_chat_id = data.get("broadcast_chat_id")
-    broadcast_message_id = data.get("broadcast_message_id")
-
-    logger.info(
-        "announce.broadcast_started",
-        admin_user_id=admin_user_id,
-        target_count=len(target_ids),
-        broadcast_chat_id=broadcast_chat_id,
-        broadcast_message_id=broadcast_message_id,
-    )
+    target_ids = None if data.get("is_all") else data.get("target_ids", [])
+    total = data.get("total") or len(target_ids or [])
 
     # Clear state immediately
     await state.clear()
@@ -282,194 +262,31 @@ async def announce_confirm_callback(
 
     await callback.answer()
 
-    # Send progress message
+    # Send progress message (edited by the engine)
     progress_msg = await callback.message.answer(
-        get_text("announce.sending", lang, sent=0, total=len(target_ids)))
+        get_text("announce.sending", lang, sent=0, total=total))
 
-    # Broadcast with rate limiting
-    delivered, failed = await _broadcast_message(
-        bot=callback.bot,
-        target_ids=target_ids,
-        usernames=usernames,
-        broadcast_chat_id=broadcast_chat_id,
-        broadcast_message_id=broadcast_message_id,
-        progress_msg=progress_msg,
+    broadcast = await get_broadcast_engine().start(
+        callback.bot,
+        admin_user_id=admin_user_id,
         lang=lang,
+        source_chat_id=data.get("broadcast_chat_id"),
+        source_message_id=data.get("broadcast_message_id"),
+        progress_message=progress_msg,
+        total=total,
+        target_ids=target_ids,
+        usernames=data.get("usernames"),
     )
 
-    # Final summary
-    try:
-        await progress_msg.edit_text(
-            get_text("announce.complete",
-                     lang,
-                     delivered=len(delivered),
-                     failed=len(failed)))
-    except Exception:
-        pass
-
     logger.info(
-        "announce.broadcast_complete",
+        "announce.broadcast_started",
         admin_user_id=admin_user_id,
-        delivered=len(delivered),
-        failed=len(failed),
-        total=len(target_ids),
+        broadcast_id=broadcast.id,
+        target_count=total,
+        broadcast_chat_id=data.get("broadcast_chat_id"),
+        broadcast_message_id=data.get("broadcast_message_id"),
     )
 
-    # Generate and send delivery report if there were any sends
-    if delivered or failed:
-        report = _generate_report(delivered, failed, usernames)
-        report_file = BufferedInputFile(
-            report.encode("utf-8"),
-            filename=
-            f"broadcast_report_{datetime.now(timezone.utc):%Y%m%d_%H%M%S}.txt",
-        )
-        await callback.message.answer_document(
-            report_file,
-            caption=get_text("announce.report_caption", lang),
-        )
-
-
-async def _broadcast_message(
-    bot,
-    target_ids: list[int],
-    usernames: dict[int, str],
-    broadcast_chat_id: int,
-    broadcast_message_id: int,
-    progress_msg,
-    lang: str,
-    max_retries: int = 3,
-) -> tuple[list[int], list[tuple[int, str]]]:
-    """Broadcast message to targets with rate limiting and flood control.
-
-    Args:
-        bot: Bot instance.
-        target_ids: List of target user IDs.
-        usernames: Mapping of user_id to username.
-        broadcast_chat_id: Source chat ID.
-        broadcast_message_id: Source message ID.
-        progress_msg: Message to update with progress.
-        lang: Language code for i18n.
-        max_retries: Max retries per target on TelegramRetryAfter.
-
-    Returns:
-        Tuple of (delivered_ids, failed_list).
-    """
-    delivered: list[int] = []
-    failed: list[tuple[int, str]] = []
-    sent_message_ids: dict[int, int] = {}
-    last_progress_update = 0
-
-    for i, target_id in enumerate(target_ids):
-        success = False
-        sent_message_id = None
-        last_error = ""
-
-        for attempt in range(max_retries):
-            try:
-                result = await bot.copy_message(
-                    chat_id=target_id,
-                    from_chat_id=broadcast_chat_id,
-                    message_id=broadcast_message_id,
-                )
-                success = True
-                sent_message_id = getattr(result, 'message_id', None)
-                logger.debug(
-                    "announce.copy_ok",
-                    target_id=target_id,
-                    target_username=usernames.get(target_id),
-                )
-                break
-            except TelegramRetryAfter as e:
-                logger.warning(
-                    "announce.flood_control",
-                    target_id=target_id,
-                    retry_after=e.retry_after,
-                    attempt=attempt + 1,
-                )
-                await asyncio.sleep(e.retry_after)
-                last_error = f"Flood control: retry_after={e.retry_after}"
-            except TelegramForbiddenError as e:
-                last_error = "Bot blocked by user"
-                logger.warning(
-                    "announce.copy_failed",
-                    target_id=target_id,
-                    target_username=usernames.get(target_id),
-                    error=last_error,
-                    error_detail=str(e),
-                )
-                break
-            except TelegramBadRequest as e:
-                # Try forward_message as fallback
-                error_str = str(e)
-                try:
-                    fwd_result = await bot.forward_message(
-                        chat_id=target_id,
-                        from_chat_id=broadcast_chat_id,
-                        message_id=broadcast_message_id,
-                    )
-                    success = True
-                    sent_message_id = (getattr(fwd_result, 'message_thread_id',
-                                               None) or
-                                       getattr(fwd_result, 'message_id', None))
-                    logger.info(
-                        "announce.forward_fallback_ok",
-                        target_id=target_id,
-                        target_username=usernames.get(target_id),
-                        copy_error=error_str,
-                    )
-                except Exception as e2:
-                    last_error = error_str
-                    logger.warning(
-                        "announce.copy_and_forward_failed",
-                        target_id=target_id,
-                        target_username=usernames.get(target_id),
-                        copy_error=error_str,
-                        forward_error=str(e2),
-                    )
-                break
-            except Exception as e:
-                last_error = str(e)
-                logger.warning(
-                    "announce.copy_failed",
-                    target_id=target_id,
-                    target_username=usernames.get(target_id),
-                    error=last_error,
-                )
-                break
-
-        if success:
-            delivered.append(target_id)
-            if sent_message_id is not None:
-                sent_message_ids[target_id] = sent_message_id
-        else:
-            failed.append((target_id, last_error))
-
-        # Update progress every 5 messages
-        sent = i + 1
-        if sent - last_progress_update >= 5 or sent == len(target_ids):
-            pct = round(sent * 100 / len(target_ids))
-            try:
-                await progress_msg.edit_text(
-                    get_text("announce.sending_progress",
-                             lang,
-                             sent=sent,
-                             total=len(target_ids),
-                             pct=pct,
-                             delivered=len(delivered),
-                             failed=len(failed)))
-                last_progress_update = sent
-            except Exception:
-                pass
-
-        # Rate limiting: 25 msg/s
-        await asyncio.sleep(0.04)
-
-    # Register topics for forum chats (best-effort)
-    if sent_message_ids:
-        await _register_announce_topics(sent_message_ids, usernames)
-
-    return delivered, failed
-
 
 @router.callback_query(
     F.data == "announce:cancel",
@@ -509,71 +326,6 @@ async def announce_cancel_callback(
     logger.info("announce.cancelled", admin_user_id=admin_user_id)
 
 
-async def _register_announce_topics(
-    sent_message_ids: dict[int, int],
-    usernames: dict[int, str],
-) -> None:
-    """Register announce-created topics in DB for forum chats.
-
-    When copy_message/forward_message creates a new topic in a forum chat,
-    the Thread table has no record of it. This causes /clear to miss these
-    topics. We register them here so /clear can find and delete them.
-
-    Best-effort: all errors are caught and logged, never breaks broadcast.
-
-    Args:
-        sent_message_ids: Mapping of target_id → sent message_id.
-        usernames: Mapping of target_id → username (for logging).
-    """
-    # Import here to avoid circular imports at module level
-    from db.engine import get_session
-
-    try:
-        async with get_session() as session:
-            # Find which targets are forum chats
-            from sqlalchemy import select
-            result = await session.execute(
-                select(Chat.id).where(
-                    Chat.id.in_(list(sent_message_ids.keys())),
-                    Chat.is_forum.is_(True),
-                ))
-            forum_chat_ids = {row[0] for row in result.all()}
-
-            if not forum_chat_ids:
-                return
-
-            thread_repo = ThreadRepository(session)
-            registered = 0
-            for chat_id in forum_chat_ids:
-                message_id = sent_message_ids[chat_id]
-                try:
-                    await thread_repo.get_or_create_thread(
-                        chat_id=chat_id,
-                        user_id=chat_id,
-                        thread_id=message_id,
-                    )
-                    registered += 1
-                except Exception as e:
-                    logger.warning(
-                        "announce.topic_register_failed",
-                        chat_id=chat_id,
-                        thread_id=message_id,
-                        error=str(e),
-                    )
-
-            if registered:
-                logger.info(
-                    "announce.topics_registered",
-                    registered=registered,
-                    forum_chats=len(forum_chat_ids),
-                )
-    except Exception as e:
-        logger.warning(
-            "announce.topic_registration_error",
-            error=str(e),
-        )
-
-
 async def _resolve_targets(
     args: list[str],
     user_repo: UserRepository,
@@ -621,51 +373,3 @@ async def _lookup_target(target: str, user_repo: UserRepository):
         return await user_repo.get_by_telegram_id(tid)
     except ValueError:
         return None
-
-
-def _generate_report(
-    delivered: list[int],
-    failed: list[tuple[int, str]],
-    usernames: dict[int, str] | None = None,
-) -> str:
-    """Generate a text delivery report.
-
-    Args:
-        delivered: List of user IDs that received the message.
-        failed: List of (user_id, error_reason) tuples.
-        usernames: Optional mapping of user_id → username.
-
-    Returns:
-        Report text as string.
-    """
-    usernames = usernames or {}
-    now = datetime.now(timezone.utc)
-    lines = [
-        f"Broadcast Report — {now:%Y-%m-%d %H:%M:%S} UTC",
-        f"Total: {len(delivered) + len(failed)}",
-        f"Delivered: {len(delivered)}",
-        f"Failed: {len(failed)}",
-        "",
-    ]
-
-    if delivered:
-        lines.append("=== Delivered ===")
-        for uid in delivered:
-            uname = usernames.get(uid)
-            if uname:
-                lines.append(f'{uid} "@{uname}"')
-            else:
-                lines.append(str(uid))
-        lines.append("")
-
-    if failed:
-        lines.append("=== Failed ===")
-        for uid, reason in failed:
-            uname = usernames.get(uid)
-            if uname:
-                lines.append(f'{uid} "@{uname}": {reason}')
-            else:
-                lines.append(f"{uid}: {reason}")
-        lines.append("")
-
-    return "\n".join(lines)
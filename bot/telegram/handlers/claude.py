@@ -23,7 +23,7 @@ from decimal import Decimal
 import html as html_lib
 import re
 import time
-from typing import Optional, TYPE_CHECKING
+from typing import Callable, Optional, TYPE_CHECKING
 
 from aiogram import types
 from aiogram.exceptions import TelegramBadRequest
@@ -33,6 +33,7 @@ if TYPE_CHECKING:
     from telegram.pipeline.models import ProcessedMessage
 
 from cache.exec_cache import get_pending_files_for_thread
+from cache.thread_cache import append_messages_atomic
 from cache.thread_cache import cache_files
 from cache.thread_cache import cache_messages
 from cache.thread_cache import get_cached_files
@@ -47,7 +48,6 @@ import config
 from config import CLAUDE_TOKEN_BUFFER_PERCENT
 from config import FILES_API_TTL_HOURS
 from config import get_model
-from config import get_system_prompt
 from core.claude.context import ContextManager
 from core.provider_factory import get_provider
 from core.claude.files_api import upload_to_files_api
@@ -59,23 +59,32 @@ from core.exceptions import OverloadedError
 from core.exceptions import RateLimitError
 from core.exceptions import ToolValidationError
 from core.models import LLMRequest
-from core.models import Message
 from core.pricing import calculate_cache_write_cost
 from core.pricing import calculate_claude_cost
 from core.pricing import calculate_provider_cost
+from core.request_templates import get_request_template
+from core.tools.cost_estimator import estimate_generation_cost
 from core.tools.helpers import extract_tool_uses
 from core.tools.helpers import format_tool_results
 from core.tools.registry import execute_tool
-from core.tools.registry import get_tool_definitions
 from core.tools.registry import get_tool_system_message
 from db.engine import get_session
 from db.models.message import MessageRole
 from db.models.user_file import FileSource
 from db.models.user_file import FileType
 from db.repositories.chat_repository import ChatRepository
+from db.repositories.message_repository import history_cache_entries
+from db.repositories.message_repository import history_from_cache
 from db.repositories.message_repository import MessageRepository
+from db.repositories.message_repository import trim_to_latest_compaction
 from db.repositories.thread_repository import ThreadRepository
 from db.repositories.user_file_repository import UserFileRepository
+from i18n import get_lang
+from i18n import get_text
+from services.balance_policy import BalanceReservation
+from services.balance_policy import get_balance_policy
+from services.conversation_compaction import estimate_tokens
+from services.conversation_compaction import get_compaction_service
 from services.factory import ServiceFactory
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -84,12 +93,12 @@ from telegram.concurrency_limiter import ConcurrencyLimitExceeded
 from telegram.context.extractors import extract_message_context
 from telegram.context.formatter import ContextFormatter
 from telegram.handlers.claude_files import process_generated_files
-from telegram.handlers.claude_helpers import compose_system_prompt_for_provider
 from telegram.handlers.claude_helpers import split_text_smart
 from telegram.streaming.formatting import escape_html
 from telegram.streaming.formatting import \
     strip_tool_markers as _strip_tool_markers
 from telegram.streaming.orchestrator import StreamingOrchestrator
+from utils.metrics import record_batch_save
 from utils.metrics import record_cache_hit
 from utils.metrics import record_cache_miss
 from utils.metrics import record_llm_request
@@ -99,8 +108,11 @@ from utils.metrics import record_cost
 from utils.metrics import record_error
 from utils.metrics import record_message_sent
 from utils.metrics import record_messages_batched
+from utils.metrics import record_time_to_first_draft
 from utils.metrics import record_tool_call
 from utils.structured_logging import get_logger
+from utils.tracing import record_stage
+from utils.tracing import span
 
 logger = get_logger(__name__)
 
@@ -153,6 +165,38 @@ async def _send_with_retry(
                              message="Max retries")
 
 
+def _first_draft_recorder(
+        thread_id: int,
+        messages: list['ProcessedMessage']) -> Callable[[], None] | None:
+    """Build callback recording time-to-first-draft for a batch.
+
+    Latency is measured from the earliest update receipt in the batch,
+    so it includes normalization, routing, batching and queue wait.
+
+    Args:
+        thread_id: Database thread ID for logging.
+        messages: Batch of ProcessedMessage objects.
+
+    Returns:
+        Callback, or None if receipt time is unknown.
+    """
+    received = [p.received_at for p in messages if p.received_at is not None]
+    if not received:
+        return None
+    received_at = min(received)
+    content_type = "media" if any(p.has_media for p in messages) else "text"
+
+    def _record() -> None:
+        seconds = time.perf_counter() - received_at
+        record_time_to_first_draft(content_type, seconds)
+        logger.info("claude_handler.first_draft",
+                    thread_id=thread_id,
+                    content_type=content_type,
+                    time_to_first_draft_ms=round(seconds * 1000, 2))
+
+    return _record
+
+
 async def _send_to_thread(
     bot,
     first_message: types.Message,
@@ -246,8 +290,10 @@ async def _process_message_batch(thread_id: int,
     # Acquire concurrency slot (may block if user has too many active generations)
     # This is outside the main try to handle ConcurrencyLimitExceeded separately
     try:
-        async with concurrency_context(user_id_for_limit,
-                                       thread_id) as queue_pos:
+        async with concurrency_context(
+                user_id_for_limit, thread_id) as queue_pos, \
+                get_balance_policy().reservation_scope(
+                    user_id_for_limit) as reservation:
             if queue_pos > 0:
                 logger.info(
                     "claude_handler.waited_in_queue",
@@ -261,6 +307,7 @@ async def _process_message_batch(thread_id: int,
                 thread_id=thread_id,
                 messages=messages,
                 first_message=first_message,
+                reservation=reservation,
             )
 
     except ConcurrencyLimitExceeded as e:
@@ -288,16 +335,27 @@ async def _process_batch_with_session(
     thread_id: int,
     messages: list['ProcessedMessage'],
     first_message: types.Message,
+    reservation: Optional[BalanceReservation] = None,
 ) -> None:
     """Process batch with database session.
 
     Extracted from _process_message_batch to allow clean concurrency wrapping.
-    Contains all the main processing logic.
+    Contains all the main processing logic, in three phases with short
+    transactions on one session:
+    - Load (steps 1-6): save messages, load history, build the request;
+      committed before streaming
+    - Stream (step 8): no transaction held across the LLM call, so the
+      pooled connection is free for minutes of thinking and tool loops.
+      Tool calls use their own sessions; tool charges and generated-file
+      records commit as they happen
+    - Persist and charge (steps 9-12): committed at the end
 
     Args:
         thread_id: Database thread ID.
         messages: List of ProcessedMessage objects.
         first_message: First Telegram message for replies.
+        reservation: Balance reservation for this generation (placed once
+            the context is built, settled by the charge).
     """
     # Start timing for total request
     total_request_start = time.perf_counter()
@@ -319,9 +377,10 @@ async def _process_batch_with_session(
                     pass  # Thread deleted — nothing to notify
                 return
 
-            # 2. Save all messages to database
+            # 2. Save all messages to database (one INSERT, one commit)
+            save_start = time.perf_counter()
             msg_repo = MessageRepository(session)
-            user_cache_msgs = []
+            new_messages = []
             for processed in messages:
                 message = processed.original_message
 
@@ -346,56 +405,55 @@ async def _process_batch_with_session(
                     # Regular text message
                     text_content = processed.text or ""
 
-                # Collect for cache append (before DB save to reuse text_content)
-                user_cache_msgs.append({
-                    "role": MessageRole.USER.value,
-                    "text_content": text_content,
-                    "message_id": message.message_id,
-                    "date": int(message.date.timestamp()),
-                })
-
                 # Extract context from Telegram message (replies, quotes, forwards)
                 msg_context = extract_message_context(message)
 
-                # Check if message already exists (retry scenario)
-                existing = await msg_repo.get_message(thread.chat_id,
-                                                      message.message_id)
-                if existing:
-                    logger.debug("claude_handler.message_already_exists",
-                                 chat_id=thread.chat_id,
-                                 message_id=message.message_id,
-                                 thread_id=thread_id)
-                    continue
-
-                await msg_repo.create_message(
-                    chat_id=thread.chat_id,
-                    message_id=message.message_id,
-                    thread_id=thread_id,
-                    from_user_id=thread.user_id,
-                    date=message.date.timestamp(),
-                    role=MessageRole.USER,
-                    text_content=text_content,
-                    reply_to_message_id=message.reply_to_message.message_id
-                    if message.reply_to_message else None,
-                    media_group_id=message.media_group_id,
+                new_messages.append({
+                    "chat_id": thread.chat_id,
+                    "message_id": message.message_id,
+                    "thread_id": thread_id,
+                    "from_user_id": thread.user_id,
+                    "date": int(message.date.timestamp()),
+                    "role": MessageRole.USER,
+                    "text_content": text_content,
+                    "reply_to_message_id":
+                        message.reply_to_message.message_id
+                        if message.reply_to_message else None,
+                    "media_group_id": message.media_group_id,
                     # Context fields (Telegram features)
-                    sender_display=msg_context.sender_display,
-                    forward_origin=msg_context.forward_origin,
-                    reply_snippet=msg_context.reply_snippet,
-                    reply_sender_display=msg_context.reply_sender_display,
-                    quote_data=msg_context.quote_data,
-                )
+                    "sender_display": msg_context.sender_display,
+                    "forward_origin": msg_context.forward_origin,
+                    "reply_snippet": msg_context.reply_snippet,
+                    "reply_sender_display": msg_context.reply_sender_display,
+                    "quote_data": msg_context.quote_data,
+                })
+
+            # Existing rows (retry scenario) are skipped by ON CONFLICT
+            inserted = await msg_repo.create_messages_batch(
+                new_messages, invalidate_cache=False)
+            stage_start = time.perf_counter()
+            record_batch_save("insert", stage_start - save_start)
+            if len(inserted) < len(new_messages):
+                logger.debug("claude_handler.messages_already_exist",
+                             thread_id=thread_id,
+                             skipped=len(new_messages) - len(inserted))
 
             await session.commit()
+            commit_end = time.perf_counter()
+            record_batch_save("commit", commit_end - stage_start)
 
-            # Append user messages to cache atomically (no invalidation needed)
+            # Append only the new rows to the cache in one round trip.
             # This avoids the costly invalidate → miss → DB reload → SET cycle
-            for msg_data in user_cache_msgs:
-                if not await update_cached_messages(thread_id, msg_data):
-                    # Cache miss (first message in thread or expired) —
-                    # invalidate so the fallback reload below populates it
-                    await invalidate_messages(thread_id)
-                    break
+            entries = history_cache_entries(
+                sorted(inserted, key=lambda m: (m.date, m.message_id)))
+            if not await append_messages_atomic(thread_id, entries):
+                # Cache miss (first message in thread or expired) —
+                # invalidate so the fallback reload below populates it
+                await invalidate_messages(thread_id)
+            save_end = time.perf_counter()
+            record_batch_save("cache", save_end - commit_end)
+            record_batch_save("total", save_end - save_start)
+            record_stage("persist.user_messages", save_end - save_start)
 
             logger.debug("claude_handler.batch_messages_saved",
                          thread_id=thread_id,
@@ -405,192 +463,199 @@ async def _process_batch_with_session(
             # Phase 1: Check all caches in parallel (Redis only, no DB)
             # Phase 2: Load DB only for cache misses (sequential to avoid
             #          SQLAlchemy "concurrent operations not permitted" error)
-            services = ServiceFactory(session)
-            user_id = thread.user_id  # Telegram user ID
-            user_file_repo = UserFileRepository(session)
-
-            # Phase 1: Parallel cache lookups (Redis only)
-            cached_user, cached_files_data, cached_messages_data, pending_files = \
-                await asyncio.gather(
-                    get_cached_user(user_id),
-                    get_cached_files(thread_id),
-                    get_cached_messages(thread_id),
-                    get_pending_files_for_thread(thread_id),
-                )
+            with span("history.load") as history_span:
+                services = ServiceFactory(session)
+                user_id = thread.user_id  # Telegram user ID
+                user_file_repo = UserFileRepository(session)
+
+                # Phase 1: Parallel cache lookups (Redis only)
+                cached_user, cached_files_data, cached_messages_data, pending_files = \
+                    await asyncio.gather(
+                        get_cached_user(user_id),
+                        get_cached_files(thread_id),
+                        get_cached_messages(thread_id),
+                        get_pending_files_for_thread(thread_id),
+                    )
 
-            # Phase 2: Sequential DB fallback for cache misses
-            user = None
-            if cached_user:
-                logger.debug("claude_handler.user_cache_hit",
-                             user_id=user_id,
-                             model_id=cached_user["model_id"])
-                user_model_id = cached_user["model_id"]
-                user_custom_prompt = cached_user.get("custom_prompt")
-            else:
-                # Cache miss - load from DB
-                user = await services.users.get_by_id(user_id)
-                if user:
-                    logger.debug("claude_handler.user_cache_miss",
+                # Phase 2: Sequential DB fallback for cache misses
+                user = None
+                if cached_user:
+                    logger.debug("claude_handler.user_cache_hit",
                                  user_id=user_id,
-                                 model_id=user.model_id)
-                    user_model_id = user.model_id
-                    user_custom_prompt = user.custom_prompt
+                                 model_id=cached_user["model_id"])
+                    user_model_id = cached_user["model_id"]
+                    user_custom_prompt = cached_user.get("custom_prompt")
+                else:
+                    # Cache miss - load from DB
+                    user = await services.users.get_by_id(user_id)
+                    if user:
+                        logger.debug("claude_handler.user_cache_miss",
+                                     user_id=user_id,
+                                     model_id=user.model_id)
+                        user_model_id = user.model_id
+                        user_custom_prompt = user.custom_prompt
+                    else:
+                        user_model_id = None
+                        user_custom_prompt = None
+
+                if cached_files_data is not None:
+                    logger.debug("claude_handler.files_cache_hit",
+                                 thread_id=thread_id,
+                                 file_count=len(cached_files_data))
+                    # Convert cached dicts to CachedUserFile objects
+                    from core.tools.helpers import CachedUserFile
+                    available_files = [
+                        CachedUserFile(f) for f in cached_files_data
+                    ]
                 else:
-                    user_model_id = None
-                    user_custom_prompt = None
+                    # Cache miss - load from DB
+                    db_files = await user_file_repo.get_by_thread_id(thread_id)
+                    available_files = db_files
+                    # Cache for next time
+                    if db_files:
+                        from core.tools.helpers import _user_file_to_dict
+                        files_data = [_user_file_to_dict(f) for f in db_files]
+                        await cache_files(thread_id, files_data)
+
+                if cached_messages_data is not None:
+                    logger.debug("claude_handler.messages_cache_hit",
+                                 thread_id=thread_id,
+                                 message_count=len(cached_messages_data))
+                    # Rebuild lightweight records from compact cached entries
+                    history = history_from_cache(cached_messages_data)
+                    # Start from latest compaction summary
+                    history = trim_to_latest_compaction(history)
+                else:
+                    # Cache miss - load from DB (from latest compaction summary)
+                    history = await msg_repo.get_thread_messages(
+                        thread_id, limit=500, since_compaction=True)
+
+                # Handle user not found
+                if user_model_id is None:
+                    logger.error("claude_handler.user_not_found",
+                                 user_id=user_id)
+                    await _send_to_thread(
+                        first_message.bot, first_message, thread,
+                        "User not found. Please contact administrator.")
+                    return
 
-            if cached_files_data is not None:
-                logger.debug("claude_handler.files_cache_hit",
-                             thread_id=thread_id,
-                             file_count=len(cached_files_data))
-                # Convert cached dicts to CachedUserFile objects
-                from core.tools.helpers import CachedUserFile
-                available_files = [CachedUserFile(f) for f in cached_files_data]
-            else:
-                # Cache miss - load from DB
-                db_files = await user_file_repo.get_by_thread_id(thread_id)
-                available_files = db_files
-                # Cache for next time
-                if db_files:
-                    from core.tools.helpers import _user_file_to_dict
-                    files_data = [_user_file_to_dict(f) for f in db_files]
-                    await cache_files(thread_id, files_data)
-
-            if cached_messages_data is not None:
-                logger.debug("claude_handler.messages_cache_hit",
-                             thread_id=thread_id,
-                             message_count=len(cached_messages_data))
-                # Reconstruct Message objects from cached data
-                history = []
-                for msg_data in cached_messages_data:
-                    msg = Message(
-                        chat_id=msg_data.get("chat_id", 0),
-                        message_id=msg_data.get("message_id", 0),
-                        thread_id=msg_data.get("thread_id"),
-                        from_user_id=msg_data.get("from_user_id"),
-                        date=msg_data["date"],
-                        role=MessageRole(msg_data["role"]),
-                        text_content=msg_data.get("text_content"),
-                        thinking_blocks=msg_data.get("thinking_blocks"),
+                # Cache user data if loaded from DB
+                if user is not None:
+                    await cache_user(
+                        user_id=user_id,
+                        balance=user.balance,
+                        model_id=user_model_id,
+                        first_name=user.first_name,
+                        username=user.username,
+                        language_code=user.language_code,
+                        custom_prompt=user_custom_prompt,
                     )
-                    history.append(msg)
-            else:
-                # Cache miss - load from DB
-                history = await msg_repo.get_thread_messages(thread_id,
-                                                             limit=500)
-
-            # Handle user not found
-            if user_model_id is None:
-                logger.error("claude_handler.user_not_found", user_id=user_id)
-                await _send_to_thread(
-                    first_message.bot, first_message, thread,
-                    "User not found. Please contact administrator.")
-                return
 
-            # Cache user data if loaded from DB
-            if user is not None:
-                await cache_user(
-                    user_id=user_id,
-                    balance=user.balance,
-                    model_id=user_model_id,
-                    first_name=user.first_name,
-                    username=user.username,
-                    language_code=user.language_code,
-                    custom_prompt=user_custom_prompt,
-                )
+                logger.info("claude_handler.files_retrieved",
+                            thread_id=thread_id,
+                            delivered_count=len(available_files),
+                            pending_count=len(pending_files))
 
-            logger.info("claude_handler.files_retrieved",
-                        thread_id=thread_id,
-                        delivered_count=len(available_files),
-                        pending_count=len(pending_files))
-
-            # Cache history only if loaded from DB (cache miss)
-            if cached_messages_data is None:
-                history_for_cache = [{
-                    "role": msg.role.value,
-                    "text_content": msg.text_content,
-                    "message_id": msg.message_id,
-                    "chat_id": msg.chat_id,
-                    "thread_id": msg.thread_id,
-                    "from_user_id": msg.from_user_id,
-                    "date": msg.date,
-                    "thinking_blocks": msg.thinking_blocks,
-                } for msg in history]
-                await cache_messages(thread_id, history_for_cache)
+                # Cache history only if loaded from DB (cache miss)
+                if cached_messages_data is None:
+                    await cache_messages(thread_id,
+                                         history_cache_entries(history))
+
+                history_span.set_attribute("cache_hit", cached_messages_data
+                                           is not None)
 
             logger.debug("claude_handler.history_retrieved",
                          thread_id=thread_id,
                          message_count=len(history))
 
             # 5. Build context
-            model_config = get_model(user_model_id)
-            provider = get_provider(user_model_id)
-            context_mgr = ContextManager(provider)
-
-            logger.debug("claude_handler.using_model",
-                         model_id=user_model_id,
-                         provider=model_config.provider,
-                         model_name=model_config.display_name)
-
-            # Compose system prompt: provider-aware composition
-            # Claude: multi-block with cache_control markers
-            # Others: simple string concatenation
-            system_prompt_blocks = compose_system_prompt_for_provider(
-                provider=model_config.provider,
-                global_prompt=get_system_prompt(model_config.provider),
-                custom_prompt=user_custom_prompt)
-
-            # Calculate total length for logging
-            if isinstance(system_prompt_blocks, list):
-                total_prompt_length = sum(
-                    len(block.get("text", "")) for block in system_prompt_blocks)
-            else:
-                total_prompt_length = len(system_prompt_blocks)
-
-            logger.info("claude_handler.system_prompt_composed",
-                        thread_id=thread_id,
-                        telegram_thread_id=thread.thread_id,
-                        has_custom_prompt=user_custom_prompt is not None,
-                        block_count=len(system_prompt_blocks),
-                        total_length=total_prompt_length)
-
-            # Convert DB messages to LLM messages with context formatting
-            # Uses ContextFormatter to include reply/quote/forward context
-            # Phase 2: Uses async format to include multimodal content (images, PDFs)
-            formatter = ContextFormatter(chat_type=first_message.chat.type)
-            llm_messages = await formatter.format_conversation_with_files(
-                history, session)
-
-            # Build context using total prompt length for token estimation
-            context = await context_mgr.build_context(
-                messages=llm_messages,
-                model_context_window=model_config.context_window,
-                system_prompt=total_prompt_length,  # Pass length for estimation
-                max_output_tokens=model_config.max_output,
-                buffer_percent=CLAUDE_TOKEN_BUFFER_PERCENT)
+            with span("context.build") as context_span:
+                model_config = get_model(user_model_id)
+                provider = get_provider(user_model_id)
+                context_mgr = ContextManager(provider)
+
+                logger.debug("claude_handler.using_model",
+                             model_id=user_model_id,
+                             provider=model_config.provider,
+                             model_name=model_config.display_name)
+
+                # Precompiled tools + system prompt for this model/custom prompt
+                # Claude: multi-block with cache_control markers
+                # Others: simple string concatenation
+                template = get_request_template(user_model_id,
+                                                user_custom_prompt)
+                system_prompt_blocks = template.system_prompt_value()
+                total_prompt_length = template.system_prompt_length
+
+                logger.info("claude_handler.system_prompt_composed",
+                            thread_id=thread_id,
+                            telegram_thread_id=thread.thread_id,
+                            has_custom_prompt=user_custom_prompt is not None,
+                            block_count=len(system_prompt_blocks),
+                            total_length=total_prompt_length)
+
+                # Convert DB messages to LLM messages with context formatting
+                # Uses ContextFormatter to include reply/quote/forward context
+                # Phase 2: Uses async format to include multimodal content (images, PDFs)
+                formatter = ContextFormatter(
+                    chat_type=first_message.chat.type,
+                    native_compaction=model_config.has_capability(
+                        "compaction"))
+                llm_messages = await formatter.format_conversation_with_files(
+                    history, session)
+
+                # Build context using total prompt length for token estimation
+                context = await context_mgr.build_context(
+                    messages=llm_messages,
+                    model_context_window=model_config.context_window,
+                    # Pass length for estimation
+                    system_prompt=total_prompt_length,
+                    max_output_tokens=model_config.max_output,
+                    buffer_percent=CLAUDE_TOKEN_BUFFER_PERCENT)
+
+                context_tokens = (
+                    total_prompt_length // 4 +
+                    sum(estimate_tokens(m.content) for m in context))
+
+                context_span.set_attribute("messages", len(context))
 
             logger.info("claude_handler.context_built",
                         thread_id=thread_id,
                         included_messages=len(context),
-                        total_messages=len(llm_messages))
+                        total_messages=len(llm_messages),
+                        context_tokens=context_tokens)
+
+            # Hold the estimated cost so concurrent generations can't all
+            # start on a balance that covers one (settled by the charge)
+            if reservation is not None:
+                check = await get_balance_policy().reserve(
+                    reservation,
+                    estimate_generation_cost(model_config, context_tokens))
+                if not check.allowed:
+                    logger.info("claude_handler.reservation_refused",
+                                thread_id=thread_id,
+                                user_id=thread.user_id,
+                                available=float(check.balance))
+                    lang = get_lang(first_message.from_user.language_code
+                                    if first_message.from_user else None)
+                    await _send_to_thread(
+                        first_message.bot, first_message, thread,
+                        get_text("balance.insufficient",
+                                 lang,
+                                 balance=check.balance))
+                    return
 
             # 6. Prepare Claude request with multi-block cached system prompt
             # GLOBAL (cached) + user custom (cached if large) + files (NOT cached)
-            # Opus 4.6 has native adaptive thinking — skip extended_thinking tool
-            # to avoid redundant API calls and broken formatting
-            exclude_tools = set()
-            if model_config.has_capability("adaptive_thinking"):
-                exclude_tools.add("extended_thinking")
-
-            request = LLMRequest(
-                messages=context,
-                system_prompt=system_prompt_blocks,
-                model=user_model_id,
-                max_tokens=model_config.max_output,
-                temperature=config.CLAUDE_TEMPERATURE,
-                tools=get_tool_definitions(
-                    exclude=exclude_tools,
-                    provider=model_config.provider))
+            # Tool set comes from the template (adaptive thinking models
+            # skip extended_thinking tool)
+            request = LLMRequest(messages=context,
+                                 system_prompt=system_prompt_blocks,
+                                 model=user_model_id,
+                                 max_tokens=model_config.max_output,
+                                 temperature=config.CLAUDE_TEMPERATURE,
+                                 tools=template.tools_list(),
+                                 template_hash=template.content_hash)
 
             logger.info("claude_handler.request_prepared",
                         thread_id=thread_id,
@@ -607,6 +672,10 @@ async def _process_batch_with_session(
             # Start timing for response metrics
             request_start_time = time.perf_counter()
 
+            # End the load phase: return the connection to the pool while
+            # streaming (loaded objects stay usable, expire_on_commit=False)
+            await session.commit()
+
             # 8. Unified streaming with thinking/text/tools
             # All requests go through stream_events for real-time updates
             # Phase 3.4: Supports continuation for sequential file delivery
@@ -631,6 +700,7 @@ async def _process_batch_with_session(
                 output_chars = 0  # Track output chars for partial payment
                 any_files_delivered = False  # Track if files delivered across continuations
                 compaction_summary = None  # Preserve compaction across continuations
+                on_first_update = _first_draft_recorder(thread_id, messages)
                 for continuation_idx in range(max_continuations + 1):
                     # Use StreamingOrchestrator for cleaner streaming flow
                     orchestrator = StreamingOrchestrator(
@@ -644,7 +714,10 @@ async def _process_batch_with_session(
                         telegram_thread_id=thread.thread_id,
                         continuation_conversation=continuation_conversation,
                         provider=provider,
+                        on_first_update=on_first_update,
                     )
+                    # Only the first stream counts for time-to-first-draft
+                    on_first_update = None
                     result = await orchestrator.stream()
 
                     # Extract values from StreamResult
@@ -856,6 +929,7 @@ async def _process_batch_with_session(
                             ),
                             related_message_id=(bot_message.message_id
                                                 if bot_message else None),
+                            reservation=reservation,
                         )
 
                         logger.info(
@@ -1088,109 +1162,113 @@ async def _process_batch_with_session(
                             max_tokens=config.CLAUDE_MAX_TOKENS)
 
             # 10. Save Claude response via write-behind (Phase 3.3)
-            # Queue message write + token usage for background DB flush
-            total_tokens = usage.input_tokens + usage.output_tokens
-            if usage.thinking_tokens:
-                total_tokens += usage.thinking_tokens
-
-            message_data = {
-                "chat_id":
-                    thread.chat_id,
-                "message_id":
-                    bot_message.message_id,
-                "thread_id":
-                    thread_id,
-                "from_user_id":
-                    None,  # Bot message
-                "date":
-                    bot_message.date.isoformat(),
-                "role":
-                    MessageRole.ASSISTANT.value,
-                "text_content":
-                    response_text,
-                "thinking_blocks":
-                    thinking_blocks_json,
-                "compaction_summary":
-                    compaction_summary,
-                # Token usage included in message data
-                "input_tokens":
-                    usage.input_tokens,
-                "output_tokens":
-                    usage.output_tokens,
-                "cache_read_tokens":
-                    usage.cache_read_tokens,
-                "cache_write_tokens":
-                    usage.cache_creation_tokens,
-                "thinking_tokens":
-                    usage.thinking_tokens,
-                "cost_usd":
-                    float(cost_usd),
-                "model_id":
-                    user_model_id,
-                "cache_write_subsidized":
-                    cache_write_subsidized,
-                "cache_write_cost_usd": (float(cache_creation_cost)
-                                         if cache_creation_cost > 0 else None),
-            }
-
-            queued = await queue_write(WriteType.MESSAGE, message_data)
-            if not queued:
-                # Fallback to direct DB write if Redis unavailable (graceful degradation)
-                logger.info("claude_handler.write_behind_fallback",
-                            thread_id=thread_id,
-                            reason="redis_unavailable")
-                await msg_repo.create_message(
-                    chat_id=thread.chat_id,
-                    message_id=bot_message.message_id,
-                    thread_id=thread_id,
-                    from_user_id=None,
-                    date=bot_message.date.timestamp(),
-                    role=MessageRole.ASSISTANT,
-                    text_content=response_text,
-                    thinking_blocks=thinking_blocks_json,
-                    model_id=user_model_id,
-                )
-                await msg_repo.add_tokens(
-                    chat_id=thread.chat_id,
-                    message_id=bot_message.message_id,
-                    input_tokens=usage.input_tokens,
-                    output_tokens=usage.output_tokens,
-                    cache_creation_tokens=usage.cache_creation_tokens,
-                    cache_read_tokens=usage.cache_read_tokens,
-                    thinking_tokens=usage.thinking_tokens,
-                )
+            with span("persist.response"):
+                # Queue message write + token usage for background DB flush
+                total_tokens = usage.input_tokens + usage.output_tokens
+                if usage.thinking_tokens:
+                    total_tokens += usage.thinking_tokens
+
+                message_data = {
+                    "chat_id":
+                        thread.chat_id,
+                    "message_id":
+                        bot_message.message_id,
+                    "thread_id":
+                        thread_id,
+                    "from_user_id":
+                        None,  # Bot message
+                    "date":
+                        bot_message.date.isoformat(),
+                    "role":
+                        MessageRole.ASSISTANT.value,
+                    "text_content":
+                        response_text,
+                    "thinking_blocks":
+                        thinking_blocks_json,
+                    "compaction_summary":
+                        compaction_summary,
+                    # Token usage included in message data
+                    "input_tokens":
+                        usage.input_tokens,
+                    "output_tokens":
+                        usage.output_tokens,
+                    "cache_read_tokens":
+                        usage.cache_read_tokens,
+                    "cache_write_tokens":
+                        usage.cache_creation_tokens,
+                    "thinking_tokens":
+                        usage.thinking_tokens,
+                    "cost_usd":
+                        float(cost_usd),
+                    "model_id":
+                        user_model_id,
+                    "cache_write_subsidized":
+                        cache_write_subsidized,
+                    "cache_write_cost_usd": (float(cache_creation_cost)
+                                             if cache_creation_cost > 0 else
+                                             None),
+                }
+
+                queued = await queue_write(WriteType.MESSAGE, message_data)
+                if not queued:
+                    # Fallback to direct DB write if Redis unavailable (graceful degradation)
+                    logger.info("claude_handler.write_behind_fallback",
+                                thread_id=thread_id,
+                                reason="redis_unavailable")
+                    await msg_repo.create_message(
+                        chat_id=thread.chat_id,
+                        message_id=bot_message.message_id,
+                        thread_id=thread_id,
+                        from_user_id=None,
+                        date=bot_message.date.timestamp(),
+                        role=MessageRole.ASSISTANT,
+                        text_content=response_text,
+                        thinking_blocks=thinking_blocks_json,
+                        model_id=user_model_id,
+                    )
+                    await msg_repo.add_tokens(
+                        chat_id=thread.chat_id,
+                        message_id=bot_message.message_id,
+                        input_tokens=usage.input_tokens,
+                        output_tokens=usage.output_tokens,
+                        cache_creation_tokens=usage.cache_creation_tokens,
+                        cache_read_tokens=usage.cache_read_tokens,
+                        thinking_tokens=usage.thinking_tokens,
+                    )
 
-            # 11. Queue user stats update via write-behind (Phase 3.3)
-            stats_data = {
-                "user_id": user_id,
-                "messages": len(messages),
-                "tokens": total_tokens,
-            }
-            stats_queued = await queue_write(WriteType.USER_STATS, stats_data)
-            if not stats_queued:
-                # Fallback to direct DB write
-                await services.users.increment_stats(
-                    telegram_id=user_id,
-                    messages=len(messages),
-                    tokens=total_tokens,
-                )
+                # 11. Queue user stats update via write-behind (Phase 3.3)
+                stats_data = {
+                    "user_id": user_id,
+                    "messages": len(messages),
+                    "tokens": total_tokens,
+                }
+                stats_queued = await queue_write(WriteType.USER_STATS,
+                                                 stats_data)
+                if not stats_queued:
+                    # Fallback to direct DB write
+                    await services.users.increment_stats(
+                        telegram_id=user_id,
+                        messages=len(messages),
+                        tokens=total_tokens,
+                    )
 
-            # 12. Update message cache with assistant response (Phase 3.3)
-            # Add to cache instead of invalidating (preserves cached history)
-            assistant_cache_msg = {
-                "role": MessageRole.ASSISTANT.value,
-                "text_content": response_text,
-                "message_id": bot_message.message_id,
-                "date": int(bot_message.date.timestamp()),
-            }
-            cache_updated = await update_cached_messages(
-                thread_id, assistant_cache_msg)
-            if not cache_updated:
-                # Cache miss (not populated) - invalidate to be safe
-                await invalidate_messages(thread_id)
+                # 12. Update message cache with assistant response (Phase 3.3)
+                # Add to cache instead of invalidating (preserves cached history)
+                assistant_cache_msg = {
+                    "role": MessageRole.ASSISTANT.value,
+                    "text_content": response_text,
+                    "message_id": bot_message.message_id,
+                    "date": int(bot_message.date.timestamp()),
+                    "compaction_summary": compaction_summary,
+                }
+                cache_updated = await update_cached_messages(
+                    thread_id, assistant_cache_msg)
+                if not cache_updated:
+                    # Cache miss (not populated) - invalidate to be safe
+                    await invalidate_messages(thread_id)
 
-            # Commit any pending direct writes (fallback path)
-            await session.commit()
+                # Commit any pending direct writes (fallback path)
+                await session.commit()
 
             # Phase 2.1: Charge user for API usage
             # Log cost BEFORE charge_user() so Grafana sees it even if charge fails
@@ -1230,6 +1308,7 @@ async def _process_batch_with_session(
                         amount=user_charge_usd,
                         description=" + ".join(desc_parts),
                         related_message_id=bot_message.message_id,
+                        reservation=reservation,
                     )
                 else:
                     # Fully subsidized — no charge needed
@@ -1265,6 +1344,13 @@ async def _process_batch_with_session(
                         input_tokens=usage.input_tokens,
                         output_tokens=usage.output_tokens)
 
+            # Client-side compaction for models without server-side one
+            # (runs in background with own session, charged separately)
+            get_compaction_service().schedule(thread_id=thread_id,
+                                              user_id=user_id,
+                                              user_model_id=user_model_id,
+                                              context_tokens=context_tokens)
+
             # Bot API 9.3: Generate topic name after first response
             # Awaited (not fire-and-forget) to ensure session is available
             # Naming is fast (~200ms with Haiku), response already sent to user
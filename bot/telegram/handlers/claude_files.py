@@ -18,10 +18,12 @@ from aiogram.exceptions import TelegramNetworkError
 from cache.thread_cache import invalidate_files
 from config import FILES_API_TTL_HOURS
 from core.claude.files_api import upload_to_files_api
+from core.image_processor import get_image_processor
 from core.mime_types import mime_to_file_type
 from db.models.user_file import FileSource
 from db.models.user_file import FileType
 from db.repositories.user_file_repository import UserFileRepository
+from services.metrics_collector import get_aggregate_tracker
 from sqlalchemy.ext.asyncio import AsyncSession
 from telegram.chat_action.manager import ChatActionManager
 from utils.structured_logging import get_logger
@@ -33,13 +35,15 @@ logger = get_logger(__name__)
 _MAX_IMAGE_DIM = 2000
 
 
-def _downscale_image_bytes(
+async def _downscale_image_bytes(
     file_bytes: bytes,
     mime_type: str,
     max_dim: int = _MAX_IMAGE_DIM,
 ) -> tuple[bytes, str]:
     """Downscale image if any dimension exceeds max_dim.
 
+    Runs in the shared image processor pool (off the event loop).
+
     Args:
         file_bytes: Original image bytes.
         mime_type: MIME type of the image.
@@ -48,38 +52,14 @@ def _downscale_image_bytes(
     Returns:
         Tuple of (possibly resized bytes, mime_type).
     """
-    try:
-        from io import BytesIO  # pylint: disable=import-outside-toplevel
-
-        from PIL import Image  # pylint: disable=import-outside-toplevel
-
-        img = Image.open(BytesIO(file_bytes))
-        w, h = img.size
-
-        if w <= max_dim and h <= max_dim:
-            return file_bytes, mime_type
-
-        scale = max_dim / max(w, h)
-        new_w = int(w * scale)
-        new_h = int(h * scale)
-        img = img.resize((new_w, new_h), Image.LANCZOS)
-
-        fmt = "PNG" if "png" in mime_type else "JPEG"
-        buf = BytesIO()
-        if fmt == "JPEG" and img.mode in ("RGBA", "P"):
-            img = img.convert("RGB")
-        img.save(buf, format=fmt, quality=85)
-        resized = buf.getvalue()
-
+    resized, mime_type = await get_image_processor().downscale(
+        file_bytes, mime_type, max_dim=max_dim)
+    if resized is not file_bytes:
         logger.info("files.image_downscaled",
-                    original=f"{w}x{h}",
-                    resized=f"{new_w}x{new_h}",
                     original_size=len(file_bytes),
                     resized_size=len(resized))
-        return resized, mime_type
+    return resized, mime_type
 
-    except Exception:  # pylint: disable=broad-exception-caught
-        return file_bytes, mime_type
 
 # Retry settings for network errors
 MAX_SEND_RETRIES = 3
@@ -179,7 +159,7 @@ async def _process_single_file(
             # Claude API rejects oversized images in multi-image requests
             upload_bytes = file_bytes
             if db_file_type == FileType.IMAGE:
-                upload_bytes, mime_type = _downscale_image_bytes(
+                upload_bytes, mime_type = await _downscale_image_bytes(
                     file_bytes, mime_type)
 
             # Step 1: Upload to Files API
@@ -231,6 +211,8 @@ async def _process_single_file(
                     telegram_file_unique_id = sent_msg.document.file_unique_id
 
         # Step 3: Save to database (use original file type, not chat action type)
+        expires_at = datetime.now(timezone.utc) + timedelta(
+            hours=FILES_API_TTL_HOURS)
         await user_file_repo.create(
             message_id=first_message.message_id,
             telegram_file_id=telegram_file_id,
@@ -241,11 +223,11 @@ async def _process_single_file(
             mime_type=mime_type,
             file_size=len(file_bytes),
             source=FileSource.ASSISTANT,
-            expires_at=datetime.now(timezone.utc) +
-            timedelta(hours=FILES_API_TTL_HOURS),
+            expires_at=expires_at,
             file_metadata={"as_document": as_document} if as_document else {},
             upload_context=upload_context,
         )
+        get_aggregate_tracker().file_created(expires_at.timestamp())
 
         # Dashboard tracking event
         logger.info(
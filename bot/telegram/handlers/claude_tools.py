@@ -135,7 +135,8 @@ async def execute_single_tool_safe(
         chat_id: Chat ID for typing indicator (optional).
         message_thread_id: Forum topic ID for typing indicator (optional).
         on_subagent_tool: Callback for self_critique subagent tool progress.
-        on_thinking_chunk: Callback for extended_thinking thinking chunks.
+        on_thinking_chunk: Callback for thinking chunks of extended_thinking
+            and the self_critique subagent.
         cancel_event: Optional asyncio.Event for cancellation.
         **extra_kwargs: Additional kwargs passed to tool executor (e.g., model_id).
 
@@ -190,10 +191,13 @@ async def execute_single_tool_safe(
         # Pass callbacks and extra params for special tools
         tool_input_with_callback = dict(tool_input)
 
-        # self_critique: subagent tool callback and cancel event
+        # self_critique: subagent tool and thinking callbacks, cancel event
         if tool_name == "self_critique":
             if on_subagent_tool:
                 tool_input_with_callback["on_subagent_tool"] = on_subagent_tool
+            if on_thinking_chunk:
+                tool_input_with_callback[
+                    "on_thinking_chunk"] = on_thinking_chunk
             if cancel_event:
                 tool_input_with_callback["cancel_event"] = cancel_event
 
@@ -26,6 +26,12 @@ class DatabaseMiddleware(BaseMiddleware):
     injects it into handler data['session'], automatically commits
     on success, rolls back on errors, and ensures proper cleanup.
 
+    The session is cheap until used: AsyncSession checks out a pooled
+    connection on its first query and returns it on commit/rollback. Updates
+    that never query hold no connection. Handlers that await long work
+    after querying (e.g. handle_message, which awaits the whole generation)
+    must commit first so the connection is not held meanwhile.
+
     Usage in handler:
         async def my_handler(message: Message, session: AsyncSession):
             user_repo = UserRepository(session)
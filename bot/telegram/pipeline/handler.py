@@ -19,17 +19,22 @@ from aiogram import F
 from aiogram import Router
 from aiogram import types
 from aiogram.filters import StateFilter
+import config
 from sqlalchemy.ext.asyncio import AsyncSession
 from telegram.generation_tracker import generation_tracker
 from telegram.pipeline.models import ProcessedMessage
 from telegram.pipeline.models import TranscriptInfo
 from telegram.pipeline.normalizer import get_normalizer
 from telegram.pipeline.queue import ProcessedMessageQueue
+from telegram.pipeline.speculation import SpeculativePrefetch
 from telegram.pipeline.tracker import get_media_group_tracker
 from telegram.pipeline.tracker import get_tracker
 from telegram.thread_resolver import get_or_create_thread
+from utils.metrics import record_handler_dispatch
 from utils.metrics import record_message_received
 from utils.structured_logging import get_logger
+from utils.tracing import span
+from utils.tracing import start_span
 
 logger = get_logger(__name__)
 
@@ -87,8 +92,10 @@ async def handle_message(message: types.Message, session: AsyncSession) -> None:
     - Video notes (round videos, auto-transcribed)
 
     Flow:
-    1. Normalize message (download, upload, transcribe)
-    2. Get or create thread
+    1. Normalize message (download, upload, transcribe); in parallel,
+       warm caches for the likely thread and start topic routing when
+       text is known upfront
+    2. Route topic and get or create thread
     3. Add to queue
 
     Args:
@@ -102,13 +109,20 @@ async def handle_message(message: types.Message, session: AsyncSession) -> None:
         )
         return
 
+    received_at = time.perf_counter()
+    # Root span of this update: queue processing spawned by queue.add()
+    # inherits it, so the whole request shares one trace
+    receive_span = start_span("pipeline.receive")
+    receive_span.activate()
     user_id = message.from_user.id
     chat_id = message.chat.id
     thread_id = message.message_thread_id
 
     # Phase 2.5: Cancel any active generation for this user in same thread
     # New message will be queued and processed after current generation stops
-    if generation_tracker.is_active(chat_id, user_id, thread_id):
+    generation_was_active = generation_tracker.is_active(
+        chat_id, user_id, thread_id)
+    if generation_was_active:
         await generation_tracker.cancel(chat_id, user_id, thread_id)
         logger.info(
             "unified_handler.cancelled_active_generation",
@@ -120,6 +134,7 @@ async def handle_message(message: types.Message, session: AsyncSession) -> None:
 
     # Determine content type for metrics
     content_type = _get_content_type(message)
+    receive_span.set_attribute("content_type", content_type)
 
     logger.info(
         "unified_handler.received",
@@ -148,12 +163,29 @@ async def handle_message(message: types.Message, session: AsyncSession) -> None:
     handler_start = time.perf_counter()
     normalization_finished = False
 
+    # Speculative start: warm caches for the current thread and start
+    # routing before normalization finishes when text is known upfront
+    # (text, captions). Voice/video notes route on the transcript.
+    prefetch = None
+    route_task = None
+    if config.SPECULATIVE_PREFETCH_ENABLED:
+        prefetch = SpeculativePrefetch(chat_id, user_id)
+        # Skip thread warm-up while a cancelled generation may still be
+        # saving into that thread's history cache
+        prefetch.start(thread_id, include_thread=not generation_was_active)
+        early_text = message.text or message.caption
+        if early_text:
+            route_task = asyncio.create_task(
+                _try_topic_routing(message, early_text, session, user_id))
+
     try:
         # 1. Normalize message (all I/O happens here)
-        normalize_start = time.perf_counter()
-        normalizer = get_normalizer()
-        processed = await normalizer.normalize(message)
-        normalize_ms = (time.perf_counter() - normalize_start) * 1000
+        with span("pipeline.normalize",
+                  content_type=content_type) as normalize_span:
+            normalizer = get_normalizer()
+            processed = await normalizer.normalize(message)
+        processed.received_at = received_at
+        normalize_ms = normalize_span.duration * 1000
 
         logger.info(
             "unified_handler.normalized",
@@ -185,6 +217,10 @@ async def handle_message(message: types.Message, session: AsyncSession) -> None:
             processed.text or
             (processed.transcript.text if processed.transcript else None))
 
+        if route_task is None:
+            route_task = asyncio.create_task(
+                _try_topic_routing(message, routing_text, session, user_id))
+
         if needs_transcription_charge:
             # Run transcription charge and topic routing in parallel
             charge_coro = _charge_transcription(
@@ -194,13 +230,10 @@ async def handle_message(message: types.Message, session: AsyncSession) -> None:
                 transcript=processed.transcript,
                 content_type=content_type,
             )
-            route_coro = _try_topic_routing(message, routing_text, session,
-                                            user_id)
-            _, route = await asyncio.gather(charge_coro, route_coro)
+            _, route = await asyncio.gather(charge_coro, route_task)
             object.__setattr__(processed, 'transcription_charged', True)
         else:
-            route = await _try_topic_routing(message, routing_text, session,
-                                             user_id)
+            route = await route_task
 
         pre_resolved_thread = None
         if route is not None and route.action != "passthrough":
@@ -217,18 +250,28 @@ async def handle_message(message: types.Message, session: AsyncSession) -> None:
             # Passthrough with pre-resolved thread (avoids duplicate DB lookup)
             pre_resolved_thread = route.resolved_thread
 
+        # Drop warm-up for the losing route, warm the routed thread instead
+        # ("new" topics are warmed by get_or_create_thread on creation)
+        if prefetch is not None:
+            if route is not None and route.action == "new":
+                prefetch.cancel_threads()
+            elif override_thread_id is not None:
+                prefetch.select(override_thread_id)
+
         # 3. Get or create thread (with possible topic override)
-        thread_start = time.perf_counter()
-        thread = await get_or_create_thread(
-            message,
-            session,
-            override_thread_id=override_thread_id,
-            override_title=route_title,
-            override_needs_naming=route_needs_naming,
-            pre_resolved_thread=pre_resolved_thread,
-        )
-        await session.commit()
-        thread_resolve_ms = (time.perf_counter() - thread_start) * 1000
+        with span("pipeline.thread_resolve") as thread_span:
+            thread = await get_or_create_thread(
+                message,
+                session,
+                override_thread_id=override_thread_id,
+                override_title=route_title,
+                override_needs_naming=route_needs_naming,
+                pre_resolved_thread=pre_resolved_thread,
+            )
+            # Also returns the middleware's connection to the pool: the
+            # queue below awaits the whole generation
+            await session.commit()
+        thread_resolve_ms = thread_span.duration * 1000
 
         logger.info(
             "unified_handler.thread_resolved",
@@ -237,11 +280,17 @@ async def handle_message(message: types.Message, session: AsyncSession) -> None:
             thread_resolve_ms=round(thread_resolve_ms, 2),
         )
 
+        # Warm-up must land before the batch appends to the history cache
+        if prefetch is not None:
+            await prefetch.wait()
+
         # 4. Add to queue
         queue = get_queue()
         await queue.add(thread_id=thread.id, message=processed)
 
         handler_ms = (time.perf_counter() - handler_start) * 1000
+        record_handler_dispatch(route.action if route else "passthrough",
+                                time.perf_counter() - received_at)
         logger.info(
             "unified_handler.queued",
             user_id=user_id,
@@ -261,6 +310,7 @@ async def handle_message(message: types.Message, session: AsyncSession) -> None:
             )
 
     except Exception as e:  # pylint: disable=broad-exception-caught
+        receive_span.end(error=e)
         logger.error(
             "unified_handler.failed",
             user_id=user_id,
@@ -283,6 +333,13 @@ async def handle_message(message: types.Message, session: AsyncSession) -> None:
         # (in case of error before step 4)
         if not normalization_finished:
             await tracker.finish(chat_id, message.message_id)
+        # Speculative work is useless once the handler is done
+        if route_task is not None and not route_task.done():
+            route_task.cancel()
+        if prefetch is not None:
+            prefetch.cancel()
+        receive_span.deactivate()
+        receive_span.end()
 
 
 async def _try_topic_routing(
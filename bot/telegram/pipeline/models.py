@@ -12,6 +12,10 @@ pipeline (Architecture Refactoring):
 Key invariant: All files are uploaded BEFORE entering the queue,
 eliminating race conditions at the design level.
 
+All dataclasses are slotted. Records that are never modified after
+extraction (files, transcript, reply context, metadata) are also frozen,
+so batched messages can share them safely.
+
 NO __init__.py - use direct import:
     from telegram.pipeline.models import ProcessedMessage, UploadedFile
 """
@@ -47,7 +51,7 @@ class MediaType(str, Enum):
     PDF = "pdf"  # PDF -> Files API (PDF parser)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TranscriptInfo:
     """Transcription result from Whisper API.
 
@@ -67,7 +71,7 @@ class TranscriptInfo:
     cost_usd: float
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class UploadedFile:  # pylint: disable=too-many-instance-attributes
     """File uploaded to Claude Files API, ready for use.
 
@@ -95,7 +99,7 @@ class UploadedFile:  # pylint: disable=too-many-instance-attributes
     metadata: dict = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ReplyContext:
     """Context from reply_to_message, forward, or quote.
 
@@ -119,7 +123,7 @@ class ReplyContext:
     quote_text: Optional[str] = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class MessageMetadata:  # pylint: disable=too-many-instance-attributes
     """Metadata extracted from Telegram message.
 
@@ -153,7 +157,7 @@ class MessageMetadata:  # pylint: disable=too-many-instance-attributes
     is_premium: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class ProcessedMessage:  # pylint: disable=too-many-instance-attributes
     """Universal container for all message types.
 
@@ -186,6 +190,8 @@ class ProcessedMessage:  # pylint: disable=too-many-instance-attributes
     transcription_charged: bool = False
     # Timing: when this message was queued (for queue_wait_ms calculation)
     queued_at: float = field(default_factory=time.perf_counter)
+    # Timing: when the handler received the update (for time-to-first-draft)
+    received_at: Optional[float] = None
 
     @property
     def has_media(self) -> bool:
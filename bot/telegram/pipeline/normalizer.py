@@ -22,6 +22,9 @@ from typing import Optional
 from aiogram import types
 from cache.file_cache import cache_file
 from core.claude.files_api import upload_to_files_api
+from core.file_transfer import download_to_cache
+from core.file_transfer import transfer_to_files_api
+from core.image_processor import get_image_processor
 from core.mime_types import detect_mime_type
 from core.mime_types import mime_to_media_type
 from core.pricing import calculate_whisper_cost
@@ -36,16 +39,11 @@ from telegram.pipeline.models import ReplyContext
 from telegram.pipeline.models import TranscriptInfo
 from telegram.pipeline.models import UploadedFile
 from utils.structured_logging import get_logger
+from utils.tracing import span
+from utils.tracing import traced
 
 logger = get_logger(__name__)
 
-# Register HEIC/HEIF opener for Pillow (must run before any Image.open)
-try:
-    import pillow_heif  # pylint: disable=import-outside-toplevel
-    pillow_heif.register_heif_opener()
-except ImportError:
-    logger.info("normalizer.pillow_heif_not_available")
-
 # Image formats supported by Claude API
 _CLAUDE_SUPPORTED_IMAGE_MIMES = frozenset({
     'image/jpeg',
@@ -311,6 +309,7 @@ class MessageNormalizer:
 
         return None
 
+    @traced("normalize.download")
     async def _download_file(
         self,
         message: types.Message,
@@ -320,7 +319,9 @@ class MessageNormalizer:
         """Download file from Telegram and cache for tools.
 
         Phase 3.2: Caches downloaded files in Redis for fast retrieval
-        during tool execution (transcribe_audio, execute_python).
+        during tool execution (transcribe_audio, execute_python). The
+        download is streamed through the blob store, so the content is
+        held in memory once.
 
         Args:
             message: Telegram message (for bot access).
@@ -333,32 +334,22 @@ class MessageNormalizer:
         Raises:
             ValueError: If download fails.
         """
-        file_info = await message.bot.get_file(file_id)
-        file_bytes_io = await message.bot.download_file(file_info.file_path)
-
-        if not file_bytes_io:
-            raise ValueError(f"Failed to download file: {file_id}")
-
-        content = file_bytes_io.read()
-
-        # Phase 3.2: Cache file for potential tool use
-        await cache_file(file_id, content, filename=filename)
-
-        return content
+        return await download_to_cache(message.bot, file_id, filename=filename)
 
+    @traced("normalize.upload")
     async def _download_and_upload(
         self,
         message: types.Message,
         file_id: str,
         filename: str,
         mime_type: str,
-    ) -> tuple[bytes, Optional[str]]:
-        """Download file, cache in Redis, and upload to Files API.
+    ) -> tuple[int, Optional[str]]:
+        """Stream file from Telegram into the cache and Files API.
 
-        Flow:
-        1. Download file from Telegram
-        2. Cache in Redis (always - needed for Google provider)
-        3. Try Files API upload (non-fatal if it fails)
+        Download chunks are teed into the blob store (always - needed for
+        Google provider) and into a Files API upload running at the same
+        time, so the file is never held in memory as a whole. The upload
+        is non-fatal: if it fails, the file is still usable via cache.
 
         Args:
             message: Telegram message (for bot access).
@@ -367,43 +358,18 @@ class MessageNormalizer:
             mime_type: MIME type for Files API upload.
 
         Returns:
-            Tuple of (file_content, claude_file_id or None).
+            Tuple of (size_bytes, claude_file_id or None).
 
         Raises:
             ValueError: If download fails.
         """
-        # Step 1: Download from Telegram
-        file_info = await message.bot.get_file(file_id)
-        file_bytes_io = await message.bot.download_file(file_info.file_path)
-
-        if not file_bytes_io:
-            raise ValueError(f"Failed to download file: {file_id}")
-
-        content = file_bytes_io.read()
-
-        # Step 2: Cache in Redis (always needed for Google inline resolution)
-        await cache_file(file_id, content, filename=filename)
-
-        # Step 3: Try Files API upload (non-fatal)
-        # Google models don't need Files API - they use cached bytes.
-        # If upload fails, the file is still usable via Redis cache.
-        try:
-            claude_file_id = await upload_to_files_api(
-                file_bytes=content,
-                filename=filename,
-                mime_type=mime_type,
-            )
-        except Exception as e:  # pylint: disable=broad-exception-caught
-            logger.warning(
-                "normalizer.files_api_upload_skipped",
-                filename=filename,
-                file_id=file_id,
-                error=str(e),
-                error_type=type(e).__name__,
-            )
-            claude_file_id = None
-
-        return content, claude_file_id
+        result = await transfer_to_files_api(
+            message.bot,
+            file_id,
+            filename=filename,
+            mime_type=mime_type,
+        )
+        return result.size_bytes, result.claude_file_id
 
     async def _process_voice(
         self,
@@ -446,12 +412,13 @@ class MessageNormalizer:
         audio_file = io.BytesIO(audio_bytes)
         audio_file.name = f"voice_{voice.file_id[:8]}.ogg"
 
-        response = await client.audio.transcriptions.create(
-            model="whisper-1",
-            file=audio_file,
-            language=None,  # Auto-detect
-            response_format="verbose_json",
-        )
+        with span("normalize.transcribe", media="voice"):
+            response = await client.audio.transcriptions.create(
+                model="whisper-1",
+                file=audio_file,
+                language=None,  # Auto-detect
+                response_format="verbose_json",
+            )
 
         transcript_text = response.text.strip()
         duration = response.duration or voice.duration
@@ -520,12 +487,13 @@ class MessageNormalizer:
         video_file = io.BytesIO(video_bytes)
         video_file.name = f"video_note_{video_note.file_id[:8]}.mp4"
 
-        response = await client.audio.transcriptions.create(
-            model="whisper-1",
-            file=video_file,
-            language=None,
-            response_format="verbose_json",
-        )
+        with span("normalize.transcribe", media="video_note"):
+            response = await client.audio.transcriptions.create(
+                model="whisper-1",
+                file=video_file,
+                language=None,
+                response_format="verbose_json",
+            )
 
         transcript_text = response.text.strip()
         duration = response.duration or video_note.duration
@@ -586,7 +554,7 @@ class MessageNormalizer:
         )
 
         # Download, cache and upload in parallel (~100-200ms savings)
-        audio_bytes, claude_file_id = await self._download_and_upload(
+        audio_size, claude_file_id = await self._download_and_upload(
             message=message,
             file_id=audio.file_id,
             filename=filename,
@@ -598,7 +566,7 @@ class MessageNormalizer:
             user_id=user_id,
             filename=filename,
             claude_file_id=claude_file_id,
-            size_bytes=len(audio_bytes),
+            size_bytes=audio_size,
         )
 
         return [
@@ -609,7 +577,7 @@ class MessageNormalizer:
                 file_type=MediaType.AUDIO,
                 filename=filename,
                 mime_type=mime_type,
-                size_bytes=audio.file_size or len(audio_bytes),
+                size_bytes=audio.file_size or audio_size,
                 metadata={
                     "duration": audio.duration,
                     "performer": audio.performer,
@@ -652,7 +620,7 @@ class MessageNormalizer:
         )
 
         # Download, cache and upload in parallel (~100-200ms savings)
-        video_bytes, claude_file_id = await self._download_and_upload(
+        video_size, claude_file_id = await self._download_and_upload(
             message=message,
             file_id=video.file_id,
             filename=filename,
@@ -664,7 +632,7 @@ class MessageNormalizer:
             user_id=user_id,
             filename=filename,
             claude_file_id=claude_file_id,
-            size_bytes=len(video_bytes),
+            size_bytes=video_size,
         )
 
         return [
@@ -675,7 +643,7 @@ class MessageNormalizer:
                 file_type=MediaType.VIDEO,
                 filename=filename,
                 mime_type=mime_type,
-                size_bytes=video.file_size or len(video_bytes),
+                size_bytes=video.file_size or video_size,
                 metadata={
                     "duration": video.duration,
                     "width": video.width,
@@ -712,7 +680,7 @@ class MessageNormalizer:
         mime_type = "image/jpeg"
 
         # Download, cache and upload in parallel (~100-200ms savings)
-        photo_bytes, claude_file_id = await self._download_and_upload(
+        photo_size, claude_file_id = await self._download_and_upload(
             message=message,
             file_id=photo.file_id,
             filename=filename,
@@ -724,7 +692,7 @@ class MessageNormalizer:
             user_id=user_id,
             filename=filename,
             claude_file_id=claude_file_id,
-            size_bytes=len(photo_bytes),
+            size_bytes=photo_size,
         )
 
         return [
@@ -735,7 +703,7 @@ class MessageNormalizer:
                 file_type=MediaType.IMAGE,
                 filename=filename,
                 mime_type=mime_type,
-                size_bytes=photo.file_size or len(photo_bytes),
+                size_bytes=photo.file_size or photo_size,
                 metadata={
                     "width": photo.width,
                     "height": photo.height,
@@ -744,7 +712,7 @@ class MessageNormalizer:
         ]
 
     @staticmethod
-    def _convert_image_to_jpeg(
+    async def _convert_image_to_jpeg(
         content: bytes,
         mime_type: str,
         filename: str,
@@ -753,6 +721,8 @@ class MessageNormalizer:
 
         Claude API supports: JPEG, PNG, GIF, WebP.
         Other formats (HEIC, HEIF, BMP, TIFF) are converted to JPEG.
+        Conversion runs in the shared image processor pool (off the
+        event loop).
 
         Args:
             content: Original image bytes.
@@ -765,18 +735,7 @@ class MessageNormalizer:
         Raises:
             ValueError: If image cannot be opened or converted.
         """
-        import io  # pylint: disable=import-outside-toplevel
-        from PIL import Image  # pylint: disable=import-outside-toplevel
-
-        img = Image.open(io.BytesIO(content))
-
-        # Convert to RGB for JPEG (handles RGBA, LA, P, etc.)
-        if img.mode != 'RGB':
-            img = img.convert('RGB')
-
-        output = io.BytesIO()
-        img.save(output, format='JPEG', quality=95)
-        converted = output.getvalue()
+        converted = await get_image_processor().to_jpeg(content, quality=95)
 
         new_filename = filename.rsplit('.', 1)[0] + '.jpg'
 
@@ -827,8 +786,10 @@ class MessageNormalizer:
             doc_bytes = await self._download_file(message,
                                                   document.file_id,
                                                   filename=filename)
-            doc_bytes, mime_type, filename = self._convert_image_to_jpeg(
-                doc_bytes, mime_type, filename)
+            doc_bytes, mime_type, filename = (
+                await self._convert_image_to_jpeg(doc_bytes, mime_type,
+                                                  filename))
+            doc_size = len(doc_bytes)
             # Cache converted bytes for Google inline resolution
             await cache_file(document.file_id, doc_bytes, filename=filename)
             try:
@@ -848,7 +809,7 @@ class MessageNormalizer:
                 claude_file_id = None
         else:
             # Standard path: download, cache and upload in parallel
-            doc_bytes, claude_file_id = await self._download_and_upload(
+            doc_size, claude_file_id = await self._download_and_upload(
                 message=message,
                 file_id=document.file_id,
                 filename=filename,
@@ -864,7 +825,7 @@ class MessageNormalizer:
             filename=filename,
             claude_file_id=claude_file_id,
             file_type=file_type.value,
-            size_bytes=len(doc_bytes),
+            size_bytes=doc_size,
         )
 
         return [
@@ -875,7 +836,7 @@ class MessageNormalizer:
                 file_type=file_type,
                 filename=filename,
                 mime_type=mime_type,
-                size_bytes=document.file_size or len(doc_bytes),
+                size_bytes=document.file_size or doc_size,
                 metadata={},
             )
         ]
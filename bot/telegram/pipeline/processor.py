@@ -22,6 +22,7 @@ from db.engine import get_session
 from db.models.user_file import FileSource
 from db.models.user_file import FileType as DbFileType
 from db.repositories.user_file_repository import UserFileRepository
+from services.metrics_collector import get_aggregate_tracker
 from telegram.pipeline.models import MediaType
 from telegram.pipeline.models import ProcessedMessage
 from utils.structured_logging import get_logger
@@ -91,6 +92,8 @@ async def process_batch(
                         # DB requires non-null unique claude_file_id
                         db_claude_file_id = (file.claude_file_id
                                              or f"unavailable:{uuid4().hex}")
+                        expires_at = datetime.now(timezone.utc) + timedelta(
+                            hours=FILES_API_TTL_HOURS)
                         await file_repo.create(
                             message_id=processed.metadata.message_id,
                             telegram_file_id=file.telegram_file_id,
@@ -102,11 +105,12 @@ async def process_batch(
                             mime_type=file.mime_type,
                             file_size=file.size_bytes,
                             source=FileSource.USER,
-                            expires_at=datetime.now(timezone.utc) +
-                            timedelta(hours=FILES_API_TTL_HOURS),
+                            expires_at=expires_at,
                             file_metadata=file.metadata,
                             upload_context=upload_context,
                         )
+                        get_aggregate_tracker().file_created(
+                            expires_at.timestamp())
 
                         logger.info(
                             "processor.file_saved",
@@ -19,6 +19,7 @@ import time
 from typing import Awaitable, Callable, Dict, List, TYPE_CHECKING
 
 from utils.structured_logging import get_logger
+from utils.tracing import record_stage
 
 if TYPE_CHECKING:
     from telegram.pipeline.models import ProcessedMessage
@@ -285,6 +286,7 @@ class ProcessedMessageQueue:
         # Calculate queue wait times for each message
         queue_wait_times = []
         for msg in messages:
+            record_stage("queue.wait", processing_start - msg.queued_at)
             queue_wait_ms = (processing_start - msg.queued_at) * 1000
             queue_wait_times.append(round(queue_wait_ms, 2))
 
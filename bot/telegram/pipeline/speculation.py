@@ -0,0 +1,239 @@
+"""Speculative cache warm-up for the unified pipeline.
+
+While a message is normalized and topic routing decides where it goes,
+the caches the batch processor reads first (user, thread history, thread
+files) are warmed for the thread the message most likely lands in - the
+one it was sent to. When routing picks another topic, warm-up for the
+losing thread is cancelled and the routed thread is warmed instead.
+
+Warm-up only fills caches on a miss (cold or expired thread), which is
+exactly when routing runs (after a gap), so the batch processor starts
+streaming without the DB fallback.
+
+NO __init__.py - use direct import:
+    from telegram.pipeline.speculation import SpeculativePrefetch
+"""
+
+import asyncio
+
+from cache.thread_cache import cache_files
+from cache.thread_cache import cache_messages
+from cache.thread_cache import get_cached_files
+from cache.thread_cache import get_cached_messages
+from cache.thread_cache import get_cached_thread
+from cache.user_cache import cache_user
+from cache.user_cache import get_cached_user
+from db.engine import get_session
+from db.repositories.message_repository import history_cache_entries
+from db.repositories.message_repository import MessageRepository
+from db.repositories.thread_repository import ThreadRepository
+from db.repositories.user_file_repository import UserFileRepository
+from db.repositories.user_repository import UserRepository
+from utils.metrics import record_speculative_prefetch
+from utils.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Same history window as the batch processor's DB fallback
+HISTORY_LIMIT = 500
+
+
+async def warm_user(user_id: int) -> str:
+    """Load user into cache if missing.
+
+    Args:
+        user_id: Telegram user ID.
+
+    Returns:
+        "hit" (already cached), "warmed" or "miss" (no such user).
+    """
+    if await get_cached_user(user_id) is not None:
+        return "hit"
+
+    async with get_session() as session:
+        user = await UserRepository(session).get_by_id(user_id)
+    if user is None:
+        return "miss"
+
+    await cache_user(
+        user_id=user.id,
+        balance=user.balance,
+        model_id=user.model_id,
+        first_name=user.first_name,
+        username=user.username,
+        language_code=user.language_code,
+        custom_prompt=user.custom_prompt,
+    )
+    return "warmed"
+
+
+async def warm_thread(chat_id: int, user_id: int,
+                      telegram_thread_id: int | None) -> str:
+    """Load thread history and files into cache if missing.
+
+    Args:
+        chat_id: Telegram chat ID.
+        user_id: Telegram user ID.
+        telegram_thread_id: Telegram topic ID (None for main chat).
+
+    Returns:
+        "hit" (already cached), "warmed" or "miss" (no such thread).
+    """
+    cached_thread = await get_cached_thread(chat_id, user_id,
+                                            telegram_thread_id)
+    internal_id = cached_thread.get("id") if cached_thread else None
+
+    if internal_id is not None:
+        messages, files = await asyncio.gather(
+            get_cached_messages(internal_id), get_cached_files(internal_id))
+        if messages is not None and files is not None:
+            return "hit"
+
+    async with get_session() as session:
+        if internal_id is None:
+            thread = await ThreadRepository(session).get_active_thread(
+                chat_id=chat_id, user_id=user_id, thread_id=telegram_thread_id)
+            if thread is None:
+                return "miss"
+            internal_id = thread.id
+            messages, files = await asyncio.gather(
+                get_cached_messages(internal_id),
+                get_cached_files(internal_id))
+
+        if messages is None:
+            history = await MessageRepository(session).get_thread_messages(
+                internal_id, limit=HISTORY_LIMIT, since_compaction=True)
+            await cache_messages(internal_id, history_cache_entries(history))
+
+        if files is None:
+            db_files = await UserFileRepository(session).get_by_thread_id(
+                internal_id)
+            if db_files:
+                from core.tools.helpers import \
+                    _user_file_to_dict  # pylint: disable=import-outside-toplevel
+                await cache_files(internal_id,
+                                  [_user_file_to_dict(f) for f in db_files])
+
+    return "warmed"
+
+
+class SpeculativePrefetch:
+    """Cache warm-up tasks for one incoming message.
+
+    Usage:
+        prefetch = SpeculativePrefetch(chat_id, user_id)
+        prefetch.start(message.message_thread_id)
+        ...  # normalize, route
+        prefetch.select(routed_thread_id)  # or cancel_threads() for "new"
+        await prefetch.wait()  # before queue.add()
+        prefetch.cancel()  # in finally
+    """
+
+    def __init__(self, chat_id: int, user_id: int):
+        """Initialize SpeculativePrefetch.
+
+        Args:
+            chat_id: Telegram chat ID.
+            user_id: Telegram user ID.
+        """
+        self.chat_id = chat_id
+        self.user_id = user_id
+        self._user_task: asyncio.Task | None = None
+        # Telegram topic ID -> warm-up task
+        self._thread_tasks: dict[int | None, asyncio.Task] = {}
+
+    def start(self,
+              telegram_thread_id: int | None,
+              include_thread: bool = True) -> None:
+        """Start warm-up for the user and the thread the message was sent to.
+
+        Args:
+            telegram_thread_id: Telegram topic ID (None for main chat).
+            include_thread: Also warm the thread (False while another
+                generation may be writing its history).
+        """
+        if self._user_task is None:
+            self._user_task = self._spawn("user", warm_user, self.user_id)
+        if include_thread:
+            self._start_thread(telegram_thread_id)
+
+    def select(self, telegram_thread_id: int | None) -> None:
+        """Keep warm-up for the routed thread only.
+
+        Args:
+            telegram_thread_id: Telegram topic ID chosen by routing.
+        """
+        for key in list(self._thread_tasks):
+            if key != telegram_thread_id:
+                self._cancel_thread(key)
+        self._start_thread(telegram_thread_id)
+
+    def cancel_threads(self) -> None:
+        """Cancel all thread warm-ups (message goes to a new topic)."""
+        for key in list(self._thread_tasks):
+            self._cancel_thread(key)
+
+    async def wait(self) -> None:
+        """Wait for running warm-ups (errors are logged, not raised)."""
+        tasks = [t for t in self._tasks() if not t.done()]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def cancel(self) -> None:
+        """Cancel everything still running."""
+        for task in self._tasks():
+            if not task.done():
+                task.cancel()
+
+    def _tasks(self) -> list[asyncio.Task]:
+        """All warm-up tasks."""
+        tasks = list(self._thread_tasks.values())
+        if self._user_task is not None:
+            tasks.append(self._user_task)
+        return tasks
+
+    def _start_thread(self, telegram_thread_id: int | None) -> None:
+        """Start thread warm-up unless already running."""
+        if telegram_thread_id in self._thread_tasks:
+            return
+        self._thread_tasks[telegram_thread_id] = self._spawn(
+            "thread", warm_thread, self.chat_id, self.user_id,
+            telegram_thread_id)
+
+    def _cancel_thread(self, telegram_thread_id: int | None) -> None:
+        """Cancel warm-up of a losing thread."""
+        task = self._thread_tasks.pop(telegram_thread_id)
+        if not task.done():
+            task.cancel()
+            record_speculative_prefetch("thread", "cancelled")
+            logger.debug(
+                "speculation.thread_cancelled",
+                user_id=self.user_id,
+                telegram_thread_id=telegram_thread_id,
+            )
+
+    def _spawn(self, target: str, warm, *args) -> asyncio.Task:
+        """Run warm-up function as a task with outcome metrics."""
+
+        async def _run() -> None:
+            try:
+                result = await warm(*args)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.info(
+                    "speculation.warm_failed",
+                    user_id=self.user_id,
+                    target=target,
+                    error=str(e),
+                )
+                return
+            record_speculative_prefetch(target, result)
+            logger.debug(
+                "speculation.warm_done",
+                user_id=self.user_id,
+                target=target,
+                result=result,
+            )
+
+        return asyncio.create_task(_run())
@@ -0,0 +1,254 @@
+"""Adaptive update cadence for sendMessageDraft.
+
+DraftCadence picks the interval between draft updates for one response
+from three signals:
+
+- Token arrival rate (reported by StreamingSession): slow streams get
+  short intervals so each chunk shows up promptly; fast streams get long
+  ones, since Telegram animates every draft change and fewer, larger
+  updates look just as smooth.
+- sendMessageDraft latency: never update faster than the API answers
+  (DRAFT_LATENCY_FACTOR x latency EWMA).
+- Global outbound budget: all active responses share
+  DRAFT_GLOBAL_UPDATES_PER_SECOND, so the interval grows with the number
+  of concurrent streams.
+
+Flood control (TelegramRetryAfter) doubles the interval; the penalty
+decays with each successful update.
+
+NO __init__.py - use direct import:
+    from telegram.streaming.cadence import DraftCadence
+"""
+
+import time
+from typing import Callable, Optional
+import weakref
+
+from config import DRAFT_FAST_CHARS_PER_SECOND
+from config import DRAFT_FAST_UPDATE_INTERVAL
+from config import DRAFT_GLOBAL_UPDATES_PER_SECOND
+from config import DRAFT_LATENCY_FACTOR
+from config import DRAFT_MAX_UPDATE_INTERVAL
+from config import DRAFT_MIN_UPDATE_INTERVAL
+from utils.metrics import record_draft_cadence
+from utils.metrics import record_draft_send_latency
+from utils.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+# EWMA weight of the newest sample
+_EWMA_ALPHA = 0.3
+
+# Chars are aggregated over at least this long before a rate sample
+_RATE_SAMPLE_SECONDS = 0.5
+
+# Longer gaps (tool calls, long thinking pauses) start a fresh sample
+_RATE_IDLE_GAP = 3.0
+
+# Flood penalty: multiplier per RetryAfter, cap, decay per sent update
+_FLOOD_PENALTY_STEP = 2.0
+_FLOOD_PENALTY_MAX = 4.0
+_FLOOD_PENALTY_DECAY = 0.85
+
+
+class OutboundBudget:
+    """Draft update budget shared by all active responses.
+
+    Each active DraftCadence gets an equal share of the global rate.
+    Cadences are tracked weakly, so a response that is never closed
+    stops counting once it is garbage collected.
+    """
+
+    def __init__(
+            self,
+            updates_per_second: float = DRAFT_GLOBAL_UPDATES_PER_SECOND
+    ) -> None:
+        """Initialize budget.
+
+        Args:
+            updates_per_second: Draft updates per second across all chats.
+        """
+        self._rate = updates_per_second
+        self._active: weakref.WeakSet = weakref.WeakSet()
+
+    @property
+    def active(self) -> int:
+        """Number of responses currently streaming."""
+        return len(self._active)
+
+    def register(self, cadence: "DraftCadence") -> None:
+        """Start counting a response against the budget."""
+        self._active.add(cadence)
+
+    def unregister(self, cadence: "DraftCadence") -> None:
+        """Stop counting a response against the budget."""
+        self._active.discard(cadence)
+
+    def fair_interval(self) -> float:
+        """Minimum interval per response that keeps within the budget."""
+        return max(self.active, 1) / self._rate
+
+
+class DraftCadence:  # pylint: disable=too-many-instance-attributes
+    """Adaptive draft update interval for one response.
+
+    Shared by all DraftStreamers of a DraftManager, so the learned rate
+    and latency carry over when a response is split into several drafts.
+    Also counts updates sent and skipped for per-response telemetry.
+    """
+
+    def __init__(self,
+                 budget: Optional[OutboundBudget] = None,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """Initialize cadence.
+
+        Args:
+            budget: Shared outbound budget (global singleton by default).
+            clock: Monotonic time source.
+        """
+        self._budget = budget or get_outbound_budget()
+        self._clock = clock
+        self._latency: Optional[float] = None
+        self._char_rate: Optional[float] = None
+        self._sample_start: Optional[float] = None
+        self._sample_chars = 0
+        self._last_chars_at = 0.0
+        self._flood_penalty = 1.0
+        self._interval_sum = 0.0
+        self._closed = False
+        self.sent = 0
+        self.skipped = 0
+        self.keepalives = 0
+        self._budget.register(self)
+
+    @property
+    def latency(self) -> Optional[float]:
+        """sendMessageDraft latency EWMA (seconds), None before first send."""
+        return self._latency
+
+    @property
+    def char_rate(self) -> Optional[float]:
+        """Token arrival rate EWMA (chars/second), None until measured."""
+        return self._char_rate
+
+    def observe_chars(self, count: int) -> None:
+        """Record streamed content arriving from the model.
+
+        Args:
+            count: Number of characters in the delta.
+        """
+        now = self._clock()
+        idle = now - self._last_chars_at > _RATE_IDLE_GAP
+        self._last_chars_at = now
+        if self._sample_start is None or idle:
+            # A delta after a pause covers unknown time: start sampling here
+            self._sample_start = now
+            self._sample_chars = 0
+            return
+        self._sample_chars += count
+
+        elapsed = now - self._sample_start
+        if elapsed >= _RATE_SAMPLE_SECONDS:
+            self._char_rate = _ewma(self._char_rate,
+                                    self._sample_chars / elapsed)
+            self._sample_start = now
+            self._sample_chars = 0
+
+    def observe_latency(self, seconds: float) -> None:
+        """Record a sendMessageDraft round trip.
+
+        Args:
+            seconds: Call duration.
+        """
+        self._latency = _ewma(self._latency, seconds)
+        record_draft_send_latency(seconds)
+
+    def observe_flood(self) -> None:
+        """Back off after TelegramRetryAfter."""
+        self._flood_penalty = min(self._flood_penalty * _FLOOD_PENALTY_STEP,
+                                  _FLOOD_PENALTY_MAX)
+
+    def record_sent(self) -> None:
+        """Count a content update and let the flood penalty decay."""
+        self.sent += 1
+        self._interval_sum += self.interval()
+        self._flood_penalty = max(self._flood_penalty * _FLOOD_PENALTY_DECAY,
+                                  1.0)
+
+    def record_skipped(self) -> None:
+        """Count an update coalesced by throttling."""
+        self.skipped += 1
+
+    def record_keepalive(self) -> None:
+        """Count a keepalive resend."""
+        self.keepalives += 1
+
+    def interval(self) -> float:
+        """Current minimum time between draft updates (seconds)."""
+        if self._char_rate is None:
+            interval = DRAFT_MIN_UPDATE_INTERVAL
+        else:
+            speed = min(self._char_rate / DRAFT_FAST_CHARS_PER_SECOND, 1.0)
+            interval = DRAFT_MIN_UPDATE_INTERVAL + speed * (
+                DRAFT_FAST_UPDATE_INTERVAL - DRAFT_MIN_UPDATE_INTERVAL)
+
+        if self._latency is not None:
+            interval = max(interval, DRAFT_LATENCY_FACTOR * self._latency)
+        interval = max(interval, self._budget.fair_interval())
+        return min(interval * self._flood_penalty, DRAFT_MAX_UPDATE_INTERVAL)
+
+    def keepalive_interval(self, base: float) -> float:
+        """Keepalive interval, stretched when updates are throttled harder.
+
+        Args:
+            base: Configured keepalive interval.
+
+        Returns:
+            Seconds of inactivity before a keepalive is sent.
+        """
+        return max(base, self.interval())
+
+    def close(self, chat_id: Optional[int] = None) -> None:
+        """Leave the budget and record per-response telemetry.
+
+        Safe to call multiple times.
+
+        Args:
+            chat_id: Chat ID for the log entry.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._budget.unregister(self)
+
+        mean_interval = self._interval_sum / self.sent if self.sent else 0.0
+        record_draft_cadence(self.sent, self.skipped, self.keepalives,
+                             mean_interval)
+        logger.debug("draft_cadence.closed",
+                     chat_id=chat_id,
+                     sent=self.sent,
+                     skipped=self.skipped,
+                     keepalives=self.keepalives,
+                     mean_interval=round(mean_interval, 2),
+                     char_rate=round(self._char_rate or 0.0, 1),
+                     latency_ms=round((self._latency or 0.0) * 1000))
+
+
+def _ewma(current: Optional[float], sample: float) -> float:
+    """Fold a sample into an exponentially weighted moving average."""
+    if current is None:
+        return sample
+    return current + _EWMA_ALPHA * (sample - current)
+
+
+from core.singleton import singleton  # pylint: disable=wrong-import-position
+
+
+@singleton
+def get_outbound_budget() -> OutboundBudget:
+    """Get the global draft update budget.
+
+    Returns:
+        OutboundBudget singleton.
+    """
+    return OutboundBudget()
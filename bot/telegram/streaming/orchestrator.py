@@ -7,8 +7,10 @@ NO __init__.py - use direct import:
     from telegram.streaming.orchestrator import StreamingOrchestrator
 """
 
-from typing import TYPE_CHECKING
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, TYPE_CHECKING
 
+from core.claude.prompt_cache import get_prompt_cache_manager
 from core.models import LLMRequest
 from core.models import Message
 from telegram.chat_action.manager import ChatActionManager
@@ -20,8 +22,11 @@ from telegram.streaming.session import StreamingSession
 from telegram.streaming.tool_executor import ToolExecutor
 from telegram.streaming.types import CancellationReason
 from telegram.streaming.types import StreamResult
+from telegram.streaming.types import ToolCall
 from utils.serialization import serialize_content_block
 from utils.structured_logging import get_logger
+from utils.tracing import span
+from utils.tracing import start_span
 
 if TYPE_CHECKING:
     from aiogram import Bot
@@ -165,6 +170,7 @@ class StreamingOrchestrator:  # pylint: disable=too-many-instance-attributes
         continuation_conversation: list | None = None,
         claude_provider: "LLMProvider | None" = None,
         provider: "LLMProvider | None" = None,
+        on_first_update: "Callable[[], None] | None" = None,
     ):
         """Initialize StreamingOrchestrator.
 
@@ -180,6 +186,7 @@ class StreamingOrchestrator:  # pylint: disable=too-many-instance-attributes
             continuation_conversation: Conversation state for continuation.
             claude_provider: Deprecated, use provider instead.
             provider: LLMProvider instance (uses factory if None).
+            on_first_update: Called once when the first draft is sent.
         """
         self._request = request
         self._first_message = first_message
@@ -191,6 +198,7 @@ class StreamingOrchestrator:  # pylint: disable=too-many-instance-attributes
         self._telegram_thread_id = telegram_thread_id
         self._continuation_conversation = continuation_conversation
         self._provider = provider or claude_provider
+        self._on_first_update = on_first_update
 
         # Lazy-loaded components
         self._tool_executor: ToolExecutor | None = None
@@ -219,6 +227,28 @@ class StreamingOrchestrator:  # pylint: disable=too-many-instance-attributes
             )
         return self._tool_executor
 
+    @asynccontextmanager
+    async def _speculation_scope(self) -> AsyncIterator[None]:
+        """Cancel speculative tool work left over when streaming stops."""
+        try:
+            yield
+        finally:
+            self._cancel_speculation()
+
+    def _speculate(self, event, cancel_event) -> None:
+        """Start safe work for a tool whose input has finished streaming."""
+        tool = ToolCall(tool_id=event.tool_id,
+                        name=event.tool_name,
+                        input=event.tool_input or {})
+        self._get_tool_executor().speculate(tool,
+                                            cancel_event=cancel_event,
+                                            model_id=self._request.model)
+
+    def _cancel_speculation(self) -> None:
+        """Cancel tool work started for tools that will not be executed."""
+        if self._tool_executor is not None:
+            self._tool_executor.cancel_speculation()
+
     async def stream(self) -> StreamResult:
         """Stream response with tool loop and continuation.
 
@@ -269,8 +299,11 @@ class StreamingOrchestrator:  # pylint: disable=too-many-instance-attributes
                 topic_id=self._telegram_thread_id,
                 keepalive_interval=DRAFT_KEEPALIVE_INTERVAL,
             ) as dm,
+            self._speculation_scope(),
         ):
-            stream = StreamingSession(dm, self._thread_id)
+            stream = StreamingSession(dm,
+                                      self._thread_id,
+                                      on_first_update=self._on_first_update)
             total_output_chars = 0
             # Capture provider state at stream_complete time to avoid
             # singleton race condition (see provider_factory.py).
@@ -279,157 +312,192 @@ class StreamingOrchestrator:  # pylint: disable=too-many-instance-attributes
             # Anchor cache breakpoint to last clean message before
             # tool blocks. Stays stable across tool loop iterations,
             # and matches what DB will return for the next message.
-            clean_breakpoint_idx = max(len(conversation) - 2, 0)
+            # Fresh turns let the prompt cache manager pick the offset.
+            cache_manager = get_prompt_cache_manager()
+            if self._continuation_conversation is None:
+                clean_breakpoint_idx = cache_manager.choose_breakpoint(
+                    self._request.template_hash, self._thread_id,
+                    len(conversation))
+            else:
+                clean_breakpoint_idx = max(len(conversation) - 2, 0)
+            # Conversation is append-only, so Message wrappers built in
+            # earlier iterations are reused and only the tail is added.
+            llm_messages: list[Message] = []
 
             for iteration in range(TOOL_LOOP_MAX_ITERATIONS):
-                logger.info(
-                    "orchestrator.iteration",
-                    thread_id=self._thread_id,
-                    iteration=iteration + 1,
-                )
-
-                # Reset per-iteration state
-                stream.reset_iteration()
-
-                # Build request for this iteration
-                iter_request = LLMRequest(
-                    messages=[
-                        Message(role=msg["role"], content=msg["content"])
-                        for msg in conversation
-                    ],
-                    system_prompt=self._request.system_prompt,
-                    model=self._request.model,
-                    max_tokens=self._request.max_tokens,
-                    temperature=self._request.temperature,
-                    tools=self._request.tools,
-                    cache_breakpoint_index=clean_breakpoint_idx,
-                )
+                with span("tool_loop.iteration", iteration=iteration + 1):
+                    logger.info(
+                        "orchestrator.iteration",
+                        thread_id=self._thread_id,
+                        iteration=iteration + 1,
+                    )
 
-                # Stream with typing indicator
-                was_cancelled = False
-                generating_scope_id = await action_manager.push_scope(
-                    ActionPhase.GENERATING)
-                generating_scope_active = True
+                    # Reset per-iteration state
+                    stream.reset_iteration()
+                    self._cancel_speculation()
+
+                    # Build request for this iteration. model_construct skips
+                    # pydantic validation: self._request was validated when it
+                    # was created and conversation entries are built here.
+                    llm_messages.extend(
+                        Message.model_construct(role=msg["role"],
+                                                content=msg["content"])
+                        for msg in conversation[len(llm_messages):])
+                    iter_request = LLMRequest.model_construct(
+                        messages=list(llm_messages),
+                        system_prompt=self._request.system_prompt,
+                        model=self._request.model,
+                        max_tokens=self._request.max_tokens,
+                        temperature=self._request.temperature,
+                        tools=self._request.tools,
+                        cache_breakpoint_index=clean_breakpoint_idx,
+                        template_hash=self._request.template_hash,
+                    )
 
-                try:
-                    provider = self._get_provider()
-                    async for event in provider.stream_events(iter_request):
-                        # Check for cancellation
-                        if cancel_event.is_set():
-                            was_cancelled = True
-                            break
-
-                        # Handle events
-                        if event.type == "thinking_delta":
-                            await stream.handle_thinking_delta(event.content)
-                        elif event.type == "text_delta":
-                            await stream.handle_text_delta(event.content)
-                        elif event.type == "tool_use":
-                            # Stop typing when tool detected
-                            if generating_scope_active:
-                                await action_manager.pop_scope(
-                                    generating_scope_id)
-                                generating_scope_active = False
-                            await stream.handle_tool_use_start(
-                                event.tool_id, event.tool_name,
-                                event.is_server_tool)
-                        elif event.type == "block_end":
-                            if event.tool_name and event.tool_id:
-                                stream.handle_tool_input_complete(
+                    # Stream with typing indicator
+                    was_cancelled = False
+                    generating_scope_id = await action_manager.push_scope(
+                        ActionPhase.GENERATING)
+                    generating_scope_active = True
+
+                    ttft_span = start_span("llm.ttft")
+                    try:
+                        provider = self._get_provider()
+                        async for event in provider.stream_events(iter_request):
+                            ttft_span.end()  # No-op after the first event
+                            # Check for cancellation
+                            if cancel_event.is_set():
+                                was_cancelled = True
+                                break
+
+                            # Handle events
+                            if event.type == "thinking_delta":
+                                await stream.handle_thinking_delta(
+                                    event.content)
+                            elif event.type == "text_delta":
+                                await stream.handle_text_delta(event.content)
+                            elif event.type == "tool_use":
+                                # Stop typing when tool detected
+                                if generating_scope_active:
+                                    await action_manager.pop_scope(
+                                        generating_scope_id)
+                                    generating_scope_active = False
+                                await stream.handle_tool_use_start(
                                     event.tool_id, event.tool_name,
-                                    event.tool_input or {},
                                     event.is_server_tool)
-                                await stream.update_display()
-                            else:
-                                await stream.handle_block_end()
-                        elif event.type == "message_end":
-                            stream.handle_message_end(event.stop_reason)
-                        elif event.type == "stream_complete":
-                            stream.handle_stream_complete(event.final_message)
-                            # Capture provider state NOW — before any
-                            # await that could let another coroutine call
-                            # stream_events() and reset the singleton.
-                            captured_usage = event.usage
-                            provider = self._get_provider()
-                            captured_thinking_blocks_json = (
-                                provider.get_thinking_blocks_json()
-                            )
-                finally:
-                    if generating_scope_active:
-                        await action_manager.pop_scope(generating_scope_id)
-
-                # Final update
-                await stream.update_display()
-                stream.log_iteration_complete(iteration + 1)
-                total_output_chars += stream.get_current_text_length()
-
-                # Handle cancellation
-                if was_cancelled:
-                    return await self._handle_cancellation(
-                        stream, dm, total_output_chars)
-
-                # Handle end_turn/pause_turn
-                if stream.stop_reason in ("end_turn", "pause_turn"):
-                    return await self._handle_completion(
-                        stream, dm, iteration + 1,
-                        captured_usage, captured_thinking_blocks_json)
-
-                # Handle tool execution
-                if stream.stop_reason == "tool_use" and stream.pending_tools:
-                    result = await self._execute_tools(stream, dm, conversation,
-                                                       cancel_event, iteration)
-                    if result is not None:
-                        # Attach captured usage for turn break path
-                        result.usage = captured_usage
-                        result.thinking_blocks_json = captured_thinking_blocks_json
-                        return result
-                    # Continue to next iteration with updated conversation
-                elif stream.stop_reason == "tool_use" and not stream.pending_tools:
-                    # Only server-side tools were called (web_search, web_fetch)
-                    # They are executed by API automatically, just add to conversation
-                    provider = self._get_provider()
-                    provider_content = provider.get_serialized_assistant_content()
-                    if provider_content:
-                        conversation.append({
-                            "role": "assistant",
-                            "content": provider_content
-                        })
-                    elif stream.captured_message and stream.captured_message.content:
-                        captured_msg = stream.captured_message
-                        serialized_content = [
-                            serialize_content_block(block)
-                            for block in captured_msg.content
-                            if getattr(block, 'type', None) != 'thinking'
-                        ]
-                        conversation.append({
-                            "role": "assistant",
-                            "content": serialized_content
-                        })
-                    elif stream.content_blocks:
-                        serialized_content = [
-                            block for block in stream.content_blocks
-                            if block.get('type') != 'thinking'
-                        ]
-                        if serialized_content:
-                            logger.warning(
-                                "orchestrator.content_blocks_fallback",
-                                thread_id=self._thread_id,
-                                block_count=len(serialized_content),
-                            )
+                            elif event.type == "block_end":
+                                if event.tool_name and event.tool_id:
+                                    stream.handle_tool_input_complete(
+                                        event.tool_id, event.tool_name,
+                                        event.tool_input or {},
+                                        event.is_server_tool)
+                                    # Start safe tool work while the model
+                                    # finishes its turn
+                                    if not event.is_server_tool:
+                                        self._speculate(event, cancel_event)
+                                    await stream.update_display()
+                                else:
+                                    await stream.handle_block_end()
+                            elif event.type == "message_end":
+                                stream.handle_message_end(event.stop_reason)
+                            elif event.type == "stream_complete":
+                                stream.handle_stream_complete(
+                                    event.final_message)
+                                # Capture provider state NOW — before any
+                                # await that could let another coroutine call
+                                # stream_events() and reset the singleton.
+                                captured_usage = event.usage
+                                cache_manager.record_usage(
+                                    self._request.template_hash,
+                                    getattr(event.final_message, "usage", None),
+                                    thread_id=self._thread_id,
+                                    first_call=iteration == 0,
+                                )
+                                provider = self._get_provider()
+                                captured_thinking_blocks_json = (
+                                    provider.get_thinking_blocks_json())
+                    except BaseException as e:
+                        # Stream failed or was cancelled before any event
+                        ttft_span.end(error=e)
+                        raise
+                    finally:
+                        ttft_span.end()
+                        if generating_scope_active:
+                            await action_manager.pop_scope(generating_scope_id)
+
+                    # Final update
+                    await stream.update_display()
+                    stream.log_iteration_complete(iteration + 1)
+                    total_output_chars += stream.get_current_text_length()
+
+                    # Handle cancellation
+                    if was_cancelled:
+                        return await self._handle_cancellation(
+                            stream, dm, total_output_chars)
+
+                    # Handle end_turn/pause_turn
+                    if stream.stop_reason in ("end_turn", "pause_turn"):
+                        return await self._handle_completion(
+                            stream, dm, iteration + 1, captured_usage,
+                            captured_thinking_blocks_json)
+
+                    # Handle tool execution
+                    if stream.stop_reason == "tool_use" and stream.pending_tools:
+                        result = await self._execute_tools(
+                            stream, dm, conversation, cancel_event, iteration)
+                        if result is not None:
+                            # Attach captured usage for turn break path
+                            result.usage = captured_usage
+                            result.thinking_blocks_json = captured_thinking_blocks_json
+                            return result
+                        # Continue to next iteration with updated conversation
+                    elif stream.stop_reason == "tool_use" and not stream.pending_tools:
+                        # Only server-side tools were called (web_search, web_fetch)
+                        # They are executed by API automatically, just add to conversation
+                        provider = self._get_provider()
+                        provider_content = (
+                            provider.get_serialized_assistant_content())
+                        if provider_content:
+                            conversation.append({
+                                "role": "assistant",
+                                "content": provider_content
+                            })
+                        elif stream.captured_message and stream.captured_message.content:
+                            captured_msg = stream.captured_message
+                            serialized_content = [
+                                serialize_content_block(block)
+                                for block in captured_msg.content
+                                if getattr(block, 'type', None) != 'thinking'
+                            ]
                             conversation.append({
                                 "role": "assistant",
                                 "content": serialized_content
                             })
-                    if True:  # Always log
-                        logger.info(
-                            "orchestrator.server_tools_only",
-                            thread_id=self._thread_id,
-                            iteration=iteration + 1,
-                        )
-                    # Continue to next iteration
-                else:
-                    # Unexpected stop reason
-                    return await self._handle_unexpected_stop(stream, dm)
+                        elif stream.content_blocks:
+                            serialized_content = [
+                                block for block in stream.content_blocks
+                                if block.get('type') != 'thinking'
+                            ]
+                            if serialized_content:
+                                logger.warning(
+                                    "orchestrator.content_blocks_fallback",
+                                    thread_id=self._thread_id,
+                                    block_count=len(serialized_content),
+                                )
+                                conversation.append({
+                                    "role": "assistant",
+                                    "content": serialized_content
+                                })
+                        if True:  # Always log
+                            logger.info(
+                                "orchestrator.server_tools_only",
+                                thread_id=self._thread_id,
+                                iteration=iteration + 1,
+                            )
+                        # Continue to next iteration
+                    else:
+                        # Unexpected stop reason
+                        return await self._handle_unexpected_stop(stream, dm)
 
             # Max iterations exceeded
             return await self._handle_max_iterations(dm)
@@ -578,6 +646,9 @@ class StreamingOrchestrator:  # pylint: disable=too-many-instance-attributes
                 self._user_id,
                 self._telegram_thread_id,
             )
+            # Tools run in their own sessions: make the new file records
+            # visible to them
+            await self._session.commit()
 
         # Callback for subagent tool progress (e.g., self_critique)
         async def on_subagent_tool(parent_tool: str, sub_tool: str) -> None:
@@ -4,7 +4,7 @@ StreamingSession encapsulates all state needed during a single streaming
 response, providing clean methods for handling events and managing display.
 """
 
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 from core.tools.registry import get_tool_emoji
 from telegram.draft_streaming import DraftManager
@@ -97,17 +97,21 @@ class StreamingSession:  # pylint: disable=too-many-instance-attributes
     def __init__(self,
                  draft_manager: DraftManager,
                  thread_id: int,
-                 parse_mode: ParseMode = DEFAULT_PARSE_MODE) -> None:
+                 parse_mode: ParseMode = DEFAULT_PARSE_MODE,
+                 on_first_update: Callable[[], None] | None = None) -> None:
         """Initialize streaming session.
 
         Args:
             draft_manager: DraftManager for sending updates.
             thread_id: Database thread ID for logging.
             parse_mode: "MarkdownV2" (default) or "HTML".
+            on_first_update: Called once when the first draft is sent
+                (time-to-first-draft metrics).
         """
         self._dm = draft_manager
         self._thread_id = thread_id
         self._parse_mode = parse_mode
+        self._on_first_update = on_first_update
         self._display = DisplayManager()
         self._truncator = TruncationManager(parse_mode=parse_mode)
         self._last_sent_text = ""
@@ -192,6 +196,7 @@ class StreamingSession:  # pylint: disable=too-many-instance-attributes
         self._display.append(BlockType.THINKING, content)
         self._current_thinking += content
         self._current_block_type = "thinking"
+        self._dm.cadence.observe_chars(len(content))
         await self._update_draft()
 
     async def handle_text_delta(self, content: str) -> None:
@@ -229,6 +234,7 @@ class StreamingSession:  # pylint: disable=too-many-instance-attributes
         self._display.append(BlockType.TEXT, content)
         self._current_text += content
         self._current_block_type = "text"
+        self._dm.cadence.observe_chars(len(content))
         await self._update_draft()
 
     async def handle_tool_use_start(self,
@@ -592,6 +598,8 @@ class StreamingSession:  # pylint: disable=too-many-instance-attributes
                 logger.debug("stream.session.first_update_sent",
                              thread_id=self._thread_id,
                              text_length=len(display_text))
+                if self._on_first_update is not None:
+                    self._on_first_update()
 
     async def _split_message(self) -> None:
         """Split message when text exceeds limit.
@@ -3,30 +3,58 @@
 Handles parallel tool execution with proper charging, metrics, and cleanup.
 Extracted from claude.py for better separation of concerns.
 
+Speculative execution: as soon as a tool's input has streamed, speculate()
+starts safe work for it while the model is still finishing its turn -
+the tool's prepare hook (file prefetch, sandbox lease) or, for read-only
+tools, the full execution. execute_batch() picks that work up by tool_id;
+work nobody picks up is cancelled by cancel_speculation().
+
+Bulkheads: every tool call holds its tool's bulkhead slots (global and
+per-user limits from ToolConfig, see core/tools/bulkhead.py). Calls shed by
+an overloaded bulkhead come back as tool errors.
+
+Sessions: tools run concurrently and an AsyncSession must not be used by
+two coroutines at once, so each tool call (and prepare hook) gets its own
+short-lived session from get_session(). The generation's session is only
+used between tool completions (charging).
+
 NO __init__.py - use direct import:
     from telegram.streaming.tool_executor import ToolExecutor
 """
 
 import asyncio
+from contextlib import AbstractAsyncContextManager
+from contextlib import nullcontext
 from dataclasses import dataclass
 from dataclasses import field
 from decimal import Decimal
-from typing import Awaitable, Callable, TYPE_CHECKING
+import time
+from typing import Awaitable, Callable, Optional, TYPE_CHECKING
 
 from cache.write_behind import queue_write
 from cache.write_behind import WriteType
+from config import get_model
+from config import TOOL_SPECULATION_ENABLED
+from core.tools.bulkhead import get_tool_bulkhead
+from core.tools.bulkhead import ToolOverloaded
+from core.tools.registry import get_tool_for_provider
+from db.engine import get_session
 from telegram.handlers.claude_tools import charge_for_tool
 from telegram.handlers.claude_tools import execute_single_tool_safe
 from telegram.streaming.types import ToolCall
 from utils.metrics import record_cost
 from utils.metrics import record_error
 from utils.metrics import record_tool_call
+from utils.metrics import record_tool_speculation
+from utils.metrics import record_tool_speculation_saved
 from utils.structured_logging import get_logger
+from utils.tracing import span
 
 if TYPE_CHECKING:
     from asyncio import Event
 
     from aiogram import Bot
+    from core.tools.base import ToolConfig
     from sqlalchemy.ext.asyncio import AsyncSession
 
 logger = get_logger(__name__)
@@ -64,19 +92,51 @@ class BatchExecutionResult:
         force_turn_break: True if any tool requested turn break.
         turn_break_tool: Name of tool that triggered turn break.
         first_file_committed: True if files were committed during execution.
+        speculation_saved: Seconds of tool work done while the model was
+            still streaming.
     """
 
     results: list[ToolExecutionResult]
     force_turn_break: bool = False
     turn_break_tool: str | None = None
     first_file_committed: bool = False
+    speculation_saved: float = 0.0
+
+
+@dataclass
+class _Speculation:
+    """Tool work started before the model finished its turn.
+
+    Attributes:
+        tool_name: Tool the work is for.
+        kind: "prepare" (warm-up hook) or "execute" (read-only tool).
+        task: Running work; "execute" tasks return the tool result.
+        started: Monotonic start time.
+        finished: Monotonic time the task completed (None while running).
+    """
+
+    tool_name: str
+    kind: str
+    task: asyncio.Task
+    started: float
+    finished: Optional[float] = None
+
+    def mark_finished(self, _task: asyncio.Task) -> None:
+        """Done callback: remember when the work completed."""
+        self.finished = time.monotonic()
+
+    def overlap(self, now: float) -> float:
+        """Seconds of work done before now."""
+        end = self.finished if self.finished is not None else now
+        return max(min(end, now) - self.started, 0.0)
 
 
 class ToolExecutor:
     """Executes tools in parallel with proper handling.
 
     Manages:
-    - Parallel execution via asyncio.as_completed
+    - Parallel execution via asyncio.as_completed (one DB session per tool)
+    - Speculative execution while the model is still streaming
     - Cost charging
     - Metrics recording
     - Database queuing for tool calls
@@ -96,7 +156,8 @@ class ToolExecutor:
 
         Args:
             bot: Telegram Bot instance.
-            session: Database session.
+            session: Generation's database session (charging only; tools
+                open their own).
             thread_id: Thread ID for logging.
             user_id: User ID for charging.
             chat_id: Chat ID for typing indicator.
@@ -110,6 +171,161 @@ class ToolExecutor:
         self._chat_id = chat_id
         self._message_id = message_id
         self._message_thread_id = message_thread_id
+        # tool_id -> work started by speculate()
+        self._speculations: dict[str, _Speculation] = {}
+
+    def speculate(
+        self,
+        tool: ToolCall,
+        cancel_event: "Event | None" = None,
+        model_id: str | None = None,
+    ) -> bool:
+        """Start safe work for a tool whose input has finished streaming.
+
+        Read-only tools run in full; tools with a prepare hook warm up.
+        Other tools wait for execute_batch() as before.
+
+        Args:
+            tool: Tool call with complete input.
+            cancel_event: Optional event to check for cancellation.
+            model_id: User's current model ID (provider-specific tools).
+
+        Returns:
+            True if work was started.
+        """
+        if not TOOL_SPECULATION_ENABLED or tool.tool_id in self._speculations:
+            return False
+
+        provider = get_model(model_id).provider if model_id else "claude"
+        config = get_tool_for_provider(tool.name, provider)
+        if config is None or config.is_server_side:
+            return False
+
+        if config.read_only:
+            kind = "execute"
+            work = self._run_tool(tool,
+                                  cancel_event=cancel_event,
+                                  model_id=model_id)
+        elif config.prepare is not None:
+            kind = "prepare"
+            work = self._prepare(config, tool)
+        else:
+            return False
+
+        speculation = _Speculation(
+            tool_name=tool.name,
+            kind=kind,
+            task=asyncio.create_task(work, name=f"speculate:{tool.name}"),
+            started=time.monotonic(),
+        )
+        speculation.task.add_done_callback(speculation.mark_finished)
+        self._speculations[tool.tool_id] = speculation
+
+        logger.debug(
+            "tool_executor.speculation_started",
+            thread_id=self._thread_id,
+            tool_name=tool.name,
+            kind=kind,
+        )
+        return True
+
+    def cancel_speculation(self) -> int:
+        """Cancel speculative work that no batch picked up.
+
+        Called when the stream aborts or ends without running the tools.
+
+        Returns:
+            Number of cancelled tasks.
+        """
+        speculations, self._speculations = self._speculations, {}
+        for speculation in speculations.values():
+            speculation.task.cancel()
+            record_tool_speculation(speculation.tool_name, speculation.kind,
+                                    "cancelled")
+        if speculations:
+            logger.info(
+                "tool_executor.speculation_cancelled",
+                thread_id=self._thread_id,
+                tool_names=[s.tool_name for s in speculations.values()],
+            )
+        return len(speculations)
+
+    async def _prepare(self, config: "ToolConfig", tool: ToolCall) -> None:
+        """Run a tool's prepare hook; failures surface in real execution."""
+        try:
+            async with get_session() as session:
+                await config.prepare(tool.input,
+                                     bot=self._bot,
+                                     session=session,
+                                     thread_id=self._thread_id)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.info(
+                "tool_executor.prepare_failed",
+                thread_id=self._thread_id,
+                tool_name=tool.name,
+                error=str(e),
+            )
+
+    def _bulkhead(self,
+                  config: "ToolConfig | None") -> AbstractAsyncContextManager:
+        """Bulkhead slots for a tool (no-op for unknown tools)."""
+        if config is None:
+            return nullcontext()
+        return get_tool_bulkhead().acquire(config, self._user_id)
+
+    async def _run_tool(
+        self,
+        tool: ToolCall,
+        cancel_event: "Event | None" = None,
+        on_subagent_tool: "Callable[[str], Awaitable[None]] | None" = None,
+        on_thinking_chunk: "Callable[[str], Awaitable[None]] | None" = None,
+        model_id: str | None = None,
+    ) -> dict:
+        """Execute one tool; errors are returned in the result dict."""
+        # Pass model_id for provider-aware tool resolution
+        extra_kwargs = {}
+        if model_id:
+            extra_kwargs["model_id"] = model_id
+
+        provider = get_model(model_id).provider if model_id else "claude"
+        config = get_tool_for_provider(tool.name, provider)
+
+        with span("tool.execute", tool=tool.name) as tool_span:
+            try:
+                # Slot first: queued calls must not hold a pooled connection
+                async with self._bulkhead(config), get_session() as session:
+                    result = await execute_single_tool_safe(
+                        tool_name=tool.name,
+                        tool_input=tool.input,
+                        bot=self._bot,
+                        session=session,
+                        thread_id=self._thread_id,
+                        user_id=self._user_id,
+                        chat_id=self._chat_id,
+                        message_thread_id=self._message_thread_id,
+                        on_subagent_tool=on_subagent_tool,
+                        on_thinking_chunk=on_thinking_chunk,
+                        cancel_event=cancel_event,
+                        **extra_kwargs,
+                    )
+            except ToolOverloaded as e:
+                reason = (f"no free slot after waiting {e.wait_time:.0f}s"
+                          if e.reason == "timeout" else
+                          "too many calls are already queued for it")
+                result = {
+                    "error": "tool_overloaded",
+                    "message":
+                        (f"{tool.name} is overloaded right now by requests "
+                         f"from all users ({reason}). Do not retry it in "
+                         "this turn: continue without it or tell the user "
+                         "to try again in a few minutes."),
+                    "_tool_name": tool.name,
+                    "_duration": e.wait_time,
+                }
+            if result.get("error"):
+                # Tool errors are returned, not raised
+                tool_span.status = "error"
+        return result
 
     async def execute_batch(
         self,
@@ -127,7 +343,8 @@ class ToolExecutor:
             cancel_event: Optional event to check for cancellation.
             on_file_ready: Callback for file processing (called for each file).
             on_subagent_tool: Callback (parent_tool, sub_tool) for subagent progress.
-            on_thinking_chunk: Callback for extended_thinking thinking chunks.
+            on_thinking_chunk: Callback for thinking chunks of
+                extended_thinking and self_critique.
             model_id: User's current model ID (for extended_thinking).
 
         Returns:
@@ -144,8 +361,25 @@ class ToolExecutor:
             tool_names=tool_names,
         )
 
+        # Pick up work speculate() started while the model was streaming
+        now = time.monotonic()
+        speculations = {
+            t.tool_id: self._speculations.pop(t.tool_id)
+            for t in tools
+            if t.tool_id in self._speculations
+        }
+        speculation_saved = sum(s.overlap(now) for s in speculations.values())
+
         # Create indexed tasks for as_completed processing
         async def _indexed_task(idx: int, tool: ToolCall) -> tuple:
+            speculation = speculations.get(tool.tool_id)
+            if speculation is not None:
+                record_tool_speculation(tool.name, speculation.kind, "used")
+                if speculation.kind == "execute":
+                    return (idx, await speculation.task)
+                # Let the warm-up finish so execution hits its caches
+                await speculation.task
+
             # Create callback for self_critique subagent tool progress
             tool_callback = None
             if tool.name == "self_critique" and on_subagent_tool:
@@ -155,30 +389,18 @@ class ToolExecutor:
 
                 tool_callback = _subagent_callback
 
-            # Create callback for extended_thinking thinking chunks
+            # Thinking chunks of extended_thinking and the self_critique
+            # subagent are streamed to the user
             thinking_callback = None
-            if tool.name == "extended_thinking" and on_thinking_chunk:
+            if (tool.name in ("extended_thinking", "self_critique")
+                    and on_thinking_chunk):
                 thinking_callback = on_thinking_chunk
 
-            # Pass model_id for provider-aware tool resolution
-            extra_kwargs = {}
-            if model_id:
-                extra_kwargs["model_id"] = model_id
-
-            result = await execute_single_tool_safe(
-                tool_name=tool.name,
-                tool_input=tool.input,
-                bot=self._bot,
-                session=self._session,
-                thread_id=self._thread_id,
-                user_id=self._user_id,
-                chat_id=self._chat_id,
-                message_thread_id=self._message_thread_id,
-                on_subagent_tool=tool_callback,
-                on_thinking_chunk=thinking_callback,
-                cancel_event=cancel_event,
-                **extra_kwargs,
-            )
+            result = await self._run_tool(tool,
+                                          cancel_event=cancel_event,
+                                          on_subagent_tool=tool_callback,
+                                          on_thinking_chunk=thinking_callback,
+                                          model_id=model_id)
             return (idx, result)
 
         tasks = [_indexed_task(idx, tool) for idx, tool in enumerate(tools)]
@@ -300,12 +522,17 @@ class ToolExecutor:
                 force_turn_break=raw_result.get("_force_turn_break", False),
             )
 
+        if TOOL_SPECULATION_ENABLED:
+            record_tool_speculation_saved(speculation_saved)
+
         logger.info(
             "tool_executor.batch_complete",
             thread_id=self._thread_id,
             tool_count=len(tools),
             errors=sum(1 for r in results if r and r.is_error),
             force_turn_break=force_turn_break,
+            speculated=len(speculations),
+            speculation_saved_ms=round(speculation_saved * 1000),
         )
 
         return BatchExecutionResult(
@@ -313,4 +540,5 @@ class ToolExecutor:
             force_turn_break=force_turn_break,
             turn_break_tool=turn_break_tool,
             first_file_committed=first_file_committed,
+            speculation_saved=speculation_saved,
         )
@@ -3,6 +3,9 @@
 This module defines the core types used throughout the streaming system:
 - BlockType: Enum for content block types (thinking, text)
 - DisplayBlock: Dataclass for typed content blocks
+
+Dataclasses are slotted (created per block/tool call); ToolCall and
+FileDelivery are also frozen.
 """
 
 from dataclasses import dataclass
@@ -21,7 +24,7 @@ class BlockType(str, Enum):
     TEXT = "text"
 
 
-@dataclass
+@dataclass(slots=True)
 class DisplayBlock:
     """A typed content block for display.
 
@@ -39,7 +42,7 @@ class DisplayBlock:
             self.block_type = BlockType(self.block_type)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ToolCall:
     """Represents a pending tool call.
 
@@ -54,7 +57,7 @@ class ToolCall:
     input: dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FileDelivery:
     """File to be delivered to user.
 
@@ -83,7 +86,7 @@ class CancellationReason(str, Enum):
     ERROR = "error"
 
 
-@dataclass
+@dataclass(slots=True)
 class StreamResult:  # pylint: disable=too-many-instance-attributes
     """Result of streaming operation.
 
@@ -0,0 +1,190 @@
+"""Tests for content-addressed local blob store.
+
+Tests storage, deduplication, LRU eviction, index rebuild and pointer
+resolution.
+"""
+
+import hashlib
+import os
+from unittest.mock import patch
+
+from cache.blob_store import BlobStore
+from cache.blob_store import parse_blob_pointer
+from cache.blob_store import resolve_blob
+import pytest
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Blob store with a 100-byte budget."""
+    return BlobStore(root=str(tmp_path), max_bytes=100)
+
+
+class TestBlobStore:
+    """Tests for BlobStore."""
+
+    @pytest.mark.asyncio
+    async def test_put_get(self, store):
+        """Stored content is returned by digest."""
+        digest = await store.put(b"hello")
+
+        assert digest == hashlib.sha256(b"hello").hexdigest()
+        assert await store.get(digest) == b"hello"
+        assert store.contains(digest)
+
+    @pytest.mark.asyncio
+    async def test_open_view(self, store):
+        """View is a read-only memoryview over the blob."""
+        digest = await store.put(b"abc" * 10)
+
+        view = await store.open_view(digest)
+
+        assert isinstance(view, memoryview)
+        assert view.readonly
+        assert view.tobytes() == b"abc" * 10
+
+    @pytest.mark.asyncio
+    async def test_empty_blob(self, store):
+        """Empty content can be stored and mapped."""
+        digest = await store.put(b"")
+
+        assert await store.get(digest) == b""
+
+    @pytest.mark.asyncio
+    async def test_missing_blob(self, store):
+        """Unknown digest returns None."""
+        assert await store.get("0" * 64) is None
+        assert await store.open_view("0" * 64) is None
+
+    @pytest.mark.asyncio
+    async def test_dedup(self, store):
+        """Identical content is stored once."""
+        first = await store.put(b"same")
+        second = await store.put(bytearray(b"same"))
+
+        assert first == second
+        assert store.total_bytes == 4
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self, store):
+        """Least recently used blobs are evicted over budget."""
+        a = await store.put(b"a" * 40)
+        b = await store.put(b"b" * 40)
+        await store.get(a)  # a is now most recently used
+        c = await store.put(b"c" * 40)
+
+        assert store.contains(a)
+        assert not store.contains(b)
+        assert store.contains(c)
+        assert store.total_bytes == 80
+
+    @pytest.mark.asyncio
+    async def test_oversized_blob_kept(self, store):
+        """A single blob over budget evicts others but is itself kept."""
+        small = await store.put(b"s" * 10)
+        big = await store.put(b"x" * 150)
+
+        assert not store.contains(small)
+        assert await store.get(big) == b"x" * 150
+
+    @pytest.mark.asyncio
+    async def test_view_survives_eviction(self, store):
+        """Mapped view stays readable after its file is evicted."""
+        a = await store.put(b"a" * 60)
+        view = await store.open_view(a)
+        await store.put(b"b" * 60)
+
+        assert not store.contains(a)
+        assert view.tobytes() == b"a" * 60
+
+    @pytest.mark.asyncio
+    async def test_index_rebuilt_from_disk(self, tmp_path):
+        """New instance picks up existing blobs and removes temp files."""
+        first = BlobStore(root=str(tmp_path), max_bytes=100)
+        digest = await first.put(b"persisted")
+        stray = os.path.join(tmp_path, digest[:2], digest + ".ab12cd34.tmp")
+        with open(stray, "wb") as f:
+            f.write(b"partial")
+
+        second = BlobStore(root=str(tmp_path), max_bytes=100)
+        await second.put(b"other")
+
+        assert second.total_bytes == len(b"persisted") + len(b"other")
+        assert await second.get(digest) == b"persisted"
+        assert not os.path.exists(stray)
+
+
+class TestBlobWriter:
+    """Tests for streaming writes (BlobStore.open_writer)."""
+
+    @pytest.mark.asyncio
+    async def test_streamed_write(self, store, tmp_path):
+        """Chunks are committed as one blob under their digest."""
+        writer = store.open_writer()
+        await writer.write(b"hello ")
+        await writer.write(memoryview(b"world"))
+        digest = await writer.commit()
+
+        assert digest == hashlib.sha256(b"hello world").hexdigest()
+        assert writer.size == 11
+        assert await store.get(digest) == b"hello world"
+        assert store.total_bytes == 11
+        assert os.listdir(tmp_path / "tmp") == []
+
+    @pytest.mark.asyncio
+    async def test_streamed_write_dedup(self, store, tmp_path):
+        """Writing existing content keeps one copy."""
+        digest = await store.put(b"same")
+        writer = store.open_writer()
+        await writer.write(b"same")
+
+        assert await writer.commit() == digest
+        assert store.total_bytes == 4
+        assert os.listdir(tmp_path / "tmp") == []
+
+    @pytest.mark.asyncio
+    async def test_abort_removes_temp_file(self, store, tmp_path):
+        """Aborted writes leave nothing behind."""
+        writer = store.open_writer()
+        await writer.write(b"partial")
+        await writer.abort()
+
+        assert os.listdir(tmp_path / "tmp") == []
+        assert store.total_bytes == 0
+
+
+class TestBlobPointers:
+    """Tests for pointer parsing and resolution."""
+
+    def test_parse_pointer(self):
+        """64-char hex value is a pointer."""
+        digest = hashlib.sha256(b"x").hexdigest()
+
+        assert parse_blob_pointer(digest.encode()) == digest
+
+    @pytest.mark.parametrize("value", [
+        b"raw file bytes",
+        b"\x89PNG" + b"\x00" * 60,
+        b"A" * 64,
+        b"",
+    ])
+    def test_parse_legacy_value(self, value):
+        """Anything else is legacy inline content."""
+        assert parse_blob_pointer(value) is None
+
+    @pytest.mark.asyncio
+    async def test_resolve_legacy(self):
+        """Legacy inline bytes are returned as-is."""
+        assert await resolve_blob(b"inline content") == b"inline content"
+
+    @pytest.mark.asyncio
+    async def test_resolve_pointer(self, store):
+        """Pointer resolves to blob content."""
+        digest = await store.put(b"blob content")
+
+        with patch("cache.blob_store.get_blob_store", return_value=store):
+            data = await resolve_blob(digest.encode())
+            view = await resolve_blob(digest.encode(), as_view=True)
+
+        assert data == b"blob content"
+        assert bytes(view) == b"blob content"
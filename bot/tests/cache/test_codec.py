@@ -0,0 +1,82 @@
+"""Tests for cache payload codec.
+
+Tests envelope round trips, legacy JSON compatibility and error handling.
+"""
+
+import json
+
+from cache.codec import CodecError
+from cache.codec import decode
+from cache.codec import dumps
+from cache.codec import encode
+import pytest
+
+
+class TestCodec:
+    """Tests for encode/decode."""
+
+    def test_round_trip(self):
+        """Encoded values decode to the same value."""
+        value = {
+            "messages": [{
+                "role": "user",
+                "text_content": "Привет 👋",
+                "tokens": 12,
+                "thinking_blocks": None,
+            }],
+            "cached_at": 1700000000.5,
+        }
+
+        data = encode(value)
+
+        assert data[:1] == b"\x01"
+        assert decode(data) == value
+
+    def test_non_str_keys_coerced(self):
+        """Int keys become strings, as with json.dumps."""
+        assert decode(encode({1: "a"})) == {"1": "a"}
+
+    @pytest.mark.parametrize("value", [
+        {"balance": "10.5000"},
+        [1, 2, 3],
+        "text",
+        42,
+    ])
+    def test_legacy_json_readable(self, value):
+        """Values written by json.dumps before the codec still decode."""
+        assert decode(json.dumps(value).encode("utf-8")) == value
+
+    def test_legacy_str_and_whitespace(self):
+        """Str input and leading whitespace are legacy JSON too."""
+        assert decode(' {"a": 1}') == {"a": 1}
+        assert decode(b'\n[1]') == [1]
+
+    def test_legacy_nan(self):
+        """Legacy NaN (rejected by orjson) falls back to json.loads."""
+        assert decode(b'{"x": NaN}')["x"] != 0
+
+    def test_memoryview_input(self):
+        """Zero-copy input types are accepted."""
+        assert decode(memoryview(encode([1]))) == [1]
+        assert decode(bytearray(encode([2]))) == [2]
+
+    def test_unknown_version(self):
+        """Future envelope versions are rejected, not misparsed."""
+        with pytest.raises(CodecError):
+            decode(b"\x02{}")
+
+    def test_invalid_payload(self):
+        """Garbage raises a ValueError like json.loads did."""
+        with pytest.raises(ValueError):
+            decode(b"{not json")
+        with pytest.raises(ValueError):
+            decode(b"")
+
+    def test_dumps_plain_json(self):
+        """dumps() has no envelope (Lua script arguments)."""
+        assert json.loads(dumps({"a": 1})) == {"a": 1}
+
+    def test_encode_rejects_unserializable(self):
+        """Non-JSON values raise TypeError like json.dumps."""
+        with pytest.raises(TypeError):
+            encode({"when": object()})
@@ -3,15 +3,18 @@
 Tests temporary file storage for execute_python tool output.
 """
 
+import hashlib
 import json
 from unittest.mock import AsyncMock
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
+from cache.blob_store import BlobStore
 from cache.exec_cache import _generate_preview
 from cache.exec_cache import delete_exec_file
 from cache.exec_cache import generate_temp_id
 from cache.exec_cache import get_exec_file
+from cache.exec_cache import get_exec_file_view
 from cache.exec_cache import get_exec_meta
 from cache.exec_cache import get_pending_files_for_thread
 from cache.exec_cache import store_exec_file
@@ -22,6 +25,15 @@ from cache.keys import exec_meta_key
 import pytest
 
 
+@pytest.fixture(autouse=True)
+def blob_store(tmp_path):
+    """Blob store in a temp directory."""
+    store = BlobStore(root=str(tmp_path), max_bytes=256 * 1024 * 1024)
+    with patch("cache.blob_store.get_blob_store", return_value=store), \
+            patch("cache.exec_cache.get_blob_store", return_value=store):
+        yield store
+
+
 class TestGenerateTempId:
     """Tests for temp ID generation."""
 
@@ -212,11 +224,12 @@ class TestStoreExecFile:
         assert result["execution_id"] == "abc123"
 
     @pytest.mark.asyncio
-    async def test_store_exec_file_bytearray(self, mock_redis):
+    async def test_store_exec_file_bytearray(self, mock_redis, blob_store):
         """Test storage works with bytearray content (E2B sandbox returns this).
 
         Regression test for: Redis DataError with bytearray type.
-        E2B sandbox returns bytearray, but Redis only accepts bytes.
+        E2B sandbox returns bytearray; content goes to the blob store and
+        Redis only receives the pointer.
         """
         bytearray_content = bytearray(b"content from E2B sandbox")
 
@@ -232,12 +245,12 @@ class TestStoreExecFile:
         assert result["filename"] == "sandbox_output.png"
         assert result["size_bytes"] == len(bytearray_content)
 
-        # Verify pipeline was called with bytes, not bytearray
+        # Redis receives the blob pointer, blob holds the content
         pipe = mock_redis.pipeline.return_value
         file_call = pipe.setex.call_args_list[0]
-        stored_content = file_call[0][2]
-        assert isinstance(stored_content,
-                          bytes), "Redis should receive bytes, not bytearray"
+        digest = file_call[0][2]
+        assert digest == hashlib.sha256(bytearray_content).hexdigest()
+        assert await blob_store.get(digest) == bytes(bytearray_content)
 
     @pytest.mark.asyncio
     async def test_store_exec_file_too_large(self):
@@ -349,6 +362,22 @@ class TestGetExecFile:
 
         assert result is None
 
+    @pytest.mark.asyncio
+    async def test_get_exec_file_pointer(self, mock_redis, sample_temp_id,
+                                         sample_content, blob_store):
+        """Test blob pointer is resolved through the blob store."""
+        digest = await blob_store.put(sample_content)
+        mock_redis.get.return_value = digest.encode()
+
+        with patch("cache.exec_cache.get_redis", return_value=mock_redis):
+            result = await get_exec_file(sample_temp_id)
+            view = await get_exec_file_view(sample_temp_id)
+
+        assert result == sample_content
+        assert isinstance(result, bytes)
+        assert isinstance(view, memoryview)
+        assert view.tobytes() == sample_content
+
 
 class TestGetExecMeta:
     """Tests for retrieving execution file metadata."""
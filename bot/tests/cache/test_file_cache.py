@@ -3,11 +3,15 @@
 Tests binary file caching functionality.
 """
 
+import hashlib
+import os
 from unittest.mock import AsyncMock
 from unittest.mock import patch
 
+from cache.blob_store import BlobStore
 from cache.file_cache import cache_file
 from cache.file_cache import get_cached_file
+from cache.file_cache import get_cached_file_view
 from cache.file_cache import invalidate_file
 from cache.keys import file_bytes_key
 from cache.keys import FILE_BYTES_MAX_SIZE
@@ -15,6 +19,15 @@ from cache.keys import FILE_BYTES_TTL
 import pytest
 
 
+@pytest.fixture(autouse=True)
+def blob_store(tmp_path):
+    """Blob store in a temp directory."""
+    store = BlobStore(root=str(tmp_path), max_bytes=64 * 1024 * 1024)
+    with patch("cache.blob_store.get_blob_store", return_value=store), \
+            patch("cache.file_cache.get_blob_store", return_value=store):
+        yield store
+
+
 class TestFileCache:
     """Tests for file cache functions."""
 
@@ -79,10 +92,11 @@ class TestFileCache:
                                       filename="test.ogg")
 
         assert result is True
+        digest = hashlib.sha256(sample_content).hexdigest()
         mock_redis.setex.assert_called_once_with(
             file_bytes_key(sample_file_id),
             FILE_BYTES_TTL,
-            sample_content,
+            digest,
         )
 
     @pytest.mark.asyncio
@@ -167,3 +181,58 @@ class TestFileCacheKeys:
 
         assert key == f"file:bytes:{file_id}"
         assert key.startswith("file:bytes:")
+
+
+class TestFileCacheBlobPointers:
+    """Tests for Redis pointer + blob store round-trip."""
+
+    @pytest.fixture
+    def mock_redis(self):
+        """Mock Redis storing setex values in a dict."""
+        values = {}
+        redis = AsyncMock()
+
+        async def _setex(key, _ttl, value):
+            values[key] = value.encode() if isinstance(value, str) else value
+
+        redis.setex.side_effect = _setex
+        redis.get.side_effect = values.get
+        return redis
+
+    @pytest.mark.asyncio
+    async def test_round_trip(self, mock_redis, blob_store):
+        """Cached content is read back through the pointer."""
+        content = b"voice message bytes" * 100
+
+        with patch("cache.file_cache.get_redis", return_value=mock_redis):
+            assert await cache_file("file_1", content) is True
+            result = await get_cached_file("file_1")
+
+        assert result == content
+        assert isinstance(result, bytes)
+        assert blob_store.total_bytes == len(content)
+
+    @pytest.mark.asyncio
+    async def test_view_is_memoryview(self, mock_redis):
+        """View accessor returns a mapped memoryview."""
+        content = b"%PDF-1.4 " + b"x" * 4096
+
+        with patch("cache.file_cache.get_redis", return_value=mock_redis):
+            await cache_file("file_2", content)
+            view = await get_cached_file_view("file_2")
+
+        assert isinstance(view, memoryview)
+        assert view.tobytes() == content
+
+    @pytest.mark.asyncio
+    async def test_evicted_blob_is_miss(self, mock_redis, blob_store):
+        """Pointer to an evicted blob is a cache miss."""
+        content = b"soon gone"
+
+        with patch("cache.file_cache.get_redis", return_value=mock_redis):
+            await cache_file("file_3", content)
+            digest = hashlib.sha256(content).hexdigest()
+            os.unlink(blob_store._path(digest))
+            result = await get_cached_file("file_3")
+
+        assert result is None
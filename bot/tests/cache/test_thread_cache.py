@@ -3,6 +3,7 @@
 Tests cache-aside pattern for thread and message data caching.
 """
 
+import json
 from unittest.mock import AsyncMock
 from unittest.mock import patch
 
@@ -10,6 +11,7 @@ from cache.keys import messages_key
 from cache.keys import MESSAGES_TTL
 from cache.keys import thread_key
 from cache.keys import THREAD_TTL
+from cache.thread_cache import append_messages_atomic
 from cache.thread_cache import cache_messages
 from cache.thread_cache import cache_thread
 from cache.thread_cache import get_cached_messages
@@ -265,6 +267,40 @@ class TestMessagesCache:
 
         assert result is False
 
+    @pytest.mark.asyncio
+    async def test_append_messages_atomic_single_eval(self, mock_redis):
+        """Test whole batch is appended with one EVAL."""
+        mock_redis.eval.return_value = 1
+        batch = [{"message_id": 1}, {"message_id": 2}]
+
+        with patch("cache.thread_cache.get_redis", return_value=mock_redis):
+            result = await append_messages_atomic(1, batch)
+
+        assert result is True
+        mock_redis.eval.assert_called_once()
+        args = mock_redis.eval.call_args[0]
+        assert args[2] == messages_key(1)
+        assert json.loads(args[3]) == batch
+
+    @pytest.mark.asyncio
+    async def test_append_messages_atomic_miss(self, mock_redis):
+        """Test cache miss returns False."""
+        mock_redis.eval.return_value = 0
+
+        with patch("cache.thread_cache.get_redis", return_value=mock_redis):
+            result = await append_messages_atomic(1, [{"message_id": 1}])
+
+        assert result is False
+
+    @pytest.mark.asyncio
+    async def test_append_messages_atomic_empty(self, mock_redis):
+        """Test empty batch is a no-op."""
+        with patch("cache.thread_cache.get_redis", return_value=mock_redis):
+            result = await append_messages_atomic(1, [])
+
+        assert result is True
+        mock_redis.eval.assert_not_called()
+
 
 class TestCacheKeys:
     """Tests for cache key generation."""
@@ -8,8 +8,11 @@ import json
 from unittest.mock import AsyncMock
 from unittest.mock import patch
 
+from cache.codec import decode
 from cache.keys import user_key
+from cache.keys import user_reservations_key
 from cache.keys import USER_TTL
+from cache.user_cache import adjust_cached_balance
 from cache.user_cache import cache_user
 from cache.user_cache import get_balance_from_cached
 from cache.user_cache import get_cached_user
@@ -84,6 +87,7 @@ class TestUserCache:
         model_id = "claude:sonnet"
         first_name = "Test"
         username = "testuser"
+        mock_redis.eval.return_value = [0, b""]
 
         with patch("cache.user_cache.get_redis",
                    return_value=mock_redis) as mock_get_redis:
@@ -96,15 +100,34 @@ class TestUserCache:
             )
 
         assert result is True
-        mock_redis.setex.assert_called_once()
-        call_args = mock_redis.setex.call_args
-        assert call_args[0][0] == user_key(user_id)
-        assert call_args[0][1] == USER_TTL
+        mock_redis.eval.assert_called_once()
+        call_args = mock_redis.eval.call_args
+        assert call_args[0][2] == user_key(user_id)
+        assert call_args[0][4] == str(USER_TTL)
         # Verify JSON contains expected fields
-        import json
-        cached_json = json.loads(call_args[0][2])
+        cached_json = decode(call_args[0][3])
         assert cached_json["balance"] == "10.5000"
         assert cached_json["model_id"] == "claude:sonnet"
+        assert json.loads(call_args[0][5]) == cached_json
+
+    @pytest.mark.asyncio
+    async def test_cache_user_keeps_cached_balance(self, mock_redis):
+        """Reloading a cached user never writes the Postgres balance."""
+        from cache.user_cache import _CACHE_USER_LUA
+
+        mock_redis.eval.return_value = [1, b"9.2500"]
+
+        with patch("cache.user_cache.get_redis", return_value=mock_redis):
+            result = await cache_user(
+                user_id=123456,
+                balance=Decimal("10.0000"),
+                model_id="claude:sonnet",
+                first_name="Test",
+            )
+
+        assert result is True
+        mock_redis.setex.assert_not_called()
+        assert mock_redis.eval.call_args[0][0] == _CACHE_USER_LUA
 
     @pytest.mark.asyncio
     async def test_cache_user_redis_unavailable(self):
@@ -194,8 +217,8 @@ class TestGetBalanceFromCached:
         assert result == Decimal("-5.0000")
 
 
-class TestUpdateCachedBalance:
-    """Tests for update_cached_balance function (atomic Lua script)."""
+class TestAdjustCachedBalance:
+    """Tests for adjust_cached_balance function (atomic Lua script)."""
 
     @pytest.fixture
     def mock_redis(self):
@@ -203,19 +226,15 @@ class TestUpdateCachedBalance:
         return AsyncMock()
 
     @pytest.mark.asyncio
-    async def test_update_cached_balance_success(self, mock_redis):
-        """Test successful balance update via Lua script."""
+    async def test_adjust_cached_balance_success(self, mock_redis):
+        """Test balance change is sent as a delta, not a new balance."""
         user_id = 123456
-        new_balance = Decimal("15.5000")
 
-        # Lua script returns [1, old_balance] on success
-        mock_redis.eval.return_value = [1, b"10.0000"]
+        # Lua script returns [1, old_balance, new_balance] on success
+        mock_redis.eval.return_value = [1, b"10.0000", b"9.9500"]
 
-        from cache.user_cache import update_cached_balance
-
-        with patch("cache.user_cache.get_redis",
-                   return_value=mock_redis) as mock_get_redis:
-            result = await update_cached_balance(user_id, new_balance)
+        with patch("cache.user_cache.get_redis", return_value=mock_redis):
+            result = await adjust_cached_balance(user_id, Decimal("-0.05"))
 
         assert result is True
         mock_redis.eval.assert_called_once()
@@ -224,51 +243,34 @@ class TestUpdateCachedBalance:
         call_args = mock_redis.eval.call_args
         assert call_args[0][1] == 1  # number of keys
         assert call_args[0][2] == user_key(user_id)  # KEYS[1]
-        assert call_args[0][3] == "15.5000"  # ARGV[1] new_balance
+        assert call_args[0][3] == "-0.05"  # ARGV[1] delta
 
     @pytest.mark.asyncio
-    async def test_update_cached_balance_not_cached(self, mock_redis):
-        """Test update when user is not in cache."""
-        user_id = 123456
-        new_balance = Decimal("15.5000")
-
-        # Lua script returns [0, ''] when key not found
-        mock_redis.eval.return_value = [0, b""]
+    async def test_adjust_cached_balance_not_cached(self, mock_redis):
+        """Test adjustment when user is not in cache."""
+        # Lua script returns [0, '', ''] when key not found
+        mock_redis.eval.return_value = [0, b"", b""]
 
-        from cache.user_cache import update_cached_balance
-
-        with patch("cache.user_cache.get_redis",
-                   return_value=mock_redis) as mock_get_redis:
-            result = await update_cached_balance(user_id, new_balance)
+        with patch("cache.user_cache.get_redis", return_value=mock_redis):
+            result = await adjust_cached_balance(123456, Decimal("5.0"))
 
         assert result is False
 
     @pytest.mark.asyncio
-    async def test_update_cached_balance_redis_unavailable(self):
+    async def test_adjust_cached_balance_redis_unavailable(self):
         """Test returns False when Redis is unavailable."""
-        user_id = 123456
-        new_balance = Decimal("15.5000")
-
-        from cache.user_cache import update_cached_balance
-
-        with patch("cache.user_cache.get_redis",
-                   return_value=None) as mock_get_redis:
-            result = await update_cached_balance(user_id, new_balance)
+        with patch("cache.user_cache.get_redis", return_value=None):
+            result = await adjust_cached_balance(123456, Decimal("5.0"))
 
         assert result is False
 
     @pytest.mark.asyncio
-    async def test_update_cached_balance_eval_error(self, mock_redis):
+    async def test_adjust_cached_balance_eval_error(self, mock_redis):
         """Test graceful handling of Lua script errors."""
-        user_id = 123456
-        new_balance = Decimal("15.5000")
-
         mock_redis.eval.side_effect = Exception("NOSCRIPT")
 
-        from cache.user_cache import update_cached_balance
-
         with patch("cache.user_cache.get_redis", return_value=mock_redis):
-            result = await update_cached_balance(user_id, new_balance)
+            result = await adjust_cached_balance(123456, Decimal("5.0"))
 
         assert result is False
 
@@ -298,8 +300,8 @@ class TestCustomPromptCaching:
             )
 
         assert result is True
-        call_args = mock_redis.setex.call_args
-        cached_json = json.loads(call_args[0][2])
+        call_args = mock_redis.eval.call_args
+        cached_json = decode(call_args[0][3])
         assert cached_json["custom_prompt"] == custom_prompt
 
     @pytest.mark.asyncio
@@ -316,8 +318,8 @@ class TestCustomPromptCaching:
             )
 
         assert result is True
-        call_args = mock_redis.setex.call_args
-        cached_json = json.loads(call_args[0][2])
+        call_args = mock_redis.eval.call_args
+        cached_json = decode(call_args[0][3])
         assert cached_json["custom_prompt"] is None
 
     @pytest.mark.asyncio
@@ -350,13 +352,11 @@ class TestCustomPromptCaching:
         """
         user_id = 123456
 
-        # Lua script returns [1, old_balance] on success
-        mock_redis.eval.return_value = [1, b"10.0000"]
-
-        from cache.user_cache import update_cached_balance
+        # Lua script returns [1, old_balance, new_balance] on success
+        mock_redis.eval.return_value = [1, b"10.0000", b"15.0000"]
 
         with patch("cache.user_cache.get_redis", return_value=mock_redis):
-            result = await update_cached_balance(user_id, Decimal("5.0"))
+            result = await adjust_cached_balance(user_id, Decimal("5.0"))
 
         assert result is True
         # Lua script handles field preservation atomically
@@ -388,8 +388,8 @@ class TestLanguageCodeCaching:
             )
 
         assert result is True
-        call_args = mock_redis.setex.call_args
-        cached_json = json.loads(call_args[0][2])
+        call_args = mock_redis.eval.call_args
+        cached_json = decode(call_args[0][3])
         assert cached_json["language_code"] == language_code
 
     @pytest.mark.asyncio
@@ -406,8 +406,8 @@ class TestLanguageCodeCaching:
             )
 
         assert result is True
-        call_args = mock_redis.setex.call_args
-        cached_json = json.loads(call_args[0][2])
+        call_args = mock_redis.eval.call_args
+        cached_json = decode(call_args[0][3])
         assert cached_json["language_code"] is None
 
     @pytest.mark.asyncio
@@ -440,13 +440,99 @@ class TestLanguageCodeCaching:
         """
         user_id = 123456
 
-        # Lua script returns [1, old_balance] on success
-        mock_redis.eval.return_value = [1, b"10.0000"]
-
-        from cache.user_cache import update_cached_balance
+        # Lua script returns [1, old_balance, new_balance] on success
+        mock_redis.eval.return_value = [1, b"10.0000", b"15.0000"]
 
         with patch("cache.user_cache.get_redis", return_value=mock_redis):
-            result = await update_cached_balance(user_id, Decimal("5.0"))
+            result = await adjust_cached_balance(user_id, Decimal("5.0"))
 
         assert result is True
         mock_redis.eval.assert_called_once()
+
+
+class TestBalanceReservations:
+    """Tests for reserve_balance / settle_reservation / release."""
+
+    @pytest.fixture
+    def mock_redis(self):
+        """Create mock Redis client."""
+        return AsyncMock()
+
+    @pytest.mark.asyncio
+    async def test_reserve_held(self, mock_redis):
+        """Held reservation returns available balance after it."""
+        mock_redis.eval.return_value = [1, b"0.4000"]
+
+        from cache.user_cache import reserve_balance
+
+        with patch("cache.user_cache.get_redis", return_value=mock_redis):
+            result = await reserve_balance(123, "r1", Decimal("0.1"),
+                                           Decimal("0"))
+
+        assert result == (True, Decimal("0.4000"))
+        args = mock_redis.eval.call_args.args
+        assert args[1] == 2
+        assert args[2] == user_key(123)
+        assert args[3] == user_reservations_key(123)
+        assert args[4:7] == ("r1", "0.1", "0")
+
+    @pytest.mark.asyncio
+    async def test_reserve_refused(self, mock_redis):
+        """Refused reservation reports what is left."""
+        mock_redis.eval.return_value = [0, b"-0.2000"]
+
+        from cache.user_cache import reserve_balance
+
+        with patch("cache.user_cache.get_redis", return_value=mock_redis):
+            result = await reserve_balance(123, "r1", Decimal("0.1"),
+                                           Decimal("0"))
+
+        assert result == (False, Decimal("-0.2000"))
+
+    @pytest.mark.asyncio
+    async def test_reserve_not_cached(self, mock_redis):
+        """Uncached user: None (caller fails open)."""
+        mock_redis.eval.return_value = [-1, b""]
+
+        from cache.user_cache import reserve_balance
+
+        with patch("cache.user_cache.get_redis", return_value=mock_redis):
+            result = await reserve_balance(123, "r1", Decimal("0.1"),
+                                           Decimal("0"))
+
+        assert result is None
+
+    @pytest.mark.asyncio
+    async def test_settle(self, mock_redis):
+        """Settle returns balance before and after the deduction."""
+        mock_redis.eval.return_value = [1, b"0.5000", b"0.3750"]
+
+        from cache.user_cache import settle_reservation
+
+        with patch("cache.user_cache.get_redis", return_value=mock_redis):
+            result = await settle_reservation(123, "r1", Decimal("0.125"))
+
+        assert result == (Decimal("0.5000"), Decimal("0.3750"))
+
+    @pytest.mark.asyncio
+    async def test_settle_redis_unavailable(self):
+        """No Redis: None (caller charges the database)."""
+        from cache.user_cache import settle_reservation
+
+        with patch("cache.user_cache.get_redis", return_value=None):
+            result = await settle_reservation(123, "r1", Decimal("0.125"))
+
+        assert result is None
+
+    @pytest.mark.asyncio
+    async def test_release(self, mock_redis):
+        """Release removes the hash field."""
+        mock_redis.hdel.return_value = 1
+
+        from cache.user_cache import release_reservation
+
+        with patch("cache.user_cache.get_redis", return_value=mock_redis):
+            assert await release_reservation(123, "r1") is True
+
+        mock_redis.hdel.assert_called_once_with(user_reservations_key(123),
+                                                "r1")
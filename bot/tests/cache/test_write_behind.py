@@ -11,6 +11,7 @@ from unittest.mock import AsyncMock
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
+from cache.codec import decode
 from cache.write_behind import _auto_replay_dlq
 from cache.write_behind import DLQ_MAX_AGE
 from cache.write_behind import flush_writes
@@ -78,7 +79,7 @@ class TestQueueWrite:
                 },
             )
 
-        payload = json.loads(captured_payload)
+        payload = decode(captured_payload)
         assert payload["type"] == "user_stats"
         assert payload["data"]["user_id"] == 123
         assert "queued_at" in payload
@@ -227,6 +228,99 @@ class TestFlushWrites:
         mock_session.execute.assert_called_once()
         mock_session.commit.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_flush_feeds_metrics_tracker(self):
+        """Committed user messages and stats update the aggregate tracker."""
+        now = int(datetime.now(timezone.utc).timestamp())
+        payloads = [
+            json.dumps({
+                "type": "message",
+                "data": {
+                    "chat_id": 123,
+                    "message_id": 457,
+                    "thread_id": 1,
+                    "from_user_id": 42,
+                    "date": now,
+                    "role": "user",
+                    "text_content": "Hi",
+                },
+            }).encode(),
+            json.dumps({
+                "type": "user_stats",
+                "data": {
+                    "user_id": 42,
+                    "messages": 1,
+                    "tokens": 150,
+                },
+            }).encode(),
+        ]
+
+        async def mock_lpop(key):
+            return payloads.pop(0) if payloads else None
+
+        mock_redis = AsyncMock()
+        mock_redis.lpop = mock_lpop
+        mock_redis.llen = AsyncMock(return_value=0)
+        mock_result = MagicMock()
+        mock_result.rowcount = 1
+        mock_session = MagicMock()
+        mock_session.execute = AsyncMock(return_value=mock_result)
+        mock_session.commit = AsyncMock()
+
+        user = MagicMock(username="alice", message_count=11,
+                         total_tokens_used=5150)
+        user_repo = MagicMock()
+        user_repo.increment_stats = AsyncMock(return_value=user)
+        tracker = MagicMock()
+
+        with patch("cache.write_behind.get_redis", return_value=mock_redis), \
+                patch("db.repositories.user_repository.UserRepository",
+                      return_value=user_repo), \
+                patch("services.metrics_collector.get_aggregate_tracker",
+                      return_value=tracker):
+            result = await flush_writes(mock_session)
+
+        assert result == 2
+        tracker.user_active.assert_called_once_with(42, float(now))
+        tracker.user_stats.assert_called_once_with(42, "alice", 11, 5150)
+
+
+class TestBalanceCharges:
+    """Tests for BALANCE_CHARGE reconciliation."""
+
+    @pytest.mark.asyncio
+    async def test_charge_deducts_and_records_operation(self):
+        """Settled charge: relative UPDATE plus USAGE audit row."""
+        payload = json.dumps({
+            "type": "balance_charge",
+            "data": {
+                "user_id": 123,
+                "amount": "0.25",
+                "related_message_id": 7,
+                "description": "Claude API",
+            },
+        }).encode()
+        mock_redis = AsyncMock()
+        mock_redis.lpop = AsyncMock(side_effect=[payload, None])
+        mock_redis.llen = AsyncMock(return_value=0)
+        mock_result = MagicMock()
+        mock_result.scalar_one.return_value = Decimal("4.7500")
+        mock_session = MagicMock()
+        mock_session.execute = AsyncMock(return_value=mock_result)
+        mock_session.commit = AsyncMock()
+
+        with patch("cache.write_behind.get_redis", return_value=mock_redis):
+            result = await flush_writes(mock_session)
+
+        assert result == 1
+        statement = str(mock_session.execute.call_args.args[0])
+        assert "UPDATE users SET balance=(users.balance -" in statement
+        operation = mock_session.add.call_args.args[0]
+        assert operation.amount == Decimal("-0.25")
+        assert operation.balance_before == Decimal("5.0000")
+        assert operation.balance_after == Decimal("4.7500")
+        mock_session.commit.assert_called_once()
+
 
 class TestAutoReplayDlq:
     """Tests for _auto_replay_dlq function."""
@@ -257,7 +351,7 @@ class TestAutoReplayDlq:
 
         mock_redis.rpush.assert_called_once()
         # Verify retry_count was stripped
-        replayed = json.loads(mock_redis.rpush.call_args[0][1])
+        replayed = decode(mock_redis.rpush.call_args[0][1])
         assert "retry_count" not in replayed
         assert "retry_after" not in replayed
 
@@ -317,4 +411,5 @@ class TestWriteTypes:
         assert WriteType.MESSAGE.value == "message"
         assert WriteType.USER_STATS.value == "user_stats"
         assert WriteType.BALANCE_OP.value == "balance_op"
+        assert WriteType.BALANCE_CHARGE.value == "balance_charge"
         assert WriteType.FILE.value == "file"
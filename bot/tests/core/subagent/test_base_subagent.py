@@ -11,6 +11,43 @@ from core.subagent.base import SubagentResult
 import pytest
 
 
+def _final_message(input_tokens: int = 10,
+                   cache_read: int = 0,
+                   cache_creation: int = 0) -> Mock:
+    """Final Anthropic message of a finished end_turn call."""
+    message = Mock(stop_reason="end_turn", content=[])
+    message.usage = Mock(input_tokens=input_tokens,
+                         output_tokens=100,
+                         cache_read_input_tokens=cache_read,
+                         cache_creation_input_tokens=cache_creation,
+                         thinking_tokens=0,
+                         server_tool_use=None)
+    return message
+
+
+def _stream_client(final_message: Mock, thinking: tuple = ()) -> Mock:
+    """Anthropic client streaming thinking deltas, then final_message."""
+    events = []
+    for chunk in thinking:
+        delta = Mock(thinking=chunk)
+        events.append(Mock(type="content_block_delta", delta=delta))
+
+    stream = AsyncMock()
+    stream.__aenter__ = AsyncMock(return_value=stream)
+    stream.__aexit__ = AsyncMock(return_value=False)
+
+    async def iterate():
+        for event in events:
+            yield event
+
+    stream.__aiter__ = lambda self: iterate()
+    stream.get_final_message = AsyncMock(return_value=final_message)
+
+    client = Mock()
+    client.messages.stream = Mock(return_value=stream)
+    return client
+
+
 class TestSubagentResult:
     """Tests for SubagentResult dataclass."""
 
@@ -191,11 +228,10 @@ class TestBaseSubagentRun:
     async def test_run_end_turn_returns_result(self, test_subagent_class):
         """Test that end_turn response returns parsed result."""
         config = SubagentConfig(
-            model_id="test",
+            model_id="claude-opus-4-6",
             system_prompt="Test",
             tools=[],
         )
-        client = AsyncMock()
 
         # Mock response with end_turn
         mock_response = Mock()
@@ -203,11 +239,14 @@ class TestBaseSubagentRun:
         mock_response.usage = Mock()
         mock_response.usage.input_tokens = 100
         mock_response.usage.output_tokens = 50
-        mock_response.usage.thinking_tokens = None
+        mock_response.usage.thinking_tokens = 0
+        mock_response.usage.cache_read_input_tokens = 0
+        mock_response.usage.cache_creation_input_tokens = 0
+        mock_response.usage.server_tool_use = None
         mock_response.content = [
             Mock(type="text", text='{"verdict": "PASS", "score": 95}')
         ]
-        client.messages.create = AsyncMock(return_value=mock_response)
+        client = _stream_client(mock_response)
 
         subagent = test_subagent_class(config,
                                        client,
@@ -216,7 +255,7 @@ class TestBaseSubagentRun:
                                        user_id=123)
 
         with patch("services.factory.ServiceFactory") as mock_factory_class, \
-             patch("core.subagent.base.calculate_claude_cost") as mock_calc:
+             patch("core.subagent.request.calculate_claude_cost") as mock_calc:
             mock_factory = Mock()
             mock_factory.balance.get_balance = AsyncMock(
                 return_value=Decimal("10.00"))
@@ -231,6 +270,153 @@ class TestBaseSubagentRun:
             assert result.iterations == 1
 
 
+class TestBaseSubagentStreaming:
+    """Tests for streamed, prompt-cached subagent API calls."""
+
+    @pytest.fixture
+    def subagent_class(self):
+        """Subagent with one echo tool."""
+
+        class TestSubagent(BaseSubagent):
+
+            async def _execute_tool(self, tool_name, tool_input, tool_use_id):
+                return {"result": "ok"}
+
+            def _parse_result(self, response_text):
+                return {"verdict": "PASS"}
+
+        return TestSubagent
+
+    @staticmethod
+    def _config() -> SubagentConfig:
+        return SubagentConfig(
+            model_id="claude-opus-4-6",
+            system_prompt="Review carefully.",
+            tools=[{
+                "name": "echo",
+                "input_schema": {
+                    "type": "object"
+                }
+            }],
+        )
+
+    @pytest.mark.asyncio
+    async def test_thinking_forwarded_to_callback(self, subagent_class):
+        """Thinking deltas reach on_thinking_chunk before the call ends."""
+        client = _stream_client(_final_message(), thinking=["Let me ", "check"])
+        chunks = []
+
+        async def on_thinking_chunk(chunk):
+            chunks.append(chunk)
+
+        subagent = subagent_class(self._config(),
+                                  client,
+                                  Mock(),
+                                  Mock(),
+                                  user_id=123,
+                                  on_thinking_chunk=on_thinking_chunk)
+
+        response = await subagent._call_api([{  # pylint: disable=protected-access
+            "role": "user",
+            "content": "test"
+        }])
+
+        assert chunks == ["Let me ", "check"]
+        assert response.stop_reason == "end_turn"
+
+    @pytest.mark.asyncio
+    async def test_failing_thinking_callback_ignored(self, subagent_class):
+        """A broken UI callback does not fail the subagent call."""
+        client = _stream_client(_final_message(), thinking=["x"])
+        subagent = subagent_class(
+            self._config(),
+            client,
+            Mock(),
+            Mock(),
+            user_id=123,
+            on_thinking_chunk=AsyncMock(side_effect=RuntimeError("edit")))
+
+        response = await subagent._call_api([{  # pylint: disable=protected-access
+            "role": "user",
+            "content": "test"
+        }])
+
+        assert response.stop_reason == "end_turn"
+
+    @pytest.mark.asyncio
+    async def test_cache_breakpoints(self, subagent_class):
+        """System block and newest message carry cache_control."""
+        client = _stream_client(_final_message())
+        subagent = subagent_class(self._config(),
+                                  client,
+                                  Mock(),
+                                  Mock(),
+                                  user_id=123)
+        messages = [
+            {
+                "role": "user",
+                "content": "test"
+            },
+            {
+                "role":
+                    "assistant",
+                "content": [{
+                    "type": "tool_use",
+                    "id": "t1",
+                    "name": "echo",
+                    "input": {}
+                }]
+            },
+            {
+                "role":
+                    "user",
+                "content": [{
+                    "type": "tool_result",
+                    "tool_use_id": "t1",
+                    "content": "ok"
+                }]
+            },
+        ]
+
+        await subagent._call_api(messages)  # pylint: disable=protected-access
+
+        params = client.messages.stream.call_args.kwargs
+        assert params["system"][0]["cache_control"] == {"type": "ephemeral"}
+        assert params["tools"] == self._config().tools
+        sent = params["messages"]
+        assert sent[2]["content"][-1]["cache_control"] == {"type": "ephemeral"}
+        assert "cache_control" not in sent[1]["content"][-1]
+        # Caller's history is not mutated
+        assert "cache_control" not in messages[2]["content"][-1]
+
+    def test_usage_tracks_cache_and_metrics(self, subagent_class):
+        """Cache reads/writes are billed and recorded per subagent."""
+        subagent = subagent_class(self._config(),
+                                  Mock(),
+                                  Mock(),
+                                  Mock(),
+                                  user_id=123)
+        response = _final_message(input_tokens=50,
+                                  cache_read=4000,
+                                  cache_creation=300)
+
+        with patch("core.subagent.request.record_subagent_cache_usage") as record:
+            subagent._track_api_usage(response)  # pylint: disable=protected-access
+
+        record.assert_called_once_with("testsubagent", 4000, 300, 50)
+        tracker = subagent.cost_tracker
+        assert tracker.total_cache_read_tokens == 4000
+        assert tracker.total_cache_creation_tokens == 300
+        # Cached reads cost less than the same tokens uncached
+        uncached = subagent_class(self._config(),
+                                  Mock(),
+                                  Mock(),
+                                  Mock(),
+                                  user_id=123).cost_tracker
+        uncached.add_api_usage(input_tokens=4350, output_tokens=100)
+        assert tracker.calculate_total_cost() < uncached.calculate_total_cost()
+
+
 class TestBaseSubagentAbstractMethods:
     """Tests for abstract method enforcement."""
 
@@ -113,16 +113,13 @@ class TestGetFileContentFromTelegram:
         mock_file_info.file_path = "photos/file_123.jpg"
         mock_bot.get_file = AsyncMock(return_value=mock_file_info)
 
-        mock_bytes_io = MagicMock()
-        mock_bytes_io.read.return_value = b"jpeg_image_bytes"
-        mock_bot.download_file = AsyncMock(return_value=mock_bytes_io)
-
         with patch("db.repositories.user_file_repository.UserFileRepository",
                    return_value=mock_repo), \
              patch("cache.file_cache.get_cached_file",
                    new_callable=AsyncMock, return_value=None), \
-             patch("cache.file_cache.cache_file",
-                   new_callable=AsyncMock):
+             patch("core.file_manager.download_to_cache",
+                   new_callable=AsyncMock,
+                   return_value=b"jpeg_image_bytes"):
 
             manager = FileManager(bot=mock_bot, session=AsyncMock())
             content, metadata = await manager.get_file_content("AgACAgIAAxkB..."
@@ -148,16 +145,13 @@ class TestGetFileContentFromTelegram:
         mock_file_info.file_path = "documents/file_456.pdf"
         mock_bot.get_file = AsyncMock(return_value=mock_file_info)
 
-        mock_bytes_io = MagicMock()
-        mock_bytes_io.read.return_value = b"pdf_content"
-        mock_bot.download_file = AsyncMock(return_value=mock_bytes_io)
-
         with patch("db.repositories.user_file_repository.UserFileRepository",
                    return_value=mock_repo), \
              patch("cache.file_cache.get_cached_file",
                    new_callable=AsyncMock, return_value=None), \
-             patch("cache.file_cache.cache_file",
-                   new_callable=AsyncMock):
+             patch("core.file_manager.download_to_cache",
+                   new_callable=AsyncMock,
+                   return_value=b"pdf_content"):
 
             manager = FileManager(bot=mock_bot, session=AsyncMock())
             content, metadata = await manager.get_file_content("BQACAgIAAxkD..."
@@ -303,16 +297,13 @@ class TestGetFileContentCaching:
         mock_file_info.file_path = "photos/file.jpg"
         mock_bot.get_file = AsyncMock(return_value=mock_file_info)
 
-        mock_bytes_io = MagicMock()
-        mock_bytes_io.read.return_value = b"fresh_content"
-        mock_bot.download_file = AsyncMock(return_value=mock_bytes_io)
-
         with patch("db.repositories.user_file_repository.UserFileRepository",
                    return_value=mock_repo), \
              patch("cache.file_cache.get_cached_file",
                    new_callable=AsyncMock) as mock_cache, \
-             patch("cache.file_cache.cache_file",
-                   new_callable=AsyncMock):
+             patch("core.file_manager.download_to_cache",
+                   new_callable=AsyncMock,
+                   return_value=b"fresh_content") as mock_download:
 
             manager = FileManager(bot=mock_bot, session=AsyncMock())
             content, metadata = await manager.get_file_content(
@@ -321,5 +312,8 @@ class TestGetFileContentCaching:
             )
 
             assert content == b"fresh_content"
+            mock_download.assert_called_once_with(mock_bot,
+                                                  "AgACAgIAAxkB...",
+                                                  cache=False)
             # Cache should not be checked
             mock_cache.assert_not_called()
@@ -0,0 +1,198 @@
+"""Tests for streaming Telegram file transfers.
+
+Tests the in-flight budget, the blob tee and the Files API hand-off with
+a real blob store and mocked Telegram/Files API I/O.
+"""
+
+import asyncio
+import hashlib
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from cache.blob_store import BlobStore
+from core.file_transfer import download_to_cache
+from core.file_transfer import transfer_to_files_api
+from core.file_transfer import TransferBudget
+import pytest
+
+CHUNKS = [b"%PDF-1.4\n", b"a" * 100, b"b" * 100]
+CONTENT = b"".join(CHUNKS)
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Blob store used by the transfer module."""
+    blob_store = BlobStore(root=str(tmp_path), max_bytes=10_000)
+    with patch("core.file_transfer.get_blob_store", return_value=blob_store):
+        yield blob_store
+
+
+@pytest.fixture
+def mock_cache():
+    """Mocked file cache pointer write."""
+    with patch("core.file_transfer.cache_file_blob",
+               new_callable=AsyncMock) as mock:
+        yield mock
+
+
+def _bot(error: Exception | None = None) -> MagicMock:
+    """Bot whose session streams CHUNKS (then raises error, if given)."""
+
+    async def _stream_content(**kwargs):
+        for chunk in CHUNKS:
+            yield chunk
+        if error is not None:
+            raise error
+
+    bot = MagicMock()
+    bot.get_file = AsyncMock(return_value=MagicMock(file_path="docs/a.pdf",
+                                                    file_size=len(CONTENT)))
+    bot.session.api.is_local = False
+    bot.session.stream_content = MagicMock(side_effect=_stream_content)
+    return bot
+
+
+async def _consume(chunks, **kwargs):
+    """Upload stand-in that reads the whole stream."""
+    body = b"".join([chunk async for chunk in chunks])
+    assert body == CONTENT
+    return "file_streamed"
+
+
+class TestTransferBudget:
+    """Tests for TransferBudget."""
+
+    @pytest.mark.asyncio
+    async def test_waits_for_budget(self):
+        """Reservations beyond the budget wait for a release."""
+        budget = TransferBudget(max_bytes=100)
+        second_entered = asyncio.Event()
+
+        async def _second():
+            async with budget.reserve(60):
+                second_entered.set()
+
+        async with budget.reserve(60):
+            task = asyncio.create_task(_second())
+            await asyncio.sleep(0.01)
+            assert not second_entered.is_set()
+            assert budget.in_flight == 60
+
+        await asyncio.wait_for(task, 1)
+        assert second_entered.is_set()
+        assert budget.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_oversized_reservation_clamped(self):
+        """A reservation larger than the budget still proceeds alone."""
+        budget = TransferBudget(max_bytes=100)
+
+        async with budget.reserve(500):
+            assert budget.in_flight == 100
+
+
+class TestTransferToFilesApi:
+    """Tests for transfer_to_files_api()."""
+
+    @pytest.mark.asyncio
+    async def test_tees_into_blob_and_upload(self, store, mock_cache):
+        """Chunks reach both the upload and the blob store."""
+        bot = _bot()
+        with patch("core.file_transfer.upload_stream_to_files_api",
+                   side_effect=_consume) as mock_upload:
+            result = await transfer_to_files_api(bot,
+                                                 "tg_file",
+                                                 filename="a.pdf",
+                                                 mime_type="application/pdf")
+
+        digest = hashlib.sha256(CONTENT).hexdigest()
+        assert result.claude_file_id == "file_streamed"
+        assert result.size_bytes == len(CONTENT)
+        assert result.digest == digest
+        assert await store.get(digest) == CONTENT
+        mock_cache.assert_awaited_once_with("tg_file",
+                                            digest,
+                                            len(CONTENT),
+                                            filename="a.pdf")
+        assert mock_upload.call_args[1]["size_bytes"] == len(CONTENT)
+
+    @pytest.mark.asyncio
+    async def test_upload_failure_non_fatal(self, store, mock_cache):
+        """Failed upload still caches the file."""
+
+        async def _fail(chunks, **kwargs):
+            async for _ in chunks:
+                pass
+            raise RuntimeError("files api down")
+
+        with patch("core.file_transfer.upload_stream_to_files_api",
+                   side_effect=_fail):
+            result = await transfer_to_files_api(_bot(),
+                                                 "tg_file",
+                                                 filename="a.pdf")
+
+        assert result.claude_file_id is None
+        assert result.digest == hashlib.sha256(CONTENT).hexdigest()
+        mock_cache.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_replay_reads_blob(self, store, mock_cache):
+        """Retries are served from the committed blob."""
+
+        async def _replayed(chunks, replay, **kwargs):
+            async for _ in chunks:
+                pass
+            view = await replay()
+            assert view.tobytes() == CONTENT
+            return "file_replayed"
+
+        with patch("core.file_transfer.upload_stream_to_files_api",
+                   side_effect=_replayed):
+            result = await transfer_to_files_api(_bot(),
+                                                 "tg_file",
+                                                 filename="a.pdf")
+
+        assert result.claude_file_id == "file_replayed"
+
+    @pytest.mark.asyncio
+    async def test_download_error_raised(self, store, mock_cache, tmp_path):
+        """Download errors propagate and leave no partial blob."""
+        bot = _bot(error=ConnectionError("reset"))
+        with patch("core.file_transfer.upload_stream_to_files_api",
+                   side_effect=_consume):
+            with pytest.raises(ConnectionError):
+                await transfer_to_files_api(bot, "tg_file", filename="a.pdf")
+
+        assert store.total_bytes == 0
+        assert list((tmp_path / "tmp").iterdir()) == []
+        mock_cache.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_missing_file_path(self, store, mock_cache):
+        """Unknown files raise ValueError."""
+        bot = _bot()
+        bot.get_file.return_value = None
+
+        with pytest.raises(ValueError, match="Failed to download"):
+            await transfer_to_files_api(bot, "tg_file", filename="a.pdf")
+
+
+class TestDownloadToCache:
+    """Tests for download_to_cache()."""
+
+    @pytest.mark.asyncio
+    async def test_returns_content_and_caches(self, store, mock_cache):
+        """Content is spooled to the blob store and read back once."""
+        content = await download_to_cache(_bot(), "tg_file", filename="a")
+
+        assert content == CONTENT
+        mock_cache.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_cache_disabled(self, store, mock_cache):
+        """cache=False skips the file cache pointer."""
+        content = await download_to_cache(_bot(), "tg_file", cache=False)
+
+        assert content == CONTENT
+        mock_cache.assert_not_awaited()
@@ -61,6 +61,28 @@ class TestUploadToFilesApi:
         assert call_args[1]['file'][0] == filename
         assert isinstance(call_args[1]['file'][1], BytesIO)
 
+    @pytest.mark.asyncio
+    @patch('core.claude.files_api.get_anthropic_client')
+    async def test_upload_memoryview_streamed(self, mock_get_client):
+        """Test memoryview content is streamed in chunks, not copied."""
+        mock_client = Mock()
+        mock_client.beta.files.upload.return_value = Mock(id="file_view")
+        mock_get_client.return_value = mock_client
+        content = b"%PDF-1.4\n" + bytes(range(256)) * 1000
+
+        claude_file_id = await files_api.upload_to_files_api(
+            file_bytes=memoryview(content),
+            filename="report.pdf",
+            mime_type="application/pdf")
+
+        assert claude_file_id == "file_view"
+        body = mock_client.beta.files.upload.call_args[1]['file'][1]
+        assert not isinstance(body, BytesIO)
+        assert body.seek(0, 2) == len(content)
+        body.seek(0)
+        chunks = iter(lambda: body.read(65536), b"")
+        assert b"".join(chunks) == content
+
     @pytest.mark.asyncio
     @patch('core.claude.files_api.get_anthropic_client')
     async def test_upload_api_error(self, mock_get_client):
@@ -108,6 +130,153 @@ class TestUploadToFilesApi:
         mock_client.beta.files.upload.assert_called_once()
 
 
+async def _chunks(*parts: bytes):
+    """Async chunk source."""
+    for part in parts:
+        yield part
+
+
+def _read_all(body) -> bytes:
+    """Read a file-like body the way the multipart encoder does."""
+    body.seek(0)
+    return b"".join(iter(lambda: body.read(7), b""))
+
+
+class TestUploadStreamToFilesApi:
+    """Tests for upload_stream_to_files_api() function."""
+
+    @pytest.fixture
+    def stream_client(self):
+        """Client returned by with_options(max_retries=0)."""
+        client = Mock()
+        with patch('core.claude.files_api.get_anthropic_client') as mock_get:
+            mock_get.return_value.with_options.return_value = client
+            yield client
+
+    @pytest.mark.asyncio
+    async def test_streams_through_bounded_pipe(self, stream_client):
+        """Body is read while chunks arrive through a small buffer."""
+        received = {}
+
+        def _upload(file):
+            body = file[1]
+            received["length"] = body.seek(0, 2)
+            received["content"] = _read_all(body)
+            return Mock(id="file_stream")
+
+        stream_client.beta.files.upload.side_effect = _upload
+        parts = [b"%PDF-1.4\n", b"a" * 40, b"b" * 40, b"c" * 3]
+
+        claude_file_id = await files_api.upload_stream_to_files_api(
+            _chunks(*parts),
+            filename="doc.pdf",
+            size_bytes=92,
+            max_buffered=16)
+
+        assert claude_file_id == "file_stream"
+        assert received == {"length": 92, "content": b"".join(parts)}
+        assert stream_client.beta.files.upload.call_args[1]['file'][2] == (
+            "application/pdf")
+
+    @pytest.mark.asyncio
+    async def test_size_mismatch_fails_upload(self, stream_client):
+        """Short stream is not sent as a complete file."""
+        import anthropic
+
+        def _upload(file):
+            try:
+                _read_all(file[1])
+            except OSError as e:
+                raise anthropic.BadRequestError(message=str(e),
+                                                response=Mock(status_code=400),
+                                                body=None) from e
+            return Mock(id="file_truncated")
+
+        stream_client.beta.files.upload.side_effect = _upload
+
+        with pytest.raises(anthropic.BadRequestError, match="ended after"):
+            await files_api.upload_stream_to_files_api(_chunks(b"abc"),
+                                                       filename="a.txt",
+                                                       size_bytes=10)
+
+    @pytest.mark.asyncio
+    async def test_early_failure_drains_source(self, stream_client):
+        """Source is consumed to the end even if the upload is rejected."""
+        import anthropic
+
+        stream_client.beta.files.upload.side_effect = anthropic.BadRequestError(
+            message="Bad request", response=Mock(status_code=400), body=None)
+        consumed = []
+
+        async def _source():
+            for part in (b"x" * 10, b"y" * 10, b"z" * 10):
+                consumed.append(part)
+                yield part
+
+        replay = Mock()
+        with pytest.raises(anthropic.BadRequestError):
+            await files_api.upload_stream_to_files_api(_source(),
+                                                       filename="a.bin",
+                                                       max_buffered=5,
+                                                       replay=replay)
+
+        assert len(consumed) == 3
+        replay.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch('core.claude.files_api.upload_to_files_api')
+    async def test_transient_failure_replayed(self, mock_upload,
+                                              stream_client):
+        """Retryable errors are retried with the replayed content."""
+        import anthropic
+
+        stream_client.beta.files.upload.side_effect = (
+            anthropic.InternalServerError(message="Internal server error",
+                                          response=Mock(status_code=500),
+                                          body=None))
+        mock_upload.return_value = "file_replayed"
+
+        async def _replay():
+            return memoryview(b"full content")
+
+        claude_file_id = await files_api.upload_stream_to_files_api(
+            _chunks(b"full ", b"content"),
+            filename="a.txt",
+            mime_type="text/plain",
+            replay=_replay)
+
+        assert claude_file_id == "file_replayed"
+        mock_upload.assert_called_once_with(
+            file_bytes=memoryview(b"full content"),
+            filename="a.txt",
+            mime_type="text/plain")
+
+    @pytest.mark.asyncio
+    async def test_source_error_aborts_upload(self, stream_client):
+        """Errors from the chunk source abort the reader and propagate."""
+        reader_errors = []
+
+        def _upload(file):
+            try:
+                _read_all(file[1])
+            except OSError as e:
+                reader_errors.append(e)
+                raise
+            return Mock(id="unexpected")
+
+        stream_client.beta.files.upload.side_effect = _upload
+
+        async def _source():
+            yield b"partial"
+            raise ConnectionError("telegram dropped")
+
+        with pytest.raises(ConnectionError, match="telegram dropped"):
+            await files_api.upload_stream_to_files_api(_source(),
+                                                       filename="a.bin")
+
+        assert len(reader_errors) == 1
+
+
 class TestDownloadFromFilesApi:
     """Tests for download_from_files_api() function."""
 
@@ -0,0 +1,275 @@
+"""Tests for the shared image processing service.
+
+Tests ImageProcessor:
+- Downscaling only images above the size limit
+- JPEG conversion
+- Variant caching (in-process LRU, Redis)
+- Process pool and thread fallback execution
+"""
+
+import base64
+from io import BytesIO
+from unittest.mock import AsyncMock
+from unittest.mock import patch
+
+from core.image_processor import get_image_processor
+from core.image_processor import ImageProcessor
+from core.image_processor import probe_image
+from PIL import Image
+import pytest
+
+
+def _make_image(width: int, height: int, fmt: str = "PNG") -> bytes:
+    """Create encoded test image of given size."""
+    img = Image.new("RGB", (width, height), color=(200, 30, 30))
+    buf = BytesIO()
+    img.save(buf, format=fmt)
+    return buf.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def no_redis():
+    """Run without Redis (L2 cache unavailable)."""
+    with patch('core.image_processor.get_redis',
+               new_callable=AsyncMock,
+               return_value=None):
+        yield
+
+
+@pytest.fixture
+def processor():
+    """Thread-backed processor (no process pool in unit tests)."""
+    proc = ImageProcessor(max_workers=0, cache_max_bytes=10 * 1024 * 1024)
+    yield proc
+    proc.shutdown()
+
+
+class TestProbeImage:
+    """Tests for header-only probe."""
+
+    def test_probe_returns_dimensions(self):
+        """Probe reads width, height, mode and format."""
+        info = probe_image(_make_image(30, 20))
+        assert info is not None
+        assert (info.width, info.height) == (30, 20)
+        assert info.mode == "RGB"
+        assert info.format == "PNG"
+
+    def test_probe_invalid_bytes(self):
+        """Probe returns None for non-image data."""
+        assert probe_image(b"not an image") is None
+
+
+class TestDownscale:
+    """Tests for ImageProcessor.downscale()."""
+
+    @pytest.mark.asyncio
+    async def test_small_image_returned_unchanged(self, processor):
+        """Images within limits are returned as the same object."""
+        data = _make_image(100, 50)
+        with patch.object(processor, '_submit') as mock_submit:
+            result, mime = await processor.downscale(data, "image/png")
+        assert result is data
+        assert mime == "image/png"
+        mock_submit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_large_png_downscaled(self, processor):
+        """Large PNG is resized to fit max_dim preserving aspect ratio."""
+        data = _make_image(400, 200)
+        result, mime = await processor.downscale(data,
+                                                 "image/png",
+                                                 max_dim=100)
+        assert mime == "image/png"
+        info = probe_image(result)
+        assert (info.width, info.height) == (100, 50)
+        assert info.format == "PNG"
+
+    @pytest.mark.asyncio
+    async def test_large_jpeg_downscaled(self, processor):
+        """Large JPEG uses reduced decoding and still hits exact size."""
+        data = _make_image(800, 400, fmt="JPEG")
+        result, _ = await processor.downscale(data,
+                                              "image/jpeg",
+                                              max_dim=100)
+        info = probe_image(result)
+        assert (info.width, info.height) == (100, 50)
+        assert info.format == "JPEG"
+
+    @pytest.mark.asyncio
+    async def test_invalid_data_returned_unchanged(self, processor):
+        """Non-image data passes through without error."""
+        data = b"garbage"
+        result, _ = await processor.downscale(data, "image/png")
+        assert result is data
+
+    @pytest.mark.asyncio
+    async def test_repeated_downscale_hits_cache(self, processor):
+        """Same content + operation is processed only once."""
+        data = _make_image(400, 200)
+        first, _ = await processor.downscale(data, "image/png", max_dim=100)
+
+        with patch.object(processor, '_submit') as mock_submit:
+            second, _ = await processor.downscale(data,
+                                                  "image/png",
+                                                  max_dim=100)
+        mock_submit.assert_not_called()
+        assert second == first
+
+    @pytest.mark.asyncio
+    async def test_different_operation_not_shared(self, processor):
+        """Different max_dim produces a separate cache entry."""
+        data = _make_image(400, 200)
+        small, _ = await processor.downscale(data, "image/png", max_dim=100)
+        larger, _ = await processor.downscale(data, "image/png", max_dim=200)
+        assert probe_image(small).width == 100
+        assert probe_image(larger).width == 200
+
+
+class TestToJpeg:
+    """Tests for ImageProcessor.to_jpeg()."""
+
+    @pytest.mark.asyncio
+    async def test_png_converted_to_jpeg(self, processor):
+        """PNG with alpha is converted to RGB JPEG."""
+        img = Image.new("RGBA", (20, 20), color=(0, 0, 255, 128))
+        buf = BytesIO()
+        img.save(buf, format="PNG")
+
+        result = await processor.to_jpeg(buf.getvalue())
+
+        info = probe_image(result)
+        assert info.format == "JPEG"
+        assert info.mode == "RGB"
+
+    @pytest.mark.asyncio
+    async def test_invalid_data_raises(self, processor):
+        """Unreadable image raises so caller can fall back."""
+        with pytest.raises(Exception):
+            await processor.to_jpeg(b"garbage")
+
+
+class TestVariantCache:
+    """Tests for in-process LRU and Redis variant cache."""
+
+    def test_lru_evicts_oldest_over_budget(self):
+        """LRU evicts least recently used entries over byte budget."""
+        proc = ImageProcessor(max_workers=0, cache_max_bytes=10)
+        proc._cache_put("a", b"12345")
+        proc._cache_put("b", b"12345")
+        assert proc._cache_get("a") == b"12345"  # a becomes most recent
+        proc._cache_put("c", b"12345")
+
+        assert proc._cache_get("b") is None
+        assert proc._cache_get("a") is not None
+        assert proc._cache_get("c") is not None
+
+    def test_lru_skips_oversized_values(self):
+        """Values larger than the whole budget are not cached."""
+        proc = ImageProcessor(max_workers=0, cache_max_bytes=4)
+        proc._cache_put("a", b"12345")
+        assert proc._cache_get("a") is None
+
+    @pytest.mark.asyncio
+    async def test_redis_hit_skips_processing(self, processor):
+        """Variant found in Redis is used without running the worker."""
+        data = _make_image(400, 200)
+        mock_redis = AsyncMock()
+        mock_redis.get.return_value = b"cached-variant"
+
+        with patch('core.image_processor.get_redis',
+                   new_callable=AsyncMock,
+                   return_value=mock_redis), \
+                patch.object(processor, '_submit') as mock_submit:
+            result, _ = await processor.downscale(data,
+                                                  "image/png",
+                                                  max_dim=100)
+
+        assert result == b"cached-variant"
+        mock_submit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_result_written_to_redis(self, processor):
+        """Processed variant is stored in Redis with TTL."""
+        data = _make_image(400, 200)
+        mock_redis = AsyncMock()
+        mock_redis.get.return_value = None
+
+        with patch('core.image_processor.get_redis',
+                   new_callable=AsyncMock,
+                   return_value=mock_redis):
+            await processor.downscale(data, "image/png", max_dim=100)
+
+        mock_redis.setex.assert_called_once()
+        key = mock_redis.setex.call_args[0][0]
+        assert key.startswith("image:variant:")
+        assert key.endswith(":downscale:100:85:image/png")
+
+
+class TestProcessPool:
+    """Tests for process pool execution."""
+
+    @pytest.mark.asyncio
+    async def test_pool_executes_worker(self):
+        """Work runs in a spawned process pool."""
+        proc = ImageProcessor(max_workers=1)
+        try:
+            result, _ = await proc.downscale(_make_image(400, 200),
+                                             "image/png",
+                                             max_dim=100)
+            assert proc._pool is not None
+            assert probe_image(result).width == 100
+        finally:
+            proc.shutdown()
+        assert proc._pool is None
+
+
+class TestClaudeClientDownscale:
+    """Tests for base64 image downscaling in Claude request building."""
+
+    @pytest.mark.asyncio
+    async def test_nested_tool_result_image_downscaled(self, processor):
+        """Images nested in tool_result content are downscaled."""
+        from core.claude.client import _downscale_images
+
+        big = base64.b64encode(_make_image(3000, 1500)).decode()
+        small = base64.b64encode(_make_image(10, 10)).decode()
+        image_block = {
+            "type": "image",
+            "source": {
+                "type": "base64",
+                "media_type": "image/png",
+                "data": big
+            }
+        }
+        small_block = {
+            "type": "image",
+            "source": {
+                "type": "base64",
+                "media_type": "image/png",
+                "data": small
+            }
+        }
+        messages = [{
+            "role": "user",
+            "content": [{
+                "type": "tool_result",
+                "tool_use_id": "t1",
+                "content": [image_block]
+            }, small_block]
+        }]
+
+        with patch('core.image_processor.get_image_processor',
+                   return_value=processor):
+            await _downscale_images(messages)
+
+        nested = messages[0]["content"][0]["content"][0]
+        raw = base64.b64decode(nested["source"]["data"])
+        assert probe_image(raw).width == 2000
+        # Small image untouched (same block object)
+        assert messages[0]["content"][1] is small_block
+
+
+def test_singleton():
+    """get_image_processor returns the same instance."""
+    assert get_image_processor() is get_image_processor()
@@ -662,11 +662,34 @@ class TestExtendedThinkingAdaptive:
 class TestSubagentAdaptiveThinking:
     """Tests for adaptive thinking in subagent _call_api."""
 
-    @pytest.mark.asyncio
-    async def test_adaptive_for_opus_model(self):
-        """Subagent should use adaptive thinking for Opus 4.6."""
+    @staticmethod
+    def _stream_client() -> Mock:
+        """Anthropic client whose stream ends immediately with end_turn."""
+        mock_stream = AsyncMock()
+        mock_stream.__aenter__ = AsyncMock(return_value=mock_stream)
+        mock_stream.__aexit__ = AsyncMock(return_value=False)
+
+        async def mock_iter():
+            return
+            yield  # pylint: disable=unreachable
+
+        mock_stream.__aiter__ = lambda self: mock_iter()
+        mock_final = Mock(stop_reason="end_turn")
+        mock_final.usage = Mock(input_tokens=10,
+                                output_tokens=5,
+                                cache_read_input_tokens=0,
+                                cache_creation_input_tokens=0,
+                                thinking_tokens=0,
+                                server_tool_use=None)
+        mock_stream.get_final_message = AsyncMock(return_value=mock_final)
+
+        client = Mock()
+        client.messages.stream = Mock(return_value=mock_stream)
+        return client
+
+    @staticmethod
+    def _subagent_class():
         from core.subagent.base import BaseSubagent
-        from core.subagent.base import SubagentConfig
 
         class TestSubagent(BaseSubagent):
 
@@ -676,67 +699,193 @@ class TestSubagentAdaptiveThinking:
             def _parse_result(self, response_text):
                 return {"verdict": "PASS"}
 
+        return TestSubagent
+
+    @pytest.mark.asyncio
+    async def test_adaptive_for_opus_model(self):
+        """Subagent should use adaptive thinking for Opus 4.6."""
+        from core.subagent.base import SubagentConfig
+
         config = SubagentConfig(
             model_id="claude-opus-4-6",
             system_prompt="Test",
             tools=[],
         )
-        client = AsyncMock()
-        mock_response = Mock()
-        mock_response.stop_reason = "end_turn"
-        client.messages.create = AsyncMock(return_value=mock_response)
-
-        subagent = TestSubagent(config, client, Mock(), Mock(), user_id=123)
+        client = self._stream_client()
+        subagent = self._subagent_class()(config,
+                                          client,
+                                          Mock(),
+                                          Mock(),
+                                          user_id=123)
 
         with patch("config.get_model_by_provider_id",
-                   return_value=_opus_config()):
+                   return_value=_opus_config()), \
+                patch("core.claude.client.get_model",
+                      return_value=_opus_config()):
             await subagent._call_api([{  # pylint: disable=protected-access
                 "role": "user",
                 "content": "test"
             }])
 
-        call_args = client.messages.create.call_args[1]
+        call_args = client.messages.stream.call_args[1]
         assert call_args["thinking"] == {"type": "adaptive"}
         assert call_args["output_config"] == {"effort": "high"}
 
     @pytest.mark.asyncio
-    async def test_manual_for_unknown_model(self):
-        """Subagent should fallback to manual thinking for unknown models."""
-        from core.subagent.base import BaseSubagent
+    async def test_manual_for_non_adaptive_model(self):
+        """Subagent should use a manual thinking budget for Haiku."""
         from core.subagent.base import SubagentConfig
 
-        class TestSubagent(BaseSubagent):
-
-            async def _execute_tool(self, tool_name, tool_input, tool_use_id):
-                return {"result": "ok"}
-
-            def _parse_result(self, response_text):
-                return {"verdict": "PASS"}
-
         config = SubagentConfig(
-            model_id="test-unknown",
+            model_id="claude-haiku-4-5-20251001",
             system_prompt="Test",
             tools=[],
         )
-        client = AsyncMock()
-        mock_response = Mock()
-        mock_response.stop_reason = "end_turn"
-        client.messages.create = AsyncMock(return_value=mock_response)
-
-        subagent = TestSubagent(config, client, Mock(), Mock(), user_id=123)
+        client = self._stream_client()
+        subagent = self._subagent_class()(config,
+                                          client,
+                                          Mock(),
+                                          Mock(),
+                                          user_id=123)
 
         with patch("config.get_model_by_provider_id",
-                   side_effect=ValueError("not found")):
+                   return_value=_haiku_config()), \
+                patch("core.claude.client.get_model",
+                      return_value=_haiku_config()):
             await subagent._call_api([{  # pylint: disable=protected-access
                 "role": "user",
                 "content": "test"
             }])
 
-        call_args = client.messages.create.call_args[1]
-        assert call_args["thinking"]["type"] == "enabled"
-        assert "budget_tokens" in call_args["thinking"]
+        call_args = client.messages.stream.call_args[1]
+        assert call_args["thinking"] == {
+            "type": "enabled",
+            "budget_tokens": config.thinking_budget_tokens
+        }
         assert "output_config" not in call_args
 
+    @pytest.mark.asyncio
+    async def test_unknown_model_rejected(self):
+        """Models missing from the registry cannot be priced or streamed."""
+        from core.subagent.base import SubagentConfig
+
+        config = SubagentConfig(
+            model_id="test-unknown",
+            system_prompt="Test",
+            tools=[],
+        )
+        client = self._stream_client()
+        subagent = self._subagent_class()(config,
+                                          client,
+                                          Mock(),
+                                          Mock(),
+                                          user_id=123)
+
+        with patch("config.get_model_by_provider_id",
+                   side_effect=ValueError("not found")):
+            with pytest.raises(ValueError):
+                await subagent._call_api([{  # pylint: disable=protected-access
+                    "role": "user",
+                    "content": "test"
+                }])
+
+        client.messages.stream.assert_not_called()
+
+
+class TestSelfCritiqueStreaming:
+    """Tests for the self_critique subagent API path."""
+
+    @staticmethod
+    def _stream_client() -> Mock:
+        """Client streaming one thinking delta, then a PASS verdict."""
+        mock_stream = AsyncMock()
+        mock_stream.__aenter__ = AsyncMock(return_value=mock_stream)
+        mock_stream.__aexit__ = AsyncMock(return_value=False)
+
+        async def mock_iter():
+            yield Mock(type="content_block_delta",
+                       delta=Mock(thinking="Checking the claim"))
+
+        mock_stream.__aiter__ = lambda self: mock_iter()
+        mock_final = Mock(stop_reason="end_turn")
+        mock_final.content = [
+            Mock(type="text", text='{"verdict": "PASS", "issues": []}')
+        ]
+        mock_final.usage = Mock(input_tokens=10,
+                                output_tokens=5,
+                                cache_read_input_tokens=0,
+                                cache_creation_input_tokens=0,
+                                thinking_tokens=0,
+                                web_search_requests=0,
+                                server_tool_use=None)
+        mock_stream.get_final_message = AsyncMock(return_value=mock_final)
+
+        client = Mock()
+        client.messages.stream = Mock(return_value=mock_stream)
+        return client
+
+    @pytest.mark.asyncio
+    async def test_streams_cached_adaptive_request(self):
+        """self_critique streams with adaptive thinking and cache breakpoints."""
+        from core.tools.self_critique import execute_self_critique
+
+        client = self._stream_client()
+        on_thinking_chunk = AsyncMock()
+        services = Mock()
+        services.balance.get_balance = AsyncMock(return_value=Decimal("5.00"))
+        services.balance.charge_user = AsyncMock()
+
+        with patch("core.tools.self_critique.get_model",
+                   return_value=_opus_config()), \
+                patch("core.claude.client.get_model",
+                      return_value=_opus_config()), \
+                patch("services.factory.ServiceFactory",
+                      return_value=services):
+            result = await execute_self_critique(
+                user_request="Is 2 + 2 = 4?",
+                content="Yes",
+                bot=Mock(),
+                session=AsyncMock(),
+                user_id=123,
+                anthropic_client=client,
+                on_thinking_chunk=on_thinking_chunk)
+
+        assert result["verdict"] == "PASS"
+        call_args = client.messages.stream.call_args[1]
+        assert call_args["thinking"] == {"type": "adaptive"}
+        assert call_args["output_config"] == {"effort": "high"}
+        assert call_args["system"][0]["cache_control"] == {"type": "ephemeral"}
+        on_thinking_chunk.assert_awaited_once_with("Checking the claim")
+
+    @pytest.mark.asyncio
+    async def test_forced_verdict_uses_low_effort(self):
+        """The tool-less verdict call after the tool limit runs at low effort."""
+        from core.tools.self_critique import execute_self_critique
+
+        client = self._stream_client()
+        services = Mock()
+        services.balance.get_balance = AsyncMock(return_value=Decimal("5.00"))
+        services.balance.charge_user = AsyncMock()
+
+        with patch("core.tools.self_critique.get_model",
+                   return_value=_opus_config()), \
+                patch("core.claude.client.get_model",
+                      return_value=_opus_config()), \
+                patch("services.factory.ServiceFactory",
+                      return_value=services), \
+                patch("core.tools.self_critique.MAX_SUBAGENT_ITERATIONS", 0):
+            result = await execute_self_critique(user_request="Is 2 + 2 = 4?",
+                                                 bot=Mock(),
+                                                 session=AsyncMock(),
+                                                 user_id=123,
+                                                 anthropic_client=client)
+
+        assert result["tool_limit_reached"] is True
+        call_args = client.messages.stream.call_args[1]
+        assert call_args["output_config"] == {"effort": "low"}
+        assert call_args["max_tokens"] == 4000
+        assert "tools" not in call_args
+
 
 # =============================================================================
 # Model Registry Tests
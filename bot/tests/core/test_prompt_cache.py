@@ -0,0 +1,276 @@
+"""Tests for prompt cache manager.
+
+Tests per-prefix usage tracking, breakpoint selection and credit, and
+keep-alive refresh of shared prefixes.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from core.claude.prompt_cache import PromptCacheManager
+import core.request_templates as templates_module
+from core.request_templates import get_request_template
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clean_templates():
+    """Start each test with an empty template cache."""
+    templates_module._templates.clear()
+    templates_module._templates_by_hash.clear()
+    yield
+    templates_module._templates.clear()
+    templates_module._templates_by_hash.clear()
+
+
+class _Clock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _usage(read: int = 0, creation: int = 0, uncached: int = 10):
+    """Anthropic usage stand-in."""
+    return SimpleNamespace(cache_read_input_tokens=read,
+                           cache_creation_input_tokens=creation,
+                           input_tokens=uncached)
+
+
+def _manager(clock=None, **kwargs) -> PromptCacheManager:
+    """Manager with deterministic defaults."""
+    kwargs.setdefault("explore_rate", 0.0)
+    kwargs.setdefault("min_samples", 2)
+    return PromptCacheManager(ttl=300,
+                              refresh_margin=30,
+                              keepalive_window=1800,
+                              offsets=(2, 1),
+                              clock=clock or _Clock(),
+                              **kwargs)
+
+
+class TestUsageTracking:
+    """Tests for record_usage()."""
+
+    def test_records_per_prefix(self):
+        """Templates sharing a prefix aggregate into one entry."""
+        manager = _manager()
+        plain = get_request_template("claude:sonnet")
+        custom = get_request_template("claude:sonnet", "Be brief")
+
+        manager.record_usage(plain.content_hash, _usage(creation=8000))
+        manager.record_usage(custom.content_hash, _usage(read=8000))
+
+        stats = manager.get_prefix_stats(plain.prefix_hash)
+        assert stats.requests == 2
+        assert stats.read_tokens == 8000
+        assert stats.creation_tokens == 8000
+        assert stats.read_ratio == pytest.approx(8000 / 16020)
+
+    def test_ignores_unknown_and_non_block_templates(self):
+        """Requests without a Claude template are not tracked."""
+        manager = _manager()
+        google = get_request_template("google:flash")
+
+        manager.record_usage(None, _usage(read=1))
+        manager.record_usage(google.content_hash, _usage(read=1))
+        manager.record_usage(get_request_template("claude:sonnet").content_hash,
+                             None)
+
+        assert not manager._prefixes
+
+    def test_updates_read_ratio_metric(self):
+        """Read ratio is exported per model."""
+        manager = _manager()
+        template = get_request_template("claude:sonnet")
+
+        with patch("core.claude.prompt_cache.set_prompt_cache_read_ratio"
+                  ) as mock_set:
+            manager.record_usage(template.content_hash, _usage(read=90))
+
+        mock_set.assert_called_once_with("claude:sonnet", 0.9)
+
+
+class TestBreakpoints:
+    """Tests for choose_breakpoint() and credit attribution."""
+
+    def _turn(self, manager, clock, template, thread_id, read, creation):
+        """Simulate one turn: choose breakpoint, then first call usage."""
+        index = manager.choose_breakpoint(template.content_hash, thread_id,
+                                          10)
+        manager.record_usage(template.content_hash,
+                             _usage(read=read, creation=creation),
+                             thread_id=thread_id,
+                             first_call=True)
+        clock.now += 60
+        return index
+
+    def test_default_without_template(self):
+        """Unknown templates get the default offset."""
+        assert _manager().choose_breakpoint(None, 1, 10) == 8
+        assert _manager().choose_breakpoint(None, 1, 1) == 0
+
+    def test_default_until_enough_samples(self):
+        """Default offset is kept until every candidate has samples."""
+        clock = _Clock()
+        manager = _manager(clock)
+        template = get_request_template("claude:sonnet")
+
+        for _ in range(5):
+            assert self._turn(manager, clock, template, 1, 1000, 100) == 8
+
+        offsets = manager.get_prefix_stats(template.prefix_hash).offsets
+        assert offsets[2].samples == 4
+        assert 1 not in offsets
+
+    def test_picks_offset_with_best_savings(self):
+        """Next turn's reads are credited to the previous choice."""
+        clock = _Clock()
+        manager = _manager(clock)
+        template = get_request_template("claude:sonnet")
+
+        # Offset 2 yields few reads, offset 1 many
+        with patch("core.claude.prompt_cache.random.random", return_value=0):
+            with patch("core.claude.prompt_cache.random.choice",
+                       side_effect=lambda offsets: offsets[0]):
+                manager._explore_rate = 1.0
+                for read in (100, 100, 100):
+                    self._turn(manager, clock, template, 1, read, 500)
+            with patch("core.claude.prompt_cache.random.choice",
+                       side_effect=lambda offsets: offsets[1]):
+                for read in (5000, 5000, 5000):
+                    self._turn(manager, clock, template, 1, read, 500)
+
+        manager._explore_rate = 0.0
+        assert manager.choose_breakpoint(template.content_hash, 1, 10) == 9
+
+    def test_late_turn_not_credited(self):
+        """Turns after the TTL carry no breakpoint information."""
+        clock = _Clock()
+        manager = _manager(clock)
+        template = get_request_template("claude:sonnet")
+
+        self._turn(manager, clock, template, 1, 0, 500)
+        clock.now += 600
+        self._turn(manager, clock, template, 1, 0, 500)
+
+        assert not manager.get_prefix_stats(template.prefix_hash).offsets
+
+    def test_tool_loop_calls_not_credited(self):
+        """Only the first call of a turn settles the previous choice."""
+        clock = _Clock()
+        manager = _manager(clock)
+        template = get_request_template("claude:sonnet")
+
+        self._turn(manager, clock, template, 1, 0, 500)
+        manager.record_usage(template.content_hash,
+                             _usage(read=9000),
+                             thread_id=1,
+                             first_call=False)
+
+        assert not manager.get_prefix_stats(template.prefix_hash).offsets
+
+    def test_thread_tracking_bounded(self):
+        """Old threads are forgotten beyond max_threads."""
+        clock = _Clock()
+        manager = _manager(clock, max_threads=2)
+        template = get_request_template("claude:sonnet")
+
+        for thread_id in range(5):
+            self._turn(manager, clock, template, thread_id, 0, 100)
+
+        assert list(manager._turns) == [3, 4]
+
+
+class TestRefresh:
+    """Tests for keep-alive refresh."""
+
+    def test_due_only_near_expiry_and_recent(self):
+        """Refresh when about to expire and traffic was recent."""
+        clock = _Clock()
+        manager = _manager(clock)
+        template = get_request_template("claude:sonnet")
+        manager.record_usage(template.content_hash, _usage(creation=8000))
+
+        assert manager.due_for_refresh() == []
+        clock.now += 280
+        assert len(manager.due_for_refresh()) == 1
+        clock.now += 30
+        # Already expired: refresh would cost a full write
+        assert manager.due_for_refresh() == []
+
+    def test_idle_prefix_not_refreshed(self):
+        """Keep-alive stops after the keep-alive window."""
+        clock = _Clock()
+        manager = _manager(clock)
+        template = get_request_template("claude:sonnet")
+        manager.record_usage(template.content_hash, _usage(creation=8000))
+        stats = manager.get_prefix_stats(template.prefix_hash)
+
+        clock.now += 1900
+        stats.warm_until = clock.now + 10
+
+        assert manager.due_for_refresh() == []
+
+    @pytest.mark.asyncio
+    async def test_refresh_extends_ttl(self):
+        """Successful refresh extends warm_until and is counted."""
+        clock = _Clock()
+        manager = _manager(clock)
+        template = get_request_template("claude:sonnet")
+        manager.record_usage(template.content_hash, _usage(creation=8000))
+        clock.now += 280
+
+        provider = MagicMock()
+        provider.warm_prompt_cache = AsyncMock(return_value=_usage(read=8000))
+        with patch("core.provider_factory.get_provider",
+                   return_value=provider), \
+                patch("core.claude.prompt_cache.record_prompt_cache_refresh"
+                     ) as mock_metric:
+            refreshed = await manager.refresh_due()
+
+        assert refreshed == 1
+        provider.warm_prompt_cache.assert_awaited_once_with(template)
+        mock_metric.assert_called_once_with("hit")
+        stats = manager.get_prefix_stats(template.prefix_hash)
+        assert stats.warm_until == clock.now + 300
+        assert stats.refreshes == 1
+        # Refresh is not real traffic
+        assert stats.requests == 1
+
+    @pytest.mark.asyncio
+    async def test_refresh_error_counted(self):
+        """API errors are counted and don't raise."""
+        clock = _Clock()
+        manager = _manager(clock)
+        template = get_request_template("claude:sonnet")
+        manager.record_usage(template.content_hash, _usage(creation=8000))
+        clock.now += 280
+
+        provider = MagicMock()
+        provider.warm_prompt_cache = AsyncMock(side_effect=RuntimeError("x"))
+        with patch("core.provider_factory.get_provider",
+                   return_value=provider), \
+                patch("core.claude.prompt_cache.record_prompt_cache_refresh"
+                     ) as mock_metric:
+            assert await manager.refresh_due() == 0
+
+        mock_metric.assert_called_once_with("error")
+
+    @pytest.mark.asyncio
+    async def test_evicted_template_skipped(self):
+        """Prefixes whose template is gone stop being refreshed."""
+        clock = _Clock()
+        manager = _manager(clock)
+        template = get_request_template("claude:sonnet")
+        manager.record_usage(template.content_hash, _usage(creation=8000))
+        clock.now += 280
+        templates_module._templates_by_hash.clear()
+
+        assert await manager.refresh_due() == 0
+        assert manager.due_for_refresh() == []
@@ -0,0 +1,202 @@
+"""Tests for precompiled request templates.
+
+Tests:
+- Template building per model (Claude blocks, Google string + declarations)
+- Template reuse and keying by custom prompt
+- Stable hashing
+- Invalidation (admin commands)
+- Gemini provider using precomputed declarations
+"""
+
+from unittest.mock import patch
+
+from core.models import LLMRequest
+from core.models import Message
+import core.request_templates as templates_module
+from core.request_templates import get_prompt_version
+from core.request_templates import get_request_template
+from core.request_templates import get_template_by_hash
+from core.request_templates import invalidate_request_templates
+from core.request_templates import stable_hash
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clean_templates():
+    """Start each test with an empty template cache."""
+    templates_module._templates.clear()
+    templates_module._templates_by_hash.clear()
+    yield
+    templates_module._templates.clear()
+    templates_module._templates_by_hash.clear()
+
+
+class TestStableHash:
+    """Tests for stable_hash()."""
+
+    def test_independent_of_key_order(self):
+        """Dict key order does not change the hash."""
+        assert stable_hash({"a": 1, "b": [1, 2]}) == stable_hash({
+            "b": [1, 2],
+            "a": 1
+        })
+
+    def test_different_values_differ(self):
+        """Different content yields different hashes."""
+        assert stable_hash({"a": 1}) != stable_hash({"a": 2})
+
+
+class TestGetRequestTemplate:
+    """Tests for get_request_template()."""
+
+    def test_claude_template_has_blocks_and_tools(self):
+        """Claude template has cache_control blocks and tool list."""
+        template = get_request_template("claude:sonnet")
+
+        assert template.provider == "claude"
+        system = template.system_prompt_value()
+        assert isinstance(system, list)
+        assert system[0]["cache_control"]["type"] == "ephemeral"
+        assert template.system_prompt_length == sum(
+            len(b["text"]) for b in system)
+        assert len(template.tools_list()) > 0
+        assert template.google_declarations is None
+
+    def test_adaptive_thinking_excludes_extended_thinking(self):
+        """Adaptive thinking models don't get extended_thinking tool."""
+        template = get_request_template("claude:opus")
+        names = {t.get("name") for t in template.tools}
+        assert "extended_thinking" not in names
+
+    def test_google_template_has_declarations(self):
+        """Google template has string prompt and precomputed declarations."""
+        from config import MODEL_REGISTRY
+
+        google_ids = [
+            mid for mid, cfg in MODEL_REGISTRY.items()
+            if cfg.provider == "google"
+        ]
+        if not google_ids:
+            pytest.skip("No Google models registered")
+
+        template = get_request_template(google_ids[0])
+
+        assert isinstance(template.system_prompt_value(), str)
+        assert template.google_declarations is not None
+        assert len(template.google_declarations) > 0
+
+    def test_template_reused(self):
+        """Same model and custom prompt return the same object."""
+        first = get_request_template("claude:sonnet", "Be brief")
+        second = get_request_template("claude:sonnet", "Be brief")
+        assert first is second
+
+    def test_custom_prompt_changes_template(self):
+        """Different custom prompts produce different templates."""
+        plain = get_request_template("claude:sonnet")
+        custom = get_request_template("claude:sonnet", "Be brief")
+
+        assert plain is not custom
+        assert plain.system_hash != custom.system_hash
+        assert plain.tools_hash == custom.tools_hash
+
+    def test_prefix_hash_shared_across_custom_prompts(self):
+        """Custom prompts keep the shared prefix; Google has none."""
+        plain = get_request_template("claude:sonnet")
+        custom = get_request_template("claude:sonnet", "Be brief")
+
+        assert plain.prefix_hash is not None
+        assert plain.prefix_hash == custom.prefix_hash
+        assert get_request_template("claude:haiku").prefix_hash != \
+            plain.prefix_hash
+        assert get_request_template("google:flash").prefix_hash is None
+
+    def test_build_runs_once(self):
+        """Tool definitions are built only on first access."""
+        with patch('core.tools.registry.get_tool_definitions',
+                   return_value=[]) as mock_defs:
+            get_request_template("claude:sonnet")
+            get_request_template("claude:sonnet")
+        assert mock_defs.call_count == 1
+
+    def test_lookup_by_hash(self):
+        """Template can be found by its content hash."""
+        template = get_request_template("claude:sonnet")
+        assert get_template_by_hash(template.content_hash) is template
+        assert get_template_by_hash(None) is None
+        assert get_template_by_hash("unknown") is None
+
+    def test_lru_eviction(self):
+        """Oldest templates are evicted over MAX_TEMPLATES."""
+        with patch.object(templates_module, 'MAX_TEMPLATES', 2):
+            first = get_request_template("claude:sonnet", "a")
+            get_request_template("claude:sonnet", "b")
+            get_request_template("claude:sonnet", "c")
+
+        assert len(templates_module._templates) == 2
+        assert get_template_by_hash(first.content_hash) is None
+
+
+class TestInvalidation:
+    """Tests for invalidate_request_templates()."""
+
+    def test_invalidate_rebuilds(self):
+        """After invalidation a new template is built."""
+        before = get_request_template("claude:sonnet")
+        version = get_prompt_version()
+
+        invalidate_request_templates("test")
+
+        after = get_request_template("claude:sonnet")
+        assert get_prompt_version() == version + 1
+        assert after is not before
+        assert after.prompt_version == version + 1
+
+
+class TestGeminiUsesTemplate:
+    """Tests for Gemini provider with template-backed requests."""
+
+    @pytest.mark.asyncio
+    async def test_declarations_not_reconverted(self):
+        """Gemini skips _convert_tools_for_google for template requests."""
+        from config import MODEL_REGISTRY
+
+        google_ids = [
+            mid for mid, cfg in MODEL_REGISTRY.items()
+            if cfg.provider == "google"
+        ]
+        if not google_ids:
+            pytest.skip("No Google models registered")
+
+        from core.google.client import GeminiProvider
+
+        template = get_request_template(google_ids[0])
+        request = LLMRequest(messages=[Message(role="user", content="hi")],
+                             system_prompt=template.system_prompt_value(),
+                             model=google_ids[0],
+                             tools=template.tools_list(),
+                             template_hash=template.content_hash)
+
+        provider = GeminiProvider.__new__(GeminiProvider)
+        provider._content_caches = {}
+        provider._cache_creation_failures = {}
+        provider._last_cache_creation_tokens = 0
+        provider._template_tools = {}
+
+        captured = {}
+
+        async def fake_cache(**kwargs):
+            captured.update(kwargs)
+            raise RuntimeError("stop")
+
+        with patch('core.google.client._convert_tools_for_google') as conv, \
+                patch.object(provider, '_get_or_create_cache',
+                             side_effect=fake_cache), \
+                patch('core.google.client.get_google_client'):
+            with pytest.raises(RuntimeError):
+                async for _ in provider.stream_events(request):
+                    pass
+
+        conv.assert_not_called()
+        assert captured["tools_hash"] == template.tools_hash
+        assert template.tools_hash in provider._template_tools
@@ -0,0 +1,163 @@
+"""Tests for per-tool bulkheads."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+from core.tools.base import ToolConfig
+from core.tools.bulkhead import ToolBulkhead
+from core.tools.bulkhead import ToolOverloaded
+import pytest
+
+
+def _config(**limits) -> ToolConfig:
+    """Tool config with bulkhead limits."""
+    return ToolConfig(name="render_latex",
+                      definition={"name": "render_latex"},
+                      executor=AsyncMock(),
+                      **limits)
+
+
+async def _hold(bulkhead: ToolBulkhead, config: ToolConfig, user_id: int,
+                release: asyncio.Event) -> None:
+    """Hold a slot until released."""
+    async with bulkhead.acquire(config, user_id):
+        await release.wait()
+
+
+class TestToolBulkhead:
+    """Tests for ToolBulkhead.acquire."""
+
+    @pytest.mark.asyncio
+    async def test_unlimited_tool_passes_through(self):
+        """Tools without limits never wait."""
+        bulkhead = ToolBulkhead()
+
+        async with bulkhead.acquire(_config(), user_id=1) as waited:
+            assert waited == 0.0
+
+        assert not bulkhead.get_stats()
+
+    @pytest.mark.asyncio
+    async def test_global_limit_queues(self):
+        """Calls beyond max_concurrent wait for a free slot."""
+        bulkhead = ToolBulkhead()
+        config = _config(max_concurrent=1)
+        release = asyncio.Event()
+
+        holder = asyncio.create_task(_hold(bulkhead, config, 1, release))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(_hold(bulkhead, config, 2, release))
+        await asyncio.sleep(0.01)
+
+        assert bulkhead.get_stats()["render_latex"] == {
+            "active": 1,
+            "waiting": 1
+        }
+
+        release.set()
+        await asyncio.gather(holder, waiter)
+        assert bulkhead.get_stats()["render_latex"] == {
+            "active": 0,
+            "waiting": 0
+        }
+
+    @pytest.mark.asyncio
+    async def test_per_user_limit_leaves_room_for_others(self):
+        """One user's surplus calls queue; other users still run."""
+        bulkhead = ToolBulkhead()
+        config = _config(max_concurrent=3, max_concurrent_per_user=1)
+        release = asyncio.Event()
+
+        heavy = [
+            asyncio.create_task(_hold(bulkhead, config, 1, release))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0.01)
+
+        # Heavy user holds 1 global slot; their other calls wait on their
+        # own lane, not the shared queue
+        assert bulkhead.get_stats()["render_latex"] == {
+            "active": 1,
+            "waiting": 0
+        }
+        async with bulkhead.acquire(config, user_id=2) as waited:
+            assert waited < 0.1
+
+        release.set()
+        await asyncio.gather(*heavy)
+
+    @pytest.mark.asyncio
+    async def test_queue_full_sheds_immediately(self):
+        """Calls beyond max_queue fail without waiting."""
+        bulkhead = ToolBulkhead()
+        config = _config(max_concurrent=1, max_queue=1)
+        release = asyncio.Event()
+
+        tasks = [
+            asyncio.create_task(_hold(bulkhead, config, user_id, release))
+            for user_id in (1, 2)
+        ]
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(ToolOverloaded) as exc_info:
+            async with bulkhead.acquire(config, user_id=3):
+                pass
+
+        assert exc_info.value.reason == "queue_full"
+        release.set()
+        await asyncio.gather(*tasks)
+
+    @pytest.mark.asyncio
+    async def test_queue_timeout_sheds(self):
+        """Calls waiting longer than the queue timeout fail."""
+        bulkhead = ToolBulkhead(queue_timeout=0.05)
+        config = _config(max_concurrent=1, max_concurrent_per_user=1)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(bulkhead, config, 1, release))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(ToolOverloaded) as exc_info:
+            async with bulkhead.acquire(config, user_id=2):
+                pass
+
+        assert exc_info.value.reason == "timeout"
+        # Timed-out call gave back its per-user slot
+        assert (config.name, 2) not in bulkhead._users  # pylint: disable=protected-access
+        release.set()
+        await holder
+
+    @pytest.mark.asyncio
+    async def test_per_user_wait_not_shed(self):
+        """A user's surplus call waits for their own calls past the timeout."""
+        bulkhead = ToolBulkhead(queue_timeout=0.02)
+        config = _config(max_concurrent=3,
+                         max_concurrent_per_user=1,
+                         max_queue=0)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(bulkhead, config, 1, release))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(_hold(bulkhead, config, 1, release))
+        await asyncio.sleep(0.05)
+
+        assert not waiter.done()
+        release.set()
+        await asyncio.gather(holder, waiter)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_releases_state(self):
+        """Cancelling a queued call leaves no waiting count behind."""
+        bulkhead = ToolBulkhead()
+        config = _config(max_concurrent=1)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(bulkhead, config, 1, release))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(_hold(bulkhead, config, 2, release))
+        await asyncio.sleep(0.01)
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert bulkhead.get_stats()["render_latex"]["waiting"] == 0
+        release.set()
+        await holder
@@ -198,11 +198,13 @@ class TestDeliverFile:
     @pytest.mark.asyncio
     async def test_pdf_delivery(self, mock_bot, mock_session, pdf_metadata,
                                 pdf_content):
-        """Test PDF file delivery."""
+        """Test PDF file delivery (passed on as zero-copy view)."""
+        view = memoryview(pdf_content)
         with patch("core.tools.deliver_file.get_exec_meta",
                    return_value=pdf_metadata), \
-             patch("core.tools.deliver_file.get_exec_file",
-                   return_value=pdf_content), \
+             patch("core.tools.deliver_file.get_exec_file") as mock_get, \
+             patch("core.tools.deliver_file.get_exec_file_view",
+                   return_value=view), \
              patch("core.tools.deliver_file.delete_exec_file",
                    return_value=True):
             result = await deliver_file(
@@ -214,6 +216,8 @@ class TestDeliverFile:
         assert result["success"] == "true"
         assert result["_file_contents"][0]["mime_type"] == "application/pdf"
         assert result["_file_contents"][0]["filename"] == "report.pdf"
+        assert result["_file_contents"][0]["content"] is view
+        mock_get.assert_not_called()
 
 
 # ============================================================================
@@ -64,6 +64,15 @@ def mock_balance_op_repo():
     return repo
 
 
+@pytest.fixture
+def mock_stream():
+    """Patched subagent streaming: each call returns the next mock response."""
+    with patch("core.tools.self_critique.build_subagent_request"), \
+            patch("core.tools.self_critique.stream_subagent_response",
+                  new_callable=AsyncMock) as mock:
+        yield mock
+
+
 @pytest.fixture
 def mock_model_config():
     """Mock model configuration for Opus."""
@@ -345,7 +354,8 @@ class TestBalanceCheck:
             assert result["current_balance"] == 0.25
 
     @pytest.mark.asyncio
-    async def test_sufficient_balance_proceeds(self, mock_bot, mock_session):
+    async def test_sufficient_balance_proceeds(self, mock_bot, mock_session,
+                                               mock_stream):
         """Test that sufficient balance allows execution."""
         from core.tools.self_critique import execute_self_critique
 
@@ -375,7 +385,7 @@ class TestBalanceCheck:
 
             # Setup Anthropic client
             mock_client = AsyncMock()
-            mock_client.messages.create = AsyncMock(return_value=mock_response)
+            mock_stream.return_value = mock_response
 
             result = await execute_self_critique(user_request="Test request",
                                                  content="Test content",
@@ -390,7 +400,7 @@ class TestBalanceCheck:
 
     @pytest.mark.asyncio
     async def test_exact_threshold_balance_proceeds(self, mock_bot,
-                                                    mock_session):
+                                                    mock_session, mock_stream):
         """Test that balance exactly at threshold allows execution."""
         from core.tools.self_critique import execute_self_critique
         from core.tools.self_critique import MIN_BALANCE_FOR_CRITIQUE
@@ -415,7 +425,7 @@ class TestBalanceCheck:
             mock_factory_class.return_value = mock_factory
 
             mock_client = AsyncMock()
-            mock_client.messages.create = AsyncMock(return_value=mock_response)
+            mock_stream.return_value = mock_response
 
             result = await execute_self_critique(user_request="Test",
                                                  bot=mock_bot,
@@ -673,7 +683,7 @@ class TestJSONParsing:
     """Tests for JSON response parsing in execute_self_critique."""
 
     @pytest.mark.asyncio
-    async def test_parse_clean_json(self, mock_bot, mock_session):
+    async def test_parse_clean_json(self, mock_bot, mock_session, mock_stream):
         """Test parsing clean JSON response."""
         from core.tools.self_critique import execute_self_critique
 
@@ -701,7 +711,7 @@ class TestJSONParsing:
             mock_factory_class.return_value = mock_factory
 
             mock_client = AsyncMock()
-            mock_client.messages.create = AsyncMock(return_value=mock_response)
+            mock_stream.return_value = mock_response
 
             result = await execute_self_critique(user_request="Test",
                                                  bot=mock_bot,
@@ -714,7 +724,8 @@ class TestJSONParsing:
             assert len(result["issues"]) == 1
 
     @pytest.mark.asyncio
-    async def test_parse_json_in_code_block(self, mock_bot, mock_session):
+    async def test_parse_json_in_code_block(self, mock_bot, mock_session,
+                                            mock_stream):
         """Test parsing JSON wrapped in markdown code block."""
         from core.tools.self_critique import execute_self_critique
 
@@ -741,7 +752,7 @@ class TestJSONParsing:
             mock_factory_class.return_value = mock_factory
 
             mock_client = AsyncMock()
-            mock_client.messages.create = AsyncMock(return_value=mock_response)
+            mock_stream.return_value = mock_response
 
             result = await execute_self_critique(user_request="Test",
                                                  bot=mock_bot,
@@ -753,7 +764,8 @@ class TestJSONParsing:
             assert result["alignment_score"] == 30
 
     @pytest.mark.asyncio
-    async def test_parse_invalid_json(self, mock_bot, mock_session):
+    async def test_parse_invalid_json(self, mock_bot, mock_session,
+                                      mock_stream):
         """Test handling of invalid JSON response."""
         from core.tools.self_critique import execute_self_critique
 
@@ -774,7 +786,7 @@ class TestJSONParsing:
             mock_factory_class.return_value = mock_factory
 
             mock_client = AsyncMock()
-            mock_client.messages.create = AsyncMock(return_value=mock_response)
+            mock_stream.return_value = mock_response
 
             result = await execute_self_critique(user_request="Test",
                                                  bot=mock_bot,
@@ -796,7 +808,8 @@ class TestToolLoopIntegration:
     """Integration tests for the full tool loop."""
 
     @pytest.mark.asyncio
-    async def test_single_iteration_pass(self, mock_bot, mock_session):
+    async def test_single_iteration_pass(self, mock_bot, mock_session,
+                                         mock_stream):
         """Test successful single-iteration verification."""
         from core.tools.self_critique import execute_self_critique
 
@@ -826,7 +839,7 @@ class TestToolLoopIntegration:
             mock_factory_class.return_value = mock_factory
 
             mock_client = AsyncMock()
-            mock_client.messages.create = AsyncMock(return_value=mock_response)
+            mock_stream.return_value = mock_response
 
             result = await execute_self_critique(
                 user_request="Write a function to add two numbers",
@@ -842,7 +855,8 @@ class TestToolLoopIntegration:
             assert "tokens_used" in result
 
     @pytest.mark.asyncio
-    async def test_tool_use_then_response(self, mock_bot, mock_session):
+    async def test_tool_use_then_response(self, mock_bot, mock_session,
+                                          mock_stream):
         """Test verification with tool use followed by response."""
         from core.tools.self_critique import execute_self_critique
 
@@ -902,8 +916,7 @@ class TestToolLoopIntegration:
             mock_factory_class.return_value = mock_factory
 
             mock_client = AsyncMock()
-            mock_client.messages.create = AsyncMock(
-                side_effect=[mock_response_1, mock_response_2])
+            mock_stream.side_effect = [mock_response_1, mock_response_2]
 
             # Mock execute_tool from registry
             mock_exec_tool.return_value = {
@@ -925,7 +938,8 @@ class TestToolLoopIntegration:
             mock_exec_tool.assert_called_once()
 
     @pytest.mark.asyncio
-    async def test_parallel_tool_execution(self, mock_bot, mock_session):
+    async def test_parallel_tool_execution(self, mock_bot, mock_session,
+                                           mock_stream):
         """Test that multiple tools are executed in parallel."""
         from core.tools.self_critique import execute_self_critique
 
@@ -988,8 +1002,7 @@ class TestToolLoopIntegration:
             mock_factory_class.return_value = mock_factory
 
             mock_client = AsyncMock()
-            mock_client.messages.create = AsyncMock(
-                side_effect=[mock_response_1, mock_response_2])
+            mock_stream.side_effect = [mock_response_1, mock_response_2]
 
             # Mock execute_tool to return different results based on tool name
             def mock_tool_dispatch(tool_name, tool_input, **kwargs):
@@ -1022,7 +1035,8 @@ class TestMaxIterations:
     """Tests for max iterations limit."""
 
     @pytest.mark.asyncio
-    async def test_max_iterations_reached(self, mock_bot, mock_session):
+    async def test_max_iterations_reached(self, mock_bot, mock_session,
+                                          mock_stream):
         """Test that max iterations triggers final call without tools."""
         from core.tools.self_critique import execute_self_critique
         from core.tools.self_critique import MAX_SUBAGENT_ITERATIONS
@@ -1071,8 +1085,8 @@ class TestMaxIterations:
 
             mock_client = AsyncMock()
             # Return tool_use for MAX_SUBAGENT_ITERATIONS, then end_turn for final
-            mock_client.messages.create = AsyncMock(
-                side_effect=[mock_tool_response] * MAX_SUBAGENT_ITERATIONS +
+            mock_stream.side_effect = (
+                [mock_tool_response] * MAX_SUBAGENT_ITERATIONS +
                 [mock_final_response])
 
             mock_exec_tool.return_value = {
@@ -1093,7 +1107,7 @@ class TestMaxIterations:
             # MAX_SUBAGENT_ITERATIONS + 1 final call
             assert result["iterations"] == MAX_SUBAGENT_ITERATIONS + 1
             # Should have been called MAX_SUBAGENT_ITERATIONS + 1 times
-            assert mock_client.messages.create.call_count == MAX_SUBAGENT_ITERATIONS + 1
+            assert mock_stream.call_count == MAX_SUBAGENT_ITERATIONS + 1
 
 
 # =============================================================================
@@ -1105,7 +1119,8 @@ class TestCancellation:
     """Tests for cancellation via cancel_event."""
 
     @pytest.mark.asyncio
-    async def test_cancel_event_stops_subagent(self, mock_bot, mock_session):
+    async def test_cancel_event_stops_subagent(self, mock_bot, mock_session,
+                                               mock_stream):
         """Test that setting cancel_event stops the subagent."""
         import asyncio
 
@@ -1130,8 +1145,6 @@ class TestCancellation:
 
             mock_client = AsyncMock()
             # Should never be called - cancelled before first iteration
-            mock_client.messages.create = AsyncMock()
-
             result = await execute_self_critique(user_request="Test request",
                                                  bot=mock_bot,
                                                  session=mock_session,
@@ -1143,10 +1156,11 @@ class TestCancellation:
             assert result["partial"] is True
             assert result["iterations"] == 0
             # API should not have been called
-            mock_client.messages.create.assert_not_called()
+            mock_stream.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_cancel_mid_iteration(self, mock_bot, mock_session):
+    async def test_cancel_mid_iteration(self, mock_bot, mock_session,
+                                        mock_stream):
         """Test cancellation during tool loop."""
         import asyncio
 
@@ -1197,7 +1211,7 @@ class TestCancellation:
                 cancel_event.set()
                 return mock_tool_response
 
-            mock_client.messages.create = AsyncMock(side_effect=api_side_effect)
+            mock_stream.side_effect = api_side_effect
 
             mock_exec_tool.return_value = {
                 "output": "OK",
@@ -1215,7 +1229,7 @@ class TestCancellation:
             assert result["verdict"] == "CANCELLED"
             assert result["partial"] is True
             # API called once, then cancelled on second iteration
-            assert mock_client.messages.create.call_count == 1
+            assert mock_stream.call_count == 1
 
 
 # =============================================================================
@@ -1228,7 +1242,7 @@ class TestCostCharging:
 
     @pytest.mark.asyncio
     async def test_user_charged_after_verification(self, mock_bot,
-                                                   mock_session):
+                                                   mock_session, mock_stream):
         """Test that user is charged after successful verification."""
         from core.tools.self_critique import execute_self_critique
 
@@ -1253,7 +1267,7 @@ class TestCostCharging:
             mock_factory_class.return_value = mock_factory
 
             mock_client = AsyncMock()
-            mock_client.messages.create = AsyncMock(return_value=mock_response)
+            mock_stream.return_value = mock_response
 
             mock_calc.return_value = Decimal("0.05")
 
@@ -1272,7 +1286,8 @@ class TestCostCharging:
             assert "self_critique" in call_args.kwargs["description"]
 
     @pytest.mark.asyncio
-    async def test_cost_includes_tool_costs(self, mock_bot, mock_session):
+    async def test_cost_includes_tool_costs(self, mock_bot, mock_session,
+                                            mock_stream):
         """Test that tool costs are included in total charge."""
         from core.tools.self_critique import execute_self_critique
 
@@ -1321,8 +1336,7 @@ class TestCostCharging:
             mock_factory_class.return_value = mock_factory
 
             mock_client = AsyncMock()
-            mock_client.messages.create = AsyncMock(
-                side_effect=[mock_response_1, mock_response_2])
+            mock_stream.side_effect = [mock_response_1, mock_response_2]
 
             # Mock execute_tool to return result with execution_time
             mock_exec_tool.return_value = {"output": "1", "execution_time": 2.0}
@@ -7,7 +7,13 @@ NO __init__.py - use direct import:
     pytest tests/db/repositories/test_message_repository.py
 """
 
+from unittest.mock import AsyncMock
+from unittest.mock import patch
+
 from db.models.message import MessageRole
+from db.repositories.message_repository import CachedMessage
+from db.repositories.message_repository import history_cache_entries
+from db.repositories.message_repository import history_from_cache
 from db.repositories.message_repository import MessageRepository
 import pytest
 
@@ -1152,3 +1158,217 @@ async def test_create_message_with_all_context_fields(
     assert message.reply_sender_display == "@reply_target"
     assert message.quote_data["text"] == "quoted"
     assert message.edit_count == 0
+
+
+async def _create_conversation(repo, sample_chat, sample_thread, sample_user,
+                               count):
+    """Create alternating user/assistant messages (ids 900+, dates 1s apart)."""
+    messages = []
+    for idx in range(count):
+        is_user = idx % 2 == 0
+        messages.append(await repo.create_message(
+            chat_id=sample_chat.id,
+            message_id=900 + idx,
+            thread_id=sample_thread.id,
+            from_user_id=sample_user.id if is_user else None,
+            date=1234570000 + idx,
+            role=MessageRole.USER if is_user else MessageRole.ASSISTANT,
+            text_content=f'Message {idx}',
+        ))
+    return messages
+
+
+@pytest.mark.asyncio
+async def test_get_thread_messages_since_compaction(
+    test_session,
+    sample_thread,
+    sample_user,
+    sample_chat,
+):
+    """History starts at the user turn before the latest summary.
+
+    Args:
+        test_session: Async session fixture.
+        sample_thread: Sample thread fixture.
+        sample_user: Sample user fixture.
+        sample_chat: Sample chat fixture.
+    """
+    repo = MessageRepository(test_session)
+    await _create_conversation(repo, sample_chat, sample_thread, sample_user,
+                               10)
+
+    await repo.set_compaction_summary(sample_chat.id, 903, 'old summary')
+    await repo.set_compaction_summary(sample_chat.id, 907, 'new summary')
+
+    messages = await repo.get_thread_messages(sample_thread.id,
+                                              limit=500,
+                                              since_compaction=True)
+
+    assert [m.message_id for m in messages] == [906, 907, 908, 909]
+    assert messages[1].compaction_summary == 'new summary'
+
+
+@pytest.mark.asyncio
+async def test_get_thread_messages_since_compaction_no_summary(
+    test_session,
+    sample_thread,
+    sample_user,
+    sample_chat,
+):
+    """Without summaries the full history is returned.
+
+    Args:
+        test_session: Async session fixture.
+        sample_thread: Sample thread fixture.
+        sample_user: Sample user fixture.
+        sample_chat: Sample chat fixture.
+    """
+    repo = MessageRepository(test_session)
+    await _create_conversation(repo, sample_chat, sample_thread, sample_user,
+                               4)
+
+    messages = await repo.get_thread_messages(sample_thread.id,
+                                              since_compaction=True)
+
+    assert len(messages) == 4
+
+
+@pytest.mark.asyncio
+async def test_set_compaction_summary_not_found(test_session):
+    """Setting summary on unknown message raises ValueError.
+
+    Args:
+        test_session: Async session fixture.
+    """
+    repo = MessageRepository(test_session)
+
+    with pytest.raises(ValueError, match='not found'):
+        await repo.set_compaction_summary(1, 999999, 'summary')
+
+
+@pytest.mark.asyncio
+async def test_history_cache_entries_compact(
+    test_session,
+    sample_thread,
+    sample_user,
+    sample_chat,
+):
+    """Cached entries skip thinking blocks and unset fields.
+
+    Args:
+        test_session: Async session fixture.
+        sample_thread: Sample thread fixture.
+        sample_user: Sample user fixture.
+        sample_chat: Sample chat fixture.
+    """
+    repo = MessageRepository(test_session)
+    user_msg = await repo.create_message(
+        chat_id=sample_chat.id,
+        message_id=950,
+        thread_id=sample_thread.id,
+        from_user_id=sample_user.id,
+        date=1234570000,
+        role=MessageRole.USER,
+        text_content='Question',
+        sender_display='@alice',
+    )
+    bot_msg = await repo.create_message(
+        chat_id=sample_chat.id,
+        message_id=951,
+        thread_id=sample_thread.id,
+        from_user_id=None,
+        date=1234570001,
+        role=MessageRole.ASSISTANT,
+        text_content='Answer',
+        thinking_blocks='[{"type": "thinking", "thinking": "long"}]',
+    )
+
+    entries = history_cache_entries([user_msg, bot_msg])
+
+    assert entries[0]['sender_display'] == '@alice'
+    assert entries[0]['from_user_id'] == sample_user.id
+    assert 'thinking_blocks' not in entries[1]
+    assert 'from_user_id' not in entries[1]
+    assert 'attachments' not in entries[1]
+
+    records = history_from_cache(entries)
+    assert isinstance(records[0], CachedMessage)
+    assert records[0].sender_display == '@alice'
+    assert records[1].role == MessageRole.ASSISTANT
+    assert records[1].from_user_id is None
+    assert records[1].edit_count == 0
+
+
+def test_cached_message_ignores_legacy_fields():
+    """Entries cached by older versions (with thinking blocks) still load."""
+    record = CachedMessage({
+        'role': 'assistant',
+        'text_content': 'Answer',
+        'message_id': 5,
+        'date': 1234570000,
+        'thinking_blocks': '[...]',
+        'compaction_summary': None,
+    })
+
+    assert record.text_content == 'Answer'
+    assert not hasattr(record, '__dict__')
+    assert not hasattr(record, 'thinking_blocks')
+
+
+@pytest.mark.asyncio
+async def test_create_messages_batch_skips_existing(
+    test_session,
+    sample_thread,
+    sample_user,
+    sample_chat,
+    sample_message,
+):
+    """Batch insert returns only new rows and skips existing ones.
+
+    Args:
+        test_session: Async session fixture.
+        sample_thread: Sample thread fixture.
+        sample_user: Sample user fixture.
+        sample_chat: Sample chat fixture.
+        sample_message: Existing message (retry scenario).
+    """
+    repo = MessageRepository(test_session)
+    base = {
+        "chat_id": sample_chat.id,
+        "thread_id": sample_thread.id,
+        "from_user_id": sample_user.id,
+        "date": 1234567890,
+        "role": MessageRole.USER,
+    }
+    batch = [
+        {
+            **base, "message_id": sample_message.message_id,
+            "text_content": "duplicate"
+        },
+        {
+            **base, "message_id": 9001,
+            "text_content": "photo",
+            "attachments": [{
+                "type": "photo",
+                "file_id": "f"
+            }]
+        },
+        {
+            **base, "message_id": 9002,
+            "text_content": "text"
+        },
+    ]
+
+    with patch("db.repositories.message_repository.invalidate_messages",
+               new_callable=AsyncMock) as mock_invalidate:
+        inserted = await repo.create_messages_batch(batch,
+                                                    invalidate_cache=False)
+
+    assert sorted(m.message_id for m in inserted) == [9001, 9002]
+    mock_invalidate.assert_not_awaited()
+    photo = await repo.get_message(sample_chat.id, 9001)
+    assert photo.has_photos is True
+    assert photo.attachment_count == 1
+    existing = await repo.get_message(sample_chat.id,
+                                      sample_message.message_id)
+    assert existing.text_content == sample_message.text_content
@@ -575,6 +575,107 @@ class TestSetCacheSubsidyCommand:
             assert "privileged users" in response.lower()
 
 
+@pytest.mark.asyncio
+class TestProfileCommand:
+    """Test /profile admin command."""
+
+    @pytest.fixture(autouse=True)
+    def _reset_profilers(self):
+        """Fresh profiler singletons, stopped after each test."""
+        from utils.profiling import get_memory_tracker
+        from utils.profiling import get_profiler
+        get_profiler.reset()
+        get_memory_tracker.reset()
+        yield
+        if get_profiler().running:
+            get_profiler().stop()
+        get_memory_tracker().stop()
+
+    async def test_profile_start_stop_sends_speedscope(self, admin_user_id):
+        """Test /profile start then /profile stop returns a profile file.
+
+        Args:
+            admin_user_id: Admin user ID fixture.
+        """
+        with privileged_context(admin_user_id):
+            start_message = create_admin_message(admin_user_id,
+                                                 "/profile start 1")
+            await admin.cmd_profile(start_message)
+            assert "started" in start_message.answer.call_args[0][0]
+
+            stop_message = create_admin_message(admin_user_id,
+                                                "/profile stop")
+            stop_message.answer_document = AsyncMock()
+            await admin.cmd_profile(stop_message)
+
+            stop_message.answer_document.assert_called_once()
+            document = stop_message.answer_document.call_args[0][0]
+            assert document.filename.endswith(".speedscope.json")
+            assert b'"sampled"' in document.data
+
+    async def test_profile_tasks_sends_dump(self, admin_user_id):
+        """Test /profile tasks returns the asyncio task dump.
+
+        Args:
+            admin_user_id: Admin user ID fixture.
+        """
+        with privileged_context(admin_user_id):
+            mock_message = create_admin_message(admin_user_id,
+                                                "/profile tasks")
+            mock_message.answer_document = AsyncMock()
+            await admin.cmd_profile(mock_message)
+
+            document = mock_message.answer_document.call_args[0][0]
+            assert document.filename.startswith("tasks_")
+            assert b"tasks" in document.data
+
+    async def test_profile_stop_without_start(self, admin_user_id):
+        """Test /profile stop with no running profiler reports an error.
+
+        Args:
+            admin_user_id: Admin user ID fixture.
+        """
+        with privileged_context(admin_user_id):
+            mock_message = create_admin_message(admin_user_id,
+                                                "/profile stop")
+            await admin.cmd_profile(mock_message)
+
+            response = mock_message.answer.call_args[0][0]
+            assert "not running" in response
+
+    async def test_profile_start_invalid_interval(self, admin_user_id):
+        """Test /profile start with a non-numeric interval shows usage.
+
+        Args:
+            admin_user_id: Admin user ID fixture.
+        """
+        with privileged_context(admin_user_id):
+            mock_message = create_admin_message(admin_user_id,
+                                                "/profile start fast")
+            await admin.cmd_profile(mock_message)
+
+            response = mock_message.answer.call_args[0][0]
+            assert "Usage" in response
+            from utils.profiling import get_profiler
+            assert not get_profiler().running
+
+    async def test_profile_unauthorized(self, regular_user_id):
+        """Test that non-privileged user cannot profile.
+
+        Args:
+            regular_user_id: Regular user ID fixture.
+        """
+        with no_privileged_users():
+            mock_message = create_admin_message(regular_user_id,
+                                                "/profile start")
+            await admin.cmd_profile(mock_message)
+
+            response = mock_message.answer.call_args[0][0]
+            assert "privileged users" in response.lower()
+            from utils.profiling import get_profiler
+            assert not get_profiler().running
+
+
 @pytest.mark.asyncio
 class TestPrivilegeChecking:
     """Test privilege checking mechanism."""
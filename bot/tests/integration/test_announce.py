@@ -7,10 +7,9 @@ Tests cover:
 - All-users mode (no targets)
 - FSM state transitions
 - Preview via copy_message
-- Rate-limited broadcast with flood control
-- TelegramRetryAfter handling
-- Progress updates
+- Hand-off to the broadcast engine (delivery, report)
 - Delivery report generation
+- Forum topic registration
 - Confirmation and cancellation flows
 """
 
@@ -26,10 +25,11 @@ import config
 from db.models.user import User
 from db.repositories.user_repository import UserRepository
 import pytest
+from services.broadcast import BroadcastEngine
+from services.broadcast import BroadcastRateLimiter
+from services.broadcast import generate_report
+from services.broadcast import register_announce_topics
 from telegram.handlers import announce
-from telegram.handlers.announce import _broadcast_message
-from telegram.handlers.announce import _generate_report
-from telegram.handlers.announce import _register_announce_topics
 from telegram.handlers.announce import announce_cancel_callback
 from telegram.handlers.announce import announce_confirm_callback
 from telegram.handlers.announce import announce_message_received
@@ -105,6 +105,8 @@ def make_callback(user_id: int, data: str) -> Mock:
     cb.message.answer_document = AsyncMock()
     cb.bot = Mock()
     cb.bot.copy_message = AsyncMock()
+    cb.bot.edit_message_text = AsyncMock()
+    cb.bot.send_document = AsyncMock()
     return cb
 
 
@@ -255,7 +257,9 @@ class TestAnnounceAllUsers:
                 AnnounceStates.waiting_for_message)
             call_kwargs = state.update_data.call_args[1]
             assert call_kwargs["is_all"] is True
-            assert sample_user.id in call_kwargs["target_ids"]
+            # Targets are paged by the engine, not stored in FSM state
+            assert call_kwargs["total"] == 1
+            assert "target_ids" not in call_kwargs
 
     async def test_all_users_empty_db(self, test_session):
         """No users in DB → error message."""
@@ -330,15 +334,20 @@ class TestAnnounceConfirmation:
     """Test broadcast confirmation and cancellation."""
 
     @pytest.fixture(autouse=True)
-    def _patch_topic_registration(self):
-        """Patch out topic registration to avoid DB calls."""
-        with patch(
-                "telegram.handlers.announce._register_announce_topics",
-                new_callable=AsyncMock,
-        ):
-            yield
-
-    async def test_confirm_broadcasts(self):
+    def engine(self):
+        """Fresh engine without Redis, topic registration or rate delays."""
+        engine = BroadcastEngine(limiter=BroadcastRateLimiter(rate=1e6),
+                                 progress_interval=0.01)
+        with patch("telegram.handlers.announce.get_broadcast_engine",
+                   return_value=engine), \
+                patch("services.broadcast.get_redis",
+                      new_callable=AsyncMock,
+                      return_value=None), \
+                patch("services.broadcast.register_announce_topics",
+                      new_callable=AsyncMock):
+            yield engine
+
+    async def test_confirm_broadcasts(self, engine):
         """Confirm button triggers copy_message broadcast with rate limiting."""
         cb = make_callback(ADMIN_USER_ID, "announce:confirm")
         state = make_state({
@@ -348,9 +357,8 @@ class TestAnnounceConfirmation:
             "broadcast_message_id": 42,
         })
 
-        with patch("telegram.handlers.announce.asyncio.sleep",
-                   new_callable=AsyncMock):
-            await announce_confirm_callback(cb, state)
+        await announce_confirm_callback(cb, state)
+        await engine.join()
 
         # Should clear state
         state.clear.assert_called_once()
@@ -359,9 +367,9 @@ class TestAnnounceConfirmation:
         assert cb.bot.copy_message.call_count == 3
 
         # Should send delivery report
-        cb.message.answer_document.assert_called_once()
+        cb.bot.send_document.assert_called_once()
 
-    async def test_confirm_handles_errors(self):
+    async def test_confirm_handles_errors(self, engine):
         """Broadcast handles blocked users gracefully."""
         from aiogram.exceptions import TelegramForbiddenError
 
@@ -380,13 +388,32 @@ class TestAnnounceConfirmation:
             "broadcast_message_id": 42,
         })
 
-        with patch("telegram.handlers.announce.asyncio.sleep",
-                   new_callable=AsyncMock):
-            await announce_confirm_callback(cb, state)
+        await announce_confirm_callback(cb, state)
+        await engine.join()
 
         assert cb.bot.copy_message.call_count == 3
         # Report should still be generated
-        cb.message.answer_document.assert_called_once()
+        cb.bot.send_document.assert_called_once()
+        report = cb.bot.send_document.call_args.args[1].data.decode()
+        assert "1002: Bot blocked by user" in report
+
+    async def test_confirm_all_users_pages_from_db(self, engine):
+        """All-users broadcast passes no target list to the engine."""
+        cb = make_callback(ADMIN_USER_ID, "announce:confirm")
+        state = make_state({
+            "admin_user_id": ADMIN_USER_ID,
+            "total": 2,
+            "is_all": True,
+            "broadcast_chat_id": 100,
+            "broadcast_message_id": 42,
+        })
+
+        with patch.object(engine, "start", new_callable=AsyncMock) as start:
+            await announce_confirm_callback(cb, state)
+
+        kwargs = start.call_args.kwargs
+        assert kwargs["target_ids"] is None
+        assert kwargs["total"] == 2
 
     async def test_cancel_clears_state(self):
         """Cancel button clears FSM state."""
@@ -418,127 +445,6 @@ class TestAnnounceConfirmation:
         cb.bot.copy_message.assert_not_called()
 
 
-# =============================================================================
-# Tests: Broadcast Helper (_broadcast_message)
-# =============================================================================
-
-
-@pytest.mark.asyncio
-class TestBroadcastMessage:
-    """Test _broadcast_message helper with rate limiting and flood control."""
-
-    @pytest.fixture(autouse=True)
-    def _patch_topic_registration(self):
-        """Patch out topic registration to avoid DB calls."""
-        with patch(
-                "telegram.handlers.announce._register_announce_topics",
-                new_callable=AsyncMock,
-        ):
-            yield
-
-    async def test_rate_limiting_sleeps_between_sends(self):
-        """Should sleep 0.04s between each send."""
-        bot = Mock()
-        bot.copy_message = AsyncMock()
-        progress_msg = Mock(edit_text=AsyncMock())
-
-        with patch("telegram.handlers.announce.asyncio.sleep",
-                   new_callable=AsyncMock) as mock_sleep:
-            await _broadcast_message(
-                bot=bot,
-                target_ids=[1, 2, 3],
-                usernames={},
-                broadcast_chat_id=100,
-                broadcast_message_id=42,
-                progress_msg=progress_msg,
-                lang="en",
-            )
-
-        # Should sleep 0.04 for each target
-        sleep_calls = [c[0][0] for c in mock_sleep.call_args_list]
-        assert sleep_calls.count(0.04) == 3
-
-    async def test_retry_after_retries_and_succeeds(self):
-        """TelegramRetryAfter triggers retry after sleeping."""
-        from aiogram.exceptions import TelegramRetryAfter
-
-        bot = Mock()
-        # First call: retry_after, second call: success
-        bot.copy_message = AsyncMock(side_effect=[
-            TelegramRetryAfter(retry_after=1, method="copy", message="Flood"),
-            None,
-        ])
-        progress_msg = Mock(edit_text=AsyncMock())
-
-        with patch("telegram.handlers.announce.asyncio.sleep",
-                   new_callable=AsyncMock) as mock_sleep:
-            delivered, failed = await _broadcast_message(
-                bot=bot,
-                target_ids=[1001],
-                usernames={},
-                broadcast_chat_id=100,
-                broadcast_message_id=42,
-                progress_msg=progress_msg,
-                lang="en",
-            )
-
-        assert delivered == [1001]
-        assert failed == []
-        # Should have slept for retry_after (1s) + rate limit (0.04s)
-        sleep_values = [c[0][0] for c in mock_sleep.call_args_list]
-        assert 1 in sleep_values
-
-    async def test_retry_after_exhaustion(self):
-        """TelegramRetryAfter exhausts max_retries → fails."""
-        from aiogram.exceptions import TelegramRetryAfter
-
-        bot = Mock()
-        bot.copy_message = AsyncMock(side_effect=TelegramRetryAfter(
-            retry_after=0.01, method="copy", message="Flood"))
-        progress_msg = Mock(edit_text=AsyncMock())
-
-        with patch("telegram.handlers.announce.asyncio.sleep",
-                   new_callable=AsyncMock):
-            delivered, failed = await _broadcast_message(
-                bot=bot,
-                target_ids=[1001],
-                usernames={},
-                broadcast_chat_id=100,
-                broadcast_message_id=42,
-                progress_msg=progress_msg,
-                lang="en",
-                max_retries=2,
-            )
-
-        assert delivered == []
-        assert len(failed) == 1
-        assert failed[0][0] == 1001
-        assert "Flood control" in failed[0][1]
-        # Should have been called max_retries times
-        assert bot.copy_message.call_count == 2
-
-    async def test_progress_updates_every_5(self):
-        """Progress message updated every 5 sends."""
-        bot = Mock()
-        bot.copy_message = AsyncMock()
-        progress_msg = Mock(edit_text=AsyncMock())
-
-        with patch("telegram.handlers.announce.asyncio.sleep",
-                   new_callable=AsyncMock):
-            await _broadcast_message(
-                bot=bot,
-                target_ids=list(range(12)),
-                usernames={},
-                broadcast_chat_id=100,
-                broadcast_message_id=42,
-                progress_msg=progress_msg,
-                lang="en",
-            )
-
-        # Updates at: 5, 10, 12 (final)
-        assert progress_msg.edit_text.call_count == 3
-
-
 # =============================================================================
 # Tests: Report Generation
 # =============================================================================
@@ -549,7 +455,7 @@ class TestAnnounceReport:
 
     def test_report_with_delivered_and_failed(self):
         """Report includes both delivered and failed sections."""
-        report = _generate_report(
+        report = generate_report(
             delivered=[1001, 1002],
             failed=[(1003, "Bot blocked by user")],
         )
@@ -563,7 +469,7 @@ class TestAnnounceReport:
 
     def test_report_all_delivered(self):
         """Report with no failures."""
-        report = _generate_report(delivered=[1, 2, 3], failed=[])
+        report = generate_report(delivered=[1, 2, 3], failed=[])
 
         assert "Delivered: 3" in report
         assert "Failed: 0" in report
@@ -571,7 +477,7 @@ class TestAnnounceReport:
 
     def test_report_all_failed(self):
         """Report with no deliveries."""
-        report = _generate_report(
+        report = generate_report(
             delivered=[],
             failed=[(1, "error1"), (2, "error2")],
         )
@@ -583,7 +489,7 @@ class TestAnnounceReport:
     def test_report_includes_usernames(self):
         """Report shows usernames next to IDs when available."""
         usernames = {1001: "alice", 1003: "charlie"}
-        report = _generate_report(
+        report = generate_report(
             delivered=[1001, 1002],
             failed=[(1003, "Bot blocked by user")],
             usernames=usernames,
@@ -601,7 +507,7 @@ class TestAnnounceReport:
 
 @pytest.mark.asyncio
 class TestAnnounceTopicRegistration:
-    """Test _register_announce_topics for forum chat topic tracking."""
+    """Test register_announce_topics for forum chat topic tracking."""
 
     async def test_registers_topics_for_forum_chats(self, test_session):
         """Topics registered for chats with is_forum=True."""
@@ -617,11 +523,9 @@ class TestAnnounceTopicRegistration:
         mock_session_cm.__aenter__ = AsyncMock(return_value=test_session)
         mock_session_cm.__aexit__ = AsyncMock(return_value=False)
 
-        with patch("db.engine.get_session", return_value=mock_session_cm):
-            await _register_announce_topics(
-                sent_message_ids={2001: 555},
-                usernames={2001: "forum_user"},
-            )
+        with patch("services.broadcast.get_session",
+                   return_value=mock_session_cm):
+            await register_announce_topics(sent_message_ids={2001: 555})
 
         # Verify thread was created
         from sqlalchemy import select
@@ -647,11 +551,9 @@ class TestAnnounceTopicRegistration:
         mock_session_cm.__aenter__ = AsyncMock(return_value=test_session)
         mock_session_cm.__aexit__ = AsyncMock(return_value=False)
 
-        with patch("db.engine.get_session", return_value=mock_session_cm):
-            await _register_announce_topics(
-                sent_message_ids={3001: 777},
-                usernames={3001: "regular_user"},
-            )
+        with patch("services.broadcast.get_session",
+                   return_value=mock_session_cm):
+            await register_announce_topics(sent_message_ids={3001: 777})
 
         # No thread should be created
         from sqlalchemy import select
@@ -669,12 +571,10 @@ class TestAnnounceTopicRegistration:
         mock_session_cm.__aenter__ = AsyncMock(return_value=mock_session)
         mock_session_cm.__aexit__ = AsyncMock(return_value=False)
 
-        with patch("db.engine.get_session", return_value=mock_session_cm):
+        with patch("services.broadcast.get_session",
+                   return_value=mock_session_cm):
             # Should NOT raise
-            await _register_announce_topics(
-                sent_message_ids={4001: 999},
-                usernames={4001: "error_user"},
-            )
+            await register_announce_topics(sent_message_ids={4001: 999})
 
     async def test_mixed_forum_and_non_forum(self, test_session):
         """Only forum chats get Thread records, non-forum are skipped."""
@@ -690,14 +590,12 @@ class TestAnnounceTopicRegistration:
         mock_session_cm.__aenter__ = AsyncMock(return_value=test_session)
         mock_session_cm.__aexit__ = AsyncMock(return_value=False)
 
-        with patch("db.engine.get_session", return_value=mock_session_cm):
-            await _register_announce_topics(
-                sent_message_ids={
-                    5001: 111,
-                    5002: 222
-                },
-                usernames={},
-            )
+        with patch("services.broadcast.get_session",
+                   return_value=mock_session_cm):
+            await register_announce_topics(sent_message_ids={
+                5001: 111,
+                5002: 222
+            })
 
         from sqlalchemy import select
 
@@ -0,0 +1,84 @@
+"""Tests for BalancePolicy balance reservations."""
+
+from decimal import Decimal
+from unittest.mock import AsyncMock
+from unittest.mock import patch
+
+import pytest
+from services.balance_policy import BalancePolicy
+from services.balance_policy import BalanceReservation
+
+
+class TestReservations:
+    """Tests for reserve / release / reservation_scope."""
+
+    @pytest.mark.asyncio
+    async def test_reserve_held(self):
+        """Held reservation allows the request."""
+        policy = BalancePolicy(min_balance_for_request=Decimal("0"))
+        reservation = BalanceReservation(user_id=123)
+
+        with patch("services.balance_policy.reserve_balance",
+                   return_value=(True, Decimal("0.4"))) as reserve:
+            result = await policy.reserve(reservation, Decimal("0.1"))
+
+        reserve.assert_awaited_once_with(123, reservation.id, Decimal("0.1"),
+                                         Decimal("0"))
+        assert result.allowed
+        assert result.source == "reservation"
+        assert reservation.held
+        assert reservation.amount == Decimal("0.1")
+
+    @pytest.mark.asyncio
+    async def test_reserve_refused(self):
+        """Balance taken by concurrent reservations blocks the request."""
+        policy = BalancePolicy()
+        reservation = BalanceReservation(user_id=123)
+
+        with patch("services.balance_policy.reserve_balance",
+                   return_value=(False, Decimal("-0.2"))):
+            result = await policy.reserve(reservation, Decimal("0.1"))
+
+        assert not result.allowed
+        assert result.balance == Decimal("-0.2")
+        assert not reservation.held
+
+    @pytest.mark.asyncio
+    async def test_reserve_fails_open(self):
+        """Uncached user or no Redis: allowed, nothing held."""
+        policy = BalancePolicy()
+        reservation = BalanceReservation(user_id=123)
+
+        with patch("services.balance_policy.reserve_balance",
+                   return_value=None):
+            result = await policy.reserve(reservation, Decimal("0.1"))
+
+        assert result.allowed
+        assert not reservation.held
+
+    @pytest.mark.asyncio
+    async def test_scope_releases_unsettled(self):
+        """Exiting the scope releases a reservation still held."""
+        policy = BalancePolicy()
+
+        with patch("services.balance_policy.release_reservation",
+                   new_callable=AsyncMock) as release:
+            with pytest.raises(RuntimeError):
+                async with policy.reservation_scope(123) as reservation:
+                    reservation.held = True
+                    raise RuntimeError("generation failed")
+
+        release.assert_awaited_once_with(123, reservation.id)
+        assert not reservation.held
+
+    @pytest.mark.asyncio
+    async def test_scope_skips_settled(self):
+        """Settled reservation (held cleared by the charge) isn't released."""
+        policy = BalancePolicy()
+
+        with patch("services.balance_policy.release_reservation",
+                   new_callable=AsyncMock) as release:
+            async with policy.reservation_scope(123):
+                pass
+
+        release.assert_not_awaited()
@@ -7,6 +7,7 @@ from decimal import Decimal
 import random
 from unittest.mock import AsyncMock, patch
 
+from cache.write_behind import WriteType
 from db.models.balance_operation import BalanceOperation
 from db.models.balance_operation import OperationType
 from db.models.payment import \
@@ -17,6 +18,7 @@ from db.repositories.balance_operation_repository import \
     BalanceOperationRepository
 from db.repositories.user_repository import UserRepository
 import pytest
+from services.balance_policy import BalanceReservation
 from services.balance_service import BalanceService
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
@@ -464,7 +466,7 @@ class TestChargeUserIntegrityRetry:
 
         service = BalanceService(session, user_repo, balance_op_repo)
 
-        with patch("services.balance_service.update_cached_balance"):
+        with patch("services.balance_service.adjust_cached_balance"):
             balance = await service.charge_user(
                 user_id=123,
                 amount=Decimal("0.05"),
@@ -505,3 +507,90 @@ class TestChargeUserIntegrityRetry:
                 amount=Decimal("0.05"),
                 description="Test charge",
             )
+
+
+class TestChargeUserReservation:
+    """Test charge_user settling a Redis balance reservation."""
+
+    @pytest.mark.asyncio
+    async def test_settled_charge_is_queued(self):
+        """Held reservation: Redis deducts, DB write goes to the queue."""
+        session = AsyncMock()
+        user_repo = AsyncMock()
+        service = BalanceService(session, user_repo, AsyncMock())
+        reservation = BalanceReservation(user_id=123, held=True)
+
+        with patch("services.balance_service.settle_reservation",
+                   return_value=(Decimal("1.0000"), Decimal("0.9000"))) as \
+                settle, \
+                patch("services.balance_service.queue_write",
+                      return_value=True) as queue:
+            balance = await service.charge_user(
+                user_id=123,
+                amount=Decimal("0.1"),
+                description="Test charge",
+                reservation=reservation,
+            )
+
+        assert balance == Decimal("0.9000")
+        settle.assert_awaited_once_with(123, reservation.id, Decimal("0.1"))
+        assert queue.call_args.args[0] == WriteType.BALANCE_CHARGE
+        assert queue.call_args.args[1]["amount"] == "0.1"
+        assert not reservation.held
+        user_repo.get_by_id_for_update.assert_not_awaited()
+        session.commit.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_uncached_user_charges_database(self):
+        """Settle miss (user not cached): locked DB charge as before."""
+        session = AsyncMock()
+        user_repo = AsyncMock()
+        mock_user = AsyncMock()
+        mock_user.balance = Decimal("5.0000")
+        user_repo.get_by_id_for_update.return_value = mock_user
+        service = BalanceService(session, user_repo, AsyncMock())
+        reservation = BalanceReservation(user_id=123, held=True)
+
+        with patch("services.balance_service.settle_reservation",
+                   return_value=None), \
+                patch("services.balance_service.queue_write") as queue, \
+                patch("services.balance_service.adjust_cached_balance") as \
+                update_cache:
+            balance = await service.charge_user(
+                user_id=123,
+                amount=Decimal("0.05"),
+                description="Test charge",
+                reservation=reservation,
+            )
+
+        assert balance == Decimal("4.9500")
+        queue.assert_not_called()
+        session.commit.assert_awaited_once()
+        update_cache.assert_awaited_once_with(123, Decimal("-0.05"))
+
+    @pytest.mark.asyncio
+    async def test_queue_failure_skips_cache_update(self):
+        """Settled but not queued: DB charged directly, cache left as is."""
+        session = AsyncMock()
+        user_repo = AsyncMock()
+        mock_user = AsyncMock()
+        mock_user.balance = Decimal("5.0000")
+        user_repo.get_by_id_for_update.return_value = mock_user
+        service = BalanceService(session, user_repo, AsyncMock())
+        reservation = BalanceReservation(user_id=123, held=True)
+
+        with patch("services.balance_service.settle_reservation",
+                   return_value=(Decimal("5.0000"), Decimal("4.9500"))), \
+                patch("services.balance_service.queue_write",
+                      return_value=False), \
+                patch("services.balance_service.adjust_cached_balance") as \
+                update_cache:
+            await service.charge_user(
+                user_id=123,
+                amount=Decimal("0.05"),
+                description="Test charge",
+                reservation=reservation,
+            )
+
+        session.commit.assert_awaited_once()
+        update_cache.assert_not_awaited()
@@ -0,0 +1,300 @@
+"""Tests for services.broadcast (resumable /announce engine)."""
+
+import asyncio
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from aiogram.exceptions import TelegramRetryAfter
+from cache.codec import encode
+from cache.keys import BROADCAST_ACTIVE_KEY
+from cache.keys import broadcast_delivered_key
+from cache.keys import broadcast_failed_key
+from cache.keys import broadcast_meta_key
+import pytest
+from services.broadcast import Broadcast
+from services.broadcast import BroadcastEngine
+from services.broadcast import BroadcastRateLimiter
+
+
+class FakeClock:
+    """Manual monotonic clock; sleeping advances it."""
+
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def make_bot() -> Mock:
+    """Bot mock with the methods the engine uses."""
+    bot = Mock()
+    bot.copy_message = AsyncMock(return_value=Mock(message_id=1))
+    bot.forward_message = AsyncMock()
+    bot.edit_message_text = AsyncMock()
+    bot.send_document = AsyncMock()
+    return bot
+
+
+def make_engine(**kwargs) -> BroadcastEngine:
+    """Engine without rate delays."""
+    kwargs.setdefault("limiter", BroadcastRateLimiter(rate=1e6))
+    kwargs.setdefault("progress_interval", 0.01)
+    return BroadcastEngine(**kwargs)
+
+
+def make_broadcast(**kwargs) -> Broadcast:
+    """Broadcast with explicit targets."""
+    defaults = dict(id="b1",
+                    admin_user_id=1,
+                    lang="en",
+                    source_chat_id=100,
+                    source_message_id=42,
+                    progress_chat_id=100,
+                    progress_message_id=43,
+                    total=3,
+                    target_ids=[1001, 1002, 1003])
+    defaults.update(kwargs)
+    return Broadcast(**defaults)
+
+
+@pytest.fixture
+def no_side_effects():
+    """No Redis, no topic registration."""
+    with patch("services.broadcast.get_redis",
+               new_callable=AsyncMock,
+               return_value=None), \
+            patch("services.broadcast.register_announce_topics",
+                  new_callable=AsyncMock):
+        yield
+
+
+class TestBroadcastRateLimiter:
+    """Tests for BroadcastRateLimiter."""
+
+    @pytest.mark.asyncio
+    async def test_spaces_sends_by_rate(self):
+        """Slots are 1/rate apart."""
+        clock = FakeClock()
+        limiter = BroadcastRateLimiter(rate=10, clock=clock)
+        with patch("services.broadcast.asyncio.sleep", clock.sleep):
+            start = clock.now
+            for _ in range(5):
+                await limiter.acquire()
+
+        assert clock.now - start == pytest.approx(0.4)
+
+    @pytest.mark.asyncio
+    async def test_flood_pauses_and_halves_rate(self):
+        """RetryAfter blocks all callers and halves the rate."""
+        clock = FakeClock()
+        limiter = BroadcastRateLimiter(rate=20, min_rate=4, clock=clock)
+        limiter.on_flood(3)
+        with patch("services.broadcast.asyncio.sleep", clock.sleep):
+            start = clock.now
+            await limiter.acquire()
+
+        assert clock.now - start == pytest.approx(3)
+        assert limiter.rate == 10
+        limiter.on_flood(1)
+        limiter.on_flood(1)
+        assert limiter.rate == 4  # Floor
+
+    def test_success_recovers_rate(self):
+        """Successes restore the rate up to the configured maximum."""
+        limiter = BroadcastRateLimiter(rate=20, min_rate=1)
+        limiter.on_flood(0)
+        for _ in range(100):
+            limiter.on_success()
+        assert limiter.rate == 20
+
+
+@pytest.mark.usefixtures("no_side_effects")
+class TestBroadcastEngine:
+    """Tests for BroadcastEngine delivery."""
+
+    @pytest.mark.asyncio
+    async def test_retry_after_retries_and_succeeds(self):
+        """TelegramRetryAfter backs off and retries the target."""
+        bot = make_bot()
+        bot.copy_message.side_effect = [
+            TelegramRetryAfter(retry_after=0, method="copy", message="Flood"),
+            Mock(message_id=1),
+        ]
+        engine = make_engine()
+        broadcast = make_broadcast(target_ids=[1001], total=1)
+
+        await engine._run(bot, broadcast)  # pylint: disable=protected-access
+
+        assert broadcast.delivered == {1001}
+        assert not broadcast.failed
+        assert engine._limiter.rate < 1e6  # pylint: disable=protected-access
+
+    @pytest.mark.asyncio
+    async def test_retry_after_exhaustion(self):
+        """TelegramRetryAfter on every attempt fails the target."""
+        bot = make_bot()
+        bot.copy_message.side_effect = TelegramRetryAfter(retry_after=0,
+                                                          method="copy",
+                                                          message="Flood")
+        engine = make_engine(max_retries=2)
+        broadcast = make_broadcast(target_ids=[1001], total=1)
+
+        await engine._run(bot, broadcast)  # pylint: disable=protected-access
+
+        assert "Flood control" in broadcast.failed[1001]
+        assert bot.copy_message.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_pages_advance_checkpoint(self):
+        """Each page moves the checkpoint to its last target."""
+        bot = make_bot()
+        engine = make_engine(page_size=2)
+        broadcast = make_broadcast(target_ids=[5, 1, 3], total=3)
+        broadcast.target_ids = sorted(broadcast.target_ids)
+
+        await engine._run(bot, broadcast)  # pylint: disable=protected-access
+
+        assert broadcast.checkpoint == 5
+        assert broadcast.delivered == {1, 3, 5}
+        bot.send_document.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_all_users_pages_from_repository(self):
+        """target_ids=None reads user IDs page by page after checkpoint."""
+        bot = make_bot()
+        engine = make_engine(page_size=2)
+        broadcast = make_broadcast(target_ids=None, total=3)
+        pages = {0: [1, 2], 2: [3], 3: []}
+        repo = Mock()
+        repo.get_user_ids_after = AsyncMock(
+            side_effect=lambda after, limit: pages[after])
+        repo.get_usernames = AsyncMock(return_value={1: "alice"})
+        session_cm = MagicMock()
+        session_cm.__aenter__ = AsyncMock()
+        session_cm.__aexit__ = AsyncMock(return_value=False)
+
+        with patch("services.broadcast.get_session", return_value=session_cm), \
+                patch("services.broadcast.UserRepository", return_value=repo):
+            await engine._run(bot, broadcast)  # pylint: disable=protected-access
+
+        assert broadcast.delivered == {1, 2, 3}
+        assert [c.args[0] for c in repo.get_user_ids_after.call_args_list
+               ] == [0, 2, 3]
+        report = bot.send_document.call_args.args[1].data.decode()
+        assert '1 "@alice"' in report
+
+
+class TestBroadcastPersistence:
+    """Tests for Redis state and resume."""
+
+    @pytest.mark.asyncio
+    async def test_resume_skips_finished_targets(self):
+        """Resumed broadcast continues after checkpoint, skipping done IDs."""
+        broadcast = make_broadcast(target_ids=[1001, 1002, 1003, 1004],
+                                   total=4,
+                                   checkpoint=1001)
+        redis = AsyncMock()
+        sets = {
+            BROADCAST_ACTIVE_KEY: {b"b1"},
+            broadcast_delivered_key("b1"): {b"1001", b"1002"},
+        }
+        redis.smembers = AsyncMock(side_effect=lambda key: sets[key])
+        redis.get = AsyncMock(return_value=encode(broadcast.meta()))
+        redis.hgetall = AsyncMock(return_value={b"1003": b"Bot blocked"})
+        redis.pipeline = MagicMock(return_value=MagicMock(execute=AsyncMock()))
+        bot = make_bot()
+        engine = make_engine()
+
+        with patch("services.broadcast.get_redis",
+                   new_callable=AsyncMock,
+                   return_value=redis), \
+                patch("services.broadcast.register_announce_topics",
+                      new_callable=AsyncMock):
+            assert await engine.resume(bot) == 1
+            await engine.join()
+
+        # Only 1004 was left to send
+        assert [c.kwargs["chat_id"] for c in bot.copy_message.call_args_list
+               ] == [1004]
+        redis.sadd.assert_called_with(broadcast_delivered_key("b1"), 1004)
+        report = bot.send_document.call_args.args[1].data.decode()
+        assert "Delivered: 3" in report
+        assert "1003: Bot blocked" in report
+
+    @pytest.mark.asyncio
+    async def test_start_registers_active_and_retires(self):
+        """Start adds to the active set; finishing removes it, keys expire."""
+        pipe = MagicMock(execute=AsyncMock())
+        redis = AsyncMock()
+        redis.pipeline = MagicMock(return_value=pipe)
+        bot = make_bot()
+        engine = make_engine()
+
+        with patch("services.broadcast.get_redis",
+                   new_callable=AsyncMock,
+                   return_value=redis), \
+                patch("services.broadcast.register_announce_topics",
+                      new_callable=AsyncMock):
+            broadcast = await engine.start(
+                bot,
+                admin_user_id=1,
+                lang="en",
+                source_chat_id=100,
+                source_message_id=42,
+                progress_message=Mock(chat=Mock(id=100), message_id=43),
+                total=1,
+                target_ids=[1001],
+                usernames={})
+            await engine.join()
+
+        pipe.sadd.assert_called_once_with(BROADCAST_ACTIVE_KEY, broadcast.id)
+        pipe.srem.assert_called_once_with(BROADCAST_ACTIVE_KEY, broadcast.id)
+        expired = {c.args[0] for c in pipe.expire.call_args_list}
+        assert expired == {
+            broadcast_meta_key(broadcast.id),
+            broadcast_delivered_key(broadcast.id),
+            broadcast_failed_key(broadcast.id),
+        }
+
+    @pytest.mark.asyncio
+    async def test_failed_broadcast_retired(self):
+        """A broadcast that fails leaves the active set; no report is sent."""
+        pipe = MagicMock(execute=AsyncMock())
+        redis = AsyncMock()
+        redis.pipeline = MagicMock(return_value=pipe)
+        bot = make_bot()
+        engine = make_engine()
+
+        with patch("services.broadcast.get_redis",
+                   new_callable=AsyncMock,
+                   return_value=redis), \
+                patch.object(engine, "_next_page",
+                             AsyncMock(side_effect=RuntimeError("db down"))):
+            await engine._run(bot, make_broadcast())  # pylint: disable=protected-access
+
+        pipe.srem.assert_called_once_with(BROADCAST_ACTIVE_KEY, "b1")
+        bot.send_document.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_suspended_broadcast_stays_active(self):
+        """Cancellation (shutdown) keeps the broadcast for resume()."""
+        pipe = MagicMock(execute=AsyncMock())
+        redis = AsyncMock()
+        redis.pipeline = MagicMock(return_value=pipe)
+        engine = make_engine()
+
+        with patch("services.broadcast.get_redis",
+                   new_callable=AsyncMock,
+                   return_value=redis), \
+                patch.object(engine, "_next_page",
+                             AsyncMock(side_effect=asyncio.CancelledError)):
+            with pytest.raises(asyncio.CancelledError):
+                await engine._run(make_bot(), make_broadcast())  # pylint: disable=protected-access
+
+        pipe.srem.assert_not_called()
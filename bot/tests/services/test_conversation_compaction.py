@@ -0,0 +1,298 @@
+"""Tests for services/conversation_compaction.py - client-side compaction.
+
+Tests boundary selection, transcript building, scheduling rules and the
+compaction flow with mocked LLM, repository and billing.
+
+NO __init__.py - use direct import:
+    pytest tests/services/test_conversation_compaction.py
+"""
+
+import asyncio
+from decimal import Decimal
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from core.models import TokenUsage
+from db.models.message import MessageRole
+import pytest
+from services.conversation_compaction import build_transcript
+from services.conversation_compaction import ConversationCompactionService
+from services.conversation_compaction import estimate_tokens
+from services.conversation_compaction import get_compaction_service
+from services.conversation_compaction import select_compaction_boundary
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+
+def _make_history(count: int, chars: int = 400) -> list:
+    """Create alternating user/assistant mock messages."""
+    history = []
+    for idx in range(count):
+        msg = MagicMock()
+        msg.chat_id = 1
+        msg.message_id = 100 + idx
+        msg.role = MessageRole.USER if idx % 2 == 0 else MessageRole.ASSISTANT
+        msg.text_content = f"{idx}:" + "x" * chars
+        msg.caption = None
+        msg.compaction_summary = None
+        history.append(msg)
+    return history
+
+
+@pytest.fixture
+def compaction_config():
+    """Small thresholds for tests."""
+    with patch("services.conversation_compaction.config") as mock_config:
+        mock_config.COMPACTION_ENABLED = True
+        mock_config.COMPACTION_TRIGGER_TOKENS = 1000
+        mock_config.COMPACTION_KEEP_RECENT_TOKENS = 500
+        mock_config.COMPACTION_MIN_MESSAGES = 2
+        mock_config.COMPACTION_MSG_TRUNCATE = 1000
+        mock_config.COMPACTION_MAX_INPUT_CHARS = 100_000
+        mock_config.COMPACTION_MAX_TOKENS = 256
+        mock_config.COMPACTION_MODEL_CLAUDE = "claude:haiku"
+        mock_config.COMPACTION_MODEL_GOOGLE = "google:flash-lite"
+        yield mock_config
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+
+class TestEstimateTokens:
+    """Tests for estimate_tokens()."""
+
+    def test_string(self):
+        """String content is chars / 4."""
+        assert estimate_tokens("a" * 400) == 100
+
+    def test_blocks(self):
+        """Text blocks are counted, non-text blocks contribute little."""
+        blocks = [{"type": "text", "text": "a" * 400}, {"type": "image"}]
+        assert estimate_tokens(blocks) == 100
+
+
+class TestSelectBoundary:
+    """Tests for select_compaction_boundary()."""
+
+    def test_tail_fits_keep_budget(self, compaction_config):
+        """Earliest boundary whose tail fits the keep budget is chosen."""
+        # 20 messages x ~100 tokens; keep budget 500 -> tail of <= 5 messages
+        history = _make_history(20)
+        boundary = select_compaction_boundary(history)
+
+        assert history[boundary].role == MessageRole.ASSISTANT
+        tail = history[boundary - 1:]
+        assert sum(estimate_tokens(m.text_content) for m in tail) <= 500
+        assert len(tail) >= 4
+
+    def test_short_history_not_compacted(self, compaction_config):
+        """Too few older messages -> nothing to compact."""
+        assert select_compaction_boundary(_make_history(3)) is None
+
+    def test_existing_summary_not_reused_as_boundary(self, compaction_config):
+        """Message that already has a summary is never a new boundary."""
+        history = _make_history(4, chars=4000)
+        history[3].compaction_summary = "old"
+        assert select_compaction_boundary(history) is None
+
+
+class TestBuildTranscript:
+    """Tests for build_transcript()."""
+
+    def test_includes_previous_summary_and_roles(self, compaction_config):
+        """Previous summary is merged, roles are labeled."""
+        transcript = build_transcript(_make_history(2, chars=5),
+                                      previous_summary="Earlier stuff")
+
+        assert "<previous_summary>\nEarlier stuff" in transcript
+        assert "User: 0:xxxxx" in transcript
+        assert "Assistant: 1:xxxxx" in transcript
+
+    def test_truncates_long_messages(self, compaction_config):
+        """Messages over COMPACTION_MSG_TRUNCATE are cut."""
+        transcript = build_transcript(_make_history(1, chars=5000))
+        assert "[...]" in transcript
+        assert len(transcript) < 1200
+
+
+# =============================================================================
+# Service
+# =============================================================================
+
+
+class TestNeedsCompaction:
+    """Tests for needs_compaction()."""
+
+    def test_below_threshold(self, compaction_config):
+        """Small contexts are not compacted."""
+        service = ConversationCompactionService()
+        assert service.needs_compaction("google:flash", 999) is False
+
+    def test_non_native_model_above_threshold(self, compaction_config):
+        """Models without server-side compaction are compacted."""
+        service = ConversationCompactionService()
+        assert service.needs_compaction("google:flash", 5000) is True
+        assert service.needs_compaction("claude:sonnet", 5000) is True
+
+    def test_native_model_skipped(self, compaction_config):
+        """Opus (server-side compaction) is left to the API."""
+        service = ConversationCompactionService()
+        assert service.needs_compaction("claude:opus", 5000) is False
+
+    def test_disabled(self, compaction_config):
+        """Feature flag disables compaction."""
+        compaction_config.COMPACTION_ENABLED = False
+        service = ConversationCompactionService()
+        assert service.needs_compaction("google:flash", 5000) is False
+
+
+class TestSchedule:
+    """Tests for schedule()."""
+
+    @pytest.mark.asyncio
+    async def test_one_task_per_thread(self, compaction_config):
+        """Second schedule for the same thread is ignored while running."""
+        service = ConversationCompactionService()
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def fake_run(*_args):
+            started.set()
+            await release.wait()
+            service._in_progress.discard(7)
+
+        with patch.object(service, "_run", side_effect=fake_run):
+            assert service.schedule(7, 1, "google:flash", 5000) is True
+            assert service.schedule(7, 1, "google:flash", 5000) is False
+            await started.wait()
+            release.set()
+            await asyncio.gather(*service._tasks)
+
+        assert 7 not in service._in_progress
+
+
+class TestCompactThread:
+    """Tests for compact_thread()."""
+
+    @pytest.mark.asyncio
+    async def test_summary_stored_and_user_charged(self, compaction_config):
+        """Summary is saved on boundary message and cost is charged."""
+        service = ConversationCompactionService()
+        history = _make_history(20)
+        history[1].compaction_summary = "previous"
+
+        mock_repo = MagicMock()
+        mock_repo.get_thread_messages = AsyncMock(return_value=history)
+        mock_repo.set_compaction_summary = AsyncMock()
+        mock_services = MagicMock()
+        mock_services.balance.charge_user = AsyncMock(
+            return_value=Decimal("9.99"))
+        session = AsyncMock()
+
+        with patch("services.conversation_compaction.MessageRepository",
+                   return_value=mock_repo), \
+                patch("services.conversation_compaction.ServiceFactory",
+                      return_value=mock_services), \
+                patch("services.conversation_compaction.invalidate_messages",
+                      new_callable=AsyncMock) as mock_invalidate, \
+                patch.object(service, "summarize",
+                             new_callable=AsyncMock,
+                             return_value=("SUMMARY",
+                                           TokenUsage(input_tokens=1000,
+                                                      output_tokens=100))
+                            ) as mock_summarize:
+            summary = await service.compact_thread(session, 5, 42,
+                                                   "google:flash")
+
+        assert summary == "SUMMARY"
+        mock_repo.get_thread_messages.assert_awaited_once_with(
+            5, since_compaction=True)
+        summarizer, transcript = mock_summarize.call_args[0]
+        assert summarizer == "google:flash-lite"
+        assert "<previous_summary>\nprevious" in transcript
+
+        chat_id, message_id, stored = (
+            mock_repo.set_compaction_summary.call_args[0])
+        assert (chat_id, stored) == (1, "SUMMARY")
+        boundary = message_id - 100
+        assert history[boundary].role == MessageRole.ASSISTANT
+        mock_invalidate.assert_awaited_once_with(5)
+
+        charge = mock_services.balance.charge_user.call_args[1]
+        assert charge["user_id"] == 42
+        assert charge["amount"] > 0
+
+    @pytest.mark.asyncio
+    async def test_zero_cost_not_charged(self, compaction_config):
+        """Summarizer without usage data is not charged."""
+        service = ConversationCompactionService()
+        mock_repo = MagicMock()
+        mock_repo.get_thread_messages = AsyncMock(
+            return_value=_make_history(20))
+        mock_repo.set_compaction_summary = AsyncMock()
+        mock_services = MagicMock()
+        mock_services.balance.charge_user = AsyncMock()
+
+        with patch("services.conversation_compaction.MessageRepository",
+                   return_value=mock_repo), \
+                patch("services.conversation_compaction.ServiceFactory",
+                      return_value=mock_services), \
+                patch("services.conversation_compaction.invalidate_messages",
+                      new_callable=AsyncMock), \
+                patch.object(service, "summarize",
+                             new_callable=AsyncMock,
+                             return_value=("SUMMARY", TokenUsage(
+                                 input_tokens=0, output_tokens=0))):
+            summary = await service.compact_thread(AsyncMock(), 5, 42,
+                                                   "google:flash")
+
+        assert summary == "SUMMARY"
+        mock_services.balance.charge_user.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_nothing_to_compact(self, compaction_config):
+        """Short history skips the LLM call."""
+        service = ConversationCompactionService()
+        mock_repo = MagicMock()
+        mock_repo.get_thread_messages = AsyncMock(
+            return_value=_make_history(2))
+
+        with patch("services.conversation_compaction.MessageRepository",
+                   return_value=mock_repo), \
+                patch.object(service, "summarize",
+                             new_callable=AsyncMock) as mock_summarize:
+            result = await service.compact_thread(AsyncMock(), 5, 42,
+                                                  "claude:sonnet")
+
+        assert result is None
+        mock_summarize.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_claude_summarizer(self, compaction_config):
+        """Claude users are summarized with Haiku via Anthropic client."""
+        service = ConversationCompactionService()
+        response = MagicMock()
+        response.content = [MagicMock(text=" Summary ")]
+        response.usage = MagicMock(input_tokens=10, output_tokens=5)
+        client = AsyncMock()
+        client.messages.create = AsyncMock(return_value=response)
+
+        with patch(
+                "services.conversation_compaction.get_anthropic_async_client",
+                return_value=client):
+            summary, usage = await service.summarize("claude:haiku",
+                                                     "transcript")
+
+        assert summary == "Summary"
+        assert usage.input_tokens == 10
+        assert client.messages.create.call_args[1]["max_tokens"] == 256
+
+
+def test_singleton():
+    """get_compaction_service returns the same instance."""
+    assert get_compaction_service() is get_compaction_service()
@@ -0,0 +1,194 @@
+"""Tests for operational metrics collector.
+
+Tests incremental directory sizing, the in-memory aggregate tracker and
+collector scheduling.
+"""
+
+import os
+from unittest.mock import AsyncMock
+from unittest.mock import patch
+
+import pytest
+from services.metrics_collector import AggregateTracker
+from services.metrics_collector import DirectorySizeCache
+from services.metrics_collector import DiskUsageCollector
+from services.metrics_collector import MetricsCollector
+
+MODULE = "services.metrics_collector"
+
+
+def _write(path, size: int) -> None:
+    """Write file of given size, creating parent directories."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+
+
+class TestDirectorySizeCache:
+    """Tests for DirectorySizeCache."""
+
+    def test_size_recursive(self, tmp_path):
+        """Sums files in all subdirectories."""
+        _write(tmp_path / "a.bin", 100)
+        _write(tmp_path / "sub" / "b.bin", 50)
+        _write(tmp_path / "sub" / "deep" / "c.bin", 25)
+
+        assert DirectorySizeCache().size(str(tmp_path)) == 175
+
+    def test_missing_root(self):
+        """Nonexistent root measures as 0."""
+        assert DirectorySizeCache().size("/nonexistent/path/xyz") == 0
+
+    def test_unchanged_directories_reused(self, tmp_path):
+        """Second pass reuses all directory scans."""
+        _write(tmp_path / "sub" / "b.bin", 50)
+        cache = DirectorySizeCache()
+        cache.size(str(tmp_path))
+
+        assert cache.size(str(tmp_path)) == 50
+        assert cache.last_scanned == 0
+        assert cache.last_reused == 2
+
+    def test_new_file_detected(self, tmp_path):
+        """Adding a file rescans only its directory."""
+        _write(tmp_path / "one" / "a.bin", 10)
+        _write(tmp_path / "two" / "b.bin", 20)
+        cache = DirectorySizeCache()
+        cache.size(str(tmp_path))
+
+        _write(tmp_path / "two" / "c.bin", 30)
+        os.utime(tmp_path / "two", ns=(0, 10**18))  # coarse mtime safety
+
+        assert cache.size(str(tmp_path)) == 60
+        assert cache.last_scanned == 1
+
+    def test_removed_directory_forgotten(self, tmp_path):
+        """Deleted subdirectories drop out of the total and the cache."""
+        _write(tmp_path / "gone" / "a.bin", 10)
+        cache = DirectorySizeCache()
+        cache.size(str(tmp_path))
+
+        os.remove(tmp_path / "gone" / "a.bin")
+        os.rmdir(tmp_path / "gone")
+        os.utime(tmp_path, ns=(0, 10**18))
+
+        assert cache.size(str(tmp_path)) == 0
+        assert str(tmp_path / "gone") not in cache._dirs
+
+    def test_full_rescan_catches_in_place_growth(self, tmp_path):
+        """Files growing in an unchanged directory show up after rescan."""
+        _write(tmp_path / "wal", 10)
+        mtime = os.stat(tmp_path).st_mtime_ns
+        cache = DirectorySizeCache(full_rescan_interval=0)
+        cache.size(str(tmp_path))
+
+        with open(tmp_path / "wal", "ab") as f:
+            f.write(b"y" * 5)
+        os.utime(tmp_path, ns=(mtime, mtime))
+
+        assert cache.size(str(tmp_path)) == 15
+
+
+class TestDiskUsageCollector:
+    """Tests for DiskUsageCollector."""
+
+    @pytest.mark.asyncio
+    async def test_sets_gauges(self, tmp_path):
+        """Per-volume and total gauges are published."""
+        _write(tmp_path / "pg" / "data", 100)
+        _write(tmp_path / "loki" / "chunk", 40)
+        collector = DiskUsageCollector({
+            "postgres": str(tmp_path / "pg"),
+            "loki": str(tmp_path / "loki"),
+        })
+
+        with patch(f"{MODULE}.set_disk_usage") as mock_set:
+            await collector()
+
+        mock_set.assert_any_call("postgres", 100)
+        mock_set.assert_any_call("loki", 40)
+        mock_set.assert_any_call("total", 140)
+
+
+class TestAggregateTracker:
+    """Tests for AggregateTracker."""
+
+    def test_active_users_window(self):
+        """Users outside the 1h window are pruned."""
+        tracker = AggregateTracker()
+        tracker.user_active(1, at=10_000)
+        tracker.user_active(2, at=13_000)
+        tracker.user_active(1, at=9_000)  # older event doesn't regress
+
+        assert tracker.active_users(now=13_500) == 2
+        assert tracker.active_users(now=14_000 + 1) == 1
+
+    def test_active_files_expire(self):
+        """Files stop counting once expired."""
+        tracker = AggregateTracker()
+        tracker.seed(last_seen={}, file_expiries=[100.0, 300.0], user_stats={})
+        tracker.file_created(200.0)
+
+        assert tracker.active_files(now=50) == 3
+        assert tracker.active_files(now=250) == 1
+        assert tracker.active_files(now=300) == 0
+
+    def test_top_users_from_absolute_totals(self):
+        """Top users reflect the latest absolute totals."""
+        tracker = AggregateTracker()
+        tracker.seed(last_seen={},
+                     file_expiries=[],
+                     user_stats={
+                         1: ("a", 100, 1000),
+                         2: ("b", 50, 9000),
+                     })
+        tracker.user_stats(3, "c", 120, 10)
+
+        assert [u[0] for u in tracker.top_users("messages")] == ["3", "1", "2"]
+        assert [u[0] for u in tracker.top_users("tokens")] == ["2", "1", "3"]
+
+    def test_prune_keeps_candidates(self):
+        """Pruning keeps top candidates of both metrics."""
+        tracker = AggregateTracker(tracked_users=1)
+        tracker.user_stats(1, "msgs", 100, 0)
+        tracker.user_stats(2, "tokens", 0, 100)
+        tracker.user_stats(3, "low", 1, 1)
+
+        with patch(f"{MODULE}.set_top_users"), \
+                patch(f"{MODULE}.set_active_users"), \
+                patch(f"{MODULE}.set_active_files"):
+            tracker.publish(now=0)
+
+        assert set(tracker._user_stats) == {1, 2}
+
+
+class TestMetricsCollector:
+    """Tests for MetricsCollector scheduling."""
+
+    @pytest.mark.asyncio
+    async def test_runs_on_interval(self):
+        """Collector runs at most once per interval."""
+        collect = AsyncMock()
+        collector = MetricsCollector(tick=10)
+        collector.add("disk", 60, collect)
+
+        await collector.collect_due(now=0)
+        await collector.collect_due(now=30)
+        await collector.collect_due(now=60)
+
+        assert collect.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failure_isolated_and_timed(self):
+        """A failing collector doesn't stop others; both are timed."""
+        ok = AsyncMock()
+        collector = MetricsCollector()
+        collector.add("broken", 10, AsyncMock(side_effect=RuntimeError("x")))
+        collector.add("pool", 10, ok)
+
+        with patch(f"{MODULE}.record_metrics_collection") as mock_record:
+            await collector.collect_due(now=0)
+
+        ok.assert_awaited_once()
+        recorded = [c.args[0] for c in mock_record.call_args_list]
+        assert recorded == ["broken", "pool"]
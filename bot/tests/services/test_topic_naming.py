@@ -230,8 +230,6 @@ class TestMaybeNameTopic:
                    return_value=mock_anthropic_client), \
              patch("services.topic_naming.ServiceFactory",
                    return_value=mock_service_factory), \
-             patch("services.topic_naming.update_cached_balance",
-                   new_callable=AsyncMock) as mock_update_cache, \
              patch("services.topic_naming.record_llm_request"), \
              patch("services.topic_naming.record_llm_tokens"), \
              patch("services.topic_naming.record_cost"), \
@@ -257,12 +255,9 @@ class TestMaybeNameTopic:
             name="Test Topic Title",
         )
 
-        # Verify user was charged
+        # Verify user was charged (charge_user updates the cached balance)
         mock_service_factory.balance.charge_user.assert_called_once()
 
-        # Verify cache was updated
-        mock_update_cache.assert_called_once()
-
     @pytest.mark.asyncio
     async def test_maybe_name_topic_skip_if_not_needed(self,
                                                        topic_naming_service,
@@ -336,8 +331,6 @@ class TestMaybeNameTopic:
                    return_value=mock_anthropic_client), \
              patch("services.topic_naming.ServiceFactory",
                    return_value=mock_service_factory), \
-             patch("services.topic_naming.update_cached_balance",
-                   new_callable=AsyncMock), \
              patch("services.topic_naming.record_llm_request"), \
              patch("services.topic_naming.record_llm_tokens"), \
              patch("services.topic_naming.record_cost"), \
@@ -396,8 +389,6 @@ class TestMaybeNameTopic:
                    return_value=mock_anthropic_client), \
              patch("services.topic_naming.ServiceFactory",
                    return_value=mock_service_factory), \
-             patch("services.topic_naming.update_cached_balance",
-                   new_callable=AsyncMock), \
              patch("services.topic_naming.record_llm_request") as mock_req, \
              patch("services.topic_naming.record_llm_tokens") as mock_tok, \
              patch("services.topic_naming.record_cost") as mock_cost, \
@@ -555,8 +546,6 @@ class TestTopicNamingEdgeCases:
                    return_value=mock_anthropic_client), \
              patch("services.topic_naming.ServiceFactory",
                    return_value=mock_service_factory), \
-             patch("services.topic_naming.update_cached_balance",
-                   new_callable=AsyncMock), \
              patch("services.topic_naming.record_llm_request"), \
              patch("services.topic_naming.record_llm_tokens"), \
              patch("services.topic_naming.record_cost"), \
@@ -0,0 +1,250 @@
+"""Tests for services/topic_prefilter.py - local topic relevance scoring.
+
+NO __init__.py - use direct import:
+    pytest tests/services/test_topic_prefilter.py
+"""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock
+from unittest.mock import patch
+
+import pytest
+from services.topic_prefilter import score_topics
+from services.topic_prefilter import TopicPrefilter
+from services.topic_relevance import RelevanceResult
+from services.topic_relevance import TopicContext
+from services.topic_relevance import TopicRelevanceService
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+
+@pytest.fixture
+def current_topic():
+    """Current topic about Python async."""
+    return TopicContext(
+        label="current",
+        thread_id=42,
+        internal_id=1,
+        title="Python async/await",
+        recent_user_messages=["What's async?", "Show asyncio example"],
+    )
+
+
+@pytest.fixture
+def other_topics():
+    """Other topics: React bug and recipes."""
+    return [
+        TopicContext(
+            label="A",
+            thread_id=10,
+            internal_id=2,
+            title="React rendering bug",
+            recent_user_messages=["Component not rendering", "Still broken"],
+        ),
+        TopicContext(
+            label="B",
+            thread_id=20,
+            internal_id=3,
+            title="Рецепты пасты",
+            recent_user_messages=["Как сварить пасту карбонара"],
+        ),
+    ]
+
+
+@pytest.fixture
+def prefilter():
+    """Prefilter with explicit thresholds."""
+    return TopicPrefilter(stay_min_score=0.35,
+                          resume_min_score=0.45,
+                          min_margin=0.25)
+
+
+# =============================================================================
+# Scoring
+# =============================================================================
+
+
+class TestScoreTopics:
+    """Tests for score_topics()."""
+
+    def test_scores_ordered_like_topics(self, current_topic, other_topics):
+        """Current score first, others in input order."""
+        score = score_topics("React component rendering twice", current_topic,
+                             other_topics)
+
+        assert len(score.others) == 2
+        assert score.others[0] > score.current
+        assert score.others[0] > score.others[1]
+
+    def test_inflected_words_match(self, current_topic, other_topics):
+        """Character trigrams match Russian word forms."""
+        score = score_topics("Рецепт пасты с грибами", current_topic,
+                             other_topics)
+        assert score.others[1] > 0.3
+
+    def test_only_stopwords_returns_none(self, current_topic, other_topics):
+        """Messages without content words cannot be scored."""
+        assert score_topics("what is this", current_topic, other_topics) is None
+
+
+# =============================================================================
+# Decisions
+# =============================================================================
+
+
+class TestDecide:
+    """Tests for TopicPrefilter.decide()."""
+
+    def test_confident_stay(self, prefilter, current_topic, other_topics):
+        """Strong match with current topic stays locally."""
+        decision, _ = prefilter.decide("asyncio gather vs await in python",
+                                       current_topic, other_topics)
+        assert decision.action == "stay"
+
+    def test_confident_resume(self, prefilter, current_topic, other_topics):
+        """Strong match with another topic resumes it locally."""
+        decision, _ = prefilter.decide("React rendering bug again",
+                                       current_topic, other_topics)
+        assert decision.action == "resume"
+        assert decision.target.thread_id == 10
+
+    def test_resume_from_general(self, prefilter, other_topics):
+        """From General only resume is possible."""
+        decision, score = prefilter.decide("React rendering bug again", None,
+                                           other_topics)
+        assert decision.action == "resume"
+        assert score.current == 0.0
+
+    def test_unrelated_goes_to_llm(self, prefilter, current_topic,
+                                   other_topics):
+        """No confident match defers to LLM."""
+        decision, _ = prefilter.decide("How do I configure Docker volumes?",
+                                       current_topic, other_topics)
+        assert decision is None
+
+    def test_ambiguous_goes_to_llm(self, prefilter, other_topics):
+        """Close scores between topics defer to LLM."""
+        ambiguous = TopicContext(label="C",
+                                 thread_id=30,
+                                 internal_id=4,
+                                 title="React rendering performance",
+                                 recent_user_messages=[])
+        decision, _ = prefilter.decide("React rendering question", None,
+                                       [other_topics[0], ambiguous])
+        assert decision is None
+
+    def test_short_message_goes_to_llm(self, prefilter, current_topic,
+                                       other_topics):
+        """Very short messages are never decided locally."""
+        decision, score = prefilter.decide("asyncio", current_topic,
+                                           other_topics)
+        assert decision is None
+        assert score is None
+
+
+# =============================================================================
+# Service integration
+# =============================================================================
+
+
+@pytest.fixture
+def service():
+    """TopicRelevanceService with mocked LLM (returns "stay")."""
+    svc = TopicRelevanceService(model="claude-haiku-test", max_tokens=60)
+    svc._check_with_llm = AsyncMock(return_value=RelevanceResult(
+        action="stay"))
+    return svc
+
+
+class TestServiceLocalPath:
+    """Tests for pre-filter and decision cache in check_relevance()."""
+
+    @pytest.mark.asyncio
+    async def test_local_decision_skips_llm(self, service, current_topic,
+                                            other_topics):
+        """Confident local decision does not call the LLM."""
+        with patch("services.topic_relevance.random.random", return_value=1.0):
+            result = await service.check_relevance("React rendering bug again",
+                                                   current_topic, other_topics)
+
+        assert result.action == "resume"
+        assert result.target_thread_id == 10
+        assert result.target_internal_id == 2
+        service._check_with_llm.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_prefilter_disabled_uses_llm(self, service, current_topic,
+                                               other_topics):
+        """Disabled pre-filter always asks the LLM."""
+        with patch("services.topic_relevance.config."
+                   "TOPIC_PREFILTER_ENABLED", False):
+            await service.check_relevance("React rendering bug again",
+                                          current_topic, other_topics)
+        service._check_with_llm.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_llm_decision_cached(self, service, current_topic,
+                                       other_topics):
+        """Repeated message with same topics hits the decision cache."""
+        message = "How do I configure Docker volumes?"
+        await service.check_relevance(message, current_topic, other_topics)
+        await service.check_relevance("  how do I configure docker volumes? ",
+                                      current_topic, other_topics)
+
+        service._check_with_llm.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_cache_keyed_by_topics(self, service, current_topic,
+                                         other_topics):
+        """Different candidate topics produce a different cache key."""
+        message = "How do I configure Docker volumes?"
+        await service.check_relevance(message, current_topic, other_topics)
+        await service.check_relevance(message, current_topic, other_topics[:1])
+
+        assert service._check_with_llm.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_cache_expires(self, service, current_topic, other_topics):
+        """Expired cache entries are not used."""
+        message = "How do I configure Docker volumes?"
+        await service.check_relevance(message, current_topic, other_topics)
+
+        with patch("services.topic_relevance.time.monotonic",
+                   return_value=time.monotonic() + 10_000):
+            await service.check_relevance(message, current_topic,
+                                          other_topics)
+
+        assert service._check_with_llm.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_fallback_not_cached(self, service, current_topic,
+                                       other_topics):
+        """LLM failure fallback is retried next time."""
+        service._check_with_llm.return_value = None
+        message = "How do I configure Docker volumes?"
+
+        result = await service.check_relevance(message, current_topic,
+                                               other_topics)
+        await service.check_relevance(message, current_topic, other_topics)
+
+        assert result.action == "stay"
+        assert service._check_with_llm.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_sampled_verification(self, service, current_topic,
+                                        other_topics):
+        """Sampled local decisions are verified by the LLM."""
+        with patch("services.topic_relevance.random.random",
+                   return_value=0.0), \
+                patch("services.topic_relevance."
+                      "record_topic_prefilter_agreement") as mock_agreement:
+            await service.check_relevance("React rendering bug again",
+                                          current_topic, other_topics)
+            await asyncio.gather(*service._verify_tasks)
+
+        # LLM said "stay", local said "resume"
+        service._check_with_llm.assert_awaited_once()
+        mock_agreement.assert_called_once_with(False)
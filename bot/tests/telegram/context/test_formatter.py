@@ -668,3 +668,58 @@ class TestContextFormatterThinkingBlocks:
         assert isinstance(result.content, str)
         assert result.content == "Final answer."
         assert large_thinking not in result.content
+
+
+class TestContextFormatterTextCompaction:
+    """Tests for compaction summaries on models without native compaction."""
+
+    @staticmethod
+    def _conversation():
+        """Four messages; assistant message #3 carries a summary."""
+        messages = [
+            create_mock_db_message(from_user_id=123, text_content="Q1"),
+            create_mock_db_message(from_user_id=None, text_content="A1"),
+            create_mock_db_message(from_user_id=123, text_content="Q2"),
+            create_mock_db_message(from_user_id=None, text_content="A2"),
+        ]
+        for msg in messages:
+            msg.compaction_summary = None
+        messages[3].compaction_summary = "User asked Q1, got A1."
+        return messages
+
+    def test_native_keeps_compaction_block(self):
+        """Native models get a compaction block, nothing is dropped."""
+        result = ContextFormatter().format_conversation(self._conversation())
+
+        assert len(result) == 4
+        assert result[3].content[0]["type"] == "compaction"
+
+    def test_text_summary_prepended_to_user_turn(self):
+        """Non-native models start from summary + preceding user turn."""
+        formatter = ContextFormatter(native_compaction=False)
+        result = formatter.format_conversation(self._conversation())
+
+        assert [m.role for m in result] == ["user", "assistant"]
+        assert result[0].content.startswith(
+            "[Summary of earlier conversation]\nUser asked Q1, got A1.")
+        assert result[0].content.endswith("Q2")
+        assert result[1].content == "A2"
+
+    def test_text_summary_without_preceding_user_turn(self):
+        """Summary becomes its own user turn when history starts with it."""
+        formatter = ContextFormatter(native_compaction=False)
+        result = formatter.format_conversation(self._conversation()[3:])
+
+        assert [m.role for m in result] == ["user", "assistant"]
+        assert "User asked Q1" in result[0].content
+        assert result[1].content == "A2"
+
+    def test_text_mode_without_summary_unchanged(self):
+        """Conversations without summaries are not modified."""
+        messages = self._conversation()
+        messages[3].compaction_summary = None
+        formatter = ContextFormatter(native_compaction=False)
+
+        result = formatter.format_conversation(messages)
+
+        assert [m.content for m in result] == ["Q1", "A1", "Q2", "A2"]
@@ -10,6 +10,7 @@ Comprehensive tests for telegram/handlers/claude.py:
 
 import asyncio
 from contextlib import asynccontextmanager
+from contextlib import ExitStack
 from datetime import datetime
 from datetime import timezone
 from decimal import Decimal
@@ -165,6 +166,105 @@ def make_processed_message(
     )
 
 
+def _setup_patches(
+    mock_session,
+    mock_thread,
+    mock_user,
+    context_error=None,
+):
+    """Setup common patches for _process_batch_with_session tests."""
+    mock_thread_repo = AsyncMock()
+    mock_thread_repo.get_by_id = AsyncMock(return_value=mock_thread)
+
+    mock_msg_repo = AsyncMock()
+    mock_msg_repo.create_messages_batch = AsyncMock(return_value=[])
+    mock_msg_repo.get_thread_messages = AsyncMock(return_value=[])
+
+    mock_user_file_repo = AsyncMock()
+
+    mock_services = MagicMock()
+    mock_services.users = AsyncMock()
+    mock_services.users.get_by_id = AsyncMock(return_value=mock_user)
+
+    mock_context_mgr = MagicMock()
+    if context_error:
+        mock_context_mgr.build_context = AsyncMock(side_effect=context_error)
+    else:
+        mock_context_mgr.build_context = AsyncMock(return_value=[])
+
+    mock_formatter = MagicMock()
+    mock_formatter.format_conversation_with_files = AsyncMock(return_value=[])
+
+    return {
+        "get_session":
+            patch(
+                "telegram.handlers.claude.get_session",
+                return_value=mock_session_context(mock_session),
+            ),
+        "thread_repo":
+            patch(
+                "telegram.handlers.claude.ThreadRepository",
+                return_value=mock_thread_repo,
+            ),
+        "msg_repo":
+            patch(
+                "telegram.handlers.claude.MessageRepository",
+                return_value=mock_msg_repo,
+            ),
+        "file_repo":
+            patch(
+                "telegram.handlers.claude.UserFileRepository",
+                return_value=mock_user_file_repo,
+            ),
+        "services":
+            patch(
+                "telegram.handlers.claude.ServiceFactory",
+                return_value=mock_services,
+            ),
+        "cache_user":
+            patch(
+                "telegram.handlers.claude.get_cached_user",
+                AsyncMock(return_value=None),
+            ),
+        "cache_set":
+            patch(
+                "telegram.handlers.claude.cache_user",
+                AsyncMock(),
+            ),
+        "invalidate":
+            patch(
+                "telegram.handlers.claude.invalidate_messages",
+                AsyncMock(),
+            ),
+        "cache_msgs":
+            patch(
+                "telegram.handlers.claude.cache_messages",
+                AsyncMock(),
+            ),
+        "pending":
+            patch(
+                "telegram.handlers.claude.get_pending_files_for_thread",
+                AsyncMock(return_value=[]),
+            ),
+        "context":
+            patch(
+                "telegram.handlers.claude.ContextManager",
+                return_value=mock_context_mgr,
+            ),
+        "formatter":
+            patch(
+                "telegram.handlers.claude.ContextFormatter",
+                return_value=mock_formatter,
+            ),
+        "record_error":
+            patch("telegram.handlers.claude.record_error"),
+        "record_request":
+            patch("telegram.handlers.claude.record_llm_request"),
+        "logger":
+            patch("telegram.handlers.claude.logger"),
+    }
+
+
 # ============================================================================
 # Tests for init_claude_provider
 # ============================================================================
@@ -423,7 +523,7 @@ class TestProcessBatchWithSession:
         mock_thread_repo.get_by_id = AsyncMock(return_value=mock_thread)
 
         mock_msg_repo = AsyncMock()
-        mock_msg_repo.create_message = AsyncMock()
+        mock_msg_repo.create_messages_batch = AsyncMock(return_value=[])
 
         mock_user_repo = AsyncMock()
         mock_user_repo.get_by_id = AsyncMock(return_value=None)
@@ -503,107 +603,6 @@ class TestProcessBatchWithSession:
 class TestErrorHandling:
     """Tests for error handling in _process_batch_with_session."""
 
-    def _setup_patches(
-        self,
-        mock_session,
-        mock_thread,
-        mock_user,
-        context_error=None,
-    ):
-        """Setup common patches for error handling tests."""
-        mock_thread_repo = AsyncMock()
-        mock_thread_repo.get_by_id = AsyncMock(return_value=mock_thread)
-
-        mock_msg_repo = AsyncMock()
-        mock_msg_repo.create_message = AsyncMock()
-        mock_msg_repo.get_thread_messages = AsyncMock(return_value=[])
-
-        mock_user_file_repo = AsyncMock()
-
-        mock_services = MagicMock()
-        mock_services.users = AsyncMock()
-        mock_services.users.get_by_id = AsyncMock(return_value=mock_user)
-
-        mock_context_mgr = MagicMock()
-        if context_error:
-            mock_context_mgr.build_context = AsyncMock(
-                side_effect=context_error)
-        else:
-            mock_context_mgr.build_context = AsyncMock(return_value=[])
-
-        mock_formatter = MagicMock()
-        mock_formatter.format_conversation_with_files = AsyncMock(
-            return_value=[])
-
-        return {
-            "get_session":
-                patch(
-                    "telegram.handlers.claude.get_session",
-                    return_value=mock_session_context(mock_session),
-                ),
-            "thread_repo":
-                patch(
-                    "telegram.handlers.claude.ThreadRepository",
-                    return_value=mock_thread_repo,
-                ),
-            "msg_repo":
-                patch(
-                    "telegram.handlers.claude.MessageRepository",
-                    return_value=mock_msg_repo,
-                ),
-            "file_repo":
-                patch(
-                    "telegram.handlers.claude.UserFileRepository",
-                    return_value=mock_user_file_repo,
-                ),
-            "services":
-                patch(
-                    "telegram.handlers.claude.ServiceFactory",
-                    return_value=mock_services,
-                ),
-            "cache_user":
-                patch(
-                    "telegram.handlers.claude.get_cached_user",
-                    AsyncMock(return_value=None),
-                ),
-            "cache_set":
-                patch(
-                    "telegram.handlers.claude.cache_user",
-                    AsyncMock(),
-                ),
-            "invalidate":
-                patch(
-                    "telegram.handlers.claude.invalidate_messages",
-                    AsyncMock(),
-                ),
-            "cache_msgs":
-                patch(
-                    "telegram.handlers.claude.cache_messages",
-                    AsyncMock(),
-                ),
-            "pending":
-                patch(
-                    "telegram.handlers.claude.get_pending_files_for_thread",
-                    AsyncMock(return_value=[]),
-                ),
-            "context":
-                patch(
-                    "telegram.handlers.claude.ContextManager",
-                    return_value=mock_context_mgr,
-                ),
-            "formatter":
-                patch(
-                    "telegram.handlers.claude.ContextFormatter",
-                    return_value=mock_formatter,
-                ),
-            "record_error":
-                patch("telegram.handlers.claude.record_error"),
-            "record_request":
-                patch("telegram.handlers.claude.record_llm_request"),
-            "logger":
-                patch("telegram.handlers.claude.logger"),
-        }
-
     @pytest.mark.asyncio
     async def test_context_window_exceeded(
         self,
@@ -622,7 +621,7 @@ class TestErrorHandling:
             original_message=mock_telegram_message,
         )
 
-        patches = self._setup_patches(
+        patches = _setup_patches(
             mock_session,
             mock_thread,
             mock_user,
@@ -676,7 +675,7 @@ class TestErrorHandling:
             original_message=mock_telegram_message,
         )
 
-        patches = self._setup_patches(
+        patches = _setup_patches(
             mock_session,
             mock_thread,
             mock_user,
@@ -729,7 +728,7 @@ class TestErrorHandling:
             original_message=mock_telegram_message,
         )
 
-        patches = self._setup_patches(
+        patches = _setup_patches(
             mock_session,
             mock_thread,
             mock_user,
@@ -778,7 +777,7 @@ class TestErrorHandling:
             original_message=mock_telegram_message,
         )
 
-        patches = self._setup_patches(
+        patches = _setup_patches(
             mock_session,
             mock_thread,
             mock_user,
@@ -825,7 +824,7 @@ class TestErrorHandling:
             original_message=mock_telegram_message,
         )
 
-        patches = self._setup_patches(
+        patches = _setup_patches(
             mock_session,
             mock_thread,
             mock_user,
@@ -855,6 +854,116 @@ class TestErrorHandling:
         call_args = mock_telegram_message.answer.call_args[0][0]
         assert "Unexpected error" in call_args
 
+    @pytest.mark.asyncio
+    async def test_failed_stage_span_recorded(
+        self,
+        mock_session,
+        mock_telegram_message,
+        sample_metadata,
+        mock_thread,
+        mock_user,
+    ):
+        """A stage that raises still ends its span, with error status."""
+        processed = make_processed_message(
+            text="Hello",
+            metadata=sample_metadata,
+            original_message=mock_telegram_message,
+        )
+
+        patches = _setup_patches(
+            mock_session,
+            mock_thread,
+            mock_user,
+            context_error=RuntimeError("Unexpected!"),
+        )
+
+        with patches["get_session"], patches["thread_repo"], patches[
+                "msg_repo"]:
+            with patches["file_repo"], patches["services"], patches[
+                    "cache_user"]:
+                with patches["cache_set"], patches["invalidate"], patches[
+                        "cache_msgs"]:
+                    with patches["pending"], patches["context"]:
+                        with patches["formatter"], patches[
+                                "record_error"], patches["logger"], patch(
+                                    "utils.tracing.record_pipeline_stage"
+                                ) as record_stage:
+                            from telegram.handlers.claude import \
+                                _process_batch_with_session
+
+                            await _process_batch_with_session(
+                                thread_id=42,
+                                messages=[processed],
+                                first_message=mock_telegram_message,
+                            )
+
+        stages = {c.args[0]: c.args[2] for c in record_stage.call_args_list}
+        assert stages["history.load"] == "ok"
+        assert stages["context.build"] == "error"
+
+
+class TestStreamingPhase:
+    """Tests for releasing the DB connection during streaming."""
+
+    @pytest.mark.asyncio
+    async def test_load_phase_committed_before_streaming(
+        self,
+        mock_session,
+        mock_telegram_message,
+        sample_metadata,
+        mock_thread,
+        mock_user,
+    ):
+        """No transaction from the load phase is held while streaming."""
+        processed = make_processed_message(
+            text="Hello",
+            metadata=sample_metadata,
+            original_message=mock_telegram_message,
+        )
+        patches = _setup_patches(mock_session, mock_thread, mock_user)
+
+        calls = []
+        mock_session.commit.side_effect = lambda: calls.append("commit")
+
+        async def _stream():
+            calls.append("stream")
+            raise RuntimeError("stop after stream start")
+
+        orchestrator = MagicMock()
+        orchestrator.stream = _stream
+
+        async def _load_user(user_id):
+            calls.append("query")
+            return mock_user
+
+        with ExitStack() as stack:
+            mocks = {
+                name: stack.enter_context(item)
+                for name, item in patches.items()
+            }
+            # Cache miss: user is loaded through the session after the
+            # messages are saved
+            mocks["services"].return_value.users.get_by_id = _load_user
+            stack.enter_context(
+                patch("telegram.handlers.claude.get_provider",
+                      return_value=MagicMock()))
+            stack.enter_context(
+                patch("telegram.handlers.claude.StreamingOrchestrator",
+                      return_value=orchestrator))
+            stack.enter_context(
+                patch("telegram.chat_action.legacy.send_action", AsyncMock()))
+            from telegram.handlers.claude import _process_batch_with_session
+
+            await _process_batch_with_session(
+                thread_id=42,
+                messages=[processed],
+                first_message=mock_telegram_message,
+            )
+
+        assert "query" in calls
+        before_stream = calls[:calls.index("stream")]
+        assert before_stream[-1] == "commit"
+
 
 # ============================================================================
 # Tests for batch metrics
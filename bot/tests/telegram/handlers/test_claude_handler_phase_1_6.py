@@ -106,8 +106,7 @@ def mock_thread_repo(mock_thread):
 def mock_message_repo():
     """Create mock MessageRepository."""
     repo = AsyncMock()
-    repo.create_message = AsyncMock()
-    repo.get_message = AsyncMock(return_value=None)  # message doesn't exist yet
+    repo.create_messages_batch = AsyncMock(return_value=[])
     repo.get_thread_messages = AsyncMock(return_value=[])
     return repo
 
@@ -222,8 +221,9 @@ async def test_voice_message_transcript_prefix(
 
         await _process_message_batch(42, [processed])
 
-        mock_message_repo.create_message.assert_called()
-        call_kwargs = mock_message_repo.create_message.call_args_list[0][1]
+        mock_message_repo.create_messages_batch.assert_called()
+        batch = mock_message_repo.create_messages_batch.call_args[0][0]
+        call_kwargs = batch[0]
 
         # ProcessedMessage.get_text_for_db() uses int(duration)
         expected_prefix = "[VOICE MESSAGE - 12s]: Hello, how are you?"
@@ -286,7 +286,8 @@ async def test_image_with_caption(mock_session, mock_message, sample_metadata,
 
         await _process_message_batch(42, [processed])
 
-        call_kwargs = mock_message_repo.create_message.call_args_list[0][1]
+        batch = mock_message_repo.create_messages_batch.call_args[0][0]
+        call_kwargs = batch[0]
         assert call_kwargs['text_content'] == "Look at this photo!"
 
 
@@ -341,7 +342,8 @@ async def test_image_without_caption(mock_session, mock_message,
 
         await _process_message_batch(42, [processed])
 
-        call_kwargs = mock_message_repo.create_message.call_args_list[0][1]
+        batch = mock_message_repo.create_messages_batch.call_args[0][0]
+        call_kwargs = batch[0]
         text = call_kwargs['text_content']
 
         assert "📎 User uploaded image: photo.jpg" in text
@@ -391,5 +393,6 @@ async def test_regular_text_message(mock_session, mock_message, sample_metadata,
 
         await _process_message_batch(42, [processed])
 
-        call_kwargs = mock_message_repo.create_message.call_args_list[0][1]
+        batch = mock_message_repo.create_messages_batch.call_args[0][0]
+        call_kwargs = batch[0]
         assert call_kwargs['text_content'] == "Just a regular text message"
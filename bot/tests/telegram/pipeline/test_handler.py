@@ -266,6 +266,169 @@ class TestUnifiedHandler:
         assert "try again" in args[0].lower()
 
 
+class TestSpeculativeStart:
+    """Tests for speculative routing and cache warm-up in the handler."""
+
+    @staticmethod
+    def _processed(mock_message: MagicMock, text: str | None):
+        """Build ProcessedMessage for mock message."""
+        from telegram.pipeline.models import MessageMetadata
+        from telegram.pipeline.models import ProcessedMessage
+
+        metadata = MessageMetadata(
+            chat_id=123,
+            user_id=456,
+            message_id=100,
+            message_thread_id=None,
+            chat_type="private",
+            date=mock_message.date,
+        )
+        return ProcessedMessage(text=text,
+                                metadata=metadata,
+                                original_message=mock_message)
+
+    @pytest.mark.asyncio
+    @patch("telegram.pipeline.handler.SpeculativePrefetch")
+    @patch("telegram.pipeline.handler.get_normalizer")
+    @patch("telegram.pipeline.handler.get_or_create_thread")
+    @patch("telegram.pipeline.handler.get_queue")
+    async def test_routing_overlaps_normalization(
+        self,
+        mock_get_queue: MagicMock,
+        mock_get_thread: AsyncMock,
+        mock_get_normalizer: MagicMock,
+        mock_prefetch_cls: MagicMock,
+        mock_message: MagicMock,
+        mock_session: AsyncMock,
+    ) -> None:
+        """Routing starts before normalization finishes for captions."""
+        import asyncio
+
+        from services.topic_routing import TopicRouteResult
+        from telegram.pipeline.handler import handle_message
+
+        mock_message.caption = "Look at this chart"
+        processed = self._processed(mock_message, "Look at this chart")
+        routing_started = asyncio.Event()
+
+        async def slow_normalize(_message):
+            await routing_started.wait()
+            return processed
+
+        normalizer = MagicMock()
+        normalizer.normalize = slow_normalize
+        mock_get_normalizer.return_value = normalizer
+
+        async def route(_message, text, _session, _user_id):
+            assert text == "Look at this chart"
+            routing_started.set()
+            return TopicRouteResult(action="resume", override_thread_id=77)
+
+        prefetch = MagicMock()
+        prefetch.wait = AsyncMock()
+        mock_prefetch_cls.return_value = prefetch
+        mock_get_thread.return_value = MagicMock(id=1)
+        queue = MagicMock()
+        queue.add = AsyncMock()
+        mock_get_queue.return_value = queue
+
+        with patch("telegram.pipeline.handler._try_topic_routing", route):
+            await asyncio.wait_for(handle_message(mock_message, mock_session),
+                                   timeout=5)
+
+        prefetch.start.assert_called_once_with(None, include_thread=True)
+        prefetch.select.assert_called_once_with(77)
+        prefetch.wait.assert_awaited_once()
+        assert mock_get_thread.call_args[1]["override_thread_id"] == 77
+        assert processed.received_at is not None
+        queue.add.assert_called_once_with(thread_id=1, message=processed)
+
+    @pytest.mark.asyncio
+    @patch("telegram.pipeline.handler.SpeculativePrefetch")
+    @patch("telegram.pipeline.handler.get_normalizer")
+    @patch("telegram.pipeline.handler.get_or_create_thread")
+    @patch("telegram.pipeline.handler.get_queue")
+    async def test_new_topic_cancels_thread_warmup(
+        self,
+        mock_get_queue: MagicMock,
+        mock_get_thread: AsyncMock,
+        mock_get_normalizer: MagicMock,
+        mock_prefetch_cls: MagicMock,
+        mock_message: MagicMock,
+        mock_session: AsyncMock,
+    ) -> None:
+        """Routing to a new topic drops the speculative thread warm-up."""
+        from services.topic_routing import TopicRouteResult
+        from telegram.pipeline.handler import handle_message
+
+        mock_message.text = "Completely different subject"
+        normalizer = MagicMock()
+        normalizer.normalize = AsyncMock(return_value=self._processed(
+            mock_message, mock_message.text))
+        mock_get_normalizer.return_value = normalizer
+
+        prefetch = MagicMock()
+        prefetch.wait = AsyncMock()
+        mock_prefetch_cls.return_value = prefetch
+        mock_get_thread.return_value = MagicMock(id=1)
+        mock_get_queue.return_value = MagicMock(add=AsyncMock())
+
+        with patch("telegram.pipeline.handler._try_topic_routing",
+                   new_callable=AsyncMock,
+                   return_value=TopicRouteResult(action="new",
+                                                 override_thread_id=88,
+                                                 title="Other")):
+            await handle_message(mock_message, mock_session)
+
+        prefetch.cancel_threads.assert_called_once_with()
+        prefetch.select.assert_not_called()
+        prefetch.cancel.assert_called_once_with()
+
+    @pytest.mark.asyncio
+    @patch("telegram.pipeline.handler.SpeculativePrefetch")
+    @patch("telegram.pipeline.handler.get_normalizer")
+    async def test_failure_cancels_speculative_work(
+        self,
+        mock_get_normalizer: MagicMock,
+        mock_prefetch_cls: MagicMock,
+        mock_message: MagicMock,
+        mock_session: AsyncMock,
+    ) -> None:
+        """Normalization failure cancels early routing and warm-up."""
+        import asyncio
+
+        from telegram.pipeline.handler import handle_message
+
+        mock_message.caption = "Some caption"
+        route_started = asyncio.Event()
+        route_cancelled = asyncio.Event()
+
+        async def failing_normalize(_message):
+            await route_started.wait()
+            raise ValueError("boom")
+
+        normalizer = MagicMock()
+        normalizer.normalize = failing_normalize
+        mock_get_normalizer.return_value = normalizer
+        prefetch = MagicMock()
+        mock_prefetch_cls.return_value = prefetch
+
+        async def route(*_args):
+            route_started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                route_cancelled.set()
+                raise
+
+        with patch("telegram.pipeline.handler._try_topic_routing", route):
+            await handle_message(mock_message, mock_session)
+            await asyncio.wait_for(route_cancelled.wait(), timeout=1)
+
+        prefetch.cancel.assert_called_once_with()
+        mock_message.answer.assert_called_once()
+
+
 class TestUnsupportedMessageHandler:
     """Tests for the unsupported message handler."""
 
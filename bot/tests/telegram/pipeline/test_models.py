@@ -3,6 +3,7 @@
 Tests all dataclasses and their methods in telegram.pipeline.models.
 """
 
+import dataclasses
 from datetime import datetime
 from datetime import timezone
 from unittest.mock import MagicMock
@@ -235,6 +236,21 @@ class TestMessageMetadata:
         assert metadata.last_name == "Doe"
         assert metadata.is_premium is True
 
+    def test_metadata_is_frozen_and_slotted(self) -> None:
+        """MessageMetadata is immutable and has no per-instance dict."""
+        metadata = MessageMetadata(
+            chat_id=1,
+            user_id=2,
+            message_id=3,
+            message_thread_id=None,
+            chat_type="private",
+            date=datetime.now(timezone.utc),
+        )
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            metadata.chat_id = 5  # type: ignore[misc]
+        assert not hasattr(metadata, "__dict__")
+
 
 class TestProcessedMessage:
     """Tests for ProcessedMessage dataclass."""
@@ -13,6 +13,7 @@ from unittest.mock import MagicMock
 from unittest.mock import patch
 
 import pytest
+from core.file_transfer import TransferResult
 from telegram.pipeline.models import MediaType
 from telegram.pipeline.models import ProcessedMessage
 from telegram.pipeline.normalizer import MessageNormalizer
@@ -79,6 +80,13 @@ def mock_bot() -> AsyncMock:
     return bot
 
 
+def _transfer(claude_file_id: str) -> TransferResult:
+    """Result of a streamed Telegram -> Files API transfer."""
+    return TransferResult(size_bytes=17,
+                          digest="0" * 64,
+                          claude_file_id=claude_file_id)
+
+
 @pytest.fixture
 def mock_action_manager():
     """Create a mock ActionManager that returns no-op context managers."""
@@ -276,12 +284,10 @@ class TestMessageNormalizerPhoto:
 
     @pytest.mark.asyncio
     @patch("telegram.pipeline.normalizer.ChatActionManager")
-    @patch("telegram.pipeline.normalizer.upload_to_files_api")
-    @patch("telegram.pipeline.normalizer.cache_file")
+    @patch("telegram.pipeline.normalizer.transfer_to_files_api")
     async def test_process_photo(
         self,
-        mock_cache_file: AsyncMock,
-        mock_upload: AsyncMock,
+        mock_transfer: AsyncMock,
         mock_action_manager_class: MagicMock,
         normalizer: MessageNormalizer,
         mock_message: MagicMock,
@@ -290,7 +296,7 @@ class TestMessageNormalizerPhoto:
     ) -> None:
         """Processes photo by uploading to Files API."""
         mock_action_manager_class.get.return_value = mock_action_manager
-        mock_upload.return_value = "file_photo_123"
+        mock_transfer.return_value = _transfer("file_photo_123")
 
         # Set up photo
         photo_size = MagicMock()
@@ -311,16 +317,14 @@ class TestMessageNormalizerPhoto:
         assert result.files[0].file_type == MediaType.IMAGE
         assert result.files[0].telegram_file_id == "photo_file_id_123"
         assert result.text == "Photo caption"
-        mock_upload.assert_called_once()
+        mock_transfer.assert_called_once()
 
     @pytest.mark.asyncio
     @patch("telegram.pipeline.normalizer.ChatActionManager")
-    @patch("telegram.pipeline.normalizer.upload_to_files_api")
-    @patch("telegram.pipeline.normalizer.cache_file")
+    @patch("telegram.pipeline.normalizer.transfer_to_files_api")
     async def test_process_photo_uses_largest_size(
         self,
-        mock_cache_file: AsyncMock,
-        mock_upload: AsyncMock,
+        mock_transfer: AsyncMock,
         mock_action_manager_class: MagicMock,
         normalizer: MessageNormalizer,
         mock_message: MagicMock,
@@ -329,7 +333,7 @@ class TestMessageNormalizerPhoto:
     ) -> None:
         """Uses largest photo size (last in list)."""
         mock_action_manager_class.get.return_value = mock_action_manager
-        mock_upload.return_value = "file_photo_large"
+        mock_transfer.return_value = _transfer("file_photo_large")
 
         # Multiple sizes (Telegram sends multiple)
         small = MagicMock()
@@ -359,8 +363,7 @@ class TestMessageNormalizerDocument:
 
     @pytest.mark.asyncio
     @patch("telegram.pipeline.normalizer.ChatActionManager")
-    @patch("telegram.pipeline.normalizer.upload_to_files_api")
-    @patch("telegram.pipeline.normalizer.cache_file")
+    @patch("telegram.pipeline.normalizer.transfer_to_files_api")
     @patch(
         "telegram.pipeline.normalizer.mime_to_media_type",
         return_value=MediaType.PDF,
@@ -373,8 +376,7 @@ class TestMessageNormalizerDocument:
         self,
         mock_detect: MagicMock,
         mock_mime_to_media: MagicMock,
-        mock_cache_file: AsyncMock,
-        mock_upload: AsyncMock,
+        mock_transfer: AsyncMock,
         mock_action_manager_class: MagicMock,
         normalizer: MessageNormalizer,
         mock_message: MagicMock,
@@ -383,7 +385,7 @@ class TestMessageNormalizerDocument:
     ) -> None:
         """Processes PDF document."""
         mock_action_manager_class.get.return_value = mock_action_manager
-        mock_upload.return_value = "file_pdf_123"
+        mock_transfer.return_value = _transfer("file_pdf_123")
 
         document = MagicMock()
         document.file_id = "doc_file_id"
@@ -402,8 +404,7 @@ class TestMessageNormalizerDocument:
 
     @pytest.mark.asyncio
     @patch("telegram.pipeline.normalizer.ChatActionManager")
-    @patch("telegram.pipeline.normalizer.upload_to_files_api")
-    @patch("telegram.pipeline.normalizer.cache_file")
+    @patch("telegram.pipeline.normalizer.transfer_to_files_api")
     @patch(
         "telegram.pipeline.normalizer.mime_to_media_type",
         return_value=MediaType.DOCUMENT,
@@ -416,8 +417,7 @@ class TestMessageNormalizerDocument:
         self,
         mock_detect: MagicMock,
         mock_mime_to_media: MagicMock,
-        mock_cache_file: AsyncMock,
-        mock_upload: AsyncMock,
+        mock_transfer: AsyncMock,
         mock_action_manager_class: MagicMock,
         normalizer: MessageNormalizer,
         mock_message: MagicMock,
@@ -426,7 +426,7 @@ class TestMessageNormalizerDocument:
     ) -> None:
         """Processes text document."""
         mock_action_manager_class.get.return_value = mock_action_manager
-        mock_upload.return_value = "file_txt_123"
+        mock_transfer.return_value = _transfer("file_txt_123")
 
         document = MagicMock()
         document.file_id = "txt_file_id"
@@ -447,10 +447,11 @@ class TestMessageNormalizerVoice:
 
     @pytest.mark.asyncio
     @patch("telegram.pipeline.normalizer.ChatActionManager")
-    @patch("telegram.pipeline.normalizer.cache_file")
+    @patch("telegram.pipeline.normalizer.download_to_cache",
+           return_value=b"test file content")
     async def test_process_voice_transcribes(
         self,
-        mock_cache_file: AsyncMock,
+        mock_download: AsyncMock,
         mock_action_manager_class: MagicMock,
         normalizer: MessageNormalizer,
         mock_message: MagicMock,
@@ -493,10 +494,11 @@ class TestMessageNormalizerVoice:
 
     @pytest.mark.asyncio
     @patch("telegram.pipeline.normalizer.ChatActionManager")
-    @patch("telegram.pipeline.normalizer.cache_file")
+    @patch("telegram.pipeline.normalizer.download_to_cache",
+           return_value=b"test file content")
     async def test_voice_text_for_db_has_prefix(
         self,
-        mock_cache_file: AsyncMock,
+        mock_download: AsyncMock,
         mock_action_manager_class: MagicMock,
         normalizer: MessageNormalizer,
         mock_message: MagicMock,
@@ -537,10 +539,11 @@ class TestMessageNormalizerVideoNote:
 
     @pytest.mark.asyncio
     @patch("telegram.pipeline.normalizer.ChatActionManager")
-    @patch("telegram.pipeline.normalizer.cache_file")
+    @patch("telegram.pipeline.normalizer.download_to_cache",
+           return_value=b"test file content")
     async def test_process_video_note_transcribes(
         self,
-        mock_cache_file: AsyncMock,
+        mock_download: AsyncMock,
         mock_action_manager_class: MagicMock,
         normalizer: MessageNormalizer,
         mock_message: MagicMock,
@@ -582,8 +585,7 @@ class TestMessageNormalizerAudio:
 
     @pytest.mark.asyncio
     @patch("telegram.pipeline.normalizer.ChatActionManager")
-    @patch("telegram.pipeline.normalizer.upload_to_files_api")
-    @patch("telegram.pipeline.normalizer.cache_file")
+    @patch("telegram.pipeline.normalizer.transfer_to_files_api")
     @patch(
         "telegram.pipeline.normalizer.detect_mime_type",
         return_value="audio/mpeg",
@@ -591,8 +593,7 @@ class TestMessageNormalizerAudio:
     async def test_process_audio_uploads_no_transcribe(
         self,
         mock_detect: MagicMock,
-        mock_cache_file: AsyncMock,
-        mock_upload: AsyncMock,
+        mock_transfer: AsyncMock,
         mock_action_manager_class: MagicMock,
         normalizer: MessageNormalizer,
         mock_message: MagicMock,
@@ -601,7 +602,7 @@ class TestMessageNormalizerAudio:
     ) -> None:
         """Audio files are uploaded, not auto-transcribed."""
         mock_action_manager_class.get.return_value = mock_action_manager
-        mock_upload.return_value = "file_audio_123"
+        mock_transfer.return_value = _transfer("file_audio_123")
 
         audio = MagicMock()
         audio.file_id = "audio_id"
@@ -629,8 +630,7 @@ class TestMessageNormalizerVideo:
 
     @pytest.mark.asyncio
     @patch("telegram.pipeline.normalizer.ChatActionManager")
-    @patch("telegram.pipeline.normalizer.upload_to_files_api")
-    @patch("telegram.pipeline.normalizer.cache_file")
+    @patch("telegram.pipeline.normalizer.transfer_to_files_api")
     @patch(
         "telegram.pipeline.normalizer.detect_mime_type",
         return_value="video/mp4",
@@ -638,8 +638,7 @@ class TestMessageNormalizerVideo:
     async def test_process_video_uploads_no_transcribe(
         self,
         mock_detect: MagicMock,
-        mock_cache_file: AsyncMock,
-        mock_upload: AsyncMock,
+        mock_transfer: AsyncMock,
         mock_action_manager_class: MagicMock,
         normalizer: MessageNormalizer,
         mock_message: MagicMock,
@@ -648,7 +647,7 @@ class TestMessageNormalizerVideo:
     ) -> None:
         """Video files are uploaded, not auto-transcribed."""
         mock_action_manager_class.get.return_value = mock_action_manager
-        mock_upload.return_value = "file_video_123"
+        mock_transfer.return_value = _transfer("file_video_123")
 
         video = MagicMock()
         video.file_id = "video_id"
@@ -671,52 +670,43 @@ class TestMessageNormalizerVideo:
         assert result.files[0].metadata["height"] == 1080
 
 
-class TestDownloadAndUploadParallel:
-    """Tests for parallel download and upload optimization."""
+class TestDownloadAndUpload:
+    """Tests for streamed download + upload."""
 
     @pytest.mark.asyncio
-    @patch("telegram.pipeline.normalizer.upload_to_files_api")
-    @patch("telegram.pipeline.normalizer.cache_file")
-    async def test_download_and_upload_runs_cache_and_upload_in_parallel(
+    @patch("telegram.pipeline.normalizer.transfer_to_files_api")
+    async def test_download_and_upload_returns_size_and_file_id(
         self,
-        mock_cache_file: AsyncMock,
-        mock_upload: AsyncMock,
+        mock_transfer: AsyncMock,
         normalizer: MessageNormalizer,
         mock_message: MagicMock,
         mock_bot: AsyncMock,
     ) -> None:
-        """Cache and upload run in parallel after download completes."""
-        mock_upload.return_value = "file_id_123"
+        """Returns received size and Files API ID without the content."""
+        mock_transfer.return_value = _transfer("file_id_123")
         mock_message.bot = mock_bot
 
-        content, file_id = await normalizer._download_and_upload(
+        size, file_id = await normalizer._download_and_upload(
             message=mock_message,
             file_id="test_file_id",
             filename="test.jpg",
             mime_type="image/jpeg",
         )
 
-        # Both cache and upload should be called
-        mock_cache_file.assert_called_once()
-        mock_upload.assert_called_once()
-
-        # Verify results
-        assert content == b"test file content"
+        assert size == 17
         assert file_id == "file_id_123"
 
     @pytest.mark.asyncio
-    @patch("telegram.pipeline.normalizer.upload_to_files_api")
-    @patch("telegram.pipeline.normalizer.cache_file")
+    @patch("telegram.pipeline.normalizer.transfer_to_files_api")
     async def test_download_and_upload_passes_correct_params(
         self,
-        mock_cache_file: AsyncMock,
-        mock_upload: AsyncMock,
+        mock_transfer: AsyncMock,
         normalizer: MessageNormalizer,
         mock_message: MagicMock,
         mock_bot: AsyncMock,
     ) -> None:
-        """Parameters are passed correctly to cache and upload functions."""
-        mock_upload.return_value = "file_pdf_456"
+        """Parameters are passed correctly to the transfer."""
+        mock_transfer.return_value = _transfer("file_pdf_456")
         mock_message.bot = mock_bot
 
         await normalizer._download_and_upload(
@@ -726,16 +716,9 @@ class TestDownloadAndUploadParallel:
             mime_type="application/pdf",
         )
 
-        # Verify cache_file was called with correct params
-        mock_cache_file.assert_called_once_with(
+        mock_transfer.assert_called_once_with(
+            mock_bot,
             "pdf_file_id",
-            b"test file content",
-            filename="document.pdf",
-        )
-
-        # Verify upload_to_files_api was called with correct params
-        mock_upload.assert_called_once_with(
-            file_bytes=b"test file content",
             filename="document.pdf",
             mime_type="application/pdf",
         )
@@ -748,7 +731,7 @@ class TestDownloadAndUploadParallel:
         mock_bot: AsyncMock,
     ) -> None:
         """Raises ValueError if download fails."""
-        mock_bot.download_file.return_value = None  # Simulate failure
+        mock_bot.get_file.return_value = None  # Simulate failure
         mock_message.bot = mock_bot
 
         with pytest.raises(ValueError, match="Failed to download"):
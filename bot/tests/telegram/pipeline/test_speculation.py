@@ -0,0 +1,208 @@
+"""Unit tests for speculative cache warm-up.
+
+Tests warm-up of user and thread caches and cancellation of the losing
+route after topic routing decides.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+from telegram.pipeline.speculation import SpeculativePrefetch
+from telegram.pipeline.speculation import warm_thread
+from telegram.pipeline.speculation import warm_user
+
+MODULE = "telegram.pipeline.speculation"
+
+
+@asynccontextmanager
+async def _fake_session():
+    """Stand-in for db.engine.get_session()."""
+    yield AsyncMock()
+
+
+class TestWarmUser:
+    """Tests for warm_user()."""
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_skips_db(self) -> None:
+        """Cached user is not loaded from DB."""
+        with patch(f"{MODULE}.get_cached_user",
+                   new_callable=AsyncMock,
+                   return_value={"model_id": "claude:sonnet"}), \
+                patch(f"{MODULE}.get_session") as mock_session:
+            assert await warm_user(1) == "hit"
+        mock_session.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_cache_miss_loads_and_caches(self) -> None:
+        """Missing user is loaded from DB and cached."""
+        user = MagicMock(id=1, model_id="claude:sonnet")
+        repo = MagicMock()
+        repo.get_by_id = AsyncMock(return_value=user)
+
+        with patch(f"{MODULE}.get_cached_user",
+                   new_callable=AsyncMock,
+                   return_value=None), \
+                patch(f"{MODULE}.get_session", _fake_session), \
+                patch(f"{MODULE}.UserRepository", return_value=repo), \
+                patch(f"{MODULE}.cache_user",
+                      new_callable=AsyncMock) as mock_cache:
+            assert await warm_user(1) == "warmed"
+
+        assert mock_cache.call_args[1]["model_id"] == "claude:sonnet"
+
+
+class TestWarmThread:
+    """Tests for warm_thread()."""
+
+    @pytest.mark.asyncio
+    async def test_all_cached(self) -> None:
+        """Warm caches are left alone."""
+        with patch(f"{MODULE}.get_cached_thread",
+                   new_callable=AsyncMock,
+                   return_value={"id": 7}), \
+                patch(f"{MODULE}.get_cached_messages",
+                      new_callable=AsyncMock,
+                      return_value=[]), \
+                patch(f"{MODULE}.get_cached_files",
+                      new_callable=AsyncMock,
+                      return_value=[]), \
+                patch(f"{MODULE}.get_session") as mock_session:
+            assert await warm_thread(1, 2, 3) == "hit"
+        mock_session.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_history_miss_loaded(self) -> None:
+        """Cold history is loaded with the processor's window and cached."""
+        msg_repo = MagicMock()
+        msg_repo.get_thread_messages = AsyncMock(return_value=[])
+
+        with patch(f"{MODULE}.get_cached_thread",
+                   new_callable=AsyncMock,
+                   return_value={"id": 7}), \
+                patch(f"{MODULE}.get_cached_messages",
+                      new_callable=AsyncMock,
+                      return_value=None), \
+                patch(f"{MODULE}.get_cached_files",
+                      new_callable=AsyncMock,
+                      return_value=[]), \
+                patch(f"{MODULE}.get_session", _fake_session), \
+                patch(f"{MODULE}.MessageRepository", return_value=msg_repo), \
+                patch(f"{MODULE}.cache_messages",
+                      new_callable=AsyncMock) as mock_cache:
+            assert await warm_thread(1, 2, 3) == "warmed"
+
+        msg_repo.get_thread_messages.assert_awaited_once_with(
+            7, limit=500, since_compaction=True)
+        mock_cache.assert_awaited_once_with(7, [])
+
+    @pytest.mark.asyncio
+    async def test_unknown_thread(self) -> None:
+        """Thread that doesn't exist yet is a miss."""
+        thread_repo = MagicMock()
+        thread_repo.get_active_thread = AsyncMock(return_value=None)
+
+        with patch(f"{MODULE}.get_cached_thread",
+                   new_callable=AsyncMock,
+                   return_value=None), \
+                patch(f"{MODULE}.get_session", _fake_session), \
+                patch(f"{MODULE}.ThreadRepository", return_value=thread_repo):
+            assert await warm_thread(1, 2, 3) == "miss"
+
+
+class TestSpeculativePrefetch:
+    """Tests for SpeculativePrefetch task management."""
+
+    @pytest.fixture
+    def blocked(self):
+        """Warm-ups that block until released, recording calls."""
+        release = asyncio.Event()
+        calls = []
+
+        async def _warm_thread(_chat_id, _user_id, telegram_thread_id):
+            calls.append(telegram_thread_id)
+            await release.wait()
+            return "warmed"
+
+        async def _warm_user(_user_id):
+            return "hit"
+
+        with patch(f"{MODULE}.warm_thread", _warm_thread), \
+                patch(f"{MODULE}.warm_user", _warm_user):
+            yield release, calls
+
+    @pytest.mark.asyncio
+    async def test_select_cancels_losing_route(self, blocked) -> None:
+        """Routing to another topic cancels the current-thread warm-up."""
+        release, calls = blocked
+        prefetch = SpeculativePrefetch(chat_id=1, user_id=2)
+        prefetch.start(10)
+        losing = prefetch._thread_tasks[10]
+        await asyncio.sleep(0)
+
+        prefetch.select(20)
+        await asyncio.sleep(0)
+        release.set()
+        await prefetch.wait()
+
+        assert losing.cancelled()
+        assert calls == [10, 20]
+        assert list(prefetch._thread_tasks) == [20]
+
+    @pytest.mark.asyncio
+    async def test_select_same_thread_keeps_task(self, blocked) -> None:
+        """Routing to the current thread reuses the running warm-up."""
+        release, calls = blocked
+        prefetch = SpeculativePrefetch(chat_id=1, user_id=2)
+        prefetch.start(None)
+        task = prefetch._thread_tasks[None]
+
+        prefetch.select(None)
+        release.set()
+        await prefetch.wait()
+
+        assert prefetch._thread_tasks[None] is task
+        assert calls == [None]
+
+    @pytest.mark.asyncio
+    @pytest.mark.usefixtures("blocked")
+    async def test_cancel_threads_for_new_topic(self) -> None:
+        """New topic cancels all thread warm-ups, user warm-up continues."""
+        prefetch = SpeculativePrefetch(chat_id=1, user_id=2)
+        prefetch.start(10)
+        user_task = prefetch._user_task
+
+        prefetch.cancel_threads()
+        await prefetch.wait()
+
+        assert prefetch._thread_tasks == {}
+        assert user_task.done() and not user_task.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_start_without_thread(self, blocked) -> None:
+        """Thread warm-up can be skipped (active generation)."""
+        prefetch = SpeculativePrefetch(chat_id=1, user_id=2)
+        prefetch.start(10, include_thread=False)
+        await prefetch.wait()
+
+        assert prefetch._thread_tasks == {}
+        assert blocked[1] == []
+
+    @pytest.mark.asyncio
+    async def test_errors_are_swallowed(self) -> None:
+        """Warm-up failures never reach the handler."""
+
+        async def _fail(*_args):
+            raise RuntimeError("redis down")
+
+        with patch(f"{MODULE}.warm_thread", _fail), \
+                patch(f"{MODULE}.warm_user", _fail):
+            prefetch = SpeculativePrefetch(chat_id=1, user_id=2)
+            prefetch.start(10)
+            await prefetch.wait()
+
+        assert all(not t.cancelled() for t in prefetch._tasks())
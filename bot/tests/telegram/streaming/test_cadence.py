@@ -0,0 +1,150 @@
+"""Tests for adaptive draft cadence.
+
+Tests interval selection from token rate, latency, flood penalty and the
+shared outbound budget, plus per-response telemetry.
+"""
+
+from unittest.mock import patch
+
+from config import DRAFT_FAST_UPDATE_INTERVAL
+from config import DRAFT_MAX_UPDATE_INTERVAL
+from config import DRAFT_MIN_UPDATE_INTERVAL
+import pytest
+from telegram.streaming.cadence import DraftCadence
+from telegram.streaming.cadence import OutboundBudget
+
+
+class _Clock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _cadence(clock=None, rate: float = 1000.0, **kwargs) -> DraftCadence:
+    """Cadence with a private budget (no contention by default)."""
+    return DraftCadence(budget=OutboundBudget(rate),
+                        clock=clock or _Clock(),
+                        **kwargs)
+
+
+def _stream(cadence: DraftCadence, clock: _Clock, chars_per_second: float,
+            seconds: float) -> None:
+    """Feed deltas every 100 ms at the given rate."""
+    for _ in range(int(seconds * 10)):
+        clock.now += 0.1
+        cadence.observe_chars(int(chars_per_second / 10))
+
+
+class TestInterval:
+    """Tests for interval()."""
+
+    def test_min_interval_before_measurements(self):
+        """Unknown rate and latency: update as soon as allowed."""
+        assert _cadence().interval() == DRAFT_MIN_UPDATE_INTERVAL
+
+    def test_slow_stream_stays_near_min(self):
+        """A slow model gets a short interval."""
+        clock = _Clock()
+        cadence = _cadence(clock)
+        _stream(cadence, clock, 20, 3)
+
+        assert cadence.char_rate == pytest.approx(20, rel=0.1)
+        assert cadence.interval() < DRAFT_MIN_UPDATE_INTERVAL + 0.15
+
+    def test_fast_stream_uses_fast_interval(self):
+        """A fast model gets fewer, larger updates."""
+        clock = _Clock()
+        cadence = _cadence(clock)
+        _stream(cadence, clock, 1000, 3)
+
+        assert cadence.interval() == pytest.approx(DRAFT_FAST_UPDATE_INTERVAL)
+
+    def test_idle_gap_not_counted_as_slow(self):
+        """Pauses (tool calls) don't drag the rate down."""
+        clock = _Clock()
+        cadence = _cadence(clock)
+        _stream(cadence, clock, 1000, 2)
+        clock.now += 30
+        _stream(cadence, clock, 1000, 1)
+
+        assert cadence.char_rate == pytest.approx(1000, rel=0.1)
+
+    def test_latency_floor(self):
+        """Interval never drops below a multiple of send latency."""
+        cadence = _cadence()
+        cadence.observe_latency(1.2)
+
+        assert cadence.interval() == pytest.approx(2.4)
+
+    def test_flood_penalty_doubles_and_decays(self):
+        """RetryAfter widens the interval; sent updates shrink it back."""
+        cadence = _cadence()
+        cadence.observe_flood()
+        assert cadence.interval() == pytest.approx(2 *
+                                                   DRAFT_MIN_UPDATE_INTERVAL)
+
+        for _ in range(10):
+            cadence.record_sent()
+        assert cadence.interval() == pytest.approx(DRAFT_MIN_UPDATE_INTERVAL)
+
+    def test_capped_at_max(self):
+        """Back-off never exceeds the ceiling."""
+        cadence = _cadence()
+        cadence.observe_latency(10.0)
+        cadence.observe_flood()
+
+        assert cadence.interval() == DRAFT_MAX_UPDATE_INTERVAL
+
+    def test_keepalive_interval_stretches(self):
+        """Keepalive is never more frequent than updates."""
+        cadence = _cadence()
+        assert cadence.keepalive_interval(5.0) == 5.0
+
+        cadence.observe_latency(3.0)
+        assert cadence.keepalive_interval(1.0) == DRAFT_MAX_UPDATE_INTERVAL
+
+
+class TestOutboundBudget:
+    """Tests for the shared budget."""
+
+    def test_concurrent_responses_share_budget(self):
+        """Each active response gets an equal share of the global rate."""
+        budget = OutboundBudget(4.0)
+        cadences = [DraftCadence(budget=budget) for _ in range(4)]
+
+        assert budget.active == 4
+        assert cadences[0].interval() == pytest.approx(1.0)
+
+        for cadence in cadences[1:]:
+            cadence.close()
+        assert cadences[0].interval() == DRAFT_MIN_UPDATE_INTERVAL
+
+    def test_unclosed_cadence_released_on_gc(self):
+        """Leaked cadences stop counting once collected."""
+        budget = OutboundBudget(4.0)
+        DraftCadence(budget=budget)
+
+        assert budget.active == 0
+
+
+class TestTelemetry:
+    """Tests for close()."""
+
+    def test_close_records_counts_once(self):
+        """Sent/skipped/keepalive counts are recorded once per response."""
+        cadence = _cadence()
+        cadence.record_sent()
+        cadence.record_sent()
+        cadence.record_skipped()
+        cadence.record_keepalive()
+
+        with patch("telegram.streaming.cadence.record_draft_cadence"
+                  ) as mock_record:
+            cadence.close()
+            cadence.close()
+
+        mock_record.assert_called_once_with(2, 1, 1, pytest.approx(0.5))
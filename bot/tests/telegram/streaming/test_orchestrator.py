@@ -26,6 +26,7 @@ from telegram.streaming.tool_executor import ToolExecutionResult
 from telegram.streaming.types import CancellationReason
 from telegram.streaming.types import StreamResult
 from telegram.streaming.types import ToolCall
+from utils.tracing import start_span
 
 # ============================================================================
 # Helper classes for mocking
@@ -102,6 +103,7 @@ def mock_llm_request():
     request.max_tokens = 4096
     request.temperature = 1.0
     request.tools = []
+    request.template_hash = None
     return request
 
 
@@ -408,6 +410,79 @@ class TestStreamingOrchestratorStream:
         assert result.was_cancelled is False
         assert result.iterations == 1
 
+    @pytest.mark.asyncio
+    async def test_stream_uses_prompt_cache_manager(
+        self,
+        mock_llm_request,
+        mock_telegram_message,
+        mock_session,
+        mock_user_file_repo,
+        mock_claude_provider,
+        mock_draft_manager,
+        mock_cancel_event,
+        mock_action_manager,
+    ):
+        """Breakpoint comes from the cache manager; usage is reported."""
+        final_message = MockMessage(content=[])
+        final_message.usage = MagicMock(cache_read_input_tokens=100)
+        events = [
+            MockStreamEvent(type="text_delta", content="Hi"),
+            MockStreamEvent(type="message_end", stop_reason="end_turn"),
+            MockStreamEvent(type="stream_complete",
+                            final_message=final_message),
+        ]
+        requests = []
+
+        async def mock_stream_events(request):
+            requests.append(request)
+            for event in events:
+                yield event
+
+        mock_claude_provider.stream_events = mock_stream_events
+        mock_llm_request.template_hash = "abc"
+        cache_manager = MagicMock()
+        cache_manager.choose_breakpoint.return_value = 0
+
+        orchestrator = StreamingOrchestrator(
+            request=mock_llm_request,
+            first_message=mock_telegram_message,
+            thread_id=7,
+            session=mock_session,
+            user_file_repo=mock_user_file_repo,
+            chat_id=123,
+            user_id=456,
+            claude_provider=mock_claude_provider,
+        )
+
+        with (
+                patch("telegram.streaming.orchestrator.generation_context") as
+                mock_gen_ctx,
+                patch(
+                    "telegram.streaming.orchestrator.DraftManager",
+                    return_value=mock_draft_manager,
+                ),
+                patch("telegram.streaming.orchestrator.ChatActionManager") as
+                mock_action_cls,
+                patch(
+                    "telegram.streaming.orchestrator.get_prompt_cache_manager",
+                    return_value=cache_manager,
+                ),
+        ):
+            mock_gen_ctx.return_value.__aenter__ = AsyncMock(
+                return_value=mock_cancel_event)
+            mock_gen_ctx.return_value.__aexit__ = AsyncMock(return_value=None)
+            mock_draft_manager.__aenter__ = AsyncMock(
+                return_value=mock_draft_manager)
+            mock_draft_manager.__aexit__ = AsyncMock(return_value=None)
+            mock_action_cls.get.return_value = mock_action_manager
+
+            await orchestrator.stream()
+
+        cache_manager.choose_breakpoint.assert_called_once_with("abc", 7, 1)
+        assert requests[0].cache_breakpoint_index == 0
+        cache_manager.record_usage.assert_called_once_with(
+            "abc", final_message.usage, thread_id=7, first_call=True)
+
     @pytest.mark.asyncio
     async def test_stream_with_cancellation(
         self,
@@ -609,9 +684,11 @@ class TestStreamingOrchestratorStream:
         ]
 
         iteration = 0
+        requests = []
 
         async def mock_stream_events(request):
             nonlocal iteration
+            requests.append(request)
             events = first_events if iteration == 0 else second_events
             iteration += 1
             for event in events:
@@ -678,6 +755,10 @@ class TestStreamingOrchestratorStream:
         assert result.was_cancelled is False
         assert result.iterations == 2
         assert "answer is X" in result.text
+        # Second iteration extends the first request's messages in place
+        first, second = (r.messages for r in requests)
+        assert len(second) == len(first) + 2
+        assert second[0] is first[0]
 
     @pytest.mark.asyncio
     async def test_stream_with_force_turn_break(
@@ -1343,6 +1424,71 @@ class TestStreamingOrchestratorStream:
         assert result.was_cancelled is False
         assert result.text == ""  # Empty final text (this was the bug scenario)
 
+    @pytest.mark.asyncio
+    async def test_ttft_span_ended_when_stream_fails(
+        self,
+        mock_llm_request,
+        mock_telegram_message,
+        mock_session,
+        mock_user_file_repo,
+        mock_claude_provider,
+        mock_draft_manager,
+        mock_cancel_event,
+        mock_action_manager,
+    ):
+        """A stream failing before its first event still ends llm.ttft."""
+        spans = []
+
+        def _start_span(name, **attributes):
+            started = start_span(name, **attributes)
+            spans.append(started)
+            return started
+
+        async def mock_stream_events(request):
+            raise ConnectionError("connection reset")
+            yield  # pylint: disable=unreachable
+
+        mock_claude_provider.stream_events = mock_stream_events
+
+        orchestrator = StreamingOrchestrator(
+            request=mock_llm_request,
+            first_message=mock_telegram_message,
+            thread_id=1,
+            session=mock_session,
+            user_file_repo=mock_user_file_repo,
+            chat_id=123,
+            user_id=456,
+            claude_provider=mock_claude_provider,
+        )
+
+        with (
+                patch("telegram.streaming.orchestrator.generation_context") as
+                mock_gen_ctx,
+                patch(
+                    "telegram.streaming.orchestrator.DraftManager",
+                    return_value=mock_draft_manager,
+                ),
+                patch("telegram.streaming.orchestrator.ChatActionManager") as
+                mock_action_cls,
+                patch("telegram.streaming.orchestrator.start_span",
+                      _start_span),
+        ):
+            mock_gen_ctx.return_value.__aenter__ = AsyncMock(
+                return_value=mock_cancel_event)
+            mock_gen_ctx.return_value.__aexit__ = AsyncMock(return_value=None)
+            mock_draft_manager.__aenter__ = AsyncMock(
+                return_value=mock_draft_manager)
+            mock_draft_manager.__aexit__ = AsyncMock(return_value=None)
+            mock_action_cls.get.return_value = mock_action_manager
+
+            with pytest.raises(ConnectionError):
+                await orchestrator.stream()
+
+        ttft = [s for s in spans if s.name == "llm.ttft"]
+        assert len(ttft) == 1
+        assert ttft[0].end_ns is not None
+        assert ttft[0].status == "error"
+
 
 class TestStreamingOrchestratorMaxIterations:
     """Tests for max iterations handling."""
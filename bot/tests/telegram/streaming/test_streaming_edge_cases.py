@@ -474,6 +474,19 @@ class TestStreamingSessionEdgeCases:
         # Initially empty
         assert session._subagent_tools == {}
 
+    @pytest.mark.asyncio
+    async def test_on_first_update_called_once(self, mock_draft_manager):
+        """First draft callback fires once (time-to-first-draft)."""
+        on_first_update = MagicMock()
+        session = StreamingSession(mock_draft_manager,
+                                   thread_id=123,
+                                   on_first_update=on_first_update)
+
+        await session.handle_text_delta("Hello")
+        await session.handle_text_delta(" world")
+
+        on_first_update.assert_called_once_with()
+
 
 # ============================================================================
 # Tests for error message formatting
@@ -0,0 +1,235 @@
+"""Tests for ToolExecutor speculation, bulkheads and tool sessions."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from core.tools.base import ToolConfig
+from core.tools.bulkhead import ToolBulkhead
+import pytest
+from telegram.streaming.tool_executor import ToolExecutor
+from telegram.streaming.types import ToolCall
+
+
+@pytest.fixture
+def executor() -> ToolExecutor:
+    """Executor with mocked Telegram/DB dependencies."""
+    return ToolExecutor(bot=Mock(),
+                        session=Mock(),
+                        thread_id=1,
+                        user_id=2,
+                        chat_id=3,
+                        message_id=4)
+
+
+@pytest.fixture(autouse=True)
+def tool_sessions():
+    """Patched get_session: every call yields a fresh mock session."""
+    sessions = []
+
+    @asynccontextmanager
+    async def _get_session():
+        session = Mock(name=f"tool_session_{len(sessions)}")
+        sessions.append(session)
+        yield session
+
+    with patch("telegram.streaming.tool_executor.get_session", _get_session):
+        yield sessions
+
+
+@pytest.fixture
+def run_tool():
+    """Patched execute_single_tool_safe returning a plain result."""
+    with patch("telegram.streaming.tool_executor.execute_single_tool_safe",
+               new_callable=AsyncMock,
+               return_value={
+                   "ok": True,
+                   "_duration": 0.01
+               }) as mock:
+        yield mock
+
+
+def _config_with_prepare(prepare) -> ToolConfig:
+    """execute_python-like config with a custom prepare hook."""
+    return ToolConfig(name="execute_python",
+                      definition={"name": "execute_python"},
+                      executor=AsyncMock(),
+                      needs_bot_session=True,
+                      prepare=prepare)
+
+
+class TestSpeculation:
+    """Tests for speculate/execute_batch/cancel_speculation."""
+
+    @pytest.mark.asyncio
+    async def test_read_only_tool_executes_once(self, executor, run_tool):
+        """A read-only tool runs during streaming; the batch reuses it."""
+        tool = ToolCall(tool_id="t1", name="list_files", input={})
+
+        assert executor.speculate(tool) is True
+        await asyncio.sleep(0.01)
+        assert run_tool.call_count == 1
+
+        batch = await executor.execute_batch([tool])
+
+        assert run_tool.call_count == 1
+        assert batch.results[0].result == {"ok": True}
+        assert batch.speculation_saved > 0
+
+    @pytest.mark.asyncio
+    async def test_prepare_runs_before_execution(self, executor, run_tool):
+        """Prepare hooks get the tool input; execution waits for them."""
+        order = []
+
+        async def prepare(tool_input, **kwargs):
+            await asyncio.sleep(0.01)
+            order.append(("prepare", tool_input, kwargs["thread_id"]))
+
+        run_tool.side_effect = lambda **kw: order.append("execute") or {}
+        tool = ToolCall(tool_id="t1",
+                        name="execute_python",
+                        input={"code": "print(1)"})
+
+        with patch("telegram.streaming.tool_executor.get_tool_for_provider",
+                   return_value=_config_with_prepare(prepare)):
+            assert executor.speculate(tool) is True
+            await executor.execute_batch([tool])
+
+        assert order == [("prepare", {"code": "print(1)"}, 1), "execute"]
+
+    @pytest.mark.asyncio
+    async def test_prepare_failure_ignored(self, executor, run_tool):
+        """A failing warm-up does not fail the tool."""
+        prepare = AsyncMock(side_effect=ValueError("File not found"))
+        tool = ToolCall(tool_id="t1", name="execute_python", input={})
+
+        with patch("telegram.streaming.tool_executor.get_tool_for_provider",
+                   return_value=_config_with_prepare(prepare)):
+            executor.speculate(tool)
+            batch = await executor.execute_batch([tool])
+
+        assert not batch.results[0].is_error
+        run_tool.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_cancel_stops_unclaimed_work(self, executor, run_tool):
+        """Aborted streams cancel speculative work."""
+        started = asyncio.Event()
+
+        async def prepare(tool_input, **kwargs):
+            started.set()
+            await asyncio.sleep(10)
+
+        tool = ToolCall(tool_id="t1", name="execute_python", input={})
+
+        with patch("telegram.streaming.tool_executor.get_tool_for_provider",
+                   return_value=_config_with_prepare(prepare)):
+            executor.speculate(tool)
+            await started.wait()
+            task = executor._speculations["t1"].task  # pylint: disable=protected-access
+
+            assert executor.cancel_speculation() == 1
+            await asyncio.sleep(0)
+
+        assert task.cancelled()
+        assert executor.cancel_speculation() == 0
+        run_tool.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_tools_without_hooks_wait_for_batch(self, executor, run_tool):
+        """Tools with side effects are not started early."""
+        tool = ToolCall(tool_id="t1",
+                        name="generate_image",
+                        input={"prompt": "cat"})
+
+        assert executor.speculate(tool) is False
+        run_tool.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_disabled(self, executor, run_tool):
+        """TOOL_SPECULATION_ENABLED=False turns speculation off."""
+        tool = ToolCall(tool_id="t1", name="list_files", input={})
+
+        with patch("telegram.streaming.tool_executor.TOOL_SPECULATION_ENABLED",
+                   False):
+            assert executor.speculate(tool) is False
+            batch = await executor.execute_batch([tool])
+
+        assert batch.speculation_saved == 0
+        run_tool.assert_called_once()
+
+
+class TestBulkhead:
+    """Tests for bulkhead limits in execute_batch."""
+
+    @pytest.mark.asyncio
+    async def test_overloaded_tool_returns_error(self, executor, run_tool):
+        """A shed call becomes a tool error; the batch goes on."""
+        config = ToolConfig(name="render_latex",
+                            definition={"name": "render_latex"},
+                            executor=AsyncMock(),
+                            max_concurrent=1,
+                            max_queue=0)
+        release = asyncio.Event()
+
+        async def _slow(**kwargs):
+            await release.wait()
+            return {"ok": True}
+
+        run_tool.side_effect = _slow
+        tools = [
+            ToolCall(tool_id=f"t{i}", name="render_latex", input={})
+            for i in range(2)
+        ]
+
+        with patch("telegram.streaming.tool_executor.get_tool_for_provider",
+                   return_value=config), \
+                patch("telegram.streaming.tool_executor.get_tool_bulkhead",
+                      return_value=ToolBulkhead()):
+            batch_task = asyncio.create_task(executor.execute_batch(tools))
+            await asyncio.sleep(0.01)
+            release.set()
+            batch = await batch_task
+
+        errors = [r for r in batch.results if r.is_error]
+        assert len(errors) == 1
+        assert errors[0].result["error"] == "tool_overloaded"
+        assert "already queued" in errors[0].result["message"]
+        assert run_tool.call_count == 1
+
+
+class TestToolSessions:
+    """Tests for per-tool database sessions."""
+
+    @pytest.mark.asyncio
+    async def test_each_tool_gets_own_session(self, executor, run_tool,
+                                              tool_sessions):
+        """Parallel tools never share the generation's session."""
+        tools = [
+            ToolCall(tool_id=f"t{i}", name="list_files", input={})
+            for i in range(3)
+        ]
+
+        await executor.execute_batch(tools)
+
+        used = [c.kwargs["session"] for c in run_tool.call_args_list]
+        assert len(tool_sessions) == 3
+        assert len({id(s) for s in used}) == 3
+        assert executor._session not in used  # pylint: disable=protected-access
+
+    @pytest.mark.asyncio
+    async def test_prepare_gets_own_session(self, executor, run_tool,
+                                            tool_sessions):
+        """Prepare hooks run while streaming, so they get a session too."""
+        prepare = AsyncMock()
+        tool = ToolCall(tool_id="t1", name="execute_python", input={})
+
+        with patch("telegram.streaming.tool_executor.get_tool_for_provider",
+                   return_value=_config_with_prepare(prepare)):
+            executor.speculate(tool)
+            await executor.execute_batch([tool])
+
+        assert prepare.call_args.kwargs["session"] is tool_sessions[0]
+        assert run_tool.call_args.kwargs["session"] is tool_sessions[1]
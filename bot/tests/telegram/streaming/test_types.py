@@ -1,5 +1,7 @@
 """Tests for streaming types module."""
 
+import dataclasses
+
 import pytest
 from telegram.streaming.types import BlockType
 from telegram.streaming.types import DisplayBlock
@@ -72,3 +74,10 @@ class TestToolCall:
         """Input should default to empty dict."""
         tool = ToolCall(tool_id="id", name="test")
         assert tool.input == {}
+
+    def test_tool_call_is_frozen(self):
+        """ToolCall is immutable and slotted."""
+        tool = ToolCall(tool_id="id", name="test")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            tool.name = "other"
+        assert not hasattr(tool, "__dict__")
@@ -115,7 +115,9 @@ class TestCommandRegistry:
 
     def test_expected_admin_commands_present(self):
         names = {cmd.name for cmd in COMMANDS if cmd.admin}
-        expected = {"topup", "set_margin", "set_cache_subsidy", "announce"}
+        expected = {
+            "topup", "set_margin", "set_cache_subsidy", "announce", "profile"
+        }
         assert expected == names
 
     def test_commands_is_immutable_tuple(self):
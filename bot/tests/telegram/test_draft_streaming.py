@@ -14,9 +14,11 @@ from unittest.mock import patch
 
 from aiogram import Bot
 from aiogram.exceptions import TelegramBadRequest
+from aiogram.exceptions import TelegramRetryAfter
+from config import DRAFT_MIN_UPDATE_INTERVAL
 import pytest
+from telegram.draft_streaming import DraftManager
 from telegram.draft_streaming import DraftStreamer
-from telegram.draft_streaming import MIN_UPDATE_INTERVAL
 from telegram.streaming.constants import TELEGRAM_LIMIT
 from telegram.streaming.truncation import TruncationManager
 
@@ -220,9 +222,9 @@ class TestDraftStreamerIntegration:
         """Test typical streaming workflow."""
         # Stream multiple updates
         await streamer.update("Starting...")
-        await asyncio.sleep(MIN_UPDATE_INTERVAL + 0.01)
+        await asyncio.sleep(DRAFT_MIN_UPDATE_INTERVAL + 0.01)
         await streamer.update("Processing...")
-        await asyncio.sleep(MIN_UPDATE_INTERVAL + 0.01)
+        await asyncio.sleep(DRAFT_MIN_UPDATE_INTERVAL + 0.01)
         await streamer.update("Done!")
 
         # Finalize
@@ -253,6 +255,88 @@ class TestDraftStreamerIntegration:
         assert streamer.last_text == "forced"
 
 
+class TestDraftStreamerCadence:
+    """Tests for adaptive cadence integration."""
+
+    @pytest.mark.asyncio
+    async def test_throttled_text_flushed_without_next_delta(
+            self, streamer, mock_bot):
+        """Pending text is sent once the interval passes."""
+        await streamer.update("first")
+        await streamer.update("second")
+        assert streamer.last_text == "first"
+
+        await asyncio.sleep(streamer.cadence.interval() + 0.05)
+
+        assert streamer.last_text == "second"
+        assert streamer._pending_text is None
+        assert streamer.cadence.sent == 2
+        assert streamer.cadence.skipped == 1
+
+    @pytest.mark.asyncio
+    async def test_clear_cancels_deferred_flush(self, streamer, mock_bot):
+        """No draft is sent after clear()."""
+        await streamer.update("first")
+        await streamer.update("second")
+
+        await streamer.clear()
+        await asyncio.sleep(streamer.cadence.interval() + 0.05)
+
+        assert streamer.last_text == "first"
+        assert streamer._flush_task is None
+
+    @pytest.mark.asyncio
+    async def test_finalize_cancels_flush_in_flight(self, streamer, mock_bot):
+        """A deferred draft still being sent never lands after finalize()."""
+        sent = []
+        release = asyncio.Event()
+
+        async def send(method):
+            if method.text == "second":
+                await release.wait()
+            sent.append(method.text)
+
+        mock_bot.side_effect = send
+        mock_bot.send_message.side_effect = (
+            lambda **kwargs: sent.append("final message"))
+        await streamer.update("first")
+        await streamer.update("second")
+        await asyncio.sleep(streamer.cadence.interval() + 0.05)
+
+        await streamer.finalize("final")
+        release.set()
+        await asyncio.sleep(0.01)
+
+        assert sent == ["first", "final", "final message"]
+        assert streamer._flush_task is None
+
+    @pytest.mark.asyncio
+    async def test_flood_widens_interval(self, streamer, mock_bot):
+        """TelegramRetryAfter doubles the cadence interval."""
+        base = streamer.cadence.interval()
+        mock_bot.side_effect = [
+            TelegramRetryAfter(method=MagicMock(),
+                               message="Flood control",
+                               retry_after=0),
+            None,
+        ]
+
+        assert await streamer.update("text") is True
+        assert streamer.cadence.interval() > base
+
+    @pytest.mark.asyncio
+    async def test_manager_shares_cadence_across_drafts(self, mock_bot):
+        """Drafts of one response share a cadence, closed on exit."""
+        async with DraftManager(mock_bot, chat_id=100) as dm:
+            first = dm.current
+            await dm.commit_and_create_new()
+            assert dm.current is not first
+            assert dm.current.cadence is first.cadence is dm.cadence
+            assert not first.cadence._closed
+
+        assert dm.cadence._closed
+
+
 class TestDraftStreamerKeepaliveTask:
     """Tests for automatic keepalive task management.
 
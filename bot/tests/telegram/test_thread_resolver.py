@@ -0,0 +1,82 @@
+"""Tests for thread resolver cache warming."""
+
+from decimal import Decimal
+import json
+from unittest.mock import AsyncMock
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from cache.codec import decode
+from cache.codec import encode
+from cache.user_cache import _CACHE_USER_LUA
+from cache.user_cache import _SETTLE_BALANCE_LUA
+from cache.user_cache import cache_user
+from cache.user_cache import get_cached_user
+from cache.user_cache import settle_reservation
+import pytest
+from telegram.thread_resolver import _warm_caches
+
+
+class _FakeRedis:
+    """In-memory Redis for the user cache scripts (Python mirrors of Lua)."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, bytes] = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def eval(self, script, numkeys, *args):
+        keys, argv = args[:numkeys], args[numkeys:]
+        current = self.data.get(keys[0])
+        if script == _CACHE_USER_LUA:
+            if current is None:
+                self.data[keys[0]] = argv[0]
+                return [0, b""]
+            fresh = json.loads(argv[2])
+            fresh["balance"] = decode(current)["balance"]
+            self.data[keys[0]] = encode(fresh)
+            return [1, fresh["balance"].encode()]
+        if script == _SETTLE_BALANCE_LUA:
+            if current is None:
+                return [0, b"", b""]
+            cached = decode(current)
+            old = cached["balance"]
+            cached["balance"] = f"{Decimal(old) - Decimal(argv[1]):.4f}"
+            self.data[keys[0]] = encode(cached)
+            return [1, old.encode(), cached["balance"].encode()]
+        raise NotImplementedError(script)
+
+
+class TestWarmCaches:
+    """Tests for _warm_caches."""
+
+    @pytest.mark.asyncio
+    async def test_new_thread_keeps_settled_balance(self):
+        """A charge settled in Redis survives warming from a stale DB row."""
+        redis = _FakeRedis()
+        user = Mock(id=42,
+                    balance=Decimal("10.0000"),
+                    model_id="claude:sonnet",
+                    first_name="Test",
+                    username=None,
+                    language_code="en",
+                    custom_prompt="Be brief")
+        thread = Mock(id=7, chat_id=42, user_id=42)
+
+        with patch("cache.user_cache.get_redis", return_value=redis), \
+                patch("telegram.thread_resolver.cache_thread", AsyncMock()), \
+                patch("telegram.thread_resolver.cache_messages", AsyncMock()), \
+                patch("telegram.thread_resolver.cache_files", AsyncMock()):
+            await cache_user(user_id=42,
+                             balance=user.balance,
+                             model_id=user.model_id,
+                             first_name=user.first_name)
+            await settle_reservation(42, "r1", Decimal("0.7500"))
+
+            # Write-behind hasn't reached Postgres: user.balance is stale
+            await _warm_caches(thread, user)
+            cached = await get_cached_user(42)
+
+        assert cached["balance"] == "9.2500"
+        assert cached["custom_prompt"] == "Be brief"
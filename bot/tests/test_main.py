@@ -15,7 +15,6 @@ from unittest.mock import MagicMock
 from unittest.mock import patch
 
 from main import _parse_memory
-from main import get_directory_size
 from main import load_privileged_users
 from main import main
 from main import read_secret
@@ -177,24 +176,6 @@ class TestLoadPrivilegedUsers:
 class TestHelperFunctions:
     """Tests for helper functions in main.py."""
 
-    def test_get_directory_size_empty(self, tmp_path):
-        """Test directory size for empty directory."""
-        size = get_directory_size(str(tmp_path))
-        assert size == 0
-
-    def test_get_directory_size_with_files(self, tmp_path):
-        """Test directory size with files."""
-        (tmp_path / "file1.txt").write_text("hello")
-        (tmp_path / "file2.txt").write_text("world!!")
-
-        size = get_directory_size(str(tmp_path))
-        assert size == 5 + 7  # "hello" + "world!!"
-
-    def test_get_directory_size_nonexistent(self):
-        """Test directory size for nonexistent path."""
-        size = get_directory_size("/nonexistent/path/xyz")
-        assert size == 0
-
     def test_parse_memory_bytes(self):
         """Test parsing memory in bytes."""
         assert _parse_memory("100B") == 100
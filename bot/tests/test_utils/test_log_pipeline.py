@@ -0,0 +1,173 @@
+"""Tests for non-blocking log pipeline.
+
+Tests event sampling, rate limiting, the background writer and drop
+accounting.
+"""
+
+import io
+import json
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+import structlog
+from utils.log_pipeline import BackgroundLogWriter
+from utils.log_pipeline import EventSampler
+from utils.log_pipeline import orjson_dumps
+from utils.log_pipeline import QueuedLogger
+
+
+class _BlockingStream(io.BytesIO):
+    """Stream whose writes block until released."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def write(self, data):
+        self.release.wait(5)
+        return super().write(data)
+
+
+def _lines(stream: io.BytesIO) -> list[dict]:
+    """Parse newline-delimited JSON written to stream."""
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+class TestEventSampler:
+    """Tests for EventSampler."""
+
+    def test_unconfigured_event_passes(self):
+        """Events without rules pass unchanged."""
+        sampler = EventSampler(sample_rates={"hot": 0.0}, load=lambda: 1.0)
+
+        event = {"event": "cold"}
+        assert sampler(None, "info", event) is event
+
+    def test_sampling_only_under_load(self):
+        """Sample rate applies only when load reaches threshold."""
+        load = [0.0]
+        sampler = EventSampler(sample_rates={"hot": 0.0},
+                               load=lambda: load[0],
+                               load_threshold=0.5)
+
+        assert sampler(None, "info", {"event": "hot"})
+
+        load[0] = 0.5
+        with pytest.raises(structlog.DropEvent):
+            sampler(None, "info", {"event": "hot"})
+        assert sampler.dropped == 1
+
+    def test_kept_record_annotated(self):
+        """Sampled records carry their sample rate."""
+        sampler = EventSampler(sample_rates={"hot": 0.25}, load=lambda: 1.0)
+
+        with patch("utils.log_pipeline.random.random", return_value=0.1):
+            event = sampler(None, "info", {"event": "hot"})
+
+        assert event["sample_rate"] == 0.25
+
+    def test_rate_limit(self):
+        """Rate limit keeps one second worth of records, then drops."""
+        sampler = EventSampler(rate_limits={"requeued": 3})
+
+        kept = 0
+        for _ in range(10):
+            try:
+                sampler(None, "info", {"event": "requeued"})
+                kept += 1
+            except structlog.DropEvent:
+                pass
+
+        assert kept == 3
+        assert sampler.dropped == 7
+
+    def test_errors_never_dropped(self):
+        """Warnings and errors bypass sampling and rate limits."""
+        sampler = EventSampler(sample_rates={"hot": 0.0},
+                               rate_limits={"hot": 0.0},
+                               load=lambda: 1.0)
+
+        for method in ("warning", "error", "exception"):
+            assert sampler(None, method, {"event": "hot"})
+
+
+class TestBackgroundLogWriter:
+    """Tests for BackgroundLogWriter."""
+
+    def test_writes_on_close(self):
+        """Queued records are flushed on close."""
+        stream = io.BytesIO()
+        writer = BackgroundLogWriter(stream=stream)
+        writer.start()
+
+        for i in range(5):
+            writer.submit(orjson_dumps({"event": "e", "i": i}))
+        writer.close()
+
+        assert [line["i"] for line in _lines(stream)] == list(range(5))
+        assert writer.written == 5
+        assert not writer.running
+
+    def test_full_queue_drops_and_reports(self):
+        """Submitting to a full queue drops without blocking."""
+        stream = _BlockingStream()
+        writer = BackgroundLogWriter(stream=stream, max_queue=2)
+        writer.start()
+
+        # First record is taken by the (blocked) writer thread
+        writer.submit(b'{"event": "first"}')
+        while writer.load() > 0:
+            time.sleep(0.001)
+        results = [writer.submit(b'{"event": "x"}') for _ in range(5)]
+        stream.release.set()
+        writer.close()
+
+        assert results == [True, True, False, False, False]
+        assert writer.stats()["dropped"] == 3
+        report = [r for r in _lines(stream) if r["event"] != "x"][-1]
+        assert report["event"] == "logging.records_dropped"
+        assert report["dropped"] == 3
+
+    def test_write_error_counted(self):
+        """Broken stream doesn't kill the writer."""
+        stream = io.BytesIO()
+        stream.close()
+        writer = BackgroundLogWriter(stream=stream)
+        writer.start()
+
+        writer.submit(b"{}")
+        writer.close()
+
+        assert writer.stats()["write_errors"] == 1
+
+
+class TestOrjsonRendering:
+    """Tests for orjson serializer and queued logger."""
+
+    def test_non_str_keys_and_fallback(self):
+        """Matches json.dumps leniency for keys and unknown objects."""
+        rendered = structlog.processors.JSONRenderer(serializer=orjson_dumps)(
+            None, "info", {
+                "event": "e",
+                "counts": {
+                    1: 2
+                },
+                "obj": object()
+            })
+
+        data = json.loads(rendered)
+        assert data["counts"] == {"1": 2}
+        assert data["obj"].startswith("<object")
+
+    def test_queued_logger_accepts_str(self):
+        """String records (stdlib path) are encoded before queueing."""
+        stream = io.BytesIO()
+        writer = BackgroundLogWriter(stream=stream)
+        writer.start()
+
+        QueuedLogger(writer).info('{"event": "str"}')
+        writer.close()
+
+        assert _lines(stream) == [{"event": "str"}]
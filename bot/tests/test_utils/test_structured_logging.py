@@ -7,9 +7,11 @@ NO __init__.py - use direct import:
     pytest tests/utils/test_structured_logging.py
 """
 
+from io import BytesIO
 from io import StringIO
 import json
 import logging
+from types import SimpleNamespace
 from unittest.mock import patch
 
 import pytest
@@ -17,6 +19,7 @@ import structlog
 from utils.structured_logging import AiogramLogFilter
 from utils.structured_logging import get_logger
 from utils.structured_logging import setup_logging
+from utils.structured_logging import shutdown_logging
 
 
 @pytest.fixture(autouse=True)
@@ -409,3 +412,46 @@ class TestAiogramLogFilter:
         # Should remain ERROR
         assert record.levelno == logging.ERROR
         assert record.levelname == "ERROR"
+
+
+def test_setup_logging_background_writer():
+    """Test background mode renders with orjson and writes off-thread.
+
+    Records reach stdout after shutdown_logging() flushes the writer.
+    """
+    output = BytesIO()
+    stdout = SimpleNamespace(buffer=output)
+    with patch('sys.stdout', stdout):
+        setup_logging(background=True)
+    logger = get_logger("test")
+
+    logger.info("background_test", field="value")
+    logging.getLogger("aiogram.test").warning("stdlib_test")
+    shutdown_logging()
+
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [line['event'] for line in lines] == [
+        'background_test', 'stdlib_test'
+    ]
+    assert lines[0]['field'] == 'value'
+    assert 'timestamp' in lines[0]
+
+
+def test_setup_logging_reconfigure_rebinds_existing_loggers():
+    """Test loggers created before reconfiguring use the new writer.
+
+    Module-level loggers must not keep a writer that was shut down.
+    """
+    first = BytesIO()
+    with patch('sys.stdout', SimpleNamespace(buffer=first)):
+        setup_logging(background=True)
+    logger = get_logger("test")
+    logger.info("first_setup")
+
+    output = StringIO()
+    with patch('sys.stdout', output):
+        setup_logging()
+        logger.info("second_setup")
+
+    assert b"first_setup" in first.getvalue()
+    assert json.loads(output.getvalue().strip())['event'] == 'second_setup'
@@ -0,0 +1,87 @@
+"""Tests for utils.loop_monitor module."""
+
+import asyncio
+import time
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+from utils.loop_monitor import install_slow_callback_detector
+from utils.loop_monitor import loop_lag_monitor_task
+from utils.loop_monitor import uninstall_slow_callback_detector
+
+
+async def _blocking_step() -> None:
+    """Block the event loop (the bug the detector should catch)."""
+    time.sleep(0.05)
+
+
+class TestSlowCallbackDetector:
+    """Tests for install_slow_callback_detector."""
+
+    @pytest.fixture(autouse=True)
+    def _uninstall(self):
+        """Always restore Handle._run."""
+        yield
+        uninstall_slow_callback_detector()
+
+    @pytest.mark.asyncio
+    async def test_reports_blocking_task(self):
+        """Task step blocking past the threshold is logged and counted."""
+        with patch("utils.loop_monitor.logger") as mock_logger, \
+                patch("utils.loop_monitor.record_slow_callback") as record:
+            install_slow_callback_detector(threshold=0.02)
+            await asyncio.create_task(_blocking_step(), name="blocker")
+
+        record.assert_called()
+        calls = [
+            c for c in mock_logger.warning.call_args_list
+            if c.args[0] == "loop_monitor.slow_callback"
+        ]
+        assert calls
+        assert calls[0].kwargs["task"] == "blocker"
+        assert "_blocking_step" in calls[0].kwargs["callback"]
+
+    @pytest.mark.asyncio
+    async def test_ignores_fast_callbacks(self):
+        """Callbacks under the threshold are not reported."""
+        with patch("utils.loop_monitor.record_slow_callback") as record:
+            install_slow_callback_detector(threshold=1.0)
+            await asyncio.sleep(0)
+
+        record.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_uninstall_stops_reporting(self):
+        """After uninstall, blocking callbacks are no longer seen."""
+        with patch("utils.loop_monitor.record_slow_callback") as record:
+            install_slow_callback_detector(threshold=0.02)
+            uninstall_slow_callback_detector()
+            await asyncio.create_task(_blocking_step())
+
+        record.assert_not_called()
+
+
+class TestLoopLagMonitor:
+    """Tests for loop_lag_monitor_task."""
+
+    @pytest.mark.asyncio
+    async def test_records_lag_and_warns(self):
+        """Late wake-ups are recorded; large ones are logged."""
+        logger = MagicMock()
+        with patch("utils.loop_monitor.record_event_loop_lag") as record, \
+                patch("utils.loop_monitor.EVENT_LOOP_LAG_WARN_THRESHOLD",
+                      0.02):
+            task = asyncio.create_task(
+                loop_lag_monitor_task(logger, interval=0.01))
+            await asyncio.sleep(0.001)
+            time.sleep(0.05)  # Block the loop while the monitor sleeps
+            await asyncio.sleep(0.03)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        assert record.called
+        assert max(c.args[0] for c in record.call_args_list) >= 0.03
+        logger.warning.assert_called()
+        assert logger.warning.call_args.args[0] == "loop_monitor.lag"
@@ -0,0 +1,248 @@
+"""Tests for utils.profiling module."""
+
+import asyncio
+from collections import Counter
+import time
+from unittest.mock import patch
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient
+from aiohttp.test_utils import TestServer
+import pytest
+from utils.profiling import dump_tasks
+from utils.profiling import get_memory_tracker
+from utils.profiling import get_profiler
+from utils.profiling import install_task_age_tracking
+from utils.profiling import MAX_SAMPLE_INTERVAL
+from utils.profiling import MemoryTracker
+from utils.profiling import MIN_SAMPLE_INTERVAL
+from utils.profiling import Profile
+from utils.profiling import ProfilerError
+from utils.profiling import register_debug_routes
+from utils.profiling import SamplingProfiler
+
+
+def _busy_work(seconds: float) -> None:
+    """Burn CPU in a recognizable frame."""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(100))
+
+
+class TestSamplingProfiler:
+    """Tests for SamplingProfiler."""
+
+    def test_samples_calling_thread(self):
+        """Profile contains the function that was running."""
+        profiler = SamplingProfiler(interval=0.001)
+        profiler.start()
+        _busy_work(0.3)
+        profile = profiler.stop()
+
+        assert profile.sample_count > 10
+        names = {frame[0] for stack in profile.samples for frame in stack}
+        assert "_busy_work" in names
+
+    def test_double_start_rejected(self):
+        """Only one session at a time."""
+        profiler = SamplingProfiler(interval=0.01)
+        profiler.start()
+        try:
+            with pytest.raises(ProfilerError):
+                profiler.start()
+        finally:
+            profiler.stop()
+        assert not profiler.running
+
+    @pytest.mark.parametrize("interval,expected", [
+        (0, MIN_SAMPLE_INTERVAL),
+        (-1, MIN_SAMPLE_INTERVAL),
+        (10, MAX_SAMPLE_INTERVAL),
+    ])
+    def test_interval_clamped(self, interval, expected):
+        """Out-of-range intervals are clamped instead of busy-looping."""
+        profiler = SamplingProfiler()
+        profiler.start(interval)
+        profiler.stop()
+        assert profiler.interval == expected
+
+    def test_non_finite_interval_rejected(self):
+        """NaN/inf intervals raise and leave the profiler idle."""
+        profiler = SamplingProfiler()
+        with pytest.raises(ValueError):
+            profiler.start(float("nan"))
+        assert not profiler.running
+
+    def test_stop_without_start(self):
+        """Stopping an idle profiler is an error."""
+        with pytest.raises(ProfilerError):
+            SamplingProfiler().stop()
+
+    def test_max_duration_stops_sampling(self):
+        """Session stops sampling by itself after max_duration."""
+        profiler = SamplingProfiler(interval=0.001, max_duration=0.02)
+        profiler.start()
+        _busy_work(0.1)
+        profile = profiler.stop()
+
+        assert profile.duration < 0.08
+
+
+class TestProfileFormats:
+    """Tests for Profile output formats."""
+
+    @pytest.fixture
+    def profile(self):
+        """Two stacks sharing a root frame."""
+        root = ("main", "/app/main.py", 1)
+        samples = Counter({
+            (root, ("render", "/app/md.py", 10)): 3,
+            (root, ("decode", "/app/js.py", 20)): 1,
+        })
+        return Profile(samples, interval=0.01, duration=0.04)
+
+    def test_speedscope(self, profile):
+        """Frames are shared; weights are seconds."""
+        data = profile.to_speedscope()
+
+        frames = data["shared"]["frames"]
+        assert [f["name"] for f in frames] == ["main", "render", "decode"]
+        sampled = data["profiles"][0]
+        assert sampled["type"] == "sampled"
+        assert sampled["samples"] == [[0, 1], [0, 2]]
+        assert sampled["weights"] == pytest.approx([0.03, 0.01])
+        assert sampled["endValue"] == pytest.approx(0.04)
+
+    def test_collapsed(self, profile):
+        """Most frequent stack first, root-to-leaf separated by ';'."""
+        lines = profile.to_collapsed().splitlines()
+
+        assert lines[0] == "main (main.py:1);render (md.py:10) 3"
+        assert lines[1] == "main (main.py:1);decode (js.py:20) 1"
+
+
+class TestDumpTasks:
+    """Tests for dump_tasks and task age tracking."""
+
+    @pytest.mark.asyncio
+    async def test_lists_tasks_with_age(self):
+        """Tracked tasks report name, age and stack."""
+        loop = asyncio.get_running_loop()
+        previous = loop.get_task_factory()
+        install_task_age_tracking()
+        try:
+            task = asyncio.create_task(asyncio.sleep(10), name="sleeper")
+            await asyncio.sleep(0)
+            report = dump_tasks()
+        finally:
+            task.cancel()
+            loop.set_task_factory(previous)
+
+        assert "=== sleeper age=" in report
+        assert "age=unknown" in report  # The test's own task predates it
+        assert "sleep" in report
+
+
+class TestMemoryTracker:
+    """Tests for MemoryTracker."""
+
+    def test_diff_reports_growth(self):
+        """Allocations after the baseline show up in the diff."""
+        tracker = MemoryTracker(frames=1)
+        tracker.start()
+        try:
+            retained = [bytearray(1024) for _ in range(1000)]
+            report = tracker.diff(top=5)
+        finally:
+            tracker.stop()
+
+        assert retained
+        assert "test_profiling.py" in report
+        assert not tracker.running
+
+    def test_diff_requires_start(self):
+        """Diff before start is an error."""
+        with pytest.raises(ProfilerError):
+            MemoryTracker().diff()
+
+
+class TestDebugEndpoints:
+    """Tests for /debug/* routes."""
+
+    @pytest.fixture(autouse=True)
+    def _reset(self):
+        """Fresh singletons per test."""
+        get_profiler.reset()
+        get_memory_tracker.reset()
+        yield
+        if get_profiler().running:
+            get_profiler().stop()
+        get_memory_tracker().stop()
+
+    async def _client(self) -> TestClient:
+        app = web.Application()
+        register_debug_routes(app)
+        client = TestClient(TestServer(app))
+        await client.start_server()
+        return client
+
+    @pytest.mark.asyncio
+    async def test_disabled_without_token(self):
+        """No configured token: endpoints don't exist."""
+        with patch("utils.profiling.DEBUG_ENDPOINTS_TOKEN", ""):
+            client = await self._client()
+            try:
+                resp = await client.get("/debug/tasks")
+            finally:
+                await client.close()
+        assert resp.status == 404
+
+    @pytest.mark.asyncio
+    async def test_wrong_token_rejected(self):
+        """Wrong bearer token: 401."""
+        with patch("utils.profiling.DEBUG_ENDPOINTS_TOKEN", "secret"):
+            client = await self._client()
+            try:
+                resp = await client.get(
+                    "/debug/tasks", headers={"Authorization": "Bearer nope"})
+            finally:
+                await client.close()
+        assert resp.status == 401
+
+    @pytest.mark.asyncio
+    async def test_profile_round_trip(self):
+        """Start, stop: speedscope JSON comes back; second stop is 409."""
+        headers = {"Authorization": "Bearer secret"}
+        with patch("utils.profiling.DEBUG_ENDPOINTS_TOKEN", "secret"):
+            client = await self._client()
+            try:
+                resp = await client.post(
+                    "/debug/profile/start?interval=0.001", headers=headers)
+                assert resp.status == 200
+                await asyncio.sleep(0.05)
+                resp = await client.post("/debug/profile/stop",
+                                         headers=headers)
+                assert resp.status == 200
+                data = await resp.json()
+                resp_again = await client.post("/debug/profile/stop",
+                                               headers=headers)
+            finally:
+                await client.close()
+
+        assert data["profiles"][0]["type"] == "sampled"
+        assert resp_again.status == 409
+
+    @pytest.mark.asyncio
+    async def test_profile_start_invalid_interval(self):
+        """Non-numeric interval: 400, profiler not started."""
+        headers = {"Authorization": "Bearer secret"}
+        with patch("utils.profiling.DEBUG_ENDPOINTS_TOKEN", "secret"):
+            client = await self._client()
+            try:
+                resp = await client.post(
+                    "/debug/profile/start?interval=abc", headers=headers)
+            finally:
+                await client.close()
+
+        assert resp.status == 400
+        assert not get_profiler().running
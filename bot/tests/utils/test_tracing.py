@@ -0,0 +1,106 @@
+"""Tests for utils.tracing module."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from utils.tracing import current_span
+from utils.tracing import record_stage
+from utils.tracing import span
+from utils.tracing import start_span
+from utils.tracing import traced
+
+
+@pytest.fixture
+def recorded():
+    """Capture record_pipeline_stage calls as (stage, status) tuples."""
+    calls = []
+    with patch("utils.tracing.record_pipeline_stage",
+               side_effect=lambda stage, seconds, status: calls.append(
+                   (stage, status))):
+        yield calls
+
+
+class TestSpan:
+    """Tests for span nesting and export."""
+
+    def test_root_span_starts_trace(self, recorded):
+        """Span without parent gets a fresh trace and no parent ID."""
+        with span("root") as root:
+            assert current_span() is root
+
+        assert root.parent_id is None
+        assert len(root.trace_id) == 32
+        assert current_span() is None
+        assert recorded == [("root", "ok")]
+
+    def test_child_shares_trace(self, recorded):
+        """Nested spans share the trace and point at their parent."""
+        with span("parent") as parent:
+            with span("child") as child:
+                pass
+
+        assert child.trace_id == parent.trace_id
+        assert child.parent_id == parent.span_id
+        assert recorded == [("child", "ok"), ("parent", "ok")]
+
+    def test_error_status(self, recorded):
+        """Exception marks the span as error and propagates."""
+        with pytest.raises(ValueError):
+            with span("failing") as failing:
+                raise ValueError("boom")
+
+        assert failing.status == "error"
+        assert failing.attributes["error_type"] == "ValueError"
+        assert recorded == [("failing", "error")]
+
+    def test_end_is_idempotent(self, recorded):
+        """Ending twice exports once and keeps the first duration."""
+        manual = start_span("manual")
+        first = manual.end()
+        assert manual.end() == first
+        assert recorded == [("manual", "ok")]
+
+    def test_start_span_does_not_activate(self, recorded):
+        """start_span() leaves the current span unchanged."""
+        with span("outer") as outer:
+            inner = start_span("inner")
+            assert current_span() is outer
+            assert inner.parent_id == outer.span_id
+            inner.end()
+
+    def test_record_stage(self, recorded):
+        """Externally measured stages are recorded as ok."""
+        record_stage("queue.wait", 0.25)
+        assert recorded == [("queue.wait", "ok")]
+
+
+class TestTraced:
+    """Tests for the traced decorator."""
+
+    @pytest.mark.asyncio
+    async def test_traces_each_call(self, recorded):
+        """Each call is one span; return value passes through."""
+
+        @traced("work")
+        async def work(value: int) -> int:
+            return value * 2
+
+        assert await work(2) == 4
+        assert await work(3) == 6
+        assert recorded == [("work", "ok"), ("work", "ok")]
+
+    @pytest.mark.asyncio
+    async def test_spawned_task_inherits_trace(self, recorded):
+        """Tasks created inside a span continue its trace."""
+        with span("request") as request:
+            child = await asyncio.create_task(_child_span())
+
+        assert child.trace_id == request.trace_id
+        assert child.parent_id == request.span_id
+
+
+async def _child_span():
+    """Open a span and return it."""
+    with span("spawned") as spawned:
+        return spawned
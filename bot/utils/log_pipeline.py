@@ -0,0 +1,331 @@
+"""Non-blocking log output: event sampling and background writer.
+
+structlog's default PrintLogger writes every record synchronously to
+stdout from the calling thread, which for most records is the event loop.
+This module moves the write off the loop:
+
+- EventSampler: structlog processor that drops hot events by name
+  (probabilistic sampling under load, per-second rate limits).
+- BackgroundLogWriter: bounded queue + writer thread. Records are
+  already rendered to bytes (orjson) by the caller; the thread batches
+  them into a single stdout write. When the queue is full the record is
+  dropped and counted; drops are reported in-band as a
+  "logging.records_dropped" record and via stats().
+- QueuedLoggerFactory / QueuedLogHandler: structlog and stdlib adapters
+  feeding the writer.
+
+Wired up by utils.structured_logging.setup_logging(background=True).
+
+NO __init__.py - use direct import:
+    from utils.log_pipeline import BackgroundLogWriter, EventSampler
+"""
+
+from datetime import datetime
+from datetime import timezone
+import logging
+import queue
+import random
+import sys
+import threading
+import time
+from typing import BinaryIO, Callable, Optional
+
+import orjson
+import structlog
+
+_STOP = object()
+
+# Drop reports are written at most this often (seconds)
+_DROP_REPORT_INTERVAL = 1.0
+
+_NEVER_SAMPLED = frozenset(
+    {"warning", "warn", "error", "err", "critical", "exception", "fatal"})
+
+
+class EventSampler:
+    """Structlog processor that drops hot events by event name.
+
+    Two independent controls, both keyed by the event name:
+    - sample_rates: keep this fraction of records, only while the log
+      pipeline is under load (load() >= load_threshold). Kept records get
+      a ``sample_rate`` field so consumers can scale counts back up.
+    - rate_limits: keep at most N records per second (token bucket),
+      always applied.
+
+    Warnings and errors always pass.
+    """
+
+    def __init__(self,
+                 sample_rates: Optional[dict[str, float]] = None,
+                 rate_limits: Optional[dict[str, float]] = None,
+                 load: Optional[Callable[[], float]] = None,
+                 load_threshold: float = 0.0) -> None:
+        """Initialize the sampler.
+
+        Args:
+            sample_rates: Event name -> fraction of records kept under load.
+            rate_limits: Event name -> max records per second.
+            load: Returns current pipeline load in [0, 1]. Without it the
+                pipeline is never considered loaded.
+            load_threshold: Load at which sample_rates start applying.
+        """
+        self._sample_rates = dict(sample_rates or {})
+        self._rate_limits = dict(rate_limits or {})
+        self._load = load
+        self._load_threshold = load_threshold
+        # event -> (tokens, last refill monotonic time)
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self.dropped = 0
+
+    def __call__(self, _logger, method_name: str, event_dict: dict) -> dict:
+        """Drop the record (structlog.DropEvent) or pass it through."""
+        if method_name in _NEVER_SAMPLED:
+            return event_dict
+        event = event_dict.get("event")
+
+        limit = self._rate_limits.get(event)
+        if limit is not None and not self._take_token(event, limit):
+            self.dropped += 1
+            raise structlog.DropEvent
+
+        rate = self._sample_rates.get(event)
+        if rate is not None and rate < 1.0 and self._under_load():
+            if random.random() >= rate:
+                self.dropped += 1
+                raise structlog.DropEvent
+            event_dict["sample_rate"] = rate
+
+        return event_dict
+
+    def _under_load(self) -> bool:
+        """Check whether sampling should apply."""
+        return self._load is not None and self._load() >= self._load_threshold
+
+    def _take_token(self, event: str, limit: float) -> bool:
+        """Token bucket check (burst = one second worth of records).
+
+        Races between logging threads may let an extra record through;
+        the limit is approximate by design (no lock on the hot path).
+        """
+        now = time.monotonic()
+        tokens, last = self._buckets.get(event, (limit, now))
+        tokens = min(limit, tokens + (now - last) * limit)
+        if tokens < 1.0:
+            self._buckets[event] = (tokens, now)
+            return False
+        self._buckets[event] = (tokens - 1.0, now)
+        return True
+
+
+class BackgroundLogWriter:
+    """Writes pre-rendered log lines to a stream from a dedicated thread.
+
+    submit() never blocks: when the queue is full the record is dropped
+    and counted.
+
+    Usage:
+        writer = BackgroundLogWriter(max_queue=10000)
+        writer.start()
+        writer.submit(b'{"event": "x"}')
+        writer.close()  # flushes queued records
+    """
+
+    def __init__(self,
+                 stream: Optional[BinaryIO] = None,
+                 max_queue: int = 10000,
+                 batch_size: int = 256) -> None:
+        """Initialize the writer.
+
+        Args:
+            stream: Binary stream to write to. Defaults to sys.stdout.buffer
+                (resolved in start()).
+            max_queue: Queue capacity in records.
+            batch_size: Max records joined into one write.
+        """
+        self._stream = stream
+        self._max_queue = max_queue
+        self._batch_size = batch_size
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self.written = 0
+        self.dropped = 0
+        self.write_errors = 0
+        self._dropped_reported = 0
+        self._last_drop_report = 0.0
+
+    @property
+    def running(self) -> bool:
+        """Whether the writer thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the writer thread."""
+        if self.running:
+            return
+        if self._stream is None:
+            self._stream = sys.stdout.buffer
+        self._thread = threading.Thread(target=self._run,
+                                        name="log-writer",
+                                        daemon=True)
+        self._thread.start()
+
+    def submit(self, line: bytes) -> bool:
+        """Queue a rendered record (without trailing newline).
+
+        Args:
+            line: Rendered log record.
+
+        Returns:
+            True if queued, False if dropped (queue full).
+        """
+        try:
+            self._queue.put_nowait(line)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def load(self) -> float:
+        """Queue fill ratio in [0, 1]."""
+        return self._queue.qsize() / self._max_queue
+
+    def stats(self) -> dict[str, int]:
+        """Writer counters for metrics."""
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "write_errors": self.write_errors,
+        }
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush queued records and stop the writer thread.
+
+        Args:
+            timeout: Max seconds to wait for the queue to drain.
+        """
+        if not self.running:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        """Writer thread loop."""
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            stop = False
+            while len(batch) < self._batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._write(batch)
+            self._report_drops()
+            if stop:
+                return
+
+    def _write(self, batch: list[bytes]) -> None:
+        """Write a batch of records as newline-delimited JSON."""
+        try:
+            self._stream.write(b"\n".join(batch) + b"\n")
+            self._stream.flush()
+            self.written += len(batch)
+        except (OSError, ValueError):
+            # Closed or broken stdout: nothing useful to do but count
+            self.write_errors += len(batch)
+
+    def _report_drops(self) -> None:
+        """Write an in-band record about records dropped since last report."""
+        dropped = self.dropped
+        if dropped == self._dropped_reported:
+            return
+        now = time.monotonic()
+        if now - self._last_drop_report < _DROP_REPORT_INTERVAL:
+            return
+        self._last_drop_report = now
+        self._write([
+            orjson.dumps({
+                "event": "logging.records_dropped",
+                "level": "warning",
+                "logger": __name__,
+                "dropped": dropped - self._dropped_reported,
+                "dropped_total": dropped,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            })
+        ])
+        self._dropped_reported = dropped
+
+
+class QueuedLogger:
+    """structlog logger that hands rendered records to the writer."""
+
+    def __init__(self, writer: BackgroundLogWriter) -> None:
+        """Initialize with the writer records are submitted to."""
+        self._writer = writer
+
+    def msg(self, message: bytes | str) -> None:
+        """Submit a rendered record."""
+        if isinstance(message, str):
+            message = message.encode()
+        self._writer.submit(message)
+
+    log = debug = info = warn = warning = msg
+    fatal = failure = err = error = critical = exception = msg
+
+
+class QueuedLoggerFactory:
+    """structlog logger factory producing QueuedLogger instances."""
+
+    def __init__(self, writer: BackgroundLogWriter) -> None:
+        """Initialize with the shared writer."""
+        self._writer = writer
+
+    def __call__(self, *args) -> QueuedLogger:
+        """Create a logger (structlog passes the logger name, unused)."""
+        return QueuedLogger(self._writer)
+
+
+class QueuedLogHandler(logging.Handler):
+    """stdlib logging handler that formats records and queues them."""
+
+    def __init__(self, writer: BackgroundLogWriter) -> None:
+        """Initialize with the shared writer."""
+        super().__init__()
+        self._writer = writer
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Format record and submit it to the writer."""
+        try:
+            line = self.format(record)
+        except Exception:  # pylint: disable=broad-exception-caught
+            self.handleError(record)
+            return
+        self._writer.submit(line.encode())
+
+
+def orjson_dumps(obj, **kwargs) -> bytes:
+    """orjson serializer for structlog's JSONRenderer.
+
+    Accepts the ``default`` keyword JSONRenderer passes and allows
+    non-string dict keys (json.dumps coerces them, orjson refuses by
+    default).
+    """
+    return orjson.dumps(obj,
+                        default=kwargs.get("default"),
+                        option=orjson.OPT_NON_STR_KEYS)
+
+
+def orjson_dumps_str(obj, **kwargs) -> str:
+    """orjson serializer returning str (stdlib logging formatter path)."""
+    return orjson_dumps(obj, **kwargs).decode()
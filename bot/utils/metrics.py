@@ -13,6 +13,8 @@ from prometheus_client import Counter
 from prometheus_client import Gauge
 from prometheus_client import generate_latest
 from prometheus_client import Histogram
+from utils.profiling import install_task_age_tracking
+from utils.profiling import register_debug_routes
 from utils.structured_logging import get_logger
 
 logger = get_logger(__name__)
@@ -28,6 +30,72 @@ MESSAGES_RECEIVED = Counter(
 MESSAGES_SENT = Counter('bot_messages_sent_total',
                         'Total number of messages sent by bot', ['chat_type'])
 
+# === Pipeline Latency Metrics ===
+
+TIME_TO_FIRST_DRAFT = Histogram(
+    'bot_time_to_first_draft_seconds',
+    'Latency from update receipt to first draft update',
+    ['content_type'],
+    buckets=[0.25, 0.5, 1, 1.5, 2, 3, 5, 8, 13, 20, 30, 60])
+
+HANDLER_DISPATCH_TIME = Histogram(
+    'bot_handler_dispatch_seconds',
+    'Latency from update receipt to queue add',
+    ['route'],  # passthrough/new/resume
+    buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30])
+
+BATCH_SAVE_TIME = Histogram(
+    'bot_batch_save_seconds',
+    'Time to persist a user message batch before the LLM call',
+    ['stage'],  # insert/commit/cache/total
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5])
+
+SPECULATIVE_PREFETCH = Counter(
+    'bot_speculative_prefetch_total',
+    'Speculative cache warm-ups started by the handler',
+    ['target', 'result']  # target: user/thread; result: warmed/hit/miss/cancelled
+)
+
+BROADCAST_MESSAGES = Counter(
+    'bot_broadcast_messages_total',
+    'Broadcast (/announce) sends by outcome',
+    ['result']  # delivered/failed/flood
+)
+
+PIPELINE_STAGE_TIME = Histogram(
+    'bot_pipeline_stage_seconds',
+    'Duration of traced pipeline stages (utils/tracing.py spans)',
+    ['stage', 'status'],  # status: ok/error
+    buckets=[
+        0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60,
+        120
+    ])
+
+EVENT_LOOP_LAG = Histogram(
+    'bot_event_loop_lag_seconds',
+    'How late the event loop wakes up from a timed sleep',
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5])
+
+SLOW_CALLBACKS = Counter(
+    'bot_event_loop_slow_callbacks_total',
+    'Event loop callbacks that blocked longer than the threshold')
+
+DRAFT_UPDATES_PER_RESPONSE = Histogram(
+    'bot_draft_updates_per_response',
+    'sendMessageDraft calls per response by outcome',
+    ['outcome'],  # sent/skipped/keepalive
+    buckets=[0, 1, 2, 5, 10, 20, 50, 100, 200, 500])
+
+DRAFT_SEND_LATENCY = Histogram(
+    'bot_draft_send_latency_seconds',
+    'sendMessageDraft round-trip time',
+    buckets=[0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 2, 5])
+
+DRAFT_UPDATE_INTERVAL = Histogram(
+    'bot_draft_update_interval_seconds',
+    'Mean adaptive draft update interval per response',
+    buckets=[0.5, 0.75, 1, 1.5, 2, 3, 4, 6, 8])
+
 # === Claude API Metrics ===
 
 CLAUDE_REQUESTS = Counter(
@@ -55,6 +123,31 @@ TOOL_CALLS = Counter(
     ['tool_name', 'status']  # success/error
 )
 
+TOOL_SPECULATIONS = Counter(
+    'bot_tool_speculations_total',
+    'Tool work started before the model finished its turn',
+    ['tool_name', 'kind', 'outcome']  # prepare/execute, used/cancelled
+)
+
+TOOL_SPECULATION_SAVED = Histogram(
+    'bot_tool_speculation_saved_seconds',
+    'Tool latency overlapped with streaming per tool loop iteration',
+    buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30])
+
+TOOL_QUEUE_WAIT = Histogram('bot_tool_queue_wait_seconds',
+                            'Time tool calls waited for a bulkhead slot',
+                            ['tool_name'],
+                            buckets=[0.01, 0.1, 0.5, 1, 2, 5, 10, 30, 60])
+
+TOOL_ACTIVE = Gauge('bot_tool_active', 'Tool calls holding a bulkhead slot',
+                    ['tool_name'])
+
+TOOL_SHED = Counter(
+    'bot_tool_shed_total',
+    'Tool calls rejected by a bulkhead',
+    ['tool_name', 'reason']  # queue_full/timeout
+)
+
 TOOL_EXECUTION_TIME = Histogram('bot_tool_execution_seconds',
                                 'Tool execution time in seconds', ['tool_name'],
                                 buckets=[0.1, 0.5, 1, 2, 5, 10, 30, 60])
@@ -63,6 +156,28 @@ TOOL_PRECHECK_REJECTED = Counter(
     'bot_tool_precheck_rejected_total',
     'Paid tool calls rejected due to negative balance', ['tool_name'])
 
+# === Image Processing Metrics ===
+
+IMAGE_PROCESSING_TIME = Histogram(
+    'bot_image_processing_seconds',
+    'Image processing time in worker pool (cache misses only)',
+    ['operation'],  # downscale/jpeg
+    buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5])
+
+# === Topic Routing Metrics ===
+
+TOPIC_PREFILTER_DECISIONS = Counter(
+    'bot_topic_prefilter_decisions_total',
+    'Topic relevance decisions by source',
+    ['source', 'action']  # source: cache/local/llm/fallback
+)
+
+TOPIC_PREFILTER_AGREEMENT = Counter(
+    'bot_topic_prefilter_agreement_total',
+    'Sampled local decisions verified by LLM',
+    ['result']  # agree/disagree
+)
+
 # === Cost Metrics ===
 
 COSTS_USD = Counter(
@@ -83,6 +198,14 @@ TOTAL_USERS = Gauge('bot_total_users', 'Total number of registered users')
 TOTAL_THREADS = Gauge('bot_total_threads',
                       'Total number of conversation threads')
 
+# === Metrics Collector ===
+
+METRICS_COLLECTION_TIME = Histogram(
+    'bot_metrics_collector_seconds',
+    'Time spent in each operational metrics collector',
+    ['collector'],  # pool/queue/redis/aggregates/disk/reseed
+    buckets=[0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30])
+
 # === Disk Usage Metrics ===
 
 DISK_USAGE_BYTES = Gauge(
@@ -148,6 +271,30 @@ PROMPT_CACHE_TOKENS_SAVED = Counter(
     'bot_prompt_cache_tokens_saved_total',
     'Total tokens saved by prompt cache (cache_read_tokens)')
 
+PROMPT_CACHE_READ_RATIO = Gauge(
+    'bot_prompt_cache_read_ratio',
+    'Share of input tokens read from cache per shared prompt prefix',
+    ['model'])
+
+PROMPT_CACHE_REFRESHES = Counter(
+    'bot_prompt_cache_refreshes_total',
+    'Keep-alive requests for shared prompt prefixes', ['result'])
+
+PROMPT_CACHE_BREAKPOINTS = Counter(
+    'bot_prompt_cache_breakpoints_total',
+    'Rolling message breakpoint choices (offset from history end)',
+    ['offset', 'reason'])
+
+SUBAGENT_CACHE_REQUESTS = Counter(
+    'bot_subagent_cache_requests_total',
+    'Subagent API calls by prompt cache outcome (hit/write/miss)',
+    ['subagent', 'result'])
+
+SUBAGENT_CACHE_TOKENS = Counter(
+    'bot_subagent_cache_tokens_total',
+    'Subagent input tokens by cache outcome (read/creation/uncached)',
+    ['subagent', 'kind'])
+
 # === Files API Metrics ===
 
 FILES_API_UPLOADS = Counter(
@@ -192,6 +339,33 @@ REDIS_UPTIME_SECONDS = Gauge('bot_redis_uptime_seconds',
 REDIS_CIRCUIT_OPEN = Gauge('bot_redis_circuit_open',
                            'Redis circuit breaker state (1=open, 0=closed)')
 
+# === Blob Store Metrics ===
+
+BLOB_STORE_BYTES = Gauge('bot_blob_store_bytes',
+                         'Bytes held in local file blob store')
+
+BLOB_STORE_EVICTIONS = Counter('bot_blob_store_evictions_total',
+                               'Blobs evicted from local store (LRU)')
+
+FILE_TRANSFER_INFLIGHT_BYTES = Gauge(
+    'bot_file_transfer_inflight_bytes',
+    'Buffer bytes reserved by streaming Telegram -> Files API transfers')
+
+FILE_TRANSFERS = Counter('bot_file_transfers_total',
+                         'Streaming file transfers by outcome',
+                         ['result'])  # streamed, replayed, upload_failed
+
+# === Log Pipeline Metrics ===
+
+LOG_QUEUE_DEPTH = Gauge('bot_log_queue_depth',
+                        'Log records waiting for the background writer')
+
+LOG_RECORDS_DROPPED = Counter(
+    'bot_log_records_dropped_total',
+    'Log records not written',
+    ['reason']  # queue_full/sampled/write_error
+)
+
 # === Write-Behind Queue Metrics (Phase 3.3) ===
 
 WRITE_QUEUE_DEPTH = Gauge('bot_write_queue_depth',
@@ -222,6 +396,61 @@ def record_message_sent(chat_type: str) -> None:
     MESSAGES_SENT.labels(chat_type=chat_type).inc()
 
 
+def record_time_to_first_draft(content_type: str, seconds: float) -> None:
+    """Record latency from update receipt to first draft update."""
+    TIME_TO_FIRST_DRAFT.labels(content_type=content_type).observe(seconds)
+
+
+def record_handler_dispatch(route: str, seconds: float) -> None:
+    """Record latency from update receipt to queue add."""
+    HANDLER_DISPATCH_TIME.labels(route=route).observe(seconds)
+
+
+def record_batch_save(stage: str, seconds: float) -> None:
+    """Record duration of a batch save stage (insert/commit/cache/total)."""
+    BATCH_SAVE_TIME.labels(stage=stage).observe(seconds)
+
+
+def record_speculative_prefetch(target: str, result: str) -> None:
+    """Record outcome of a speculative cache warm-up."""
+    SPECULATIVE_PREFETCH.labels(target=target, result=result).inc()
+
+
+def record_broadcast_message(result: str) -> None:
+    """Record a broadcast send outcome."""
+    BROADCAST_MESSAGES.labels(result=result).inc()
+
+
+def record_pipeline_stage(stage: str, seconds: float, status: str) -> None:
+    """Record the duration of a traced pipeline stage."""
+    PIPELINE_STAGE_TIME.labels(stage=stage, status=status).observe(seconds)
+
+
+def record_event_loop_lag(seconds: float) -> None:
+    """Record event loop wake-up lag."""
+    EVENT_LOOP_LAG.observe(seconds)
+
+
+def record_slow_callback() -> None:
+    """Record an event loop callback over the slow threshold."""
+    SLOW_CALLBACKS.inc()
+
+
+def record_draft_send_latency(seconds: float) -> None:
+    """Record sendMessageDraft round-trip time."""
+    DRAFT_SEND_LATENCY.observe(seconds)
+
+
+def record_draft_cadence(sent: int, skipped: int, keepalives: int,
+                         mean_interval: float) -> None:
+    """Record draft update counts and cadence for one response."""
+    DRAFT_UPDATES_PER_RESPONSE.labels(outcome='sent').observe(sent)
+    DRAFT_UPDATES_PER_RESPONSE.labels(outcome='skipped').observe(skipped)
+    DRAFT_UPDATES_PER_RESPONSE.labels(outcome='keepalive').observe(keepalives)
+    if mean_interval > 0:
+        DRAFT_UPDATE_INTERVAL.observe(mean_interval)
+
+
 def record_claude_request(model: str, success: bool) -> None:
     """Record a Claude API request."""
     CLAUDE_REQUESTS.labels(model=model,
@@ -264,11 +493,53 @@ def record_tool_call(tool_name: str, success: bool, duration: float) -> None:
     TOOL_EXECUTION_TIME.labels(tool_name=tool_name).observe(duration)
 
 
+def record_tool_speculation(tool_name: str, kind: str, outcome: str) -> None:
+    """Record a speculative tool start (prepare/execute, used/cancelled)."""
+    TOOL_SPECULATIONS.labels(tool_name=tool_name, kind=kind,
+                             outcome=outcome).inc()
+
+
+def record_tool_speculation_saved(seconds: float) -> None:
+    """Record tool latency hidden behind streaming in one iteration."""
+    TOOL_SPECULATION_SAVED.observe(seconds)
+
+
+def record_tool_queue_wait(tool_name: str, seconds: float) -> None:
+    """Record time a tool call waited for its bulkhead slot."""
+    TOOL_QUEUE_WAIT.labels(tool_name=tool_name).observe(seconds)
+
+
+def set_tool_active(tool_name: str, count: int) -> None:
+    """Set number of running tool calls for a bulkhead."""
+    TOOL_ACTIVE.labels(tool_name=tool_name).set(count)
+
+
+def record_tool_shed(tool_name: str, reason: str) -> None:
+    """Record a tool call rejected by a bulkhead (queue_full/timeout)."""
+    TOOL_SHED.labels(tool_name=tool_name, reason=reason).inc()
+
+
 def record_tool_precheck_rejected(tool_name: str) -> None:
     """Record a paid tool rejected due to negative balance."""
     TOOL_PRECHECK_REJECTED.labels(tool_name=tool_name).inc()
 
 
+def record_image_processing(operation: str, seconds: float) -> None:
+    """Record image processing time in the worker pool."""
+    IMAGE_PROCESSING_TIME.labels(operation=operation).observe(seconds)
+
+
+def record_topic_decision(source: str, action: str) -> None:
+    """Record topic relevance decision (skip rate = non-llm / total)."""
+    TOPIC_PREFILTER_DECISIONS.labels(source=source, action=action).inc()
+
+
+def record_topic_prefilter_agreement(agreed: bool) -> None:
+    """Record whether LLM agreed with a sampled local decision."""
+    TOPIC_PREFILTER_AGREEMENT.labels(
+        result='agree' if agreed else 'disagree').inc()
+
+
 def record_cost(service: str, amount_usd: float) -> None:
     """Record a cost in USD."""
     COSTS_USD.labels(service=service).inc(amount_usd)
@@ -299,6 +570,35 @@ def set_total_threads(count: int) -> None:
     TOTAL_THREADS.set(count)
 
 
+def record_user_created() -> None:
+    """Count a newly registered user (incremental bot_total_users)."""
+    TOTAL_USERS.inc()
+
+
+def record_thread_created() -> None:
+    """Count a newly created thread (incremental bot_total_threads)."""
+    TOTAL_THREADS.inc()
+
+
+def record_thread_deleted(count: int = 1) -> None:
+    """Uncount deleted threads (incremental bot_total_threads)."""
+    TOTAL_THREADS.dec(count)
+
+
+def record_balance_change(delta_usd: float) -> None:
+    """Apply a committed balance change to bot_total_balance_usd.
+
+    Args:
+        delta_usd: balance_after - balance_before (negative for charges).
+    """
+    TOTAL_BALANCE_USD.inc(delta_usd)
+
+
+def record_metrics_collection(collector: str, seconds: float) -> None:
+    """Record duration of one metrics collector run."""
+    METRICS_COLLECTION_TIME.labels(collector=collector).observe(seconds)
+
+
 def set_disk_usage(volume: str, bytes_used: int) -> None:
     """Set disk usage for a volume."""
     DISK_USAGE_BYTES.labels(volume=volume).set(bytes_used)
@@ -315,6 +615,8 @@ def set_top_users(users: list[tuple[str, str, int, int]],
     gauge = TOP_USER_MESSAGES if metric_type == "messages" else TOP_USER_TOKENS
     value_idx = 2 if metric_type == "messages" else 3
 
+    # Drop previous (user, rank) series - ranks shift between updates
+    gauge.clear()
     for rank, (user_id, username, messages, tokens) in enumerate(users, 1):
         value = messages if metric_type == "messages" else tokens
         gauge.labels(user_id=str(user_id),
@@ -358,6 +660,33 @@ def record_cache_miss() -> None:
     PROMPT_CACHE_MISSES.inc()
 
 
+def set_prompt_cache_read_ratio(model: str, ratio: float) -> None:
+    """Set cache read ratio for a shared prompt prefix."""
+    PROMPT_CACHE_READ_RATIO.labels(model=model).set(ratio)
+
+
+def record_prompt_cache_refresh(result: str) -> None:
+    """Record a prompt prefix keep-alive request (hit/write/error)."""
+    PROMPT_CACHE_REFRESHES.labels(result=result).inc()
+
+
+def record_prompt_cache_breakpoint(offset: int, reason: str) -> None:
+    """Record a rolling breakpoint choice (default/best/explore)."""
+    PROMPT_CACHE_BREAKPOINTS.labels(offset=str(offset), reason=reason).inc()
+
+
+def record_subagent_cache_usage(subagent: str, read: int, creation: int,
+                                uncached: int) -> None:
+    """Record prompt cache usage of one subagent API call."""
+    result = "hit" if read else "write" if creation else "miss"
+    SUBAGENT_CACHE_REQUESTS.labels(subagent=subagent, result=result).inc()
+    for kind, tokens in (("read", read), ("creation", creation),
+                         ("uncached", uncached)):
+        if tokens > 0:
+            SUBAGENT_CACHE_TOKENS.labels(subagent=subagent,
+                                         kind=kind).inc(tokens)
+
+
 def record_file_upload(file_type: str) -> None:
     """Record a file upload to Claude Files API."""
     FILES_API_UPLOADS.labels(file_type=file_type).inc()
@@ -417,6 +746,59 @@ def set_redis_circuit_state(is_open: bool) -> None:
     REDIS_CIRCUIT_OPEN.set(1 if is_open else 0)
 
 
+# === Blob Store Functions ===
+
+
+def set_blob_store_bytes(total_bytes: int) -> None:
+    """Set the number of bytes held in the local blob store."""
+    BLOB_STORE_BYTES.set(total_bytes)
+
+
+def record_blob_eviction(count: int = 1) -> None:
+    """Record blobs evicted from the local blob store.
+
+    Args:
+        count: Number of blobs evicted.
+    """
+    BLOB_STORE_EVICTIONS.inc(count)
+
+
+def set_file_transfer_inflight_bytes(total_bytes: int) -> None:
+    """Set buffer bytes reserved by in-flight file transfers."""
+    FILE_TRANSFER_INFLIGHT_BYTES.set(total_bytes)
+
+
+def record_file_transfer(result: str) -> None:
+    """Record a streaming file transfer outcome.
+
+    Args:
+        result: 'streamed', 'replayed' (retried from the blob store)
+            or 'upload_failed'.
+    """
+    FILE_TRANSFERS.labels(result=result).inc()
+
+
+# === Log Pipeline Functions ===
+
+# Last seen cumulative drop counts (pipeline exposes totals, not deltas)
+_log_drops_seen: dict[str, int] = {}
+
+
+def set_log_pipeline_stats(stats: dict[str, int]) -> None:
+    """Export log pipeline counters.
+
+    Args:
+        stats: Output of utils.structured_logging.get_log_stats().
+    """
+    LOG_QUEUE_DEPTH.set(stats.get("queued", 0))
+    for reason in ("queue_full", "sampled", "write_error"):
+        total = stats.get(reason, 0)
+        delta = total - _log_drops_seen.get(reason, 0)
+        if delta > 0:
+            LOG_RECORDS_DROPPED.labels(reason=reason).inc(delta)
+        _log_drops_seen[reason] = total
+
+
 # === Write-Behind Functions (Phase 3.3) ===
 
 
@@ -517,6 +899,9 @@ async def start_metrics_server(host: str = '0.0.0.0', port: int = 8080) -> None:
     app.router.add_get('/health', health_handler)
     app.router.add_get('/health/live', health_live_handler)
     app.router.add_get('/health/ready', health_ready_handler)
+    # Admin-only profiling endpoints (bearer token, see utils/profiling.py)
+    register_debug_routes(app)
+    install_task_age_tracking()
 
     # Disable access logging to prevent non-JSON logs polluting Loki
     # (Prometheus scrapes /metrics every 15s, these logs are noise)
@@ -0,0 +1,493 @@
+"""On-demand profiling of the running bot.
+
+- SamplingProfiler: a background thread samples the event loop thread's
+  Python stack every PROFILER_SAMPLE_INTERVAL (sys._current_frames, no
+  tracing hooks, so the loop itself runs at full speed). Output is a
+  speedscope profile (https://www.speedscope.app) or collapsed stacks
+  for flamegraph.pl.
+- dump_tasks(): all asyncio tasks with their ages and stacks.
+- MemoryTracker: tracemalloc snapshot diffs (what grew since last time).
+
+Exposed on the metrics server under /debug/* (bearer token
+DEBUG_ENDPOINTS_TOKEN; disabled when unset) and via the /profile admin
+command.
+
+NO __init__.py - use direct import:
+    from utils.profiling import get_profiler, get_memory_tracker
+    from utils.profiling import dump_tasks
+"""
+
+import asyncio
+from collections import Counter
+import hmac
+import io
+import json
+import math
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Optional
+import weakref
+
+from aiohttp import web
+from config import DEBUG_ENDPOINTS_TOKEN
+from config import PROFILER_MAX_DURATION
+from config import PROFILER_SAMPLE_INTERVAL
+from config import TRACEMALLOC_FRAMES
+from utils.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Sampling interval bounds (seconds): a zero or negative wait busy-loops the
+# sampler thread, anything slower than a second yields a useless profile
+MIN_SAMPLE_INTERVAL = 0.001
+MAX_SAMPLE_INTERVAL = 1.0
+
+# (function name, file, first line) - one node of a sampled stack
+Frame = tuple[str, str, int]
+
+# Task -> monotonic creation time (see install_task_age_tracking)
+_task_created: "weakref.WeakKeyDictionary[asyncio.Task, float]" = (
+    weakref.WeakKeyDictionary())
+
+
+class ProfilerError(Exception):
+    """Profiler used in the wrong state (already running / not running)."""
+
+
+class Profile:
+    """Aggregated stack samples of one profiling session.
+
+    Attributes:
+        samples: Stack (root first) -> number of samples.
+        interval: Sampling interval (seconds).
+        duration: Wall time profiled (seconds).
+    """
+
+    def __init__(self, samples: Counter, interval: float,
+                 duration: float) -> None:
+        """Initialize profile.
+
+        Args:
+            samples: Stack -> sample count.
+            interval: Sampling interval.
+            duration: Wall time profiled.
+        """
+        self.samples = samples
+        self.interval = interval
+        self.duration = duration
+
+    @property
+    def sample_count(self) -> int:
+        """Total number of samples."""
+        return sum(self.samples.values())
+
+    def to_collapsed(self) -> str:
+        """Collapsed stacks, one "a;b;c count" line per unique stack."""
+        lines = []
+        for stack, count in self.samples.most_common():
+            names = ";".join(f"{name} ({os.path.basename(file)}:{line})"
+                             for name, file, line in stack)
+            lines.append(f"{names} {count}")
+        return "\n".join(lines) + "\n"
+
+    def to_speedscope(self, name: str = "bot") -> dict:
+        """Speedscope file (sampled profile, weights in seconds)."""
+        frame_index: dict[Frame, int] = {}
+        frames = []
+        stacks = []
+        weights = []
+        for stack, count in self.samples.items():
+            indices = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append({
+                        "name": frame[0],
+                        "file": frame[1],
+                        "line": frame[2],
+                    })
+                indices.append(frame_index[frame])
+            stacks.append(indices)
+            weights.append(count * self.interval)
+        return {
+            "$schema":
+                "https://www.speedscope.app/file-format-schema.json",
+            "name":
+                name,
+            "exporter":
+                "bot.utils.profiling",
+            "shared": {
+                "frames": frames
+            },
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": stacks,
+                "weights": weights,
+            }],
+        }
+
+
+class SamplingProfiler:
+    """Statistical profiler for the event loop thread.
+
+    One session at a time. A session stops itself after max_duration,
+    so a forgotten profiler doesn't run forever; its samples are kept
+    until stop() collects them.
+    """
+
+    def __init__(self,
+                 interval: float = PROFILER_SAMPLE_INTERVAL,
+                 max_duration: float = PROFILER_MAX_DURATION) -> None:
+        """Initialize profiler.
+
+        Args:
+            interval: Default seconds between samples.
+            max_duration: Seconds after which a session stops sampling.
+        """
+        self._default_interval = interval
+        self._max_duration = max_duration
+        self._interval = interval
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._samples: Counter = Counter()
+        self._started_at = 0.0
+        self._stopped_at: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether a session was started and not yet collected."""
+        return self._thread is not None
+
+    @property
+    def interval(self) -> float:
+        """Seconds between samples of the current (or last) session."""
+        return self._interval
+
+    def start(self,
+              interval: Optional[float] = None,
+              thread_id: Optional[int] = None) -> None:
+        """Start sampling.
+
+        Args:
+            interval: Seconds between samples (default from config),
+                clamped to MIN_SAMPLE_INTERVAL..MAX_SAMPLE_INTERVAL.
+            thread_id: Thread to sample (default: calling thread, i.e.
+                the event loop when called from a coroutine).
+
+        Raises:
+            ProfilerError: If a session is already running.
+            ValueError: If interval is not a finite number.
+        """
+        if self.running:
+            raise ProfilerError("Profiler is already running")
+        if interval is None:
+            interval = self._default_interval
+        if not math.isfinite(interval):
+            raise ValueError(f"Invalid sampling interval: {interval}")
+        self._interval = min(max(interval, MIN_SAMPLE_INTERVAL),
+                             MAX_SAMPLE_INTERVAL)
+        self._samples = Counter()
+        self._stop.clear()
+        self._started_at = time.monotonic()
+        self._stopped_at = None
+        target = thread_id or threading.get_ident()
+        self._thread = threading.Thread(target=self._run,
+                                        args=(target,),
+                                        name="sampling-profiler",
+                                        daemon=True)
+        self._thread.start()
+        logger.info("profiling.profiler_started",
+                    interval_ms=round(self._interval * 1000, 2))
+
+    def stop(self) -> Profile:
+        """Stop sampling and collect the profile.
+
+        Returns:
+            Profile of the session.
+
+        Raises:
+            ProfilerError: If no session is running.
+        """
+        if self._thread is None:
+            raise ProfilerError("Profiler is not running")
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        duration = (self._stopped_at or time.monotonic()) - self._started_at
+        profile = Profile(self._samples, self._interval, duration)
+        logger.info("profiling.profiler_stopped",
+                    duration=round(duration, 2),
+                    samples=profile.sample_count,
+                    unique_stacks=len(profile.samples))
+        return profile
+
+    def _run(self, thread_id: int) -> None:
+        """Sampling loop (profiler thread)."""
+        deadline = self._started_at + self._max_duration
+        while not self._stop.wait(self._interval):
+            frame = sys._current_frames().get(thread_id)  # pylint: disable=protected-access
+            if frame is None:
+                break
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    (code.co_qualname, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            self._samples[tuple(reversed(stack))] += 1
+            if time.monotonic() >= deadline:
+                logger.warning("profiling.profiler_max_duration",
+                               max_duration=self._max_duration)
+                break
+        self._stopped_at = time.monotonic()
+
+
+class MemoryTracker:
+    """tracemalloc snapshots diffed against the previous one.
+
+    tracemalloc slows allocations down noticeably, so it only runs
+    between start() and stop().
+    """
+
+    def __init__(self, frames: int = TRACEMALLOC_FRAMES) -> None:
+        """Initialize tracker.
+
+        Args:
+            frames: Stack frames stored per allocation.
+        """
+        self._frames = frames
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether allocations are being traced."""
+        return self._baseline is not None
+
+    def start(self) -> None:
+        """Start tracing and take the baseline snapshot."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self._frames)
+        self._baseline = self._snapshot()
+        logger.info("profiling.tracemalloc_started", frames=self._frames)
+
+    def diff(self, top: int = 30) -> str:
+        """Report allocations grown since the previous snapshot.
+
+        The new snapshot becomes the baseline for the next diff.
+
+        Args:
+            top: Number of source lines to report.
+
+        Returns:
+            Plain-text report.
+
+        Raises:
+            ProfilerError: If tracing was not started.
+        """
+        if self._baseline is None:
+            raise ProfilerError("tracemalloc is not running")
+        snapshot = self._snapshot()
+        stats = snapshot.compare_to(self._baseline, "lineno")
+        self._baseline = snapshot
+        current, peak = tracemalloc.get_traced_memory()
+
+        out = io.StringIO()
+        out.write(f"traced: current={current / 1024 / 1024:.1f} MiB "
+                  f"peak={peak / 1024 / 1024:.1f} MiB\n")
+        out.write(f"top {top} by growth since previous snapshot:\n")
+        for stat in stats[:top]:
+            out.write(f"{stat}\n")
+        return out.getvalue()
+
+    def stop(self) -> None:
+        """Stop tracing and drop snapshots."""
+        self._baseline = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        logger.info("profiling.tracemalloc_stopped")
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        """Snapshot without tracemalloc's own and import allocations."""
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+
+
+def install_task_age_tracking(
+        loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+    """Record creation time of every task for dump_tasks().
+
+    Wraps the loop's task factory (keeping any existing one). Tasks
+    created before installation are reported without an age.
+
+    Args:
+        loop: Event loop (default: running loop).
+    """
+    loop = loop or asyncio.get_running_loop()
+    previous = loop.get_task_factory()
+    if getattr(previous, "_tracks_age", False):
+        return
+
+    def factory(loop, coro, **kwargs):
+        if previous is not None:
+            task = previous(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        _task_created[task] = time.monotonic()
+        return task
+
+    factory._tracks_age = True  # pylint: disable=protected-access
+    loop.set_task_factory(factory)
+
+
+def dump_tasks(limit: int = 20) -> str:
+    """Describe all asyncio tasks, oldest first.
+
+    Args:
+        limit: Max stack frames per task.
+
+    Returns:
+        Plain-text report.
+    """
+    now = time.monotonic()
+    tasks = list(asyncio.all_tasks())
+    tasks.sort(key=lambda t: _task_created.get(t, float("inf")))
+
+    out = io.StringIO()
+    out.write(f"{len(tasks)} tasks\n\n")
+    for task in tasks:
+        created = _task_created.get(task)
+        age = f"{now - created:.1f}s" if created is not None else "unknown"
+        coro = task.get_coro()
+        out.write(f"=== {task.get_name()} age={age} "
+                  f"coro={getattr(coro, '__qualname__', repr(coro))}\n")
+        task.print_stack(limit=limit, file=out)
+        out.write("\n")
+    return out.getvalue()
+
+
+# === HTTP endpoints (metrics server) ===
+
+
+@web.middleware
+async def _debug_auth(request: web.Request, handler):
+    """Require the debug bearer token on /debug/* routes."""
+    if not request.path.startswith("/debug/"):
+        return await handler(request)
+    if not DEBUG_ENDPOINTS_TOKEN:
+        raise web.HTTPNotFound()
+    header = request.headers.get("Authorization", "")
+    if not hmac.compare_digest(header, f"Bearer {DEBUG_ENDPOINTS_TOKEN}"):
+        logger.warning("profiling.debug_unauthorized",
+                       path=request.path,
+                       remote=request.remote)
+        raise web.HTTPUnauthorized()
+    return await handler(request)
+
+
+def _error(exc: ProfilerError) -> web.Response:
+    """409 for state errors."""
+    return web.json_response({"error": str(exc)}, status=409)
+
+
+async def profile_start_handler(request: web.Request) -> web.Response:
+    """POST /debug/profile/start[?interval=0.005]"""
+    interval = request.query.get("interval")
+    try:
+        get_profiler().start(float(interval) if interval else None)
+    except ProfilerError as e:
+        return _error(e)
+    except ValueError:
+        return web.json_response({"error": f"Invalid interval: {interval}"},
+                                 status=400)
+    return web.json_response({"status": "started"})
+
+
+async def profile_stop_handler(request: web.Request) -> web.Response:
+    """POST /debug/profile/stop[?format=speedscope|collapsed]"""
+    try:
+        profile = get_profiler().stop()
+    except ProfilerError as e:
+        return _error(e)
+    if request.query.get("format") == "collapsed":
+        return web.Response(text=profile.to_collapsed())
+    return web.Response(text=json.dumps(profile.to_speedscope()),
+                        content_type="application/json",
+                        headers={
+                            "Content-Disposition":
+                                'attachment; filename="profile.speedscope.json"'
+                        })
+
+
+async def tasks_handler(request: web.Request) -> web.Response:
+    """GET /debug/tasks"""
+    return web.Response(text=dump_tasks())
+
+
+async def memory_start_handler(request: web.Request) -> web.Response:
+    """POST /debug/memory/start"""
+    get_memory_tracker().start()
+    return web.json_response({"status": "started"})
+
+
+async def memory_diff_handler(request: web.Request) -> web.Response:
+    """GET /debug/memory/diff[?top=30]"""
+    try:
+        report = get_memory_tracker().diff(int(request.query.get("top", "30")))
+    except ProfilerError as e:
+        return _error(e)
+    return web.Response(text=report)
+
+
+async def memory_stop_handler(request: web.Request) -> web.Response:
+    """POST /debug/memory/stop"""
+    get_memory_tracker().stop()
+    return web.json_response({"status": "stopped"})
+
+
+def register_debug_routes(app: web.Application) -> None:
+    """Add /debug/* routes and their auth middleware to an aiohttp app.
+
+    Args:
+        app: Application (before it is started).
+    """
+    app.middlewares.append(_debug_auth)
+    app.router.add_post("/debug/profile/start", profile_start_handler)
+    app.router.add_post("/debug/profile/stop", profile_stop_handler)
+    app.router.add_get("/debug/tasks", tasks_handler)
+    app.router.add_post("/debug/memory/start", memory_start_handler)
+    app.router.add_get("/debug/memory/diff", memory_diff_handler)
+    app.router.add_post("/debug/memory/stop", memory_stop_handler)
+
+
+from core.singleton import singleton  # pylint: disable=wrong-import-position
+
+
+@singleton
+def get_profiler() -> SamplingProfiler:
+    """Get the process-wide sampling profiler.
+
+    Returns:
+        SamplingProfiler singleton.
+    """
+    return SamplingProfiler()
+
+
+@singleton
+def get_memory_tracker() -> MemoryTracker:
+    """Get the process-wide tracemalloc tracker.
+
+    Returns:
+        MemoryTracker singleton.
+    """
+    return MemoryTracker()
@@ -3,12 +3,33 @@
 This module provides structured logging setup for the bot application.
 All logs are formatted as JSON for easy parsing by log aggregation systems
 like Loki.
+
+With background=True, records are rendered with orjson and written to
+stdout by a writer thread (see utils/log_pipeline.py), so the event loop
+never blocks on stdout.
 """
 
+import atexit
 import logging
 import sys
+from typing import Optional
 
+from config import LOG_QUEUE_SIZE
+from config import LOG_RATE_LIMITS
+from config import LOG_SAMPLE_RATES
+from config import LOG_SAMPLING_LOAD_THRESHOLD
+from config import LOG_WRITE_BATCH
 import structlog
+from utils.log_pipeline import BackgroundLogWriter
+from utils.log_pipeline import EventSampler
+from utils.log_pipeline import orjson_dumps
+from utils.log_pipeline import orjson_dumps_str
+from utils.log_pipeline import QueuedLoggerFactory
+from utils.log_pipeline import QueuedLogHandler
+
+# Active background writer (None when logging synchronously)
+_writer: Optional[BackgroundLogWriter] = None
+_sampler: Optional[EventSampler] = None
 
 
 class AiogramLogFilter(logging.Filter):
@@ -105,7 +126,7 @@ def _downgrade_404_errors(_logger: str, method_name: str,
     return event_dict
 
 
-def setup_logging(level: str = "INFO") -> None:
+def setup_logging(level: str = "INFO", background: bool = False) -> None:
     """Configures structlog for JSON logging.
 
     Sets up both standard library logging and structlog with processors
@@ -115,9 +136,29 @@ def setup_logging(level: str = "INFO") -> None:
     This configuration ensures ALL logs (including third-party libraries
     like aiogram, aiohttp) are formatted as JSON for Loki compatibility.
 
+    Hot events are sampled/rate limited per LOG_SAMPLE_RATES and
+    LOG_RATE_LIMITS (see EventSampler).
+
     Args:
         level: Log level (DEBUG, INFO, WARNING, ERROR). Defaults to INFO.
+        background: Render with orjson and write from a background thread
+            through a bounded queue (records are dropped, not blocked on,
+            when the queue is full). Defaults to synchronous stdout writes.
     """
+    global _writer, _sampler  # pylint: disable=global-statement
+    shutdown_logging()
+    if background:
+        _writer = BackgroundLogWriter(max_queue=LOG_QUEUE_SIZE,
+                                      batch_size=LOG_WRITE_BATCH)
+        _writer.start()
+
+    _sampler = EventSampler(
+        sample_rates=LOG_SAMPLE_RATES,
+        rate_limits=LOG_RATE_LIMITS,
+        load=_writer.load if _writer else None,
+        load_threshold=LOG_SAMPLING_LOAD_THRESHOLD,
+    )
+
     # Shared processors for both structlog and stdlib logging
     shared_processors = [
         structlog.contextvars.merge_contextvars,
@@ -129,14 +170,29 @@ def setup_logging(level: str = "INFO") -> None:
         structlog.processors.TimeStamper(fmt="iso"),
     ]
 
-    # Configure structlog
+    if _writer:
+        renderer = structlog.processors.JSONRenderer(serializer=orjson_dumps)
+        stdlib_renderer = structlog.processors.JSONRenderer(
+            serializer=orjson_dumps_str)
+        logger_factory = QueuedLoggerFactory(_writer)
+        handler = QueuedLogHandler(_writer)
+    else:
+        renderer = structlog.processors.JSONRenderer()
+        stdlib_renderer = structlog.processors.JSONRenderer()
+        logger_factory = structlog.PrintLoggerFactory()
+        handler = logging.StreamHandler(sys.stdout)
+
+    # Configure structlog (sampler first: dropped records cost nothing more)
     structlog.configure(
-        processors=shared_processors + [structlog.processors.JSONRenderer()],
+        processors=[_sampler] + shared_processors + [renderer],
         wrapper_class=structlog.make_filtering_bound_logger(
             getattr(logging, level.upper())),
         context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(),
-        cache_logger_on_first_use=True,
+        logger_factory=logger_factory,
+        # No caching: module-level loggers are bound once at import, and a
+        # cached logger would keep the writer and sampler of the first
+        # setup_logging() call after shutdown or reconfiguration
+        cache_logger_on_first_use=False,
     )
 
     # Configure standard library logging to output JSON
@@ -147,11 +203,10 @@ def setup_logging(level: str = "INFO") -> None:
         # Final processor for stdlib logs
         processors=[
             structlog.stdlib.ProcessorFormatter.remove_processors_meta,
-            structlog.processors.JSONRenderer(),
+            stdlib_renderer,
         ],
     )
 
-    handler = logging.StreamHandler(sys.stdout)
     handler.setFormatter(formatter)
 
     # Configure root logger
@@ -193,6 +248,38 @@ def setup_logging(level: str = "INFO") -> None:
     sys.excepthook = json_excepthook
 
 
+def get_log_stats() -> dict[str, int]:
+    """Get log pipeline counters for metrics.
+
+    Returns:
+        Dict with queued (writer backlog) and cumulative drop counts by
+        reason: queue_full, sampled, write_error.
+    """
+    writer_stats = _writer.stats() if _writer else {}
+    return {
+        "queued": writer_stats.get("queued", 0),
+        "queue_full": writer_stats.get("dropped", 0),
+        "sampled": _sampler.dropped if _sampler else 0,
+        "write_error": writer_stats.get("write_errors", 0),
+    }
+
+
+def shutdown_logging() -> None:
+    """Flush and stop the background log writer (no-op if not running).
+
+    Called on shutdown and before reconfiguring. Records logged after
+    this are dropped until setup_logging() runs again.
+    """
+    global _writer  # pylint: disable=global-statement
+    if _writer is None:
+        return
+    writer, _writer = _writer, None
+    writer.close()
+
+
+atexit.register(shutdown_logging)
+
+
 def get_logger(name: str) -> structlog.BoundLogger:
     """Gets a configured logger instance.
 
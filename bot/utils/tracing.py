@@ -0,0 +1,227 @@
+"""Lightweight pipeline tracing with Prometheus export.
+
+Spans follow the OpenTelemetry data model (trace_id, span_id, parent,
+name, attributes, status, start/end in ns) and nest through contextvars,
+so child spans in awaited coroutines and spawned tasks share the trace
+of the update that caused them. Every finished span is observed in
+bot_pipeline_stage_seconds{stage=<name>}.
+
+If the opentelemetry package is installed, finished spans are also
+forwarded to its global tracer (no-op unless an SDK is configured).
+
+Stage names are dotted and low-cardinality (they become label values);
+put IDs into attributes instead.
+
+Usage:
+    with span("pipeline.normalize", content_type="photo") as s:
+        processed = await normalizer.normalize(message)
+    normalize_ms = s.duration * 1000
+
+    iteration = start_span("tool_loop.iteration", iteration=i)
+    ...
+    iteration.end()
+
+    @traced("normalize.download")
+    async def _download_file(...): ...
+
+    record_stage("queue.wait", seconds)  # Measured elsewhere
+
+NO __init__.py - use direct import:
+    from utils.tracing import span, start_span, traced, record_stage
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+import secrets
+import time
+from typing import Any, Awaitable, Callable, Iterator, Optional, TypeVar
+
+from utils.metrics import record_pipeline_stage
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # Optional: spans are exported to Prometheus only
+    otel_trace = None
+
+T = TypeVar("T")
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span",
+                                                         default=None)
+
+
+class Span:  # pylint: disable=too-many-instance-attributes
+    """One timed stage of a trace.
+
+    Attributes:
+        name: Stage name (Prometheus label value).
+        trace_id: 32 hex chars, shared by all spans of a trace.
+        span_id: 16 hex chars.
+        parent_id: span_id of the parent, None for a root span.
+        attributes: Free-form attributes (IDs, sizes).
+        status: "ok" or "error".
+    """
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attributes",
+                 "status", "start_ns", "end_ns", "_token")
+
+    def __init__(self, name: str, parent: Optional["Span"],
+                 attributes: dict[str, Any]) -> None:
+        """Initialize and start span.
+
+        Args:
+            name: Stage name.
+            parent: Parent span, None to start a new trace.
+            attributes: Initial attributes.
+        """
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.status = "ok"
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self._token = None
+
+    @property
+    def duration(self) -> float:
+        """Seconds from start to end (or to now, if still running)."""
+        end_ns = self.end_ns if self.end_ns is not None else (
+            time.perf_counter_ns())
+        return (end_ns - self.start_ns) / 1e9
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set an attribute."""
+        self.attributes[key] = value
+
+    def end(self, error: Optional[BaseException] = None) -> float:
+        """Finish the span and export it. Idempotent.
+
+        Args:
+            error: Exception that ended the stage, if any.
+
+        Returns:
+            Duration in seconds.
+        """
+        if self.end_ns is not None:
+            return self.duration
+        self.end_ns = time.perf_counter_ns()
+        if error is not None:
+            self.status = "error"
+            self.attributes["error_type"] = type(error).__name__
+        record_pipeline_stage(self.name, self.duration, self.status)
+        if otel_trace is not None:
+            _export_otel(self)
+        return self.duration
+
+    def activate(self) -> None:
+        """Make this the current span (parent of spans started next)."""
+        self._token = _current_span.set(self)
+
+    def deactivate(self) -> None:
+        """Restore the previously current span."""
+        if self._token is not None:
+            try:
+                _current_span.reset(self._token)
+            except ValueError:
+                # Ended from another context (e.g. a different task)
+                pass
+            self._token = None
+
+
+def current_span() -> Optional[Span]:
+    """Get the span active in this context, if any."""
+    return _current_span.get()
+
+
+def start_span(name: str, **attributes: Any) -> Span:
+    """Start a span as a child of the current one (not activated).
+
+    Use for stages that don't map onto one block; call end() when done.
+
+    Args:
+        name: Stage name.
+        **attributes: Initial attributes.
+
+    Returns:
+        Running span.
+    """
+    return Span(name, _current_span.get(), attributes)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """Trace a block; spans started inside become its children.
+
+    Args:
+        name: Stage name.
+        **attributes: Initial attributes.
+
+    Yields:
+        The running span.
+    """
+    current = start_span(name, **attributes)
+    current.activate()
+    try:
+        yield current
+    except BaseException as e:
+        current.end(error=e)
+        raise
+    finally:
+        current.deactivate()
+        current.end()
+
+
+def traced(
+    name: str
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Decorator tracing every call of a coroutine function.
+
+    Args:
+        name: Stage name.
+    """
+
+    def decorator(
+            func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+
+        @wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            with span(name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def record_stage(name: str, seconds: float) -> None:
+    """Record a stage duration measured outside a span.
+
+    Args:
+        name: Stage name.
+        seconds: Duration.
+    """
+    record_pipeline_stage(name, seconds, "ok")
+
+
+def _export_otel(finished: Span) -> None:
+    """Forward a finished span to the OpenTelemetry global tracer."""
+    # perf_counter_ns has an arbitrary origin; OTel wants epoch ns
+    offset = time.time_ns() - time.perf_counter_ns()
+    tracer = otel_trace.get_tracer("bot.pipeline")
+    otel_span = tracer.start_span(finished.name,
+                                  start_time=finished.start_ns + offset,
+                                  attributes={
+                                      **{
+                                          key: value for key, value in
+                                          finished.attributes.items()
+                                          if value is not None
+                                      },
+                                      "bot.trace_id": finished.trace_id,
+                                      "bot.span_id": finished.span_id,
+                                      "bot.parent_id": finished.parent_id or "",
+                                  })
+    if finished.status == "error":
+        otel_span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR))
+    otel_span.end(end_time=finished.end_ns + offset)